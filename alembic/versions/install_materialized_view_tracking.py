@@ -0,0 +1,41 @@
+"""Änderungserkennung der materialisierten Ansichten
+
+Revision ID: b7e2f4a9c1d3
+Revises: 8aacdc96b4ff
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from backend.db.materialized_views import install_change_tracking
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2f4a9c1d3'
+down_revision: Union[str, None] = '8aacdc96b4ff'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Protokoll, Zähler und Trigger einmalig in der Migrationstransaktion anlegen
+    install_change_tracking(op.get_bind())
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    tables = [row[0] for row in bind.exec_driver_sql("SELECT table_name FROM materialized_views_changes")]
+    for table in tables:
+        if bind.dialect.name == "postgresql":
+            op.execute(f"DROP TRIGGER IF EXISTS mv_track_{table} ON {table}")
+            op.execute(f"DROP TRIGGER IF EXISTS mv_delta_{table} ON {table}")
+        else:
+            for operation in ("insert", "update", "delete"):
+                op.execute(f"DROP TRIGGER IF EXISTS mv_log_{table}_{operation}")
+    if bind.dialect.name == "postgresql":
+        op.execute("DROP FUNCTION IF EXISTS mv_track_changes()")
+        op.execute("DROP FUNCTION IF EXISTS mv_track_delta()")
+    op.execute("DROP TABLE IF EXISTS materialized_views_change_log")
+    op.execute("DROP TABLE IF EXISTS materialized_views_delta")
+    op.execute("DROP TABLE IF EXISTS materialized_views_changes")
@@ -76,7 +76,7 @@ def get_artikel_batch(
     Ruft mehrere Artikel in einem optimierten Batch ab.
     """
     try:
-        artikel_batch = process_artikel_batches(db, request.ids)
+        artikel_batch = process_artikel_batches(db, request.ids, profile="list")
         
         # Antwort aufbereiten
         artikel_list = []
@@ -85,7 +85,7 @@ def get_artikel_batch(
                 "id": artikel.id,
                 "name": artikel.name,
                 "artikelnummer": getattr(artikel, "artikelnummer", None),
-                "kategorie": getattr(artikel, "kategorie", None),
+                "kategorie": artikel.kategorie.name if artikel.kategorie else None,
                 "beschreibung": getattr(artikel, "beschreibung", None)
             })
         
@@ -118,7 +118,7 @@ def get_artikel_paginated(
                 "id": artikel.id,
                 "name": artikel.name,
                 "artikelnummer": getattr(artikel, "artikelnummer", None),
-                "kategorie": getattr(artikel, "kategorie", None),
+                "kategorie": artikel.kategorie.name if artikel.kategorie else None,
                 "beschreibung": getattr(artikel, "beschreibung", None)
             })
         
@@ -9,11 +9,14 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, date
 from decimal import Decimal
 import logging
+import os
 
 from ..modules.pos_system import (
     POSSystem, POSProduct, POSCartItem, POSSale, 
     POSDailyReport, PaymentMethod, SaleStatus
 )
+from ..modules.number_range_service import NumberRangeService
+from ..modules.pos_journal import POSJournal, POSJournalWorker
 from ..auth.auth_handler import get_current_user
 from ..database.connection import get_database_connection
 
@@ -21,12 +24,19 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/pos", tags=["Kassensystem"])
 
+# Kasse und lokale Datenbanken je Installation; die Kassennummer ist zugleich
+# Worker-ID der Nummernkreise und darf nur von einem Prozess genutzt werden
+KASSE_ID = os.environ.get("POS_KASSE_ID", "01")
+NUMBER_RANGE_DB = os.environ.get("POS_NUMBER_RANGE_DB", os.path.join(os.getcwd(), "pos_nummernkreise.db"))
+JOURNAL_DB = os.environ.get("POS_JOURNAL_DB", os.path.join(os.getcwd(), "pos_journal.db"))
+
 # Globale POS-System-Instanz
 pos_system: Optional[POSSystem] = None
+journal_worker: Optional[POSJournalWorker] = None
 
 def get_pos_system():
     """POS-System-Instanz abrufen"""
-    global pos_system
+    global pos_system, journal_worker
     if pos_system is None:
         db_conn = get_database_connection()
         tse_config = {
@@ -34,7 +44,17 @@ def get_pos_system():
             'port': 8080,
             'timeout': 30
         }
-        pos_system = POSSystem(db_conn, tse_config)
+        # Belegnummern je Kasse aus eigenen Blöcken, ohne Sperre auf einem zentralen Zähler;
+        # ein zweiter Prozess mit derselben Kasse scheitert hier (WorkerIdInUseError)
+        number_ranges = NumberRangeService(NUMBER_RANGE_DB, worker_id=f"kasse-{KASSE_ID}")
+        # Verkäufe lokal festschreiben; TSE, Lager und FIBU folgen gebündelt im Hintergrund
+        journal = POSJournal(JOURNAL_DB, kasse_id=KASSE_ID)
+        pos_system = POSSystem(db_conn, tse_config, number_ranges=number_ranges, kasse_id=KASSE_ID,
+                               journal=journal)
+        # Artikelstamm einmal laden; Scans und Suche laufen danach im Speicher
+        pos_system.load_catalog()
+        journal_worker = pos_system.create_journal_worker()
+        journal_worker.start()
     return pos_system
 
 @router.get("/products", response_model=List[Dict[str, Any]])
@@ -449,6 +469,7 @@ async def get_pos_status(current_user: Dict = Depends(get_current_user)):
         return {
             "system_status": "online",
             "tse_connected": pos.tse is not None,
+            "journal_backlog": pos.journal.backlog() if pos.journal else {},
             "current_cart": {
                 'anzahl_artikel': cart_total['anzahl_artikel'],
                 'gesamt_brutto': float(cart_total['brutto'])
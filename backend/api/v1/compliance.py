@@ -70,6 +70,38 @@ async def validate_batch(
             detail=f"Fehler bei der Validierung: {str(e)}"
         )
 
+@router.post("/batches/validate", response_model=Dict[str, List[ComplianceRecord]])
+async def validate_batches(
+    batches: Dict[str, Dict[str, Any]],
+    compliance_types: Optional[List[ComplianceType]] = None,
+    responsible_person: str = Query(..., description="Name der verantwortlichen Person"),
+    digital_signature: str = Query(..., description="Digitale Signatur")
+) -> Dict[str, List[ComplianceRecord]]:
+    """
+    Führt die Compliance-Validierung für viele Chargen in einem Aufruf durch
+    
+    Args:
+        batches: Chargendaten nach Chargen-ID
+        compliance_types: Optional Liste der zu prüfenden Standards
+        responsible_person: Name der verantwortlichen Person
+        digital_signature: Digitale Signatur
+        
+    Returns:
+        Validierungsergebnisse nach Chargen-ID
+    """
+    try:
+        return await compliance_engine.validate_batches(
+            batches=batches,
+            compliance_types=compliance_types,
+            responsible_person=responsible_person,
+            digital_signature=digital_signature
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Fehler bei der Validierung: {str(e)}"
+        )
+
 @router.get("/batch/{batch_id}/summary")
 async def get_validation_summary(batch_id: str) -> Dict[str, Any]:
     """
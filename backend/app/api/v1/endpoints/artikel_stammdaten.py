@@ -5,12 +5,13 @@ Diese Endpunkte ermöglichen die Verwaltung von erweiterten Artikelstammdaten im
 
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Body, Query, Path
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 
 try:
-    from backend.app.dependencies import get_db
+    from backend.app.db.async_session import get_async_db, reload_for_response, response_load_options
     from backend.app.schemas.artikel_stammdaten import (
         ArtikelStammdatenCreate, ArtikelStammdatenResponse, ArtikelStammdatenUpdate,
         AlternativeEinheitCreate, AlternativeEinheitResponse,
@@ -34,8 +35,9 @@ try:
 except ImportError:
     # Fallback: Vereinfachte Implementierung für Entwicklungszwecke
     from fastapi import Depends
-    from sqlalchemy.orm import Session
-    from backend.app.dependencies import get_db
+    from sqlalchemy import delete, select
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from backend.app.db.async_session import get_async_db, reload_for_response, response_load_options
     from backend.app.schemas.artikel_stammdaten import (
         ArtikelStammdatenCreate, ArtikelStammdatenResponse, ArtikelStammdatenUpdate,
         AlternativeEinheitCreate, AlternativeEinheitResponse,
@@ -57,21 +59,21 @@ router = APIRouter()
 
 # Artikel-Stammdaten-Endpunkte
 @router.post("/", response_model=ArtikelStammdatenResponse)
-def create_stammdaten(
+async def create_stammdaten(
     stammdaten: ArtikelStammdatenCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Erstellt erweiterte Stammdaten für einen Artikel.
     """
     try:
         # Prüfen, ob der Artikel existiert
-        artikel = db.query(Artikel).filter(Artikel.id == stammdaten.artikel_id).first()
+        artikel = await db.get(Artikel, stammdaten.artikel_id)
         if not artikel:
             raise HTTPException(status_code=404, detail=f"Artikel mit ID {stammdaten.artikel_id} nicht gefunden")
         
         # Prüfen, ob bereits Stammdaten für diesen Artikel existieren
-        existing = db.query(ArtikelStammdaten).filter(ArtikelStammdaten.artikel_id == stammdaten.artikel_id).first()
+        existing = (await db.execute(select(ArtikelStammdaten).where(ArtikelStammdaten.artikel_id == stammdaten.artikel_id))).scalars().first()
         if existing:
             raise HTTPException(status_code=400, detail=f"Für Artikel {stammdaten.artikel_id} existieren bereits Stammdaten")
         
@@ -121,7 +123,7 @@ def create_stammdaten(
         
         # Speichern des Basis-Objekts
         db.add(db_stammdaten)
-        db.flush()  # Flush, um die ID für Beziehungen zu haben
+        await db.flush()  # Flush, um die ID für Beziehungen zu haben
         
         # Alternative Einheiten hinzufügen, falls vorhanden
         if stammdaten.alternative_einheiten:
@@ -222,7 +224,7 @@ def create_stammdaten(
                 geprueft_von=ki_data.geprueft_von
             )
             db.add(ki)
-            db.flush()  # Flush, um die ID für KI-Alternativen und Keywords zu haben
+            await db.flush()  # Flush, um die ID für KI-Alternativen und Keywords zu haben
             
             # KI-Alternativen hinzufügen, falls vorhanden
             if ki_data.alternativen:
@@ -244,83 +246,84 @@ def create_stammdaten(
                     )
                     db.add(kw)
         
-        db.commit()
-        db.refresh(db_stammdaten)
+        await db.commit()
+        db_stammdaten = await reload_for_response(db, db_stammdaten, ArtikelStammdatenResponse)
         return db_stammdaten
     
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Datenintegrität verletzt: {str(e)}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Fehler beim Erstellen der Stammdaten: {str(e)}")
 
 @router.get("/", response_model=List[ArtikelStammdatenResponse])
-def get_stammdaten_list(
+async def get_stammdaten_list(
     skip: int = 0,
     limit: int = 100,
     artikel_gruppe: Optional[str] = None,
     artikel_art: Optional[str] = None,
     ean_code: Optional[str] = None,
     nur_aktive: bool = True,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Gibt eine Liste von Artikel-Stammdaten zurück.
     Kann nach Gruppe, Art und EAN-Code gefiltert werden.
     """
-    query = db.query(ArtikelStammdaten)
+    query = select(ArtikelStammdaten).options(*response_load_options(ArtikelStammdaten, ArtikelStammdatenResponse))
     
     # Filter anwenden
     if artikel_gruppe:
-        query = query.filter(ArtikelStammdaten.artikel_gruppe == artikel_gruppe)
+        query = query.where(ArtikelStammdaten.artikel_gruppe == artikel_gruppe)
     if artikel_art:
-        query = query.filter(ArtikelStammdaten.artikel_art == artikel_art)
+        query = query.where(ArtikelStammdaten.artikel_art == artikel_art)
     if ean_code:
-        query = query.filter(ArtikelStammdaten.ean_code == ean_code)
+        query = query.where(ArtikelStammdaten.ean_code == ean_code)
     if nur_aktive:
-        query = query.filter(ArtikelStammdaten.artikel_gesperrt == False)
+        query = query.where(ArtikelStammdaten.artikel_gesperrt == False)
     
     # Paginierung anwenden
-    stammdaten_list = query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    stammdaten_list = result.scalars().all()
     return stammdaten_list
 
 @router.get("/{stammdaten_id}", response_model=ArtikelStammdatenResponse)
-def get_stammdaten_by_id(
+async def get_stammdaten_by_id(
     stammdaten_id: int = Path(..., title="Die ID des Stammdatensatzes"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Gibt einen Stammdatensatz anhand seiner ID zurück.
     """
-    stammdaten = db.query(ArtikelStammdaten).filter(ArtikelStammdaten.id == stammdaten_id).first()
+    stammdaten = await db.get(ArtikelStammdaten, stammdaten_id, options=response_load_options(ArtikelStammdaten, ArtikelStammdatenResponse))
     if not stammdaten:
         raise HTTPException(status_code=404, detail=f"Stammdaten mit ID {stammdaten_id} nicht gefunden")
     return stammdaten
 
 @router.get("/artikel/{artikel_id}", response_model=ArtikelStammdatenResponse)
-def get_stammdaten_by_artikel_id(
+async def get_stammdaten_by_artikel_id(
     artikel_id: int = Path(..., title="Die ID des Artikels"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Gibt den Stammdatensatz für einen bestimmten Artikel zurück.
     """
-    stammdaten = db.query(ArtikelStammdaten).filter(ArtikelStammdaten.artikel_id == artikel_id).first()
+    stammdaten = (await db.execute(select(ArtikelStammdaten).where(ArtikelStammdaten.artikel_id == artikel_id).options(*response_load_options(ArtikelStammdaten, ArtikelStammdatenResponse)))).scalars().first()
     if not stammdaten:
         raise HTTPException(status_code=404, detail=f"Stammdaten für Artikel {artikel_id} nicht gefunden")
     return stammdaten
 
 @router.put("/{stammdaten_id}", response_model=ArtikelStammdatenResponse)
-def update_stammdaten(
+async def update_stammdaten(
     stammdaten_id: int,
     stammdaten_update: ArtikelStammdatenUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Aktualisiert einen Stammdatensatz.
     """
-    db_stammdaten = db.query(ArtikelStammdaten).filter(ArtikelStammdaten.id == stammdaten_id).first()
+    db_stammdaten = await db.get(ArtikelStammdaten, stammdaten_id)
     if not db_stammdaten:
         raise HTTPException(status_code=404, detail=f"Stammdaten mit ID {stammdaten_id} nicht gefunden")
     
@@ -338,46 +341,46 @@ def update_stammdaten(
     db_stammdaten.geaendert_am = datetime.now()
     
     try:
-        db.commit()
-        db.refresh(db_stammdaten)
+        await db.commit()
+        db_stammdaten = await reload_for_response(db, db_stammdaten, ArtikelStammdatenResponse)
         return db_stammdaten
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Datenintegrität verletzt: {str(e)}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Fehler beim Aktualisieren der Stammdaten: {str(e)}")
 
 @router.delete("/{stammdaten_id}", status_code=204)
-def delete_stammdaten(
+async def delete_stammdaten(
     stammdaten_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Löscht einen Stammdatensatz.
     """
-    db_stammdaten = db.query(ArtikelStammdaten).filter(ArtikelStammdaten.id == stammdaten_id).first()
+    db_stammdaten = await db.get(ArtikelStammdaten, stammdaten_id)
     if not db_stammdaten:
         raise HTTPException(status_code=404, detail=f"Stammdaten mit ID {stammdaten_id} nicht gefunden")
     
     try:
-        db.delete(db_stammdaten)
-        db.commit()
+        await db.delete(db_stammdaten)
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Fehler beim Löschen der Stammdaten: {str(e)}")
 
 # Einheiten-Endpunkte
 @router.post("/{stammdaten_id}/einheiten", response_model=AlternativeEinheitResponse)
-def add_alternative_einheit(
+async def add_alternative_einheit(
     stammdaten_id: int,
     einheit: AlternativeEinheitCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Fügt eine alternative Einheit zu einem Stammdatensatz hinzu.
     """
-    db_stammdaten = db.query(ArtikelStammdaten).filter(ArtikelStammdaten.id == stammdaten_id).first()
+    db_stammdaten = await db.get(ArtikelStammdaten, stammdaten_id)
     if not db_stammdaten:
         raise HTTPException(status_code=404, detail=f"Stammdaten mit ID {stammdaten_id} nicht gefunden")
     
@@ -390,24 +393,24 @@ def add_alternative_einheit(
     
     try:
         db.add(db_einheit)
-        db.commit()
-        db.refresh(db_einheit)
+        await db.commit()
+        db_einheit = await reload_for_response(db, db_einheit, AlternativeEinheitResponse)
         return db_einheit
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Fehler beim Hinzufügen der Einheit: {str(e)}")
 
 # Verkaufspreis-Endpunkte
 @router.post("/{stammdaten_id}/preise", response_model=VerkaufsPreisResponse)
-def add_verkaufspreis(
+async def add_verkaufspreis(
     stammdaten_id: int,
     preis: VerkaufsPreisCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Fügt einen Verkaufspreis zu einem Stammdatensatz hinzu.
     """
-    db_stammdaten = db.query(ArtikelStammdaten).filter(ArtikelStammdaten.id == stammdaten_id).first()
+    db_stammdaten = await db.get(ArtikelStammdaten, stammdaten_id)
     if not db_stammdaten:
         raise HTTPException(status_code=404, detail=f"Stammdaten mit ID {stammdaten_id} nicht gefunden")
     
@@ -425,29 +428,29 @@ def add_verkaufspreis(
     
     try:
         db.add(db_preis)
-        db.commit()
-        db.refresh(db_preis)
+        await db.commit()
+        db_preis = await reload_for_response(db, db_preis, VerkaufsPreisResponse)
         return db_preis
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Fehler beim Hinzufügen des Verkaufspreises: {str(e)}")
 
 # KI-Erweiterungs-Endpunkte
 @router.post("/{stammdaten_id}/ki", response_model=KIErweiterungResponse)
-def create_ki_erweiterung(
+async def create_ki_erweiterung(
     stammdaten_id: int,
     ki_erweiterung: KIErweiterungCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Erstellt oder aktualisiert KI-Erweiterungen für einen Stammdatensatz.
     """
-    db_stammdaten = db.query(ArtikelStammdaten).filter(ArtikelStammdaten.id == stammdaten_id).first()
+    db_stammdaten = await db.get(ArtikelStammdaten, stammdaten_id)
     if not db_stammdaten:
         raise HTTPException(status_code=404, detail=f"Stammdaten mit ID {stammdaten_id} nicht gefunden")
     
     # Prüfen, ob bereits eine KI-Erweiterung existiert
-    existing_ki = db.query(KIErweiterung).filter(KIErweiterung.stammdaten_id == stammdaten_id).first()
+    existing_ki = (await db.execute(select(KIErweiterung).where(KIErweiterung.stammdaten_id == stammdaten_id))).scalars().first()
     if existing_ki:
         # Aktualisieren der bestehenden KI-Erweiterung
         for key, value in ki_erweiterung.dict(exclude={"alternativen", "seo_keywords"}).items():
@@ -461,12 +464,12 @@ def create_ki_erweiterung(
         )
         db.add(db_ki)
     
-    db.flush()  # Flush, um die ID für Beziehungen zu haben
+    await db.flush()  # Flush, um die ID für Beziehungen zu haben
     
     # KI-Alternativen hinzufügen oder aktualisieren
     if ki_erweiterung.alternativen:
         # Bestehende entfernen
-        db.query(KIAlternative).filter(KIAlternative.ki_erweiterung_id == db_ki.id).delete()
+        await db.execute(delete(KIAlternative).where(KIAlternative.ki_erweiterung_id == db_ki.id))
         # Neue hinzufügen
         for alt_data in ki_erweiterung.alternativen:
             alt = KIAlternative(
@@ -479,7 +482,7 @@ def create_ki_erweiterung(
     # SEO-Keywords hinzufügen oder aktualisieren
     if ki_erweiterung.seo_keywords:
         # Bestehende entfernen
-        db.query(SEOKeyword).filter(SEOKeyword.ki_erweiterung_id == db_ki.id).delete()
+        await db.execute(delete(SEOKeyword).where(SEOKeyword.ki_erweiterung_id == db_ki.id))
         # Neue hinzufügen
         for kw_data in ki_erweiterung.seo_keywords:
             kw = SEOKeyword(
@@ -490,30 +493,30 @@ def create_ki_erweiterung(
             db.add(kw)
     
     try:
-        db.commit()
-        db.refresh(db_ki)
+        await db.commit()
+        db_ki = await reload_for_response(db, db_ki, KIErweiterungResponse)
         return db_ki
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Fehler beim Erstellen/Aktualisieren der KI-Erweiterung: {str(e)}")
 
 # KI-Analysen
 @router.post("/{stammdaten_id}/ki/analyze", response_model=Dict[str, Any])
-def analyze_with_ki(
+async def analyze_with_ki(
     stammdaten_id: int,
     analysis_type: str = Query(..., description="Typ der Analyse: 'preisempfehlung', 'beschreibung', 'klassifikation'"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Führt eine KI-Analyse für den Artikel durch und gibt Ergebnisse zurück.
     Die Ergebnisse werden nicht gespeichert, sondern nur zurückgegeben.
     """
-    db_stammdaten = db.query(ArtikelStammdaten).filter(ArtikelStammdaten.id == stammdaten_id).first()
+    db_stammdaten = await db.get(ArtikelStammdaten, stammdaten_id)
     if not db_stammdaten:
         raise HTTPException(status_code=404, detail=f"Stammdaten mit ID {stammdaten_id} nicht gefunden")
     
     # Artikel-Informationen laden
-    artikel = db.query(Artikel).filter(Artikel.id == db_stammdaten.artikel_id).first()
+    artikel = await db.get(Artikel, db_stammdaten.artikel_id)
     if not artikel:
         raise HTTPException(status_code=404, detail=f"Artikel mit ID {db_stammdaten.artikel_id} nicht gefunden")
     
@@ -5,12 +5,13 @@ Implementiert alle CRUD-Operationen für 30+ CRM-Formulare
 
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Body, Query, Path
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, date
 import logging
 
-from backend.app.dependencies import get_db
+from backend.app.db.async_session import get_async_db, reload_for_response, response_load_options
 from backend.app.models.crm import (
     Kunde, Kontakt, Angebot, AngebotPosition, Auftrag, AuftragPosition,
     Verkaufschance, VerkaufschanceAktivitaet, MarketingKampagne, KampagnenTeilnehmer,
@@ -43,7 +44,7 @@ router = APIRouter(prefix="/crm", tags=["CRM"])
 @router.post("/kunde/", response_model=KundeResponse)
 async def create_kunde(
     kunde: KundeCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neuen Kunden"""
@@ -53,11 +54,11 @@ async def create_kunde(
     try:
         db_kunde = Kunde(**kunde.dict())
         db.add(db_kunde)
-        db.commit()
-        db.refresh(db_kunde)
+        await db.commit()
+        db_kunde = await reload_for_response(db, db_kunde, KundeResponse)
         return db_kunde
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Kunde bereits vorhanden")
 
 @router.get("/kunde/", response_model=List[KundeResponse])
@@ -67,34 +68,35 @@ async def get_kunde_list(
     kundentyp: Optional[str] = None,
     status: Optional[str] = None,
     vertriebsgebiet: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Kunden mit Filterung"""
     if not check_permission(current_user, "crm", "kunde", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Kunde)
+    query = select(Kunde).options(*response_load_options(Kunde, KundeResponse))
     if kundentyp:
-        query = query.filter(Kunde.kundentyp == kundentyp)
+        query = query.where(Kunde.kundentyp == kundentyp)
     if status:
-        query = query.filter(Kunde.status == status)
+        query = query.where(Kunde.status == status)
     if vertriebsgebiet:
-        query = query.filter(Kunde.vertriebsgebiet == vertriebsgebiet)
+        query = query.where(Kunde.vertriebsgebiet == vertriebsgebiet)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/kunde/{kunde_id}", response_model=KundeResponse)
 async def get_kunde(
     kunde_id: int = Path(..., title="Kunde ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifischen Kunden"""
     if not check_permission(current_user, "crm", "kunde", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    kunde = db.query(Kunde).filter(Kunde.id == kunde_id).first()
+    kunde = await db.get(Kunde, kunde_id, options=response_load_options(Kunde, KundeResponse))
     if not kunde:
         raise HTTPException(status_code=404, detail="Kunde nicht gefunden")
     return kunde
@@ -103,47 +105,47 @@ async def get_kunde(
 async def update_kunde(
     kunde_id: int = Path(..., title="Kunde ID"),
     kunde_update: KundeUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Kunde"""
     if not check_permission(current_user, "crm", "kunde", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    kunde = db.query(Kunde).filter(Kunde.id == kunde_id).first()
+    kunde = await db.get(Kunde, kunde_id)
     if not kunde:
         raise HTTPException(status_code=404, detail="Kunde nicht gefunden")
     
     for field, value in kunde_update.dict(exclude_unset=True).items():
         setattr(kunde, field, value)
     
-    db.commit()
-    db.refresh(kunde)
+    await db.commit()
+    kunde = await reload_for_response(db, kunde, KundeResponse)
     return kunde
 
 @router.delete("/kunde/{kunde_id}", status_code=204)
 async def delete_kunde(
     kunde_id: int = Path(..., title="Kunde ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Kunde"""
     if not check_permission(current_user, "crm", "kunde", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    kunde = db.query(Kunde).filter(Kunde.id == kunde_id).first()
+    kunde = await db.get(Kunde, kunde_id)
     if not kunde:
         raise HTTPException(status_code=404, detail="Kunde nicht gefunden")
     
-    db.delete(kunde)
-    db.commit()
+    await db.delete(kunde)
+    await db.commit()
 
 # ==================== Kontakt Endpoints ====================
 
 @router.post("/kontakt/", response_model=KontaktResponse)
 async def create_kontakt(
     kontakt: KontaktCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neuen Kontakt"""
@@ -153,11 +155,11 @@ async def create_kontakt(
     try:
         db_kontakt = Kontakt(**kontakt.dict())
         db.add(db_kontakt)
-        db.commit()
-        db.refresh(db_kontakt)
+        await db.commit()
+        db_kontakt = await reload_for_response(db, db_kontakt, KontaktResponse)
         return db_kontakt
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Kontakt bereits vorhanden")
 
 @router.get("/kontakt/", response_model=List[KontaktResponse])
@@ -167,34 +169,35 @@ async def get_kontakt_list(
     kunde_id: Optional[int] = None,
     kontakttyp: Optional[str] = None,
     ist_primär: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Kontakte mit Filterung"""
     if not check_permission(current_user, "crm", "kontakt", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Kontakt)
+    query = select(Kontakt).options(*response_load_options(Kontakt, KontaktResponse))
     if kunde_id:
-        query = query.filter(Kontakt.kunde_id == kunde_id)
+        query = query.where(Kontakt.kunde_id == kunde_id)
     if kontakttyp:
-        query = query.filter(Kontakt.kontakttyp == kontakttyp)
+        query = query.where(Kontakt.kontakttyp == kontakttyp)
     if ist_primär is not None:
-        query = query.filter(Kontakt.ist_primär == ist_primär)
+        query = query.where(Kontakt.ist_primär == ist_primär)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/kontakt/{kontakt_id}", response_model=KontaktResponse)
 async def get_kontakt(
     kontakt_id: int = Path(..., title="Kontakt ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifischen Kontakt"""
     if not check_permission(current_user, "crm", "kontakt", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    kontakt = db.query(Kontakt).filter(Kontakt.id == kontakt_id).first()
+    kontakt = await db.get(Kontakt, kontakt_id, options=response_load_options(Kontakt, KontaktResponse))
     if not kontakt:
         raise HTTPException(status_code=404, detail="Kontakt nicht gefunden")
     return kontakt
@@ -203,47 +206,47 @@ async def get_kontakt(
 async def update_kontakt(
     kontakt_id: int = Path(..., title="Kontakt ID"),
     kontakt_update: KontaktUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Kontakt"""
     if not check_permission(current_user, "crm", "kontakt", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    kontakt = db.query(Kontakt).filter(Kontakt.id == kontakt_id).first()
+    kontakt = await db.get(Kontakt, kontakt_id)
     if not kontakt:
         raise HTTPException(status_code=404, detail="Kontakt nicht gefunden")
     
     for field, value in kontakt_update.dict(exclude_unset=True).items():
         setattr(kontakt, field, value)
     
-    db.commit()
-    db.refresh(kontakt)
+    await db.commit()
+    kontakt = await reload_for_response(db, kontakt, KontaktResponse)
     return kontakt
 
 @router.delete("/kontakt/{kontakt_id}", status_code=204)
 async def delete_kontakt(
     kontakt_id: int = Path(..., title="Kontakt ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Kontakt"""
     if not check_permission(current_user, "crm", "kontakt", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    kontakt = db.query(Kontakt).filter(Kontakt.id == kontakt_id).first()
+    kontakt = await db.get(Kontakt, kontakt_id)
     if not kontakt:
         raise HTTPException(status_code=404, detail="Kontakt nicht gefunden")
     
-    db.delete(kontakt)
-    db.commit()
+    await db.delete(kontakt)
+    await db.commit()
 
 # ==================== Angebot Endpoints ====================
 
 @router.post("/angebot/", response_model=AngebotResponse)
 async def create_angebot(
     angebot: AngebotCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neues Angebot"""
@@ -253,11 +256,11 @@ async def create_angebot(
     try:
         db_angebot = Angebot(**angebot.dict())
         db.add(db_angebot)
-        db.commit()
-        db.refresh(db_angebot)
+        await db.commit()
+        db_angebot = await reload_for_response(db, db_angebot, AngebotResponse)
         return db_angebot
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Angebot konnte nicht erstellt werden")
 
 @router.get("/angebot/", response_model=List[AngebotResponse])
@@ -268,36 +271,37 @@ async def get_angebot_list(
     status: Optional[str] = None,
     von_datum: Optional[date] = None,
     bis_datum: Optional[date] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Angebote mit Filterung"""
     if not check_permission(current_user, "crm", "angebot", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Angebot)
+    query = select(Angebot).options(*response_load_options(Angebot, AngebotResponse))
     if kunde_id:
-        query = query.filter(Angebot.kunde_id == kunde_id)
+        query = query.where(Angebot.kunde_id == kunde_id)
     if status:
-        query = query.filter(Angebot.status == status)
+        query = query.where(Angebot.status == status)
     if von_datum:
-        query = query.filter(Angebot.angebotsdatum >= von_datum)
+        query = query.where(Angebot.angebotsdatum >= von_datum)
     if bis_datum:
-        query = query.filter(Angebot.angebotsdatum <= bis_datum)
+        query = query.where(Angebot.angebotsdatum <= bis_datum)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/angebot/{angebot_id}", response_model=AngebotResponse)
 async def get_angebot(
     angebot_id: int = Path(..., title="Angebot ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifisches Angebot"""
     if not check_permission(current_user, "crm", "angebot", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    angebot = db.query(Angebot).filter(Angebot.id == angebot_id).first()
+    angebot = await db.get(Angebot, angebot_id, options=response_load_options(Angebot, AngebotResponse))
     if not angebot:
         raise HTTPException(status_code=404, detail="Angebot nicht gefunden")
     return angebot
@@ -306,47 +310,47 @@ async def get_angebot(
 async def update_angebot(
     angebot_id: int = Path(..., title="Angebot ID"),
     angebot_update: AngebotUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Angebot"""
     if not check_permission(current_user, "crm", "angebot", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    angebot = db.query(Angebot).filter(Angebot.id == angebot_id).first()
+    angebot = await db.get(Angebot, angebot_id)
     if not angebot:
         raise HTTPException(status_code=404, detail="Angebot nicht gefunden")
     
     for field, value in angebot_update.dict(exclude_unset=True).items():
         setattr(angebot, field, value)
     
-    db.commit()
-    db.refresh(angebot)
+    await db.commit()
+    angebot = await reload_for_response(db, angebot, AngebotResponse)
     return angebot
 
 @router.delete("/angebot/{angebot_id}", status_code=204)
 async def delete_angebot(
     angebot_id: int = Path(..., title="Angebot ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Angebot"""
     if not check_permission(current_user, "crm", "angebot", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    angebot = db.query(Angebot).filter(Angebot.id == angebot_id).first()
+    angebot = await db.get(Angebot, angebot_id)
     if not angebot:
         raise HTTPException(status_code=404, detail="Angebot nicht gefunden")
     
-    db.delete(angebot)
-    db.commit()
+    await db.delete(angebot)
+    await db.commit()
 
 # ==================== Auftrag Endpoints ====================
 
 @router.post("/auftrag/", response_model=AuftragResponse)
 async def create_auftrag(
     auftrag: AuftragCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neuen Auftrag"""
@@ -356,11 +360,11 @@ async def create_auftrag(
     try:
         db_auftrag = Auftrag(**auftrag.dict())
         db.add(db_auftrag)
-        db.commit()
-        db.refresh(db_auftrag)
+        await db.commit()
+        db_auftrag = await reload_for_response(db, db_auftrag, AuftragResponse)
         return db_auftrag
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Auftrag konnte nicht erstellt werden")
 
 @router.get("/auftrag/", response_model=List[AuftragResponse])
@@ -371,36 +375,37 @@ async def get_auftrag_list(
     status: Optional[str] = None,
     von_datum: Optional[date] = None,
     bis_datum: Optional[date] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Aufträge mit Filterung"""
     if not check_permission(current_user, "crm", "auftrag", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Auftrag)
+    query = select(Auftrag).options(*response_load_options(Auftrag, AuftragResponse))
     if kunde_id:
-        query = query.filter(Auftrag.kunde_id == kunde_id)
+        query = query.where(Auftrag.kunde_id == kunde_id)
     if status:
-        query = query.filter(Auftrag.status == status)
+        query = query.where(Auftrag.status == status)
     if von_datum:
-        query = query.filter(Auftrag.auftragsdatum >= von_datum)
+        query = query.where(Auftrag.auftragsdatum >= von_datum)
     if bis_datum:
-        query = query.filter(Auftrag.auftragsdatum <= bis_datum)
+        query = query.where(Auftrag.auftragsdatum <= bis_datum)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/auftrag/{auftrag_id}", response_model=AuftragResponse)
 async def get_auftrag(
     auftrag_id: int = Path(..., title="Auftrag ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifischen Auftrag"""
     if not check_permission(current_user, "crm", "auftrag", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    auftrag = db.query(Auftrag).filter(Auftrag.id == auftrag_id).first()
+    auftrag = await db.get(Auftrag, auftrag_id, options=response_load_options(Auftrag, AuftragResponse))
     if not auftrag:
         raise HTTPException(status_code=404, detail="Auftrag nicht gefunden")
     return auftrag
@@ -409,47 +414,47 @@ async def get_auftrag(
 async def update_auftrag(
     auftrag_id: int = Path(..., title="Auftrag ID"),
     auftrag_update: AuftragUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Auftrag"""
     if not check_permission(current_user, "crm", "auftrag", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    auftrag = db.query(Auftrag).filter(Auftrag.id == auftrag_id).first()
+    auftrag = await db.get(Auftrag, auftrag_id)
     if not auftrag:
         raise HTTPException(status_code=404, detail="Auftrag nicht gefunden")
     
     for field, value in auftrag_update.dict(exclude_unset=True).items():
         setattr(auftrag, field, value)
     
-    db.commit()
-    db.refresh(auftrag)
+    await db.commit()
+    auftrag = await reload_for_response(db, auftrag, AuftragResponse)
     return auftrag
 
 @router.delete("/auftrag/{auftrag_id}", status_code=204)
 async def delete_auftrag(
     auftrag_id: int = Path(..., title="Auftrag ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Auftrag"""
     if not check_permission(current_user, "crm", "auftrag", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    auftrag = db.query(Auftrag).filter(Auftrag.id == auftrag_id).first()
+    auftrag = await db.get(Auftrag, auftrag_id)
     if not auftrag:
         raise HTTPException(status_code=404, detail="Auftrag nicht gefunden")
     
-    db.delete(auftrag)
-    db.commit()
+    await db.delete(auftrag)
+    await db.commit()
 
 # ==================== Verkaufschance Endpoints ====================
 
 @router.post("/verkaufschance/", response_model=VerkaufschanceResponse)
 async def create_verkaufschance(
     verkaufschance: VerkaufschanceCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neue Verkaufschance"""
@@ -459,11 +464,11 @@ async def create_verkaufschance(
     try:
         db_verkaufschance = Verkaufschance(**verkaufschance.dict())
         db.add(db_verkaufschance)
-        db.commit()
-        db.refresh(db_verkaufschance)
+        await db.commit()
+        db_verkaufschance = await reload_for_response(db, db_verkaufschance, VerkaufschanceResponse)
         return db_verkaufschance
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Verkaufschance konnte nicht erstellt werden")
 
 @router.get("/verkaufschance/", response_model=List[VerkaufschanceResponse])
@@ -475,38 +480,39 @@ async def get_verkaufschance_list(
     wahrscheinlichkeit: Optional[float] = None,
     von_datum: Optional[date] = None,
     bis_datum: Optional[date] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Verkaufschancen mit Filterung"""
     if not check_permission(current_user, "crm", "verkaufschance", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Verkaufschance)
+    query = select(Verkaufschance).options(*response_load_options(Verkaufschance, VerkaufschanceResponse))
     if kunde_id:
-        query = query.filter(Verkaufschance.kunde_id == kunde_id)
+        query = query.where(Verkaufschance.kunde_id == kunde_id)
     if status:
-        query = query.filter(Verkaufschance.status == status)
+        query = query.where(Verkaufschance.status == status)
     if wahrscheinlichkeit:
-        query = query.filter(Verkaufschance.wahrscheinlichkeit >= wahrscheinlichkeit)
+        query = query.where(Verkaufschance.wahrscheinlichkeit >= wahrscheinlichkeit)
     if von_datum:
-        query = query.filter(Verkaufschance.erwartetes_abschlussdatum >= von_datum)
+        query = query.where(Verkaufschance.erwartetes_abschlussdatum >= von_datum)
     if bis_datum:
-        query = query.filter(Verkaufschance.erwartetes_abschlussdatum <= bis_datum)
+        query = query.where(Verkaufschance.erwartetes_abschlussdatum <= bis_datum)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/verkaufschance/{verkaufschance_id}", response_model=VerkaufschanceResponse)
 async def get_verkaufschance(
     verkaufschance_id: int = Path(..., title="Verkaufschance ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifische Verkaufschance"""
     if not check_permission(current_user, "crm", "verkaufschance", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    verkaufschance = db.query(Verkaufschance).filter(Verkaufschance.id == verkaufschance_id).first()
+    verkaufschance = await db.get(Verkaufschance, verkaufschance_id, options=response_load_options(Verkaufschance, VerkaufschanceResponse))
     if not verkaufschance:
         raise HTTPException(status_code=404, detail="Verkaufschance nicht gefunden")
     return verkaufschance
@@ -515,47 +521,47 @@ async def get_verkaufschance(
 async def update_verkaufschance(
     verkaufschance_id: int = Path(..., title="Verkaufschance ID"),
     verkaufschance_update: VerkaufschanceUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Verkaufschance"""
     if not check_permission(current_user, "crm", "verkaufschance", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    verkaufschance = db.query(Verkaufschance).filter(Verkaufschance.id == verkaufschance_id).first()
+    verkaufschance = await db.get(Verkaufschance, verkaufschance_id)
     if not verkaufschance:
         raise HTTPException(status_code=404, detail="Verkaufschance nicht gefunden")
     
     for field, value in verkaufschance_update.dict(exclude_unset=True).items():
         setattr(verkaufschance, field, value)
     
-    db.commit()
-    db.refresh(verkaufschance)
+    await db.commit()
+    verkaufschance = await reload_for_response(db, verkaufschance, VerkaufschanceResponse)
     return verkaufschance
 
 @router.delete("/verkaufschance/{verkaufschance_id}", status_code=204)
 async def delete_verkaufschance(
     verkaufschance_id: int = Path(..., title="Verkaufschance ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Verkaufschance"""
     if not check_permission(current_user, "crm", "verkaufschance", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    verkaufschance = db.query(Verkaufschance).filter(Verkaufschance.id == verkaufschance_id).first()
+    verkaufschance = await db.get(Verkaufschance, verkaufschance_id)
     if not verkaufschance:
         raise HTTPException(status_code=404, detail="Verkaufschance nicht gefunden")
     
-    db.delete(verkaufschance)
-    db.commit()
+    await db.delete(verkaufschance)
+    await db.commit()
 
 # ==================== Marketing Kampagne Endpoints ====================
 
 @router.post("/marketing-kampagne/", response_model=MarketingKampagneResponse)
 async def create_marketing_kampagne(
     kampagne: MarketingKampagneCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neue Marketing Kampagne"""
@@ -565,11 +571,11 @@ async def create_marketing_kampagne(
     try:
         db_kampagne = MarketingKampagne(**kampagne.dict())
         db.add(db_kampagne)
-        db.commit()
-        db.refresh(db_kampagne)
+        await db.commit()
+        db_kampagne = await reload_for_response(db, db_kampagne, MarketingKampagneResponse)
         return db_kampagne
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Kampagne konnte nicht erstellt werden")
 
 @router.get("/marketing-kampagne/", response_model=List[MarketingKampagneResponse])
@@ -580,36 +586,37 @@ async def get_marketing_kampagne_list(
     status: Optional[str] = None,
     von_datum: Optional[date] = None,
     bis_datum: Optional[date] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Marketing Kampagnen mit Filterung"""
     if not check_permission(current_user, "crm", "marketing_kampagne", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(MarketingKampagne)
+    query = select(MarketingKampagne).options(*response_load_options(MarketingKampagne, MarketingKampagneResponse))
     if kampagnentyp:
-        query = query.filter(MarketingKampagne.kampagnentyp == kampagnentyp)
+        query = query.where(MarketingKampagne.kampagnentyp == kampagnentyp)
     if status:
-        query = query.filter(MarketingKampagne.status == status)
+        query = query.where(MarketingKampagne.status == status)
     if von_datum:
-        query = query.filter(MarketingKampagne.startdatum >= von_datum)
+        query = query.where(MarketingKampagne.startdatum >= von_datum)
     if bis_datum:
-        query = query.filter(MarketingKampagne.enddatum <= bis_datum)
+        query = query.where(MarketingKampagne.enddatum <= bis_datum)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/marketing-kampagne/{kampagne_id}", response_model=MarketingKampagneResponse)
 async def get_marketing_kampagne(
     kampagne_id: int = Path(..., title="Kampagne ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifische Marketing Kampagne"""
     if not check_permission(current_user, "crm", "marketing_kampagne", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    kampagne = db.query(MarketingKampagne).filter(MarketingKampagne.id == kampagne_id).first()
+    kampagne = await db.get(MarketingKampagne, kampagne_id, options=response_load_options(MarketingKampagne, MarketingKampagneResponse))
     if not kampagne:
         raise HTTPException(status_code=404, detail="Kampagne nicht gefunden")
     return kampagne
@@ -618,47 +625,47 @@ async def get_marketing_kampagne(
 async def update_marketing_kampagne(
     kampagne_id: int = Path(..., title="Kampagne ID"),
     kampagne_update: MarketingKampagneUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Marketing Kampagne"""
     if not check_permission(current_user, "crm", "marketing_kampagne", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    kampagne = db.query(MarketingKampagne).filter(MarketingKampagne.id == kampagne_id).first()
+    kampagne = await db.get(MarketingKampagne, kampagne_id)
     if not kampagne:
         raise HTTPException(status_code=404, detail="Kampagne nicht gefunden")
     
     for field, value in kampagne_update.dict(exclude_unset=True).items():
         setattr(kampagne, field, value)
     
-    db.commit()
-    db.refresh(kampagne)
+    await db.commit()
+    kampagne = await reload_for_response(db, kampagne, MarketingKampagneResponse)
     return kampagne
 
 @router.delete("/marketing-kampagne/{kampagne_id}", status_code=204)
 async def delete_marketing_kampagne(
     kampagne_id: int = Path(..., title="Kampagne ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Marketing Kampagne"""
     if not check_permission(current_user, "crm", "marketing_kampagne", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    kampagne = db.query(MarketingKampagne).filter(MarketingKampagne.id == kampagne_id).first()
+    kampagne = await db.get(MarketingKampagne, kampagne_id)
     if not kampagne:
         raise HTTPException(status_code=404, detail="Kampagne nicht gefunden")
     
-    db.delete(kampagne)
-    db.commit()
+    await db.delete(kampagne)
+    await db.commit()
 
 # ==================== Kundenservice Endpoints ====================
 
 @router.post("/kundenservice/", response_model=KundenserviceResponse)
 async def create_kundenservice(
     kundenservice: KundenserviceCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neuen Kundenservice Fall"""
@@ -668,11 +675,11 @@ async def create_kundenservice(
     try:
         db_kundenservice = Kundenservice(**kundenservice.dict())
         db.add(db_kundenservice)
-        db.commit()
-        db.refresh(db_kundenservice)
+        await db.commit()
+        db_kundenservice = await reload_for_response(db, db_kundenservice, KundenserviceResponse)
         return db_kundenservice
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Kundenservice Fall konnte nicht erstellt werden")
 
 @router.get("/kundenservice/", response_model=List[KundenserviceResponse])
@@ -683,36 +690,37 @@ async def get_kundenservice_list(
     tickettyp: Optional[str] = None,
     priorität: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Kundenservice Fälle mit Filterung"""
     if not check_permission(current_user, "crm", "kundenservice", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Kundenservice)
+    query = select(Kundenservice).options(*response_load_options(Kundenservice, KundenserviceResponse))
     if kunde_id:
-        query = query.filter(Kundenservice.kunde_id == kunde_id)
+        query = query.where(Kundenservice.kunde_id == kunde_id)
     if tickettyp:
-        query = query.filter(Kundenservice.tickettyp == tickettyp)
+        query = query.where(Kundenservice.tickettyp == tickettyp)
     if priorität:
-        query = query.filter(Kundenservice.priorität == priorität)
+        query = query.where(Kundenservice.priorität == priorität)
     if status:
-        query = query.filter(Kundenservice.status == status)
+        query = query.where(Kundenservice.status == status)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/kundenservice/{ticket_id}", response_model=KundenserviceResponse)
 async def get_kundenservice(
     ticket_id: int = Path(..., title="Ticket ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifischen Kundenservice Fall"""
     if not check_permission(current_user, "crm", "kundenservice", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    kundenservice = db.query(Kundenservice).filter(Kundenservice.id == ticket_id).first()
+    kundenservice = await db.get(Kundenservice, ticket_id, options=response_load_options(Kundenservice, KundenserviceResponse))
     if not kundenservice:
         raise HTTPException(status_code=404, detail="Kundenservice Fall nicht gefunden")
     return kundenservice
@@ -721,40 +729,40 @@ async def get_kundenservice(
 async def update_kundenservice(
     ticket_id: int = Path(..., title="Ticket ID"),
     kundenservice_update: KundenserviceUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Kundenservice Fall"""
     if not check_permission(current_user, "crm", "kundenservice", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    kundenservice = db.query(Kundenservice).filter(Kundenservice.id == ticket_id).first()
+    kundenservice = await db.get(Kundenservice, ticket_id)
     if not kundenservice:
         raise HTTPException(status_code=404, detail="Kundenservice Fall nicht gefunden")
     
     for field, value in kundenservice_update.dict(exclude_unset=True).items():
         setattr(kundenservice, field, value)
     
-    db.commit()
-    db.refresh(kundenservice)
+    await db.commit()
+    kundenservice = await reload_for_response(db, kundenservice, KundenserviceResponse)
     return kundenservice
 
 @router.delete("/kundenservice/{ticket_id}", status_code=204)
 async def delete_kundenservice(
     ticket_id: int = Path(..., title="Ticket ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Kundenservice Fall"""
     if not check_permission(current_user, "crm", "kundenservice", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    kundenservice = db.query(Kundenservice).filter(Kundenservice.id == ticket_id).first()
+    kundenservice = await db.get(Kundenservice, ticket_id)
     if not kundenservice:
         raise HTTPException(status_code=404, detail="Kundenservice Fall nicht gefunden")
     
-    db.delete(kundenservice)
-    db.commit()
+    await db.delete(kundenservice)
+    await db.commit()
 
 # ==================== Weitere CRM Endpoints ====================
 
@@ -5,12 +5,13 @@ Implementiert alle CRUD-Operationen für 35+ Finanzbuchhaltung-Formulare
 
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Body, Query, Path
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, date
 import logging
 
-from backend.app.dependencies import get_db
+from backend.app.db.async_session import get_async_db, reload_for_response, response_load_options
 from backend.app.models.finanzbuchhaltung import (
     Konto, Kontengruppe, Buchung, Buchungsvorlage, Rechnung, RechnungPosition,
     Zahlung, Zahlungsplan, Kostenstelle, KostenstellenBuchung, Budget,
@@ -47,7 +48,7 @@ router = APIRouter(prefix="/finanzbuchhaltung", tags=["Finanzbuchhaltung"])
 @router.post("/konto/", response_model=KontoResponse)
 async def create_konto(
     konto: KontoCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neues Konto"""
@@ -57,11 +58,11 @@ async def create_konto(
     try:
         db_konto = Konto(**konto.dict())
         db.add(db_konto)
-        db.commit()
-        db.refresh(db_konto)
+        await db.commit()
+        db_konto = await reload_for_response(db, db_konto, KontoResponse)
         return db_konto
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Konto bereits vorhanden")
 
 @router.get("/konto/", response_model=List[KontoResponse])
@@ -71,34 +72,35 @@ async def get_konto_list(
     kontengruppe_id: Optional[int] = None,
     kontoart: Optional[str] = None,
     ist_aktiv: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Konten mit Filterung"""
     if not check_permission(current_user, "finanzbuchhaltung", "konto", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Konto)
+    query = select(Konto).options(*response_load_options(Konto, KontoResponse))
     if kontengruppe_id:
-        query = query.filter(Konto.kontengruppe_id == kontengruppe_id)
+        query = query.where(Konto.kontengruppe_id == kontengruppe_id)
     if kontoart:
-        query = query.filter(Konto.kontoart == kontoart)
+        query = query.where(Konto.kontoart == kontoart)
     if ist_aktiv is not None:
-        query = query.filter(Konto.ist_aktiv == ist_aktiv)
+        query = query.where(Konto.ist_aktiv == ist_aktiv)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/konto/{konto_id}", response_model=KontoResponse)
 async def get_konto(
     konto_id: int = Path(..., title="Konto ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifisches Konto"""
     if not check_permission(current_user, "finanzbuchhaltung", "konto", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    konto = db.query(Konto).filter(Konto.id == konto_id).first()
+    konto = await db.get(Konto, konto_id, options=response_load_options(Konto, KontoResponse))
     if not konto:
         raise HTTPException(status_code=404, detail="Konto nicht gefunden")
     return konto
@@ -107,47 +109,47 @@ async def get_konto(
 async def update_konto(
     konto_id: int = Path(..., title="Konto ID"),
     konto_update: KontoUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Konto"""
     if not check_permission(current_user, "finanzbuchhaltung", "konto", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    konto = db.query(Konto).filter(Konto.id == konto_id).first()
+    konto = await db.get(Konto, konto_id)
     if not konto:
         raise HTTPException(status_code=404, detail="Konto nicht gefunden")
     
     for field, value in konto_update.dict(exclude_unset=True).items():
         setattr(konto, field, value)
     
-    db.commit()
-    db.refresh(konto)
+    await db.commit()
+    konto = await reload_for_response(db, konto, KontoResponse)
     return konto
 
 @router.delete("/konto/{konto_id}", status_code=204)
 async def delete_konto(
     konto_id: int = Path(..., title="Konto ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Konto"""
     if not check_permission(current_user, "finanzbuchhaltung", "konto", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    konto = db.query(Konto).filter(Konto.id == konto_id).first()
+    konto = await db.get(Konto, konto_id)
     if not konto:
         raise HTTPException(status_code=404, detail="Konto nicht gefunden")
     
-    db.delete(konto)
-    db.commit()
+    await db.delete(konto)
+    await db.commit()
 
 # ==================== Buchung Endpoints ====================
 
 @router.post("/buchung/", response_model=BuchungResponse)
 async def create_buchung(
     buchung: BuchungCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neue Buchung"""
@@ -157,11 +159,11 @@ async def create_buchung(
     try:
         db_buchung = Buchung(**buchung.dict())
         db.add(db_buchung)
-        db.commit()
-        db.refresh(db_buchung)
+        await db.commit()
+        db_buchung = await reload_for_response(db, db_buchung, BuchungResponse)
         return db_buchung
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Buchung konnte nicht erstellt werden")
 
 @router.get("/buchung/", response_model=List[BuchungResponse])
@@ -172,36 +174,37 @@ async def get_buchung_list(
     von_datum: Optional[date] = None,
     bis_datum: Optional[date] = None,
     buchungstyp: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Buchungen mit Filterung"""
     if not check_permission(current_user, "finanzbuchhaltung", "buchung", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Buchung)
+    query = select(Buchung).options(*response_load_options(Buchung, BuchungResponse))
     if konto_id:
-        query = query.filter(Buchung.konto_id == konto_id)
+        query = query.where(Buchung.konto_id == konto_id)
     if von_datum:
-        query = query.filter(Buchung.buchungsdatum >= von_datum)
+        query = query.where(Buchung.buchungsdatum >= von_datum)
     if bis_datum:
-        query = query.filter(Buchung.buchungsdatum <= bis_datum)
+        query = query.where(Buchung.buchungsdatum <= bis_datum)
     if buchungstyp:
-        query = query.filter(Buchung.buchungstyp == buchungstyp)
+        query = query.where(Buchung.buchungstyp == buchungstyp)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/buchung/{buchung_id}", response_model=BuchungResponse)
 async def get_buchung(
     buchung_id: int = Path(..., title="Buchung ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifische Buchung"""
     if not check_permission(current_user, "finanzbuchhaltung", "buchung", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    buchung = db.query(Buchung).filter(Buchung.id == buchung_id).first()
+    buchung = await db.get(Buchung, buchung_id, options=response_load_options(Buchung, BuchungResponse))
     if not buchung:
         raise HTTPException(status_code=404, detail="Buchung nicht gefunden")
     return buchung
@@ -210,47 +213,47 @@ async def get_buchung(
 async def update_buchung(
     buchung_id: int = Path(..., title="Buchung ID"),
     buchung_update: BuchungUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Buchung"""
     if not check_permission(current_user, "finanzbuchhaltung", "buchung", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    buchung = db.query(Buchung).filter(Buchung.id == buchung_id).first()
+    buchung = await db.get(Buchung, buchung_id)
     if not buchung:
         raise HTTPException(status_code=404, detail="Buchung nicht gefunden")
     
     for field, value in buchung_update.dict(exclude_unset=True).items():
         setattr(buchung, field, value)
     
-    db.commit()
-    db.refresh(buchung)
+    await db.commit()
+    buchung = await reload_for_response(db, buchung, BuchungResponse)
     return buchung
 
 @router.delete("/buchung/{buchung_id}", status_code=204)
 async def delete_buchung(
     buchung_id: int = Path(..., title="Buchung ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Buchung"""
     if not check_permission(current_user, "finanzbuchhaltung", "buchung", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    buchung = db.query(Buchung).filter(Buchung.id == buchung_id).first()
+    buchung = await db.get(Buchung, buchung_id)
     if not buchung:
         raise HTTPException(status_code=404, detail="Buchung nicht gefunden")
     
-    db.delete(buchung)
-    db.commit()
+    await db.delete(buchung)
+    await db.commit()
 
 # ==================== Rechnung Endpoints ====================
 
 @router.post("/rechnung/", response_model=RechnungResponse)
 async def create_rechnung(
     rechnung: RechnungCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neue Rechnung"""
@@ -260,11 +263,11 @@ async def create_rechnung(
     try:
         db_rechnung = Rechnung(**rechnung.dict())
         db.add(db_rechnung)
-        db.commit()
-        db.refresh(db_rechnung)
+        await db.commit()
+        db_rechnung = await reload_for_response(db, db_rechnung, RechnungResponse)
         return db_rechnung
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Rechnung konnte nicht erstellt werden")
 
 @router.get("/rechnung/", response_model=List[RechnungResponse])
@@ -275,36 +278,37 @@ async def get_rechnung_list(
     von_datum: Optional[date] = None,
     bis_datum: Optional[date] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Rechnungen mit Filterung"""
     if not check_permission(current_user, "finanzbuchhaltung", "rechnung", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Rechnung)
+    query = select(Rechnung).options(*response_load_options(Rechnung, RechnungResponse))
     if rechnungstyp:
-        query = query.filter(Rechnung.rechnungstyp == rechnungstyp)
+        query = query.where(Rechnung.rechnungstyp == rechnungstyp)
     if von_datum:
-        query = query.filter(Rechnung.rechnungsdatum >= von_datum)
+        query = query.where(Rechnung.rechnungsdatum >= von_datum)
     if bis_datum:
-        query = query.filter(Rechnung.rechnungsdatum <= bis_datum)
+        query = query.where(Rechnung.rechnungsdatum <= bis_datum)
     if status:
-        query = query.filter(Rechnung.status == status)
+        query = query.where(Rechnung.status == status)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/rechnung/{rechnung_id}", response_model=RechnungResponse)
 async def get_rechnung(
     rechnung_id: int = Path(..., title="Rechnung ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifische Rechnung"""
     if not check_permission(current_user, "finanzbuchhaltung", "rechnung", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    rechnung = db.query(Rechnung).filter(Rechnung.id == rechnung_id).first()
+    rechnung = await db.get(Rechnung, rechnung_id, options=response_load_options(Rechnung, RechnungResponse))
     if not rechnung:
         raise HTTPException(status_code=404, detail="Rechnung nicht gefunden")
     return rechnung
@@ -313,47 +317,47 @@ async def get_rechnung(
 async def update_rechnung(
     rechnung_id: int = Path(..., title="Rechnung ID"),
     rechnung_update: RechnungUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Rechnung"""
     if not check_permission(current_user, "finanzbuchhaltung", "rechnung", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    rechnung = db.query(Rechnung).filter(Rechnung.id == rechnung_id).first()
+    rechnung = await db.get(Rechnung, rechnung_id)
     if not rechnung:
         raise HTTPException(status_code=404, detail="Rechnung nicht gefunden")
     
     for field, value in rechnung_update.dict(exclude_unset=True).items():
         setattr(rechnung, field, value)
     
-    db.commit()
-    db.refresh(rechnung)
+    await db.commit()
+    rechnung = await reload_for_response(db, rechnung, RechnungResponse)
     return rechnung
 
 @router.delete("/rechnung/{rechnung_id}", status_code=204)
 async def delete_rechnung(
     rechnung_id: int = Path(..., title="Rechnung ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Rechnung"""
     if not check_permission(current_user, "finanzbuchhaltung", "rechnung", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    rechnung = db.query(Rechnung).filter(Rechnung.id == rechnung_id).first()
+    rechnung = await db.get(Rechnung, rechnung_id)
     if not rechnung:
         raise HTTPException(status_code=404, detail="Rechnung nicht gefunden")
     
-    db.delete(rechnung)
-    db.commit()
+    await db.delete(rechnung)
+    await db.commit()
 
 # ==================== Zahlung Endpoints ====================
 
 @router.post("/zahlung/", response_model=ZahlungResponse)
 async def create_zahlung(
     zahlung: ZahlungCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neue Zahlung"""
@@ -363,11 +367,11 @@ async def create_zahlung(
     try:
         db_zahlung = Zahlung(**zahlung.dict())
         db.add(db_zahlung)
-        db.commit()
-        db.refresh(db_zahlung)
+        await db.commit()
+        db_zahlung = await reload_for_response(db, db_zahlung, ZahlungResponse)
         return db_zahlung
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Zahlung konnte nicht erstellt werden")
 
 @router.get("/zahlung/", response_model=List[ZahlungResponse])
@@ -378,36 +382,37 @@ async def get_zahlung_list(
     von_datum: Optional[date] = None,
     bis_datum: Optional[date] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Zahlungen mit Filterung"""
     if not check_permission(current_user, "finanzbuchhaltung", "zahlung", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Zahlung)
+    query = select(Zahlung).options(*response_load_options(Zahlung, ZahlungResponse))
     if zahlungstyp:
-        query = query.filter(Zahlung.zahlungstyp == zahlungstyp)
+        query = query.where(Zahlung.zahlungstyp == zahlungstyp)
     if von_datum:
-        query = query.filter(Zahlung.zahlungsdatum >= von_datum)
+        query = query.where(Zahlung.zahlungsdatum >= von_datum)
     if bis_datum:
-        query = query.filter(Zahlung.zahlungsdatum <= bis_datum)
+        query = query.where(Zahlung.zahlungsdatum <= bis_datum)
     if status:
-        query = query.filter(Zahlung.status == status)
+        query = query.where(Zahlung.status == status)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/zahlung/{zahlung_id}", response_model=ZahlungResponse)
 async def get_zahlung(
     zahlung_id: int = Path(..., title="Zahlung ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifische Zahlung"""
     if not check_permission(current_user, "finanzbuchhaltung", "zahlung", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    zahlung = db.query(Zahlung).filter(Zahlung.id == zahlung_id).first()
+    zahlung = await db.get(Zahlung, zahlung_id, options=response_load_options(Zahlung, ZahlungResponse))
     if not zahlung:
         raise HTTPException(status_code=404, detail="Zahlung nicht gefunden")
     return zahlung
@@ -416,47 +421,47 @@ async def get_zahlung(
 async def update_zahlung(
     zahlung_id: int = Path(..., title="Zahlung ID"),
     zahlung_update: ZahlungUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Zahlung"""
     if not check_permission(current_user, "finanzbuchhaltung", "zahlung", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    zahlung = db.query(Zahlung).filter(Zahlung.id == zahlung_id).first()
+    zahlung = await db.get(Zahlung, zahlung_id)
     if not zahlung:
         raise HTTPException(status_code=404, detail="Zahlung nicht gefunden")
     
     for field, value in zahlung_update.dict(exclude_unset=True).items():
         setattr(zahlung, field, value)
     
-    db.commit()
-    db.refresh(zahlung)
+    await db.commit()
+    zahlung = await reload_for_response(db, zahlung, ZahlungResponse)
     return zahlung
 
 @router.delete("/zahlung/{zahlung_id}", status_code=204)
 async def delete_zahlung(
     zahlung_id: int = Path(..., title="Zahlung ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Zahlung"""
     if not check_permission(current_user, "finanzbuchhaltung", "zahlung", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    zahlung = db.query(Zahlung).filter(Zahlung.id == zahlung_id).first()
+    zahlung = await db.get(Zahlung, zahlung_id)
     if not zahlung:
         raise HTTPException(status_code=404, detail="Zahlung nicht gefunden")
     
-    db.delete(zahlung)
-    db.commit()
+    await db.delete(zahlung)
+    await db.commit()
 
 # ==================== Kostenstelle Endpoints ====================
 
 @router.post("/kostenstelle/", response_model=KostenstelleResponse)
 async def create_kostenstelle(
     kostenstelle: KostenstelleCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neue Kostenstelle"""
@@ -466,11 +471,11 @@ async def create_kostenstelle(
     try:
         db_kostenstelle = Kostenstelle(**kostenstelle.dict())
         db.add(db_kostenstelle)
-        db.commit()
-        db.refresh(db_kostenstelle)
+        await db.commit()
+        db_kostenstelle = await reload_for_response(db, db_kostenstelle, KostenstelleResponse)
         return db_kostenstelle
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Kostenstelle bereits vorhanden")
 
 @router.get("/kostenstelle/", response_model=List[KostenstelleResponse])
@@ -479,32 +484,33 @@ async def get_kostenstelle_list(
     limit: int = 100,
     kostenstellenart: Optional[str] = None,
     ist_aktiv: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Kostenstellen mit Filterung"""
     if not check_permission(current_user, "finanzbuchhaltung", "kostenstelle", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Kostenstelle)
+    query = select(Kostenstelle).options(*response_load_options(Kostenstelle, KostenstelleResponse))
     if kostenstellenart:
-        query = query.filter(Kostenstelle.kostenstellenart == kostenstellenart)
+        query = query.where(Kostenstelle.kostenstellenart == kostenstellenart)
     if ist_aktiv is not None:
-        query = query.filter(Kostenstelle.ist_aktiv == ist_aktiv)
+        query = query.where(Kostenstelle.ist_aktiv == ist_aktiv)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/kostenstelle/{kostenstelle_id}", response_model=KostenstelleResponse)
 async def get_kostenstelle(
     kostenstelle_id: int = Path(..., title="Kostenstelle ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifische Kostenstelle"""
     if not check_permission(current_user, "finanzbuchhaltung", "kostenstelle", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    kostenstelle = db.query(Kostenstelle).filter(Kostenstelle.id == kostenstelle_id).first()
+    kostenstelle = await db.get(Kostenstelle, kostenstelle_id, options=response_load_options(Kostenstelle, KostenstelleResponse))
     if not kostenstelle:
         raise HTTPException(status_code=404, detail="Kostenstelle nicht gefunden")
     return kostenstelle
@@ -513,47 +519,47 @@ async def get_kostenstelle(
 async def update_kostenstelle(
     kostenstelle_id: int = Path(..., title="Kostenstelle ID"),
     kostenstelle_update: KostenstelleUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Kostenstelle"""
     if not check_permission(current_user, "finanzbuchhaltung", "kostenstelle", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    kostenstelle = db.query(Kostenstelle).filter(Kostenstelle.id == kostenstelle_id).first()
+    kostenstelle = await db.get(Kostenstelle, kostenstelle_id)
     if not kostenstelle:
         raise HTTPException(status_code=404, detail="Kostenstelle nicht gefunden")
     
     for field, value in kostenstelle_update.dict(exclude_unset=True).items():
         setattr(kostenstelle, field, value)
     
-    db.commit()
-    db.refresh(kostenstelle)
+    await db.commit()
+    kostenstelle = await reload_for_response(db, kostenstelle, KostenstelleResponse)
     return kostenstelle
 
 @router.delete("/kostenstelle/{kostenstelle_id}", status_code=204)
 async def delete_kostenstelle(
     kostenstelle_id: int = Path(..., title="Kostenstelle ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Kostenstelle"""
     if not check_permission(current_user, "finanzbuchhaltung", "kostenstelle", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    kostenstelle = db.query(Kostenstelle).filter(Kostenstelle.id == kostenstelle_id).first()
+    kostenstelle = await db.get(Kostenstelle, kostenstelle_id)
     if not kostenstelle:
         raise HTTPException(status_code=404, detail="Kostenstelle nicht gefunden")
     
-    db.delete(kostenstelle)
-    db.commit()
+    await db.delete(kostenstelle)
+    await db.commit()
 
 # ==================== Budget Endpoints ====================
 
 @router.post("/budget/", response_model=BudgetResponse)
 async def create_budget(
     budget: BudgetCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neues Budget"""
@@ -563,11 +569,11 @@ async def create_budget(
     try:
         db_budget = Budget(**budget.dict())
         db.add(db_budget)
-        db.commit()
-        db.refresh(db_budget)
+        await db.commit()
+        db_budget = await reload_for_response(db, db_budget, BudgetResponse)
         return db_budget
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Budget bereits vorhanden")
 
 @router.get("/budget/", response_model=List[BudgetResponse])
@@ -576,32 +582,33 @@ async def get_budget_list(
     limit: int = 100,
     budgetjahr: Optional[int] = None,
     kostenstelle_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Budgets mit Filterung"""
     if not check_permission(current_user, "finanzbuchhaltung", "budget", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Budget)
+    query = select(Budget).options(*response_load_options(Budget, BudgetResponse))
     if budgetjahr:
-        query = query.filter(Budget.budgetjahr == budgetjahr)
+        query = query.where(Budget.budgetjahr == budgetjahr)
     if kostenstelle_id:
-        query = query.filter(Budget.kostenstelle_id == kostenstelle_id)
+        query = query.where(Budget.kostenstelle_id == kostenstelle_id)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/budget/{budget_id}", response_model=BudgetResponse)
 async def get_budget(
     budget_id: int = Path(..., title="Budget ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifisches Budget"""
     if not check_permission(current_user, "finanzbuchhaltung", "budget", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    budget = db.query(Budget).filter(Budget.id == budget_id).first()
+    budget = await db.get(Budget, budget_id, options=response_load_options(Budget, BudgetResponse))
     if not budget:
         raise HTTPException(status_code=404, detail="Budget nicht gefunden")
     return budget
@@ -610,40 +617,40 @@ async def get_budget(
 async def update_budget(
     budget_id: int = Path(..., title="Budget ID"),
     budget_update: BudgetUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Budget"""
     if not check_permission(current_user, "finanzbuchhaltung", "budget", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    budget = db.query(Budget).filter(Budget.id == budget_id).first()
+    budget = await db.get(Budget, budget_id)
     if not budget:
         raise HTTPException(status_code=404, detail="Budget nicht gefunden")
     
     for field, value in budget_update.dict(exclude_unset=True).items():
         setattr(budget, field, value)
     
-    db.commit()
-    db.refresh(budget)
+    await db.commit()
+    budget = await reload_for_response(db, budget, BudgetResponse)
     return budget
 
 @router.delete("/budget/{budget_id}", status_code=204)
 async def delete_budget(
     budget_id: int = Path(..., title="Budget ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Budget"""
     if not check_permission(current_user, "finanzbuchhaltung", "budget", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    budget = db.query(Budget).filter(Budget.id == budget_id).first()
+    budget = await db.get(Budget, budget_id)
     if not budget:
         raise HTTPException(status_code=404, detail="Budget nicht gefunden")
     
-    db.delete(budget)
-    db.commit()
+    await db.delete(budget)
+    await db.commit()
 
 # ==================== Weitere FiBu Endpoints ====================
 
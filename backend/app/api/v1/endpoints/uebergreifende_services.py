@@ -5,12 +5,13 @@ Implementiert alle CRUD-Operationen für 45+ Übergreifende Services-Formulare
 
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Body, Query, Path
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, date
 import logging
 
-from backend.app.dependencies import get_db
+from backend.app.db.async_session import get_async_db, reload_for_response, response_load_options
 from backend.app.models.uebergreifende_services import (
     Benutzer, Rolle, BenutzerRolle, Permission, RollenPermission, BenutzerAktivitaet, BenutzerSession,
     SystemEinstellung, ModulEinstellung,
@@ -62,7 +63,7 @@ router = APIRouter(prefix="/uebergreifende-services", tags=["Übergreifende Serv
 @router.post("/benutzer/", response_model=BenutzerResponse)
 async def create_benutzer(
     benutzer: BenutzerCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neuen Benutzer"""
@@ -72,11 +73,11 @@ async def create_benutzer(
     try:
         db_benutzer = Benutzer(**benutzer.dict())
         db.add(db_benutzer)
-        db.commit()
-        db.refresh(db_benutzer)
+        await db.commit()
+        db_benutzer = await reload_for_response(db, db_benutzer, BenutzerResponse)
         return db_benutzer
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Benutzer bereits vorhanden")
 
 @router.get("/benutzer/", response_model=List[BenutzerResponse])
@@ -86,34 +87,35 @@ async def get_benutzer_list(
     status: Optional[str] = None,
     abteilung: Optional[str] = None,
     ist_aktiv: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Benutzer mit Filterung"""
     if not check_permission(current_user, "uebergreifende_services", "benutzer", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Benutzer)
+    query = select(Benutzer).options(*response_load_options(Benutzer, BenutzerResponse))
     if status:
-        query = query.filter(Benutzer.status == status)
+        query = query.where(Benutzer.status == status)
     if abteilung:
-        query = query.filter(Benutzer.abteilung == abteilung)
+        query = query.where(Benutzer.abteilung == abteilung)
     if ist_aktiv is not None:
-        query = query.filter(Benutzer.ist_aktiv == ist_aktiv)
+        query = query.where(Benutzer.ist_aktiv == ist_aktiv)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/benutzer/{benutzer_id}", response_model=BenutzerResponse)
 async def get_benutzer(
     benutzer_id: int = Path(..., title="Benutzer ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifischen Benutzer"""
     if not check_permission(current_user, "uebergreifende_services", "benutzer", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    benutzer = db.query(Benutzer).filter(Benutzer.id == benutzer_id).first()
+    benutzer = await db.get(Benutzer, benutzer_id, options=response_load_options(Benutzer, BenutzerResponse))
     if not benutzer:
         raise HTTPException(status_code=404, detail="Benutzer nicht gefunden")
     return benutzer
@@ -122,47 +124,47 @@ async def get_benutzer(
 async def update_benutzer(
     benutzer_id: int = Path(..., title="Benutzer ID"),
     benutzer_update: BenutzerUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Benutzer"""
     if not check_permission(current_user, "uebergreifende_services", "benutzer", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    benutzer = db.query(Benutzer).filter(Benutzer.id == benutzer_id).first()
+    benutzer = await db.get(Benutzer, benutzer_id)
     if not benutzer:
         raise HTTPException(status_code=404, detail="Benutzer nicht gefunden")
     
     for field, value in benutzer_update.dict(exclude_unset=True).items():
         setattr(benutzer, field, value)
     
-    db.commit()
-    db.refresh(benutzer)
+    await db.commit()
+    benutzer = await reload_for_response(db, benutzer, BenutzerResponse)
     return benutzer
 
 @router.delete("/benutzer/{benutzer_id}", status_code=204)
 async def delete_benutzer(
     benutzer_id: int = Path(..., title="Benutzer ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Benutzer"""
     if not check_permission(current_user, "uebergreifende_services", "benutzer", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    benutzer = db.query(Benutzer).filter(Benutzer.id == benutzer_id).first()
+    benutzer = await db.get(Benutzer, benutzer_id)
     if not benutzer:
         raise HTTPException(status_code=404, detail="Benutzer nicht gefunden")
     
-    db.delete(benutzer)
-    db.commit()
+    await db.delete(benutzer)
+    await db.commit()
 
 # ==================== Rolle Endpoints ====================
 
 @router.post("/rolle/", response_model=RolleResponse)
 async def create_rolle(
     rolle: RolleCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neue Rolle"""
@@ -172,11 +174,11 @@ async def create_rolle(
     try:
         db_rolle = Rolle(**rolle.dict())
         db.add(db_rolle)
-        db.commit()
-        db.refresh(db_rolle)
+        await db.commit()
+        db_rolle = await reload_for_response(db, db_rolle, RolleResponse)
         return db_rolle
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Rolle bereits vorhanden")
 
 @router.get("/rolle/", response_model=List[RolleResponse])
@@ -185,32 +187,33 @@ async def get_rolle_list(
     limit: int = 100,
     rollentyp: Optional[str] = None,
     ist_aktiv: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Rollen mit Filterung"""
     if not check_permission(current_user, "uebergreifende_services", "rolle", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Rolle)
+    query = select(Rolle).options(*response_load_options(Rolle, RolleResponse))
     if rollentyp:
-        query = query.filter(Rolle.rollentyp == rollentyp)
+        query = query.where(Rolle.rollentyp == rollentyp)
     if ist_aktiv is not None:
-        query = query.filter(Rolle.ist_aktiv == ist_aktiv)
+        query = query.where(Rolle.ist_aktiv == ist_aktiv)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/rolle/{rolle_id}", response_model=RolleResponse)
 async def get_rolle(
     rolle_id: int = Path(..., title="Rolle ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifische Rolle"""
     if not check_permission(current_user, "uebergreifende_services", "rolle", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    rolle = db.query(Rolle).filter(Rolle.id == rolle_id).first()
+    rolle = await db.get(Rolle, rolle_id, options=response_load_options(Rolle, RolleResponse))
     if not rolle:
         raise HTTPException(status_code=404, detail="Rolle nicht gefunden")
     return rolle
@@ -219,47 +222,47 @@ async def get_rolle(
 async def update_rolle(
     rolle_id: int = Path(..., title="Rolle ID"),
     rolle_update: RolleUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Rolle"""
     if not check_permission(current_user, "uebergreifende_services", "rolle", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    rolle = db.query(Rolle).filter(Rolle.id == rolle_id).first()
+    rolle = await db.get(Rolle, rolle_id)
     if not rolle:
         raise HTTPException(status_code=404, detail="Rolle nicht gefunden")
     
     for field, value in rolle_update.dict(exclude_unset=True).items():
         setattr(rolle, field, value)
     
-    db.commit()
-    db.refresh(rolle)
+    await db.commit()
+    rolle = await reload_for_response(db, rolle, RolleResponse)
     return rolle
 
 @router.delete("/rolle/{rolle_id}", status_code=204)
 async def delete_rolle(
     rolle_id: int = Path(..., title="Rolle ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Rolle"""
     if not check_permission(current_user, "uebergreifende_services", "rolle", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    rolle = db.query(Rolle).filter(Rolle.id == rolle_id).first()
+    rolle = await db.get(Rolle, rolle_id)
     if not rolle:
         raise HTTPException(status_code=404, detail="Rolle nicht gefunden")
     
-    db.delete(rolle)
-    db.commit()
+    await db.delete(rolle)
+    await db.commit()
 
 # ==================== Permission Endpoints ====================
 
 @router.post("/permission/", response_model=PermissionResponse)
 async def create_permission(
     permission: PermissionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neue Permission"""
@@ -269,11 +272,11 @@ async def create_permission(
     try:
         db_permission = Permission(**permission.dict())
         db.add(db_permission)
-        db.commit()
-        db.refresh(db_permission)
+        await db.commit()
+        db_permission = await reload_for_response(db, db_permission, PermissionResponse)
         return db_permission
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Permission bereits vorhanden")
 
 @router.get("/permission/", response_model=List[PermissionResponse])
@@ -283,34 +286,35 @@ async def get_permission_list(
     modul: Optional[str] = None,
     aktion: Optional[str] = None,
     ist_aktiv: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Permissions mit Filterung"""
     if not check_permission(current_user, "uebergreifende_services", "permission", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Permission)
+    query = select(Permission).options(*response_load_options(Permission, PermissionResponse))
     if modul:
-        query = query.filter(Permission.modul == modul)
+        query = query.where(Permission.modul == modul)
     if aktion:
-        query = query.filter(Permission.aktion == aktion)
+        query = query.where(Permission.aktion == aktion)
     if ist_aktiv is not None:
-        query = query.filter(Permission.ist_aktiv == ist_aktiv)
+        query = query.where(Permission.ist_aktiv == ist_aktiv)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/permission/{permission_id}", response_model=PermissionResponse)
 async def get_permission(
     permission_id: int = Path(..., title="Permission ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifische Permission"""
     if not check_permission(current_user, "uebergreifende_services", "permission", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    permission = db.query(Permission).filter(Permission.id == permission_id).first()
+    permission = await db.get(Permission, permission_id, options=response_load_options(Permission, PermissionResponse))
     if not permission:
         raise HTTPException(status_code=404, detail="Permission nicht gefunden")
     return permission
@@ -319,47 +323,47 @@ async def get_permission(
 async def update_permission(
     permission_id: int = Path(..., title="Permission ID"),
     permission_update: PermissionUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Permission"""
     if not check_permission(current_user, "uebergreifende_services", "permission", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    permission = db.query(Permission).filter(Permission.id == permission_id).first()
+    permission = await db.get(Permission, permission_id)
     if not permission:
         raise HTTPException(status_code=404, detail="Permission nicht gefunden")
     
     for field, value in permission_update.dict(exclude_unset=True).items():
         setattr(permission, field, value)
     
-    db.commit()
-    db.refresh(permission)
+    await db.commit()
+    permission = await reload_for_response(db, permission, PermissionResponse)
     return permission
 
 @router.delete("/permission/{permission_id}", status_code=204)
 async def delete_permission(
     permission_id: int = Path(..., title="Permission ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Permission"""
     if not check_permission(current_user, "uebergreifende_services", "permission", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    permission = db.query(Permission).filter(Permission.id == permission_id).first()
+    permission = await db.get(Permission, permission_id)
     if not permission:
         raise HTTPException(status_code=404, detail="Permission nicht gefunden")
     
-    db.delete(permission)
-    db.commit()
+    await db.delete(permission)
+    await db.commit()
 
 # ==================== System Einstellung Endpoints ====================
 
 @router.post("/system-einstellung/", response_model=SystemEinstellungResponse)
 async def create_system_einstellung(
     einstellung: SystemEinstellungCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neue System Einstellung"""
@@ -369,11 +373,11 @@ async def create_system_einstellung(
     try:
         db_einstellung = SystemEinstellung(**einstellung.dict())
         db.add(db_einstellung)
-        db.commit()
-        db.refresh(db_einstellung)
+        await db.commit()
+        db_einstellung = await reload_for_response(db, db_einstellung, SystemEinstellungResponse)
         return db_einstellung
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="System Einstellung bereits vorhanden")
 
 @router.get("/system-einstellung/", response_model=List[SystemEinstellungResponse])
@@ -382,32 +386,33 @@ async def get_system_einstellung_list(
     limit: int = 100,
     kategorie: Optional[str] = None,
     ist_aktiv: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle System Einstellungen mit Filterung"""
     if not check_permission(current_user, "uebergreifende_services", "system_einstellung", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(SystemEinstellung)
+    query = select(SystemEinstellung).options(*response_load_options(SystemEinstellung, SystemEinstellungResponse))
     if kategorie:
-        query = query.filter(SystemEinstellung.kategorie == kategorie)
+        query = query.where(SystemEinstellung.kategorie == kategorie)
     if ist_aktiv is not None:
-        query = query.filter(SystemEinstellung.ist_aktiv == ist_aktiv)
+        query = query.where(SystemEinstellung.ist_aktiv == ist_aktiv)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/system-einstellung/{einstellung_id}", response_model=SystemEinstellungResponse)
 async def get_system_einstellung(
     einstellung_id: int = Path(..., title="Einstellung ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifische System Einstellung"""
     if not check_permission(current_user, "uebergreifende_services", "system_einstellung", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    einstellung = db.query(SystemEinstellung).filter(SystemEinstellung.id == einstellung_id).first()
+    einstellung = await db.get(SystemEinstellung, einstellung_id, options=response_load_options(SystemEinstellung, SystemEinstellungResponse))
     if not einstellung:
         raise HTTPException(status_code=404, detail="System Einstellung nicht gefunden")
     return einstellung
@@ -416,47 +421,47 @@ async def get_system_einstellung(
 async def update_system_einstellung(
     einstellung_id: int = Path(..., title="Einstellung ID"),
     einstellung_update: SystemEinstellungUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert System Einstellung"""
     if not check_permission(current_user, "uebergreifende_services", "system_einstellung", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    einstellung = db.query(SystemEinstellung).filter(SystemEinstellung.id == einstellung_id).first()
+    einstellung = await db.get(SystemEinstellung, einstellung_id)
     if not einstellung:
         raise HTTPException(status_code=404, detail="System Einstellung nicht gefunden")
     
     for field, value in einstellung_update.dict(exclude_unset=True).items():
         setattr(einstellung, field, value)
     
-    db.commit()
-    db.refresh(einstellung)
+    await db.commit()
+    einstellung = await reload_for_response(db, einstellung, SystemEinstellungResponse)
     return einstellung
 
 @router.delete("/system-einstellung/{einstellung_id}", status_code=204)
 async def delete_system_einstellung(
     einstellung_id: int = Path(..., title="Einstellung ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht System Einstellung"""
     if not check_permission(current_user, "uebergreifende_services", "system_einstellung", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    einstellung = db.query(SystemEinstellung).filter(SystemEinstellung.id == einstellung_id).first()
+    einstellung = await db.get(SystemEinstellung, einstellung_id)
     if not einstellung:
         raise HTTPException(status_code=404, detail="System Einstellung nicht gefunden")
     
-    db.delete(einstellung)
-    db.commit()
+    await db.delete(einstellung)
+    await db.commit()
 
 # ==================== Workflow Definition Endpoints ====================
 
 @router.post("/workflow-definition/", response_model=WorkflowDefinitionResponse)
 async def create_workflow_definition(
     workflow: WorkflowDefinitionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neue Workflow Definition"""
@@ -466,11 +471,11 @@ async def create_workflow_definition(
     try:
         db_workflow = WorkflowDefinition(**workflow.dict())
         db.add(db_workflow)
-        db.commit()
-        db.refresh(db_workflow)
+        await db.commit()
+        db_workflow = await reload_for_response(db, db_workflow, WorkflowDefinitionResponse)
         return db_workflow
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Workflow Definition konnte nicht erstellt werden")
 
 @router.get("/workflow-definition/", response_model=List[WorkflowDefinitionResponse])
@@ -480,34 +485,35 @@ async def get_workflow_definition_list(
     workflow_typ: Optional[str] = None,
     status: Optional[str] = None,
     ist_aktiv: Optional[bool] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Workflow Definitionen mit Filterung"""
     if not check_permission(current_user, "uebergreifende_services", "workflow_definition", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(WorkflowDefinition)
+    query = select(WorkflowDefinition).options(*response_load_options(WorkflowDefinition, WorkflowDefinitionResponse))
     if workflow_typ:
-        query = query.filter(WorkflowDefinition.workflow_typ == workflow_typ)
+        query = query.where(WorkflowDefinition.workflow_typ == workflow_typ)
     if status:
-        query = query.filter(WorkflowDefinition.status == status)
+        query = query.where(WorkflowDefinition.status == status)
     if ist_aktiv is not None:
-        query = query.filter(WorkflowDefinition.ist_aktiv == ist_aktiv)
+        query = query.where(WorkflowDefinition.ist_aktiv == ist_aktiv)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/workflow-definition/{workflow_id}", response_model=WorkflowDefinitionResponse)
 async def get_workflow_definition(
     workflow_id: int = Path(..., title="Workflow ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifische Workflow Definition"""
     if not check_permission(current_user, "uebergreifende_services", "workflow_definition", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    workflow = db.query(WorkflowDefinition).filter(WorkflowDefinition.id == workflow_id).first()
+    workflow = await db.get(WorkflowDefinition, workflow_id, options=response_load_options(WorkflowDefinition, WorkflowDefinitionResponse))
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow Definition nicht gefunden")
     return workflow
@@ -516,47 +522,47 @@ async def get_workflow_definition(
 async def update_workflow_definition(
     workflow_id: int = Path(..., title="Workflow ID"),
     workflow_update: WorkflowDefinitionUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Workflow Definition"""
     if not check_permission(current_user, "uebergreifende_services", "workflow_definition", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    workflow = db.query(WorkflowDefinition).filter(WorkflowDefinition.id == workflow_id).first()
+    workflow = await db.get(WorkflowDefinition, workflow_id)
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow Definition nicht gefunden")
     
     for field, value in workflow_update.dict(exclude_unset=True).items():
         setattr(workflow, field, value)
     
-    db.commit()
-    db.refresh(workflow)
+    await db.commit()
+    workflow = await reload_for_response(db, workflow, WorkflowDefinitionResponse)
     return workflow
 
 @router.delete("/workflow-definition/{workflow_id}", status_code=204)
 async def delete_workflow_definition(
     workflow_id: int = Path(..., title="Workflow ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Workflow Definition"""
     if not check_permission(current_user, "uebergreifende_services", "workflow_definition", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    workflow = db.query(WorkflowDefinition).filter(WorkflowDefinition.id == workflow_id).first()
+    workflow = await db.get(WorkflowDefinition, workflow_id)
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow Definition nicht gefunden")
     
-    db.delete(workflow)
-    db.commit()
+    await db.delete(workflow)
+    await db.commit()
 
 # ==================== Dokument Endpoints ====================
 
 @router.post("/dokument/", response_model=DokumentResponse)
 async def create_dokument(
     dokument: DokumentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neues Dokument"""
@@ -566,11 +572,11 @@ async def create_dokument(
     try:
         db_dokument = Dokument(**dokument.dict())
         db.add(db_dokument)
-        db.commit()
-        db.refresh(db_dokument)
+        await db.commit()
+        db_dokument = await reload_for_response(db, db_dokument, DokumentResponse)
         return db_dokument
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Dokument konnte nicht erstellt werden")
 
 @router.get("/dokument/", response_model=List[DokumentResponse])
@@ -582,38 +588,39 @@ async def get_dokument_list(
     ersteller_id: Optional[int] = None,
     von_datum: Optional[date] = None,
     bis_datum: Optional[date] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Dokumente mit Filterung"""
     if not check_permission(current_user, "uebergreifende_services", "dokument", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Dokument)
+    query = select(Dokument).options(*response_load_options(Dokument, DokumentResponse))
     if dokumenttyp:
-        query = query.filter(Dokument.dokumenttyp == dokumenttyp)
+        query = query.where(Dokument.dokumenttyp == dokumenttyp)
     if kategorie:
-        query = query.filter(Dokument.kategorie == kategorie)
+        query = query.where(Dokument.kategorie == kategorie)
     if ersteller_id:
-        query = query.filter(Dokument.ersteller_id == ersteller_id)
+        query = query.where(Dokument.ersteller_id == ersteller_id)
     if von_datum:
-        query = query.filter(Dokument.erstellungsdatum >= von_datum)
+        query = query.where(Dokument.erstellungsdatum >= von_datum)
     if bis_datum:
-        query = query.filter(Dokument.erstellungsdatum <= bis_datum)
+        query = query.where(Dokument.erstellungsdatum <= bis_datum)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/dokument/{dokument_id}", response_model=DokumentResponse)
 async def get_dokument(
     dokument_id: int = Path(..., title="Dokument ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifisches Dokument"""
     if not check_permission(current_user, "uebergreifende_services", "dokument", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    dokument = db.query(Dokument).filter(Dokument.id == dokument_id).first()
+    dokument = await db.get(Dokument, dokument_id, options=response_load_options(Dokument, DokumentResponse))
     if not dokument:
         raise HTTPException(status_code=404, detail="Dokument nicht gefunden")
     return dokument
@@ -622,47 +629,47 @@ async def get_dokument(
 async def update_dokument(
     dokument_id: int = Path(..., title="Dokument ID"),
     dokument_update: DokumentUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Dokument"""
     if not check_permission(current_user, "uebergreifende_services", "dokument", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    dokument = db.query(Dokument).filter(Dokument.id == dokument_id).first()
+    dokument = await db.get(Dokument, dokument_id)
     if not dokument:
         raise HTTPException(status_code=404, detail="Dokument nicht gefunden")
     
     for field, value in dokument_update.dict(exclude_unset=True).items():
         setattr(dokument, field, value)
     
-    db.commit()
-    db.refresh(dokument)
+    await db.commit()
+    dokument = await reload_for_response(db, dokument, DokumentResponse)
     return dokument
 
 @router.delete("/dokument/{dokument_id}", status_code=204)
 async def delete_dokument(
     dokument_id: int = Path(..., title="Dokument ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Dokument"""
     if not check_permission(current_user, "uebergreifende_services", "dokument", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    dokument = db.query(Dokument).filter(Dokument.id == dokument_id).first()
+    dokument = await db.get(Dokument, dokument_id)
     if not dokument:
         raise HTTPException(status_code=404, detail="Dokument nicht gefunden")
     
-    db.delete(dokument)
-    db.commit()
+    await db.delete(dokument)
+    await db.commit()
 
 # ==================== Monitoring Alert Endpoints ====================
 
 @router.post("/monitoring-alert/", response_model=MonitoringAlertResponse)
 async def create_monitoring_alert(
     alert: MonitoringAlertCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neuen Monitoring Alert"""
@@ -672,11 +679,11 @@ async def create_monitoring_alert(
     try:
         db_alert = MonitoringAlert(**alert.dict())
         db.add(db_alert)
-        db.commit()
-        db.refresh(db_alert)
+        await db.commit()
+        db_alert = await reload_for_response(db, db_alert, MonitoringAlertResponse)
         return db_alert
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Monitoring Alert konnte nicht erstellt werden")
 
 @router.get("/monitoring-alert/", response_model=List[MonitoringAlertResponse])
@@ -688,38 +695,39 @@ async def get_monitoring_alert_list(
     status: Optional[str] = None,
     von_datum: Optional[date] = None,
     bis_datum: Optional[date] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Monitoring Alerts mit Filterung"""
     if not check_permission(current_user, "uebergreifende_services", "monitoring_alert", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(MonitoringAlert)
+    query = select(MonitoringAlert).options(*response_load_options(MonitoringAlert, MonitoringAlertResponse))
     if alert_typ:
-        query = query.filter(MonitoringAlert.alert_typ == alert_typ)
+        query = query.where(MonitoringAlert.alert_typ == alert_typ)
     if schweregrad:
-        query = query.filter(MonitoringAlert.schweregrad == schweregrad)
+        query = query.where(MonitoringAlert.schweregrad == schweregrad)
     if status:
-        query = query.filter(MonitoringAlert.status == status)
+        query = query.where(MonitoringAlert.status == status)
     if von_datum:
-        query = query.filter(MonitoringAlert.erstellungsdatum >= von_datum)
+        query = query.where(MonitoringAlert.erstellungsdatum >= von_datum)
     if bis_datum:
-        query = query.filter(MonitoringAlert.erstellungsdatum <= bis_datum)
+        query = query.where(MonitoringAlert.erstellungsdatum <= bis_datum)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/monitoring-alert/{alert_id}", response_model=MonitoringAlertResponse)
 async def get_monitoring_alert(
     alert_id: int = Path(..., title="Alert ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifischen Monitoring Alert"""
     if not check_permission(current_user, "uebergreifende_services", "monitoring_alert", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    alert = db.query(MonitoringAlert).filter(MonitoringAlert.id == alert_id).first()
+    alert = await db.get(MonitoringAlert, alert_id, options=response_load_options(MonitoringAlert, MonitoringAlertResponse))
     if not alert:
         raise HTTPException(status_code=404, detail="Monitoring Alert nicht gefunden")
     return alert
@@ -728,40 +736,40 @@ async def get_monitoring_alert(
 async def update_monitoring_alert(
     alert_id: int = Path(..., title="Alert ID"),
     alert_update: MonitoringAlertUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Monitoring Alert"""
     if not check_permission(current_user, "uebergreifende_services", "monitoring_alert", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    alert = db.query(MonitoringAlert).filter(MonitoringAlert.id == alert_id).first()
+    alert = await db.get(MonitoringAlert, alert_id)
     if not alert:
         raise HTTPException(status_code=404, detail="Monitoring Alert nicht gefunden")
     
     for field, value in alert_update.dict(exclude_unset=True).items():
         setattr(alert, field, value)
     
-    db.commit()
-    db.refresh(alert)
+    await db.commit()
+    alert = await reload_for_response(db, alert, MonitoringAlertResponse)
     return alert
 
 @router.delete("/monitoring-alert/{alert_id}", status_code=204)
 async def delete_monitoring_alert(
     alert_id: int = Path(..., title="Alert ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Monitoring Alert"""
     if not check_permission(current_user, "uebergreifende_services", "monitoring_alert", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    alert = db.query(MonitoringAlert).filter(MonitoringAlert.id == alert_id).first()
+    alert = await db.get(MonitoringAlert, alert_id)
     if not alert:
         raise HTTPException(status_code=404, detail="Monitoring Alert nicht gefunden")
     
-    db.delete(alert)
-    db.commit()
+    await db.delete(alert)
+    await db.commit()
 
 # ==================== Weitere Übergreifende Services Endpoints ====================
 
@@ -5,12 +5,13 @@ Implementiert alle CRUD-Operationen für 40+ Warenwirtschaft-Formulare
 
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Body, Query, Path
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, date
 import logging
 
-from backend.app.dependencies import get_db
+from backend.app.db.async_session import get_async_db, reload_for_response, response_load_options
 from backend.app.models.warenwirtschaft import (
     ArtikelStammdaten, Lager, Lagerzone, Lagerplatz, Einlagerung, Auslagerung,
     Bestellung, BestellPosition, Lieferant, Qualitaetskontrolle, Versand,
@@ -42,7 +43,7 @@ router = APIRouter(prefix="/warenwirtschaft", tags=["Warenwirtschaft"])
 @router.post("/artikel-stammdaten/", response_model=ArtikelStammdatenResponse)
 async def create_artikel_stammdaten(
     artikel: ArtikelStammdatenCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neue Artikel-Stammdaten"""
@@ -52,11 +53,11 @@ async def create_artikel_stammdaten(
     try:
         db_artikel = ArtikelStammdaten(**artikel.dict())
         db.add(db_artikel)
-        db.commit()
-        db.refresh(db_artikel)
+        await db.commit()
+        db_artikel = await reload_for_response(db, db_artikel, ArtikelStammdatenResponse)
         return db_artikel
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Artikel bereits vorhanden")
 
 @router.get("/artikel-stammdaten/", response_model=List[ArtikelStammdatenResponse])
@@ -65,32 +66,33 @@ async def get_artikel_stammdaten_list(
     limit: int = 100,
     artikel_gruppe: Optional[str] = None,
     artikel_art: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Artikel-Stammdaten mit Filterung"""
     if not check_permission(current_user, "warenwirtschaft", "artikel_stammdaten", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(ArtikelStammdaten)
+    query = select(ArtikelStammdaten).options(*response_load_options(ArtikelStammdaten, ArtikelStammdatenResponse))
     if artikel_gruppe:
-        query = query.filter(ArtikelStammdaten.artikel_gruppe == artikel_gruppe)
+        query = query.where(ArtikelStammdaten.artikel_gruppe == artikel_gruppe)
     if artikel_art:
-        query = query.filter(ArtikelStammdaten.artikel_art == artikel_art)
+        query = query.where(ArtikelStammdaten.artikel_art == artikel_art)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/artikel-stammdaten/{artikel_id}", response_model=ArtikelStammdatenResponse)
 async def get_artikel_stammdaten(
     artikel_id: int = Path(..., title="Artikel ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifische Artikel-Stammdaten"""
     if not check_permission(current_user, "warenwirtschaft", "artikel_stammdaten", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    artikel = db.query(ArtikelStammdaten).filter(ArtikelStammdaten.id == artikel_id).first()
+    artikel = await db.get(ArtikelStammdaten, artikel_id, options=response_load_options(ArtikelStammdaten, ArtikelStammdatenResponse))
     if not artikel:
         raise HTTPException(status_code=404, detail="Artikel nicht gefunden")
     return artikel
@@ -99,47 +101,47 @@ async def get_artikel_stammdaten(
 async def update_artikel_stammdaten(
     artikel_id: int = Path(..., title="Artikel ID"),
     artikel_update: ArtikelStammdatenUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Artikel-Stammdaten"""
     if not check_permission(current_user, "warenwirtschaft", "artikel_stammdaten", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    artikel = db.query(ArtikelStammdaten).filter(ArtikelStammdaten.id == artikel_id).first()
+    artikel = await db.get(ArtikelStammdaten, artikel_id)
     if not artikel:
         raise HTTPException(status_code=404, detail="Artikel nicht gefunden")
     
     for field, value in artikel_update.dict(exclude_unset=True).items():
         setattr(artikel, field, value)
     
-    db.commit()
-    db.refresh(artikel)
+    await db.commit()
+    artikel = await reload_for_response(db, artikel, ArtikelStammdatenResponse)
     return artikel
 
 @router.delete("/artikel-stammdaten/{artikel_id}", status_code=204)
 async def delete_artikel_stammdaten(
     artikel_id: int = Path(..., title="Artikel ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Artikel-Stammdaten"""
     if not check_permission(current_user, "warenwirtschaft", "artikel_stammdaten", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    artikel = db.query(ArtikelStammdaten).filter(ArtikelStammdaten.id == artikel_id).first()
+    artikel = await db.get(ArtikelStammdaten, artikel_id)
     if not artikel:
         raise HTTPException(status_code=404, detail="Artikel nicht gefunden")
     
-    db.delete(artikel)
-    db.commit()
+    await db.delete(artikel)
+    await db.commit()
 
 # ==================== Lager Endpoints ====================
 
 @router.post("/lager/", response_model=LagerResponse)
 async def create_lager(
     lager: LagerCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neues Lager"""
@@ -149,37 +151,38 @@ async def create_lager(
     try:
         db_lager = Lager(**lager.dict())
         db.add(db_lager)
-        db.commit()
-        db.refresh(db_lager)
+        await db.commit()
+        db_lager = await reload_for_response(db, db_lager, LagerResponse)
         return db_lager
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Lager bereits vorhanden")
 
 @router.get("/lager/", response_model=List[LagerResponse])
 async def get_lager_list(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Lager"""
     if not check_permission(current_user, "warenwirtschaft", "lager", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    return db.query(Lager).offset(skip).limit(limit).all()
+    result = await db.execute(select(Lager).options(*response_load_options(Lager, LagerResponse)).offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/lager/{lager_id}", response_model=LagerResponse)
 async def get_lager(
     lager_id: int = Path(..., title="Lager ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifisches Lager"""
     if not check_permission(current_user, "warenwirtschaft", "lager", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    lager = db.query(Lager).filter(Lager.id == lager_id).first()
+    lager = await db.get(Lager, lager_id, options=response_load_options(Lager, LagerResponse))
     if not lager:
         raise HTTPException(status_code=404, detail="Lager nicht gefunden")
     return lager
@@ -188,47 +191,47 @@ async def get_lager(
 async def update_lager(
     lager_id: int = Path(..., title="Lager ID"),
     lager_update: LagerUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Lager"""
     if not check_permission(current_user, "warenwirtschaft", "lager", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    lager = db.query(Lager).filter(Lager.id == lager_id).first()
+    lager = await db.get(Lager, lager_id)
     if not lager:
         raise HTTPException(status_code=404, detail="Lager nicht gefunden")
     
     for field, value in lager_update.dict(exclude_unset=True).items():
         setattr(lager, field, value)
     
-    db.commit()
-    db.refresh(lager)
+    await db.commit()
+    lager = await reload_for_response(db, lager, LagerResponse)
     return lager
 
 @router.delete("/lager/{lager_id}", status_code=204)
 async def delete_lager(
     lager_id: int = Path(..., title="Lager ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Lager"""
     if not check_permission(current_user, "warenwirtschaft", "lager", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    lager = db.query(Lager).filter(Lager.id == lager_id).first()
+    lager = await db.get(Lager, lager_id)
     if not lager:
         raise HTTPException(status_code=404, detail="Lager nicht gefunden")
     
-    db.delete(lager)
-    db.commit()
+    await db.delete(lager)
+    await db.commit()
 
 # ==================== Einlagerung Endpoints ====================
 
 @router.post("/einlagerung/", response_model=EinlagerungResponse)
 async def create_einlagerung(
     einlagerung: EinlagerungCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neue Einlagerung"""
@@ -238,11 +241,11 @@ async def create_einlagerung(
     try:
         db_einlagerung = Einlagerung(**einlagerung.dict())
         db.add(db_einlagerung)
-        db.commit()
-        db.refresh(db_einlagerung)
+        await db.commit()
+        db_einlagerung = await reload_for_response(db, db_einlagerung, EinlagerungResponse)
         return db_einlagerung
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Einlagerung konnte nicht erstellt werden")
 
 @router.get("/einlagerung/", response_model=List[EinlagerungResponse])
@@ -253,36 +256,37 @@ async def get_einlagerung_list(
     artikel_id: Optional[int] = None,
     von_datum: Optional[date] = None,
     bis_datum: Optional[date] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Einlagerungen mit Filterung"""
     if not check_permission(current_user, "warenwirtschaft", "einlagerung", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Einlagerung)
+    query = select(Einlagerung).options(*response_load_options(Einlagerung, EinlagerungResponse))
     if lager_id:
-        query = query.filter(Einlagerung.lager_id == lager_id)
+        query = query.where(Einlagerung.lager_id == lager_id)
     if artikel_id:
-        query = query.filter(Einlagerung.artikel_id == artikel_id)
+        query = query.where(Einlagerung.artikel_id == artikel_id)
     if von_datum:
-        query = query.filter(Einlagerung.einlagerungsdatum >= von_datum)
+        query = query.where(Einlagerung.einlagerungsdatum >= von_datum)
     if bis_datum:
-        query = query.filter(Einlagerung.einlagerungsdatum <= bis_datum)
+        query = query.where(Einlagerung.einlagerungsdatum <= bis_datum)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/einlagerung/{einlagerung_id}", response_model=EinlagerungResponse)
 async def get_einlagerung(
     einlagerung_id: int = Path(..., title="Einlagerung ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifische Einlagerung"""
     if not check_permission(current_user, "warenwirtschaft", "einlagerung", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    einlagerung = db.query(Einlagerung).filter(Einlagerung.id == einlagerung_id).first()
+    einlagerung = await db.get(Einlagerung, einlagerung_id, options=response_load_options(Einlagerung, EinlagerungResponse))
     if not einlagerung:
         raise HTTPException(status_code=404, detail="Einlagerung nicht gefunden")
     return einlagerung
@@ -291,47 +295,47 @@ async def get_einlagerung(
 async def update_einlagerung(
     einlagerung_id: int = Path(..., title="Einlagerung ID"),
     einlagerung_update: EinlagerungUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Einlagerung"""
     if not check_permission(current_user, "warenwirtschaft", "einlagerung", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    einlagerung = db.query(Einlagerung).filter(Einlagerung.id == einlagerung_id).first()
+    einlagerung = await db.get(Einlagerung, einlagerung_id)
     if not einlagerung:
         raise HTTPException(status_code=404, detail="Einlagerung nicht gefunden")
     
     for field, value in einlagerung_update.dict(exclude_unset=True).items():
         setattr(einlagerung, field, value)
     
-    db.commit()
-    db.refresh(einlagerung)
+    await db.commit()
+    einlagerung = await reload_for_response(db, einlagerung, EinlagerungResponse)
     return einlagerung
 
 @router.delete("/einlagerung/{einlagerung_id}", status_code=204)
 async def delete_einlagerung(
     einlagerung_id: int = Path(..., title="Einlagerung ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Einlagerung"""
     if not check_permission(current_user, "warenwirtschaft", "einlagerung", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    einlagerung = db.query(Einlagerung).filter(Einlagerung.id == einlagerung_id).first()
+    einlagerung = await db.get(Einlagerung, einlagerung_id)
     if not einlagerung:
         raise HTTPException(status_code=404, detail="Einlagerung nicht gefunden")
     
-    db.delete(einlagerung)
-    db.commit()
+    await db.delete(einlagerung)
+    await db.commit()
 
 # ==================== Bestellung Endpoints ====================
 
 @router.post("/bestellung/", response_model=BestellungResponse)
 async def create_bestellung(
     bestellung: BestellungCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neue Bestellung"""
@@ -341,11 +345,11 @@ async def create_bestellung(
     try:
         db_bestellung = Bestellung(**bestellung.dict())
         db.add(db_bestellung)
-        db.commit()
-        db.refresh(db_bestellung)
+        await db.commit()
+        db_bestellung = await reload_for_response(db, db_bestellung, BestellungResponse)
         return db_bestellung
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Bestellung konnte nicht erstellt werden")
 
 @router.get("/bestellung/", response_model=List[BestellungResponse])
@@ -356,36 +360,37 @@ async def get_bestellung_list(
     status: Optional[str] = None,
     von_datum: Optional[date] = None,
     bis_datum: Optional[date] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Bestellungen mit Filterung"""
     if not check_permission(current_user, "warenwirtschaft", "bestellung", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Bestellung)
+    query = select(Bestellung).options(*response_load_options(Bestellung, BestellungResponse))
     if lieferant_id:
-        query = query.filter(Bestellung.lieferant_id == lieferant_id)
+        query = query.where(Bestellung.lieferant_id == lieferant_id)
     if status:
-        query = query.filter(Bestellung.status == status)
+        query = query.where(Bestellung.status == status)
     if von_datum:
-        query = query.filter(Bestellung.bestelldatum >= von_datum)
+        query = query.where(Bestellung.bestelldatum >= von_datum)
     if bis_datum:
-        query = query.filter(Bestellung.bestelldatum <= bis_datum)
+        query = query.where(Bestellung.bestelldatum <= bis_datum)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/bestellung/{bestellung_id}", response_model=BestellungResponse)
 async def get_bestellung(
     bestellung_id: int = Path(..., title="Bestellung ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifische Bestellung"""
     if not check_permission(current_user, "warenwirtschaft", "bestellung", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    bestellung = db.query(Bestellung).filter(Bestellung.id == bestellung_id).first()
+    bestellung = await db.get(Bestellung, bestellung_id, options=response_load_options(Bestellung, BestellungResponse))
     if not bestellung:
         raise HTTPException(status_code=404, detail="Bestellung nicht gefunden")
     return bestellung
@@ -394,47 +399,47 @@ async def get_bestellung(
 async def update_bestellung(
     bestellung_id: int = Path(..., title="Bestellung ID"),
     bestellung_update: BestellungUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Bestellung"""
     if not check_permission(current_user, "warenwirtschaft", "bestellung", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    bestellung = db.query(Bestellung).filter(Bestellung.id == bestellung_id).first()
+    bestellung = await db.get(Bestellung, bestellung_id)
     if not bestellung:
         raise HTTPException(status_code=404, detail="Bestellung nicht gefunden")
     
     for field, value in bestellung_update.dict(exclude_unset=True).items():
         setattr(bestellung, field, value)
     
-    db.commit()
-    db.refresh(bestellung)
+    await db.commit()
+    bestellung = await reload_for_response(db, bestellung, BestellungResponse)
     return bestellung
 
 @router.delete("/bestellung/{bestellung_id}", status_code=204)
 async def delete_bestellung(
     bestellung_id: int = Path(..., title="Bestellung ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Bestellung"""
     if not check_permission(current_user, "warenwirtschaft", "bestellung", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    bestellung = db.query(Bestellung).filter(Bestellung.id == bestellung_id).first()
+    bestellung = await db.get(Bestellung, bestellung_id)
     if not bestellung:
         raise HTTPException(status_code=404, detail="Bestellung nicht gefunden")
     
-    db.delete(bestellung)
-    db.commit()
+    await db.delete(bestellung)
+    await db.commit()
 
 # ==================== Lieferant Endpoints ====================
 
 @router.post("/lieferant/", response_model=LieferantResponse)
 async def create_lieferant(
     lieferant: LieferantCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neuen Lieferanten"""
@@ -444,37 +449,38 @@ async def create_lieferant(
     try:
         db_lieferant = Lieferant(**lieferant.dict())
         db.add(db_lieferant)
-        db.commit()
-        db.refresh(db_lieferant)
+        await db.commit()
+        db_lieferant = await reload_for_response(db, db_lieferant, LieferantResponse)
         return db_lieferant
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Lieferant bereits vorhanden")
 
 @router.get("/lieferant/", response_model=List[LieferantResponse])
 async def get_lieferant_list(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Lieferanten"""
     if not check_permission(current_user, "warenwirtschaft", "lieferant", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    return db.query(Lieferant).offset(skip).limit(limit).all()
+    result = await db.execute(select(Lieferant).options(*response_load_options(Lieferant, LieferantResponse)).offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/lieferant/{lieferant_id}", response_model=LieferantResponse)
 async def get_lieferant(
     lieferant_id: int = Path(..., title="Lieferant ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifischen Lieferanten"""
     if not check_permission(current_user, "warenwirtschaft", "lieferant", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    lieferant = db.query(Lieferant).filter(Lieferant.id == lieferant_id).first()
+    lieferant = await db.get(Lieferant, lieferant_id, options=response_load_options(Lieferant, LieferantResponse))
     if not lieferant:
         raise HTTPException(status_code=404, detail="Lieferant nicht gefunden")
     return lieferant
@@ -483,47 +489,47 @@ async def get_lieferant(
 async def update_lieferant(
     lieferant_id: int = Path(..., title="Lieferant ID"),
     lieferant_update: LieferantUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Lieferant"""
     if not check_permission(current_user, "warenwirtschaft", "lieferant", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    lieferant = db.query(Lieferant).filter(Lieferant.id == lieferant_id).first()
+    lieferant = await db.get(Lieferant, lieferant_id)
     if not lieferant:
         raise HTTPException(status_code=404, detail="Lieferant nicht gefunden")
     
     for field, value in lieferant_update.dict(exclude_unset=True).items():
         setattr(lieferant, field, value)
     
-    db.commit()
-    db.refresh(lieferant)
+    await db.commit()
+    lieferant = await reload_for_response(db, lieferant, LieferantResponse)
     return lieferant
 
 @router.delete("/lieferant/{lieferant_id}", status_code=204)
 async def delete_lieferant(
     lieferant_id: int = Path(..., title="Lieferant ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Lieferant"""
     if not check_permission(current_user, "warenwirtschaft", "lieferant", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    lieferant = db.query(Lieferant).filter(Lieferant.id == lieferant_id).first()
+    lieferant = await db.get(Lieferant, lieferant_id)
     if not lieferant:
         raise HTTPException(status_code=404, detail="Lieferant nicht gefunden")
     
-    db.delete(lieferant)
-    db.commit()
+    await db.delete(lieferant)
+    await db.commit()
 
 # ==================== Inventur Endpoints ====================
 
 @router.post("/inventur/", response_model=InventurResponse)
 async def create_inventur(
     inventur: InventurCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Erstellt neue Inventur"""
@@ -533,11 +539,11 @@ async def create_inventur(
     try:
         db_inventur = Inventur(**inventur.dict())
         db.add(db_inventur)
-        db.commit()
-        db.refresh(db_inventur)
+        await db.commit()
+        db_inventur = await reload_for_response(db, db_inventur, InventurResponse)
         return db_inventur
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Inventur konnte nicht erstellt werden")
 
 @router.get("/inventur/", response_model=List[InventurResponse])
@@ -548,36 +554,37 @@ async def get_inventur_list(
     status: Optional[str] = None,
     von_datum: Optional[date] = None,
     bis_datum: Optional[date] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Listet alle Inventuren mit Filterung"""
     if not check_permission(current_user, "warenwirtschaft", "inventur", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    query = db.query(Inventur)
+    query = select(Inventur).options(*response_load_options(Inventur, InventurResponse))
     if lager_id:
-        query = query.filter(Inventur.lager_id == lager_id)
+        query = query.where(Inventur.lager_id == lager_id)
     if status:
-        query = query.filter(Inventur.status == status)
+        query = query.where(Inventur.status == status)
     if von_datum:
-        query = query.filter(Inventur.inventurdatum >= von_datum)
+        query = query.where(Inventur.inventurdatum >= von_datum)
     if bis_datum:
-        query = query.filter(Inventur.inventurdatum <= bis_datum)
+        query = query.where(Inventur.inventurdatum <= bis_datum)
     
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    return result.scalars().all()
 
 @router.get("/inventur/{inventur_id}", response_model=InventurResponse)
 async def get_inventur(
     inventur_id: int = Path(..., title="Inventur ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Holt spezifische Inventur"""
     if not check_permission(current_user, "warenwirtschaft", "inventur", "read"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    inventur = db.query(Inventur).filter(Inventur.id == inventur_id).first()
+    inventur = await db.get(Inventur, inventur_id, options=response_load_options(Inventur, InventurResponse))
     if not inventur:
         raise HTTPException(status_code=404, detail="Inventur nicht gefunden")
     return inventur
@@ -586,40 +593,40 @@ async def get_inventur(
 async def update_inventur(
     inventur_id: int = Path(..., title="Inventur ID"),
     inventur_update: InventurUpdate = Body(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Aktualisiert Inventur"""
     if not check_permission(current_user, "warenwirtschaft", "inventur", "update"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    inventur = db.query(Inventur).filter(Inventur.id == inventur_id).first()
+    inventur = await db.get(Inventur, inventur_id)
     if not inventur:
         raise HTTPException(status_code=404, detail="Inventur nicht gefunden")
     
     for field, value in inventur_update.dict(exclude_unset=True).items():
         setattr(inventur, field, value)
     
-    db.commit()
-    db.refresh(inventur)
+    await db.commit()
+    inventur = await reload_for_response(db, inventur, InventurResponse)
     return inventur
 
 @router.delete("/inventur/{inventur_id}", status_code=204)
 async def delete_inventur(
     inventur_id: int = Path(..., title="Inventur ID"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
     """Löscht Inventur"""
     if not check_permission(current_user, "warenwirtschaft", "inventur", "delete"):
         raise HTTPException(status_code=403, detail="Keine Berechtigung")
     
-    inventur = db.query(Inventur).filter(Inventur.id == inventur_id).first()
+    inventur = await db.get(Inventur, inventur_id)
     if not inventur:
         raise HTTPException(status_code=404, detail="Inventur nicht gefunden")
     
-    db.delete(inventur)
-    db.commit()
+    await db.delete(inventur)
+    await db.commit()
 
 # ==================== Weitere WaWi Endpoints ====================
 
@@ -17,6 +17,11 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///app.db"
+    # Pool-Einstellungen für die AsyncSession-Engine (asyncpg/aiosqlite)
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 30
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
     
     # Security
     SECRET_KEY: str = "your-secret-key-here"  # In Produktion durch sicheren Schlüssel ersetzen
@@ -0,0 +1,139 @@
+"""
+AsyncSession-Datenschicht für die v1-ERP-Endpunkte.
+
+Die Router unter ``backend/app/api/v1/endpoints`` sind ``async def`` und dürfen
+den Event-Loop nicht mit synchronen SQLAlchemy-Aufrufen blockieren. Dieses Modul
+stellt deshalb eine asynchrone Engine (asyncpg für PostgreSQL, aiosqlite für
+SQLite/Tests) mit abgestimmtem Connection-Pool und die Dependency
+``get_async_db`` bereit.
+"""
+
+from typing import Any, AsyncGenerator, Dict, List, Optional, Type, get_args, get_origin
+
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import selectinload
+
+from backend.app.core.config import settings
+
+# Synchrone Treiber -> asynchrone Treiber
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+# Erzeugte Engines je Async-URL, damit beim Shutdown alle geschlossen werden
+_engines: Dict[str, AsyncEngine] = {}
+
+
+def to_async_url(database_url: str) -> str:
+    """Übersetzt eine synchrone Datenbank-URL in die passende Async-URL."""
+    url = make_url(database_url)
+    driver = _ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _engine_kwargs(async_url: str) -> dict:
+    """Pool-Einstellungen je Backend; SQLite nutzt die Standard-Pools von SQLAlchemy."""
+    if async_url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+
+def get_async_engine(database_url: Optional[str] = None) -> AsyncEngine:
+    """Liefert die (pro URL einmalig erzeugte) asynchrone Engine."""
+    async_url = to_async_url(database_url or settings.DATABASE_URL)
+    engine = _engines.get(async_url)
+    if engine is None:
+        engine = _engines[async_url] = create_async_engine(async_url, **_engine_kwargs(async_url))
+    return engine
+
+
+def get_async_sessionmaker(
+    engine: Optional[AsyncEngine] = None,
+) -> async_sessionmaker[AsyncSession]:
+    """Session-Factory; ``expire_on_commit=False`` verhindert Lazy-Reloads nach dem Commit."""
+    return async_sessionmaker(
+        bind=engine or get_async_engine(),
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI-Dependency für eine AsyncSession pro Request."""
+    async with get_async_sessionmaker()() as session:
+        yield session
+
+
+async def dispose_async_engine() -> None:
+    """Schließt die Pool-Verbindungen aller erzeugten Engines (z.B. beim Shutdown)."""
+    while _engines:
+        _, engine = _engines.popitem()
+        await engine.dispose()
+
+
+def _nested_schema(annotation: Any) -> Optional[Type[BaseModel]]:
+    """Ermittelt das Pydantic-Modell hinter ``Optional[X]``/``List[X]``."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    if get_origin(annotation) is not None:
+        for arg in get_args(annotation):
+            nested = _nested_schema(arg)
+            if nested is not None:
+                return nested
+    return None
+
+
+def response_load_options(model: Any, schema: Type[BaseModel], _depth: int = 3) -> List[Any]:
+    """
+    Baut ``selectinload``-Optionen für alle Beziehungen, die das Response-Schema
+    serialisiert.
+
+    In einer AsyncSession sind Lazy-Loads beim Serialisieren nicht erlaubt; die
+    benötigten Beziehungen werden daher vorab geladen (rekursiv bis ``_depth``).
+    """
+    if _depth <= 0:
+        return []
+    relationships = inspect(model).relationships
+    options = []
+    for name, field in schema.model_fields.items():
+        if name not in relationships:
+            continue
+        loader = selectinload(getattr(model, name))
+        nested = _nested_schema(field.annotation)
+        if nested is not None:
+            target = relationships[name].mapper.class_
+            sub_options = response_load_options(target, nested, _depth - 1)
+            if sub_options:
+                loader = loader.options(*sub_options)
+        options.append(loader)
+    return options
+
+
+async def reload_for_response(db: AsyncSession, instance: Any, schema: Type[BaseModel]) -> Any:
+    """Lädt ein Objekt nach dem Commit inklusive der im Schema benötigten Beziehungen neu."""
+    model = type(instance)
+    identity = inspect(instance).identity
+    return await db.get(
+        model,
+        identity,
+        options=response_load_options(model, schema),
+        populate_existing=True,
+    )
@@ -19,6 +19,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Import configurations
 from backend.app.config.production import ProductionSettings
 from backend.app.database.connection import engine, Base
+from backend.app.db.async_session import dispose_async_engine
 from backend.app.monitoring.logging_config import setup_logging, LoggingMiddleware
 from backend.app.monitoring.metrics import MetricsMiddleware
 from backend.app.optimization.caching import cache_manager
@@ -91,6 +92,7 @@ async def lifespan(app: FastAPI):
     try:
         # Close database connections
         await engine.dispose()
+        await dispose_async_engine()
         logger.info("Database connections closed")
         
         # Close cache connections
@@ -2,11 +2,13 @@
 Hauptengine für die Compliance-Validierung
 """
 
-from typing import Dict, List, Any, Optional
+import asyncio
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
 from .models import (
     ComplianceType,
+    CheckResult,
     ValidationResult,
     ComplianceRecord,
     ValidationStatus,
@@ -18,14 +20,31 @@ from .models import (
     ComplianceAlert
 )
 from .validators import QSValidator, GMPValidator, EURegValidator
+from .rules import (
+    ValidationCache,
+    build_frame,
+    content_hash,
+    evaluate_rules,
+    rule_expiry,
+    specs_for
+)
+
+# Chargen pro Auswertungsschritt in validate_batches
+BULK_CHUNK_SIZE = 10000
 
 class ComplianceEngine:
     """Hauptklasse der Compliance-Engine"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[ValidationCache] = None):
         self.qs_validator = QSValidator()
         self.gmp_validator = GMPValidator()
         self.eu_validator = EURegValidator()
+        self.validators = {
+            ComplianceType.QS: self.qs_validator,
+            ComplianceType.GMP: self.gmp_validator,
+            ComplianceType.EU_REG: self.eu_validator
+        }
+        self.cache = cache if cache is not None else ValidationCache()
         
     def validate_charge(self, chargen_daten: ChargenDaten) -> ComplianceReport:
         """Führt eine vollständige Chargenvalidierung durch"""
@@ -142,21 +161,152 @@ class ComplianceEngine:
         batch_data['responsible_person'] = responsible_person
         batch_data['digital_signature'] = digital_signature
         
-        results = []
-        for compliance_type in compliance_types:
-            validator = self.validators[compliance_type]
-            validation_result = await validator.validate(batch_data)
-            
-            record = ComplianceRecord(
+        key = content_hash(batch_data)
+        
+        async def validate(compliance_type: ComplianceType) -> ValidationResult:
+            cached = self.cache.get(key, compliance_type)
+            if cached is not None:
+                return cached
+            result = await self.validators[compliance_type].validate(batch_data)
+            self.cache.store(key, compliance_type, result, rule_expiry(batch_data, compliance_type))
+            return result
+        
+        # Validatoren laufen nebenläufig
+        validation_results = await asyncio.gather(*(validate(t) for t in compliance_types))
+        
+        return [
+            ComplianceRecord(
                 batch_id=batch_id,
                 compliance_type=compliance_type,
                 validation_result=validation_result,
                 created_at=datetime.now()
             )
-            results.append(record)
+            for compliance_type, validation_result in zip(compliance_types, validation_results)
+        ]
+    
+    async def validate_batches(
+        self,
+        batches: Dict[str, Dict[str, Any]],
+        compliance_types: Optional[List[ComplianceType]] = None,
+        responsible_person: str = "",
+        digital_signature: str = "",
+        chunk_size: int = BULK_CHUNK_SIZE
+    ) -> Dict[str, List[ComplianceRecord]]:
+        """
+        Führt die Compliance-Validierung für viele Chargen gleichzeitig durch
+        
+        Die Regeltabelle (rules.RULE_TABLE) wird spaltenweise über alle
+        Chargen eines Abschnitts ausgewertet; nur Prüfungen, die eine Charge
+        nicht sicher besteht, laufen über die Validator-Methode. Ergebnisse
+        unveränderter Chargen kommen aus dem Cache.
+        
+        Args:
+            batches: Chargendaten nach Chargen-ID
+            compliance_types: Liste der zu prüfenden Standards (optional)
+            responsible_person: Name der verantwortlichen Person
+            digital_signature: Digitale Signatur
+            chunk_size: Chargen pro Auswertungsschritt
+            
+        Returns:
+            ComplianceRecord-Listen nach Chargen-ID (wie validate_batch)
+        """
+        if not compliance_types:
+            compliance_types = list(ComplianceType)
             
+        items = list(batches.items())
+        results: Dict[str, List[ComplianceRecord]] = {}
+        for start in range(0, len(items), chunk_size):
+            # Auswertung im Thread, damit der Event-Loop nicht blockiert
+            results.update(await asyncio.to_thread(
+                self._validate_chunk,
+                items[start:start + chunk_size],
+                compliance_types,
+                responsible_person,
+                digital_signature
+            ))
         return results
     
+    def _validate_chunk(
+        self,
+        items: List[Tuple[str, Dict[str, Any]]],
+        compliance_types: List[ComplianceType],
+        responsible_person: str,
+        digital_signature: str
+    ) -> Dict[str, List[ComplianceRecord]]:
+        now = datetime.now()
+        records = [
+            dict(batch_data, batch_id=batch_id, responsible_person=responsible_person,
+                 digital_signature=digital_signature)
+            for batch_id, batch_data in items
+        ]
+        keys = [content_hash(record) for record in records]
+        
+        results: Dict[Tuple[int, ComplianceType], ValidationResult] = {}
+        for compliance_type in compliance_types:
+            pending = []
+            for index, cached in enumerate(self.cache.get_many(keys, compliance_type, now)):
+                if cached is None:
+                    pending.append(index)
+                else:
+                    results[index, compliance_type] = cached
+            if not pending:
+                continue
+            
+            validator = self.validators[compliance_type]
+            specs = specs_for(compliance_type)
+            pending_records = [records[index] for index in pending]
+            masks = evaluate_rules(build_frame(pending_records, specs), specs, now)
+            
+            # Bestandene Prüfungen und vollständig konforme Ergebnisse werden
+            # innerhalb des Abschnitts geteilt (gleicher Inhalt, keine Kopien)
+            compliant_checks: Dict[Tuple[str, str], CheckResult] = {}
+            compliant_results: Dict[Tuple[int, ...], ValidationResult] = {}
+            validated = []
+            for row, index in enumerate(pending):
+                record = records[index]
+                checks = []
+                passed = True
+                for spec, mask in zip(specs, masks):
+                    if mask[row]:
+                        message = spec.compliant_message(record)
+                        check = compliant_checks.get((spec.name, message))
+                        if check is None:
+                            check = compliant_checks[spec.name, message] = spec.compliant_result(record)
+                        checks.append(check)
+                        continue
+                    passed = False
+                    try:
+                        checks.append(getattr(validator, spec.method)(record))
+                    except Exception as e:
+                        raise ValueError(f"Charge {record['batch_id']}, {spec.name}: {e}") from e
+                
+                result = compliant_results.get(tuple(map(id, checks))) if passed else None
+                if result is None:
+                    result = ValidationResult(
+                        status=validator._determine_overall_status(checks),
+                        checks=checks,
+                        responsible_person=record.get("responsible_person", ""),
+                        digital_signature=record.get("digital_signature", "")
+                    )
+                    if passed:
+                        compliant_results[tuple(map(id, checks))] = result
+                validated.append((keys[index], compliance_type, result, rule_expiry(record, compliance_type, now)))
+                results[index, compliance_type] = result
+            self.cache.store_many(validated)
+        
+        return {
+            batch_id: [
+                ComplianceRecord(
+                    batch_id=batch_id,
+                    compliance_type=compliance_type,
+                    validation_result=results[index, compliance_type],
+                    created_at=now
+                )
+                for compliance_type in compliance_types
+            ]
+            for index, (batch_id, _) in enumerate(items)
+        }
+    
     def get_overall_status(self, records: List[ComplianceRecord]) -> ValidationStatus:
         """
         Ermittelt den Gesamtstatus aus mehreren Compliance-Prüfungen
@@ -4,7 +4,6 @@ Monitoring-System für die Compliance-Engine
 
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
-import asyncio
 import logging
 from uuid import uuid4
 from collections import deque
@@ -20,27 +19,35 @@ from .models import (
     ComplianceParameter,
     ComplianceAlert
 )
+from .realtime import RunningStatistics, TimerHandle, TimerWheel
 
 logger = logging.getLogger(__name__)
 
+# Anzahl der Messungen, die im MonitoringStatus einer Charge vorgehalten werden
+MAX_LATEST_MEASUREMENTS = 100
+
 class ComplianceMonitor:
     """Echtzeit-Monitoring System für Compliance-Parameter"""
     
     def __init__(self, max_history: int = 1000):
         self.parameter_history: Dict[str, deque] = {}
+        # Streaming-Statistik über dasselbe Fenster wie die Historie
+        self.parameter_statistics: Dict[str, RunningStatistics] = {}
+        self.monitored_parameters: Dict[str, ComplianceParameter] = {}
         self.alert_history: deque = deque(maxlen=max_history)
         self.active_alerts: Dict[str, ComplianceAlert] = {}
-        self.monitoring_tasks: List[asyncio.Task] = []
         
     async def monitor_parameter(self, parameter: ComplianceParameter) -> None:
-        """Überwacht einen einzelnen Parameter"""
+        """Verarbeitet einen neuen Wert eines Parameters; Grenzwerte werden sofort geprüft"""
         if parameter.name not in self.parameter_history:
             self.parameter_history[parameter.name] = deque(maxlen=1000)
+            self.parameter_statistics[parameter.name] = RunningStatistics(window=1000)
             
         self.parameter_history[parameter.name].append({
             'wert': parameter.wert,
             'timestamp': parameter.timestamp
         })
+        self.parameter_statistics[parameter.name].add(parameter.wert, parameter.timestamp)
         
         # Prüfe Grenzwerte
         if parameter.grenzwert_min is not None and parameter.wert < parameter.grenzwert_min:
@@ -73,18 +80,10 @@ class ComplianceMonitor:
             del self.active_alerts[alert_key]
     
     def get_parameter_statistics(self, parameter_name: str) -> Dict[str, Any]:
-        """Berechnet Statistiken für einen Parameter"""
-        if parameter_name not in self.parameter_history or not self.parameter_history[parameter_name]:
+        """Liefert Statistiken für einen Parameter (laufend aktualisiert, O(1))"""
+        if parameter_name not in self.parameter_statistics:
             return {}
-            
-        values = [entry['wert'] for entry in self.parameter_history[parameter_name]]
-        return {
-            'min': min(values),
-            'max': max(values),
-            'avg': sum(values) / len(values),
-            'count': len(values),
-            'last_update': self.parameter_history[parameter_name][-1]['timestamp']
-        }
+        return self.parameter_statistics[parameter_name].snapshot()
     
     def get_active_alerts(self) -> List[ComplianceAlert]:
         """Gibt alle aktiven Alerts zurück"""
@@ -95,20 +94,19 @@ class ComplianceMonitor:
         return list(self.alert_history)
     
     async def start_monitoring(self, parameter: ComplianceParameter, interval: float = 1.0) -> None:
-        """Startet das Monitoring für einen Parameter"""
-        async def monitor():
-            while True:
-                await self.monitor_parameter(parameter)
-                await asyncio.sleep(interval)
-                
-        task = asyncio.create_task(monitor())
-        self.monitoring_tasks.append(task)
+        """
+        Nimmt einen Parameter ins Monitoring auf
+        
+        Neue Werte werden über monitor_parameter bei Eingang geprüft; ein
+        periodisches Neubewerten desselben Werts findet nicht mehr statt.
+        ``interval`` wird aus Kompatibilitätsgründen weiterhin angenommen.
+        """
+        self.monitored_parameters[parameter.name] = parameter
+        await self.monitor_parameter(parameter)
     
     async def stop_monitoring(self) -> None:
-        """Stoppt alle Monitoring-Tasks"""
-        for task in self.monitoring_tasks:
-            task.cancel()
-        self.monitoring_tasks.clear()
+        """Beendet das Monitoring aller Parameter"""
+        self.monitored_parameters.clear()
         
     def get_monitoring_status(self) -> Dict[str, Any]:
         """Gibt den aktuellen Monitoring-Status zurück"""
@@ -116,19 +114,28 @@ class ComplianceMonitor:
             'active_parameters': list(self.parameter_history.keys()),
             'active_alerts_count': len(self.active_alerts),
             'total_alerts': len(self.alert_history),
-            'monitoring_tasks': len(self.monitoring_tasks)
+            'monitored_parameters': len(self.monitored_parameters)
         }
 
 class ComplianceMonitoring:
-    """Monitoring-System für die Compliance-Engine"""
+    """
+    Monitoring-System für die Compliance-Engine
+    
+    Grenzwerte werden beim Eingang einer Messung geprüft. Zeitbasierte Regeln
+    (Benachrichtigungsverzögerung, Eskalation) laufen über ein gemeinsames
+    TimerWheel statt über einen Task pro Charge.
+    """
     
-    def __init__(self):
+    def __init__(self, timer_wheel: Optional[TimerWheel] = None):
         """Initialisiert das Monitoring-System"""
         self.active_monitoring: Dict[str, MonitoringStatus] = {}
         self.alert_settings: Dict[str, AlertSettings] = {}
         self.alert_subscriptions: Dict[str, List[AlertSubscription]] = {}
         self.active_alerts: Dict[str, List[Alert]] = {}
-        self.monitoring_tasks: Dict[str, asyncio.Task] = {}
+        self.statistics: Dict[str, Dict[str, RunningStatistics]] = {}
+        self.timer_wheel = timer_wheel if timer_wheel is not None else TimerWheel()
+        # Ausstehende Timer je Alert-ID
+        self._alert_timers: Dict[str, List[TimerHandle]] = {}
         
     async def start_monitoring(
         self,
@@ -155,10 +162,7 @@ class ComplianceMonitoring:
             parameters=parameters
         )
         self.active_monitoring[batch_id] = status
-        
-        # Starte Monitoring-Task
-        task = asyncio.create_task(self._monitor_batch(batch_id))
-        self.monitoring_tasks[batch_id] = task
+        self.statistics[batch_id] = {name: RunningStatistics() for name in parameters}
         
         logger.info(f"Monitoring für Charge {batch_id} gestartet")
         return status
@@ -170,19 +174,15 @@ class ComplianceMonitoring:
         Args:
             batch_id: ID der Charge
         """
-        if batch_id not in self.active_monitoring:
+        status = self.active_monitoring.get(batch_id)
+        if status is None or status.status != "active":
             raise ValueError(f"Kein aktives Monitoring für Charge {batch_id}")
             
-        # Beende Monitoring-Task
-        task = self.monitoring_tasks.pop(batch_id)
-        task.cancel()
-        try:
-            await task
-        except asyncio.CancelledError:
-            pass
+        # Ausstehende Timer der Charge verwerfen
+        for alert in self.active_alerts.get(batch_id, []):
+            self._cancel_alert_timers(alert.id)
             
         # Aktualisiere Status
-        status = self.active_monitoring[batch_id]
         status.status = "completed"
         status.end_time = datetime.now()
         
@@ -220,10 +220,10 @@ class ComplianceMonitoring:
         Returns:
             Measurement-Objekt
         """
-        if batch_id not in self.active_monitoring:
+        status = self.active_monitoring.get(batch_id)
+        if status is None or status.status != "active":
             raise ValueError(f"Kein aktives Monitoring für Charge {batch_id}")
             
-        status = self.active_monitoring[batch_id]
         if parameter not in status.parameters:
             raise ValueError(f"Parameter {parameter} nicht konfiguriert")
             
@@ -233,21 +233,42 @@ class ComplianceMonitoring:
             value=value,
             timestamp=datetime.now()
         )
+        self.statistics[batch_id][parameter].add(value, measurement.timestamp)
         
         # Prüfe Grenzwerte
         param_config = status.parameters[parameter]
         if value < param_config.min or value > param_config.max:
             measurement.status = "alert"
             await self._create_alert(batch_id, parameter, value, param_config)
+        else:
+            measurement.status = "normal"
+            settings = self.alert_settings.get(batch_id)
+            if settings is not None and settings.auto_resolve:
+                self._auto_resolve(batch_id, parameter)
         
         # Aktualisiere Status
         status.latest_measurements.append(measurement)
-        if len(status.latest_measurements) > 100:  # Behalte nur die letzten 100 Messungen
-            status.latest_measurements.pop(0)
+        if len(status.latest_measurements) > MAX_LATEST_MEASUREMENTS:
+            del status.latest_measurements[:-MAX_LATEST_MEASUREMENTS]
             
         logger.debug(f"Neue Messung für Charge {batch_id}: {parameter}={value}")
         return measurement
     
+    async def get_parameter_statistics(self, batch_id: str, parameter: str) -> Dict[str, Any]:
+        """
+        Liefert Streaming-Statistiken eines Parameters seit Start des Monitorings
+        
+        Args:
+            batch_id: ID der Charge
+            parameter: Name des Parameters
+            
+        Returns:
+            Dict mit min, max, avg, std, count und last_update
+        """
+        if batch_id not in self.statistics or parameter not in self.statistics[batch_id]:
+            raise ValueError(f"Parameter {parameter} für Charge {batch_id} nicht überwacht")
+        return self.statistics[batch_id][parameter].snapshot()
+    
     async def configure_alerts(
         self,
         batch_id: str,
@@ -316,6 +337,7 @@ class ComplianceMonitoring:
                 alert.resolved_at = datetime.now()
                 alert.resolved_by = resolved_by
                 alerts.remove(alert)
+                self._cancel_alert_timers(alert_id)
                 logger.info(f"Alert {alert_id} für Charge {batch_id} aufgelöst")
                 return
                 
@@ -384,47 +406,27 @@ class ComplianceMonitoring:
             most_affected_batches=most_affected
         )
     
-    async def _monitor_batch(self, batch_id: str) -> None:
-        """
-        Monitoring-Task für eine Charge
-        
-        Args:
-            batch_id: ID der Charge
-        """
-        try:
-            while True:
-                # Prüfe aktive Alerts
-                await self._check_alerts(batch_id)
-                
-                # Warte kurz
-                await asyncio.sleep(30)  # Alle 30 Sekunden
-                
-        except asyncio.CancelledError:
-            logger.info(f"Monitoring-Task für Charge {batch_id} beendet")
-            raise
-        except Exception as e:
-            logger.error(f"Fehler im Monitoring-Task für Charge {batch_id}: {e}")
-            raise
+    def _auto_resolve(self, batch_id: str, parameter: str) -> None:
+        """Löst aktive Alerts eines Parameters auf, sobald er wieder im Grenzbereich liegt"""
+        alerts = self.active_alerts.get(batch_id)
+        if not alerts:
+            return
+            
+        now = datetime.now()
+        remaining = []
+        for alert in alerts:
+            if alert.parameter == parameter:
+                alert.resolved_at = now
+                alert.resolved_by = "auto_resolve"
+                self._cancel_alert_timers(alert.id)
+                logger.info(f"Alert {alert.id} für Charge {batch_id} automatisch aufgelöst")
+            else:
+                remaining.append(alert)
+        self.active_alerts[batch_id] = remaining
     
-    async def _check_alerts(self, batch_id: str) -> None:
-        """
-        Prüft und aktualisiert Alerts
-        
-        Args:
-            batch_id: ID der Charge
-        """
-        status = self.active_monitoring[batch_id]
-        
-        # Prüfe letzte Messungen
-        for measurement in status.latest_measurements[-10:]:  # Letzte 10 Messungen
-            if measurement.status == "alert":
-                param_config = status.parameters[measurement.parameter]
-                await self._create_alert(
-                    batch_id,
-                    measurement.parameter,
-                    measurement.value,
-                    param_config
-                )
+    def _cancel_alert_timers(self, alert_id: str) -> None:
+        for handle in self._alert_timers.pop(alert_id, []):
+            self.timer_wheel.cancel(handle)
     
     async def _create_alert(
         self,
@@ -465,11 +467,47 @@ class ComplianceMonitoring:
             self.active_alerts[batch_id] = []
         self.active_alerts[batch_id].append(alert)
         
-        # Benachrichtige Subscriber
-        await self._notify_subscribers(batch_id, alert)
+        # Benachrichtige Subscriber (ggf. verzögert; entfällt, wenn der Alert vorher aufgelöst wird)
+        settings = self.alert_settings.get(batch_id)
+        timers = []
+        if settings is not None and settings.notification_delay > 0:
+            timers.append(self.timer_wheel.schedule(
+                settings.notification_delay, self._notify_if_active, batch_id, alert
+            ))
+        else:
+            await self._notify_subscribers(batch_id, alert)
+            
+        # Eskalation, falls der Alert nicht rechtzeitig aufgelöst wird
+        if settings is not None and settings.escalation_timeout:
+            timers.append(self.timer_wheel.schedule(
+                settings.escalation_timeout * 60, self._escalate_alert, batch_id, alert
+            ))
+        if timers:
+            self._alert_timers[alert.id] = timers
         
         logger.warning(f"Neuer Alert für Charge {batch_id}: {message}")
     
+    async def _notify_if_active(self, batch_id: str, alert: Alert) -> None:
+        """Verzögerte Benachrichtigung (Timer)"""
+        if alert.resolved_at is None:
+            await self._notify_subscribers(batch_id, alert)
+    
+    async def _escalate_alert(self, batch_id: str, alert: Alert) -> None:
+        """
+        Eskaliert einen nicht aufgelösten Alert (Timer)
+        
+        Args:
+            batch_id: ID der Charge
+            alert: Zu eskalierender Alert
+        """
+        self._alert_timers.pop(alert.id, None)
+        if alert.resolved_at is not None:
+            return
+            
+        alert.severity = "high"
+        logger.warning(f"Alert {alert.id} für Charge {batch_id} eskaliert")
+        await self._notify_subscribers(batch_id, alert)
+    
     async def _notify_subscribers(self, batch_id: str, alert: Alert) -> None:
         """
         Benachrichtigt alle Subscriber über einen neuen Alert
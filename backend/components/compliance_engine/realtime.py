@@ -0,0 +1,233 @@
+"""
+Bausteine für das ereignisgesteuerte Monitoring der Compliance-Engine
+
+- RunningStatistics: Streaming-Statistik (Welford) mit optionalem
+  gleitendem Fenster und Rolling-Min/Max über monotone Deques; Abfragen
+  kosten O(1) statt eines Durchlaufs über die Historie.
+- TimerWheel: ein einziger asyncio-Task für alle zeitbasierten Regeln
+  (Benachrichtigungsverzögerung, Eskalation). Einfügen und Abbrechen eines
+  Timers sind O(1); ohne ausstehende Timer läuft kein Task.
+"""
+
+import asyncio
+import inspect
+import itertools
+import logging
+import math
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class RunningStatistics:
+    """Streaming-Statistik eines Parameters"""
+
+    __slots__ = (
+        "window", "count", "mean", "_m2", "_min", "_max",
+        "_values", "_min_deque", "_max_deque", "_index", "last_update"
+    )
+
+    def __init__(self, window: Optional[int] = None):
+        """
+        Args:
+            window: Anzahl der letzten Werte, über die gerechnet wird
+                (None = alle Werte seit Start, ohne Werte zu speichern)
+        """
+        self.window = window
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+        self._values: Optional[Deque[float]] = deque() if window else None
+        # Monotone Deques aus (Index, Wert) für Rolling-Min/Max
+        self._min_deque: Optional[Deque[Tuple[int, float]]] = deque() if window else None
+        self._max_deque: Optional[Deque[Tuple[int, float]]] = deque() if window else None
+        self._index = 0
+        self.last_update: Optional[datetime] = None
+
+    def add(self, value: float, timestamp: Optional[datetime] = None) -> None:
+        """Nimmt einen Wert auf (O(1) amortisiert)"""
+        self.last_update = timestamp or datetime.now()
+        self._push(value)
+
+        if self.window is None:
+            self._min = min(self._min, value)
+            self._max = max(self._max, value)
+            return
+
+        index = self._index
+        self._index += 1
+        self._values.append(value)
+        while self._min_deque and self._min_deque[-1][1] >= value:
+            self._min_deque.pop()
+        self._min_deque.append((index, value))
+        while self._max_deque and self._max_deque[-1][1] <= value:
+            self._max_deque.pop()
+        self._max_deque.append((index, value))
+
+        # Ältesten Wert aus dem Fenster entfernen
+        if len(self._values) > self.window:
+            self._pop(self._values.popleft())
+            oldest = index - self.window
+            if self._min_deque[0][0] <= oldest:
+                self._min_deque.popleft()
+            if self._max_deque[0][0] <= oldest:
+                self._max_deque.popleft()
+
+    def _push(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def _pop(self, value: float) -> None:
+        self.count -= 1
+        if self.count == 0:
+            self.mean = 0.0
+            self._m2 = 0.0
+            return
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self._m2 = max(self._m2 - delta * (value - self.mean), 0.0)
+
+    @property
+    def min(self) -> float:
+        return self._min_deque[0][1] if self.window else self._min
+
+    @property
+    def max(self) -> float:
+        return self._max_deque[0][1] if self.window else self._max
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Statistik als Dict (leer, solange keine Werte vorliegen)"""
+        if not self.count:
+            return {}
+        return {
+            'min': self.min,
+            'max': self.max,
+            'avg': self.mean,
+            'std': math.sqrt(self.variance),
+            'count': self.count,
+            'last_update': self.last_update
+        }
+
+class TimerHandle:
+    """Handle eines geplanten Timers"""
+
+    __slots__ = ("id", "slot", "rounds", "callback", "args", "cancelled")
+
+    def __init__(self, timer_id: int, slot: int, rounds: int, callback: Callable, args: Tuple):
+        self.id = timer_id
+        self.slot = slot
+        self.rounds = rounds
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+class TimerWheel:
+    """
+    Timing-Wheel für zeitbasierte Regeln.
+
+    Timer werden in ``slots`` Fächer zu je ``resolution`` Sekunden einsortiert;
+    längere Verzögerungen laufen über mehrere Umdrehungen. Ein einziger Task
+    rückt das Rad pro Tick um ein Fach vor und führt nur die dort fälligen
+    Timer aus.
+    """
+
+    def __init__(self, resolution: float = 1.0, slots: int = 512):
+        self.resolution = resolution
+        self._slots: List[Dict[int, TimerHandle]] = [{} for _ in range(slots)]
+        self._tick = 0
+        self._pending = 0
+        self._ids = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return self._pending
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def schedule(self, delay: float, callback: Callable, *args: Any) -> TimerHandle:
+        """
+        Plant ``callback(*args)`` nach ``delay`` Sekunden (auf ``resolution``
+        aufgerundet). Coroutine-Funktionen werden abgewartet.
+        """
+        ticks = max(1, math.ceil(delay / self.resolution))
+        slots = len(self._slots)
+        slot = (self._tick + ticks) % slots
+        handle = TimerHandle(next(self._ids), slot, (ticks - 1) // slots, callback, args)
+        self._slots[slot][handle.id] = handle
+        self._pending += 1
+        self._ensure_running()
+        return handle
+
+    def cancel(self, handle: Optional[TimerHandle]) -> None:
+        """Bricht einen Timer ab (ohne Wirkung, wenn er bereits ausgeführt wurde)"""
+        if handle is None or handle.cancelled:
+            return
+        handle.cancelled = True
+        if self._slots[handle.slot].pop(handle.id, None) is not None:
+            self._pending -= 1
+
+    async def stop(self) -> None:
+        """Stoppt den Task und verwirft alle Timer"""
+        for slot in self._slots:
+            for handle in slot.values():
+                handle.cancelled = True
+            slot.clear()
+        self._pending = 0
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _ensure_running(self) -> None:
+        if self.running:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Ohne Event-Loop startet das Rad beim nächsten schedule() aus einer Coroutine
+            return
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        # Ohne ausstehende Timer endet der Task (kein Leerlauf-Wecken)
+        while self._pending:
+            next_tick += self.resolution
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            self._tick = (self._tick + 1) % len(self._slots)
+            await self._fire(self._slots[self._tick])
+        self._task = None
+
+    async def _fire(self, slot: Dict[int, TimerHandle]) -> None:
+        due = []
+        for handle in list(slot.values()):
+            if handle.rounds:
+                handle.rounds -= 1
+            else:
+                del slot[handle.id]
+                self._pending -= 1
+                due.append(handle)
+
+        for handle in due:
+            handle.cancelled = True
+            try:
+                result = handle.callback(*handle.args)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Fehler in Timer-Callback {getattr(handle.callback, '__name__', handle.callback)}: {e}")
@@ -0,0 +1,341 @@
+"""
+Regeltabelle und Bulk-Auswertung für die Compliance-Engine
+
+- RULE_TABLE: die Prüfungen der Validatoren als Daten (Abschnitt, Regeltyp,
+  Felder, Grenzwerte), erzeugt aus den Konstanten in validators.py.
+- evaluate_rules: wertet die Tabelle spaltenweise über viele Chargen aus
+  (ein pandas-DataFrame mit einer Zeile pro Charge) und liefert je Prüfung
+  eine Maske der Chargen, die die Prüfung sicher bestehen. Alle übrigen
+  Chargen werden von der Validator-Methode der Prüfung ausgewertet, sodass
+  Meldungen und Details identisch zur Einzelvalidierung bleiben.
+- ValidationCache: Ergebnisse nach Inhalts-Hash der Charge. Zeitabhängige
+  Regeln (Reinigungsdatum, HACCP-Aktualität) begrenzen die Gültigkeit eines
+  Eintrags bis zu dem Zeitpunkt, an dem die Regel kippen würde.
+"""
+
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+from .models import CheckResult, ComplianceType, ValidationResult, ValidationStatus
+from .validators import (
+    HACCP_MAX_MONTHS,
+    HYGIENE_MAX_DAYS,
+    QUALITY_LIMITS,
+    TRANSPORT_LIMITS,
+)
+
+DEFAULT_CACHE_ENTRIES = 300000
+
+class Rule(NamedTuple):
+    """
+    Bedingung, die eine Charge für das Bestehen einer Prüfung erfüllen muss.
+
+    kind:
+        fields       - Felder im Abschnitt vorhanden
+        non_empty    - Felder (bzw. der Abschnitt selbst) nicht leer
+        range        - Zahlenwert innerhalb [low, high]
+        max_age_days - ISO-Datum höchstens ``high`` Tage alt
+        items_have   - nicht leere Liste, jedes Element enthält alle Felder
+    """
+    kind: str
+    path: Tuple[str, ...]
+    fields: Tuple[str, ...] = ()
+    low: Optional[float] = None
+    high: Optional[float] = None
+
+class CheckSpec(NamedTuple):
+    """Eine Prüfung der Regeltabelle"""
+    compliance_type: ComplianceType
+    name: str
+    method: str
+    rules: Tuple[Rule, ...]
+    message: str
+    count_path: Optional[Tuple[str, ...]] = None
+
+    def compliant_message(self, batch_data: Dict[str, Any]) -> str:
+        """Meldung des Validators für eine bestandene Prüfung"""
+        if self.count_path is None:
+            return self.message
+        return self.message.format(count=len(_lookup(batch_data, self.count_path)))
+
+    def compliant_result(self, batch_data: Dict[str, Any]) -> CheckResult:
+        """CheckResult für eine bestandene Prüfung (wie vom Validator erzeugt)"""
+        return CheckResult(
+            name=self.name, status=ValidationStatus.COMPLIANT, message=self.compliant_message(batch_data)
+        )
+
+def _ranges(path: Tuple[str, ...], limits: Dict[str, Tuple[Optional[float], Optional[float]]]) -> Tuple[Rule, ...]:
+    return tuple(Rule("range", path, (name,), low, high) for name, (low, high) in limits.items())
+
+RULE_TABLE: Tuple[CheckSpec, ...] = (
+    CheckSpec(ComplianceType.QS, "Lieferantendaten", "_check_supplier_data", (
+        Rule("fields", ("supplier_data",), ("supplier_id", "supplier_batch_refs")),
+    ), "Alle Lieferantendaten vollständig"),
+    CheckSpec(ComplianceType.QS, "Transportbedingungen", "_check_transport_conditions",
+              _ranges(("transport_conditions",), TRANSPORT_LIMITS),
+              "Transportbedingungen eingehalten"),
+    CheckSpec(ComplianceType.QS, "Qualitätskontrollen", "_check_quality_controls",
+              _ranges(("quality_checks",), QUALITY_LIMITS),
+              "Alle Qualitätskontrollen bestanden"),
+    CheckSpec(ComplianceType.QS, "Hygiene-Protokoll", "_check_hygiene_protocol", (
+        Rule("fields", ("hygiene_protocol",), ("cleaning_date", "responsible", "measures")),
+        Rule("max_age_days", ("hygiene_protocol",), ("cleaning_date",), high=HYGIENE_MAX_DAYS),
+    ), "Hygiene-Protokoll vollständig und aktuell"),
+    CheckSpec(ComplianceType.GMP, "HACCP-Dokumentation", "_check_haccp_documentation", (
+        Rule("fields", ("haccp_documentation",), ("version", "last_update", "critical_points")),
+        # days / 30 > HACCP_MAX_MONTHS  <=>  days > HACCP_MAX_MONTHS * 30
+        Rule("max_age_days", ("haccp_documentation",), ("last_update",), high=HACCP_MAX_MONTHS * 30),
+    ), "HACCP-Dokumentation vollständig und aktuell"),
+    CheckSpec(ComplianceType.GMP, "Gefahrenanalyse", "_check_hazard_analysis", (
+        Rule("non_empty", ("hazard_analysis",), ("biological", "chemical", "physical")),
+    ), "Gefahrenanalyse vollständig durchgeführt"),
+    CheckSpec(ComplianceType.GMP, "Kontrollmaßnahmen", "_check_control_measures", (
+        Rule("items_have", ("control_measures",), ("id", "type", "description")),
+    ), "{count} Kontrollmaßnahmen definiert", ("control_measures",)),
+    CheckSpec(ComplianceType.GMP, "Prozessüberwachung", "_check_process_monitoring", (
+        Rule("items_have", ("process_monitoring", "measurements"), ("parameter", "value")),
+    ), "{count} Messungen dokumentiert", ("process_monitoring", "measurements")),
+    CheckSpec(ComplianceType.EU_REG, "EU-Dokumentation", "_check_eu_documentation", (
+        Rule("fields", ("eu_documentation",), ("declaration",)),
+        Rule("non_empty", ("eu_documentation",), ("certificates",)),
+    ), "EU-Dokumentation vollständig"),
+    CheckSpec(ComplianceType.EU_REG, "Notfallverfahren", "_check_emergency_procedures", (
+        Rule("non_empty", ("emergency_procedures",), ("contact", "procedures")),
+    ), "Notfallverfahren vollständig dokumentiert"),
+    CheckSpec(ComplianceType.EU_REG, "Informationskette", "_check_information_chain", (
+        Rule("non_empty", ("information_chain",), ("supplier_info", "transport_info", "customer_info")),
+    ), "Informationskette vollständig dokumentiert"),
+)
+
+def specs_for(compliance_type: ComplianceType) -> List[CheckSpec]:
+    """Prüfungen eines Standards in der Reihenfolge des Validators"""
+    return [spec for spec in RULE_TABLE if spec.compliance_type == compliance_type]
+
+def _columns(rule: Rule) -> List[Tuple[str, ...]]:
+    if rule.kind == "items_have" or not rule.fields:
+        return [rule.path]
+    return [rule.path + (field,) for field in rule.fields]
+
+# Datumsfelder mit Altersgrenze je Standard (für rule_expiry)
+_AGE_LIMITS: Dict[ComplianceType, List[Tuple[Tuple[str, ...], int]]] = {
+    compliance_type: [
+        (path, int(rule.high))
+        for spec in specs_for(compliance_type)
+        for rule in spec.rules if rule.kind == "max_age_days"
+        for path in _columns(rule)
+    ]
+    for compliance_type in ComplianceType
+}
+
+def _lookup(batch_data: Dict[str, Any], path: Sequence[str]) -> Any:
+    """Wert unter ``path``; None, wenn ein Abschnitt fehlt oder kein Dict ist"""
+    value = batch_data
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+def build_frame(records: Sequence[Dict[str, Any]], specs: Iterable[CheckSpec]) -> pd.DataFrame:
+    """DataFrame mit einer Spalte pro Feld, das von den Regeln gelesen wird"""
+    paths = []
+    for spec in specs:
+        for rule in spec.rules:
+            paths.extend(path for path in _columns(rule) if path not in paths)
+
+    # Abschnitte einmal pro Charge auflösen, Felder daraus lesen
+    sections = {}
+    for path in paths:
+        if path[:-1] and path[:-1] not in sections:
+            sections[path[:-1]] = [_lookup(record, path[:-1]) for record in records]
+
+    data = {}
+    for path in paths:
+        if path[:-1]:
+            key = path[-1]
+            data[".".join(path)] = [
+                section.get(key) if isinstance(section, dict) else None
+                for section in sections[path[:-1]]
+            ]
+        else:
+            data[path[0]] = [record.get(path[0]) for record in records]
+    return pd.DataFrame(data, index=pd.RangeIndex(len(records)))
+
+def _truthy(value: Any) -> bool:
+    try:
+        return bool(value)
+    except Exception:
+        return False
+
+def _items_have(items: Any, fields: Tuple[str, ...]) -> bool:
+    try:
+        return bool(items) and all(all(field in item for field in fields) for item in items)
+    except Exception:
+        return False
+
+def parse_naive_iso(value: Any) -> Optional[datetime]:
+    """ISO-Datum wie im Validator (nur Strings, nur ohne Zeitzone), sonst None"""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo is None else None
+
+def _numeric(column: pd.Series) -> np.ndarray:
+    if is_bool_dtype(column):
+        return np.full(len(column), np.nan)
+    if is_numeric_dtype(column):
+        return column.to_numpy(dtype=float, na_value=np.nan)
+    # Gemischte Spalten: nur echte Zahlen, Strings o.ä. gehen an den Validator
+    return np.fromiter(
+        (float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan for v in column),
+        dtype=float, count=len(column)
+    )
+
+def _evaluate_rule(frame: pd.DataFrame, rule: Rule, now: datetime) -> np.ndarray:
+    n = len(frame)
+    mask = np.ones(n, dtype=bool)
+    for path in _columns(rule):
+        name = ".".join(path)
+        if name not in frame:
+            return np.zeros(n, dtype=bool)
+        column = frame[name]
+
+        if rule.kind == "fields":
+            # Vorhandene Felder mit Wert None gehen konservativ an den Validator
+            mask &= column.notna().to_numpy()
+        elif rule.kind == "non_empty":
+            mask &= column.notna().to_numpy() & column.map(_truthy).to_numpy(dtype=bool)
+        elif rule.kind == "items_have":
+            mask &= column.map(lambda items: _items_have(items, rule.fields)).to_numpy(dtype=bool)
+        elif rule.kind == "range":
+            values = _numeric(column)
+            ok = ~np.isnan(values)
+            if rule.low is not None:
+                ok &= values >= rule.low
+            if rule.high is not None:
+                ok &= values <= rule.high
+            mask &= ok
+        elif rule.kind == "max_age_days":
+            dates = pd.to_datetime(column.map(parse_naive_iso), errors="coerce")
+            days = (pd.Timestamp(now) - dates).dt.days
+            mask &= (days <= rule.high).fillna(False).to_numpy(dtype=bool)
+        else:
+            raise ValueError(f"Unbekannter Regeltyp: {rule.kind}")
+    return mask
+
+def evaluate_rules(frame: pd.DataFrame, specs: Sequence[CheckSpec], now: Optional[datetime] = None) -> List[np.ndarray]:
+    """
+    Wertet die Regeln spaltenweise aus. Liefert je Prüfung eine Maske der
+    Chargen, die die Prüfung bestehen; False bedeutet "nicht sicher
+    bestanden" (Auswertung durch den Validator).
+    """
+    now = now or datetime.now()
+    masks = []
+    for spec in specs:
+        mask = np.ones(len(frame), dtype=bool)
+        for rule in spec.rules:
+            mask &= _evaluate_rule(frame, rule, now)
+        masks.append(mask)
+    return masks
+
+def rule_expiry(batch_data: Dict[str, Any], compliance_type: ComplianceType,
+                now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Zeitpunkt, ab dem eine zeitabhängige Regel des Standards für die Charge
+    nicht mehr erfüllt ist (None = Ergebnis ändert sich nicht mit der Zeit).
+    Bereits verletzte Altersregeln bleiben verletzt und begrenzen nichts.
+    """
+    now = now or datetime.now()
+    expiry = None
+    for path, max_days in _AGE_LIMITS[compliance_type]:
+        date = parse_naive_iso(_lookup(batch_data, path))
+        if date is None or (now - date).days > max_days:
+            continue
+        flips_at = date + timedelta(days=max_days + 1)
+        expiry = flips_at if expiry is None else min(expiry, flips_at)
+    return expiry
+
+def content_hash(batch_data: Dict[str, Any]) -> Optional[str]:
+    """
+    Inhalts-Hash einer Charge (None, wenn die Daten nicht serialisierbar sind).
+
+    Pickle statt JSON: Typen bleiben unterscheidbar (ein datetime und sein
+    ISO-String führen zu unterschiedlichen Prüfergebnissen). Abweichende
+    Schlüsselreihenfolge ergibt nur einen Cache-Fehltreffer.
+    """
+    try:
+        raw = pickle.dumps(batch_data, protocol=5)
+    except Exception:
+        return None
+    return hashlib.sha256(raw).hexdigest()
+
+class ValidationCache:
+    """
+    LRU-Cache für Validierungsergebnisse, adressiert über (Inhalts-Hash,
+    Standard). Die Ergebnisse werden geteilt und sind als unveränderlich zu
+    behandeln.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, ComplianceType], Tuple[Optional[datetime], ValidationResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Optional[str], compliance_type: ComplianceType,
+            now: Optional[datetime] = None) -> Optional[ValidationResult]:
+        return self.get_many([key], compliance_type, now)[0]
+
+    def get_many(self, keys: Sequence[Optional[str]], compliance_type: ComplianceType,
+                 now: Optional[datetime] = None) -> List[Optional[ValidationResult]]:
+        """Treffer für viele Chargen eines Standards (None = neu validieren)"""
+        now = now or datetime.now()
+        found: List[Optional[ValidationResult]] = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get((key, compliance_type)) if key is not None else None
+                if entry is None:
+                    found.append(None)
+                    continue
+                expires_at, result = entry
+                if expires_at is not None and now >= expires_at:
+                    del self._entries[(key, compliance_type)]
+                    found.append(None)
+                    continue
+                self._entries.move_to_end((key, compliance_type))
+                found.append(result)
+        return found
+
+    def store(self, key: Optional[str], compliance_type: ComplianceType,
+              result: ValidationResult, expires_at: Optional[datetime] = None) -> None:
+        self.store_many([(key, compliance_type, result, expires_at)])
+
+    def store_many(self, entries: Iterable[Tuple[Optional[str], ComplianceType, ValidationResult, Optional[datetime]]]) -> None:
+        """Legt Ergebnisse als (Schlüssel, Standard, Ergebnis, Ablaufzeit) ab"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            for key, compliance_type, result, expires_at in entries:
+                if key is None:
+                    continue
+                self._entries[(key, compliance_type)] = (expires_at, result)
+                self._entries.move_to_end((key, compliance_type))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
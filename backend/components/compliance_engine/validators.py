@@ -17,6 +17,16 @@ from .models import (
     ComplianceAlert
 )
 
+# Grenzwerte der Prüfungen (min, max); None = keine Grenze.
+# Die Regeltabelle in rules.py wird aus denselben Konstanten erzeugt.
+TRANSPORT_LIMITS = {"temperature": (15, 25), "humidity": (40, 60)}
+QUALITY_LIMITS = {"moisture": (8, 12), "temperature": (18, 22), "contamination": (None, 0.1)}
+HYGIENE_MAX_DAYS = 7
+HACCP_MAX_MONTHS = 12
+
+def _within(value: Any, low: Optional[float], high: Optional[float]) -> bool:
+    return (low is None or low <= value) and (high is None or value <= high)
+
 class BaseValidator(ABC):
     """Basis-Klasse für Compliance-Validatoren"""
     
@@ -133,8 +143,8 @@ class QSValidator(BaseValidator):
             )
         
         # Prüfe Grenzwerte
-        temp_ok = 15 <= temperature <= 25
-        humidity_ok = 40 <= humidity <= 60
+        temp_ok = _within(temperature, *TRANSPORT_LIMITS["temperature"])
+        humidity_ok = _within(humidity, *TRANSPORT_LIMITS["humidity"])
         
         if not (temp_ok and humidity_ok):
             return self._create_check_result(
@@ -163,7 +173,7 @@ class QSValidator(BaseValidator):
                 message="Keine Qualitätskontrollen durchgeführt"
             )
         
-        required_checks = ["moisture", "temperature", "contamination"]
+        required_checks = list(QUALITY_LIMITS)
         missing_checks = [c for c in required_checks if c not in controls]
         
         if missing_checks:
@@ -175,14 +185,9 @@ class QSValidator(BaseValidator):
             )
         
         # Prüfe Grenzwerte
-        moisture = controls["moisture"]
-        temperature = controls["temperature"]
-        contamination = controls["contamination"]
-        
         checks_ok = {
-            "moisture": 8 <= moisture <= 12,
-            "temperature": 18 <= temperature <= 22,
-            "contamination": contamination <= 0.1
+            name: _within(controls[name], low, high)
+            for name, (low, high) in QUALITY_LIMITS.items()
         }
         
         failed_checks = [k for k, v in checks_ok.items() if not v]
@@ -229,7 +234,7 @@ class QSValidator(BaseValidator):
         cleaning_date = datetime.fromisoformat(protocol["cleaning_date"])
         days_since_cleaning = (datetime.now() - cleaning_date).days
         
-        if days_since_cleaning > 7:
+        if days_since_cleaning > HYGIENE_MAX_DAYS:
             return self._create_check_result(
                 name="Hygiene-Protokoll",
                 status=ValidationStatus.NON_COMPLIANT,
@@ -312,7 +317,7 @@ class GMPValidator(BaseValidator):
         last_update = datetime.fromisoformat(haccp["last_update"])
         months_since_update = (datetime.now() - last_update).days / 30
         
-        if months_since_update > 12:
+        if months_since_update > HACCP_MAX_MONTHS:
             return self._create_check_result(
                 name="HACCP-Dokumentation",
                 status=ValidationStatus.NON_COMPLIANT,
@@ -0,0 +1,196 @@
+"""
+Ladeprofile und schlanke Projektionen für Artikel-Abfragen.
+
+``Artikel`` besitzt rund ein Dutzend Lazy-Beziehungen. Werden Artikellisten
+serialisiert, führt jeder Zugriff auf ``varianten``, ``preise`` usw. zu einer
+eigenen Abfrage (N+1). Dieses Modul bündelt deshalb benannte Ladeprofile
+(``list``, ``detail``, ``pos``, ``export``), die Beziehungen einheitlich per
+``joinedload`` (n:1) bzw. ``selectinload`` (1:n, n:m) laden, sowie
+Spaltenprojektionen für Listenansichten, die ohne ORM-Objekte auskommen.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
+
+from backend.models.artikel import Artikel, ArtikelKategorie, Einheit
+
+# Beziehungspfade je Profil; verschachtelte Pfade werden mit "." getrennt.
+LOAD_PROFILES: Dict[str, Tuple[str, ...]] = {
+    # Listenansicht: nur n:1-Stammdaten, alles andere ist gesperrt (raiseload)
+    "list": ("kategorie", "einheit"),
+    # Detailansicht: vollständiger Artikel inkl. Unterstrukturen
+    "detail": (
+        "kategorie",
+        "einheit",
+        "verkaufseinheit",
+        "einkaufseinheit",
+        "varianten.attributwerte",
+        "bilder",
+        "preise.preisliste",
+        "bestaende",
+        "lieferanten.lieferant",
+        "tags",
+        "attribute_werte.attribut",
+        "attribute_werte.attributwert",
+        "stuecklisten.positionen",
+        "gebinde.positionen",
+    ),
+    # Kasse: Verkaufseinheit, Preise und Varianten für Scan und Preisfindung
+    "pos": (
+        "einheit",
+        "verkaufseinheit",
+        "preise.preisliste",
+        "varianten",
+        "gebinde",
+    ),
+    # Export: flache Stammdaten ohne Stücklisten-/Gebindepositionen
+    "export": (
+        "kategorie",
+        "einheit",
+        "preise.preisliste",
+        "bestaende",
+        "lieferanten",
+        "tags",
+        "attribute_werte",
+    ),
+}
+
+# Profile, in denen nicht aufgeführte Beziehungen nicht nachgeladen werden dürfen
+STRICT_PROFILES = frozenset({"list", "pos"})
+
+
+def build_load_options(model: Any, paths: Iterable[str]) -> List[Any]:
+    """
+    Erzeugt Loader-Optionen für die angegebenen Beziehungspfade.
+
+    n:1-Beziehungen werden per ``joinedload`` geladen, Collections per
+    ``selectinload``. Gemeinsame Präfixe (z.B. ``attribute_werte.attribut`` und
+    ``attribute_werte.attributwert``) teilen sich denselben Ladeschritt.
+    """
+    tree: Dict[str, Any] = {}
+    for path in paths:
+        node = tree
+        for part in path.split("."):
+            node = node.setdefault(part, {})
+    return _options_for_tree(model, tree)
+
+
+def _options_for_tree(model: Any, tree: Dict[str, Any]) -> List[Any]:
+    relationships = inspect(model).relationships
+    options = []
+    for name, children in tree.items():
+        if name not in relationships:
+            raise ValueError(f"{model.__name__} hat keine Beziehung '{name}'")
+        relationship = relationships[name]
+        loader_fn = selectinload if relationship.uselist else joinedload
+        loader = loader_fn(getattr(model, name))
+        if children:
+            loader = loader.options(*_options_for_tree(relationship.mapper.class_, children))
+        options.append(loader)
+    return options
+
+
+def artikel_load_options(profile: str) -> List[Any]:
+    """Liefert die Loader-Optionen für ein benanntes Artikel-Ladeprofil."""
+    try:
+        paths = LOAD_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unbekanntes Artikel-Ladeprofil: {profile}") from None
+    options = build_load_options(Artikel, paths)
+    if profile in STRICT_PROFILES:
+        options.append(raiseload("*"))
+    return options
+
+
+def query_artikel(db: Session, profile: str = "detail"):
+    """Basisabfrage für Artikel mit dem gewünschten Ladeprofil."""
+    return db.query(Artikel).options(*artikel_load_options(profile))
+
+
+class ArtikelListItem:
+    """Leichtgewichtige Zeile für Artikellisten (ohne ORM-Identity-Map)."""
+
+    __slots__ = (
+        "id",
+        "artikelnummer",
+        "name",
+        "basispreis",
+        "waehrung",
+        "aktiv",
+        "kategorie",
+        "einheit",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        artikelnummer: str,
+        name: str,
+        basispreis: Optional[float],
+        waehrung: Optional[str],
+        aktiv: bool,
+        kategorie: Optional[str],
+        einheit: Optional[str],
+    ):
+        self.id = id
+        self.artikelnummer = artikelnummer
+        self.name = name
+        self.basispreis = basispreis
+        self.waehrung = waehrung
+        self.aktiv = aktiv
+        self.kategorie = kategorie
+        self.einheit = einheit
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+def artikel_list_statement(
+    kategorie_id: Optional[int] = None,
+    nur_aktive: bool = True,
+    suchbegriff: Optional[str] = None,
+):
+    """SELECT nur der Spalten, die eine Artikelliste anzeigt."""
+    stmt = (
+        select(
+            Artikel.id,
+            Artikel.artikelnummer,
+            Artikel.name,
+            Artikel.basispreis,
+            Artikel.waehrung,
+            Artikel.aktiv,
+            ArtikelKategorie.name.label("kategorie"),
+            Einheit.symbol.label("einheit"),
+        )
+        .outerjoin(ArtikelKategorie, Artikel.kategorie_id == ArtikelKategorie.id)
+        .outerjoin(Einheit, Artikel.einheit_id == Einheit.id)
+        .order_by(Artikel.name, Artikel.id)
+    )
+    if kategorie_id is not None:
+        stmt = stmt.where(Artikel.kategorie_id == kategorie_id)
+    if nur_aktive:
+        stmt = stmt.where(Artikel.aktiv.is_(True))
+    if suchbegriff:
+        pattern = f"%{suchbegriff}%"
+        stmt = stmt.where(Artikel.name.ilike(pattern) | Artikel.artikelnummer.ilike(pattern))
+    return stmt
+
+
+def list_artikel_rows(
+    db: Session,
+    kategorie_id: Optional[int] = None,
+    nur_aktive: bool = True,
+    suchbegriff: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 100,
+) -> Sequence[Tuple]:
+    """Artikelliste als Row-Tupel in genau einer Abfrage."""
+    stmt = artikel_list_statement(kategorie_id, nur_aktive, suchbegriff)
+    return db.execute(stmt.offset(offset).limit(limit)).all()
+
+
+def list_artikel_items(db: Session, **filters: Any) -> List[ArtikelListItem]:
+    """Wie ``list_artikel_rows``, aber als ``__slots__``-DTOs."""
+    return [ArtikelListItem(*row) for row in list_artikel_rows(db, **filters)]
@@ -221,6 +221,7 @@ def get_articles_optimized(db: Session, category: Optional[str] = None, page: in
         Dictionary mit Artikeln und Paginierungsinformationen
     """
     from backend.models.artikel import Artikel
+    from backend.db.artikel_loading import artikel_load_options
     
     # Basisabfrage mit effizienter Datenbankfilterung und -sortierung
     query = db.query(Artikel)
@@ -229,13 +230,12 @@ def get_articles_optimized(db: Session, category: Optional[str] = None, page: in
     if category:
         query = query.filter(Artikel.kategorie == category)
     
-    # Sortierung in der Datenbank durchführen
-    query = query.order_by(Artikel.name)
-    
-    # Gesamtzahl für Paginierung berechnen
+    # Gesamtzahl für Paginierung berechnen (ohne Joins des Ladeprofils)
     total = query.count()
     
-    # Paginierung in der Datenbank durchführen
+    # Sortierung und Paginierung in der Datenbank durchführen,
+    # Beziehungen über das Listen-Ladeprofil laden (kein N+1)
+    query = query.options(*artikel_load_options("list")).order_by(Artikel.name)
     query = query.offset((page - 1) * page_size).limit(page_size)
     
     # Optimierte Abfrage ausführen
@@ -249,7 +249,7 @@ def get_articles_optimized(db: Session, category: Optional[str] = None, page: in
         "pages": (total + page_size - 1) // page_size
     }
 
-def process_artikel_batches(db: Session, artikel_ids, batch_size=100, callback=None):
+def process_artikel_batches(db: Session, artikel_ids, batch_size=100, callback=None, profile=None):
     """
     Verarbeitet Artikel in Batches, um Speicherverbrauch zu reduzieren.
     
@@ -258,17 +258,20 @@ def process_artikel_batches(db: Session, artikel_ids, batch_size=100, callback=N
         artikel_ids: Liste von Artikel-IDs
         batch_size: Größe jedes Batches
         callback: Optionale Callback-Funktion für jeden Batch
+        profile: Optionales Artikel-Ladeprofil (list, detail, pos, export)
         
     Returns:
         Ergebnisse der Verarbeitung
     """
     from backend.models.artikel import Artikel
+    from backend.db.artikel_loading import artikel_load_options
     
+    options = artikel_load_options(profile) if profile else []
     results = []
     
     for i in range(0, len(artikel_ids), batch_size):
         batch = artikel_ids[i:i+batch_size]
-        artikel_batch = db.query(Artikel).filter(Artikel.id.in_(batch)).all()
+        artikel_batch = db.query(Artikel).options(*options).filter(Artikel.id.in_(batch)).all()
         
         if callback:
             batch_result = callback(artikel_batch)
@@ -3,20 +3,54 @@ Materialisierte Ansichten für das ERP-System.
 
 Dieses Modul stellt Funktionen zur Erstellung und Aktualisierung
 materialisierter Ansichten bereit, um häufige Abfragen zu optimieren.
+
+Änderungserkennung (einmalig über ``install_change_tracking`` eingerichtet):
+- Trigger auf den Basistabellen schreiben je Änderung eine Zeile in das
+  Änderungsprotokoll ``materialized_views_change_log`` (nur Inserts, schreibende
+  Transaktionen warten nicht aufeinander). Vor einer Aktualisierung wird das
+  Protokoll in die Summen von ``materialized_views_changes`` verdichtet; Summe
+  plus Protokoll beim Aufbau ist die Signatur einer Ansicht.
+- Für inkrementelle Ansichten vermerken Trigger jede neue Quellzeile in
+  ``materialized_views_delta``; auch spät committete Zeilen mit niedriger ID
+  gehen so nicht verloren.
+
+Aktualisierungsstrategien:
+- Inkrementell (``INCREMENTAL_VIEWS``): reine Aggregate über das Lagerbewegungs-
+  Journal; nur die in ``materialized_views_delta`` vermerkten Bewegungen werden
+  aggregiert und per Upsert in die Ansicht gemischt. Wurden Quellzeilen geändert
+  oder gelöscht, wird die Ansicht vollständig neu aufgebaut.
+- PostgreSQL: übrige Ansichten sind native ``MATERIALIZED VIEW``s und werden mit
+  ``REFRESH MATERIALIZED VIEW CONCURRENTLY`` aktualisiert (Leser blockieren nicht).
+- SQLite: übrige Ansichten werden als Tabelle neu aufgebaut und atomar getauscht.
+
+Über ``VIEW_DEPENDENCIES`` werden nur Ansichten aktualisiert, deren Basistabellen
+sich geändert haben (``refresh_changed_views``).
 """
 
+import datetime
+import json
 import logging
-from sqlalchemy import create_engine, text, Table, MetaData, Column, Integer, String, Float, DateTime
-from sqlalchemy.schema import CreateTable, DropTable
-from sqlalchemy.exc import SQLAlchemyError
-from typing import Dict, Any, Optional, List
 import time
-import datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from graphlib import TopologicalSorter
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from prometheus_client import Gauge
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
 
 # Logger konfigurieren
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Platzhalter für den dialektabhängigen Monatsausdruck
+MONTH_EXPRESSIONS = {
+    "sqlite": "strftime('%Y-%m', datum)",
+    "postgresql": "to_char(datum, 'YYYY-MM')",
+}
+
 # Standardansichten definieren
 STANDARD_VIEWS = {
     "mv_lagerbestand_pro_artikel": """
@@ -36,225 +70,802 @@ STANDARD_VIEWS = {
         GROUP BY kategorie
     """,
     "mv_lagerbewegungen_pro_monat": """
-        SELECT 
-            strftime('%Y-%m', datum) as monat, 
+        SELECT
+            {monat} as monat,
             COUNT(*) as anzahl_bewegungen,
             SUM(CASE WHEN menge > 0 THEN menge ELSE 0 END) as eingang,
             SUM(CASE WHEN menge < 0 THEN -menge ELSE 0 END) as ausgang
         FROM lagerbewegung
-        GROUP BY strftime('%Y-%m', datum)
+        GROUP BY {monat}
     """
 }
 
+# Basistabellen (oder andere Ansichten), aus denen eine Ansicht gelesen wird
+VIEW_DEPENDENCIES: Dict[str, List[str]] = {
+    "mv_lagerbestand_pro_artikel": ["lagerbewegung"],
+    "mv_chargen_pro_kategorie": ["charge", "artikel"],
+    "mv_durchschnittlicher_artikelpreis": ["artikel"],
+    "mv_lagerbewegungen_pro_monat": ["lagerbewegung"],
+}
+
+# Eindeutige Schlüssel pro Ansicht (Upsert-Ziel bzw. Voraussetzung für CONCURRENTLY)
+VIEW_KEYS: Dict[str, List[str]] = {
+    "mv_lagerbestand_pro_artikel": ["artikel_id"],
+    "mv_chargen_pro_kategorie": ["kategorie"],
+    "mv_durchschnittlicher_artikelpreis": ["kategorie"],
+    "mv_lagerbewegungen_pro_monat": ["monat"],
+}
+
+
+@dataclass(frozen=True)
+class IncrementalViewSpec:
+    """
+    Beschreibung einer inkrementell gepflegten Ansicht.
+
+    ``delta_query`` aggregiert nur die in ``materialized_views_delta`` für
+    ``:view_name`` vermerkten Zeilen (über ``id_column``); die Ergebnisse werden
+    auf die ``sum_columns`` der Ansicht addiert. Das setzt eine append-only
+    Quelltabelle voraus (Lagerbewegungen werden storniert, nicht geändert);
+    UPDATE oder DELETE auf der Quelle führt zum vollständigen Neuaufbau.
+    """
+
+    source_table: str
+    id_column: str
+    delta_query: str
+    sum_columns: List[str]
+
+
+INCREMENTAL_VIEWS: Dict[str, IncrementalViewSpec] = {
+    "mv_lagerbestand_pro_artikel": IncrementalViewSpec(
+        source_table="lagerbewegung",
+        id_column="id",
+        delta_query="""
+            SELECT artikel_id, SUM(menge) as bestand
+            FROM lagerbewegung
+            WHERE id IN (SELECT source_id FROM materialized_views_delta WHERE view_name = :view_name)
+            GROUP BY artikel_id
+        """,
+        sum_columns=["bestand"],
+    ),
+    "mv_lagerbewegungen_pro_monat": IncrementalViewSpec(
+        source_table="lagerbewegung",
+        id_column="id",
+        delta_query="""
+            SELECT
+                {monat} as monat,
+                COUNT(*) as anzahl_bewegungen,
+                SUM(CASE WHEN menge > 0 THEN menge ELSE 0 END) as eingang,
+                SUM(CASE WHEN menge < 0 THEN -menge ELSE 0 END) as ausgang
+            FROM lagerbewegung
+            WHERE id IN (SELECT source_id FROM materialized_views_delta WHERE view_name = :view_name)
+            GROUP BY {monat}
+        """,
+        sum_columns=["anzahl_bewegungen", "eingang", "ausgang"],
+    ),
+}
+
+# Änderungsprotokoll je Dialekt
+CHANGE_LOG_TABLES = {
+    "postgresql": """
+        CREATE TABLE IF NOT EXISTS materialized_views_change_log (
+            id BIGSERIAL PRIMARY KEY,
+            table_name VARCHAR(100) NOT NULL,
+            mutation SMALLINT NOT NULL DEFAULT 0
+        )
+    """,
+    "sqlite": """
+        CREATE TABLE IF NOT EXISTS materialized_views_change_log (
+            id INTEGER PRIMARY KEY,
+            table_name VARCHAR(100) NOT NULL,
+            mutation SMALLINT NOT NULL DEFAULT 0
+        )
+    """,
+}
+
+# PostgreSQL: Trigger-Funktionen der Änderungserkennung
+PG_TRACKING_FUNCTIONS = [
+    """
+    CREATE OR REPLACE FUNCTION mv_track_changes() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO materialized_views_change_log (table_name, mutation)
+        VALUES (TG_TABLE_NAME, CASE WHEN TG_OP = 'INSERT' THEN 0 ELSE 1 END);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION mv_track_delta() RETURNS trigger AS $$
+    DECLARE
+        target_view text;
+    BEGIN
+        FOREACH target_view IN ARRAY TG_ARGV LOOP
+            INSERT INTO materialized_views_delta (view_name, source_id) VALUES (target_view, NEW.id);
+        END LOOP;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+]
+
+view_staleness = Gauge(
+    'materialized_view_staleness_seconds',
+    'Seconds since the base tables of a materialized view changed without refresh',
+    ['view']
+)
+
+view_pending_rows = Gauge(
+    'materialized_view_pending_rows',
+    'Source rows not yet merged into an incrementally maintained view',
+    ['view']
+)
+
+
+def _render_query(engine, query: str) -> str:
+    """Setzt dialektabhängige Ausdrücke in eine Ansichtsabfrage ein."""
+    month = MONTH_EXPRESSIONS.get(engine.dialect.name, MONTH_EXPRESSIONS["sqlite"])
+    return query.replace("{monat}", month)
+
+
+def _uses_native_view(engine, view_name: str) -> bool:
+    """Native materialisierte Ansichten gibt es nur auf PostgreSQL (nicht für inkrementelle Ansichten)."""
+    return engine.dialect.name == "postgresql" and view_name not in INCREMENTAL_VIEWS
+
+
+def _view_exists(conn, view_name: str) -> bool:
+    inspector = inspect(conn)
+    if conn.dialect.name == "postgresql" and view_name in inspector.get_materialized_view_names():
+        return True
+    return inspector.has_table(view_name)
+
+
+def _ensure_meta_table(conn) -> None:
+    """Legt die Metadatentabelle an und ergänzt fehlende Spalten älterer Installationen."""
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS materialized_views_meta (
+            view_name VARCHAR(100) PRIMARY KEY,
+            last_refresh TIMESTAMP,
+            refresh_count INTEGER,
+            source_signature TEXT,
+            last_duration FLOAT
+        )
+    """))
+    existing = {col["name"] for col in inspect(conn).get_columns("materialized_views_meta")}
+    for column, column_type in (
+        ("source_signature", "TEXT"),
+        ("last_duration", "FLOAT"),
+    ):
+        if column not in existing:
+            conn.execute(text(f"ALTER TABLE materialized_views_meta ADD COLUMN {column} {column_type}"))
+
+
+def _tracked_tables() -> Set[str]:
+    """Basistabellen (keine Ansichten), deren Änderungen gezählt werden."""
+    return {
+        table for sources in VIEW_DEPENDENCIES.values() for table in sources if table not in STANDARD_VIEWS
+    }
+
+
+def _tracking_installed(conn) -> bool:
+    return inspect(conn).has_table("materialized_views_change_log")
+
+
+def install_change_tracking(conn) -> None:
+    """
+    Richtet Änderungsprotokoll, Zähler- und Delta-Tabelle sowie die Trigger der
+    Änderungserkennung ein.
+
+    Einmalig bei der Einrichtung bzw. per Migration aufrufen, nicht beim
+    Aktualisieren. Bestehende Trigger werden nie vorab gelöscht, damit keine
+    Änderung durch die Lücke fällt: PostgreSQL (ab Version 14) ersetzt sie mit
+    ``CREATE OR REPLACE TRIGGER`` in der laufenden Transaktion, unter SQLite
+    werden die Trigger angelegt, bevor die der Vorversion entfallen. Tabellen,
+    die erst später angelegt werden, gelten bis zum nächsten Aufruf als nicht
+    erfasst (vollständiger Neuaufbau).
+
+    Args:
+        conn: Verbindung in einer offenen Transaktion
+    """
+    postgresql = conn.dialect.name == "postgresql"
+    if postgresql:
+        # Parallele Einrichtungen nacheinander ausführen
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('materialized_views_tracking'))"))
+
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS materialized_views_changes (
+            table_name VARCHAR(100) PRIMARY KEY,
+            change_count BIGINT NOT NULL DEFAULT 0,
+            mutation_count BIGINT NOT NULL DEFAULT 0
+        )
+    """))
+    conn.execute(text(CHANGE_LOG_TABLES["postgresql" if postgresql else "sqlite"]))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS materialized_views_delta (
+            view_name VARCHAR(100) NOT NULL,
+            source_id BIGINT NOT NULL
+        )
+    """))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_materialized_views_delta ON materialized_views_delta (view_name, source_id)"
+    ))
+
+    if postgresql:
+        for statement in PG_TRACKING_FUNCTIONS:
+            conn.execute(text(statement))
+
+    existing = set(inspect(conn).get_table_names())
+    tracked = {row[0] for row in conn.execute(text("SELECT table_name FROM materialized_views_changes"))}
+    for table in sorted(_tracked_tables() & existing):
+        if table not in tracked:
+            conn.execute(text("INSERT INTO materialized_views_changes (table_name) VALUES (:table)"),
+                         {"table": table})
+        delta_views = sorted(name for name, spec in INCREMENTAL_VIEWS.items() if spec.source_table == table)
+
+        if postgresql:
+            conn.execute(text(
+                f"CREATE OR REPLACE TRIGGER mv_track_{table} AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE "
+                f"ON {table} FOR EACH STATEMENT EXECUTE FUNCTION mv_track_changes()"
+            ))
+            if delta_views:
+                arguments = ", ".join(f"'{name}'" for name in delta_views)
+                conn.execute(text(
+                    f"CREATE OR REPLACE TRIGGER mv_delta_{table} AFTER INSERT ON {table} "
+                    f"FOR EACH ROW EXECUTE FUNCTION mv_track_delta({arguments})"
+                ))
+            continue
+
+        log = "INSERT INTO materialized_views_change_log (table_name, mutation) " \
+              f"VALUES ('{table}', {{mutation}});"
+        # Doppelte Delta-Zeilen sind unschädlich (die Delta-Abfragen filtern mit IN)
+        deltas = "".join(
+            f" INSERT INTO materialized_views_delta (view_name, source_id) "
+            f"VALUES ('{name}', NEW.{INCREMENTAL_VIEWS[name].id_column});"
+            for name in delta_views
+        )
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS mv_log_{table}_insert AFTER INSERT ON {table} "
+            f"BEGIN {log.format(mutation=0)}{deltas} END"
+        ))
+        for operation in ("UPDATE", "DELETE"):
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS mv_log_{table}_{operation.lower()} AFTER {operation} ON {table} "
+                f"BEGIN {log.format(mutation=1)} END"
+            ))
+        # Zählertrigger der Vorversion erst entfernen, wenn die neuen greifen
+        for operation in ("insert", "update", "delete"):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS mv_track_{table}_{operation}"))
+
+
+def _compact_change_log(engine) -> None:
+    """
+    Verdichtet das Änderungsprotokoll in die Summen von ``materialized_views_changes``.
+
+    Summen und Protokoll ändern sich in derselben Transaktion, die Signaturen
+    bleiben daher gleich. Nur der Aktualisierungslauf schreibt die Summen;
+    Zeilen, die erst nach dem Snapshot committet werden, bleiben für den
+    nächsten Lauf stehen.
+    """
+    try:
+        with _snapshot(engine) as conn:
+            if not _tracking_installed(conn):
+                return
+            last_id = conn.execute(text("SELECT MAX(id) FROM materialized_views_change_log")).scalar()
+            if last_id is None:
+                return
+            totals = conn.execute(text("""
+                SELECT table_name, COUNT(*), COALESCE(SUM(mutation), 0)
+                FROM materialized_views_change_log
+                WHERE id <= :last_id
+                GROUP BY table_name
+            """), {"last_id": last_id}).fetchall()
+            tracked = {row[0] for row in conn.execute(text("SELECT table_name FROM materialized_views_changes"))}
+            for table, changes, mutations in totals:
+                if table not in tracked:
+                    conn.execute(text("INSERT INTO materialized_views_changes (table_name) VALUES (:table)"),
+                                 {"table": table})
+                conn.execute(text("""
+                    UPDATE materialized_views_changes
+                       SET change_count = change_count + :changes,
+                           mutation_count = mutation_count + :mutations
+                     WHERE table_name = :table
+                """), {"table": table, "changes": changes, "mutations": mutations})
+            conn.execute(text("DELETE FROM materialized_views_change_log WHERE id <= :last_id"),
+                         {"last_id": last_id})
+    except SQLAlchemyError as e:
+        # Z.B. parallel laufende Verdichtung; das Protokoll bleibt dann stehen
+        logger.warning(f"Änderungsprotokoll der materialisierten Ansichten nicht verdichtet: {e}")
+
+
+def _source_signatures(conn, tables: Iterable[str]) -> Dict[str, str]:
+    """
+    Signatur (Änderungs- und Mutationszähler aus Summen und Protokoll) je
+    Basistabelle zur Änderungserkennung.
+
+    Tabellen ohne Zähler gelten immer als geändert.
+    """
+    tables = [table for table in tables if table not in STANDARD_VIEWS]
+    if not tables:
+        return {}
+    counters = {}
+    if _tracking_installed(conn):
+        counters = {
+            row[0]: f"{row[1]}:{row[2]}" for row in conn.execute(text("""
+                SELECT table_name, SUM(changes), SUM(mutations) FROM (
+                    SELECT table_name, change_count AS changes, mutation_count AS mutations
+                    FROM materialized_views_changes
+                    UNION ALL
+                    SELECT table_name, COUNT(*), SUM(mutation)
+                    FROM materialized_views_change_log
+                    GROUP BY table_name
+                ) counters
+                GROUP BY table_name
+            """))
+        }
+    return {table: counters.get(table, f"untracked:{time.time()}") for table in tables}
+
+
+def _mutations(signature: Optional[str]) -> Optional[str]:
+    """Mutationszähler (UPDATE/DELETE) aus einer Signatur."""
+    if not signature or signature.count(":") != 1 or signature.startswith("untracked"):
+        return None
+    return signature.split(":")[1]
+
+
+@contextmanager
+def _snapshot(engine):
+    """
+    Transaktion, in der Signatur, Delta und Aufbau denselben Datenstand sehen
+    (PostgreSQL: REPEATABLE READ; SQLite ist ohnehin serialisierbar).
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="REPEATABLE READ") as conn:
+            with conn.begin():
+                yield conn
+    else:
+        with engine.begin() as conn:
+            yield conn
+
+
+def _write_meta(conn, view_name: str, duration: float, signature: Dict[str, str],
+                reset: bool = False) -> None:
+    conn.execute(text("""
+        INSERT INTO materialized_views_meta
+            (view_name, last_refresh, refresh_count, source_signature, last_duration)
+        VALUES (:view_name, :now, 1, :signature, :duration)
+        ON CONFLICT (view_name) DO UPDATE SET
+            last_refresh = excluded.last_refresh,
+            refresh_count = CASE WHEN :reset THEN 1
+                                 ELSE materialized_views_meta.refresh_count + 1 END,
+            source_signature = excluded.source_signature,
+            last_duration = excluded.last_duration
+    """), {
+        "view_name": view_name,
+        "now": datetime.datetime.now(),
+        "signature": json.dumps(signature),
+        "duration": duration,
+        "reset": reset,
+    })
+
+
+def _stored_signature(conn, view_name: str) -> Dict[str, str]:
+    value = conn.execute(
+        text("SELECT source_signature FROM materialized_views_meta WHERE view_name = :view_name"),
+        {"view_name": view_name},
+    ).scalar()
+    return json.loads(value or "{}")
+
+
+def _clear_delta(conn, view_name: str) -> None:
+    if not inspect(conn).has_table("materialized_views_delta"):
+        return
+    conn.execute(text("DELETE FROM materialized_views_delta WHERE view_name = :view_name"),
+                 {"view_name": view_name})
+
+
+def _create_unique_index(conn, view_name: str) -> None:
+    keys = VIEW_KEYS.get(view_name)
+    if keys:
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{view_name} ON {view_name} ({', '.join(keys)})"
+        ))
+
+
+def _build_view_table(conn, engine, view_name: str, query: str) -> None:
+    """Baut eine Ansicht als Tabelle auf; bei inkrementellen Ansichten wird das Delta verworfen."""
+    conn.execute(text(f"CREATE TABLE {view_name} AS {_render_query(engine, query)}"))
+    _create_unique_index(conn, view_name)
+    if view_name in INCREMENTAL_VIEWS:
+        _clear_delta(conn, view_name)
+
+
 def create_materialized_view(engine, view_name: str, query: str, recreate: bool = False):
     """
     Erstellt eine materialisierte Ansicht in der Datenbank.
-    
-    Da SQLite keine nativen materialisierten Ansichten unterstützt, 
-    wird eine Tabelle erstellt und mit den Ergebnissen der Abfrage gefüllt.
-    
+
+    Auf PostgreSQL wird eine native materialisierte Ansicht mit eindeutigem Index
+    angelegt. Unter SQLite sowie für inkrementell gepflegte Ansichten wird eine
+    Tabelle erstellt und mit den Ergebnissen der Abfrage gefüllt.
+
     Args:
         engine: SQLAlchemy-Engine
         view_name: Name der materialisierten Ansicht
         query: SQL-Abfrage für die Ansicht
         recreate: Ob die Ansicht neu erstellt werden soll, falls sie bereits existiert
-    
+
     Returns:
         bool: True bei Erfolg, False bei Fehler
     """
     try:
-        with engine.connect() as conn:
+        with engine.begin() as conn:
+            _ensure_meta_table(conn)
+            if not _tracking_installed(conn):
+                install_change_tracking(conn)
+
+        with _snapshot(engine) as conn:
             # Prüfen, ob die Ansicht bereits existiert
-            result = conn.execute(text(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{view_name}'"))
-            exists = result.fetchone() is not None
-            
+            exists = _view_exists(conn, view_name)
+
             if exists and not recreate:
                 logger.info(f"Materialisierte Ansicht {view_name} existiert bereits. Überspringe...")
                 return True
-            
+
+            native = _uses_native_view(engine, view_name)
             if exists:
                 # Ansicht löschen, wenn sie bereits existiert und neu erstellt werden soll
-                conn.execute(text(f"DROP TABLE IF EXISTS {view_name}"))
+                kind = "MATERIALIZED VIEW" if native else "TABLE"
+                conn.execute(text(f"DROP {kind} IF EXISTS {view_name}"))
                 logger.info(f"Materialisierte Ansicht {view_name} gelöscht")
-            
-            # Ansicht erstellen
-            create_stmt = f"CREATE TABLE {view_name} AS {query}"
-            conn.execute(text(create_stmt))
-            
-            # Zeitstempel für die Aktualisierung speichern
-            conn.execute(text(f"""
-                CREATE TABLE IF NOT EXISTS materialized_views_meta (
-                    view_name TEXT PRIMARY KEY,
-                    last_refresh TIMESTAMP,
-                    refresh_count INTEGER
-                )
-            """))
-            
+
+            # Ansicht erstellen; die Signatur stammt aus demselben Datenstand
+            start_time = time.time()
+            signature = _source_signatures(conn, VIEW_DEPENDENCIES.get(view_name, []))
+            if native:
+                conn.execute(text(f"CREATE MATERIALIZED VIEW {view_name} AS {_render_query(engine, query)}"))
+                _create_unique_index(conn, view_name)
+            else:
+                _build_view_table(conn, engine, view_name, query)
+
             # Metadaten aktualisieren
-            now = datetime.datetime.now().isoformat()
-            conn.execute(text(f"""
-                INSERT OR REPLACE INTO materialized_views_meta (view_name, last_refresh, refresh_count)
-                VALUES ('{view_name}', '{now}', 1)
-            """))
-            
-            conn.commit()
+            _write_meta(conn, view_name, time.time() - start_time, signature, reset=True)
+
             logger.info(f"Materialisierte Ansicht {view_name} erfolgreich erstellt")
             return True
-    
+
     except SQLAlchemyError as e:
         logger.error(f"Fehler beim Erstellen der materialisierten Ansicht {view_name}: {e}")
         return False
 
-def refresh_materialized_view(engine, view_name: str, query: Optional[str] = None):
+
+def _refresh_incremental(conn, engine, view_name: str, spec: IncrementalViewSpec,
+                         signature: Dict[str, str]) -> bool:
+    """
+    Mischt die im Delta vermerkten Quellzeilen in die Ansicht.
+
+    Returns:
+        False, wenn Quellzeilen geändert oder gelöscht wurden und die Ansicht
+        vollständig neu aufgebaut werden muss
+    """
+    stored = _stored_signature(conn, view_name)
+    source = spec.source_table
+    if _mutations(stored.get(source)) is None or _mutations(stored.get(source)) != _mutations(signature.get(source)):
+        return False
+
+    keys = VIEW_KEYS[view_name]
+    columns = keys + spec.sum_columns
+    updates = ", ".join(
+        f"{col} = COALESCE({view_name}.{col}, 0) + excluded.{col}" for col in spec.sum_columns
+    )
+    conn.execute(text(f"""
+        INSERT INTO {view_name} ({', '.join(columns)})
+        SELECT {', '.join(columns)} FROM ({_render_query(engine, spec.delta_query)}) delta
+        WHERE true
+        ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}
+    """), {"view_name": view_name})
+    _clear_delta(conn, view_name)
+    return True
+
+
+def refresh_materialized_view(engine, view_name: str, query: Optional[str] = None, full: bool = False):
     """
     Aktualisiert eine materialisierte Ansicht.
-    
+
+    Inkrementelle Ansichten werden um neue Quellzeilen fortgeschrieben, sofern
+    nicht ``full`` gesetzt ist. Native Ansichten auf PostgreSQL werden mit
+    ``REFRESH MATERIALIZED VIEW CONCURRENTLY`` aktualisiert, alle übrigen
+    vollständig neu aufgebaut.
+
     Args:
         engine: SQLAlchemy-Engine
         view_name: Name der materialisierten Ansicht
         query: SQL-Abfrage für die Ansicht (falls nicht angegeben, wird die aktuelle Ansicht verwendet)
-    
+        full: Vollständigen Neuaufbau erzwingen
+
     Returns:
         bool: True bei Erfolg, False bei Fehler
     """
     try:
-        with engine.connect() as conn:
+        # Wenn keine Abfrage angegeben wurde, versuchen wir die Abfrage aus den Standardansichten zu bekommen
+        if query is None:
+            if view_name in STANDARD_VIEWS:
+                query = STANDARD_VIEWS[view_name]
+            else:
+                logger.error(f"Keine Abfrage für Ansicht {view_name} angegeben und keine Standardansicht gefunden")
+                return False
+
+        start_time = time.time()
+
+        if _uses_native_view(engine, view_name):
+            # CONCURRENTLY ist nur außerhalb eines Transaktionsblocks erlaubt
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                if not _view_exists(conn, view_name):
+                    logger.error(f"Materialisierte Ansicht {view_name} existiert nicht")
+                    return False
+                # Signatur vor dem Refresh: spätere Änderungen gelten als ausstehend
+                signature = _source_signatures(conn, VIEW_DEPENDENCIES.get(view_name, []))
+                concurrently = "CONCURRENTLY " if view_name in VIEW_KEYS else ""
+                conn.execute(text(f"REFRESH MATERIALIZED VIEW {concurrently}{view_name}"))
+                _write_meta(conn, view_name, time.time() - start_time, signature)
+            logger.info(f"Materialisierte Ansicht {view_name} erfolgreich aktualisiert")
+            return True
+
+        with engine.begin() as conn:
+            _ensure_meta_table(conn)
+
+        with _snapshot(engine) as conn:
             # Prüfen, ob die Ansicht existiert
-            result = conn.execute(text(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{view_name}'"))
-            exists = result.fetchone() is not None
-            
-            if not exists:
+            if not _view_exists(conn, view_name):
                 logger.error(f"Materialisierte Ansicht {view_name} existiert nicht")
                 return False
-            
-            # Wenn keine Abfrage angegeben wurde, versuchen wir die Abfrage aus den Standardansichten zu bekommen
-            if query is None:
-                if view_name in STANDARD_VIEWS:
-                    query = STANDARD_VIEWS[view_name]
-                else:
-                    logger.error(f"Keine Abfrage für Ansicht {view_name} angegeben und keine Standardansicht gefunden")
-                    return False
-            
+            signature = _source_signatures(conn, VIEW_DEPENDENCIES.get(view_name, []))
+
+            spec = INCREMENTAL_VIEWS.get(view_name)
+            if spec is not None and not full:
+                if _refresh_incremental(conn, engine, view_name, spec, signature):
+                    _write_meta(conn, view_name, time.time() - start_time, signature)
+                    logger.info(f"Materialisierte Ansicht {view_name} inkrementell aktualisiert")
+                    return True
+                logger.info(f"Quellzeilen von {view_name} wurden geändert, vollständiger Neuaufbau")
+
             # Temporäre Tabelle für die Aktualisierung erstellen
             temp_table = f"{view_name}_temp"
             conn.execute(text(f"DROP TABLE IF EXISTS {temp_table}"))
-            conn.execute(text(f"CREATE TABLE {temp_table} AS {query}"))
-            
+            conn.execute(text(f"CREATE TABLE {temp_table} AS {_render_query(engine, query)}"))
+
             # Atomarer Austausch der Tabellen
             conn.execute(text(f"DROP TABLE {view_name}"))
             conn.execute(text(f"ALTER TABLE {temp_table} RENAME TO {view_name}"))
-            
+            _create_unique_index(conn, view_name)
+            if spec is not None:
+                _clear_delta(conn, view_name)
+
             # Metadaten aktualisieren
-            now = datetime.datetime.now().isoformat()
-            conn.execute(text(f"""
-                UPDATE materialized_views_meta 
-                SET last_refresh = '{now}', refresh_count = refresh_count + 1
-                WHERE view_name = '{view_name}'
-            """))
-            
-            conn.commit()
+            _write_meta(conn, view_name, time.time() - start_time, signature)
+
             logger.info(f"Materialisierte Ansicht {view_name} erfolgreich aktualisiert")
             return True
-    
+
     except SQLAlchemyError as e:
         logger.error(f"Fehler beim Aktualisieren der materialisierten Ansicht {view_name}: {e}")
         return False
 
+
+def get_view_staleness(engine, view_name: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Ermittelt die Aktualität der materialisierten Ansichten.
+
+    Eine Ansicht gilt als veraltet, wenn sich der Änderungszähler einer
+    Basistabelle seit der letzten Aktualisierung geändert hat (auch durch UPDATE
+    und DELETE); ``staleness_seconds`` ist dann die Zeit seit dieser
+    Aktualisierung. Für inkrementelle Ansichten wird zusätzlich die Zahl noch
+    nicht eingemischter Quellzeilen geliefert. Die Werte
+    werden auch als Prometheus-Gauges veröffentlicht.
+
+    Args:
+        engine: SQLAlchemy-Engine
+        view_name: Optional, Name einer spezifischen materialisierten Ansicht
+
+    Returns:
+        dict: Aktualität je Ansicht
+    """
+    view_names = [view_name] if view_name else list(STANDARD_VIEWS)
+    result = {}
+    with engine.connect() as conn:
+        _ensure_meta_table(conn)
+        tracking = _tracking_installed(conn)
+        rows = {
+            row.view_name: row for row in conn.execute(text(
+                "SELECT view_name, last_refresh, source_signature FROM materialized_views_meta"
+            ))
+        }
+        now = datetime.datetime.now()
+        for name in view_names:
+            row = rows.get(name)
+            if row is None:
+                result[name] = {"exists": False, "stale": True, "staleness_seconds": None}
+                continue
+
+            stored = json.loads(row.source_signature or "{}")
+            current = _source_signatures(conn, VIEW_DEPENDENCIES.get(name, []))
+            changed = sorted(table for table, signature in current.items() if stored.get(table) != signature)
+            last_refresh = row.last_refresh
+            if isinstance(last_refresh, str):
+                last_refresh = datetime.datetime.fromisoformat(last_refresh)
+            staleness = (now - last_refresh).total_seconds() if changed else 0.0
+
+            info = {
+                "exists": True,
+                "stale": bool(changed),
+                "changed_tables": changed,
+                "last_refresh": last_refresh.isoformat(),
+                "staleness_seconds": staleness,
+            }
+            spec = INCREMENTAL_VIEWS.get(name)
+            if spec is not None and tracking:
+                info["pending_rows"] = conn.execute(
+                    text("SELECT COUNT(*) FROM materialized_views_delta WHERE view_name = :view_name"),
+                    {"view_name": name},
+                ).scalar()
+                view_pending_rows.labels(view=name).set(info["pending_rows"])
+            view_staleness.labels(view=name).set(staleness)
+            result[name] = info
+        conn.commit()
+    return result
+
+
 def get_materialized_view_info(engine, view_name: Optional[str] = None):
     """
     Gibt Informationen über materialisierte Ansichten zurück.
-    
+
     Args:
         engine: SQLAlchemy-Engine
         view_name: Optional, Name einer spezifischen materialisierten Ansicht
-        
+
     Returns:
         dict: Informationen über die materialisierten Ansichten
     """
     try:
         with engine.connect() as conn:
+            query = """
+                SELECT view_name, last_refresh, refresh_count, last_duration
+                FROM materialized_views_meta
+            """
+            params = {}
             if view_name:
-                # Informationen über eine spezifische Ansicht abrufen
-                result = conn.execute(text(f"""
-                    SELECT view_name, last_refresh, refresh_count
-                    FROM materialized_views_meta
-                    WHERE view_name = '{view_name}'
-                """))
-                row = result.fetchone()
-                
-                if row:
-                    return {
-                        "view_name": row[0],
-                        "last_refresh": row[1],
-                        "refresh_count": row[2]
-                    }
-                else:
-                    return {"error": f"Materialisierte Ansicht {view_name} nicht gefunden"}
-            else:
-                # Informationen über alle Ansichten abrufen
-                result = conn.execute(text("""
-                    SELECT view_name, last_refresh, refresh_count
-                    FROM materialized_views_meta
-                """))
-                
-                views = []
-                for row in result.fetchall():
-                    views.append({
-                        "view_name": row[0],
-                        "last_refresh": row[1],
-                        "refresh_count": row[2]
-                    })
-                
-                return {"views": views}
-    
+                query += " WHERE view_name = :view_name"
+                params["view_name"] = view_name
+
+            views = []
+            for row in conn.execute(text(query), params).fetchall():
+                views.append({
+                    "view_name": row[0],
+                    "last_refresh": str(row[1]),
+                    "refresh_count": row[2],
+                    "last_duration": row[3],
+                    "incremental": row[0] in INCREMENTAL_VIEWS
+                })
+
+        staleness = get_view_staleness(engine, view_name)
+        for view in views:
+            view.update({
+                key: value for key, value in staleness.get(view["view_name"], {}).items()
+                if key in ("stale", "staleness_seconds", "pending_rows")
+            })
+
+        if view_name:
+            if views:
+                return views[0]
+            return {"error": f"Materialisierte Ansicht {view_name} nicht gefunden"}
+        return {"views": views}
+
     except SQLAlchemyError as e:
         logger.error(f"Fehler beim Abrufen von Informationen über materialisierte Ansichten: {e}")
         return {"error": str(e)}
 
+
+def affected_views(changed_tables: Iterable[str]) -> Set[str]:
+    """
+    Bestimmt alle Ansichten, die (auch transitiv über andere Ansichten) von den
+    geänderten Tabellen abhängen.
+    """
+    affected: Set[str] = set()
+    pending = set(changed_tables)
+    while pending:
+        table = pending.pop()
+        for view_name, sources in VIEW_DEPENDENCIES.items():
+            if table in sources and view_name not in affected:
+                affected.add(view_name)
+                pending.add(view_name)
+    return affected
+
+
+def _refresh_in_dependency_order(engine, view_names: Set[str], full: bool = False,
+                                 max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Aktualisiert Ansichten in topologischer Reihenfolge. Voneinander unabhängige
+    Ansichten laufen auf PostgreSQL parallel, unter SQLite seriell (Schreibsperre).
+    """
+    sorter = TopologicalSorter({
+        name: [dep for dep in VIEW_DEPENDENCIES.get(name, []) if dep in view_names]
+        for name in view_names
+    })
+    sorter.prepare()
+    _compact_change_log(engine)
+    if max_workers is None:
+        max_workers = 1 if engine.dialect.name == "sqlite" else 4
+
+    def run(view_name: str) -> Dict[str, Any]:
+        start_time = time.time()
+        success = refresh_materialized_view(engine, view_name, STANDARD_VIEWS.get(view_name), full=full)
+        return {"success": success, "duration": time.time() - start_time}
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while sorter.is_active():
+            ready = list(sorter.get_ready())
+            for view_name, result in zip(ready, executor.map(run, ready)):
+                results[view_name] = result
+                sorter.done(view_name)
+    return results
+
+
+def refresh_changed_views(engine, changed_tables: Optional[Iterable[str]] = None,
+                          full: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Aktualisiert nur die Ansichten, deren Basistabellen sich geändert haben.
+
+    Args:
+        engine: SQLAlchemy-Engine
+        changed_tables: Geänderte Tabellen; ohne Angabe werden sie über die
+            gespeicherten Tabellensignaturen ermittelt
+        full: Vollständigen Neuaufbau erzwingen
+
+    Returns:
+        dict: Ergebnis der Aktualisierung je aktualisierter Ansicht
+    """
+    if changed_tables is None:
+        changed_tables = {
+            table
+            for info in get_view_staleness(engine).values()
+            for table in info.get("changed_tables", [])
+        }
+    return _refresh_in_dependency_order(engine, affected_views(changed_tables), full=full)
+
+
 def setup_materialized_views(engine):
     """
-    Richtet alle Standardansichten ein.
-    
+    Richtet die Änderungserkennung und alle Standardansichten ein.
+
     Args:
         engine: SQLAlchemy-Engine
-        
+
     Returns:
         dict: Ergebnis der Einrichtung
     """
     results = {}
-    
+    with engine.begin() as conn:
+        install_change_tracking(conn)
+
     for view_name, query in STANDARD_VIEWS.items():
         start_time = time.time()
         success = create_materialized_view(engine, view_name, query)
         duration = time.time() - start_time
-        
+
         results[view_name] = {
             "success": success,
             "duration": duration
         }
-    
+
     return results
 
-def refresh_all_materialized_views(engine):
+
+def refresh_all_materialized_views(engine, full: bool = False):
     """
-    Aktualisiert alle materialisierten Ansichten.
-    
+    Aktualisiert alle materialisierten Ansichten in Abhängigkeitsreihenfolge.
+
     Args:
         engine: SQLAlchemy-Engine
-        
+        full: Auch inkrementelle Ansichten vollständig neu aufbauen
+
     Returns:
         dict: Ergebnis der Aktualisierung
     """
-    results = {}
-    
-    for view_name, query in STANDARD_VIEWS.items():
-        start_time = time.time()
-        success = refresh_materialized_view(engine, view_name, query)
-        duration = time.time() - start_time
-        
-        results[view_name] = {
-            "success": success,
-            "duration": duration
-        }
-    
-    return results 
\ No newline at end of file
+    return _refresh_in_dependency_order(engine, set(STANDARD_VIEWS), full=full)
@@ -0,0 +1,440 @@
+"""
+Gepuffertes, nur fortschreibbares Audit-Log für Transaktionen.
+
+``TransactionAuditSink`` sammelt Audit-Einträge im Speicher und schreibt sie
+blockweise statt Zeile für Zeile über das ORM:
+
+- PostgreSQL mit psycopg2: ``COPY ... FROM STDIN``, sonst Mehrzeilen-Inserts
+  (executemany) über SQLAlchemy Core
+- Hash-Kette: jeder Eintrag enthält den SHA-256 seines Vorgängers; die laufende
+  Nummer und der letzte Hash stehen in ``transaction_audit_chain`` und werden
+  je Block unter Zeilensperre fortgeschrieben
+- Monatspartitionen (PostgreSQL) werden bei Bedarf angelegt, ein Trigger
+  verhindert UPDATE und DELETE
+- Abfragen nach Transaktion, Benutzer und Zeitraum sowie ``verify`` zur
+  Prüfung der Kette
+"""
+
+import csv
+import hashlib
+import io
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Table, and_, insert, select, text, update
+from sqlalchemy.engine import Connection, Engine
+
+from backend.models.transaction_processing.models import (
+    AuditLogSeverity,
+    TransactionAuditChain,
+    TransactionAuditLog,
+)
+
+logger = logging.getLogger(__name__)
+
+# Vorgänger-Hash des ersten Eintrags
+GENESIS_HASH = "0" * 64
+
+# Einträge je Schreibvorgang
+DEFAULT_BATCH_SIZE = 1000
+
+# Sekunden zwischen zwei Schreibvorgängen des Hintergrund-Threads
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# Höchstens gepufferte Einträge, z.B. während die Datenbank nicht erreichbar ist
+DEFAULT_MAX_BUFFER = 100000
+
+# Zeilen je Abrufblock bei der Prüfung der Kette
+VERIFY_FETCH_SIZE = 5000
+
+COLUMNS = ("id", "transaction_id", "item_id", "timestamp", "action", "severity",
+           "message", "details", "user_id", "previous_hash", "entry_hash")
+
+
+class AuditBufferFullError(RuntimeError):
+    """Der Puffer ist voll; der Eintrag wurde nicht angenommen."""
+
+
+@dataclass
+class AuditEntry:
+    """Ein noch nicht geschriebener Audit-Eintrag."""
+
+    transaction_id: int
+    action: str
+    message: str
+    severity: AuditLogSeverity = AuditLogSeverity.INFO
+    item_id: Optional[int] = None
+    details: Optional[Dict[str, Any]] = None
+    user_id: Optional[int] = None
+    timestamp: datetime = field(default_factory=datetime.now)
+
+
+def _canonical_details(details: Optional[Dict[str, Any]]) -> Optional[str]:
+    if details is None:
+        return None
+    return json.dumps(details, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def compute_entry_hash(row: Dict[str, Any]) -> str:
+    """
+    SHA-256 eines Eintrags einschließlich des Vorgänger-Hashes.
+
+    Args:
+        row: Spaltenwerte des Eintrags (ohne ``entry_hash``)
+    """
+    severity = row["severity"]
+    parts = (
+        row["id"],
+        row["transaction_id"],
+        "" if row["item_id"] is None else row["item_id"],
+        row["timestamp"].isoformat(),
+        row["action"],
+        severity.value if isinstance(severity, AuditLogSeverity) else severity,
+        row["message"],
+        _canonical_details(row["details"]) or "",
+        "" if row["user_id"] is None else row["user_id"],
+        row["previous_hash"],
+    )
+    return hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def _month_bounds(moment: datetime) -> Tuple[datetime, datetime]:
+    start = datetime(moment.year, moment.month, 1)
+    end = datetime(moment.year + (moment.month == 12), moment.month % 12 + 1, 1)
+    return start, end
+
+
+def ensure_audit_schema(engine: Engine, table: Table = TransactionAuditLog.__table__,
+                        chain_table: Table = TransactionAuditChain.__table__) -> None:
+    """
+    Legt Kettenkopf und Schreibschutz-Trigger an.
+
+    Die Tabellen selbst entstehen über ``Base.metadata.create_all``; unter
+    PostgreSQL ist ``transaction_audit_log`` dort bereits nach Monaten
+    partitioniert.
+    """
+    with engine.begin() as conn:
+        if conn.execute(select(chain_table.c.id).where(chain_table.c.id == 1)).first() is None:
+            conn.execute(insert(chain_table).values(id=1, last_sequence=0, last_hash=GENESIS_HASH,
+                                                    updated_at=datetime.now()))
+        name = table.name
+        if conn.dialect.name == "postgresql":
+            conn.execute(text(f"""
+                CREATE OR REPLACE FUNCTION {name}_append_only() RETURNS trigger AS $$
+                BEGIN
+                    RAISE EXCEPTION '{name} ist nur fortschreibbar';
+                END;
+                $$ LANGUAGE plpgsql
+            """))
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name}_append_only ON {name}"))
+            conn.execute(text(
+                f"CREATE TRIGGER {name}_append_only BEFORE UPDATE OR DELETE ON {name} "
+                f"FOR EACH ROW EXECUTE FUNCTION {name}_append_only()"
+            ))
+        elif conn.dialect.name == "sqlite":
+            for operation in ("UPDATE", "DELETE"):
+                conn.execute(text(
+                    f"CREATE TRIGGER IF NOT EXISTS {name}_no_{operation.lower()} BEFORE {operation} ON {name} "
+                    f"BEGIN SELECT RAISE(ABORT, '{name} ist nur fortschreibbar'); END"
+                ))
+
+
+class TransactionAuditSink:
+    """
+    Gepufferter Schreiber und Abfrage-API für das Audit-Log.
+
+    ``append`` legt Einträge nur in den Puffer; geschrieben wird bei
+    ``batch_size`` Einträgen, durch den Hintergrund-Thread (``start``) oder
+    explizit mit ``flush``. Schlägt ein Schreibvorgang fehl, bleiben die
+    Einträge im Puffer und die Kette unverändert. Ein Audit-Eintrag wird nie
+    stillschweigend verworfen: ist der Puffer bei ``max_buffer`` Einträgen
+    voll, lehnt ``append`` weitere mit ``AuditBufferFullError`` ab.
+    """
+
+    def __init__(self, engine: Engine, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, use_copy: Optional[bool] = None,
+                 max_buffer: int = DEFAULT_MAX_BUFFER,
+                 table: Table = TransactionAuditLog.__table__,
+                 chain_table: Table = TransactionAuditChain.__table__):
+        """
+        Initialisiert den Schreiber.
+
+        Args:
+            engine: SQLAlchemy-Engine der Audit-Datenbank
+            batch_size: Einträge, ab denen ``append`` selbst schreibt
+            flush_interval: Sekunden zwischen zwei Schreibvorgängen des Hintergrund-Threads
+            use_copy: COPY verwenden (Standard: bei PostgreSQL mit psycopg2)
+            max_buffer: Höchstens gepufferte Einträge
+            table: Audit-Tabelle
+            chain_table: Tabelle mit dem Kopf der Hash-Kette
+        """
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.table = table
+        self.chain_table = chain_table
+        self.is_postgresql = engine.dialect.name == "postgresql"
+        self.use_copy = (self.is_postgresql and engine.dialect.driver == "psycopg2") if use_copy is None else use_copy
+        self._buffer: List[AuditEntry] = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._partitions: set = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ==================== Schreiben ====================
+
+    def append(self, transaction_id: int, action: str, message: str,
+               severity: AuditLogSeverity = AuditLogSeverity.INFO, item_id: Optional[int] = None,
+               details: Optional[Dict[str, Any]] = None, user_id: Optional[int] = None,
+               timestamp: Optional[datetime] = None) -> None:
+        """Legt einen Audit-Eintrag in den Puffer."""
+        self.append_entry(AuditEntry(transaction_id, action, message, severity, item_id, details,
+                                     user_id, timestamp or datetime.now()))
+
+    def append_entry(self, entry: AuditEntry) -> None:
+        """
+        Legt einen vorbereiteten Audit-Eintrag in den Puffer.
+
+        Raises:
+            AuditBufferFullError: Puffer voll, der Eintrag wurde nicht angenommen
+        """
+        if entry.details is not None:
+            # Gespeicherte und gehashte Details müssen identisch sein
+            entry.details = json.loads(_canonical_details(entry.details))
+        with self._buffer_lock:
+            if len(self._buffer) >= self.max_buffer:
+                raise AuditBufferFullError(
+                    f"Audit-Puffer voll ({self.max_buffer} Einträge), Eintrag für Transaktion "
+                    f"{entry.transaction_id} abgelehnt"
+                )
+            self._buffer.append(entry)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def pending(self) -> int:
+        """Anzahl noch nicht geschriebener Einträge."""
+        return len(self._buffer)
+
+    def flush(self) -> int:
+        """
+        Schreibt alle gepufferten Einträge in einer Datenbanktransaktion.
+
+        Returns:
+            Anzahl geschriebener Einträge
+        """
+        with self._flush_lock:
+            with self._buffer_lock:
+                entries, self._buffer = self._buffer, []
+            if not entries:
+                return 0
+            try:
+                with self.engine.begin() as conn:
+                    rows = self._chain(conn, entries)
+                    created = self._ensure_partitions(conn, rows) if self.is_postgresql else []
+                    if self.use_copy:
+                        self._copy(conn, rows)
+                    else:
+                        conn.execute(insert(self.table), rows)
+            except Exception:
+                with self._buffer_lock:
+                    self._buffer[:0] = entries
+                raise
+            # Erst nach dem Commit: bei einem Rollback fehlen auch die Partitionen
+            self._partitions.update(created)
+            logger.debug(f"{len(rows)} Audit-Einträge geschrieben (bis Nr. {rows[-1]['id']})")
+            return len(rows)
+
+    def _chain(self, conn: Connection, entries: List[AuditEntry]) -> List[Dict[str, Any]]:
+        """Reserviert Nummern am Kettenkopf und verkettet die Einträge."""
+        chain = self.chain_table
+        # Das UPDATE sperrt den Kettenkopf bis zum Ende der Transaktion
+        result = conn.execute(
+            update(chain).where(chain.c.id == 1)
+            .values(last_sequence=chain.c.last_sequence + len(entries), updated_at=datetime.now())
+        )
+        if result.rowcount == 0:
+            raise RuntimeError("Kettenkopf des Audit-Logs fehlt (ensure_audit_schema ausführen)")
+        last_sequence, previous_hash = conn.execute(
+            select(chain.c.last_sequence, chain.c.last_hash).where(chain.c.id == 1)
+        ).one()
+
+        rows = []
+        sequence = last_sequence - len(entries)
+        for entry in entries:
+            sequence += 1
+            row = {
+                "id": sequence,
+                "transaction_id": entry.transaction_id,
+                "item_id": entry.item_id,
+                "timestamp": entry.timestamp,
+                "action": entry.action,
+                "severity": entry.severity,
+                "message": entry.message,
+                "details": entry.details,
+                "user_id": entry.user_id,
+                "previous_hash": previous_hash,
+            }
+            previous_hash = row["entry_hash"] = compute_entry_hash(row)
+            rows.append(row)
+
+        conn.execute(update(chain).where(chain.c.id == 1).values(last_hash=previous_hash))
+        return rows
+
+    def _ensure_partitions(self, conn: Connection, rows: List[Dict[str, Any]]) -> List[datetime]:
+        """
+        Legt fehlende Monatspartitionen an (PostgreSQL).
+
+        Returns:
+            Monatsanfänge der angelegten Partitionen; erst nach dem Commit bekannt zu machen
+        """
+        created = []
+        for start, end in sorted({_month_bounds(row["timestamp"]) for row in rows}):
+            if start in self._partitions:
+                continue
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {self.table.name}_{start:%Y_%m} PARTITION OF {self.table.name} "
+                f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+            ))
+            created.append(start)
+        return created
+
+    def _copy(self, conn: Connection, rows: List[Dict[str, Any]]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([
+                row["id"], row["transaction_id"], row["item_id"], row["timestamp"].isoformat(),
+                row["action"], row["severity"].name, row["message"], _canonical_details(row["details"]),
+                row["user_id"], row["previous_hash"], row["entry_hash"],
+            ])
+        buffer.seek(0)
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {self.table.name} ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        finally:
+            cursor.close()
+
+    # ==================== Hintergrund-Thread ====================
+
+    def start(self) -> None:
+        """Startet den Hintergrund-Thread, der den Puffer regelmäßig schreibt."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-sink", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Fehler beim Schreiben des Audit-Logs: {str(e)}", exc_info=True)
+
+    def close(self) -> None:
+        """Beendet den Hintergrund-Thread und schreibt den restlichen Puffer."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    # ==================== Abfragen ====================
+
+    def _query(self, *conditions) -> List[Dict[str, Any]]:
+        self.flush()
+        statement = select(self.table).where(and_(*conditions)).order_by(self.table.c.id)
+        with self.engine.connect() as conn:
+            return [dict(row) for row in conn.execute(statement).mappings()]
+
+    def _time_conditions(self, start: Optional[datetime], end: Optional[datetime]) -> list:
+        # Zeitbedingungen auf ``timestamp`` erlauben das Ausblenden ganzer Partitionen
+        conditions = []
+        if start is not None:
+            conditions.append(self.table.c.timestamp >= start)
+        if end is not None:
+            conditions.append(self.table.c.timestamp < end)
+        return conditions
+
+    def by_transaction(self, transaction_id: int, start: Optional[datetime] = None,
+                       end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Audit-Einträge einer Transaktion, optional auf einen Zeitraum beschränkt."""
+        return self._query(self.table.c.transaction_id == transaction_id, *self._time_conditions(start, end))
+
+    def by_user(self, user_id: int, start: Optional[datetime] = None,
+                end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Audit-Einträge eines Benutzers, optional auf einen Zeitraum beschränkt."""
+        return self._query(self.table.c.user_id == user_id, *self._time_conditions(start, end))
+
+    def in_range(self, start: datetime, end: datetime, action: Optional[str] = None,
+                 severity: Optional[AuditLogSeverity] = None) -> List[Dict[str, Any]]:
+        """Audit-Einträge im Zeitraum [start, end), optional nach Aktion und Schweregrad gefiltert."""
+        conditions = self._time_conditions(start, end)
+        if action is not None:
+            conditions.append(self.table.c.action == action)
+        if severity is not None:
+            conditions.append(self.table.c.severity == severity)
+        return self._query(*conditions)
+
+    def verify(self, from_id: Optional[int] = None, to_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Prüft die Hash-Kette.
+
+        Erkannt werden geänderte Einträge (Hash stimmt nicht), gelöschte oder
+        eingefügte Einträge (Lücke in der Nummerierung oder falscher
+        Vorgänger-Hash) sowie ein abgeschnittenes Ende (Kettenkopf weicht ab).
+
+        Args:
+            from_id: Erste zu prüfende Nummer (Standard: Beginn der Kette)
+            to_id: Letzte zu prüfende Nummer (Standard: Kettenkopf)
+
+        Returns:
+            Dict mit ``valid``, ``checked`` und bei Fehlern ``first_invalid_id`` und ``error``
+        """
+        self.flush()
+        table = self.table
+        statement = select(table).order_by(table.c.id)
+        if from_id is not None:
+            statement = statement.where(table.c.id >= from_id)
+        if to_id is not None:
+            statement = statement.where(table.c.id <= to_id)
+
+        checked = 0
+        expected_id = from_id or 1
+        previous_hash = GENESIS_HASH if expected_id == 1 else None
+
+        def invalid(row_id, error):
+            return {"valid": False, "checked": checked, "first_invalid_id": row_id, "error": error}
+
+        with self.engine.connect() as conn:
+            last_sequence, last_hash = conn.execute(
+                select(self.chain_table.c.last_sequence, self.chain_table.c.last_hash)
+                .where(self.chain_table.c.id == 1)
+            ).one()
+            result = conn.execution_options(stream_results=True, yield_per=VERIFY_FETCH_SIZE).execute(statement)
+            for row in result.mappings():
+                if row["id"] != expected_id:
+                    return invalid(expected_id, f"Eintrag {expected_id} fehlt")
+                if previous_hash is not None and row["previous_hash"] != previous_hash:
+                    return invalid(row["id"], "Vorgänger-Hash stimmt nicht überein")
+                if compute_entry_hash(row) != row["entry_hash"]:
+                    return invalid(row["id"], "Eintrag wurde verändert")
+                previous_hash = row["entry_hash"]
+                expected_id += 1
+                checked += 1
+
+        end = last_sequence if to_id is None else min(to_id, last_sequence)
+        if expected_id <= end:
+            return invalid(expected_id, f"Eintrag {expected_id} fehlt")
+        if to_id is None and checked and previous_hash != last_hash:
+            return invalid(expected_id - 1, "Letzter Eintrag weicht vom Kettenkopf ab")
+        return {"valid": True, "checked": checked}
@@ -3,14 +3,47 @@ Event-System für die Plugin-Architektur des Transaktionsverarbeitungsmoduls.
 
 Implementiert ein Event-basiertes System für die Kommunikation zwischen dem Kern
 und den Plugins, basierend auf dem Design aus der kreativen Phase.
+
+Listener laufen entweder synchron im Thread des Aufrufers (``SYNC``, für
+kritische Listener, die das Ergebnis beeinflussen) oder asynchron (``ASYNC``)
+auf einer eigenen, begrenzten Warteschlange mit eigenen Worker-Threads. Ein
+langsamer asynchroner Listener verzögert so weder den Aufrufer noch andere
+Listener. Asynchrone Listener können Events gebündelt erhalten; Fehler,
+Zeitüberschreitungen und volle Warteschlangen landen im Dead-Letter-Speicher.
+
+Zustellung ist mindestens einmal (at-least-once): ein Aufruf, der nach
+Zeitüberschreitung weiterläuft und dann scheitert, wird beim Replay erneut
+zugestellt; Listener sollten daher idempotent sein.
 """
 
 import logging
-from typing import Dict, List, Callable, Any, Optional, Union
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Callable, Any, Optional, Tuple, Union
 
 # Logger konfigurieren
 logger = logging.getLogger(__name__)
 
+# Ausführungsarten von Listenern
+SYNC = "sync"
+ASYNC = "async"
+
+# Standardgröße der Warteschlange eines asynchronen Listeners
+DEFAULT_QUEUE_SIZE = 10000
+
+# Maximale Anzahl gespeicherter Dead Letters
+DEFAULT_DEAD_LETTER_SIZE = 1000
+
+# Events des TransactionProcessors
+TRANSACTION_COMPLETED = "transaction.completed"
+TRANSACTION_FAILED = "transaction.failed"
+TRANSACTION_BATCH_COMPLETED = "transaction.batch_completed"
+
 
 class Event:
     """
@@ -62,19 +95,353 @@ class Event:
         self.data[key] = value
 
 
+def _listener_name(listener: Callable) -> str:
+    return getattr(listener, "__qualname__", None) or repr(listener)
+
+
+@dataclass
+class ListenerMetrics:
+    """
+    Kennzahlen eines Listeners.
+    
+    Bei gebündelten Listenern zählt ``calls`` die Aufrufe, ``events`` die
+    darin enthaltenen Events.
+    """
+    
+    name: str
+    mode: str
+    calls: int = 0
+    events: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    dropped: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    
+    def record(self, duration: float, events: int = 1, failed: bool = False, timed_out: bool = False) -> None:
+        """Erfasst einen Aufruf des Listeners."""
+        with self._lock:
+            self.calls += 1
+            self.events += events
+            self.failures += failed
+            self.timeouts += timed_out
+            self.total_time += duration
+            if duration > self.max_time:
+                self.max_time = duration
+    
+    def record_dropped(self, events: int = 1) -> None:
+        """Erfasst Events, die wegen voller Warteschlange nicht angenommen wurden."""
+        with self._lock:
+            self.dropped += events
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Kennzahlen als Dictionary."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "mode": self.mode,
+                "calls": self.calls,
+                "events": self.events,
+                "failures": self.failures,
+                "timeouts": self.timeouts,
+                "dropped": self.dropped,
+                "avg_time": self.total_time / self.calls if self.calls else 0.0,
+                "max_time": self.max_time,
+            }
+
+
+@dataclass
+class DeadLetter:
+    """Events, die ein Listener nicht verarbeiten konnte."""
+    
+    event_type: str
+    listener: str
+    events: List[Event]
+    error: str
+    failed_at: datetime = field(default_factory=datetime.now)
+    _call: Optional[Callable[[List[Event]], None]] = field(default=None, repr=False, compare=False)
+    # Nach Zeitüberschreitung noch laufender Aufruf
+    _running: Optional[Future] = field(default=None, repr=False, compare=False)
+
+    @property
+    def running(self) -> bool:
+        """Der ursprüngliche Aufruf läuft noch; ein Replay wird erst danach entschieden."""
+        return self._running is not None and not self._running.done()
+
+
+class DeadLetterStore:
+    """
+    Begrenzter Speicher für Dead Letters.
+    
+    Ist der Speicher voll, wird der älteste Eintrag verworfen. Mit ``replay``
+    werden die Events erneut an ihren Listener übergeben. Einträge, deren
+    Aufruf nach einer Zeitüberschreitung noch läuft, werden dabei übersprungen;
+    endet der Aufruf erfolgreich, wird der Eintrag entfernt, scheitert er, wird
+    er mit dem Fehler des Aufrufs zum normalen Eintrag.
+    """
+    
+    def __init__(self, maxlen: int = DEFAULT_DEAD_LETTER_SIZE):
+        """
+        Initialisiert den Speicher.
+        
+        Args:
+            maxlen: Maximale Anzahl gespeicherter Einträge
+        """
+        self._entries: deque = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        
+    def add(self, entry: DeadLetter) -> None:
+        """Legt einen Eintrag ab."""
+        with self._lock:
+            if len(self._entries) == self._entries.maxlen:
+                logger.warning(f"Dead-Letter-Speicher voll, ältester Eintrag für '{self._entries[0].event_type}' verworfen")
+            self._entries.append(entry)
+            
+    def discard(self, entry: DeadLetter) -> None:
+        """Entfernt einen Eintrag, falls noch vorhanden."""
+        with self._lock:
+            try:
+                self._entries.remove(entry)
+            except ValueError:
+                pass
+            
+    def entries(self, event_type: Optional[str] = None) -> List[DeadLetter]:
+        """
+        Liefert die gespeicherten Einträge.
+        
+        Args:
+            event_type: Nur Einträge dieses Event-Typs (optional)
+        """
+        with self._lock:
+            return [entry for entry in self._entries if event_type is None or entry.event_type == event_type]
+        
+    def replay(self, event_type: Optional[str] = None) -> int:
+        """
+        Übergibt gespeicherte Events erneut und synchron an ihren Listener.
+        
+        Erfolgreich verarbeitete Einträge werden entfernt, erneut fehlschlagende
+        bleiben mit der neuen Fehlermeldung erhalten. Einträge mit noch
+        laufendem Aufruf werden übersprungen.
+        
+        Args:
+            event_type: Nur Einträge dieses Event-Typs (optional)
+            
+        Returns:
+            Anzahl erfolgreich verarbeiteter Einträge
+        """
+        replayed = 0
+        for entry in self.entries(event_type):
+            if entry._call is None or entry._running is not None:
+                continue
+            try:
+                entry._call(entry.events)
+            except Exception as e:
+                entry.error = str(e)
+                entry.failed_at = datetime.now()
+                continue
+            self.discard(entry)
+            replayed += 1
+        return replayed
+    
+    def clear(self) -> None:
+        """Entfernt alle Einträge."""
+        with self._lock:
+            self._entries.clear()
+            
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_STOP = object()
+
+
+class _AsyncListener:
+    """
+    Warteschlange und Worker-Threads eines asynchronen Listeners.
+    
+    Mit Zeitlimit läuft der Aufruf in einem eigenen Thread-Pool; ein Worker
+    wartet höchstens ``timeout`` Sekunden und nimmt dann das nächste Event,
+    auch wenn der hängende Aufruf noch läuft. Der Pool nimmt höchstens so viele
+    Aufrufe an, wie er Threads hat: hängen alle, werden weitere Events sofort
+    zum Dead Letter, statt sich unbegrenzt im Pool zu stauen.
+    """
+    
+    def __init__(self, event_type: str, listener: Callable, metrics: ListenerMetrics,
+                 dead_letters: DeadLetterStore, queue_size: int, workers: int,
+                 timeout: Optional[float], batch_size: Optional[int], batch_interval: float,
+                 put_timeout: float):
+        self.event_type = event_type
+        self.listener = listener
+        self.metrics = metrics
+        self.dead_letters = dead_letters
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.put_timeout = put_timeout
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.stopped = False
+        self._executor = (
+            ThreadPoolExecutor(max_workers=workers * 2, thread_name_prefix=f"event-{metrics.name}-call")
+            if timeout else None
+        )
+        self._slots = threading.BoundedSemaphore(workers * 2)
+        self._threads = [
+            threading.Thread(target=self._run, name=f"event-{metrics.name}-{n}", daemon=True)
+            for n in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+            
+    def submit(self, event: Event) -> bool:
+        """Stellt ein Event ein; bei voller Warteschlange wird es zum Dead Letter."""
+        if self.stopped:
+            self.dead_letters.add(self._dead_letter([event], "Listener beendet"))
+            return False
+        try:
+            if self.put_timeout > 0:
+                self.queue.put(event, timeout=self.put_timeout)
+            else:
+                self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            self.metrics.record_dropped()
+            self.dead_letters.add(self._dead_letter([event], "Warteschlange voll"))
+            logger.warning(f"Warteschlange von Listener '{self.metrics.name}' für '{self.event_type}' voll")
+            return False
+        
+    def _call(self, events: List[Event]) -> None:
+        self.listener(events if self.batch_size else events[0])
+        
+    def _dead_letter(self, events: List[Event], error: str) -> DeadLetter:
+        return DeadLetter(self.event_type, self.metrics.name, events, error, _call=self._call)
+    
+    def _collect(self, first: Any) -> Tuple[List[Event], bool]:
+        """Bündelt bis zu ``batch_size`` Events, höchstens ``batch_interval`` Sekunden lang."""
+        batch = [first]
+        stop = False
+        deadline = time.monotonic() + self.batch_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+        return batch, stop
+    
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                self.queue.task_done()
+                return
+            batch, stop = self._collect(item) if self.batch_size else ([item], False)
+            self._deliver(batch)
+            for _ in range(len(batch) + stop):
+                self.queue.task_done()
+            if stop:
+                return
+            
+    def _deliver(self, events: List[Event]) -> None:
+        started = time.perf_counter()
+        failed = timed_out = False
+        try:
+            if self._executor is None:
+                self._call(events)
+            elif not self._slots.acquire(blocking=False):
+                failed = True
+                self.dead_letters.add(self._dead_letter(events, "Vorherige Aufrufe hängen, nicht zugestellt"))
+                logger.warning(f"Alle Aufrufe von Listener '{self.metrics.name}' für '{self.event_type}' hängen")
+            else:
+                future = self._executor.submit(self._call, events)
+                future.add_done_callback(lambda _: self._slots.release())
+                try:
+                    future.result(timeout=self.timeout)
+                except FuturesTimeoutError:
+                    timed_out = True
+                    entry = self._dead_letter(events, f"Zeitüberschreitung nach {self.timeout} s")
+                    if not future.cancel():
+                        # Läuft weiter: erst das Ende des Aufrufs entscheidet über ein Replay
+                        entry._running = future
+                    self.dead_letters.add(entry)
+                    if entry._running is not None:
+                        future.add_done_callback(lambda done: self._settle(entry, done))
+                    logger.warning(f"Listener '{self.metrics.name}' für '{self.event_type}' überschreitet {self.timeout} s")
+        except Exception as e:
+            failed = True
+            self.dead_letters.add(self._dead_letter(events, str(e)))
+            logger.error(f"Fehler im Event-Listener für '{self.event_type}': {str(e)}", exc_info=True)
+        finally:
+            self.metrics.record(time.perf_counter() - started, len(events), failed, timed_out)
+            
+    def _settle(self, entry: DeadLetter, future: Future) -> None:
+        """Ende eines Aufrufs nach Zeitüberschreitung: Erfolg entfernt den Dead Letter."""
+        error = future.exception()
+        if error is None:
+            self.dead_letters.discard(entry)
+        else:
+            entry.error = str(error)
+            entry.failed_at = datetime.now()
+        entry._running = None
+        
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wartet, bis alle eingestellten Events verarbeitet sind."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+    
+    def stop(self, wait: bool = True) -> None:
+        """Beendet die Worker, nachdem die bereits eingestellten Events verarbeitet sind."""
+        if self.stopped:
+            return
+        self.stopped = True
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
 class EventDispatcher:
     """
     Dispatcher für Events im System.
     
     Verwaltet die Registrierung von Event-Listenern und das Dispatching von Events.
+    Synchrone Listener laufen im Thread des Aufrufers in Prioritätsreihenfolge;
+    asynchrone Listener erhalten das Event über ihre Warteschlange und können
+    die Propagation nicht stoppen.
     """
     
-    def __init__(self):
-        """Initialisiert einen neuen EventDispatcher."""
+    def __init__(self, dead_letter_size: int = DEFAULT_DEAD_LETTER_SIZE):
+        """
+        Initialisiert einen neuen EventDispatcher.
+        
+        Args:
+            dead_letter_size: Maximale Anzahl gespeicherter Dead Letters
+        """
         self.listeners: Dict[str, Dict[int, List[Callable]]] = {}
         self.sorted: Dict[str, Optional[List[Callable]]] = {}
+        self.dead_letters = DeadLetterStore(dead_letter_size)
+        self._metrics: Dict[Tuple[str, Callable], ListenerMetrics] = {}
+        self._timeouts: Dict[Tuple[str, Callable], float] = {}
+        self._async: Dict[Tuple[str, Callable], _AsyncListener] = {}
         
-    def add_listener(self, event_type: str, listener: Callable, priority: int = 0) -> None:
+    def add_listener(self, event_type: str, listener: Callable, priority: int = 0,
+                     mode: str = SYNC, timeout: Optional[float] = None,
+                     batch_size: Optional[int] = None, batch_interval: float = 0.05,
+                     queue_size: int = DEFAULT_QUEUE_SIZE, workers: int = 1,
+                     put_timeout: float = 0.0) -> None:
         """
         Fügt einen Listener für einen bestimmten Event-Typ hinzu.
         
@@ -82,17 +449,46 @@ class EventDispatcher:
             event_type: Der Typ des Events, für den der Listener registriert werden soll
             listener: Die Callback-Funktion, die aufgerufen werden soll
             priority: Die Priorität des Listeners (höhere Werte werden zuerst aufgerufen)
+            mode: SYNC (im Thread des Aufrufers) oder ASYNC (eigene Warteschlange)
+            timeout: Zeitlimit je Aufruf in Sekunden; asynchrone Aufrufe werden
+                danach aufgegeben, synchrone nur als Zeitüberschreitung gezählt
+            batch_size: Nur ASYNC: der Listener erhält Listen von bis zu
+                ``batch_size`` Events statt einzelner Events
+            batch_interval: Nur ASYNC: maximale Wartezeit für das Füllen eines Bündels
+            queue_size: Nur ASYNC: Größe der Warteschlange
+            workers: Nur ASYNC: Anzahl der Worker-Threads
+            put_timeout: Nur ASYNC: Wartezeit des Aufrufers bei voller Warteschlange,
+                bevor das Event zum Dead Letter wird
         """
+        if mode not in (SYNC, ASYNC):
+            raise ValueError(f"Unbekannte Ausführungsart für Listener: {mode}")
+        if batch_size is not None and (mode != ASYNC or batch_size < 1):
+            raise ValueError("batch_size ist nur für asynchrone Listener und ab 1 zulässig")
+            
         if event_type not in self.listeners:
             self.listeners[event_type] = {}
             
         if priority not in self.listeners[event_type]:
             self.listeners[event_type][priority] = []
             
+        key = (event_type, listener)
+        if key in self._metrics:
+            raise ValueError(f"Listener {_listener_name(listener)} ist für '{event_type}' bereits registriert")
+            
+        metrics = ListenerMetrics(_listener_name(listener), mode)
+        self._metrics[key] = metrics
+        if mode == ASYNC:
+            self._async[key] = _AsyncListener(
+                event_type, listener, metrics, self.dead_letters, queue_size, max(1, workers),
+                timeout, batch_size, batch_interval, put_timeout
+            )
+        elif timeout:
+            self._timeouts[key] = timeout
+            
         self.listeners[event_type][priority].append(listener)
         self.sorted[event_type] = None  # Cache zurücksetzen
         
-        logger.debug(f"Listener für Event-Typ '{event_type}' mit Priorität {priority} hinzugefügt")
+        logger.debug(f"Listener für Event-Typ '{event_type}' mit Priorität {priority} ({mode}) hinzugefügt")
         
     def remove_listener(self, event_type: str, listener: Callable) -> bool:
         """
@@ -115,6 +511,12 @@ class EventDispatcher:
                 removed = True
                 
         if removed:
+            key = (event_type, listener)
+            self._metrics.pop(key, None)
+            self._timeouts.pop(key, None)
+            worker = self._async.pop(key, None)
+            if worker is not None:
+                worker.stop(wait=False)
             self.sorted[event_type] = None  # Cache zurücksetzen
             logger.debug(f"Listener für Event-Typ '{event_type}' entfernt")
             
@@ -152,13 +554,82 @@ class EventDispatcher:
                 logger.debug(f"Event-Propagation für '{event_type}' gestoppt")
                 break
                 
-            try:
-                listener(event)
-            except Exception as e:
-                logger.error(f"Fehler im Event-Listener für '{event_type}': {str(e)}", exc_info=True)
+            key = (event_type, listener)
+            worker = self._async.get(key)
+            if worker is not None:
+                worker.submit(event)
+                continue
+                
+            self._call_sync(key, listener, event)
                 
         return event
     
+    def _call_sync(self, key: Tuple[str, Callable], listener: Callable, event: Event) -> None:
+        """Ruft einen synchronen Listener auf und erfasst Dauer und Fehler."""
+        metrics = self._metrics[key]
+        started = time.perf_counter()
+        failed = False
+        try:
+            listener(event)
+        except Exception as e:
+            failed = True
+            self.dead_letters.add(DeadLetter(key[0], metrics.name, [event], str(e),
+                                             _call=lambda events: listener(events[0])))
+            logger.error(f"Fehler im Event-Listener für '{key[0]}': {str(e)}", exc_info=True)
+        duration = time.perf_counter() - started
+        timeout = self._timeouts.get(key)
+        timed_out = timeout is not None and duration > timeout
+        if timed_out:
+            logger.warning(f"Listener '{metrics.name}' für '{key[0]}' benötigte {duration:.3f} s (Limit {timeout} s)")
+        metrics.record(duration, 1, failed, timed_out)
+        
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wartet, bis alle asynchronen Listener ihre Warteschlangen abgearbeitet haben.
+        
+        Args:
+            timeout: Maximale Wartezeit in Sekunden (None = unbegrenzt)
+            
+        Returns:
+            True, wenn alle Warteschlangen leer sind
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in list(self._async.values()):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not worker.wait_idle(remaining):
+                return False
+        return True
+    
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Kennzahlen aller Listener.
+        
+        Returns:
+            Dict "<Event-Typ>:<Listener>" -> Kennzahlen, bei asynchronen
+            Listenern mit aktueller Warteschlangenlänge
+        """
+        result = {}
+        for (event_type, listener), metrics in self._metrics.items():
+            data = metrics.as_dict()
+            worker = self._async.get((event_type, listener))
+            if worker is not None:
+                data["queue_depth"] = worker.queue.qsize()
+            result[f"{event_type}:{metrics.name}"] = data
+        return result
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Beendet die Worker aller asynchronen Listener.
+        
+        Bereits eingestellte Events werden noch verarbeitet; danach
+        dispatchte Events werden zu Dead Letters.
+        
+        Args:
+            wait: Auf das Ende der Worker warten
+        """
+        for worker in self._async.values():
+            worker.stop(wait=wait)
+    
     def has_listeners(self, event_type: Optional[str] = None) -> bool:
         """
         Prüft, ob Listener für einen bestimmten Event-Typ registriert sind.
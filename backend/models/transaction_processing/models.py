@@ -4,7 +4,7 @@ Datenmodelle für das Transaktionsverarbeitungsmodul.
 Definiert die Datenstrukturen für Transaktionen, Transaktionspositionen und Audit-Logs.
 """
 
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean, Text, Enum, JSON, Table
+from sqlalchemy import Column, Integer, BigInteger, String, Float, ForeignKey, DateTime, Boolean, Text, Enum, JSON, Table, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -96,7 +96,9 @@ class Transaction(Base):
     creator = relationship("User", foreign_keys=[created_by])
     updater = relationship("User", foreign_keys=[updated_by])
     items = relationship("TransactionItem", back_populates="transaction", cascade="all, delete-orphan")
-    audit_logs = relationship("TransactionAuditLog", back_populates="transaction", cascade="all, delete-orphan")
+    # Audit-Logs sind nur fortschreibbar und werden über TransactionAuditSink geschrieben
+    audit_logs = relationship("TransactionAuditLog", back_populates="transaction", viewonly=True,
+                              order_by="TransactionAuditLog.id")
     
     def __repr__(self):
         return f"<Transaction(id={self.id}, number={self.transaction_number}, type={self.transaction_type})>"
@@ -161,27 +163,54 @@ class TransactionItem(Base):
 
 
 class TransactionAuditLog(Base):
-    """Modell für Transaktions-Audit-Logs"""
+    """
+    Modell für Transaktions-Audit-Logs.
+    
+    Die Tabelle ist nur fortschreibbar (GoBD) und wird ausschließlich über
+    ``TransactionAuditSink`` beschrieben. ``id`` ist die lückenlose laufende
+    Nummer der Hash-Kette; ``entry_hash`` verkettet jeden Eintrag mit dem
+    ``previous_hash`` seines Vorgängers. Unter PostgreSQL ist die Tabelle nach
+    Monaten partitioniert, daher gehört ``timestamp`` zum Primärschlüssel.
+    """
     __tablename__ = "transaction_audit_log"
+    __table_args__ = (
+        Index("ix_transaction_audit_log_transaction_id", "transaction_id"),
+        Index("ix_transaction_audit_log_user_timestamp", "user_id", "timestamp"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigInteger, primary_key=True, autoincrement=False)
     transaction_id = Column(Integer, ForeignKey("transaction.id"), nullable=False)
     item_id = Column(Integer, ForeignKey("transaction_item.id"), nullable=True)
     
     # Log-Informationen
-    timestamp = Column(DateTime, nullable=False, default=datetime.now)
+    timestamp = Column(DateTime, primary_key=True, nullable=False, default=datetime.now)
     action = Column(String(100), nullable=False)
     severity = Column(Enum(AuditLogSeverity), nullable=False, default=AuditLogSeverity.INFO)
     message = Column(Text, nullable=False)
-    details = Column(JSONB, nullable=True)
+    details = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
     
     # Benutzer
     user_id = Column(Integer, ForeignKey("user.id"), nullable=True)
     
+    # Hash-Kette
+    previous_hash = Column(String(64), nullable=False)
+    entry_hash = Column(String(64), nullable=False)
+    
     # Beziehungen
-    transaction = relationship("Transaction", back_populates="audit_logs")
+    transaction = relationship("Transaction", back_populates="audit_logs", viewonly=True)
     item = relationship("TransactionItem")
     user = relationship("User")
     
     def __repr__(self):
-        return f"<TransactionAuditLog(id={self.id}, transaction_id={self.transaction_id}, action={self.action})>" 
\ No newline at end of file
+        return f"<TransactionAuditLog(id={self.id}, transaction_id={self.transaction_id}, action={self.action})>"
+
+
+class TransactionAuditChain(Base):
+    """Kopf der Hash-Kette des Audit-Logs (genau eine Zeile)"""
+    __tablename__ = "transaction_audit_chain"
+    
+    id = Column(Integer, primary_key=True)
+    last_sequence = Column(BigInteger, nullable=False, default=0)
+    last_hash = Column(String(64), nullable=False)
+    updated_at = Column(DateTime, nullable=True)
@@ -14,6 +14,13 @@ from backend.db.database import get_db
 from backend.models.transaction_processing.transaction import Transaction
 from backend.models.transaction_processing.transaction_result import TransactionResult
 from backend.models.transaction_processing.transaction_status import TransactionStatus
+from backend.models.transaction_processing.events import (
+    EventDispatcher,
+    global_event_dispatcher,
+    TRANSACTION_COMPLETED,
+    TRANSACTION_FAILED,
+    TRANSACTION_BATCH_COMPLETED
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,18 +28,28 @@ class TransactionProcessor:
     """
     Prozessor für die effiziente Verarbeitung von Transaktionen mit hohem Volumen.
     Verwendet Chunked Processing mit Savepoints für optimale Performance und Fehlertoleranz.
+    
+    Nach dem Commit werden die Events transaction.completed, transaction.failed
+    und transaction.batch_completed dispatcht; Audit-, Benachrichtigungs- und
+    Analyse-Listener sollten als ASYNC registriert werden, damit sie die
+    Verarbeitung nicht verzögern. Die Events tragen keine ORM-Objekte, sondern
+    Momentaufnahmen als Dictionary (siehe ``_event_snapshot``), da ASYNC-Listener
+    in eigenen Threads laufen und die Session des Prozessors nicht nutzen dürfen.
     """
     
-    def __init__(self, db_session: Optional[Session] = None, chunk_size: int = 100):
+    def __init__(self, db_session: Optional[Session] = None, chunk_size: int = 100,
+                 event_dispatcher: Optional[EventDispatcher] = None):
         """
         Initialisiert den TransactionProcessor.
         
         Args:
             db_session: SQLAlchemy Datenbanksession. Falls None, wird eine neue Session erstellt.
             chunk_size: Größe der Chunks für die Verarbeitung (Standard: 100)
+            event_dispatcher: Dispatcher für Verarbeitungs-Events (Standard: globaler Dispatcher)
         """
         self.db = db_session or next(get_db())
         self.chunk_size = chunk_size
+        self.events = event_dispatcher or global_event_dispatcher
     
     def process_transactions(self, transactions: List[Transaction]) -> TransactionResult:
         """
@@ -61,6 +78,8 @@ class TransactionProcessor:
         
         # Transaktionen in Chunks aufteilen
         chunks = [transactions[i:i+self.chunk_size] for i in range(0, len(transactions), self.chunk_size)]
+        completed: List[Dict[str, Any]] = []
+        failed: List[Dict[str, Any]] = []
         
         try:
             # Haupttransaktion starten
@@ -107,6 +126,7 @@ class TransactionProcessor:
                     
                     # Fehlgeschlagene Transaktionen protokollieren
                     result.failed += len(chunk)
+                    failed.extend(self._event_snapshot(transaction, "failed", error_message) for transaction in chunk)
                     if failed_transaction:
                         result.failed_transactions.append({
                             "transaction_id": failed_transaction.id,
@@ -115,6 +135,7 @@ class TransactionProcessor:
                 else:
                     # Savepoint freigeben
                     self.db.execute(f"RELEASE SAVEPOINT {savepoint_name}")
+                    completed.extend(self._event_snapshot(transaction, "completed") for transaction in chunk)
                     logger.info(f"Chunk {i+1} erfolgreich verarbeitet")
             
             # Commit der Haupttransaktion
@@ -122,7 +143,11 @@ class TransactionProcessor:
             logger.info(f"Transaktionsverarbeitung abgeschlossen: {result.successful} erfolgreich, {result.failed} fehlgeschlagen")
             
         except SQLAlchemyError as e:
-            # Fehler bei der Datenbankverbindung
+            # Fehler bei der Datenbankverbindung; Momentaufnahmen vor dem Rollback,
+            # der die Objekte der Session verfallen lässt
+            completed = []
+            failed = [self._event_snapshot(transaction, "failed", f"Datenbankfehler: {str(e)}")
+                      for transaction in transactions]
             self.db.rollback()
             logger.error(f"Datenbankfehler bei der Transaktionsverarbeitung: {str(e)}")
             result.failed = len(transactions)
@@ -136,8 +161,56 @@ class TransactionProcessor:
         result.end_time = datetime.now()
         result.processing_time = (result.end_time - result.start_time).total_seconds()
         
+        self._dispatch_events(completed, failed, result)
+        
         return result
     
+    @staticmethod
+    def _event_snapshot(transaction: Transaction, status: str, error: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Erstellt eine vom ORM gelöste Momentaufnahme einer Transaktion für die Events.
+        
+        Wird im Thread des Aufrufers vor Commit bzw. Rollback erstellt; nach dem
+        Commit sind die ORM-Objekte verfallen und würden beim Lesen über die
+        Session des Prozessors nachgeladen.
+        
+        Args:
+            transaction: Verarbeitete Transaktion
+            status: Ergebnis der Verarbeitung (completed, failed)
+            error: Fehlermeldung bei fehlgeschlagenen Transaktionen
+            
+        Returns:
+            Dictionary mit ID, Belegnummer, Typ, Betrag, Status und Fehler
+        """
+        return {
+            "id": transaction.id,
+            "number": transaction.reference_id,
+            "type": transaction.type,
+            "amount": transaction.amount,
+            "direction": transaction.direction,
+            "status": status,
+            "error": error
+        }
+    
+    def _dispatch_events(self, completed: List[Dict[str, Any]], failed: List[Dict[str, Any]],
+                         result: TransactionResult) -> None:
+        """
+        Dispatcht die Verarbeitungs-Events nach dem Commit.
+        
+        Args:
+            completed: Momentaufnahmen der erfolgreich gebuchten Transaktionen
+            failed: Momentaufnahmen der zurückgerollten Transaktionen mit Fehlermeldung
+            result: Ergebnis der Verarbeitung
+        """
+        if self.events.has_listeners(TRANSACTION_COMPLETED):
+            for snapshot in completed:
+                self.events.dispatch(TRANSACTION_COMPLETED, {"transaction": snapshot})
+        if self.events.has_listeners(TRANSACTION_FAILED):
+            for snapshot in failed:
+                self.events.dispatch(TRANSACTION_FAILED, {"transaction": snapshot, "error": snapshot["error"]})
+        if self.events.has_listeners(TRANSACTION_BATCH_COMPLETED):
+            self.events.dispatch(TRANSACTION_BATCH_COMPLETED, {"result": result})
+    
     def _validate_transaction(self, transaction: Transaction) -> bool:
         """
         Validiert eine einzelne Transaktion.
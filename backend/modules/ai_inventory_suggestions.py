@@ -49,6 +49,117 @@ class InventoryPattern:
     reorder_point: float
     optimal_batch_size: float
 
+# Standard-Parameter der Bestellplanung
+DEFAULT_LEAD_TIME_DAYS = 7
+DEFAULT_ORDERING_COST = 50.0
+DEFAULT_HOLDING_COST_RATE = 0.2
+SERVICE_LEVEL_Z = 1.645  # 95% Service Level
+SHORTAGE_HORIZON_DAYS = 30
+DAILY_DEMAND_RETENTION_DAYS = 365
+
+# Saisonale Faktoren je Kategorie (Januar bis Dezember)
+SEASONAL_FACTORS = {
+    'Getränke': [0.8, 0.9, 1.2, 1.3, 1.5, 1.8, 1.8, 1.5, 1.2, 1.0, 0.9, 0.8],
+    'Lebensmittel': [1.1, 1.0, 1.0, 1.1, 1.2, 1.1, 1.0, 1.0, 1.1, 1.2, 1.1, 1.0],
+    'Elektronik': [1.5, 1.2, 1.0, 0.9, 0.8, 0.8, 0.9, 1.0, 1.1, 1.2, 1.4, 1.6],
+    'Kleidung': [1.3, 1.1, 0.9, 0.8, 0.7, 0.8, 0.9, 1.0, 1.2, 1.3, 1.4, 1.2]
+}
+
+PRODUCT_COLUMNS = [
+    'product_id', 'product_name', 'category', 'current_stock', 'unit_price',
+    'supplier_id', 'reorder_point', 'safety_stock'
+]
+DEMAND_COLUMNS = ['product_id', 'total_sold', 'sum_sq_daily', 'transactions']
+
+def compute_reorder_plan(products: pd.DataFrame, demand: pd.DataFrame,
+                         lookback_days: int, as_of: Optional[datetime] = None,
+                         lead_time_days: int = DEFAULT_LEAD_TIME_DAYS,
+                         ordering_cost: float = DEFAULT_ORDERING_COST,
+                         holding_cost_rate: float = DEFAULT_HOLDING_COST_RATE,
+                         service_level_z: float = SERVICE_LEVEL_Z,
+                         min_daily_demand: float = 0.0) -> pd.DataFrame:
+    """
+    Berechnet Sicherheitsbestand, Bestellpunkt, EOQ, Bestellmenge und
+    Engpass-Datum für alle Produkte vektorisiert.
+
+    Args:
+        products: Produkte mit den Spalten aus PRODUCT_COLUMNS
+        demand: Nachfrage-Statistik je Produkt (DEMAND_COLUMNS); Tagesmengen
+            summiert über den Betrachtungszeitraum
+        lookback_days: Länge des Betrachtungszeitraums in Tagen
+        min_daily_demand: Untergrenze der Tagesnachfrage (z.B. für Produkte ohne Verkäufe)
+    """
+    as_of = as_of or datetime.now()
+    plan = products.merge(demand, on='product_id', how='left')
+    for column in ('total_sold', 'sum_sq_daily', 'transactions'):
+        plan[column] = plan[column].fillna(0)
+
+    stock = plan['current_stock'].fillna(0).to_numpy(dtype=float)
+    price = plan['unit_price'].fillna(0).to_numpy(dtype=float)
+    stored_reorder_point = plan['reorder_point'].fillna(0).to_numpy(dtype=float)
+    stored_safety_stock = plan['safety_stock'].fillna(0).to_numpy(dtype=float)
+    transactions = plan['transactions'].to_numpy(dtype=float)
+
+    # Tagesnachfrage und Standardabweichung (Tage ohne Verkauf zählen als 0)
+    total_sold = plan['total_sold'].to_numpy(dtype=float)
+    daily_demand = total_sold / lookback_days
+    variance = plan['sum_sq_daily'].to_numpy(dtype=float) / lookback_days - daily_demand ** 2
+    demand_std = np.sqrt(np.clip(variance, 0, None))
+    demand_std = np.where(demand_std > 0, demand_std, daily_demand * 0.3)
+    daily_demand = np.maximum(daily_demand, min_daily_demand)
+
+    # Sicherheitsbestand und Bestellpunkt
+    safety_stock = np.maximum(demand_std * np.sqrt(lead_time_days) * service_level_z, 0)
+    demand_during_lead_time = daily_demand * lead_time_days
+    reorder_point = demand_during_lead_time + safety_stock
+
+    # Economic Order Quantity (EOQ)
+    annual_demand = daily_demand * 365
+    with np.errstate(divide='ignore', invalid='ignore'):
+        eoq = np.sqrt((2 * annual_demand * ordering_cost) / (price * holding_cost_rate))
+        days_until_shortage = np.where(daily_demand > 0, stock / daily_demand, np.inf)
+    eoq = np.where((annual_demand > 0) & (price > 0), eoq, demand_during_lead_time * 2)
+    suggested_quantity = np.maximum(eoq, reorder_point - stock)
+
+    # Dringlichkeit und Engpass-Datum
+    urgency_level = np.select(
+        [daily_demand <= 0, days_until_shortage <= 7, days_until_shortage <= 14],
+        ['niedrig', 'hoch', 'mittel'],
+        default='niedrig'
+    )
+    has_shortage = (daily_demand > 0) & (stock > 0) & (days_until_shortage < SHORTAGE_HORIZON_DAYS)
+    shortage_date = pd.Series(
+        pd.Timestamp(as_of) + pd.to_timedelta(np.where(has_shortage, days_until_shortage, 0), unit='D')
+    ).where(has_shortage)
+
+    # Confidence aus Datenlage und konfigurierten Bestandsparametern
+    confidence = (
+        np.select([transactions >= 50, transactions >= 20, transactions >= 10], [0.4, 0.3, 0.2], 0.1)
+        + np.select([stock <= stored_reorder_point, stock <= stored_reorder_point + stored_safety_stock],
+                    [0.3, 0.2], 0.1)
+        + np.where(stored_safety_stock > 0, 0.2, 0.1)
+        + np.where(stored_reorder_point > 0, 0.1, 0.05)
+    )
+
+    month_factors = {category: factors[as_of.month - 1] for category, factors in SEASONAL_FACTORS.items()}
+
+    plan['daily_demand'] = daily_demand
+    plan['demand_std'] = demand_std
+    plan['safety_stock_optimal'] = safety_stock
+    plan['reorder_point_optimal'] = reorder_point
+    plan['demand_during_lead_time'] = demand_during_lead_time
+    plan['eoq'] = eoq
+    plan['suggested_quantity'] = suggested_quantity
+    plan['days_until_shortage'] = days_until_shortage
+    plan['predicted_shortage_date'] = shortage_date.to_numpy()
+    plan['urgency_level'] = urgency_level
+    plan['urgency_score'] = pd.Series(urgency_level).map({'hoch': 3, 'mittel': 2, 'niedrig': 1}).to_numpy() \
+        * np.minimum(confidence, 1.0)
+    plan['confidence_score'] = np.minimum(confidence, 1.0)
+    plan['seasonal_factor'] = plan['category'].map(month_factors).fillna(1.0).to_numpy(dtype=float)
+    plan['needs_reorder'] = (daily_demand > 0) & (stock <= reorder_point)
+    return plan
+
 class AIInventorySuggestions:
     """
     KI-basierte Inventur-Vorschläge und Optimierung
@@ -257,7 +368,102 @@ class AIInventorySuggestions:
         except Exception as e:
             logger.error(f"Fehler beim Training der ML-Modelle: {e}")
     
-    def suggest_inventory_optimization(self, product_id: str = None) -> List[InventorySuggestion]:
+    def _load_products(self, where: str = "", params: Tuple = (), suffix: str = "") -> pd.DataFrame:
+        """Lade Produkte mit Bestandsparametern in einem Query"""
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""
+            SELECT id, product_name, category, current_stock, unit_price,
+                   supplier_id, reorder_point, safety_stock
+            FROM products
+            {where}
+            {suffix}
+        """, params)
+        return pd.DataFrame(cursor.fetchall(), columns=PRODUCT_COLUMNS)
+
+    def _load_demand_statistics(self, lookback_days: int, as_of: Optional[datetime],
+                                product_ids: List[Any]) -> pd.DataFrame:
+        """
+        Lade Nachfrage-Statistiken einzelner Produkte direkt aus den Verkäufen.
+
+        Die Verkäufe werden zunächst je Produkt und Tag summiert; daraus ergeben
+        sich Summe und Quadratsumme der Tagesmengen für die Standardabweichung.
+        """
+        if not product_ids:
+            return pd.DataFrame(columns=DEMAND_COLUMNS)
+        since = (as_of or datetime.now()) - timedelta(days=lookback_days)
+        params = [since.strftime('%Y-%m-%d %H:%M:%S'), *product_ids]
+        product_filter = f"AND product_id IN ({', '.join('?' * len(product_ids))})"
+
+        cursor = self.db_connection.cursor()
+        cursor.execute(f"""
+            SELECT product_id,
+                   SUM(day_quantity) as total_sold,
+                   SUM(day_quantity * day_quantity) as sum_sq_daily,
+                   SUM(day_transactions) as transactions
+            FROM (
+                SELECT product_id, DATE(created_at) as day,
+                       SUM(quantity) as day_quantity, COUNT(*) as day_transactions
+                FROM transactions
+                WHERE created_at >= ? {product_filter}
+                GROUP BY product_id, DATE(created_at)
+            ) daily
+            GROUP BY product_id
+        """, params)
+        return pd.DataFrame(cursor.fetchall(), columns=DEMAND_COLUMNS)
+
+    def refresh_daily_demand(self, as_of: Optional[datetime] = None) -> int:
+        """
+        Aktualisiere die Tagesnachfrage-Tabelle ``product_daily_demand``.
+
+        Neu aggregiert werden nur Tage ab dem zuletzt erfassten Tag (der ggf.
+        unvollständig war); Tage außerhalb der Aufbewahrungsfrist werden entfernt.
+        """
+        as_of = as_of or datetime.now()
+        cursor = self.db_connection.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS product_daily_demand (
+                product_id TEXT NOT NULL,
+                day DATE NOT NULL,
+                quantity REAL NOT NULL,
+                transactions INTEGER NOT NULL,
+                PRIMARY KEY (product_id, day)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_product_daily_demand_day ON product_daily_demand (day)")
+        cursor.execute("SELECT MAX(day) FROM product_daily_demand")
+        last_day = cursor.fetchone()[0]
+        retention_start = (as_of - timedelta(days=DAILY_DEMAND_RETENTION_DAYS)).strftime('%Y-%m-%d')
+        start_day = max(last_day, retention_start) if last_day else retention_start
+        
+        cursor.execute("DELETE FROM product_daily_demand WHERE day < ?", (retention_start,))
+        cursor.execute("DELETE FROM product_daily_demand WHERE day >= ?", (start_day,))
+        cursor.execute("""
+            INSERT INTO product_daily_demand (product_id, day, quantity, transactions)
+            SELECT product_id, DATE(created_at), SUM(quantity), COUNT(*)
+            FROM transactions
+            WHERE created_at >= ?
+            GROUP BY product_id, DATE(created_at)
+        """, (start_day,))
+        refreshed = cursor.rowcount
+        self.db_connection.commit()
+        return refreshed
+
+    def _load_daily_demand_statistics(self, lookback_days: int, as_of: Optional[datetime] = None) -> pd.DataFrame:
+        """Lade Nachfrage-Statistiken aller Produkte aus ``product_daily_demand`` in einem Query"""
+        since_day = ((as_of or datetime.now()) - timedelta(days=lookback_days)).strftime('%Y-%m-%d')
+        cursor = self.db_connection.cursor()
+        cursor.execute("""
+            SELECT product_id,
+                   SUM(quantity) as total_sold,
+                   SUM(quantity * quantity) as sum_sq_daily,
+                   SUM(transactions) as transactions
+            FROM product_daily_demand
+            WHERE day > ?
+            GROUP BY product_id
+        """, (since_day,))
+        return pd.DataFrame(cursor.fetchall(), columns=DEMAND_COLUMNS)
+
+    def suggest_inventory_optimization(self, product_id: str = None, limit: int = 20) -> List[InventorySuggestion]:
         """
         Generiere intelligente Inventur-Vorschläge
         """
@@ -268,44 +474,28 @@ class AIInventorySuggestions:
             if not hasattr(self.demand_forecaster, 'estimators_'):
                 self._train_ml_models()
             
-            # Hole aktuelle Inventur-Daten
-            cursor = self.db_connection.cursor()
-            
             if product_id:
                 # Spezifisches Produkt
-                cursor.execute("""
-                    SELECT id, product_name, category, current_stock, unit_price,
-                           supplier_id, reorder_point, safety_stock
-                    FROM products 
-                    WHERE id = ?
-                """, (product_id,))
-                products = cursor.fetchall()
+                products = self._load_products("WHERE id = ?", (product_id,))
             else:
-                # Alle Produkte mit niedrigem Bestand
-                cursor.execute("""
-                    SELECT id, product_name, category, current_stock, unit_price,
-                           supplier_id, reorder_point, safety_stock
-                    FROM products 
-                    WHERE current_stock <= reorder_point + safety_stock
-                    ORDER BY (reorder_point + safety_stock - current_stock) DESC
-                    LIMIT 20
-                """)
-                products = cursor.fetchall()
-            
-            for product in products:
-                product_id, product_name, category, current_stock, unit_price, supplier_id, reorder_point, safety_stock = product
-                
-                # Generiere Vorschlag
-                suggestion = self._generate_inventory_suggestion(
-                    product_id, product_name, category, current_stock,
-                    unit_price, reorder_point, safety_stock
+                # Produkte mit niedrigem Bestand
+                products = self._load_products(
+                    "WHERE current_stock <= reorder_point + safety_stock",
+                    suffix="ORDER BY (reorder_point + safety_stock - current_stock) DESC"
+                           + (f" LIMIT {int(limit)}" if limit else "")
                 )
-                
-                if suggestion:
-                    suggestions.append(suggestion)
+            
+            if products.empty:
+                return suggestions
+            
+            # Nachfrage der letzten 90 Tage für alle Produkte in einem Query
+            now = datetime.now()
+            demand = self._load_demand_statistics(90, now, products['product_id'].tolist())
+            plan = compute_reorder_plan(products, demand, 90, now, min_daily_demand=0.1)
             
             # Sortiere nach Dringlichkeit
-            suggestions.sort(key=lambda x: self._urgency_score(x), reverse=True)
+            plan = plan.sort_values('urgency_score', ascending=False, kind='stable')
+            suggestions = [self._suggestion_from_plan(row, now) for row in plan.to_dict('records')]
             
             # Speichere Vorschläge in Historie
             for suggestion in suggestions[:10]:
@@ -323,189 +513,156 @@ class AIInventorySuggestions:
         
         return suggestions
     
-    def _generate_inventory_suggestion(self, product_id: str, product_name: str,
-                                     category: str, current_stock: float,
-                                     unit_price: float, reorder_point: float,
-                                     safety_stock: float) -> Optional[InventorySuggestion]:
-        """Generiere Inventur-Vorschlag für ein Produkt"""
-        try:
-            # Hole historische Daten
-            cursor = self.db_connection.cursor()
-            
-            # Verkaufsdaten der letzten 90 Tage
-            ninety_days_ago = datetime.now() - timedelta(days=90)
-            
-            cursor.execute("""
-                SELECT SUM(quantity) as total_sold, COUNT(*) as transactions
-                FROM transactions 
-                WHERE product_id = ? AND created_at >= ?
-            """, (product_id, ninety_days_ago))
-            
-            sales_result = cursor.fetchone()
-            total_sold = sales_result[0] if sales_result[0] else 0
-            transactions = sales_result[1] if sales_result[1] else 0
-            
-            # Berechne Nachfrage-Prognose
-            daily_demand = total_sold / 90 if total_sold > 0 else 0.1
-            
-            # Vorhersage für nächste 30 Tage
-            predicted_demand_30d = daily_demand * 30
-            
-            # Berechne optimale Bestellmenge
-            lead_time_days = 7  # Standard-Lieferzeit
-            demand_during_lead_time = daily_demand * lead_time_days
-            
-            # Economic Order Quantity (EOQ) Formel
-            ordering_cost = 50  # Standard-Bestellkosten
-            holding_cost_rate = 0.2  # 20% Lagerhaltungskosten
-            annual_demand = daily_demand * 365
-            
-            if annual_demand > 0 and unit_price > 0:
-                eoq = np.sqrt((2 * annual_demand * ordering_cost) / (unit_price * holding_cost_rate))
-            else:
-                eoq = demand_during_lead_time * 2
-            
-            # Berechne Confidence Score
-            confidence = self._calculate_inventory_confidence(
-                transactions, current_stock, reorder_point, safety_stock
-            )
-            
-            # Bestimme Dringlichkeit
-            urgency_level = self._determine_urgency_level(
-                current_stock, reorder_point, safety_stock, daily_demand
-            )
-            
-            # Vorhersage Engpass-Datum
-            shortage_date = None
-            if daily_demand > 0 and current_stock > 0:
-                days_until_shortage = current_stock / daily_demand
-                if days_until_shortage < 30:
-                    shortage_date = datetime.now() + timedelta(days=days_until_shortage)
-            
-            # Saisonale Faktoren
-            current_month = datetime.now().month
-            seasonal_factor = self._get_seasonal_factor(category, current_month)
-            
-            # Nachfrage-Prognose
-            demand_forecast = {
-                'daily_demand': daily_demand,
-                'weekly_demand': daily_demand * 7,
-                'monthly_demand': daily_demand * 30,
-                'annual_demand': annual_demand,
-                'demand_volatility': transactions / max(total_sold, 1)
-            }
-            
-            # Kosten-Impact
-            cost_impact = {
-                'stockout_cost': predicted_demand_30d * unit_price * 0.1,  # 10% Verlust
-                'holding_cost': current_stock * unit_price * holding_cost_rate / 12,
-                'ordering_cost': ordering_cost,
-                'total_inventory_value': current_stock * unit_price
-            }
-            
-            # Generiere Vorschlag
-            suggested_quantity = max(eoq, demand_during_lead_time + safety_stock - current_stock)
-            
-            reasoning = f"Basierend auf täglicher Nachfrage von {daily_demand:.2f} Einheiten. "
-            reasoning += f"EOQ: {eoq:.0f}, Lieferzeit-Nachfrage: {demand_during_lead_time:.0f}. "
-            reasoning += f"Confidence: {confidence:.1%}"
-            
-            return InventorySuggestion(
-                id=str(uuid.uuid4()),
-                product_id=product_id,
-                product_name=product_name,
-                suggested_quantity=suggested_quantity,
-                confidence_score=confidence,
-                reasoning=reasoning,
-                urgency_level=urgency_level,
-                predicted_shortage_date=shortage_date,
-                seasonal_factor=seasonal_factor,
-                demand_forecast=demand_forecast,
-                cost_impact=cost_impact,
-                created_at=datetime.now()
-            )
-            
-        except Exception as e:
-            logger.error(f"Fehler bei Inventur-Vorschlag-Generierung: {e}")
-            return None
+    def _suggestion_from_plan(self, row: Dict[str, Any], created_at: datetime) -> InventorySuggestion:
+        """Erzeuge Inventur-Vorschlag aus einer Zeile des Bestellplans"""
+        daily_demand = row['daily_demand']
+        unit_price = row['unit_price'] or 0
+        current_stock = row['current_stock'] or 0
+        shortage_date = row['predicted_shortage_date']
+        
+        demand_forecast = {
+            'daily_demand': daily_demand,
+            'weekly_demand': daily_demand * 7,
+            'monthly_demand': daily_demand * 30,
+            'annual_demand': daily_demand * 365,
+            'demand_volatility': row['transactions'] / max(row['total_sold'], 1)
+        }
+        
+        cost_impact = {
+            'stockout_cost': daily_demand * 30 * unit_price * 0.1,  # 10% Verlust
+            'holding_cost': current_stock * unit_price * DEFAULT_HOLDING_COST_RATE / 12,
+            'ordering_cost': DEFAULT_ORDERING_COST,
+            'total_inventory_value': current_stock * unit_price
+        }
+        
+        reasoning = f"Basierend auf täglicher Nachfrage von {daily_demand:.2f} Einheiten. "
+        reasoning += f"EOQ: {row['eoq']:.0f}, Lieferzeit-Nachfrage: {row['demand_during_lead_time']:.0f}. "
+        reasoning += f"Confidence: {row['confidence_score']:.1%}"
+        
+        return InventorySuggestion(
+            id=str(uuid.uuid4()),
+            product_id=row['product_id'],
+            product_name=row['product_name'],
+            suggested_quantity=float(row['suggested_quantity']),
+            confidence_score=float(row['confidence_score']),
+            reasoning=reasoning,
+            urgency_level=row['urgency_level'],
+            predicted_shortage_date=None if pd.isna(shortage_date) else pd.Timestamp(shortage_date).to_pydatetime(),
+            seasonal_factor=float(row['seasonal_factor']),
+            demand_forecast=demand_forecast,
+            cost_impact=cost_impact,
+            created_at=created_at
+        )
     
-    def _calculate_inventory_confidence(self, transactions: int, current_stock: float,
-                                      reorder_point: float, safety_stock: float) -> float:
-        """Berechne Confidence Score für Inventur-Vorschlag"""
-        try:
-            confidence = 0.0
-            
-            # Basis-Confidence aus Transaktionsanzahl
-            if transactions >= 50:
-                confidence += 0.4
-            elif transactions >= 20:
-                confidence += 0.3
-            elif transactions >= 10:
-                confidence += 0.2
-            else:
-                confidence += 0.1
-            
-            # Bestand-Niveau
-            if current_stock <= reorder_point:
-                confidence += 0.3  # Hohe Dringlichkeit
-            elif current_stock <= reorder_point + safety_stock:
-                confidence += 0.2  # Mittlere Dringlichkeit
-            else:
-                confidence += 0.1  # Niedrige Dringlichkeit
-            
-            # Sicherheitsbestand-Konfiguration
-            if safety_stock > 0:
-                confidence += 0.2
-            else:
-                confidence += 0.1
-            
-            # Bestellpunkt-Konfiguration
-            if reorder_point > 0:
-                confidence += 0.1
-            else:
-                confidence += 0.05
-            
-            return min(confidence, 1.0)
-            
-        except Exception as e:
-            logger.error(f"Fehler bei Confidence-Berechnung: {e}")
-            return 0.5
+    def run_reorder_planning(self, lookback_days: int = 90, as_of: Optional[datetime] = None,
+                             apply_parameters: bool = False) -> Dict[str, Any]:
+        """
+        Bestellplanung für den gesamten Katalog (z.B. nächtlich).
+
+        Nach dem Nachführen von ``product_daily_demand`` werden Produkte und
+        Nachfrage mit je einem Query geladen, die Planung
+        vektorisiert berechnet und alle Bestellvorschläge gesammelt in
+        ``inventory_reorder_plan`` geschrieben. Mit ``apply_parameters`` werden
+        zusätzlich Bestellpunkt und Sicherheitsbestand der Produkte aktualisiert.
+        """
+        as_of = as_of or datetime.now()
+        run_id = str(uuid.uuid4())
+        timings = {}
+        
+        start = datetime.now()
+        self.refresh_daily_demand(as_of)
+        timings['refresh_seconds'] = (datetime.now() - start).total_seconds()
+        
+        start = datetime.now()
+        products = self._load_products()
+        demand = self._load_daily_demand_statistics(lookback_days, as_of)
+        timings['load_seconds'] = (datetime.now() - start).total_seconds()
+        
+        start = datetime.now()
+        plan = compute_reorder_plan(products, demand, lookback_days, as_of)
+        reorders = plan[plan['needs_reorder']]
+        timings['compute_seconds'] = (datetime.now() - start).total_seconds()
+        
+        start = datetime.now()
+        self._save_reorder_plan(run_id, reorders, as_of)
+        if apply_parameters:
+            self._apply_plan_parameters(plan[plan['daily_demand'] > 0])
+        self.db_connection.commit()
+        timings['write_seconds'] = (datetime.now() - start).total_seconds()
+        
+        logger.info(f"Bestellplanung {run_id}: {len(plan)} Produkte geplant, {len(reorders)} Bestellvorschläge")
+        
+        return {
+            'run_id': run_id,
+            'planned_products': len(plan),
+            'reorder_suggestions': len(reorders),
+            'urgency_distribution': reorders['urgency_level'].value_counts().to_dict(),
+            'order_value': float((reorders['suggested_quantity'] * reorders['unit_price'].fillna(0)).sum()),
+            **timings
+        }
     
-    def _determine_urgency_level(self, current_stock: float, reorder_point: float,
-                               safety_stock: float, daily_demand: float) -> str:
-        """Bestimme Dringlichkeits-Level"""
-        try:
-            if daily_demand <= 0:
-                return 'niedrig'
-            
-            days_until_stockout = current_stock / daily_demand
-            
-            if days_until_stockout <= 7:
-                return 'hoch'
-            elif days_until_stockout <= 14:
-                return 'mittel'
-            else:
-                return 'niedrig'
-                
-        except Exception as e:
-            logger.error(f"Fehler bei Dringlichkeits-Bestimmung: {e}")
-            return 'mittel'
+    def _save_reorder_plan(self, run_id: str, reorders: pd.DataFrame, planned_at: datetime):
+        """Schreibe Bestellvorschläge gesammelt (ersetzt den vorherigen Planungslauf)"""
+        cursor = self.db_connection.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS inventory_reorder_plan (
+                product_id TEXT PRIMARY KEY,
+                run_id TEXT NOT NULL,
+                product_name TEXT,
+                current_stock REAL,
+                daily_demand REAL NOT NULL,
+                safety_stock REAL NOT NULL,
+                reorder_point REAL NOT NULL,
+                eoq REAL NOT NULL,
+                suggested_quantity REAL NOT NULL,
+                urgency_level TEXT NOT NULL,
+                confidence_score REAL NOT NULL,
+                predicted_shortage_date TIMESTAMP,
+                planned_at TIMESTAMP NOT NULL
+            )
+        """)
+        cursor.execute("DELETE FROM inventory_reorder_plan")
+        
+        shortage_dates = reorders['predicted_shortage_date'].dt.strftime('%Y-%m-%d %H:%M:%S')
+        columns = [
+            reorders['product_id'].tolist(),
+            reorders['product_name'].tolist(),
+            reorders['current_stock'].tolist(),
+            reorders['daily_demand'].tolist(),
+            reorders['safety_stock_optimal'].tolist(),
+            reorders['reorder_point_optimal'].tolist(),
+            reorders['eoq'].tolist(),
+            reorders['suggested_quantity'].tolist(),
+            reorders['urgency_level'].tolist(),
+            reorders['confidence_score'].tolist(),
+            shortage_dates.where(shortage_dates.notna(), None).tolist(),
+        ]
+        planned_at_text = planned_at.strftime('%Y-%m-%d %H:%M:%S')
+        cursor.executemany("""
+            INSERT INTO inventory_reorder_plan (
+                product_id, run_id, product_name, current_stock, daily_demand,
+                safety_stock, reorder_point, eoq, suggested_quantity, urgency_level,
+                confidence_score, predicted_shortage_date, planned_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, ((values[0], run_id, *values[1:], planned_at_text) for values in zip(*columns)))
+    
+    def _apply_plan_parameters(self, plan: pd.DataFrame):
+        """Übernehme berechnete Bestellpunkte und Sicherheitsbestände gesammelt in die Produkte"""
+        cursor = self.db_connection.cursor()
+        cursor.executemany(
+            "UPDATE products SET reorder_point = ?, safety_stock = ? WHERE id = ?",
+            zip(plan['reorder_point_optimal'].tolist(),
+                plan['safety_stock_optimal'].tolist(),
+                plan['product_id'].tolist())
+        )
     
     def _get_seasonal_factor(self, category: str, month: int) -> float:
         """Berechne saisonalen Faktor"""
         try:
-            # Saisonale Faktoren basierend auf Kategorie
-            seasonal_factors = {
-                'Getränke': [0.8, 0.9, 1.2, 1.3, 1.5, 1.8, 1.8, 1.5, 1.2, 1.0, 0.9, 0.8],
-                'Lebensmittel': [1.1, 1.0, 1.0, 1.1, 1.2, 1.1, 1.0, 1.0, 1.1, 1.2, 1.1, 1.0],
-                'Elektronik': [1.5, 1.2, 1.0, 0.9, 0.8, 0.8, 0.9, 1.0, 1.1, 1.2, 1.4, 1.6],
-                'Kleidung': [1.3, 1.1, 0.9, 0.8, 0.7, 0.8, 0.9, 1.0, 1.2, 1.3, 1.4, 1.2]
-            }
-            
             # Standard-Faktor falls Kategorie nicht gefunden
             default_factors = [1.0] * 12
             
-            factors = seasonal_factors.get(category, default_factors)
+            factors = SEASONAL_FACTORS.get(category, default_factors)
             return factors[month - 1] if 1 <= month <= 12 else 1.0
             
         except Exception as e:
@@ -520,55 +677,49 @@ class AIInventorySuggestions:
     def optimize_inventory_parameters(self) -> Dict[str, Any]:
         """Optimiere Inventur-Parameter mit KI"""
         try:
-            cursor = self.db_connection.cursor()
-            
-            # Hole alle Produkte
-            cursor.execute("""
-                SELECT id, product_name, category, current_stock, unit_price,
-                       reorder_point, safety_stock, supplier_id
-                FROM products
-            """)
-            
-            products = cursor.fetchall()
+            # Hole alle Produkte und die Nachfrage der letzten 6 Monate in je einem Query
+            products = self._load_products()
             
-            if not products:
+            if products.empty:
                 return {'message': 'Keine Produkte zur Optimierung gefunden'}
             
+            lookback_days = 180
+            self.refresh_daily_demand()
+            demand = self._load_daily_demand_statistics(lookback_days)
+            plan = compute_reorder_plan(products, demand, lookback_days)
+            
+            # Produkte ohne Verkäufe werden nicht optimiert
+            plan = plan[plan['total_sold'] > 0]
+            optimized_reorder_point = np.maximum(plan['reorder_point_optimal'].to_numpy(), 1)
+            optimized_safety_stock = plan['safety_stock_optimal'].to_numpy()
+            unit_price = plan['unit_price'].fillna(0).to_numpy(dtype=float)
+            current_reorder_point = plan['reorder_point'].fillna(0).to_numpy(dtype=float)
+            current_safety_stock = plan['safety_stock'].fillna(0).to_numpy(dtype=float)
+            
+            # Berechne Kosteneinsparungen
+            current_cost = (current_reorder_point + current_safety_stock) * unit_price
+            optimized_cost = (optimized_reorder_point + optimized_safety_stock) * unit_price
+            cost_saving = current_cost - optimized_cost
+            
+            suggestions = pd.DataFrame({
+                'product_id': plan['product_id'].to_numpy(),
+                'product_name': plan['product_name'].to_numpy(),
+                'current_reorder_point': plan['reorder_point'].to_numpy(),
+                'current_safety_stock': plan['safety_stock'].to_numpy(),
+                'optimized_reorder_point': optimized_reorder_point,
+                'optimized_safety_stock': optimized_safety_stock,
+                'cost_saving': cost_saving,
+                # Confidence basierend auf Datenqualität
+                'confidence': np.minimum(plan['transactions'].to_numpy(dtype=float) / 100.0, 1.0)
+            })
+            
             optimization_results = {
                 'total_products': len(products),
-                'optimized': 0,
-                'suggestions': [],
-                'cost_savings': 0.0
+                'optimized': len(suggestions),
+                'suggestions': suggestions.to_dict('records'),
+                'cost_savings': float(cost_saving.sum())
             }
             
-            for product in products:
-                product_id, product_name, category, current_stock, unit_price, reorder_point, safety_stock, supplier_id = product
-                
-                # Generiere optimierte Parameter
-                optimized_params = self._optimize_product_parameters(
-                    product_id, product_name, category, current_stock, unit_price
-                )
-                
-                if optimized_params:
-                    # Berechne Kosteneinsparungen
-                    current_cost = (reorder_point + safety_stock) * unit_price
-                    optimized_cost = (optimized_params['reorder_point'] + optimized_params['safety_stock']) * unit_price
-                    cost_saving = current_cost - optimized_cost
-                    
-                    optimization_results['suggestions'].append({
-                        'product_id': product_id,
-                        'product_name': product_name,
-                        'current_reorder_point': reorder_point,
-                        'current_safety_stock': safety_stock,
-                        'optimized_reorder_point': optimized_params['reorder_point'],
-                        'optimized_safety_stock': optimized_params['safety_stock'],
-                        'cost_saving': cost_saving,
-                        'confidence': optimized_params['confidence']
-                    })
-                    
-                    optimization_results['optimized'] += 1
-                    optimization_results['cost_savings'] += cost_saving
-            
             logger.info(f"Inventur-Parameter-Optimierung abgeschlossen: {optimization_results['optimized']} Produkte")
             
             return optimization_results
@@ -577,62 +728,6 @@ class AIInventorySuggestions:
             logger.error(f"Fehler bei Inventur-Parameter-Optimierung: {e}")
             return {'error': str(e)}
     
-    def _optimize_product_parameters(self, product_id: str, product_name: str,
-                                   category: str, current_stock: float,
-                                   unit_price: float) -> Optional[Dict[str, Any]]:
-        """Optimiere Parameter für ein Produkt"""
-        try:
-            # Hole Verkaufsdaten
-            cursor = self.db_connection.cursor()
-            
-            # Letzte 6 Monate
-            six_months_ago = datetime.now() - timedelta(days=180)
-            
-            cursor.execute("""
-                SELECT SUM(quantity) as total_sold, COUNT(*) as transactions,
-                       AVG(quantity) as avg_quantity, STDDEV(quantity) as std_quantity
-                FROM transactions 
-                WHERE product_id = ? AND created_at >= ?
-            """, (product_id, six_months_ago))
-            
-            result = cursor.fetchone()
-            
-            if not result or result[0] is None:
-                return None
-            
-            total_sold, transactions, avg_quantity, std_quantity = result
-            
-            if total_sold <= 0:
-                return None
-            
-            # Berechne optimale Parameter
-            daily_demand = total_sold / 180
-            demand_std = std_quantity if std_quantity else daily_demand * 0.3
-            
-            # Lead Time (Standard: 7 Tage)
-            lead_time_days = 7
-            
-            # Optimale Sicherheitsbestand (95% Service Level)
-            safety_stock = demand_std * np.sqrt(lead_time_days) * 1.645
-            
-            # Optimaler Bestellpunkt
-            reorder_point = daily_demand * lead_time_days + safety_stock
-            
-            # Confidence basierend auf Datenqualität
-            confidence = min(transactions / 100.0, 1.0)
-            
-            return {
-                'reorder_point': max(reorder_point, 1),
-                'safety_stock': max(safety_stock, 0),
-                'confidence': confidence,
-                'daily_demand': daily_demand,
-                'demand_volatility': demand_std / daily_demand if daily_demand > 0 else 0
-            }
-            
-        except Exception as e:
-            logger.error(f"Fehler bei Parameter-Optimierung: {e}")
-            return None
-    
     def get_inventory_analytics(self) -> Dict[str, Any]:
         """Hole Inventur-Analytics"""
         try:
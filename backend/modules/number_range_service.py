@@ -0,0 +1,336 @@
+"""
+VALEO NeuroERP - Nummernkreise
+Belegnummern je Belegart, Geschäftsjahr und Filiale/Kasse mit Blockvergabe
+"""
+
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class NumberRangeMode(Enum):
+    """Vergabemodus eines Nummernkreises"""
+    # Jede Nummer wird vergeben oder zurückgegeben, auch nach einem Absturz
+    LUECKENLOS = "lueckenlos"
+    # Nach einem Absturz verfällt der Rest des Blocks (Lücke, aber nie doppelt)
+    LUECKEN_TOLERANT = "luecken_tolerant"
+
+@dataclass
+class NumberRangeConfig:
+    """Konfiguration eines Nummernkreises"""
+    beleg_typ: str
+    praefix: str
+    modus: NumberRangeMode = NumberRangeMode.LUECKEN_TOLERANT
+    block_groesse: int = 100
+    format: str = "{praefix}-{jahr}-{filiale}-{nummer:06d}"
+    start: int = 1
+
+# Rechnungen und Kassenbelege fortlaufend und lückenlos (§ 14 UStG, GoBD),
+# übrige Belege dürfen Lücken haben
+DEFAULT_NUMBER_RANGES = [
+    NumberRangeConfig("rechnung", "RE", NumberRangeMode.LUECKENLOS),
+    NumberRangeConfig("kassenbeleg", "BON", NumberRangeMode.LUECKENLOS),
+    # Angebotsnummern liefert der beleg_service bislang vom Client; dessen
+    # Datenbank ist zentral, dieser Dienst zählt je Host (SQLite)
+    NumberRangeConfig("angebot", "AN"),
+    NumberRangeConfig("auftrag", "AU"),
+    NumberRangeConfig("lieferschein", "LS"),
+]
+
+# Ohne Heartbeat gilt die Worker-ID nach dieser Zeit als frei (Sekunden)
+DEFAULT_LEASE_TIMEOUT = 60.0
+
+class WorkerIdInUseError(RuntimeError):
+    """Die Worker-ID ist bereits von einer laufenden Instanz belegt"""
+
+@dataclass
+class _Block:
+    naechste: int
+    ende: int
+
+class NumberRangeService:
+    """
+    Nummernkreise mit Blockvergabe je Worker bzw. Kasse.
+
+    Der zentrale Zähler wird nur beim Reservieren eines Blocks gesperrt, die
+    Nummern innerhalb eines Blocks vergibt jeder Worker selbst. Jeder
+    Jahrgang, jede Filiale und jede Belegart bildet einen eigenen Kreis.
+
+    Lückenlose Kreise schreiben den Stand des Blocks je Nummer fest (nur die
+    Zeile des eigenen Workers). Ein neu gestarteter Worker mit derselben ID
+    setzt nach einem Absturz dort fort; beim Schließen zurückgegebene Reste
+    werden vor neuen Blöcken vergeben. Lücken-tolerante Kreise halten den
+    Block nur im Speicher.
+
+    Eine Worker-ID darf nur von einer Instanz gleichzeitig genutzt werden: sie
+    wird exklusiv gepachtet (Besitzer und Heartbeat in ``nummernkreis_worker``),
+    sonst würden zwei Instanzen denselben Block fortschreiben. Eine zweite
+    Instanz scheitert mit ``WorkerIdInUseError``; nach einem Absturz wird die
+    ID nach ``lease_timeout`` Sekunden ohne Heartbeat wieder frei.
+    """
+
+    def __init__(self, db_path: str, worker_id: str, configs: Optional[List[NumberRangeConfig]] = None,
+                 lease_timeout: float = DEFAULT_LEASE_TIMEOUT):
+        self.db_path = db_path
+        self.worker_id = worker_id
+        self.lease_timeout = lease_timeout
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.configs: Dict[str, NumberRangeConfig] = {}
+        self._bloecke: Dict[str, _Block] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+        for config in configs or DEFAULT_NUMBER_RANGES:
+            self.register(config)
+
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._init_tables()
+        self._acquire_lease()
+        self._load_blocks()
+        self._heartbeat = threading.Thread(target=self._run_heartbeat, name=f"nummernkreis-{worker_id}",
+                                           daemon=True)
+        self._heartbeat.start()
+
+    def _init_tables(self):
+        """Tabellen für Zähler, offene Blöcke und zurückgegebene Reste anlegen"""
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS nummernkreise (
+                kreis TEXT PRIMARY KEY,
+                naechste INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS nummernkreis_bloecke (
+                kreis TEXT NOT NULL,
+                worker_id TEXT NOT NULL,
+                naechste INTEGER NOT NULL,
+                ende INTEGER NOT NULL,
+                PRIMARY KEY (kreis, worker_id)
+            );
+            CREATE TABLE IF NOT EXISTS nummernkreis_reste (
+                kreis TEXT NOT NULL,
+                start INTEGER NOT NULL,
+                ende INTEGER NOT NULL,
+                PRIMARY KEY (kreis, start)
+            );
+            CREATE TABLE IF NOT EXISTS nummernkreis_worker (
+                worker_id TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                heartbeat REAL NOT NULL
+            );
+        """)
+
+    def _acquire_lease(self):
+        """Worker-ID exklusiv pachten; eine belegte, lebende ID wird nicht übernommen"""
+        cursor = self._conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            row = cursor.execute("SELECT owner, heartbeat FROM nummernkreis_worker WHERE worker_id = ?",
+                                 (self.worker_id,)).fetchone()
+            if row is not None and time.time() - row[1] < self.lease_timeout:
+                raise WorkerIdInUseError(f"Worker-ID {self.worker_id} wird bereits von {row[0]} verwendet")
+            cursor.execute(
+                "INSERT OR REPLACE INTO nummernkreis_worker (worker_id, owner, heartbeat) VALUES (?, ?, ?)",
+                (self.worker_id, self.owner, time.time())
+            )
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        if row is not None:
+            logger.warning(f"Worker-ID {self.worker_id} von {row[0]} ohne Heartbeat übernommen")
+
+    def _run_heartbeat(self):
+        while not self._stopped.wait(self.lease_timeout / 3):
+            try:
+                with self._lock:
+                    self._check_lease(self._conn.cursor(), refresh=True)
+            except WorkerIdInUseError as e:
+                logger.error(str(e))
+                return
+            except sqlite3.Error as e:
+                logger.warning(f"Heartbeat für Worker {self.worker_id} fehlgeschlagen: {str(e)}")
+
+    def _check_lease(self, cursor: sqlite3.Cursor, refresh: bool = False):
+        """Pacht prüfen (und verlängern); verloren, wenn eine andere Instanz die ID übernommen hat"""
+        cursor.execute(
+            "UPDATE nummernkreis_worker SET heartbeat = ? WHERE worker_id = ? AND owner = ?"
+            if refresh else
+            "UPDATE nummernkreis_worker SET heartbeat = heartbeat WHERE worker_id = ? AND owner = ?",
+            ((time.time(),) if refresh else ()) + (self.worker_id, self.owner)
+        )
+        if not cursor.rowcount:
+            raise WorkerIdInUseError(f"Worker-ID {self.worker_id} wurde von einer anderen Instanz übernommen")
+
+    def _load_blocks(self):
+        """Nach einem Neustart die offenen Blöcke dieses Workers übernehmen"""
+        rows = self._conn.execute(
+            "SELECT kreis, naechste, ende FROM nummernkreis_bloecke WHERE worker_id = ?", (self.worker_id,)
+        ).fetchall()
+        for kreis, naechste, ende in rows:
+            self._bloecke[kreis] = _Block(naechste, ende)
+        if rows:
+            logger.info(f"{len(rows)} offene Nummernblöcke für Worker {self.worker_id} übernommen")
+
+    def register(self, config: NumberRangeConfig):
+        """Nummernkreis registrieren oder ersetzen"""
+        if config.block_groesse < 1:
+            raise ValueError("Blockgröße muss mindestens 1 sein")
+        self.configs[config.beleg_typ] = config
+
+    def _config(self, beleg_typ: str) -> NumberRangeConfig:
+        try:
+            return self.configs[beleg_typ]
+        except KeyError:
+            raise ValueError(f"Unbekannter Nummernkreis: {beleg_typ}")
+
+    @staticmethod
+    def _kreis(beleg_typ: str, jahr: int, filiale: str) -> str:
+        return f"{beleg_typ}|{jahr}|{filiale}"
+
+    def next_value(self, beleg_typ: str, filiale: str = "00", datum: Optional[date] = None) -> int:
+        """
+        Nächste Nummer eines Kreises als Zahl
+
+        Args:
+            beleg_typ: Belegart, z.B. "rechnung"
+            filiale: Filiale bzw. Kasse
+            datum: Belegdatum, bestimmt das Geschäftsjahr (Standard: heute)
+
+        Returns:
+            Laufende Nummer innerhalb von Belegart, Jahr und Filiale
+        """
+        config = self._config(beleg_typ)
+        kreis = self._kreis(beleg_typ, (datum or date.today()).year, filiale)
+        lueckenlos = config.modus == NumberRangeMode.LUECKENLOS
+
+        with self._lock:
+            block = self._bloecke.get(kreis)
+            if block is None or block.naechste > block.ende:
+                block = self._reserve_block(kreis, config)
+                self._bloecke[kreis] = block
+            nummer = block.naechste
+            if lueckenlos:
+                # Nur die eigene Zeile: keine Sperre gegen andere Worker auf demselben Zähler;
+                # schreibt nur, solange diese Instanz die Worker-ID gepachtet hat
+                cursor = self._conn.execute(
+                    "UPDATE nummernkreis_bloecke SET naechste = ? WHERE kreis = ? AND worker_id = ? AND EXISTS "
+                    "(SELECT 1 FROM nummernkreis_worker WHERE worker_id = ? AND owner = ?)",
+                    (nummer + 1, kreis, self.worker_id, self.worker_id, self.owner)
+                )
+                if not cursor.rowcount:
+                    raise WorkerIdInUseError(
+                        f"Worker-ID {self.worker_id} wurde von einer anderen Instanz übernommen"
+                    )
+            block.naechste = nummer + 1
+            return nummer
+
+    def next_number(self, beleg_typ: str, filiale: str = "00", datum: Optional[date] = None) -> str:
+        """Nächste formatierte Belegnummer, z.B. RE-2024-01-000042"""
+        config = self._config(beleg_typ)
+        datum = datum or date.today()
+        nummer = self.next_value(beleg_typ, filiale, datum)
+        return config.format.format(praefix=config.praefix, jahr=datum.year, filiale=filiale, nummer=nummer)
+
+    def _reserve_block(self, kreis: str, config: NumberRangeConfig) -> _Block:
+        """Block aus einem zurückgegebenen Rest oder vom zentralen Zähler reservieren"""
+        lueckenlos = config.modus == NumberRangeMode.LUECKENLOS
+        cursor = self._conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            self._check_lease(cursor, refresh=True)
+            block = self._take_remainder(cursor, kreis, config.block_groesse) if lueckenlos else None
+            if block is None:
+                cursor.execute("INSERT OR IGNORE INTO nummernkreise (kreis, naechste) VALUES (?, ?)",
+                               (kreis, config.start))
+                cursor.execute("UPDATE nummernkreise SET naechste = naechste + ? WHERE kreis = ?",
+                               (config.block_groesse, kreis))
+                ende = cursor.execute("SELECT naechste FROM nummernkreise WHERE kreis = ?", (kreis,)).fetchone()[0] - 1
+                block = _Block(ende - config.block_groesse + 1, ende)
+            if lueckenlos:
+                cursor.execute(
+                    "INSERT OR REPLACE INTO nummernkreis_bloecke (kreis, worker_id, naechste, ende) VALUES (?, ?, ?, ?)",
+                    (kreis, self.worker_id, block.naechste, block.ende)
+                )
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        logger.debug(f"Nummernblock {block.naechste}-{block.ende} für {kreis} an Worker {self.worker_id} vergeben")
+        return block
+
+    @staticmethod
+    def _take_remainder(cursor: sqlite3.Cursor, kreis: str, groesse: int) -> Optional[_Block]:
+        row = cursor.execute(
+            "SELECT start, ende FROM nummernkreis_reste WHERE kreis = ? ORDER BY start LIMIT 1", (kreis,)
+        ).fetchone()
+        if row is None:
+            return None
+        start, ende = row
+        cursor.execute("DELETE FROM nummernkreis_reste WHERE kreis = ? AND start = ?", (kreis, start))
+        if ende - start + 1 > groesse:
+            cursor.execute("INSERT INTO nummernkreis_reste (kreis, start, ende) VALUES (?, ?, ?)",
+                           (kreis, start + groesse, ende))
+            ende = start + groesse - 1
+        return _Block(start, ende)
+
+    def release(self) -> int:
+        """
+        Nicht verbrauchte Nummern aller Blöcke zurückgeben (beim Herunterfahren)
+
+        Returns:
+            Anzahl zurückgegebener Nummern
+        """
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                self._check_lease(cursor)
+                zurueck = sum(self._release_block(cursor, kreis, block) for kreis, block in self._bloecke.items())
+                cursor.execute("DELETE FROM nummernkreis_bloecke WHERE worker_id = ?", (self.worker_id,))
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            self._bloecke.clear()
+        return zurueck
+
+    def _release_block(self, cursor: sqlite3.Cursor, kreis: str, block: _Block) -> int:
+        if block.naechste > block.ende:
+            return 0
+        # Letzter vergebener Block: Zähler einfach zurücksetzen
+        cursor.execute("UPDATE nummernkreise SET naechste = ? WHERE kreis = ? AND naechste = ?",
+                       (block.naechste, kreis, block.ende + 1))
+        if cursor.rowcount:
+            return block.ende - block.naechste + 1
+        if self._config(kreis.split("|", 1)[0]).modus != NumberRangeMode.LUECKENLOS:
+            return 0
+        cursor.execute("INSERT INTO nummernkreis_reste (kreis, start, ende) VALUES (?, ?, ?)",
+                       (kreis, block.naechste, block.ende))
+        return block.ende - block.naechste + 1
+
+    def open_blocks(self) -> Dict[str, Tuple[int, int]]:
+        """Offene Blöcke dieses Workers (Kreis -> nächste Nummer, Blockende)"""
+        with self._lock:
+            return {kreis: (block.naechste, block.ende) for kreis, block in self._bloecke.items()}
+
+    def close(self):
+        """Reste zurückgeben, Worker-ID freigeben und Verbindung schließen"""
+        self._stopped.set()
+        self._heartbeat.join()
+        try:
+            self.release()
+        except WorkerIdInUseError as e:
+            # Die Blöcke gehören jetzt der übernehmenden Instanz
+            logger.error(str(e))
+        self._conn.execute("DELETE FROM nummernkreis_worker WHERE worker_id = ? AND owner = ?",
+                           (self.worker_id, self.owner))
+        self._conn.close()
@@ -0,0 +1,230 @@
+"""
+VALEO NeuroERP - Artikelkatalog der Kasse
+Einmal geladener Artikelstamm im Speicher mit Indizes für EAN, PLU und
+Artikelnummer, Präfixsuche und vorberechneten Preisen der Kassen-Preisliste
+"""
+
+import bisect
+import heapq
+import logging
+import re
+import threading
+from dataclasses import fields, replace
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"\w+")
+_CENT = Decimal('0.01')
+
+class POSCatalog:
+    """
+    Artikelkatalog einer Kasse
+
+    Der Artikelstamm wird einmal geladen (load) und danach nur noch über
+    Deltas aktualisiert (apply_delta, apply_changes). Jeder Artikel liegt
+    mit den Preisen der Kassen-Preisliste vor; Scans sind reine
+    Dictionary-Zugriffe.
+    """
+
+    def __init__(self, preisliste: Optional[Dict[str, Decimal]] = None):
+        # Bruttopreise der Preisliste dieser Kasse, Artikelnummer -> Preis
+        self.preisliste: Dict[str, Decimal] = dict(preisliste or {})
+        self.version = 0
+        # Artikel ohne und mit Preisen der Preisliste
+        self._basis: Dict[str, Any] = {}
+        self._artikel: Dict[str, Any] = {}
+        self._ean: Dict[str, str] = {}
+        self._plu: Dict[str, str] = {}
+        self._kategorien: Dict[str, set] = {}
+        # Sortierte (Wort, Artikelnummer)-Paare für die Präfixsuche
+        self._woerter: List[Tuple[str, str]] = []
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._artikel)
+
+    def load(self, products: Iterable[Any], version: int = 0):
+        """Katalog vollständig (neu) laden"""
+        with self._lock:
+            self._basis.clear()
+            self._artikel.clear()
+            self._ean.clear()
+            self._plu.clear()
+            self._kategorien.clear()
+            woerter = []
+            for product in products:
+                if product.aktiv:
+                    self._index(product)
+                    woerter.extend((wort, product.artikel_nr) for wort in self._words(product))
+            woerter.sort()
+            self._woerter = woerter
+            self.version = version
+        logger.info(f"Kassenkatalog mit {len(self._artikel)} Artikeln geladen (Version {version})")
+
+    def apply_delta(self, geaendert: Iterable[Any] = (), geloescht: Iterable[str] = (),
+                    version: Optional[int] = None) -> int:
+        """
+        Geänderte Artikel übernehmen und gelöschte entfernen
+
+        Returns:
+            Anzahl geänderter Einträge
+        """
+        anzahl = 0
+        alt, neu = [], []
+        with self._lock:
+            for artikel_nr in geloescht:
+                product = self._remove(artikel_nr)
+                if product is not None:
+                    alt.extend((wort, artikel_nr) for wort in self._words(product))
+                    anzahl += 1
+            for product in geaendert:
+                vorher = self._remove(product.artikel_nr)
+                if vorher is not None:
+                    alt.extend((wort, product.artikel_nr) for wort in self._words(vorher))
+                if product.aktiv:
+                    self._index(product)
+                    neu.extend((wort, product.artikel_nr) for wort in self._words(product))
+                anzahl += 1
+            self._update_words(alt, neu)
+            if version is not None:
+                self.version = version
+        return anzahl
+
+    def _update_words(self, alt: List[Tuple[str, str]], neu: List[Tuple[str, str]]):
+        if len(alt) + len(neu) <= 256:
+            for eintrag in alt:
+                index = bisect.bisect_left(self._woerter, eintrag)
+                if index < len(self._woerter) and self._woerter[index] == eintrag:
+                    del self._woerter[index]
+            for eintrag in neu:
+                bisect.insort(self._woerter, eintrag)
+        else:
+            # Große Deltas: einmal neu sortieren statt vieler Einfügungen in die Liste
+            entfernen = set(alt)
+            self._woerter = sorted([e for e in self._woerter if e not in entfernen] + neu)
+
+    def apply_changes(self, changes: Dict[Tuple[str, str], Optional[Dict[str, Any]]]) -> int:
+        """
+        Änderungen aus dem Änderungs-Feed der Delta-Synchronisation übernehmen
+
+        Args:
+            changes: (entity_type, entity_id) -> neuer Stand oder None (gelöscht),
+                wie von DeltaTracker.pull geliefert; berücksichtigt wird "article"
+        """
+        from .pos_system import POSProduct
+
+        decimal_fields = {f.name for f in fields(POSProduct) if f.type is Decimal}
+        known = {f.name for f in fields(POSProduct)}
+        geaendert, geloescht = [], []
+        for (entity_type, entity_id), data in changes.items():
+            if entity_type != "article":
+                continue
+            if data is None:
+                geloescht.append(entity_id)
+                continue
+            werte = {k: Decimal(str(v)) if k in decimal_fields else v for k, v in data.items() if k in known}
+            werte.setdefault("artikel_nr", entity_id)
+            geaendert.append(POSProduct(**werte))
+        return self.apply_delta(geaendert, geloescht)
+
+    def set_price_list(self, preisliste: Dict[str, Decimal]):
+        """Preisliste der Kasse wechseln und Preise neu berechnen"""
+        with self._lock:
+            self.preisliste = dict(preisliste)
+            for artikel_nr, product in self._basis.items():
+                self._artikel[artikel_nr] = self._resolve_price(product)
+
+    def _resolve_price(self, product):
+        brutto = self.preisliste.get(product.artikel_nr)
+        if brutto is None:
+            return product
+        netto = (brutto / (1 + product.mwst_satz / 100)).quantize(_CENT, ROUND_HALF_UP)
+        return replace(product, verkaufspreis_brutto=brutto, verkaufspreis_netto=netto)
+
+    @staticmethod
+    def _words(product) -> set:
+        text = f"{product.artikel_nr} {product.bezeichnung} {product.kurztext or ''}"
+        return {wort.lower() for wort in _TOKEN.findall(text)}
+
+    def _index(self, product):
+        self._basis[product.artikel_nr] = product
+        self._artikel[product.artikel_nr] = self._resolve_price(product)
+        if product.ean_code:
+            self._ean[product.ean_code] = product.artikel_nr
+        if product.plu:
+            self._plu[product.plu] = product.artikel_nr
+        self._kategorien.setdefault(product.kategorie, set()).add(product.artikel_nr)
+
+    def _remove(self, artikel_nr: str):
+        product = self._basis.pop(artikel_nr, None)
+        if product is None:
+            return None
+        del self._artikel[artikel_nr]
+        if product.ean_code and self._ean.get(product.ean_code) == artikel_nr:
+            del self._ean[product.ean_code]
+        if product.plu and self._plu.get(product.plu) == artikel_nr:
+            del self._plu[product.plu]
+        self._kategorien.get(product.kategorie, set()).discard(artikel_nr)
+        return product
+
+    def by_artikel_nr(self, artikel_nr: str):
+        """Artikel über die Artikelnummer"""
+        return self._artikel.get(artikel_nr)
+
+    def by_ean(self, ean: str):
+        """Artikel über den EAN-Code"""
+        artikel_nr = self._ean.get(ean)
+        return self._artikel.get(artikel_nr) if artikel_nr else None
+
+    def by_plu(self, plu: str):
+        """Artikel über die PLU (Kurznummer für Waagen und Obst/Gemüse)"""
+        artikel_nr = self._plu.get(plu)
+        return self._artikel.get(artikel_nr) if artikel_nr else None
+
+    def lookup(self, code: str):
+        """Gescannten oder eingegebenen Code auflösen: EAN, PLU, dann Artikelnummer"""
+        return self.by_ean(code) or self.by_plu(code) or self._artikel.get(code)
+
+    def search(self, term: str, kategorie: Optional[str] = None, limit: int = 50) -> List[Any]:
+        """
+        Präfixsuche für die Touch-Oberfläche
+
+        Jedes Suchwort muss Anfang eines Worts aus Artikelnummer, Bezeichnung
+        oder Kurztext sein, z.B. "bio ap" findet "Bio-Apfel".
+        """
+        begriffe = [wort.lower() for wort in _TOKEN.findall(term)]
+        if not begriffe:
+            return self.products(kategorie)[:limit]
+
+        with self._lock:
+            # Längster (meist seltenster) Begriff zuerst, danach nur noch Schnittmengen
+            treffer = None
+            for begriff in sorted(begriffe, key=len, reverse=True):
+                artikel = self._prefix_matches(begriff)
+                treffer = artikel if treffer is None else treffer & artikel
+                if not treffer:
+                    return []
+            if kategorie:
+                treffer &= self._kategorien.get(kategorie, set())
+            ergebnis = [self._artikel[artikel_nr] for artikel_nr in treffer]
+        return heapq.nsmallest(limit, ergebnis, key=lambda p: (p.bezeichnung, p.artikel_nr))
+
+    def _prefix_matches(self, begriff: str) -> set:
+        treffer = set()
+        index = bisect.bisect_left(self._woerter, (begriff,))
+        while index < len(self._woerter):
+            wort, artikel_nr = self._woerter[index]
+            if not wort.startswith(begriff):
+                break
+            treffer.add(artikel_nr)
+            index += 1
+        return treffer
+
+    def products(self, kategorie: Optional[str] = None) -> List[Any]:
+        """Alle aktiven Artikel, optional einer Kategorie"""
+        with self._lock:
+            if kategorie is None:
+                return list(self._artikel.values())
+            return [self._artikel[a] for a in self._kategorien.get(kategorie, ())]
@@ -0,0 +1,320 @@
+"""
+VALEO NeuroERP - Lokales Verkaufsjournal der Kasse
+Verkäufe werden lokal festgeschrieben; TSE-Signatur, Lagerbuchung und
+FIBU-Buchung arbeitet ein Hintergrund-Worker gebündelt ab
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Nachgelagerte Schritte je Verkauf, in dieser Reihenfolge abgearbeitet
+JOURNAL_STEPS = ("tse", "lager", "fibu")
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Nicht serialisierbar: {type(value).__name__}")
+
+def sale_to_dict(sale) -> Dict[str, Any]:
+    """POSSale als JSON-fähiges Dictionary"""
+    return json.loads(json.dumps(asdict(sale), default=_json_default))
+
+def sale_from_dict(data: Dict[str, Any]):
+    """POSSale aus dem Journal wiederherstellen"""
+    from .pos_system import PaymentMethod, POSCartItem, POSSale, SaleStatus
+
+    decimal_fields = ("menge", "einzelpreis_netto", "einzelpreis_brutto", "gesamtpreis_netto",
+                      "gesamtpreis_brutto", "mwst_satz", "mwst_betrag")
+    artikel = [
+        POSCartItem(**{k: Decimal(v) if k in decimal_fields else v for k, v in item.items()})
+        for item in data["artikel_liste"]
+    ]
+    werte = dict(data, artikel_liste=artikel)
+    for feld in ("gesamt_netto", "gesamt_brutto", "mwst_gesamt", "rabatt_prozent", "rabatt_betrag"):
+        werte[feld] = Decimal(werte[feld])
+    werte["verkaufsdatum"] = datetime.fromisoformat(werte["verkaufsdatum"])
+    werte["zahlungsart"] = PaymentMethod(werte["zahlungsart"])
+    werte["status"] = SaleStatus(werte["status"])
+    return POSSale(**werte)
+
+class POSJournal:
+    """
+    Verkaufsjournal der Kasse in SQLite (WAL)
+
+    Ein Verkauf ist mit einer einzigen Transaktion festgeschrieben. Für jeden
+    nachgelagerten Schritt (JOURNAL_STEPS) entsteht ein offener Eintrag, den
+    der POSJournalWorker abarbeitet; fehlgeschlagene Schritte werden mit
+    Wartezeit erneut versucht, ohne den Kassiervorgang zu blockieren.
+    """
+
+    def __init__(self, db_path: str, kasse_id: str = "01"):
+        self.db_path = db_path
+        self.kasse_id = kasse_id
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._init_tables()
+
+    def _init_tables(self):
+        """Tabellen für Verkäufe und offene Schritte anlegen"""
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pos_journal (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                beleg_nr TEXT NOT NULL UNIQUE,
+                kasse_id TEXT NOT NULL,
+                verkaufsdatum TEXT NOT NULL,
+                daten TEXT NOT NULL,
+                tse_signatur TEXT,
+                tse_serien_nr TEXT,
+                tse_signatur_counter INTEGER,
+                erfasst_am REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pos_journal_schritte (
+                seq INTEGER NOT NULL,
+                schritt TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'offen',
+                versuche INTEGER NOT NULL DEFAULT 0,
+                naechster_versuch REAL NOT NULL DEFAULT 0,
+                letzter_fehler TEXT,
+                PRIMARY KEY (schritt, seq)
+            );
+            CREATE INDEX IF NOT EXISTS ix_pos_journal_schritte_offen
+                ON pos_journal_schritte (schritt, status, seq);
+        """)
+
+    def append(self, sale) -> bool:
+        """
+        Verkauf festschreiben
+
+        Args:
+            sale: Abgeschlossener POSSale
+
+        Returns:
+            False, wenn der Beleg bereits im Journal steht
+        """
+        daten = json.dumps(sale_to_dict(sale), ensure_ascii=False)
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                cursor.execute(
+                    "INSERT OR IGNORE INTO pos_journal (beleg_nr, kasse_id, verkaufsdatum, daten, erfasst_am) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (sale.beleg_nr, self.kasse_id, sale.verkaufsdatum.isoformat(), daten, time.time())
+                )
+                neu = cursor.rowcount == 1
+                if neu:
+                    seq = cursor.lastrowid
+                    cursor.executemany("INSERT INTO pos_journal_schritte (seq, schritt) VALUES (?, ?)",
+                                       [(seq, schritt) for schritt in JOURNAL_STEPS])
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+        return neu
+
+    def pending(self, schritt: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Fällige offene Einträge eines Schritts in Erfassungsreihenfolge"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT j.seq, j.beleg_nr, j.daten FROM pos_journal_schritte s JOIN pos_journal j ON j.seq = s.seq "
+                "WHERE s.schritt = ? AND s.status = 'offen' AND s.naechster_versuch <= ? ORDER BY s.seq LIMIT ?",
+                (schritt, time.time(), limit)
+            ).fetchall()
+        return [{"seq": seq, "beleg_nr": beleg_nr, "daten": json.loads(daten)} for seq, beleg_nr, daten in rows]
+
+    def complete(self, schritt: str, seqs: List[int], status: str = "erledigt",
+                 signaturen: Optional[Dict[int, Dict[str, Any]]] = None):
+        """Einträge als erledigt markieren, bei der TSE zusammen mit den Signaturen"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                if signaturen:
+                    cursor.executemany(
+                        "UPDATE pos_journal SET tse_signatur = ?, tse_serien_nr = ?, tse_signatur_counter = ? "
+                        "WHERE seq = ?",
+                        [(s.get("signature"), s.get("serial_number"), s.get("signature_counter"), seq)
+                         for seq, s in signaturen.items()]
+                    )
+                cursor.executemany("UPDATE pos_journal_schritte SET status = ? WHERE schritt = ? AND seq = ?",
+                                   [(status, schritt, seq) for seq in seqs])
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def fail(self, schritt: str, seqs: List[int], fehler: str, retry_in: float):
+        """Fehlgeschlagene Einträge später erneut versuchen"""
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE pos_journal_schritte SET versuche = versuche + 1, naechster_versuch = ?, letzter_fehler = ? "
+                "WHERE schritt = ? AND seq = ?",
+                [(time.time() + retry_in, fehler, schritt, seq) for seq in seqs]
+            )
+
+    def get_sale(self, beleg_nr: str) -> Optional[Dict[str, Any]]:
+        """Verkauf mit (ggf. nachträglich ergänzter) TSE-Signatur"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT daten, tse_signatur, tse_serien_nr, tse_signatur_counter FROM pos_journal WHERE beleg_nr = ?",
+                (beleg_nr,)
+            ).fetchone()
+        if row is None:
+            return None
+        daten = json.loads(row[0])
+        daten.update(tse_signatur=row[1], tse_serien_nr=row[2], tse_signatur_counter=row[3])
+        return daten
+
+    def backlog(self) -> Dict[str, int]:
+        """Anzahl offener Einträge je Schritt"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT schritt, COUNT(*) FROM pos_journal_schritte WHERE status = 'offen' GROUP BY schritt"
+            ).fetchall()
+        return {schritt: dict(rows).get(schritt, 0) for schritt in JOURNAL_STEPS}
+
+    def close(self):
+        """Verbindung schließen"""
+        self._conn.close()
+
+class POSJournalWorker:
+    """
+    Arbeitet die offenen Schritte des Journals gebündelt im Hintergrund ab
+
+    - tse: Signatur je Verkauf in Erfassungsreihenfolge (sign_transaction)
+    - lager: Bestandsabgänge je Artikel über den Stapel summiert
+    - fibu: Buchungssätze des Stapels in einem Aufruf
+    """
+
+    def __init__(self, journal: POSJournal,
+                 book_inventory: Callable[[Dict[str, Decimal]], None],
+                 book_fibu: Callable[[List[Any]], None],
+                 tse: Optional[Any] = None,
+                 batch_size: int = 100,
+                 interval: float = 0.5,
+                 retry_backoff: float = 5.0):
+        self.journal = journal
+        self.book_inventory = book_inventory
+        self.book_fibu = book_fibu
+        self.tse = tse
+        self.batch_size = batch_size
+        self.interval = interval
+        self.retry_backoff = retry_backoff
+        self._task: Optional[asyncio.Task] = None
+        self._stop = asyncio.Event()
+
+    def _sign(self, eintraege: List[Dict[str, Any]]) -> int:
+        """
+        Belege einzeln signieren und jede Signatur sofort festschreiben
+
+        Die TSE zählt jede Signatur; eine verworfene Signatur würde bei der
+        Wiederholung erneut vergeben und die Zählerfolge brechen. Schlägt die
+        TSE bei einem Beleg fehl, werden nur dieser und die folgenden Belege
+        später erneut versucht.
+
+        Returns:
+            Anzahl signierter Belege
+        """
+        for index, eintrag in enumerate(eintraege):
+            daten = eintrag["daten"]
+            try:
+                result = self.tse.sign_transaction(transaction_data={
+                    'receipt_number': eintrag["beleg_nr"],
+                    'total_amount': float(daten["gesamt_brutto"]),
+                    'timestamp': daten["verkaufsdatum"]
+                })
+                if result.get('status', 'success') != 'success':
+                    raise RuntimeError(result.get('error', 'TSE-Signatur fehlgeschlagen'))
+            except Exception as e:
+                offen = [rest["seq"] for rest in eintraege[index:]]
+                logger.warning(f"TSE-Signatur für {len(offen)} Belege fehlgeschlagen: {e}")
+                self.journal.fail("tse", offen, str(e), self.retry_backoff)
+                return index
+            self.journal.complete("tse", [eintrag["seq"]], signaturen={eintrag["seq"]: result})
+        return len(eintraege)
+
+    @staticmethod
+    def _decrements(eintraege: List[Dict[str, Any]]) -> Dict[str, Decimal]:
+        abgaenge: Dict[str, Decimal] = {}
+        for eintrag in eintraege:
+            for item in eintrag["daten"]["artikel_liste"]:
+                abgaenge[item["artikel_nr"]] = abgaenge.get(item["artikel_nr"], Decimal('0')) + Decimal(item["menge"])
+        return abgaenge
+
+    async def _drain_step(self, schritt: str) -> int:
+        eintraege = self.journal.pending(schritt, self.batch_size)
+        if not eintraege:
+            return 0
+        seqs = [e["seq"] for e in eintraege]
+        try:
+            if schritt == "tse":
+                if self.tse is None:
+                    self.journal.complete(schritt, seqs, status="ohne_tse")
+                    return len(seqs)
+                return await asyncio.to_thread(self._sign, eintraege)
+            elif schritt == "lager":
+                await asyncio.to_thread(self.book_inventory, self._decrements(eintraege))
+                self.journal.complete(schritt, seqs)
+            else:
+                sales = [sale_from_dict(e["daten"]) for e in eintraege]
+                await asyncio.to_thread(self.book_fibu, sales)
+                self.journal.complete(schritt, seqs)
+        except Exception as e:
+            # z.B. zentrale Datenbank nicht erreichbar: die Kasse verkauft weiter
+            logger.warning(f"Journal-Schritt {schritt} für {len(seqs)} Belege fehlgeschlagen: {e}")
+            self.journal.fail(schritt, seqs, str(e), self.retry_backoff)
+            return 0
+        return len(seqs)
+
+    async def drain_once(self) -> Dict[str, int]:
+        """Je Schritt einen Stapel abarbeiten"""
+        return {schritt: await self._drain_step(schritt) for schritt in JOURNAL_STEPS}
+
+    async def drain(self) -> Dict[str, int]:
+        """Alle fälligen Einträge abarbeiten"""
+        gesamt = dict.fromkeys(JOURNAL_STEPS, 0)
+        while True:
+            runde = await self.drain_once()
+            for schritt, anzahl in runde.items():
+                gesamt[schritt] += anzahl
+            if not any(runde.values()):
+                return gesamt
+
+    async def run(self):
+        """Journal fortlaufend abarbeiten, bis stop() aufgerufen wird"""
+        while not self._stop.is_set():
+            await self.drain()
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        """Worker in der laufenden Event-Loop starten"""
+        if self._task is None or self._task.done():
+            self._stop.clear()
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        """Worker anhalten"""
+        self._stop.set()
+        if self._task:
+            await self._task
+            self._task = None
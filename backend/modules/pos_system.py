@@ -12,6 +12,10 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import uuid
 
+from .number_range_service import NumberRangeService
+from .pos_journal import POSJournal, POSJournalWorker
+from .pos_catalog import POSCatalog
+
 # TSE Integration
 try:
     from tse import TSE
@@ -52,6 +56,7 @@ class POSProduct:
     kategorie: Optional[str] = None
     bild_url: Optional[str] = None
     aktiv: bool = True
+    plu: Optional[str] = None
 
 @dataclass
 class POSCartItem:
@@ -111,9 +116,15 @@ class POSDailyReport:
 class POSSystem:
     """Hauptklasse für das Kassensystem"""
     
-    def __init__(self, db_connection, tse_config: Optional[Dict] = None):
+    def __init__(self, db_connection, tse_config: Optional[Dict] = None,
+                 number_ranges: Optional[NumberRangeService] = None, kasse_id: str = "01",
+                 journal: Optional[POSJournal] = None, catalog: Optional[POSCatalog] = None):
         self.db = db_connection
         self.tse = None
+        self.number_ranges = number_ranges
+        self.journal = journal
+        self.catalog = catalog
+        self.kasse_id = kasse_id
         self.current_cart: List[POSCartItem] = []
         self.current_sale: Optional[POSSale] = None
         self.daily_report: Optional[POSDailyReport] = None
@@ -130,8 +141,21 @@ class POSSystem:
             except Exception as e:
                 logger.error(f"TSE Initialisierung fehlgeschlagen: {e}")
     
+    def load_catalog(self, preisliste: Optional[Dict[str, Decimal]] = None) -> POSCatalog:
+        """Artikelstamm einmal in den Kassenkatalog laden; Aktualisierung danach per Delta"""
+        self.catalog = None
+        catalog = POSCatalog(preisliste)
+        catalog.load(self.get_products())
+        self.catalog = catalog
+        return catalog
+    
     def get_products(self, kategorie: Optional[str] = None, search_term: Optional[str] = None) -> List[POSProduct]:
         """Artikel aus der Datenbank laden"""
+        if self.catalog is not None:
+            if search_term:
+                return self.catalog.search(search_term, kategorie)
+            return self.catalog.products(kategorie)
+        
         try:
             # Hier würde die Integration mit der bestehenden Artikel-Datenbank erfolgen
             # Beispiel-Implementierung basierend auf artikel_stammdaten_model.json
@@ -208,9 +232,12 @@ class POSSystem:
     def add_to_cart(self, artikel_nr: str, menge: Decimal) -> bool:
         """Artikel zum Warenkorb hinzufügen"""
         try:
-            # Artikel aus der Datenbank laden
-            products = self.get_products()
-            product = next((p for p in products if p.artikel_nr == artikel_nr), None)
+            # Artikel aus dem Kassenkatalog (auch per EAN oder PLU) oder der Datenbank laden
+            if self.catalog is not None:
+                product = self.catalog.lookup(artikel_nr)
+            else:
+                products = self.get_products()
+                product = next((p for p in products if p.artikel_nr == artikel_nr), None)
             
             if not product:
                 logger.error(f"Artikel {artikel_nr} nicht gefunden")
@@ -242,7 +269,7 @@ class POSSystem:
             )
             
             # Prüfe ob Artikel bereits im Warenkorb
-            existing_item = next((item for item in self.current_cart if item.artikel_nr == artikel_nr), None)
+            existing_item = next((item for item in self.current_cart if item.artikel_nr == product.artikel_nr), None)
             if existing_item:
                 existing_item.menge += menge
                 existing_item.gesamtpreis_netto = existing_item.einzelpreis_netto * existing_item.menge
@@ -322,12 +349,12 @@ class POSSystem:
             # Belegnummer generieren
             beleg_nr = self._generate_receipt_number()
             
-            # TSE-Signatur erstellen falls verfügbar
+            # TSE-Signatur erstellen falls verfügbar (mit Journal nachgelagert im POSJournalWorker)
             tse_signatur = None
             tse_serien_nr = None
             tse_signatur_counter = None
             
-            if self.tse:
+            if self.tse and not self.journal:
                 try:
                     tse_data = self.tse.sign_transaction(
                         transaction_data={
@@ -359,6 +386,10 @@ class POSSystem:
                 tse_signatur_counter=tse_signatur_counter
             )
             
+            # Lokal festschreiben, bevor der Warenkorb geleert wird
+            if self.journal:
+                self.journal.append(sale)
+            
             self.current_sale = sale
             
             # Kassenschublade öffnen bei Barzahlung
@@ -376,7 +407,9 @@ class POSSystem:
             return None
     
     def _generate_receipt_number(self) -> str:
-        """Belegnummer generieren"""
+        """Belegnummer generieren (fortlaufend je Kasse und Jahr, falls Nummernkreise konfiguriert)"""
+        if self.number_ranges:
+            return self.number_ranges.next_number("kassenbeleg", filiale=self.kasse_id)
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
         random_part = str(uuid.uuid4())[:8]
         return f"BELEG-{timestamp}-{random_part}"
@@ -397,6 +430,15 @@ class POSSystem:
     
     def save_sale_to_database(self, sale: POSSale) -> bool:
         """Verkaufstransaktion in der Datenbank speichern"""
+        if self.journal:
+            # Lager- und FIBU-Buchung übernimmt der POSJournalWorker gebündelt
+            try:
+                self.journal.append(sale)
+                return True
+            except Exception as e:
+                logger.error(f"Fehler beim Speichern im Verkaufsjournal: {e}")
+                return False
+        
         try:
             # Hier würde die Integration mit der bestehenden Datenbank erfolgen
             # Beispiel für die Speicherung in verschiedenen Tabellen
@@ -452,14 +494,31 @@ class POSSystem:
             return False
     
     def _update_inventory(self, artikel_nr: str, menge: Decimal):
-        """Lagerbestand aktualisieren"""
-        try:
-            # Hier würde die Aktualisierung des Lagerbestands erfolgen
-            logger.info(f"Lagerbestand für Artikel {artikel_nr} um {menge} reduziert")
-        except Exception as e:
-            logger.error(f"Fehler beim Aktualisieren des Lagerbestands: {e}")
+        """Lagerbestand aktualisieren; Fehler werden an den Aufrufer weitergegeben"""
+        # Hier würde die Aktualisierung des Lagerbestands erfolgen
+        logger.info(f"Lagerbestand für Artikel {artikel_nr} um {menge} reduziert")
     
-    def _prepare_fibu_integration(self, sale: POSSale):
+    def create_journal_worker(self, **kwargs) -> POSJournalWorker:
+        """Hintergrund-Worker für das Verkaufsjournal (TSE, Lager, FIBU) erstellen"""
+        if not self.journal:
+            raise ValueError("Kein Verkaufsjournal konfiguriert")
+        kwargs.setdefault('tse', self.tse)
+        return POSJournalWorker(self.journal, self._update_inventory_batch, self._book_fibu_batch, **kwargs)
+    
+    def _update_inventory_batch(self, abgaenge: Dict[str, Decimal]):
+        """Bestandsabgänge eines Journal-Stapels buchen (je Artikel summiert)"""
+        # Hier würde ein UPDATE je Artikel per executemany in einer Transaktion erfolgen;
+        # Fehler (z.B. Datenbank nicht erreichbar) lösen eine Wiederholung des Stapels aus
+        for artikel_nr, menge in abgaenge.items():
+            self._update_inventory(artikel_nr, menge)
+    
+    def _book_fibu_batch(self, sales: List[POSSale]):
+        """Buchungssätze eines Journal-Stapels an die FIBU übergeben"""
+        buchungen = [self._prepare_fibu_integration(sale) for sale in sales]
+        # Hier würde die Speicherung aller Buchungssätze in einer Transaktion erfolgen
+        logger.info(f"{len(buchungen)} FIBU-Buchungen übergeben")
+    
+    def _prepare_fibu_integration(self, sale: POSSale) -> Optional[Dict[str, Any]]:
         """FIBU-Integration vorbereiten"""
         try:
             # Hier würde die Vorbereitung für die FIBU-Integration erfolgen
@@ -492,9 +551,11 @@ class POSSystem:
             
             # Hier würde die Speicherung in der FIBU-Tabelle erfolgen
             logger.info(f"FIBU-Integration für {sale.beleg_nr} vorbereitet")
+            return fibu_data
             
         except Exception as e:
             logger.error(f"Fehler bei der FIBU-Integration: {e}")
+            return None
     
     def create_daily_report(self, kasse_id: str, kassierer_id: str) -> Optional[POSDailyReport]:
         """Tagesjournal erstellen"""
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""
+Lastvergleich: synchrone Session vs. AsyncSession in ``async def``-Handlern.
+
+Simuliert die v1-ERP-Endpunkte mit N gleichzeitigen Clients (Standard 200) und
+misst Requests/s sowie p50/p99-Latenz. Der synchrone Pfad entspricht dem alten
+Verhalten (blockierender ``Session``-Aufruf im Event-Loop), der asynchrone Pfad
+nutzt ``backend.app.db.async_session``.
+
+Aussagekräftig ist der Vergleich gegen PostgreSQL (asyncpg), wo die Handler
+tatsächlich auf Netzwerk-I/O warten; mit der SQLite-Standarddatenbank zeigt der
+Lauf vor allem, wie stark blockierende Aufrufe die p99-Latenz anderer Requests
+erhöhen.
+
+Beispiel:
+    python backend/scripts/benchmark_async_db.py --clients 200 --requests 20
+    python backend/scripts/benchmark_async_db.py --database-url postgresql://user:pw@localhost/erp
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import Column, Float, Integer, String, create_engine, func, select
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from backend.app.db.async_session import get_async_engine, get_async_sessionmaker
+
+Base = declarative_base()
+
+
+class BenchArtikel(Base):
+    __tablename__ = "bench_artikel"
+    id = Column(Integer, primary_key=True)
+    artikel_gruppe = Column(String(20), index=True)
+    preis = Column(Float)
+
+
+def _seed(database_url: str, rows: int) -> None:
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            BenchArtikel.__table__.insert(),
+            [{"artikel_gruppe": f"G{i % 50}", "preis": float(i % 997)} for i in range(rows)],
+        )
+    engine.dispose()
+
+
+def _query(gruppe: str):
+    return select(func.count(BenchArtikel.id), func.avg(BenchArtikel.preis)).where(
+        BenchArtikel.artikel_gruppe == gruppe
+    )
+
+
+def _summary(label: str, latencies: List[float], duration: float) -> Dict[str, float]:
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    result = {
+        "requests_per_second": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": p99 * 1000,
+    }
+    print(
+        f"{label:<6} {result['requests_per_second']:>10.1f} req/s   "
+        f"p50 {result['p50_ms']:>8.1f} ms   p99 {result['p99_ms']:>8.1f} ms"
+    )
+    return result
+
+
+async def run_sync(database_url: str, clients: int, requests: int) -> Dict[str, float]:
+    """Alter Pfad: blockierende Session innerhalb von ``async def``."""
+    engine = create_engine(database_url, pool_size=clients, max_overflow=0)
+    session_factory = sessionmaker(bind=engine)
+    latencies: List[float] = []
+
+    async def handler(i: int) -> None:
+        start = time.perf_counter()
+        await asyncio.sleep(0)  # Request-I/O: andere Handler kommen an die Reihe
+        with session_factory() as db:
+            db.execute(_query(f"G{i % 50}")).one()
+        latencies.append(time.perf_counter() - start)
+
+    async def client(c: int) -> None:
+        for r in range(requests):
+            await handler(c * requests + r)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(clients)))
+    duration = time.perf_counter() - start
+    engine.dispose()
+    return _summary("sync", latencies, duration)
+
+
+async def run_async(database_url: str, clients: int, requests: int) -> Dict[str, float]:
+    """Neuer Pfad: AsyncSession aus ``get_async_sessionmaker``."""
+    session_factory = get_async_sessionmaker(get_async_engine(database_url))
+    latencies: List[float] = []
+
+    async def handler(i: int) -> None:
+        start = time.perf_counter()
+        await asyncio.sleep(0)
+        async with session_factory() as db:
+            (await db.execute(_query(f"G{i % 50}"))).one()
+        latencies.append(time.perf_counter() - start)
+
+    async def client(c: int) -> None:
+        for r in range(requests):
+            await handler(c * requests + r)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(clients)))
+    duration = time.perf_counter() - start
+    await get_async_engine(database_url).dispose()
+    return _summary("async", latencies, duration)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=None, help="Standard: temporäre SQLite-Datei")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20, help="Requests pro Client")
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+    _seed(database_url, args.rows)
+    print(f"{args.clients} Clients x {args.requests} Requests, {args.rows} Zeilen")
+    asyncio.run(run_sync(database_url, args.clients, args.requests))
+    asyncio.run(run_async(database_url, args.clients, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+"""
+Benchmark für den Bankabgleich (Umsätze/s, Trefferquoten und Peak-RSS).
+
+Erzeugt einen synthetischen MT940-Kontoauszug und einen CSV-Export der
+gebuchten Zahlungen gleicher Größe: überwiegend Zahlungen mit
+Rechnungsnummer, dazu Zahlungen ohne Referenz, mit Tippfehlern im
+Verwendungszweck, Teilzahlungen, doppelt importierte Umsätze sowie fehlende
+Umsätze und Buchungen. Gemessen werden Einlesen und Abgleich getrennt.
+
+Beispiel:
+    python backend/scripts/benchmark_bank_reconciliation.py --lines 1000000
+"""
+
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.services.bank_reconciliation import BankReconciler, load_bookings, load_statement
+
+ACCOUNT = "DE89370400440532013000"
+NAMES = ["Landhandel Meyer GmbH", "Agrar Schulte KG", "Hof Brinkmann", "Raiffeisen Nord eG", "Lohnunternehmen Kruse"]
+
+
+def _word(number: int) -> str:
+    """Ziffernfreies Kennwort, z.B. ein Kundenname im Verwendungszweck."""
+    letters = []
+    number = number * 2654435761 % 26 ** 6
+    for _ in range(6):
+        number, rest = divmod(number, 26)
+        letters.append(chr(ord("a") + rest))
+    return "".join(letters)
+
+
+def _typo(word: str) -> str:
+    """Zwei benachbarte Buchstaben vertauschen."""
+    return word[:2] + word[3] + word[2] + word[4:]
+
+
+def generate_files(workdir: str, lines: int, seed: int):
+    """Schreibt Auszug und Buchungen; gibt die Pfade und die erwarteten Fallzahlen zurück."""
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    statement_path = os.path.join(workdir, "auszug.sta")
+    bookings_path = os.path.join(workdir, "zahlungen.csv")
+    expected = {"reference": 0, "amount_date": 0, "fuzzy": 0, "partial": 0, "duplicate": 0,
+                "missing_in_books": 0, "missing_in_statement": 0}
+
+    with open(statement_path, "w", encoding="latin-1") as sta, open(bookings_path, "w", encoding="utf-8") as csv:
+        sta.write(f":20:BENCH\n:25:{ACCOUNT}\n:28C:1/1\n:60F:C240101EUR0,00\n")
+        csv.write("booking_id,account,date,amount,reference,text\n")
+        buffer_sta, buffer_csv = [], []
+        for i in range(lines):
+            day = start + timedelta(days=rng.randrange(360))
+            value_day = day + timedelta(days=rng.randrange(3))
+            cents = rng.randrange(1000, 2_000_000)
+            invoice = f"RE-2024-{i:07d}"
+            name = NAMES[i % len(NAMES)]
+            kind = rng.random()
+            text, paid, write_line, write_booking = f"{invoice} {name}", cents, True, True
+            if kind < 0.85:
+                expected["reference"] += 1
+            elif kind < 0.89:
+                # Ohne Referenz, eindeutig über Betrag und Datum
+                cents = 2_000_000 + i
+                paid, text = cents, f"Zahlung {name}"
+                expected["amount_date"] += 1
+            elif kind < 0.92:
+                # Ohne Referenz, Betrag mehrdeutig, Verwendungszweck mit Tippfehler
+                cents = paid = 1990 + i % 20
+                text = f"Lieferung {_word(i)} {name}"
+                expected["fuzzy"] += 1
+            elif kind < 0.95:
+                paid = cents // 2
+                expected["partial"] += 1
+            elif kind < 0.97:
+                write_booking = False
+                expected["missing_in_books"] += 1
+            else:
+                write_line = False
+                expected["missing_in_statement"] += 1
+
+            if write_booking:
+                reference = invoice if kind < 0.85 or kind >= 0.92 else ""
+                booking_text = text if kind < 0.89 or kind >= 0.92 else f"Lieferung {_typo(_word(i))} {name}"
+                buffer_csv.append(f"B{i},{ACCOUNT},{day.isoformat()},{cents / 100:.2f},{reference},{booking_text}\n")
+            if write_line:
+                record = (f":61:{value_day:%y%m%d}{value_day:%m%d}C{paid // 100},{paid % 100:02d}NTRFNONREF//{i}\n"
+                          f":86:166?00SEPA-GUTSCHRIFT?20SVWZ+{text[:27]}?21{text[27:54]}?32{name[:27]}\n")
+                buffer_sta.append(record)
+                if rng.random() < 0.01:
+                    buffer_sta.append(record)
+                    expected["duplicate"] += 1
+            if len(buffer_sta) >= 10000:
+                sta.write("".join(buffer_sta))
+                csv.write("".join(buffer_csv))
+                buffer_sta, buffer_csv = [], []
+        sta.write("".join(buffer_sta))
+        sta.write(":62F:C241231EUR0,00\n-\n")
+        csv.write("".join(buffer_csv))
+    return statement_path, bookings_path, expected
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss ist unter Linux in KiB angegeben
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    statement_path, bookings_path, expected = generate_files(workdir, args.lines, args.seed)
+
+    start = time.perf_counter()
+    lines = list(load_statement(statement_path))
+    bookings = list(load_bookings(bookings_path))
+    load_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = BankReconciler().reconcile(lines, bookings)
+    match_duration = time.perf_counter() - start
+    summary = result.summary(0)
+    # Die Bankreferenz des Umsatzes ist die laufende Nummer der Buchung
+    bank_refs = {line.line_id: line.bank_reference for line in lines}
+    wrong = sum(1 for line_id, booking_id, _ in result.matches if booking_id != f"B{bank_refs[line_id]}")
+
+    print(f"Daten:        {len(lines)} Umsätze, {len(bookings)} Buchungen")
+    print(f"Einlesen:     {load_duration:.1f} s ({len(lines) / load_duration:,.0f} Umsätze/s)")
+    print(f"Abgleich:     {match_duration:.1f} s ({len(lines) / match_duration:,.0f} Umsätze/s)")
+    print(f"Treffer:      {summary['matched_by']} (erwartet: Referenz {expected['reference']}, "
+          f"Betrag/Datum {expected['amount_date']}, unscharf {expected['fuzzy']})")
+    print(f"Falsch:       {wrong} Zuordnungen")
+    print(f"Teilzahlung:  {summary['partial_payments']} (erwartet {expected['partial']})")
+    print(f"Doppelt:      {summary['duplicate_transactions']} (erwartet {expected['duplicate']})")
+    print(f"Fehlend:      {summary['unmatched_transactions']} ohne Buchung (erwartet {expected['missing_in_books']}), "
+          f"{summary['missing_transactions']} ohne Umsatz (erwartet {expected['missing_in_statement']})")
+    print(f"Peak-RSS:     {peak_rss_mb():.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
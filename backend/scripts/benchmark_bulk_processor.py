@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Benchmark für den BulkProcessor unter Dauerlast (Zeilen/s und Speicherobergrenze).
+
+Mehrere Produzenten schreiben Inserts, Updates und Deletes auf überlappende
+Primärschlüssel. Gemessen werden Durchsatz, maximale Puffergröße und Peak-RSS;
+die Puffergröße darf ``--max-pending`` nie überschreiten.
+
+Beispiel:
+    python backend/scripts/benchmark_bulk_processor.py --operations 500000 --max-pending 20000
+    python backend/scripts/benchmark_bulk_processor.py --database-url postgresql+asyncpg://... --copy
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import Column, Float, Integer, String, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from backend.services.bulk_processor import BulkProcessor
+
+Base = declarative_base()
+
+
+class BenchBuchung(Base):
+    __tablename__ = "bench_buchung"
+    id = Column(Integer, primary_key=True)
+    text = Column(String(50))
+    betrag = Column(Float)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss ist unter Linux in KiB angegeben
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def producer(processor: BulkProcessor, start: int, count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    for i in range(start, start + count):
+        await processor.add_insert({"id": i, "text": f"Buchung {i}", "betrag": float(i % 100)})
+        roll = rng.random()
+        if roll < 0.3:
+            await processor.add_update({"id": i - rng.randint(0, 50), "betrag": rng.random() * 100})
+        elif roll < 0.35:
+            await processor.add_delete(i - rng.randint(0, 50))
+
+
+async def run(args) -> None:
+    url = args.database_url or f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bulk.db')}"
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    processor = BulkProcessor(
+        db=None,
+        model=BenchBuchung,
+        batch_size=args.batch_size,
+        flush_interval=1,
+        max_pending=args.max_pending,
+        use_copy=args.copy,
+        session_factory=factory,
+    )
+    max_buffer = 0
+
+    async def sample():
+        nonlocal max_buffer
+        while True:
+            max_buffer = max(max_buffer, len(processor.buffer) + processor.buffer.inflight)
+            await asyncio.sleep(0.01)
+
+    rss_before = peak_rss_mb()
+    sampler = asyncio.create_task(sample())
+    await processor.start()
+    per_producer = args.operations // args.producers
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        producer(processor, 1 + n * per_producer, per_producer, n) for n in range(args.producers)
+    ))
+    await processor.stop()
+    duration = time.perf_counter() - started
+    sampler.cancel()
+
+    async with factory() as session:
+        rows = (await session.execute(select(func.count()).select_from(BenchBuchung))).scalar()
+    await engine.dispose()
+
+    print(f"Datenbank:       {engine.dialect.name}{' (COPY)' if args.copy else ''}")
+    print(f"Inserts:         {per_producer * args.producers} von {args.producers} Produzenten, {rows} Zeilen in der Tabelle")
+    print(f"Durchsatz:       {per_producer * args.producers / duration:,.0f} Inserts/s ({duration:.1f} s)")
+    print(f"Max. Puffer:     {max_buffer} Operationen (Limit {args.max_pending})")
+    print(f"Peak-RSS:        {peak_rss_mb():.1f} MB (vorher {rss_before:.1f} MB)")
+    print(f"Fehlgeschlagen:  {processor.failed_operations}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--operations", type=int, default=200_000)
+    parser.add_argument("--producers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--max-pending", type=int, default=20_000)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--copy", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
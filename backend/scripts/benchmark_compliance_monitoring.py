@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+Benchmark für das ereignisgesteuerte Compliance-Monitoring (Speicher und CPU).
+
+Startet das Monitoring für viele Chargen gleichzeitig, konfiguriert
+verzögerte Benachrichtigung und Eskalation (Timer im gemeinsamen TimerWheel)
+und speist zufällige Messungen ein. Gemessen werden Messungen/s, Peak-RSS und
+die CPU-Zeit in einer Leerlaufphase. Zum Vergleich werden die früheren Modelle
+(ein Task pro Charge alle 30 s, ein Task pro Parameter jede Sekunde) im selben
+Umfang nachgestellt.
+
+Beispiel:
+    python backend/scripts/benchmark_compliance_monitoring.py --batches 10000 --measurements 200000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.components.compliance_engine.models import AlertSettings, MonitoringParameter
+from backend.components.compliance_engine.monitoring import ComplianceMonitoring
+
+PARAMETERS = {
+    "temperatur": MonitoringParameter(min=2, max=8, unit="°C", description="Kühlkette"),
+    "feuchte": MonitoringParameter(min=40, max=70, unit="%", description="Luftfeuchte"),
+    "druck": MonitoringParameter(min=0.9, max=1.1, unit="bar", description="Druck"),
+}
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss ist unter Linux in KiB angegeben
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def idle_cpu_seconds(seconds: float) -> float:
+    start = time.process_time()
+    await asyncio.sleep(seconds)
+    return time.process_time() - start
+
+
+async def run_event_driven(args) -> None:
+    monitoring = ComplianceMonitoring()
+    settings = AlertSettings(notification_threshold={}, notification_delay=60, escalation_timeout=30)
+    rss_before = peak_rss_mb()
+
+    start = time.perf_counter()
+    for i in range(args.batches):
+        batch_id = f"CH-{i:06d}"
+        await monitoring.start_monitoring(batch_id, PARAMETERS)
+        await monitoring.configure_alerts(batch_id, settings)
+    setup = time.perf_counter() - start
+    rss_setup = peak_rss_mb()
+
+    rng = random.Random(42)
+    names = list(PARAMETERS)
+    start = time.perf_counter()
+    for _ in range(args.measurements):
+        name = rng.choice(names)
+        config = PARAMETERS[name]
+        value = rng.uniform(config.min, config.max)
+        if rng.random() < args.alert_rate:
+            value = config.max * 1.5
+        await monitoring.add_measurement(f"CH-{rng.randrange(args.batches):06d}", name, value)
+    feed = time.perf_counter() - start
+
+    idle_cpu = await idle_cpu_seconds(args.idle_seconds)
+    alerts = sum(len(alerts) for alerts in monitoring.active_alerts.values())
+
+    print(f"Ereignisgesteuert: {args.batches} Chargen in {setup:.2f} s gestartet, "
+          f"{len(asyncio.all_tasks()) - 1} Hintergrund-Task(s), {len(monitoring.timer_wheel)} Timer")
+    print(f"  Messungen:  {args.measurements / feed:,.0f}/s ({alerts} aktive Alerts)")
+    print(f"  Leerlauf:   {idle_cpu * 1000:.1f} ms CPU in {args.idle_seconds:.0f} s")
+    print(f"  Peak-RSS:   {peak_rss_mb():.1f} MB (vorher {rss_before:.1f} MB, "
+          f"nach dem Start {rss_setup:.1f} MB; Rest sind die letzten Messungen je Charge)")
+    await monitoring.timer_wheel.stop()
+
+
+async def run_polling(args, interval: float, label: str) -> None:
+    """
+    Früheres Modell: ein Task pro Charge bzw. Parameter, der periodisch
+    dieselben Werte erneut prüft.
+    """
+    rss_before = peak_rss_mb()
+    values = {i: [5.0] * 10 for i in range(args.batches)}
+    config = PARAMETERS["temperatur"]
+
+    async def poll(batch: int):
+        while True:
+            for value in values[batch][-10:]:
+                if value < config.min or value > config.max:
+                    pass
+            await asyncio.sleep(interval)
+
+    tasks = [asyncio.create_task(poll(i)) for i in range(args.batches)]
+    await asyncio.sleep(0)
+    idle_cpu = await idle_cpu_seconds(args.idle_seconds)
+
+    print(f"{label}: {len(tasks)} Tasks, Intervall {interval:.0f} s")
+    print(f"  Leerlauf:   {idle_cpu * 1000:.1f} ms CPU in {args.idle_seconds:.0f} s")
+    print(f"  Peak-RSS:   {peak_rss_mb():.1f} MB (vorher {rss_before:.1f} MB)")
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batches", type=int, default=10000)
+    parser.add_argument("--measurements", type=int, default=200000)
+    parser.add_argument("--alert-rate", type=float, default=0.01)
+    parser.add_argument("--idle-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run_event_driven(args))
+    asyncio.run(run_polling(args, 30, "Task pro Charge  "))
+    asyncio.run(run_polling(args, 1, "Task pro Parameter"))
+
+
+if __name__ == "__main__":
+    main()
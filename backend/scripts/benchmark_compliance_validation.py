@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""
+Benchmark für die Bulk-Validierung der Compliance-Engine (Chargen/s).
+
+Erzeugt synthetische Chargen, von denen ein Teil einzelne Regeln verletzt,
+und vergleicht die Einzelvalidierung (validate_batch pro Charge, ohne
+Cache) mit validate_batches: erster Lauf über die Regeltabelle, zweiter Lauf
+ohne Änderungen (Cache) und ein Lauf, in dem ein kleiner Teil der Chargen
+geändert wurde.
+
+Beispiel:
+    python backend/scripts/benchmark_compliance_validation.py --batches 100000 --violation-rate 0.05
+"""
+
+import argparse
+import asyncio
+import copy
+import os
+import random
+import resource
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.components.compliance_engine.engine import ComplianceEngine
+from backend.components.compliance_engine.rules import ValidationCache
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss ist unter Linux in KiB angegeben
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_batches(count: int, violation_rate: float, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    now = datetime.now()
+    batches = {}
+    for i in range(count):
+        batch = {
+            'supplier_data': {'supplier_id': f'SUPP-{i % 500:03d}', 'supplier_batch_refs': [f'REF-{i}']},
+            'transport_conditions': {'temperature': rng.uniform(15, 25), 'humidity': rng.uniform(40, 60)},
+            'quality_checks': {
+                'moisture': rng.uniform(8, 12),
+                'temperature': rng.uniform(18, 22),
+                'contamination': rng.uniform(0, 0.1)
+            },
+            'hygiene_protocol': {
+                'cleaning_date': (now - timedelta(days=rng.randint(0, 6))).isoformat(),
+                'responsible': 'Max Mustermann',
+                'measures': ['Desinfektion', 'Reinigung']
+            },
+            'haccp_documentation': {
+                'version': '1.0',
+                'last_update': (now - timedelta(days=rng.randint(0, 300))).isoformat(),
+                'critical_points': ['CP-001', 'CP-002']
+            },
+            'hazard_analysis': {'biological': ['B-001'], 'chemical': ['C-001'], 'physical': ['P-001']},
+            'control_measures': [
+                {'id': 'CM-001', 'type': 'temperature_control', 'description': 'Kühlung'},
+                {'id': 'CM-002', 'type': 'moisture_control', 'description': 'Trocknung'}
+            ],
+            'process_monitoring': {'measurements': [{'parameter': 'temp', 'value': 20.5}]},
+            'eu_documentation': {'declaration': 'DOC-EU-001', 'certificates': ['CERT-001']},
+            'emergency_procedures': {'contact': 'notfall@example.com', 'procedures': ['PROC-001']},
+            'information_chain': {'supplier_info': 'S', 'transport_info': 'T', 'customer_info': 'C'}
+        }
+        if rng.random() < violation_rate:
+            rng.choice([
+                lambda: batch['transport_conditions'].update(humidity=75),
+                lambda: batch['quality_checks'].update(moisture=14),
+                lambda: batch['hazard_analysis'].update(physical=[]),
+                lambda: batch['control_measures'][1].pop('description'),
+                lambda: batch.pop('eu_documentation'),
+            ])()
+        batches[f"CH-{i:07d}"] = batch
+    return batches
+
+
+async def run_single(batches: dict, limit: int) -> float:
+    """Bisheriger Ablauf: validate_batch pro Charge, ohne Cache"""
+    engine = ComplianceEngine(cache=ValidationCache(max_entries=0))
+    items = list(batches.items())[:limit]
+    start = time.perf_counter()
+    for batch_id, batch_data in items:
+        await engine.validate_batch(batch_id, dict(batch_data), responsible_person="QS", digital_signature="SIG")
+    return len(items) / (time.perf_counter() - start)
+
+
+async def run_bulk(args) -> None:
+    batches = make_batches(args.batches, args.violation_rate)
+
+    single_rate = await run_single(batches, min(args.single_limit, args.batches))
+    print(f"Einzelvalidierung:     {single_rate:>10,.0f} Chargen/s "
+          f"(gemessen an {min(args.single_limit, args.batches)} Chargen)")
+
+    engine = ComplianceEngine()
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    results = await engine.validate_batches(batches, responsible_person="QS", digital_signature="SIG")
+    cold = time.perf_counter() - start
+    non_compliant = sum(
+        any(r.validation_result.status != "COMPLIANT" for r in records) for records in results.values()
+    )
+    print(f"Bulk (Regeltabelle):   {args.batches / cold:>10,.0f} Chargen/s "
+          f"({cold:.2f} s, {non_compliant} Chargen mit Abweichungen)")
+
+    start = time.perf_counter()
+    await engine.validate_batches(batches, responsible_person="QS", digital_signature="SIG")
+    warm = time.perf_counter() - start
+    print(f"Bulk (unverändert):    {args.batches / warm:>10,.0f} Chargen/s ({warm:.2f} s, Cache)")
+
+    rng = random.Random(1)
+    changed = copy.copy(batches)
+    for batch_id in rng.sample(list(batches), int(args.batches * args.change_rate)):
+        batch = copy.deepcopy(batches[batch_id])
+        batch['quality_checks']['moisture'] = rng.uniform(8, 12)
+        changed[batch_id] = batch
+    start = time.perf_counter()
+    await engine.validate_batches(changed, responsible_person="QS", digital_signature="SIG")
+    partial = time.perf_counter() - start
+    print(f"Bulk ({args.change_rate:.0%} geändert):   {args.batches / partial:>10,.0f} Chargen/s ({partial:.2f} s)")
+    print(f"Peak-RSS:              {peak_rss_mb():.1f} MB (vor der Bulk-Validierung {rss_before:.1f} MB)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batches", type=int, default=100000)
+    parser.add_argument("--violation-rate", type=float, default=0.05)
+    parser.add_argument("--change-rate", type=float, default=0.01)
+    parser.add_argument("--single-limit", type=int, default=20000,
+                        help="Chargen für die Messung der Einzelvalidierung")
+    args = parser.parse_args()
+    asyncio.run(run_bulk(args))
+
+
+if __name__ == "__main__":
+    main()
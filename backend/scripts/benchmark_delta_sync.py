@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+"""
+Benchmark für die Delta-Synchronisation nach einem Tag offline.
+
+Ein Edge-Knoten (Filiale) und die Zentrale halten denselben Artikelstamm.
+Während des Offline-Fensters bucht die Filiale Verkäufe (Bestand), ändert
+Preise und Beschreibungen; gleichzeitig bucht die Zentrale Wareneingänge.
+Gemessen werden übertragene Bytes, Abgleichszeit (Upload + Download über die
+simulierte Verbindung) und verlorene Bestandsbuchungen:
+
+- bisheriger Ablauf: vollständige Entität pro Änderung ("update"), danach
+  Download des gesamten Artikelstamms
+- Delta-Synchronisation: zusammengefasste Feld-Deltas, kommutative
+  Bestandsbuchungen und Änderungs-Feed ab dem Wasserzeichen
+
+Beispiel:
+    python backend/scripts/benchmark_delta_sync.py --entities 5000 --edits 20000 --remote-edits 5000
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.services.edge_resilience.batch_sync import BatchSynchronizer, SimulatedTransport
+from backend.services.edge_resilience.delta_sync import CentralSyncStore, DeltaTracker
+from backend.services.edge_resilience.sync_queue import SyncItem, SyncQueue
+
+COMMUTATIVE = {"article": ["stock"]}
+
+
+class Link:
+    """Simulierte Verbindung: Roundtrip-Zeit sowie Upload- und Download-Bandbreite"""
+
+    def __init__(self, rtt_ms: float, up_kbps: float, down_kbps: float):
+        self.rtt = rtt_ms / 1000
+        self.up_kbps = up_kbps
+        self.down_kbps = down_kbps
+        self.downloaded = 0
+
+    def should_drop_packet(self) -> bool:
+        return False
+
+    async def simulate_latency(self) -> int:
+        await asyncio.sleep(self.rtt / 2)
+        return int(self.rtt * 500)
+
+    async def download(self, body) -> None:
+        size = len(gzip.compress(json.dumps(body, separators=(",", ":")).encode("utf-8")))
+        self.downloaded += size
+        await asyncio.sleep(self.rtt + size * 8 / (self.down_kbps * 1000))
+
+
+def make_articles(count: int, rng: random.Random) -> dict:
+    articles = {}
+    for i in range(count):
+        articles[f"ART-{i:06d}"] = {
+            "name": f"Artikel {i}",
+            "description": " ".join(rng.choice(["Saatgut", "Dünger", "Futter", "Sack", "25 kg", "Bio",
+                                                "Palette", "lose", "Premium", "Winterweizen"])
+                                    for _ in range(40)),
+            "ean": f"40{rng.randrange(10**10):010d}",
+            "category": rng.choice(["Saatgut", "Düngemittel", "Futtermittel", "Pflanzenschutz"]),
+            "supplier_id": f"L{rng.randrange(300):04d}",
+            "unit": rng.choice(["Stk", "kg", "t", "Sack"]),
+            "price": round(rng.uniform(1, 900), 2),
+            "vat_rate": 19 if rng.random() < 0.7 else 7,
+            "stock": rng.randint(50, 5000),
+            "min_stock": rng.randint(0, 50),
+            "storage_location": f"H{rng.randint(1, 9)}-R{rng.randint(1, 40):02d}",
+            "attributes": {"weight_kg": round(rng.uniform(0.1, 1000), 1), "hazardous": rng.random() < 0.05},
+        }
+    return articles
+
+
+def make_edits(articles: dict, count: int, rng: random.Random, local: bool) -> list:
+    """Änderungen im Offline-Fenster: Verkäufe (Filiale) bzw. Wareneingänge (Zentrale)"""
+    ids = list(articles)
+    # Wenige Schnelldreher machen den Großteil der Buchungen aus
+    hot = ids[:max(1, len(ids) // 10)]
+    edits = []
+    for _ in range(count):
+        article_id = rng.choice(hot) if rng.random() < 0.8 else rng.choice(ids)
+        roll = rng.random()
+        if roll < 0.8:
+            amount = -rng.randint(1, 5) if local else rng.randint(10, 100)
+            edits.append((article_id, "stock", amount))
+        elif roll < 0.95:
+            edits.append((article_id, "price", round(rng.uniform(1, 900), 2)))
+        else:
+            edits.append((article_id, "description", f"Geändert {rng.random():.6f}"))
+    return edits
+
+
+def apply_edit(article: dict, field: str, value) -> dict:
+    article = dict(article)
+    if field == "stock":
+        article["stock"] += value
+    else:
+        article[field] = value
+    return article
+
+
+async def push(queue: SyncQueue, store: CentralSyncStore, link: Link) -> dict:
+    transport = SimulatedTransport(store.handle_batch, link, bandwidth_kbps=link.up_kbps)
+    sync = BatchSynchronizer(queue, transport, max_items=500, max_in_flight=4, retry_backoff=0)
+    return await sync.sync_pending()
+
+
+def lost_stock(store: CentralSyncStore, articles: dict, local_edits: list, remote_edits: list) -> int:
+    expected = {article_id: article["stock"] for article_id, article in articles.items()}
+    for article_id, field, value in local_edits + remote_edits:
+        if field == "stock":
+            expected[article_id] += value
+    return sum(store.get_entity("article", article_id)["stock"] != stock for article_id, stock in expected.items())
+
+
+async def run_full(args, tmp: str, articles: dict, local_edits: list, remote_edits: list) -> None:
+    store = CentralSyncStore(os.path.join(tmp, "full_central.db"))
+    seed = SyncQueue(os.path.join(tmp, "full_seed.db"))
+    for article_id, article in articles.items():
+        seed.add_item(SyncItem(entity_type="article", entity_id=article_id, operation="update", data=article))
+    await push(seed, store, Link(0, 10**6, 10**6))
+
+    # Zentrale bucht während des Offline-Fensters direkt im eigenen Bestand
+    central = dict(articles)
+    remote = SyncQueue(os.path.join(tmp, "full_remote.db"))
+    for article_id, field, value in remote_edits:
+        central[article_id] = apply_edit(central[article_id], field, value)
+        remote.add_item(SyncItem(entity_type="article", entity_id=article_id, operation="update",
+                                 data=central[article_id]))
+    await push(remote, store, Link(0, 10**6, 10**6))
+
+    # Filiale: vollständige Entität pro Änderung
+    local = dict(articles)
+    queue = SyncQueue(os.path.join(tmp, "full_edge.db"))
+    start = time.perf_counter()
+    for article_id, field, value in local_edits:
+        local[article_id] = apply_edit(local[article_id], field, value)
+        queue.add_item(SyncItem(entity_type="article", entity_id=article_id, operation="update",
+                                data=local[article_id]))
+    record = time.perf_counter() - start
+
+    link = Link(args.rtt_ms, args.up_kbps, args.down_kbps)
+    start = time.perf_counter()
+    stats = await push(queue, store, link)
+    # Ohne Änderungs-Feed: gesamten Artikelstamm neu laden
+    await link.download(store.changes_since(0, len(articles))["changes"])
+    reconcile = time.perf_counter() - start
+
+    print(f"Vollständige Entitäten: Upload {stats['bytes_sent'] / 1024:>9,.0f} KiB ({stats['items_sent']} Elemente), "
+          f"Download {link.downloaded / 1024:>9,.0f} KiB, Abgleich {reconcile:6.1f} s, "
+          f"Erfassung {record:.1f} s")
+    print(f"  Artikel mit verlorenen Bestandsbuchungen: {lost_stock(store, articles, local_edits, remote_edits)}")
+
+
+async def run_delta(args, tmp: str, articles: dict, local_edits: list, remote_edits: list) -> None:
+    store = CentralSyncStore(os.path.join(tmp, "delta_central.db"))
+    central = DeltaTracker(SyncQueue(os.path.join(tmp, "delta_remote.db")), "zentrale", COMMUTATIVE)
+    edge = DeltaTracker(SyncQueue(os.path.join(tmp, "delta_edge.db")), "filiale-1", COMMUTATIVE)
+
+    async def fetch_local(since, limit, node_id):
+        return store.changes_since(since, limit, node_id)
+
+    for article_id, article in articles.items():
+        central.record_change("article", article_id, article)
+    await push(central.sync_queue, store, Link(0, 10**6, 10**6))
+    await edge.pull(fetch_local, limit=5000)
+
+    current = dict(articles)
+    for article_id, field, value in remote_edits:
+        current[article_id] = apply_edit(current[article_id], field, value)
+        central.record_change("article", article_id, current[article_id])
+    await push(central.sync_queue, store, Link(0, 10**6, 10**6))
+
+    local = dict(articles)
+    start = time.perf_counter()
+    for article_id, field, value in local_edits:
+        local[article_id] = apply_edit(local[article_id], field, value)
+        edge.record_change("article", article_id, local[article_id])
+    record = time.perf_counter() - start
+
+    link = Link(args.rtt_ms, args.up_kbps, args.down_kbps)
+
+    async def fetch(since, limit, node_id):
+        page = store.changes_since(since, limit, node_id)
+        await link.download(page)
+        return page
+
+    start = time.perf_counter()
+    stats = await push(edge.sync_queue, store, link)
+    updated = await edge.pull(fetch, limit=500)
+    reconcile = time.perf_counter() - start
+
+    print(f"Delta-Synchronisation:  Upload {stats['bytes_sent'] / 1024:>9,.0f} KiB ({stats['items_sent']} Elemente), "
+          f"Download {link.downloaded / 1024:>9,.0f} KiB, Abgleich {reconcile:6.1f} s, "
+          f"Erfassung {record:.1f} s")
+    print(f"  Artikel mit verlorenen Bestandsbuchungen: {lost_stock(store, articles, local_edits, remote_edits)}, "
+          f"aktualisierte Artikel in der Filiale: {len(updated)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entities", type=int, default=5000)
+    parser.add_argument("--edits", type=int, default=20000, help="Änderungen der Filiale im Offline-Fenster")
+    parser.add_argument("--remote-edits", type=int, default=5000, help="Änderungen der Zentrale im Offline-Fenster")
+    parser.add_argument("--rtt-ms", type=float, default=300)
+    parser.add_argument("--up-kbps", type=float, default=2000)
+    parser.add_argument("--down-kbps", type=float, default=16000)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    rng = random.Random(3)
+    articles = make_articles(args.entities, rng)
+    local_edits = make_edits(articles, args.edits, rng, local=True)
+    remote_edits = make_edits(articles, args.remote_edits, rng, local=False)
+    print(f"{args.entities} Artikel, {args.edits} Änderungen in der Filiale, "
+          f"{args.remote_edits} in der Zentrale, {args.rtt_ms:.0f} ms RTT, "
+          f"{args.up_kbps:.0f}/{args.down_kbps:.0f} kbit/s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run_full(args, tmp, articles, local_edits, remote_edits))
+        asyncio.run(run_delta(args, tmp, articles, local_edits, remote_edits))
+
+
+if __name__ == "__main__":
+    main()
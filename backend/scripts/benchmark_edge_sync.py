@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+"""
+Benchmark für die Synchronisation der Edge-Queue über eine langsame Verbindung.
+
+Simuliert mit dem NetworkSimulator (linkup_mcp/tools/network_simulator.py)
+eine ländliche Anbindung (Standard: 300 ms RTT, Jitter, Paketverlust und
+begrenzte Upload-Bandbreite) und misst Elemente/s nach einer Wiederverbindung:
+
+- bisheriger Ablauf: SyncQueue.process_queue mit einem Request pro Element
+- BatchSynchronizer: komprimierte Umschläge, mehrere gleichzeitig unterwegs,
+  Quittung je Element
+
+Beispiel:
+    python backend/scripts/benchmark_edge_sync.py --items 20000 --rtt-ms 300 --loss 1
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from backend.services.edge_resilience.batch_sync import BatchSynchronizer, SimulatedTransport, decode_envelope
+from backend.services.edge_resilience.sync_queue import SyncItem, SyncItemStatus, SyncQueue
+
+
+def load_network_simulator():
+    # Direkt aus der Datei laden; das Paket linkup_mcp zieht weitere Abhängigkeiten nach
+    path = os.path.join(ROOT, "linkup_mcp", "tools", "network_simulator.py")
+    spec = importlib.util.spec_from_file_location("network_simulator", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.NetworkSimulator
+
+
+def fill_queue(db_path: str, count: int, rng: random.Random) -> SyncQueue:
+    queue = SyncQueue(db_path)
+    for i in range(count):
+        queue.add_item(SyncItem(
+            entity_type="order",
+            entity_id=f"A{i:07d}",
+            operation="update",
+            data={
+                "customer_id": f"K{rng.randrange(5000):05d}",
+                "status": rng.choice(["offen", "kommissioniert", "geliefert"]),
+                "positions": [
+                    {"article": f"ART-{rng.randrange(20000):05d}", "quantity": rng.randint(1, 50),
+                     "price": round(rng.uniform(1, 500), 2), "unit": "Stk"}
+                    for _ in range(rng.randint(1, 6))
+                ],
+                "note": "Lieferung an Rampe 3"
+            }
+        ))
+    return queue
+
+
+class Server:
+    """Zentraler Server: übernimmt Elemente idempotent über die item_id"""
+
+    def __init__(self):
+        self.applied = set()
+
+    def batch(self, payload: bytes):
+        envelope = decode_envelope(payload)
+        results = {}
+        for item in envelope["items"]:
+            self.applied.add(item["item_id"])
+            results[item["item_id"]] = {"status": "ok"}
+        return {"envelope_id": envelope["envelope_id"], "results": results}
+
+    def single(self, payload: bytes):
+        self.applied.add(json.loads(payload)["item_id"])
+        return {"status": 200}
+
+
+def make_simulator(args):
+    simulator = load_network_simulator()()
+    # Latenz je Richtung, der Transport wartet auf Hin- und Rückweg
+    simulator.configure(latency=args.rtt_ms / 2, jitter=args.jitter_ms, packet_loss=args.loss)
+    return simulator
+
+
+async def run_single(args, db_path: str) -> None:
+    rng = random.Random(7)
+    queue = fill_queue(db_path, args.single_items, rng)
+    server = Server()
+    transport = SimulatedTransport(server.single, make_simulator(args), args.bandwidth_kbps, args.timeout)
+
+    async def send(item: SyncItem) -> bool:
+        # Ein Request pro Element, unkomprimiert (wie _process_sync_item)
+        payload = json.dumps({"item_id": item.item_id, **item.data}).encode("utf-8")
+        try:
+            await transport.send(payload)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    # process_queue wartet nur auf Futures, nicht auf Koroutinen
+    start = time.perf_counter()
+    task = asyncio.create_task(queue.process_queue(lambda item: asyncio.ensure_future(send(item))))
+    while len(server.applied) < args.single_items:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    print(f"Ein Request pro Element:  {args.single_items / elapsed:>8,.1f} Elemente/s "
+          f"({args.single_items} Elemente in {elapsed:.1f} s, {transport.requests} Requests)")
+
+
+async def run_batched(args, db_path: str) -> None:
+    rng = random.Random(7)
+    queue = fill_queue(db_path, args.items, rng)
+    server = Server()
+    transport = SimulatedTransport(server.batch, make_simulator(args), args.bandwidth_kbps, args.timeout)
+    sync = BatchSynchronizer(queue, transport, max_items=args.max_items, max_in_flight=args.in_flight,
+                             retry_backoff=0.5)
+
+    raw_bytes = sum(len(json.dumps(item.data)) for item in queue.get_items_by_status(SyncItemStatus.PENDING, args.items))
+    start = time.perf_counter()
+    stats = await sync.sync_pending()
+    elapsed = time.perf_counter() - start
+
+    assert len(server.applied) == args.items, "nicht alle Elemente übertragen"
+    print(f"Gebündelt ({args.max_items}/Umschlag, {args.in_flight} parallel): "
+          f"{args.items / elapsed:>8,.1f} Elemente/s ({args.items} Elemente in {elapsed:.1f} s)")
+    print(f"  Umschläge: {stats['envelopes']} (davon {stats['transport_errors']} verloren), "
+          f"Wiederholungen: {stats['retried']}")
+    print(f"  Übertragen: {stats['bytes_sent'] / 1024:,.0f} KiB komprimiert "
+          f"(Nutzdaten {raw_bytes / 1024:,.0f} KiB)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--single-items", type=int, default=100,
+                        help="Elemente für die Messung des bisherigen Ablaufs")
+    parser.add_argument("--rtt-ms", type=float, default=300)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--loss", type=float, default=1.0, help="Paketverlust in Prozent")
+    parser.add_argument("--bandwidth-kbps", type=float, default=2000)
+    parser.add_argument("--timeout", type=float, default=3.0)
+    parser.add_argument("--max-items", type=int, default=200)
+    parser.add_argument("--in-flight", type=int, default=4)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run_single(args, os.path.join(tmp, "single.db")))
+        asyncio.run(run_batched(args, os.path.join(tmp, "batched.db")))
+
+
+if __name__ == "__main__":
+    main()
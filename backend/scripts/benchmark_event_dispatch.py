@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Benchmark für den EventDispatcher mit synchronen und asynchronen Listenern.
+
+Dispatcht transaction.completed-Events an drei simulierte Listener (Audit,
+Benachrichtigung, Analyse) mit fester Latenz und misst die Zeit im Thread des
+Aufrufers, einmal mit allen Listenern synchron, einmal asynchron (Analyse
+gebündelt).
+
+Beispiel:
+    python backend/scripts/benchmark_event_dispatch.py --events 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.models.transaction_processing.events import ASYNC, SYNC, EventDispatcher, TRANSACTION_COMPLETED
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(events, mode, audit_ms, notify_ms, analytics_ms):
+    dispatcher = EventDispatcher()
+
+    def audit(event):
+        time.sleep(audit_ms / 1000)
+
+    def notify(event):
+        time.sleep(notify_ms / 1000)
+
+    def analytics(batch):
+        # Ein Aufruf je Bündel, z.B. ein Bulk-Insert
+        time.sleep(analytics_ms / 1000)
+
+    options = {"mode": mode}
+    dispatcher.add_listener(TRANSACTION_COMPLETED, audit, **options)
+    dispatcher.add_listener(TRANSACTION_COMPLETED, notify, **options)
+    if mode == ASYNC:
+        dispatcher.add_listener(TRANSACTION_COMPLETED, analytics, mode=ASYNC, batch_size=200)
+    else:
+        dispatcher.add_listener(TRANSACTION_COMPLETED, lambda event: analytics([event]))
+
+    latencies = []
+    started = time.perf_counter()
+    for n in range(events):
+        before = time.perf_counter()
+        dispatcher.dispatch(TRANSACTION_COMPLETED, {"transaction_id": n})
+        latencies.append(time.perf_counter() - before)
+    caller = time.perf_counter() - started
+    dispatcher.flush()
+    total = time.perf_counter() - started
+    dispatcher.shutdown()
+    return caller, total, latencies, dispatcher.metrics()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--audit-ms", type=float, default=1.0)
+    parser.add_argument("--notify-ms", type=float, default=3.0)
+    parser.add_argument("--analytics-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(f"Events:     {args.events}, Latenzen Audit {args.audit_ms} ms, Benachrichtigung {args.notify_ms} ms, "
+          f"Analyse {args.analytics_ms} ms")
+    for mode in (SYNC, ASYNC):
+        caller, total, latencies, metrics = run(args.events, mode, args.audit_ms, args.notify_ms, args.analytics_ms)
+        calls = sum(m["calls"] for m in metrics.values())
+        print(f"{mode:6s}      Aufrufer {caller:6.2f} s, p99 je dispatch {percentile(latencies, 0.99) * 1000:7.3f} ms, "
+              f"bis alle Listener fertig {total:6.2f} s, Listener-Aufrufe {calls}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Benchmark für die Streaming-Import-Engine (Zeilen/s und Peak-RSS).
+
+Erzeugt eine synthetische Artikel-CSV bzw. JSON-Lines-Datei der gewünschten
+Größe und importiert sie chunkweise in SQLite (executemany) oder PostgreSQL
+(COPY, über ``--postgres-dsn`` mit psycopg2). Der Peak-RSS sollte unabhängig
+von der Dateigröße konstant bleiben.
+
+Beispiel:
+    python backend/scripts/benchmark_import_engine.py --size-mb 5120 --format csv
+"""
+
+import argparse
+import json
+import os
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.services.import_engine import (
+    DBAPIBulkLoader,
+    StreamingImporter,
+    iter_csv_chunks,
+    iter_jsonl_chunks,
+)
+
+MAPPING = {"artikelnummer": "artikelnummer", "name": "name", "preis": "preis", "menge": "menge"}
+TYPES = {"preis": "float", "menge": "int"}
+
+
+def generate_file(path: str, size_mb: int, fmt: str) -> int:
+    """Schreibt Zeilen, bis die Zieldateigröße erreicht ist; gibt die Zeilenzahl zurück."""
+    target = size_mb * 1024 * 1024
+    rows = 0
+    with open(path, "w", encoding="utf-8") as f:
+        if fmt == "csv":
+            f.write("artikelnummer,name,preis,menge\n")
+        while f.tell() < target:
+            lines = []
+            for i in range(rows, rows + 10000):
+                if fmt == "csv":
+                    lines.append(f"A-{i:09d},Artikel {i},{i % 1000}.99,{i % 50}\n")
+                else:
+                    lines.append(json.dumps({
+                        "artikelnummer": f"A-{i:09d}", "name": f"Artikel {i}",
+                        "preis": i % 1000 + 0.99, "menge": i % 50,
+                    }) + "\n")
+            f.write("".join(lines))
+            rows += 10000
+    return rows
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss ist unter Linux in KiB angegeben
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--postgres-dsn", default=None)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    source = os.path.join(workdir, f"artikel.{args.format}")
+    rows = generate_file(source, args.size_mb, args.format)
+    rss_before = peak_rss_mb()
+
+    if args.postgres_dsn:
+        import psycopg2
+        connection = psycopg2.connect(args.postgres_dsn)
+        paramstyle = "format"
+    else:
+        connection = sqlite3.connect(os.path.join(workdir, "import.db"))
+        paramstyle = "qmark"
+    cursor = connection.cursor()
+    cursor.execute("DROP TABLE IF EXISTS bench_import")
+    cursor.execute(
+        "CREATE TABLE bench_import (artikelnummer VARCHAR(20), name VARCHAR(100), preis FLOAT, menge INTEGER)"
+    )
+    connection.commit()
+
+    def reader(start_position: int):
+        if args.format == "csv":
+            return iter_csv_chunks(source, args.chunk_size, start_position=start_position)
+        return iter_jsonl_chunks(source, args.chunk_size, start_position=start_position)
+
+    importer = StreamingImporter(
+        reader, DBAPIBulkLoader(connection, "bench_import", paramstyle), MAPPING, TYPES
+    )
+    start = time.perf_counter()
+    result = importer.run()
+    duration = time.perf_counter() - start
+    connection.close()
+
+    print(f"Datei:        {args.size_mb} MB {args.format}, {rows} Zeilen")
+    print(f"Importiert:   {result.processed_rows} Zeilen in {result.chunks} Chunks, {result.error_rows} Fehler")
+    print(f"Durchsatz:    {result.processed_rows / duration:,.0f} Zeilen/s ({duration:.1f} s)")
+    print(f"Peak-RSS:     {peak_rss_mb():.1f} MB (vor dem Import {rss_before:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
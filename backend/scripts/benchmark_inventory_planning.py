@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""
+Benchmark für die vektorisierte Bestellplanung (Produkte/s und Peak-RSS).
+
+Erzeugt eine SQLite-Datenbank mit synthetischen Produkten und Verkäufen der
+letzten 90 Tage. Gemessen werden der erste Planungslauf (baut
+``product_daily_demand`` vollständig auf) und ein nächtlicher Lauf nach einem
+weiteren Verkaufstag. Zum Vergleich wird der frühere Ansatz (ein
+Nachfrage-Query pro Produkt) an einer Stichprobe gemessen und auf den Katalog
+hochgerechnet.
+
+Beispiel:
+    python backend/scripts/benchmark_inventory_planning.py --products 100000 --sales-per-product 20
+"""
+
+import argparse
+import os
+import random
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.modules.ai_inventory_suggestions import AIInventorySuggestions
+
+CATEGORIES = ["Getränke", "Lebensmittel", "Elektronik", "Kleidung", "Haushalt"]
+
+
+def insert_sales(connection: sqlite3.Connection, rng: random.Random, products: int,
+                 sales_per_product: int, as_of: datetime, days: int) -> int:
+    rows = 0
+    for start in range(0, products, 10000):
+        sales = []
+        for i in range(start, min(start + 10000, products)):
+            for _ in range(rng.randint(0, 2 * sales_per_product)):
+                created_at = as_of - timedelta(minutes=rng.randint(1, days * 24 * 60))
+                sales.append((f"P{i:07d}", rng.randint(1, 10), 1.0, created_at.strftime("%Y-%m-%d %H:%M:%S")))
+        connection.executemany(
+            "INSERT INTO transactions (product_id, quantity, unit_price, created_at) VALUES (?, ?, ?, ?)", sales
+        )
+        rows += len(sales)
+    connection.commit()
+    return rows
+
+
+def generate_database(path: str, products: int, sales_per_product: int, as_of: datetime):
+    connection = sqlite3.connect(path)
+    connection.execute("""
+        CREATE TABLE products (
+            id TEXT PRIMARY KEY, product_name TEXT, category TEXT, current_stock REAL,
+            unit_price REAL, supplier_id TEXT, reorder_point REAL, safety_stock REAL
+        )
+    """)
+    connection.execute("""
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY, product_id TEXT, quantity REAL,
+            unit_price REAL, created_at TIMESTAMP
+        )
+    """)
+    rng = random.Random(42)
+    connection.executemany(
+        "INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        ((f"P{i:07d}", f"Artikel {i}", CATEGORIES[i % len(CATEGORIES)], rng.randint(0, 200),
+          round(rng.uniform(0.5, 500), 2), f"S{i % 300}", rng.randint(0, 50), rng.randint(0, 20))
+         for i in range(products))
+    )
+    rows = insert_sales(connection, rng, products, sales_per_product, as_of, 90)
+    connection.execute("CREATE INDEX ix_transactions_product_created ON transactions (product_id, created_at)")
+    connection.execute("CREATE INDEX ix_transactions_created ON transactions (created_at)")
+    connection.commit()
+    return connection, rows
+
+
+def per_product_seconds(connection: sqlite3.Connection, sample: int, as_of: datetime) -> float:
+    """Laufzeit des früheren Ansatzes (ein Query pro Produkt) für eine Stichprobe."""
+    since = (as_of - timedelta(days=90)).strftime("%Y-%m-%d %H:%M:%S")
+    ids = [row[0] for row in connection.execute("SELECT id FROM products LIMIT ?", (sample,))]
+    start = time.perf_counter()
+    cursor = connection.cursor()
+    for product_id in ids:
+        cursor.execute(
+            "SELECT SUM(quantity), COUNT(*) FROM transactions WHERE product_id = ? AND created_at >= ?",
+            (product_id, since)
+        )
+        cursor.fetchone()
+    return time.perf_counter() - start
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss ist unter Linux in KiB angegeben
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--sales-per-product", type=int, default=20)
+    parser.add_argument("--sample", type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.chdir(workdir)
+    as_of = datetime.now()
+    connection, sales = generate_database(
+        os.path.join(workdir, "inventory.db"), args.products, args.sales_per_product, as_of
+    )
+    rss_before = peak_rss_mb()
+
+    service = AIInventorySuggestions(connection)
+    initial = service.run_reorder_planning(lookback_days=90, as_of=as_of, apply_parameters=True)
+
+    # Ein weiterer Verkaufstag, danach nächtlicher Lauf
+    next_day = as_of + timedelta(days=1)
+    insert_sales(connection, random.Random(7), args.products, max(args.sales_per_product // 90, 1), next_day, 1)
+    start = time.perf_counter()
+    result = service.run_reorder_planning(lookback_days=90, as_of=next_day, apply_parameters=True)
+    duration = time.perf_counter() - start
+
+    sample = min(args.sample, args.products)
+    estimated = per_product_seconds(connection, sample, as_of) / sample * args.products
+    connection.close()
+
+    print(f"Katalog:      {args.products} Produkte, {sales} Verkäufe")
+    print(f"Erster Lauf:  {sum(v for k, v in initial.items() if k.endswith('_seconds')):.2f} s "
+          f"(Aufbau Tagesnachfrage {initial['refresh_seconds']:.2f} s)")
+    print(f"Nächtlich:    {duration:.2f} s ({args.products / duration:,.0f} Produkte/s), "
+          f"{result['reorder_suggestions']} Bestellvorschläge")
+    print(f"  Tagesnachfrage: {result['refresh_seconds']:.2f} s")
+    print(f"  Laden:      {result['load_seconds']:.2f} s")
+    print(f"  Berechnung: {result['compute_seconds']:.2f} s")
+    print(f"  Schreiben:  {result['write_seconds']:.2f} s")
+    print(f"Pro Produkt:  ~{estimated:.1f} s nur für die Nachfrage-Queries (hochgerechnet aus {sample})")
+    print(f"Peak-RSS:     {peak_rss_mb():.1f} MB (vor der Planung {rss_before:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
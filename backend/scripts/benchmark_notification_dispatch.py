@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""
+Benchmark für den Versand einer Notfall-Rundmeldung an viele Empfänger.
+
+Startet einen lokalen Debug-SMTP-Server (mit einstellbarer Antwortlatenz) und
+vergleicht für E-Mail, SMS (simulierte Gateway-Latenz), Push und In-App:
+
+- seriell: je Empfänger und Kanal ein Protokolleintrag mit zwei Commits,
+  je E-Mail eine neue SMTP-Verbindung (bisheriges Verhalten)
+- Dispatcher: Protokolleinträge gesammelt, Kanäle parallel, wenige
+  wiederverwendete SMTP-Verbindungen, Push gebündelt
+
+Beispiel:
+    python backend/scripts/benchmark_notification_dispatch.py --recipients 500
+"""
+
+import argparse
+import os
+import smtplib
+import socketserver
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from email.mime.text import MIMEText
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.services.notification_dispatcher import (
+    Coalescer,
+    Delivery,
+    NotificationDispatcher,
+    NotificationEvent,
+    SMTPBatchSender,
+    run_concurrently,
+)
+
+CHANNELS = ("email", "sms", "push", "in_app")
+
+
+class DebugSMTPHandler(socketserver.StreamRequestHandler):
+    """Nimmt Nachrichten an und verwirft sie; jede Antwort wartet ``server.latency``."""
+
+    def _reply(self, text):
+        time.sleep(self.server.latency)
+        self.wfile.write(text.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        self._reply("220 localhost ESMTP")
+        in_data = False
+        for line in self.rfile:
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    self._reply("250 OK")
+                continue
+            command = line[:4].upper()
+            if command in (b"EHLO", b"HELO"):
+                self._reply("250 localhost")
+            elif command == b"DATA":
+                in_data = True
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+            elif command == b"QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("250 OK")
+
+
+def open_log_db(path):
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS notification_logs (id INTEGER PRIMARY KEY, user_id INTEGER, "
+        "notification_type TEXT, content TEXT, is_sent INTEGER, sent_at TEXT, error_message TEXT)"
+    )
+    return connection
+
+
+def run_serial(recipients, event, smtp_port, sms_latency, db):
+    """Bisheriges Verfahren: Empfänger für Empfänger, Kanal für Kanal."""
+    for user_id in recipients:
+        for channel in CHANNELS:
+            cursor = db.execute(
+                "INSERT INTO notification_logs (user_id, notification_type, content, is_sent) VALUES (?, ?, ?, 0)",
+                (user_id, channel, event.body),
+            )
+            db.commit()
+            if channel == "email":
+                with smtplib.SMTP("127.0.0.1", smtp_port) as smtp:
+                    message = MIMEText(event.body)
+                    message["Subject"] = event.subject
+                    smtp.sendmail("alarm@example.com", [f"user{user_id}@example.com"], message.as_string())
+            elif channel == "sms":
+                time.sleep(sms_latency)
+            db.execute("UPDATE notification_logs SET is_sent = 1, sent_at = datetime('now') WHERE id = ?",
+                       (cursor.lastrowid,))
+            db.commit()
+
+
+def run_dispatcher(recipients, event, smtp_port, sms_latency, db, connections):
+    smtp = SMTPBatchSender("127.0.0.1", smtp_port, "alarm@example.com", use_tls=False,
+                             connections=connections)
+
+    def send_sms(deliveries, event):
+        def send_one(delivery):
+            time.sleep(sms_latency)
+            return True, ""
+        run_concurrently(deliveries, send_one, max_workers=16)
+
+    def send_all(deliveries, event):
+        for delivery in deliveries:
+            delivery.sent = True
+
+    dispatcher = NotificationDispatcher(
+        {"email": smtp.send, "sms": send_sms, "push": send_all, "in_app": send_all},
+        coalescer=Coalescer(),
+    )
+    deliveries = [
+        Delivery(user_id, channel, f"user{user_id}@example.com" if channel == "email" else user_id)
+        for user_id in recipients for channel in CHANNELS
+    ]
+    deliveries, _ = dispatcher.coalesce(event, deliveries)
+    with db:
+        first = db.execute("SELECT COALESCE(MAX(id), 0) FROM notification_logs").fetchone()[0] + 1
+        db.executemany(
+            "INSERT INTO notification_logs (id, user_id, notification_type, content, is_sent) VALUES (?, ?, ?, ?, 0)",
+            [(first + n, d.user_id, d.channel, event.body) for n, d in enumerate(deliveries)],
+        )
+    result = dispatcher.deliver(event, deliveries)
+    with db:
+        db.executemany(
+            "UPDATE notification_logs SET is_sent = ?, sent_at = datetime('now'), error_message = ? WHERE id = ?",
+            [(int(d.sent), d.error, first + n) for n, d in enumerate(result.deliveries)],
+        )
+    # Dieselbe Meldung ein zweites Mal: wird vollständig zusammengefasst
+    _, coalesced = dispatcher.coalesce(event, [Delivery(u, c) for u in recipients for c in CHANNELS])
+    return result, coalesced
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recipients", type=int, default=500)
+    parser.add_argument("--smtp-latency", type=float, default=0.002, help="Sekunden je SMTP-Antwort")
+    parser.add_argument("--sms-latency", type=float, default=0.05, help="Sekunden je SMS-Gateway-Aufruf")
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--skip-serial", action="store_true")
+    args = parser.parse_args()
+
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), DebugSMTPHandler)
+    server.daemon_threads = True
+    server.latency = args.smtp_latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    workdir = tempfile.mkdtemp()
+    recipients = list(range(1, args.recipients + 1))
+    event = NotificationEvent("NOTFALL: Brand in Halle 3", "Bitte Gebäude sofort verlassen.", "CRITICAL", "emergency", 1)
+
+    print(f"Empfänger:    {args.recipients} x {len(CHANNELS)} Kanäle, SMTP-Latenz {args.smtp_latency * 1000:.0f} ms, "
+          f"SMS-Latenz {args.sms_latency * 1000:.0f} ms")
+    if not args.skip_serial:
+        db = open_log_db(os.path.join(workdir, "serial.db"))
+        start = time.perf_counter()
+        run_serial(recipients, event, port, args.sms_latency, db)
+        print(f"Seriell:      {time.perf_counter() - start:.1f} s")
+        db.close()
+
+    db = open_log_db(os.path.join(workdir, "dispatcher.db"))
+    start = time.perf_counter()
+    result, coalesced = run_dispatcher(recipients, event, port, args.sms_latency, db, args.connections)
+    print(f"Dispatcher:   {time.perf_counter() - start:.1f} s ({result.sent} zugestellt, {result.failed} fehlgeschlagen)")
+    print(f"Wiederholung: {coalesced} von {args.recipients * len(CHANNELS)} Zustellungen zusammengefasst")
+    db.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
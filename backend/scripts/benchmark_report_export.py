@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Benchmark für den Streaming-Excel-Export (Zeilen/s und Peak-RSS).
+
+Erzeugt eine SQLite-Tabelle mit synthetischen Buchungen und exportiert sie per
+Server-Side-Cursor (``query_source``) in ein write-only Workbook
+(``write_workbook``). Zum Vergleich wird der frühere Ansatz (alle Zeilen als
+Dicts laden, DataFrame, normales Workbook) an einer kleineren Stichprobe
+gemessen; er läuft nach dem Streaming-Export, damit dessen Peak-RSS nicht
+verfälscht wird.
+
+Beispiel:
+    python backend/scripts/benchmark_report_export.py --rows 1000000 --baseline-rows 100000
+"""
+
+import argparse
+import os
+import random
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import create_engine
+
+from backend.services.report_engine import SheetSpec, query_source, write_workbook
+
+CATEGORIES = ["Wareneingang", "Warenausgang", "Umbuchung", "Inventur", "Retoure"]
+
+
+def generate_database(path: str, rows: int) -> None:
+    connection = sqlite3.connect(path)
+    connection.execute("""
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY, date TIMESTAMP, category TEXT, article TEXT,
+            quantity REAL, amount REAL, description TEXT
+        )
+    """)
+    rng = random.Random(42)
+    start = datetime(2025, 1, 1)
+    for offset in range(0, rows, 50000):
+        connection.executemany(
+            "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((i, (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"), CATEGORIES[i % len(CATEGORIES)],
+              f"A{rng.randint(1, 50000):06d}", rng.randint(1, 100), round(rng.uniform(-5000, 5000), 2),
+              f"Buchung {i}")
+             for i in range(offset, min(offset + 50000, rows)))
+        )
+    connection.commit()
+    connection.close()
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss ist unter Linux in KiB angegeben
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def baseline_seconds(engine, rows: int, output_file: str) -> float:
+    """Früherer Ansatz: alle Zeilen laden und über ein normales Workbook schreiben."""
+    import pandas as pd
+    from openpyxl import Workbook
+
+    start = time.perf_counter()
+    with engine.connect() as connection:
+        data = [dict(row._mapping) for row in connection.exec_driver_sql(
+            f"SELECT * FROM transactions LIMIT {rows}"
+        )]
+    df = pd.DataFrame(data)
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.append(list(df.columns))
+    for row in df.itertuples(index=False):
+        worksheet.append(list(row))
+    workbook.save(output_file)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--baseline-rows", type=int, default=100000)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    db_path = os.path.join(workdir, "report.db")
+    generate_database(db_path, args.rows)
+    engine = create_engine(f"sqlite:///{db_path}")
+    rss_before = peak_rss_mb()
+
+    progress_calls = []
+    start = time.perf_counter()
+    source = query_source(engine, "SELECT * FROM transactions ORDER BY id", chunk_size=args.chunk_size)
+    counts = write_workbook(
+        os.path.join(workdir, "stream.xlsx"),
+        [SheetSpec("Transaktionen", source)],
+        progress=lambda written, sheet: progress_calls.append(written),
+        chunk_size=args.chunk_size
+    )
+    duration = time.perf_counter() - start
+    rss_stream = peak_rss_mb()
+
+    baseline_rows = min(args.baseline_rows, args.rows)
+    estimated = baseline_seconds(engine, baseline_rows, os.path.join(workdir, "baseline.xlsx")) \
+        / baseline_rows * args.rows
+
+    written = sum(counts.values())
+    print(f"Zeilen:       {written} in {len(counts)} Blatt/Blättern, {len(progress_calls)} Fortschrittsmeldungen")
+    print(f"Streaming:    {duration:.2f} s ({written / duration:,.0f} Zeilen/s), "
+          f"{os.path.getsize(os.path.join(workdir, 'stream.xlsx')) / 1e6:.1f} MB")
+    print(f"Peak-RSS:     {rss_stream:.1f} MB (vor dem Export {rss_before:.1f} MB)")
+    print(f"Bisher:       ~{estimated:.1f} s (hochgerechnet aus {baseline_rows} Zeilen), "
+          f"Peak-RSS danach {peak_rss_mb():.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
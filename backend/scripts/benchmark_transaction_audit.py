@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Benchmark für das Schreiben von Transaktions-Audit-Logs.
+
+Vergleicht auf einer SQLite-Datei Einzel-Inserts mit einem Commit
+je Eintrag (bisheriges Verfahren) mit dem gepufferten, hash-verketteten
+TransactionAuditSink und prüft anschließend die Kette.
+
+Beispiel:
+    python backend/scripts/benchmark_transaction_audit.py --entries 50000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine
+from sqlalchemy.orm import Session
+
+from backend.models.transaction_processing.audit import TransactionAuditSink, ensure_audit_schema
+from backend.models.transaction_processing.models import TransactionAuditChain, TransactionAuditLog
+
+
+def create_tables(path):
+    engine = create_engine(f"sqlite:///{path}")
+    metadata = MetaData()
+    for name in ("user", "transaction", "transaction_item"):
+        Table(name, metadata, Column("id", Integer, primary_key=True))
+    table = TransactionAuditLog.__table__.to_metadata(metadata)
+    chain_table = TransactionAuditChain.__table__.to_metadata(metadata)
+    metadata.create_all(engine)
+    return engine, table, chain_table
+
+
+def entries(count):
+    start = datetime(2024, 1, 1)
+    for n in range(count):
+        yield dict(transaction_id=n // 4, action="booked", message=f"Position {n % 4} gebucht",
+                   user_id=n % 25, timestamp=start + timedelta(seconds=n),
+                   details={"betrag": round(n * 1.17, 2), "konto": 1200 + n % 40})
+
+
+def run_single(path, count):
+    engine, table, _ = create_tables(path)
+    started = time.perf_counter()
+    with Session(engine) as session:
+        for n, entry in enumerate(entries(count), start=1):
+            session.execute(table.insert().values(id=n, previous_hash="", entry_hash="", **entry))
+            session.commit()
+    return time.perf_counter() - started
+
+
+def run_sink(path, count, batch_size):
+    engine, table, chain_table = create_tables(path)
+    ensure_audit_schema(engine, table, chain_table)
+    sink = TransactionAuditSink(engine, batch_size=batch_size, table=table, chain_table=chain_table)
+    started = time.perf_counter()
+    for entry in entries(count):
+        sink.append(**entry)
+    sink.close()
+    written = time.perf_counter() - started
+    started = time.perf_counter()
+    result = sink.verify()
+    return written, time.perf_counter() - started, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    single = run_single(os.path.join(workdir, "single.db"), args.entries)
+    print(f"Einzeln, Commit je Eintrag: {single:6.2f} s ({args.entries / single:,.0f} Einträge/s)")
+    written, verified, result = run_sink(os.path.join(workdir, "sink.db"), args.entries, args.batch_size)
+    print(f"Sink, Block {args.batch_size}:          {written:6.2f} s ({args.entries / written:,.0f} Einträge/s)")
+    print(f"Kettenprüfung:              {verified:6.2f} s, {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+Gemeinsame Ausführungsschicht für die Analyse-Tasks des VALEO-NeuroERP-Systems.
+
+Die Tasks in ``backend/tasks/data_analysis_tasks.py`` laden ihre Daten nicht mehr
+jeweils neu aus der CSV-Datei, sondern über einen gemeinsamen Dataset-Cache:
+
+- ``DatasetCache``: konvertiert die Quelldatei einmalig nach Parquet (Schlüssel:
+  Pfad + mtime + Größe) und liest danach nur die benötigten Spalten
+  memory-mapped.
+- ``ResultCache``: speichert Task-Ergebnisse unter einem Fingerprint aus
+  Eingabedatei und Parametern.
+- Beide Verzeichnisse werden nach Alter (``ANALYTICS_CACHE_TTL_HOURS``) und
+  Gesamtgröße (``ANALYTICS_CACHE_MAX_MB``, am längsten ungenutzte zuerst)
+  bereinigt.
+- ``ModelStore``: hält trainierte Modelle samt Anzahl verarbeiteter Zeilen, damit
+  bei angewachsenen Datensätzen nur die neuen Zeilen nachtrainiert werden.
+- ``map_groups``: verteilt Modelle pro Gruppe (Artikel, Kunde) auf einen
+  Prozesspool.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "ANALYTICS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "valeo_analytics_cache")
+)
+
+# Obergrenzen je Cache-Verzeichnis (Parquet-Dateien bzw. Ergebnisse)
+DEFAULT_CACHE_MAX_BYTES = int(float(os.environ.get("ANALYTICS_CACHE_MAX_MB", "2048")) * 1024 * 1024)
+DEFAULT_CACHE_TTL = float(os.environ.get("ANALYTICS_CACHE_TTL_HOURS", "168")) * 3600
+
+# Gruppen pro Arbeitspaket im Prozesspool (vermeidet Overhead bei vielen kleinen Gruppen)
+DEFAULT_GROUPS_PER_TASK = 64
+
+
+def dataset_key(data_path: str) -> str:
+    """Schlüssel einer Quelldatei aus Pfad, Änderungszeit und Größe."""
+    stat = os.stat(data_path)
+    raw = f"{os.path.abspath(data_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def fingerprint(task_name: str, data_path: str, params: Dict[str, Any]) -> str:
+    """Fingerprint eines Task-Aufrufs (Eingabedatei + Parameter)."""
+    payload = json.dumps(
+        {"task": task_name, "data": dataset_key(data_path), "params": params},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def prune_directory(directory: str, max_bytes: int, max_age: float, keep: Optional[str] = None) -> int:
+    """
+    Löscht Cache-Dateien, die älter als ``max_age`` Sekunden sind, und danach die
+    am längsten ungenutzten (mtime), bis höchstens ``max_bytes`` belegt sind.
+    ``keep`` (die gerade geschriebene Datei) bleibt immer erhalten.
+
+    Returns:
+        Anzahl gelöschter Dateien
+    """
+    files = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and not entry.name.endswith(".tmp"):
+            stat = entry.stat()
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+    files.sort()
+
+    now = time.time()
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for mtime, size, path in files:
+        if now - mtime < max_age and total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    if removed:
+        logger.info(f"{removed} Dateien aus dem Analyse-Cache {directory} entfernt")
+    return removed
+
+
+def _touch(path: str) -> None:
+    """Markiert eine Cache-Datei als genutzt (Grundlage der Verdrängung)."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+class DatasetCache:
+    """
+    Cache für Analyse-Datensätze.
+
+    Beim ersten Zugriff wird die CSV-Datei gelesen und als Parquet im
+    Cache-Verzeichnis abgelegt. Folgezugriffe lesen nur die angeforderten
+    Spalten memory-mapped; zusätzlich werden die zuletzt genutzten DataFrames im
+    Prozess gehalten. ``load`` liefert stets eine Kopie, Änderungen des
+    Aufrufers erreichen den Cache nicht.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_frames: int = 8,
+                 max_bytes: int = DEFAULT_CACHE_MAX_BYTES, max_age: float = DEFAULT_CACHE_TTL):
+        self.cache_dir = os.path.join(cache_dir, "datasets")
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._frames: "OrderedDict[Tuple[str, Optional[Tuple[str, ...]]], pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _parquet_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def load(self, data_path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        key = dataset_key(data_path)
+        frame_key = (key, tuple(columns) if columns else None)
+        with self._lock:
+            if frame_key in self._frames:
+                self._frames.move_to_end(frame_key)
+                return self._frames[frame_key].copy()
+
+        df = self._read(data_path, key, columns)
+
+        with self._lock:
+            self._frames[frame_key] = df
+            while len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+        return df.copy()
+
+    def _read(self, data_path: str, key: str, columns: Optional[Sequence[str]]) -> pd.DataFrame:
+        if not PARQUET_AVAILABLE:
+            return pd.read_csv(data_path, usecols=list(columns) if columns else None)
+
+        parquet_path = self._parquet_path(key)
+        if not os.path.exists(parquet_path):
+            logger.info(f"Dataset {data_path} wird nach Parquet konvertiert")
+            df = pd.read_csv(data_path)
+            tmp_path = f"{parquet_path}.{os.getpid()}.tmp"
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, parquet_path)
+            # Auch Parquet-Dateien älterer Stände derselben Quelldatei fallen hier heraus
+            prune_directory(self.cache_dir, self.max_bytes, self.max_age, keep=parquet_path)
+            if columns is None:
+                return df
+        else:
+            _touch(parquet_path)
+
+        if columns:
+            available = set(pq.read_schema(parquet_path).names)
+            missing = [col for col in columns if col not in available]
+            if missing:
+                raise ValueError(f"Spalten nicht gefunden: {', '.join(missing)}")
+        table = pq.read_table(parquet_path, columns=list(columns) if columns else None, memory_map=True)
+        return table.to_pandas()
+
+
+class ResultCache:
+    """
+    Ergebnis-Cache auf Dateibasis, adressiert über ``fingerprint``.
+
+    Ergebnisse älter als ``max_age`` Sekunden gelten als nicht vorhanden.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+                 max_age: float = DEFAULT_CACHE_TTL):
+        self.cache_dir = os.path.join(cache_dir, "results")
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) >= self.max_age:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, default=_json_default)
+        os.replace(tmp_path, self._path(key))
+        prune_directory(self.cache_dir, self.max_bytes, self.max_age, keep=self._path(key))
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        cached = self.get(key)
+        if cached is not None:
+            cached["cached"] = True
+            return cached
+        result = compute()
+        self.set(key, result)
+        return result
+
+
+class ModelStore:
+    """
+    Ablage trainierter Modelle für inkrementelle Updates.
+
+    Gespeichert wird neben dem Modell die Zahl der bereits verarbeiteten Zeilen.
+    Datensätze werden als append-only betrachtet: ist eine Quelldatei
+    angewachsen, müssen nur die Zeilen ab ``rows_seen`` nachtrainiert werden.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = os.path.join(cache_dir, "models")
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, name: str, data_path: str, params: Dict[str, Any]) -> str:
+        raw = json.dumps(
+            {"name": name, "data": os.path.abspath(data_path), "params": params},
+            sort_keys=True,
+            default=str,
+        )
+        return os.path.join(self.cache_dir, hashlib.sha256(raw.encode("utf-8")).hexdigest() + ".pkl")
+
+    def load(self, name: str, data_path: str, params: Dict[str, Any]) -> Tuple[Any, int]:
+        try:
+            with open(self._path(name, data_path, params), "rb") as f:
+                state = pickle.load(f)
+            return state["model"], state["rows_seen"]
+        except (OSError, pickle.UnpicklingError, KeyError, EOFError):
+            return None, 0
+
+    def save(self, name: str, data_path: str, params: Dict[str, Any], model: Any, rows_seen: int) -> None:
+        path = self._path(name, data_path, params)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"model": model, "rows_seen": rows_seen}, f)
+        os.replace(tmp_path, path)
+
+
+def _apply_to_groups(func: Callable[[pd.DataFrame], Any], groups: List[Tuple[Hashable, pd.DataFrame]]):
+    return [(key, func(frame)) for key, frame in groups]
+
+
+def map_groups(
+    df: pd.DataFrame,
+    group_column: str,
+    func: Callable[[pd.DataFrame], Any],
+    max_workers: Optional[int] = None,
+    groups_per_task: int = DEFAULT_GROUPS_PER_TASK,
+) -> Dict[Hashable, Any]:
+    """
+    Wendet ``func`` auf jede Gruppe an, verteilt auf einen Prozesspool.
+
+    ``func`` muss auf Modulebene definiert sein (picklebar). Mit
+    ``max_workers=1`` wird ohne Prozesspool im aktuellen Prozess gerechnet.
+    Fehler einzelner Gruppen werden als ``{"error": ...}`` zurückgegeben und
+    brechen die übrigen Gruppen nicht ab.
+    """
+    groups = list(df.groupby(group_column, sort=True))
+    batches = [groups[i:i + groups_per_task] for i in range(0, len(groups), groups_per_task)]
+    guarded = _GroupGuard(func)
+
+    results: Dict[Hashable, Any] = {}
+    if max_workers == 1 or len(batches) <= 1:
+        for batch in batches:
+            results.update(_apply_to_groups(guarded, batch))
+        return results
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for batch_result in executor.map(_apply_to_groups, [guarded] * len(batches), batches):
+            results.update(batch_result)
+    return results
+
+
+class _GroupGuard:
+    """Picklebarer Wrapper, der Fehler pro Gruppe abfängt."""
+
+    def __init__(self, func: Callable[[pd.DataFrame], Any]):
+        self.func = func
+
+    def __call__(self, frame: pd.DataFrame) -> Any:
+        try:
+            return self.func(frame)
+        except Exception as e:
+            return {"error": str(e)}
+
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+# Gemeinsame Instanzen für die Celery-Worker
+dataset_cache = DatasetCache()
+result_cache = ResultCache()
+model_store = ModelStore()
@@ -0,0 +1,607 @@
+"""
+Bankabgleich für das VALEO-NeuroERP-System.
+
+Liest Kontoauszüge im MT940- und CAMT.053-Format und gleicht die Umsätze mit
+den gebuchten Zahlungen ab. Der Abgleich arbeitet mit Hash-Indizes statt
+paarweiser Vergleiche und läuft in mehreren Durchgängen:
+
+1. Referenz: gemeinsames Referenz-Token (z.B. Rechnungsnummer), gleicher
+   Betrag, Datum innerhalb des Zeitfensters
+2. Teilzahlung: gemeinsames Referenz-Token, Betrag kleiner als die Buchung
+3. Betrag und Datum: genau ein offener Kandidat im Zeitfenster
+4. Unscharf: Ähnlichkeit des Verwendungszwecks unter den Kandidaten mit
+   gleichem Betrag im erweiterten Zeitfenster
+
+Doppelt importierte Umsätze und doppelt erfasste Buchungen werden vorab
+erkannt und gemeldet; übrig bleibende Umsätze und Buchungen sind fehlend.
+"""
+
+import bisect
+import csv
+import difflib
+import heapq
+import logging
+import os
+import re
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Zeitfenster in Tagen für exakte bzw. unscharfe Treffer und Teilzahlungen
+DEFAULT_DATE_WINDOW = 3
+DEFAULT_FUZZY_WINDOW = 14
+
+# Mindestähnlichkeit des Verwendungszwecks für unscharfe Treffer
+DEFAULT_FUZZY_THRESHOLD = 0.6
+
+# Je Umsatz vorgemerkte Kandidaten für die Zuordnung im unscharfen Durchgang
+FUZZY_CANDIDATES = 3
+
+# Tokens, die in mehr Buchungen vorkommen, taugen nicht als Referenz (z.B. Kundennummern)
+MAX_TOKEN_FREQUENCY = 20
+
+_TOKEN = re.compile(r"[A-Z0-9][A-Z0-9\-/.]{4,}")
+_DIGIT = re.compile(r"\d")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class StatementLine:
+    """Ein Umsatz aus einem Kontoauszug."""
+
+    line_id: str
+    account: str
+    booking_date: date
+    amount_cents: int  # Gutschrift positiv, Lastschrift negativ
+    currency: str = "EUR"
+    value_date: Optional[date] = None
+    counterparty: str = ""
+    reference: str = ""  # EndToEndId / EREF
+    remittance: str = ""  # Verwendungszweck
+    bank_reference: str = ""
+    source: str = ""  # Auszugsdatei; Dubletten gibt es nur zwischen verschiedenen Dateien
+
+
+@dataclass
+class Booking:
+    """Eine gebuchte Zahlung aus der Finanzbuchhaltung."""
+
+    booking_id: str
+    account: str
+    booking_date: date
+    amount_cents: int
+    reference: str = ""
+    text: str = ""
+
+
+@dataclass
+class ReconciliationResult:
+    """Ergebnis eines Abgleichs."""
+
+    total_statement_lines: int = 0
+    total_bookings: int = 0
+    # (line_id, booking_id, Verfahren)
+    matches: List[Tuple[str, str, str]] = field(default_factory=list)
+    partial_payments: List[Dict[str, Any]] = field(default_factory=list)
+    duplicate_lines: List[Dict[str, str]] = field(default_factory=list)
+    duplicate_bookings: List[Dict[str, str]] = field(default_factory=list)
+    missing_in_books: List[StatementLine] = field(default_factory=list)
+    missing_in_statement: List[Booking] = field(default_factory=list)
+
+    def summary(self, max_details: int = 100) -> Dict[str, Any]:
+        """Kennzahlen und die ersten Einzelfälle je Kategorie."""
+        methods: Dict[str, int] = defaultdict(int)
+        for _, _, method in self.matches:
+            methods[method] += 1
+        return {
+            "total_transactions": self.total_statement_lines,
+            "total_bookings": self.total_bookings,
+            "matched_transactions": len(self.matches),
+            "matched_by": dict(methods),
+            "unmatched_transactions": len(self.missing_in_books),
+            "duplicate_transactions": len(self.duplicate_lines),
+            "duplicate_bookings": len(self.duplicate_bookings),
+            "missing_transactions": len(self.missing_in_statement),
+            "partial_payments": len(self.partial_payments),
+            "unmatched_details": [
+                {
+                    "transaction_id": line.line_id,
+                    "date": line.booking_date.isoformat(),
+                    "amount": line.amount_cents / 100,
+                    "description": line.remittance or line.counterparty,
+                    "status": "unmatched",
+                }
+                for line in self.missing_in_books[:max_details]
+            ],
+            "missing_details": [
+                {
+                    "booking_id": booking.booking_id,
+                    "date": booking.booking_date.isoformat(),
+                    "amount": booking.amount_cents / 100,
+                    "reference": booking.reference,
+                    "status": "missing",
+                }
+                for booking in self.missing_in_statement[:max_details]
+            ],
+            "partial_details": self.partial_payments[:max_details],
+            "duplicate_details": self.duplicate_lines[:max_details],
+        }
+
+
+# ---------------------------------------------------------------------------
+# Einlesen
+# ---------------------------------------------------------------------------
+
+def _cents(value: str) -> int:
+    return int((Decimal(value.replace(",", ".")) * 100).to_integral_value())
+
+
+def _mt940_date(value: str) -> date:
+    # JJMMTT; strptime ist bei Millionen Umsätzen der teuerste Schritt des Einlesens
+    return date(2000 + int(value[:2]), int(value[2:4]), int(value[4:6]))
+
+
+_MT940_LINE = re.compile(
+    r"^(?P<value_date>\d{6})(?P<entry_date>\d{4})?(?P<mark>R?[CD])[A-Z]?(?P<amount>\d+,\d{0,2})"
+    r"[NF](?P<type>[A-Z0-9]{3})(?P<customer_ref>[^/\n]*)(?://(?P<bank_ref>[^\n]*))?"
+)
+_MT940_PURPOSE_FIELDS = tuple(str(i) for i in list(range(20, 30)) + list(range(60, 64)))
+_MT940_SEPA = re.compile(r"(EREF|KREF|MREF|CRED|DEBT|SVWZ|ABWA|ABWE)\+")
+
+
+def _parse_mt940_86(text: str) -> Tuple[str, str, str]:
+    """Referenz, Verwendungszweck und Gegenpartei aus Feld :86: (Subfelder ?xx, SEPA-Kennungen)."""
+    if "?" in text[:6]:
+        subfields = defaultdict(str)
+        for part in text.split("?")[1:]:
+            subfields[part[:2]] += part[2:]
+        purpose = "".join(subfields[key] for key in _MT940_PURPOSE_FIELDS if key in subfields)
+        counterparty = subfields["32"] + subfields["33"]
+    else:
+        purpose, counterparty = text, ""
+
+    reference = ""
+    tags = list(_MT940_SEPA.finditer(purpose))
+    if tags:
+        values = {}
+        for i, tag in enumerate(tags):
+            end = tags[i + 1].start() if i + 1 < len(tags) else len(purpose)
+            values[tag.group(1)] = purpose[tag.end():end].strip()
+        reference = values.get("EREF", "")
+        if reference == "NOTPROVIDED":
+            reference = ""
+        purpose = values.get("SVWZ", purpose)
+    return reference, purpose.strip(), counterparty.strip()
+
+
+def parse_mt940(path: str, encoding: str = "latin-1") -> Iterator[StatementLine]:
+    """
+    Liest die Umsätze einer MT940-Datei (SWIFT, auch mehrere Auszüge je Datei).
+
+    ``line_id`` ist ``{Datei}:{Konto}:{laufende Nummer in der Datei}``.
+    """
+    source = os.path.basename(path)
+    account, current, info = "", None, []
+    number = 0
+
+    def emit():
+        reference, remittance, counterparty = _parse_mt940_86(_WHITESPACE.sub(" ", "".join(info)))
+        match, name = current
+        amount = _cents(match.group("amount"))
+        if match.group("mark") in ("D", "RC"):
+            amount = -amount
+        customer_ref = match.group("customer_ref").strip()
+        value_date = booking_date = _mt940_date(match.group("value_date"))
+        entry = match.group("entry_date")
+        if entry:
+            # Buchungsdatum ohne Jahr; über den Jahreswechsel gehört es zum Nachbarjahr
+            month, day = int(entry[:2]), int(entry[2:])
+            year = value_date.year + (month < value_date.month - 6) - (month > value_date.month + 6)
+            booking_date = date(year, month, day)
+        return StatementLine(
+            line_id=f"{source}:{account}:{name}",
+            account=account,
+            booking_date=booking_date,
+            amount_cents=amount,
+            value_date=value_date,
+            counterparty=counterparty,
+            reference=reference or ("" if customer_ref == "NONREF" else customer_ref),
+            remittance=remittance,
+            bank_reference=(match.group("bank_ref") or "").strip(),
+            source=path,
+        )
+
+    tag = None
+    with open(path, encoding=encoding) as handle:
+        for raw in handle:
+            line = raw.rstrip("\r\n")
+            if line.startswith(":") and line.find(":", 1) > 0:
+                tag, _, value = line[1:].partition(":")
+                if current and tag != "86":
+                    yield emit()
+                    current, info = None, []
+                if tag == "25":
+                    account = value.strip()
+                elif tag == "61":
+                    match = _MT940_LINE.match(value)
+                    if match is None:
+                        logger.warning(f"Unlesbarer MT940-Umsatz in {path}: {value}")
+                        continue
+                    number += 1
+                    current, info = (match, str(number)), []
+                elif tag == "86" and current:
+                    info.append(value)
+            elif tag == "86" and current:
+                info.append(line)
+            elif line.startswith("-"):
+                tag = None
+        if current:
+            yield emit()
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _find(element: ET.Element, path: str) -> Optional[ET.Element]:
+    """Namensraumunabhängige Suche über einen Pfad aus lokalen Namen."""
+    for name in path.split("/"):
+        if element is None:
+            return None
+        element = next((child for child in element if _local(child.tag) == name), None)
+    return element
+
+
+def _text(element: ET.Element, path: str) -> str:
+    found = _find(element, path)
+    return (found.text or "").strip() if found is not None else ""
+
+
+def _findall(element: ET.Element, path: str) -> List[ET.Element]:
+    *parents, name = path.split("/")
+    parent = _find(element, "/".join(parents)) if parents else element
+    return [child for child in parent if _local(child.tag) == name] if parent is not None else []
+
+
+def parse_camt053(path: str) -> Iterator[StatementLine]:
+    """
+    Liest die Umsätze einer CAMT.053-Datei (ISO 20022) speicherschonend per iterparse.
+
+    ``line_id`` ist ``{Datei}:{Konto}:{laufende Nummer des Eintrags}:{Detail}``;
+    die AcctSvcrRef der Bank ist nicht immer vorhanden oder eindeutig.
+    """
+    source = os.path.basename(path)
+    account = ""
+    entry = 0
+    for event, element in ET.iterparse(path, events=("end",)):
+        name = _local(element.tag)
+        if name == "Acct" and not account:
+            account = _text(element, "Id/IBAN") or _text(element, "Id/Othr/Id")
+        elif name == "Stmt":
+            account = ""
+            element.clear()
+        elif name == "Ntry":
+            entry += 1
+            sign = -1 if _text(element, "CdtDbtInd") == "DBIT" else 1
+            booking_date = date.fromisoformat(
+                (_text(element, "BookgDt/Dt") or _text(element, "BookgDt/DtTm"))[:10]
+            )
+            value_date = _text(element, "ValDt/Dt")
+            bank_reference = _text(element, "AcctSvcrRef")
+            entry_amount = _find(element, "Amt")
+            details = _findall(element, "NtryDtls/TxDtls")
+
+            for index, tx in enumerate(details or [None]):
+                amount = _find(tx, "AmtDtls/TxAmt/Amt") if tx is not None and len(details) > 1 else None
+                amount = amount if amount is not None else entry_amount
+                counterparty = ""
+                reference = remittance = ""
+                if tx is not None:
+                    party = "Dbtr" if sign > 0 else "Cdtr"
+                    counterparty = _text(tx, f"RltdPties/{party}/Nm") or _text(tx, f"RltdPties/{party}/Pty/Nm")
+                    reference = _text(tx, "Refs/EndToEndId")
+                    if reference == "NOTPROVIDED":
+                        reference = ""
+                    remittance = " ".join(u.text or "" for u in _findall(tx, "RmtInf/Ustrd")).strip()
+                    if not reference:
+                        reference = _text(tx, "RmtInf/Strd/CdtrRefInf/Ref")
+                yield StatementLine(
+                    line_id=f"{source}:{account}:{entry}:{index}",
+                    account=account,
+                    booking_date=booking_date,
+                    amount_cents=sign * _cents(amount.text or "0"),
+                    currency=amount.get("Ccy", "EUR"),
+                    value_date=date.fromisoformat(value_date) if value_date else None,
+                    counterparty=counterparty,
+                    reference=reference,
+                    remittance=remittance,
+                    bank_reference=bank_reference,
+                    source=path,
+                )
+            element.clear()
+
+
+def load_statement(path: str) -> Iterator[StatementLine]:
+    """Kontoauszug einlesen; das Format wird am Dateiinhalt erkannt."""
+    with open(path, "rb") as handle:
+        head = handle.read(512).lstrip()
+    if head.startswith(b"<?xml") or head.startswith(b"<"):
+        return parse_camt053(path)
+    return parse_mt940(path)
+
+
+def load_bookings(path: str) -> Iterator[Booking]:
+    """
+    Gebuchte Zahlungen aus einem CSV-Export lesen.
+
+    Erwartete Spalten: booking_id, account, date (ISO), amount, reference, text
+    """
+    with open(path, newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            yield Booking(
+                booking_id=row["booking_id"],
+                account=row.get("account", ""),
+                booking_date=date.fromisoformat(row["date"][:10]),
+                amount_cents=_cents(row["amount"]),
+                reference=row.get("reference", ""),
+                text=row.get("text", ""),
+            )
+
+
+# ---------------------------------------------------------------------------
+# Abgleich
+# ---------------------------------------------------------------------------
+
+def reference_tokens(*texts: str) -> set:
+    """Referenz-Kandidaten: Zeichenketten ab fünf Zeichen mit mindestens einer Ziffer."""
+    tokens = set()
+    for token in _TOKEN.findall(" ".join(texts).upper()):
+        if _DIGIT.search(token):
+            token = token.replace("-", "").replace("/", "").replace(".", "")
+            if len(token) >= 5:
+                tokens.add(token)
+    return tokens
+
+
+def _trigrams(text: str) -> frozenset:
+    return frozenset(text[k:k + 3] for k in range(len(text) - 2))
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text.upper()).strip()
+
+
+def _partial_of(amount: int, open_amount: Optional[int]) -> bool:
+    """Teilbetrag: gleiches Vorzeichen und betragsmäßig kleiner als der offene Rest (ohne Division)."""
+    if not amount or not open_amount:
+        return False
+    return (amount > 0) == (open_amount > 0) and abs(amount) < abs(open_amount)
+
+
+class BankReconciler:
+    """Gleicht Kontoauszugsumsätze mit gebuchten Zahlungen ab."""
+
+    def __init__(
+        self,
+        date_window: int = DEFAULT_DATE_WINDOW,
+        fuzzy_window: int = DEFAULT_FUZZY_WINDOW,
+        fuzzy_threshold: float = DEFAULT_FUZZY_THRESHOLD,
+        progress_callback: Optional[Callable[[float, str], None]] = None,
+    ):
+        self.date_window = date_window
+        self.fuzzy_window = fuzzy_window
+        self.fuzzy_threshold = fuzzy_threshold
+        self.progress_callback = progress_callback
+
+    def _progress(self, value: float, message: str) -> None:
+        logger.debug(message)
+        if self.progress_callback:
+            self.progress_callback(value, message)
+
+    def reconcile(self, lines: Iterable[StatementLine], bookings: Iterable[Booking]) -> ReconciliationResult:
+        """
+        Umsätze und Buchungen abgleichen.
+
+        Buchungen ohne Konto (account leer) gelten für alle Konten. Jede Buchung
+        wird höchstens einmal zugeordnet, bei Teilzahlungen bis ihr Betrag erreicht ist.
+        """
+        result = ReconciliationResult()
+        lines = self._drop_duplicate_lines(list(lines), result)
+        bookings = self._drop_duplicate_bookings(list(bookings), result)
+        result.total_statement_lines = len(lines) + len(result.duplicate_lines)
+        result.total_bookings = len(bookings) + len(result.duplicate_bookings)
+
+        self._progress(0.1, "Indizes werden aufgebaut")
+        booking_days = [b.booking_date.toordinal() for b in bookings]
+        by_amount: Dict[Tuple[str, int], List[int]] = defaultdict(list)
+        by_token: Dict[str, List[int]] = defaultdict(list)
+        for index, booking in enumerate(bookings):
+            by_amount[(booking.account, booking.amount_cents)].append(index)
+            for token in reference_tokens(booking.reference, booking.text):
+                by_token[token].append(index)
+        # Nach Datum sortiert, damit das Zeitfenster per Bisektion gefunden wird
+        for hits in by_amount.values():
+            hits.sort(key=booking_days.__getitem__)
+
+        # Restbetrag offener Buchungen (Teilzahlungen mindern ihn)
+        open_cents: List[Optional[int]] = [b.amount_cents for b in bookings]
+        partial_lines: Dict[int, List[str]] = defaultdict(list)
+        line_days = [line.booking_date.toordinal() for line in lines]
+        line_tokens = [reference_tokens(line.reference, line.remittance) for line in lines]
+        unmatched = list(range(len(lines)))
+
+        def candidates_by_token(i: int, window: int) -> Iterator[int]:
+            line = lines[i]
+            seen = set()
+            for token in line_tokens[i]:
+                hits = by_token.get(token, ())
+                if len(hits) > MAX_TOKEN_FREQUENCY:
+                    continue
+                for b in hits:
+                    if b not in seen and open_cents[b] is not None and bookings[b].account in ("", line.account) \
+                            and abs(booking_days[b] - line_days[i]) <= window:
+                        seen.add(b)
+                        yield b
+
+        def candidates_by_amount(i: int, window: int) -> List[int]:
+            line = lines[i]
+            hits = by_amount.get((line.account, line.amount_cents), [])
+            if not hits and line.account:
+                hits = by_amount.get(("", line.amount_cents), [])
+            day = line_days[i]
+            first = bisect.bisect_left(hits, day - window, key=booking_days.__getitem__)
+            last = bisect.bisect_right(hits, day + window, key=booking_days.__getitem__)
+            return [b for b in hits[first:last] if open_cents[b] == bookings[b].amount_cents]
+
+        def nearest(i: int, candidates: Iterable[int]) -> Optional[int]:
+            return min(candidates, key=lambda b: (abs(booking_days[b] - line_days[i]), b), default=None)
+
+        def match(i: int, b: int, method: str) -> None:
+            open_cents[b] = None
+            result.matches.append((lines[i].line_id, bookings[b].booking_id, method))
+
+        # 1. Referenz, Betrag und Datum
+        self._progress(0.3, "Abgleich über Referenzen")
+        rest = []
+        for i in unmatched:
+            amount = lines[i].amount_cents
+            b = nearest(i, (b for b in candidates_by_token(i, self.date_window)
+                            if open_cents[b] == amount == bookings[b].amount_cents))
+            if b is None:
+                rest.append(i)
+            else:
+                match(i, b, "reference")
+        unmatched = rest
+
+        # 2. Teilzahlungen: Referenz passt, Betrag kleiner als der offene Rest
+        self._progress(0.5, "Teilzahlungen werden zugeordnet")
+        rest = []
+        for i in unmatched:
+            amount = lines[i].amount_cents
+            b = nearest(i, (b for b in candidates_by_token(i, self.fuzzy_window)
+                            if _partial_of(amount, open_cents[b])
+                            or amount == open_cents[b] != bookings[b].amount_cents))
+            if b is None:
+                rest.append(i)
+                continue
+            partial_lines[b].append(lines[i].line_id)
+            open_cents[b] -= amount
+            if open_cents[b] == 0:
+                open_cents[b] = None
+        unmatched = rest
+
+        # 3. Betrag und Datum, nur bei eindeutigem Kandidaten
+        self._progress(0.65, "Abgleich über Betrag und Datum")
+        rest = []
+        for i in unmatched:
+            candidates = candidates_by_amount(i, self.date_window)
+            if len(candidates) == 1:
+                match(i, candidates[0], "amount_date")
+            else:
+                rest.append(i)
+        unmatched = rest
+
+        # 4. Unscharf über den Verwendungszweck; die besten Paare zuerst, damit ein
+        # schwächerer Treffer nicht die passende Buchung eines späteren Umsatzes belegt
+        self._progress(0.8, "Unscharfer Abgleich über den Verwendungszweck")
+        booking_texts: Dict[int, Tuple[str, frozenset]] = {}
+        pairs = []
+        for i in unmatched:
+            line = lines[i]
+            text = _normalize(f"{line.reference} {line.remittance} {line.counterparty}")
+            grams = _trigrams(text)
+            # Vorauswahl über gemeinsame Trigramme, erst dann die teure Ähnlichkeit
+            shortlist: List[Tuple[float, int]] = []
+            for b in candidates_by_amount(i, self.fuzzy_window):
+                if b not in booking_texts:
+                    booking_text = _normalize(f"{bookings[b].reference} {bookings[b].text}")
+                    booking_texts[b] = (booking_text, _trigrams(booking_text))
+                other = booking_texts[b][1]
+                overlap = len(grams & other) / (len(grams | other) or 1)
+                entry = (overlap, -b)
+                if len(shortlist) < FUZZY_CANDIDATES:
+                    heapq.heappush(shortlist, entry)
+                elif entry > shortlist[0]:
+                    heapq.heapreplace(shortlist, entry)
+            matcher = difflib.SequenceMatcher(None, b=text, autojunk=False)
+            for _, neg_b in shortlist:
+                matcher.set_seq1(booking_texts[-neg_b][0])
+                score = matcher.ratio()
+                if score >= self.fuzzy_threshold:
+                    pairs.append((-score, i, -neg_b))
+        pairs.sort()
+        fuzzy_matched = set()
+        for _, i, b in pairs:
+            if i not in fuzzy_matched and open_cents[b] is not None:
+                fuzzy_matched.add(i)
+                match(i, b, "fuzzy")
+        unmatched = [i for i in unmatched if i not in fuzzy_matched]
+
+        self._progress(0.95, "Ergebnis wird zusammengestellt")
+        for b, line_ids in partial_lines.items():
+            booking = bookings[b]
+            open_amount = open_cents[b] or 0
+            result.partial_payments.append({
+                "booking_id": booking.booking_id,
+                "reference": booking.reference,
+                "booked_amount": booking.amount_cents / 100,
+                "paid_amount": (booking.amount_cents - open_amount) / 100,
+                "open_amount": open_amount / 100,
+                "line_ids": line_ids,
+                "status": "paid" if open_amount == 0 else "partial",
+            })
+        result.missing_in_books = [lines[i] for i in unmatched]
+        result.missing_in_statement = [
+            booking for b, booking in enumerate(bookings)
+            if open_cents[b] is not None and b not in partial_lines
+        ]
+        self._progress(1.0, "Abgleich abgeschlossen")
+        return result
+
+    @staticmethod
+    def _drop_duplicate_lines(lines: List[StatementLine], result: ReconciliationResult) -> List[StatementLine]:
+        """
+        Mehrfach importierte Umsätze (überlappende Auszüge) erkennen.
+
+        Gleiche Umsätze in derselben Datei sind getrennte Zahlungen (z.B. zwei
+        Kartenzahlungen ohne Bankreferenz). Doppelt ist erst das n-te Vorkommen
+        in einer Datei, wenn eine andere Datei den Umsatz bereits n-mal enthielt.
+        """
+        kept: Dict[tuple, List[StatementLine]] = {}
+        occurrences: Dict[tuple, int] = defaultdict(int)
+        unique = []
+        for line in lines:
+            key = (line.account, line.booking_date, line.amount_cents, line.bank_reference,
+                   line.reference, line.remittance)
+            n = occurrences[key, line.source]
+            occurrences[key, line.source] += 1
+            same = kept.setdefault(key, [])
+            if n < len(same):
+                result.duplicate_lines.append({"line_id": line.line_id, "duplicate_of": same[n].line_id})
+            else:
+                same.append(line)
+                unique.append(line)
+        return unique
+
+    @staticmethod
+    def _drop_duplicate_bookings(bookings: List[Booking], result: ReconciliationResult) -> List[Booking]:
+        """Doppelt erfasste Zahlungen (gleiche Referenz, gleicher Betrag und Tag) erkennen."""
+        seen: Dict[tuple, Booking] = {}
+        unique = []
+        for booking in bookings:
+            if not booking.reference:
+                unique.append(booking)
+                continue
+            key = (booking.account, booking.booking_date, booking.amount_cents, booking.reference)
+            first = seen.setdefault(key, booking)
+            if first is booking:
+                unique.append(booking)
+            else:
+                result.duplicate_bookings.append({"booking_id": booking.booking_id,
+                                                  "duplicate_of": first.booking_id})
+        return unique
@@ -1,11 +1,22 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from sqlalchemy.orm import Session
-from .models import Angebot, Auftrag, Lieferschein, Rechnung, Eingangslieferschein, Bestellung
-from .db import SessionLocal, AngebotDB, AngebotsPositionDB, AuftragDB, AuftragsPositionDB
+import base64
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, selectinload
+from .models import (
+    Angebot, Auftrag, Lieferschein, Rechnung, Eingangslieferschein, Bestellung, BelegUmwandlung, UmwandlungsErgebnis
+)
+from .db import (
+    SessionLocal, AngebotDB, AngebotsPositionDB, AuftragDB, AuftragsPositionDB, LieferscheinDB,
+    LieferscheinPositionDB, RechnungDB, RechnungsPositionDB
+)
+from .konvertierung import belege_umwandeln
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 1000
+
 def get_db():
     db = SessionLocal()
     try:
@@ -16,11 +27,86 @@ def get_db():
 # In-Memory-Speicher (Demo-Zweck)
 angebote: List[Angebot] = []
 auftraege: List[Auftrag] = []
-lieferscheine: List[Lieferschein] = []
-rechnungen: List[Rechnung] = []
 eingangslieferscheine: List[Eingangslieferschein] = []
 bestellungen: List[Bestellung] = []
 
+# --- Listen (Filter und Keyset-Paging) ---
+
+def _columns(model, *exclude: str) -> List[str]:
+    return [c.key for c in model.__table__.columns if c.key not in exclude]
+
+# JSON-Textfelder werden in den Listen (wie bisher) nicht ausgeliefert
+_ANGEBOT_FIELDS = _columns(AngebotDB, "VorgeschlageneAlternativen")
+_ANGEBOTSPOSITION_FIELDS = _columns(AngebotsPositionDB, "id", "angebot_id")
+_AUFTRAG_FIELDS = _columns(AuftragDB, "RessourcenKonflikte")
+_AUFTRAGSPOSITION_FIELDS = _columns(AuftragsPositionDB, "id", "auftrag_id")
+_LIEFERSCHEIN_FIELDS = _columns(LieferscheinDB, "KommissionierungsReihenfolge")
+_LIEFERSCHEINPOSITION_FIELDS = _columns(LieferscheinPositionDB, "id", "lieferschein_id")
+_RECHNUNG_FIELDS = _columns(RechnungDB)
+_RECHNUNGSPOSITION_FIELDS = _columns(RechnungsPositionDB, "id", "rechnung_id")
+
+def _angebot_to_dict(a: AngebotDB) -> Dict[str, Any]:
+    result = {field: getattr(a, field) for field in _ANGEBOT_FIELDS}
+    result["Positionen"] = [{field: getattr(p, field) for field in _ANGEBOTSPOSITION_FIELDS} for p in a.positionen]
+    result["VorgeschlageneAlternativen"] = None
+    return result
+
+def _auftrag_to_dict(a: AuftragDB) -> Dict[str, Any]:
+    result = {field: getattr(a, field) for field in _AUFTRAG_FIELDS}
+    result["Positionen"] = [{field: getattr(p, field) for field in _AUFTRAGSPOSITION_FIELDS} for p in a.positionen]
+    result["RessourcenKonflikte"] = None
+    return result
+
+def _lieferschein_to_dict(l: LieferscheinDB) -> Dict[str, Any]:
+    result = {field: getattr(l, field) for field in _LIEFERSCHEIN_FIELDS}
+    result["Positionen"] = [{field: getattr(p, field) for field in _LIEFERSCHEINPOSITION_FIELDS} for p in l.positionen]
+    result["KommissionierungsReihenfolge"] = None
+    return result
+
+def _rechnung_to_dict(r: RechnungDB) -> Dict[str, Any]:
+    result = {field: getattr(r, field) for field in _RECHNUNG_FIELDS}
+    result["Positionen"] = [{field: getattr(p, field) for field in _RECHNUNGSPOSITION_FIELDS} for p in r.positionen]
+    return result
+
+def _encode_cursor(erstell_datum: datetime, beleg_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{erstell_datum.isoformat()}|{beleg_id}".encode()).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        erstell_datum, beleg_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(erstell_datum), beleg_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Ungültiger Cursor")
+
+def _list_belege(db: Session, model, id_column, response: Response, kunden_id: Optional[str],
+                 status: Optional[str], von: Optional[datetime], bis: Optional[datetime],
+                 cursor: Optional[str], limit: Optional[int]) -> list:
+    """Lädt eine Seite Belege mit Positionen in zwei Abfragen (Belege, Positionen per IN)."""
+    query = db.query(model).options(selectinload(model.positionen))
+    if kunden_id:
+        query = query.filter(model.KundenID == kunden_id)
+    if status:
+        query = query.filter(model.Status == status)
+    if von:
+        query = query.filter(model.ErstellDatum >= von)
+    if bis:
+        query = query.filter(model.ErstellDatum <= bis)
+    if cursor:
+        erstell_datum, beleg_id = _decode_cursor(cursor)
+        query = query.filter(or_(
+            model.ErstellDatum > erstell_datum,
+            and_(model.ErstellDatum == erstell_datum, id_column > beleg_id)
+        ))
+    query = query.order_by(model.ErstellDatum, id_column)
+    if limit:
+        query = query.limit(limit)
+
+    belege = query.all()
+    if limit and len(belege) == limit:
+        last = belege[-1]
+        response.headers["X-Next-Cursor"] = _encode_cursor(last.ErstellDatum, getattr(last, id_column.key))
+    return belege
+
 # --- Angebot ---
 
 @router.post("/angebote", response_model=Angebot)
@@ -70,95 +156,26 @@ def create_angebot(angebot: Angebot, db: Session = Depends(get_db)):
     return angebot
 
 @router.get("/angebote", response_model=List[Angebot])
-def list_angebote(db: Session = Depends(get_db)):
-    angebote = db.query(AngebotDB).all()
-    result = []
-    for a in angebote:
-        positionen = db.query(AngebotsPositionDB).filter_by(angebot_id=a.AngebotID).all()
-        pos_list = [
-            dict(
-                PositionsID=p.PositionsID,
-                ArtikelID=p.ArtikelID,
-                ArtikelBezeichnung=p.ArtikelBezeichnung,
-                ArtikelBeschreibung=p.ArtikelBeschreibung,
-                Menge=p.Menge,
-                Einheit=p.Einheit,
-                Einzelpreis=p.Einzelpreis,
-                MwStSatz=p.MwStSatz,
-                Rabatt=p.Rabatt,
-                Gesamtpreis=p.Gesamtpreis
-            ) for p in positionen
-        ]
-        angebot = Angebot(
-            AngebotID=a.AngebotID,
-            AngebotNummer=a.AngebotNummer,
-            KundenID=a.KundenID,
-            KundenAnsprechpartner=a.KundenAnsprechpartner,
-            Betreff=a.Betreff,
-            ErstellDatum=a.ErstellDatum,
-            GueltigBis=a.GueltigBis,
-            Waehrung=a.Waehrung,
-            Gesamtbetrag=a.Gesamtbetrag,
-            MwStBetrag=a.MwStBetrag,
-            Rabatt=a.Rabatt,
-            Status=a.Status,
-            Zahlungsbedingungen=a.Zahlungsbedingungen,
-            Lieferbedingungen=a.Lieferbedingungen,
-            Positionen=pos_list,
-            KundenAffinitaet=a.KundenAffinitaet,
-            OptimiertePreise=a.OptimiertePreise,
-            PreisOptimierungsBasis=a.PreisOptimierungsBasis,
-            VorgeschlageneAlternativen=None,
-            SaisonaleAnpassung=a.SaisonaleAnpassung,
-            MarktpreisVergleich=a.MarktpreisVergleich
-        )
-        result.append(angebot)
-    return result
+def list_angebote(
+    response: Response,
+    kunden_id: Optional[str] = None,
+    status: Optional[str] = None,
+    von: Optional[datetime] = None,
+    bis: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Angebote nach ErstellDatum; bei vollem Ergebnis liefert X-Next-Cursor die nächste Seite."""
+    angebote = _list_belege(db, AngebotDB, AngebotDB.AngebotID, response, kunden_id, status, von, bis, cursor, limit)
+    return [_angebot_to_dict(a) for a in angebote]
 
 @router.get("/angebote/{angebot_id}", response_model=Angebot)
 def get_angebot(angebot_id: str, db: Session = Depends(get_db)):
-    a = db.query(AngebotDB).filter_by(AngebotID=angebot_id).first()
+    a = db.query(AngebotDB).options(selectinload(AngebotDB.positionen)).filter_by(AngebotID=angebot_id).first()
     if not a:
         raise HTTPException(status_code=404, detail="Angebot nicht gefunden")
-    positionen = db.query(AngebotsPositionDB).filter_by(angebot_id=a.AngebotID).all()
-    pos_list = [
-        dict(
-            PositionsID=p.PositionsID,
-            ArtikelID=p.ArtikelID,
-            ArtikelBezeichnung=p.ArtikelBezeichnung,
-            ArtikelBeschreibung=p.ArtikelBeschreibung,
-            Menge=p.Menge,
-            Einheit=p.Einheit,
-            Einzelpreis=p.Einzelpreis,
-            MwStSatz=p.MwStSatz,
-            Rabatt=p.Rabatt,
-            Gesamtpreis=p.Gesamtpreis
-        ) for p in positionen
-    ]
-    angebot = Angebot(
-        AngebotID=a.AngebotID,
-        AngebotNummer=a.AngebotNummer,
-        KundenID=a.KundenID,
-        KundenAnsprechpartner=a.KundenAnsprechpartner,
-        Betreff=a.Betreff,
-        ErstellDatum=a.ErstellDatum,
-        GueltigBis=a.GueltigBis,
-        Waehrung=a.Waehrung,
-        Gesamtbetrag=a.Gesamtbetrag,
-        MwStBetrag=a.MwStBetrag,
-        Rabatt=a.Rabatt,
-        Status=a.Status,
-        Zahlungsbedingungen=a.Zahlungsbedingungen,
-        Lieferbedingungen=a.Lieferbedingungen,
-        Positionen=pos_list,
-        KundenAffinitaet=a.KundenAffinitaet,
-        OptimiertePreise=a.OptimiertePreise,
-        PreisOptimierungsBasis=a.PreisOptimierungsBasis,
-        VorgeschlageneAlternativen=None,
-        SaisonaleAnpassung=a.SaisonaleAnpassung,
-        MarktpreisVergleich=a.MarktpreisVergleich
-    )
-    return angebot
+    return _angebot_to_dict(a)
 
 # --- Auftrag ---
 
@@ -212,135 +229,114 @@ def create_auftrag(auftrag: Auftrag, db: Session = Depends(get_db)):
     return auftrag
 
 @router.get("/auftraege", response_model=List[Auftrag])
-def list_auftraege(db: Session = Depends(get_db)):
-    auftraege = db.query(AuftragDB).all()
-    result = []
-    for a in auftraege:
-        positionen = db.query(AuftragsPositionDB).filter_by(auftrag_id=a.AuftragID).all()
-        pos_list = [
-            dict(
-                PositionsID=p.PositionsID,
-                ArtikelID=p.ArtikelID,
-                ArtikelBezeichnung=p.ArtikelBezeichnung,
-                Menge=p.Menge,
-                Einheit=p.Einheit,
-                Einzelpreis=p.Einzelpreis,
-                MwStSatz=p.MwStSatz,
-                Rabatt=p.Rabatt,
-                Gesamtpreis=p.Gesamtpreis,
-                LieferStatus=p.LieferStatus,
-                BereitsGelieferteMenge=p.BereitsGelieferteMenge
-            ) for p in positionen
-        ]
-        auftrag = Auftrag(
-            AuftragID=a.AuftragID,
-            AuftragNummer=a.AuftragNummer,
-            AngebotID=a.AngebotID,
-            KundenID=a.KundenID,
-            KundenBestellnummer=a.KundenBestellnummer,
-            ErstellDatum=a.ErstellDatum,
-            Lieferdatum=a.Lieferdatum,
-            Status=a.Status,
-            Prioritaet=a.Prioritaet,
-            Gesamtbetrag=a.Gesamtbetrag,
-            MwStBetrag=a.MwStBetrag,
-            Rabatt=a.Rabatt,
-            Zahlungsbedingungen=a.Zahlungsbedingungen,
-            Lieferbedingungen=a.Lieferbedingungen,
-            Lieferadresse=a.Lieferadresse,
-            Rechnungsadresse=a.Rechnungsadresse,
-            Positionen=pos_list,
-            LieferterminPrognose=a.LieferterminPrognose,
-            LagerbestandsOptimierung=a.LagerbestandsOptimierung,
-            ProduktionsplanungID=a.ProduktionsplanungID,
-            RessourcenKonflikte=None,
-            AutomatischePrioritaetssetzung=a.AutomatischePrioritaetssetzung,
-            UmsatzPrognose=a.UmsatzPrognose
-        )
-        result.append(auftrag)
-    return result
+def list_auftraege(
+    response: Response,
+    kunden_id: Optional[str] = None,
+    status: Optional[str] = None,
+    von: Optional[datetime] = None,
+    bis: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Aufträge nach ErstellDatum; bei vollem Ergebnis liefert X-Next-Cursor die nächste Seite."""
+    auftraege = _list_belege(db, AuftragDB, AuftragDB.AuftragID, response, kunden_id, status, von, bis, cursor, limit)
+    return [_auftrag_to_dict(a) for a in auftraege]
 
 @router.get("/auftraege/{auftrag_id}", response_model=Auftrag)
 def get_auftrag(auftrag_id: str, db: Session = Depends(get_db)):
-    a = db.query(AuftragDB).filter_by(AuftragID=auftrag_id).first()
+    a = db.query(AuftragDB).options(selectinload(AuftragDB.positionen)).filter_by(AuftragID=auftrag_id).first()
     if not a:
         raise HTTPException(status_code=404, detail="Auftrag nicht gefunden")
-    positionen = db.query(AuftragsPositionDB).filter_by(auftrag_id=a.AuftragID).all()
-    pos_list = [
-        dict(
-            PositionsID=p.PositionsID,
-            ArtikelID=p.ArtikelID,
-            ArtikelBezeichnung=p.ArtikelBezeichnung,
-            Menge=p.Menge,
-            Einheit=p.Einheit,
-            Einzelpreis=p.Einzelpreis,
-            MwStSatz=p.MwStSatz,
-            Rabatt=p.Rabatt,
-            Gesamtpreis=p.Gesamtpreis,
-            LieferStatus=p.LieferStatus,
-            BereitsGelieferteMenge=p.BereitsGelieferteMenge
-        ) for p in positionen
-    ]
-    auftrag = Auftrag(
-        AuftragID=a.AuftragID,
-        AuftragNummer=a.AuftragNummer,
-        AngebotID=a.AngebotID,
-        KundenID=a.KundenID,
-        KundenBestellnummer=a.KundenBestellnummer,
-        ErstellDatum=a.ErstellDatum,
-        Lieferdatum=a.Lieferdatum,
-        Status=a.Status,
-        Prioritaet=a.Prioritaet,
-        Gesamtbetrag=a.Gesamtbetrag,
-        MwStBetrag=a.MwStBetrag,
-        Rabatt=a.Rabatt,
-        Zahlungsbedingungen=a.Zahlungsbedingungen,
-        Lieferbedingungen=a.Lieferbedingungen,
-        Lieferadresse=a.Lieferadresse,
-        Rechnungsadresse=a.Rechnungsadresse,
-        Positionen=pos_list,
-        LieferterminPrognose=a.LieferterminPrognose,
-        LagerbestandsOptimierung=a.LagerbestandsOptimierung,
-        ProduktionsplanungID=a.ProduktionsplanungID,
-        RessourcenKonflikte=None,
-        AutomatischePrioritaetssetzung=a.AutomatischePrioritaetssetzung,
-        UmsatzPrognose=a.UmsatzPrognose
-    )
-    return auftrag
+    return _auftrag_to_dict(a)
 
 # --- Lieferschein ---
+
 @router.post("/lieferscheine", response_model=Lieferschein)
-def create_lieferschein(lieferschein: Lieferschein):
-    lieferscheine.append(lieferschein)
+def create_lieferschein(lieferschein: Lieferschein, db: Session = Depends(get_db)):
+    daten = lieferschein.model_dump(include=set(_LIEFERSCHEIN_FIELDS))
+    db.add(LieferscheinDB(**daten, KommissionierungsReihenfolge=None))  # Für Demo
+    db.add_all(
+        LieferscheinPositionDB(lieferschein_id=lieferschein.LieferscheinID, **pos.model_dump())
+        for pos in lieferschein.Positionen
+    )
+    db.commit()
     return lieferschein
 
 @router.get("/lieferscheine", response_model=List[Lieferschein])
-def list_lieferscheine():
-    return lieferscheine
+def list_lieferscheine(
+    response: Response,
+    kunden_id: Optional[str] = None,
+    status: Optional[str] = None,
+    von: Optional[datetime] = None,
+    bis: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Lieferscheine nach ErstellDatum; bei vollem Ergebnis liefert X-Next-Cursor die nächste Seite."""
+    lieferscheine = _list_belege(db, LieferscheinDB, LieferscheinDB.LieferscheinID, response, kunden_id, status,
+                                 von, bis, cursor, limit)
+    return [_lieferschein_to_dict(l) for l in lieferscheine]
 
 @router.get("/lieferscheine/{lieferschein_id}", response_model=Lieferschein)
-def get_lieferschein(lieferschein_id: str):
-    for l in lieferscheine:
-        if l.LieferscheinID == lieferschein_id:
-            return l
-    raise HTTPException(status_code=404, detail="Lieferschein nicht gefunden")
+def get_lieferschein(lieferschein_id: str, db: Session = Depends(get_db)):
+    l = db.query(LieferscheinDB).options(selectinload(LieferscheinDB.positionen)).filter_by(
+        LieferscheinID=lieferschein_id).first()
+    if not l:
+        raise HTTPException(status_code=404, detail="Lieferschein nicht gefunden")
+    return _lieferschein_to_dict(l)
 
 # --- Rechnung ---
+
 @router.post("/rechnungen", response_model=Rechnung)
-def create_rechnung(rechnung: Rechnung):
-    rechnungen.append(rechnung)
+def create_rechnung(rechnung: Rechnung, db: Session = Depends(get_db)):
+    db.add(RechnungDB(**rechnung.model_dump(include=set(_RECHNUNG_FIELDS))))
+    db.add_all(
+        RechnungsPositionDB(rechnung_id=rechnung.RechnungID, **pos.model_dump())
+        for pos in rechnung.Positionen
+    )
+    db.commit()
     return rechnung
 
 @router.get("/rechnungen", response_model=List[Rechnung])
-def list_rechnungen():
-    return rechnungen
+def list_rechnungen(
+    response: Response,
+    kunden_id: Optional[str] = None,
+    status: Optional[str] = None,
+    von: Optional[datetime] = None,
+    bis: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Rechnungen nach ErstellDatum; bei vollem Ergebnis liefert X-Next-Cursor die nächste Seite."""
+    rechnungen = _list_belege(db, RechnungDB, RechnungDB.RechnungID, response, kunden_id, status,
+                              von, bis, cursor, limit)
+    return [_rechnung_to_dict(r) for r in rechnungen]
 
 @router.get("/rechnungen/{rechnung_id}", response_model=Rechnung)
-def get_rechnung(rechnung_id: str):
-    for r in rechnungen:
-        if r.RechnungID == rechnung_id:
-            return r
-    raise HTTPException(status_code=404, detail="Rechnung nicht gefunden")
+def get_rechnung(rechnung_id: str, db: Session = Depends(get_db)):
+    r = db.query(RechnungDB).options(selectinload(RechnungDB.positionen)).filter_by(RechnungID=rechnung_id).first()
+    if not r:
+        raise HTTPException(status_code=404, detail="Rechnung nicht gefunden")
+    return _rechnung_to_dict(r)
+
+# --- Belegkette ---
+
+@router.post("/belege/umwandeln", response_model=UmwandlungsErgebnis)
+def umwandeln(umwandlung: BelegUmwandlung, db: Session = Depends(get_db)):
+    """
+    Wandelt Belege in die nächste Stufe um (Angebot → Auftrag → Lieferschein → Rechnung).
+
+    Alle Belege werden in einer Transaktion umgewandelt; bereits umgewandelte
+    Quellbelege werden mit ihrem vorhandenen Zielbeleg gemeldet, eine
+    Wiederholung ist daher gefahrlos.
+    """
+    return belege_umwandeln(
+        db, umwandlung.Quelle, ids=umwandlung.IDs, status=umwandlung.Status,
+        kunden_id=umwandlung.KundenID, max_belege=umwandlung.MaxBelege
+    )
 
 # --- Eingangslieferschein ---
 @router.post("/eingangslieferscheine", response_model=Eingangslieferschein)
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, String, Integer, Float, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import create_engine, Column, String, Integer, Float, DateTime, Boolean, ForeignKey, Text, Index, UniqueConstraint
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 from sqlalchemy.dialects.sqlite import JSON
 from datetime import datetime
@@ -12,7 +12,7 @@ Base = declarative_base()
 class AngebotsPositionDB(Base):
     __tablename__ = "angebotspositionen"
     id = Column(Integer, primary_key=True, index=True)
-    angebot_id = Column(String, ForeignKey("angebote.AngebotID"))
+    angebot_id = Column(String, ForeignKey("angebote.AngebotID"), index=True)
     PositionsID = Column(String)
     ArtikelID = Column(String)
     ArtikelBezeichnung = Column(String)
@@ -28,7 +28,7 @@ class AngebotDB(Base):
     __tablename__ = "angebote"
     AngebotID = Column(String, primary_key=True, index=True)
     AngebotNummer = Column(String)
-    KundenID = Column(String)
+    KundenID = Column(String, index=True)
     KundenAnsprechpartner = Column(String, nullable=True)
     Betreff = Column(String)
     ErstellDatum = Column(DateTime)
@@ -37,7 +37,7 @@ class AngebotDB(Base):
     Gesamtbetrag = Column(Float)
     MwStBetrag = Column(Float)
     Rabatt = Column(Float)
-    Status = Column(String)
+    Status = Column(String, index=True)
     Zahlungsbedingungen = Column(String)
     Lieferbedingungen = Column(String)
     # KI-Felder
@@ -48,12 +48,14 @@ class AngebotDB(Base):
     SaisonaleAnpassung = Column(Boolean, nullable=True)
     MarktpreisVergleich = Column(Float, nullable=True)
     positionen = relationship("AngebotsPositionDB", backref="angebot")
+    # Keyset-Paging der Listenansicht
+    __table_args__ = (Index("ix_angebote_erstelldatum_id", "ErstellDatum", "AngebotID"),)
 
 # --- Auftrag ---
 class AuftragsPositionDB(Base):
     __tablename__ = "auftragspositionen"
     id = Column(Integer, primary_key=True, index=True)
-    auftrag_id = Column(String, ForeignKey("auftraege.AuftragID"))
+    auftrag_id = Column(String, ForeignKey("auftraege.AuftragID"), index=True)
     PositionsID = Column(String)
     ArtikelID = Column(String)
     ArtikelBezeichnung = Column(String)
@@ -71,11 +73,11 @@ class AuftragDB(Base):
     AuftragID = Column(String, primary_key=True, index=True)
     AuftragNummer = Column(String)
     AngebotID = Column(String, nullable=True)
-    KundenID = Column(String)
+    KundenID = Column(String, index=True)
     KundenBestellnummer = Column(String, nullable=True)
     ErstellDatum = Column(DateTime)
     Lieferdatum = Column(DateTime, nullable=True)
-    Status = Column(String)
+    Status = Column(String, index=True)
     Prioritaet = Column(String)
     Gesamtbetrag = Column(Float)
     MwStBetrag = Column(Float)
@@ -92,6 +94,123 @@ class AuftragDB(Base):
     AutomatischePrioritaetssetzung = Column(String, nullable=True)
     UmsatzPrognose = Column(Float, nullable=True)
     positionen = relationship("AuftragsPositionDB", backref="auftrag")
+    # Keyset-Paging der Listenansicht
+    __table_args__ = (Index("ix_auftraege_erstelldatum_id", "ErstellDatum", "AuftragID"),)
+
+# --- Lieferschein ---
+class LieferscheinPositionDB(Base):
+    __tablename__ = "lieferscheinpositionen"
+    id = Column(Integer, primary_key=True, index=True)
+    lieferschein_id = Column(String, ForeignKey("lieferscheine.LieferscheinID"), index=True)
+    PositionsID = Column(String)
+    AuftragsPositionsID = Column(String)
+    ArtikelID = Column(String)
+    ArtikelBezeichnung = Column(String)
+    Menge = Column(Float)
+    Einheit = Column(String)
+    ChargenNummer = Column(String, nullable=True)
+    SerienNummer = Column(String, nullable=True)
+    LagerortID = Column(String)
+    Bemerkung = Column(String, nullable=True)
+
+class LieferscheinDB(Base):
+    __tablename__ = "lieferscheine"
+    LieferscheinID = Column(String, primary_key=True, index=True)
+    LieferscheinNummer = Column(String)
+    AuftragID = Column(String, index=True)
+    KundenID = Column(String, index=True)
+    ErstellDatum = Column(DateTime)
+    Lieferdatum = Column(DateTime)
+    Status = Column(String, index=True)
+    Versandart = Column(String)
+    TrackingNummer = Column(String, nullable=True)
+    Spediteur = Column(String, nullable=True)
+    Lieferadresse = Column(String)
+    Gewicht = Column(Float, nullable=True)
+    Volumen = Column(Float, nullable=True)
+    AnzahlPackstuecke = Column(Integer)
+    # KI-Felder
+    OptimierteVerpackung = Column(String, nullable=True)
+    RoutenOptimierung = Column(String, nullable=True)
+    ZeitfensterPrognose = Column(String, nullable=True)
+    KommissionierungsReihenfolge = Column(Text, nullable=True)  # JSON als Text
+    AutomatischeDokumentenErstellung = Column(Boolean, nullable=True)
+    QualitaetssicherungsHinweise = Column(String, nullable=True)
+    positionen = relationship("LieferscheinPositionDB", backref="lieferschein")
+    __table_args__ = (Index("ix_lieferscheine_erstelldatum_id", "ErstellDatum", "LieferscheinID"),)
+
+# --- Rechnung ---
+class RechnungsPositionDB(Base):
+    __tablename__ = "rechnungspositionen"
+    id = Column(Integer, primary_key=True, index=True)
+    rechnung_id = Column(String, ForeignKey("rechnungen.RechnungID"), index=True)
+    PositionsID = Column(String)
+    LieferscheinPositionsID = Column(String, nullable=True)
+    ArtikelID = Column(String)
+    ArtikelBezeichnung = Column(String)
+    Menge = Column(Float)
+    Einheit = Column(String)
+    Einzelpreis = Column(Float)
+    MwStSatz = Column(Float)
+    Rabatt = Column(Float)
+    Gesamtpreis = Column(Float)
+    Kostenstelle = Column(String, nullable=True)
+
+class RechnungDB(Base):
+    __tablename__ = "rechnungen"
+    RechnungID = Column(String, primary_key=True, index=True)
+    RechnungNummer = Column(String)
+    AuftragID = Column(String, index=True)
+    LieferscheinID = Column(String, nullable=True)
+    KundenID = Column(String, index=True)
+    ErstellDatum = Column(DateTime)
+    Faelligkeitsdatum = Column(DateTime)
+    Status = Column(String, index=True)
+    Zahlungsbedingungen = Column(String)
+    Zahlungsart = Column(String)
+    Waehrung = Column(String, default="EUR")
+    Gesamtbetrag = Column(Float)
+    MwStBetrag = Column(Float)
+    Rabatt = Column(Float)
+    BereitsGezahlt = Column(Float)
+    Rechnungsadresse = Column(String)
+    IBAN = Column(String, nullable=True)
+    BIC = Column(String, nullable=True)
+    Verwendungszweck = Column(String)
+    # KI-Felder
+    ZahlungsprognoseDatum = Column(DateTime, nullable=True)
+    ZahlungsausfallRisiko = Column(Integer, nullable=True)
+    EmpfohleneZahlungserinnerung = Column(DateTime, nullable=True)
+    UmsatzsteuerKategorisierung = Column(String, nullable=True)
+    BuchhaltungskontoVorschlag = Column(String, nullable=True)
+    CashflowPrognoseImpact = Column(Float, nullable=True)
+    positionen = relationship("RechnungsPositionDB", backref="rechnung")
+    __table_args__ = (
+        Index("ix_rechnungen_erstelldatum_id", "ErstellDatum", "RechnungID"),
+        Index("ux_rechnungen_nummer", "RechnungNummer", unique=True),
+    )
+
+# --- Belegkette ---
+class BelegVerknuepfungDB(Base):
+    """Herkunft eines Belegs: jeder Quellbeleg wird je Zielbelegart höchstens einmal umgewandelt."""
+    __tablename__ = "beleg_verknuepfungen"
+    id = Column(Integer, primary_key=True, index=True)
+    QuellTyp = Column(String)
+    QuellID = Column(String)
+    ZielTyp = Column(String)
+    ZielID = Column(String, index=True)
+    ErstellDatum = Column(DateTime, default=datetime.now)
+    __table_args__ = (UniqueConstraint("QuellTyp", "QuellID", "ZielTyp", name="uq_beleg_verknuepfung"),)
+
+class NummernkreisDB(Base):
+    """Zuletzt vergebene Belegnummer je Belegart und Jahr (Rechnungen lückenlos, § 14 UStG, GoBD)."""
+    __tablename__ = "nummernkreise"
+    Belegart = Column(String, primary_key=True)
+    Jahr = Column(Integer, primary_key=True)
+    LetzteNummer = Column(Integer, nullable=False, default=0)
 
 # Datenbanktabellen anlegen
-Base.metadata.create_all(bind=engine) 
\ No newline at end of file
+Base.metadata.create_all(bind=engine)
+# Bestehende Datenbanken: eindeutige Rechnungsnummer nachziehen
+for index in RechnungDB.__table__.indexes:
+    index.create(bind=engine, checkfirst=True) 
\ No newline at end of file
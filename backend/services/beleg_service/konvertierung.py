@@ -0,0 +1,294 @@
+"""
+Umwandlung von Belegen entlang der Belegkette Angebot → Auftrag → Lieferschein → Rechnung.
+
+Viele Belege werden in einer Transaktion umgewandelt:
+
+- Die Quellbelege werden in einer Abfrage geladen, die Zielbelege per
+  executemany eingefügt.
+- Positionen werden mengenbasiert per INSERT ... SELECT kopiert; die Zuordnung
+  Quelle → Ziel liefert die Tabelle beleg_verknuepfungen.
+- Jede Umwandlung wird in beleg_verknuepfungen festgehalten. Bereits
+  umgewandelte Quellbelege werden übersprungen, der Unique-Constraint verhindert
+  Doppelungen bei parallelen Wiederholungen.
+- Belegnummern stammen aus dem Jahreszähler in nummernkreise und werden in
+  derselben Transaktion vergeben; Rechnungsnummern bleiben so lückenlos.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import and_, case, exists, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .db import (
+    AngebotDB, AngebotsPositionDB, AuftragDB, AuftragsPositionDB, BelegVerknuepfungDB,
+    LieferscheinDB, LieferscheinPositionDB, NummernkreisDB, RechnungDB, RechnungsPositionDB
+)
+from .models import UmwandlungsErgebnis
+
+# Vorgaben für Felder, die der Quellbeleg nicht enthält
+STANDARDWERTE: Dict[str, Any] = {
+    "Prioritaet": "normal",
+    "Versandart": "Standard",
+    "LagerortID": "",
+    "Zahlungsart": "Überweisung",
+    "Zahlungsziel_Tage": 14,
+}
+
+
+class Umwandlung(NamedTuple):
+    ziel: str
+    quell_model: Any
+    quell_id: Any
+    ziel_model: Any
+    ziel_id: str
+    nummer_feld: str
+    praefix: str
+    # Status des Quellbelegs nach der Umwandlung
+    status_nach: str
+
+
+UMWANDLUNGEN: Dict[str, Umwandlung] = {
+    "angebot": Umwandlung("auftrag", AngebotDB, AngebotDB.AngebotID, AuftragDB, "AuftragID",
+                          "AuftragNummer", "AU", "beauftragt"),
+    "auftrag": Umwandlung("lieferschein", AuftragDB, AuftragDB.AuftragID, LieferscheinDB, "LieferscheinID",
+                          "LieferscheinNummer", "LS", "geliefert"),
+    "lieferschein": Umwandlung("rechnung", LieferscheinDB, LieferscheinDB.LieferscheinID, RechnungDB, "RechnungID",
+                               "RechnungNummer", "RE", "berechnet"),
+}
+
+
+def _verknuepft(quelle: str, ziel: str):
+    v = BelegVerknuepfungDB
+    return lambda quell_spalte: and_(v.QuellID == quell_spalte, v.QuellTyp == quelle, v.ZielTyp == ziel)
+
+
+def _auftrag_aus_angebot(a: AngebotDB, kopf: Dict[str, Any], jetzt: datetime,
+                         optionen: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(
+        kopf, AngebotID=a.AngebotID, KundenID=a.KundenID, ErstellDatum=jetzt, Status="offen",
+        Prioritaet=optionen["Prioritaet"], Gesamtbetrag=a.Gesamtbetrag, MwStBetrag=a.MwStBetrag, Rabatt=a.Rabatt,
+        Zahlungsbedingungen=a.Zahlungsbedingungen, Lieferbedingungen=a.Lieferbedingungen,
+        Lieferadresse=optionen.get("Lieferadresse", ""), Rechnungsadresse=optionen.get("Rechnungsadresse", "")
+    )
+
+
+def _lieferschein_aus_auftrag(a: AuftragDB, kopf: Dict[str, Any], jetzt: datetime,
+                              optionen: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(
+        kopf, AuftragID=a.AuftragID, KundenID=a.KundenID, ErstellDatum=jetzt, Lieferdatum=a.Lieferdatum or jetzt,
+        Status="erstellt", Versandart=optionen["Versandart"], Lieferadresse=a.Lieferadresse,
+        AnzahlPackstuecke=optionen.get("AnzahlPackstuecke", 1)
+    )
+
+
+def _rechnung_aus_lieferschein(l: LieferscheinDB, kopf: Dict[str, Any], jetzt: datetime,
+                               optionen: Dict[str, Any]) -> Dict[str, Any]:
+    auftrag = optionen["_auftraege"].get(l.AuftragID)
+    return dict(
+        kopf, AuftragID=l.AuftragID, LieferscheinID=l.LieferscheinID, KundenID=l.KundenID, ErstellDatum=jetzt,
+        Faelligkeitsdatum=jetzt + timedelta(days=optionen["Zahlungsziel_Tage"]), Status="offen",
+        Zahlungsbedingungen=auftrag.Zahlungsbedingungen if auftrag else "", Zahlungsart=optionen["Zahlungsart"],
+        Waehrung="EUR", Gesamtbetrag=0.0, MwStBetrag=0.0, Rabatt=0.0, BereitsGezahlt=0.0,
+        Rechnungsadresse=auftrag.Rechnungsadresse if auftrag else "", Verwendungszweck=kopf["RechnungNummer"]
+    )
+
+
+def _positionen_angebot(quell_ids: List[str], optionen: Dict[str, Any]):
+    p, v, z = AngebotsPositionDB, BelegVerknuepfungDB, AuftragsPositionDB.__table__.c
+    quelle = select(
+        v.ZielID, p.PositionsID, p.ArtikelID, p.ArtikelBezeichnung, p.Menge, p.Einheit, p.Einzelpreis,
+        p.MwStSatz, p.Rabatt, p.Gesamtpreis, literal("offen"), literal(0.0)
+    ).select_from(p).join(v, _verknuepft("angebot", "auftrag")(p.angebot_id)).where(p.angebot_id.in_(quell_ids))
+    return [insert(AuftragsPositionDB).from_select([
+        z.auftrag_id, z.PositionsID, z.ArtikelID, z.ArtikelBezeichnung, z.Menge, z.Einheit, z.Einzelpreis,
+        z.MwStSatz, z.Rabatt, z.Gesamtpreis, z.LieferStatus, z.BereitsGelieferteMenge
+    ], quelle)]
+
+
+def _positionen_auftrag(quell_ids: List[str], optionen: Dict[str, Any]):
+    p, v, z = AuftragsPositionDB, BelegVerknuepfungDB, LieferscheinPositionDB.__table__.c
+    offen = p.Menge - func.coalesce(p.BereitsGelieferteMenge, 0)
+    quelle = select(
+        v.ZielID, p.PositionsID, p.PositionsID, p.ArtikelID, p.ArtikelBezeichnung, offen, p.Einheit,
+        literal(optionen["LagerortID"])
+    ).select_from(p).join(v, _verknuepft("auftrag", "lieferschein")(p.auftrag_id)).where(
+        p.auftrag_id.in_(quell_ids), offen > 0
+    )
+    return [
+        insert(LieferscheinPositionDB).from_select([
+            z.lieferschein_id, z.PositionsID, z.AuftragsPositionsID, z.ArtikelID, z.ArtikelBezeichnung, z.Menge,
+            z.Einheit, z.LagerortID
+        ], quelle),
+        # Auftragspositionen gelten mit dem Lieferschein als vollständig geliefert
+        update(AuftragsPositionDB).where(AuftragsPositionDB.auftrag_id.in_(quell_ids)).values(
+            BereitsGelieferteMenge=AuftragsPositionDB.Menge, LieferStatus="geliefert"
+        ).execution_options(synchronize_session=False),
+    ]
+
+
+def _positionen_lieferschein(quell_ids: List[str], optionen: Dict[str, Any]):
+    p, v, l, a = LieferscheinPositionDB, BelegVerknuepfungDB, LieferscheinDB, AuftragsPositionDB
+    z = RechnungsPositionDB.__table__.c
+    # Preise aus der Auftragsposition, anteilig zur gelieferten Menge
+    gesamtpreis = case((a.Menge > 0, a.Gesamtpreis * p.Menge / a.Menge), else_=0.0)
+    quelle = select(
+        v.ZielID, p.PositionsID, p.PositionsID, p.ArtikelID, p.ArtikelBezeichnung, p.Menge, p.Einheit,
+        func.coalesce(a.Einzelpreis, 0.0), func.coalesce(a.MwStSatz, 0.0), func.coalesce(a.Rabatt, 0.0),
+        func.coalesce(gesamtpreis, 0.0)
+    ).select_from(p).join(v, _verknuepft("lieferschein", "rechnung")(p.lieferschein_id)).join(
+        l, l.LieferscheinID == p.lieferschein_id
+    ).outerjoin(
+        a, and_(a.auftrag_id == l.AuftragID, a.PositionsID == p.AuftragsPositionsID)
+    ).where(p.lieferschein_id.in_(quell_ids))
+
+    r = RechnungsPositionDB
+    ziel_ids = select(v.ZielID).where(v.QuellTyp == "lieferschein", v.ZielTyp == "rechnung", v.QuellID.in_(quell_ids))
+    summe = select(func.coalesce(func.sum(r.Gesamtpreis), 0.0)).where(r.rechnung_id == RechnungDB.RechnungID)
+    mwst = select(func.coalesce(func.sum(r.Gesamtpreis * r.MwStSatz / 100), 0.0)).where(
+        r.rechnung_id == RechnungDB.RechnungID
+    )
+    return [
+        insert(RechnungsPositionDB).from_select([
+            z.rechnung_id, z.PositionsID, z.LieferscheinPositionsID, z.ArtikelID, z.ArtikelBezeichnung, z.Menge,
+            z.Einheit, z.Einzelpreis, z.MwStSatz, z.Rabatt, z.Gesamtpreis
+        ], quelle),
+        # Rechnungsbeträge aus den eingefügten Positionen
+        update(RechnungDB).where(RechnungDB.RechnungID.in_(ziel_ids)).values(
+            Gesamtbetrag=summe.scalar_subquery(), MwStBetrag=mwst.scalar_subquery()
+        ).execution_options(synchronize_session=False),
+    ]
+
+
+_KOEPFE = {
+    "angebot": _auftrag_aus_angebot,
+    "auftrag": _lieferschein_aus_auftrag,
+    "lieferschein": _rechnung_aus_lieferschein,
+}
+
+_POSITIONEN = {
+    "angebot": _positionen_angebot,
+    "auftrag": _positionen_auftrag,
+    "lieferschein": _positionen_lieferschein,
+}
+
+
+def _umwandeln(db: Session, quelle: str, ids: Optional[List[str]], status: Optional[str], kunden_id: Optional[str],
+               max_belege: int, jetzt: datetime, optionen: Dict[str, Any]) -> UmwandlungsErgebnis:
+    u = UMWANDLUNGEN[quelle]
+    v = BelegVerknuepfungDB
+
+    query = db.query(u.quell_model)
+    if ids is not None:
+        query = query.filter(u.quell_id.in_(ids))
+    if status:
+        query = query.filter(u.quell_model.Status == status)
+    if kunden_id:
+        query = query.filter(u.quell_model.KundenID == kunden_id)
+    # Bereits umgewandelte Belege vor dem LIMIT ausschließen, sonst füllen sie das Fenster
+    # und die dahinter liegenden Belege werden nie erreicht
+    query = query.filter(~exists().where(v.QuellTyp == quelle, v.QuellID == u.quell_id, v.ZielTyp == u.ziel))
+    neu = query.order_by(u.quell_model.ErstellDatum, u.quell_id).limit(max_belege).all()
+
+    # Übersprungen werden nur ausdrücklich angeforderte Belege gemeldet
+    vorhanden = dict(db.query(v.QuellID, v.ZielID).filter(
+        v.QuellTyp == quelle, v.ZielTyp == u.ziel, v.QuellID.in_(ids)
+    ).all()) if ids is not None else {}
+    if not neu:
+        return UmwandlungsErgebnis(Quelle=quelle, Ziel=u.ziel, Erstellt={}, Uebersprungen=vorhanden)
+
+    if quelle == "lieferschein":
+        auftrag_ids = {q.AuftragID for q in neu}
+        optionen["_auftraege"] = {a.AuftragID: a for a in db.query(AuftragDB).filter(AuftragDB.AuftragID.in_(auftrag_ids))}
+
+    erstellt, koepfe, verknuepfungen = {}, [], []
+    nummern = _nummern_vergeben(db, u.ziel, u.praefix, len(neu), jetzt.year)
+    for q, nummer in zip(neu, nummern):
+        quell_id = getattr(q, u.quell_id.key)
+        ziel_id = str(uuid.uuid4())
+        kopf = {u.ziel_id: ziel_id, u.nummer_feld: nummer}
+        koepfe.append(_KOEPFE[quelle](q, kopf, jetzt, optionen))
+        verknuepfungen.append(dict(QuellTyp=quelle, QuellID=quell_id, ZielTyp=u.ziel, ZielID=ziel_id, ErstellDatum=jetzt))
+        erstellt[quell_id] = ziel_id
+
+    neu_ids = list(erstellt)
+    db.execute(insert(u.ziel_model), koepfe)
+    db.execute(insert(v), verknuepfungen)
+    for statement in _POSITIONEN[quelle](neu_ids, optionen):
+        db.execute(statement)
+    db.execute(
+        update(u.quell_model).where(u.quell_id.in_(neu_ids)).values(Status=u.status_nach)
+        .execution_options(synchronize_session=False)
+    )
+    return UmwandlungsErgebnis(Quelle=quelle, Ziel=u.ziel, Erstellt=erstellt, Uebersprungen=vorhanden)
+
+
+def _nummern_vergeben(db: Session, belegart: str, praefix: str, anzahl: int, jahr: int) -> List[str]:
+    """
+    Vergibt ``anzahl`` fortlaufende Nummern aus dem Jahreszähler der Belegart.
+
+    Das UPDATE sperrt die Zählerzeile wie SELECT ... FOR UPDATE bis zum Ende der
+    Umwandlungstransaktion und rechnet in der Datenbank (auch unter SQLite ohne
+    FOR UPDATE sicher). Parallele Umwandlungen warten, ein Rollback gibt die
+    Nummern wieder frei.
+    """
+    n = NummernkreisDB
+    letzte = db.execute(
+        update(n).where(n.Belegart == belegart, n.Jahr == jahr)
+        .values(LetzteNummer=n.LetzteNummer + anzahl).returning(n.LetzteNummer)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if letzte is None:
+        # Erster Beleg des Jahres; ein paralleler Insert scheitert am Primärschlüssel und wird wiederholt
+        db.execute(insert(n).values(Belegart=belegart, Jahr=jahr, LetzteNummer=anzahl))
+        letzte = anzahl
+    return [f"{praefix}-{jahr}-{nummer:06d}" for nummer in range(letzte - anzahl + 1, letzte + 1)]
+
+
+def belege_umwandeln(
+    db: Session,
+    quelle: str,
+    ids: Optional[List[str]] = None,
+    status: Optional[str] = None,
+    kunden_id: Optional[str] = None,
+    max_belege: int = 1000,
+    optionen: Optional[Dict[str, Any]] = None,
+    jetzt: Optional[datetime] = None
+) -> UmwandlungsErgebnis:
+    """
+    Wandelt Belege in einer Transaktion in die nächste Stufe der Belegkette um.
+
+    Args:
+        db: Datenbank-Session
+        quelle: "angebot", "auftrag" oder "lieferschein"
+        ids: IDs der Quellbelege (None = alle, die den Filtern entsprechen)
+        status: Nur Quellbelege mit diesem Status (z.B. "angenommen")
+        kunden_id: Nur Quellbelege dieses Kunden
+        max_belege: Höchstzahl umzuwandelnder Belege
+        optionen: Abweichende STANDARDWERTE
+        jetzt: Erstelldatum der Zielbelege (bestimmt auch das Jahr des Nummernkreises)
+
+    Returns:
+        Zuordnung Quell-ID → Ziel-ID für erstellte und bereits vorhandene Belege
+    """
+    if quelle not in UMWANDLUNGEN:
+        raise ValueError(f"Unbekannte Belegart: {quelle}")
+
+    for versuch in range(2):
+        try:
+            ergebnis = _umwandeln(
+                db, quelle, ids, status, kunden_id, max_belege, jetzt or datetime.now(),
+                {**STANDARDWERTE, **(optionen or {})}
+            )
+            db.commit()
+            return ergebnis
+        except IntegrityError:
+            # Parallele Umwandlung derselben Belege: erneut versuchen, vorhandene werden übersprungen
+            db.rollback()
+            if versuch:
+                raise
+        except Exception:
+            db.rollback()
+            raise
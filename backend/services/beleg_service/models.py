@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 from datetime import datetime
 
 # --- Angebot ---
@@ -241,4 +241,18 @@ class Bestellung(BaseModel):
     BestellzeitpunktOptimierung: Optional[str] = None
     MengenOptimierungsFaktor: Optional[float] = None
     LieferantenBewertungScore: Optional[int] = None
-    NachhaltigkeitsScore: Optional[int] = None 
\ No newline at end of file
+    NachhaltigkeitsScore: Optional[int] = None 
+# --- Belegkette ---
+class BelegUmwandlung(BaseModel):
+    Quelle: Literal["angebot", "auftrag", "lieferschein"]
+    IDs: Optional[List[str]] = None
+    Status: Optional[str] = None
+    KundenID: Optional[str] = None
+    MaxBelege: int = Field(1000, ge=1, le=10000)
+
+class UmwandlungsErgebnis(BaseModel):
+    Quelle: str
+    Ziel: str
+    # Quell-ID -> Ziel-ID
+    Erstellt: Dict[str, str]
+    Uebersprungen: Dict[str, str]
@@ -1,15 +1,21 @@
 """
 Bulk Operation Processor für VALEO-NeuroERP
 """
-from typing import List, Dict, Any, Optional, Callable, TypeVar, Generic
+from typing import List, Dict, Any, Optional, Callable, TypeVar, Generic, Hashable
 import asyncio
 import logging
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy import Table, select, update, delete
 from backend.monitoring.metrics import metrics
 from backend.core.config import settings
+from backend.services.write_behind import (
+    OP_DELETE,
+    OP_INSERT,
+    OP_UPDATE,
+    KeylessInsert,
+    WriteBehindBuffer,
+    execute_operations,
+)
 
 # Type Variables
 T = TypeVar('T')
@@ -20,45 +26,59 @@ logger = logging.getLogger(__name__)
 class BulkProcessor(Generic[Model]):
     def __init__(
         self,
-        db: AsyncSession,
+        db: Optional[AsyncSession],
         model: Model,
         batch_size: int = 1000,
         flush_interval: int = 30,
-        retry_attempts: int = 3
+        retry_attempts: int = 3,
+        max_pending: Optional[int] = None,
+        use_copy: bool = False,
+        session_factory: Optional[Callable[[], AsyncSession]] = None
     ):
         """
         Initialisiert den Bulk Processor
-        
+
+        Operationen werden in einem Write-Behind-Puffer pro Primärschlüssel
+        zusammengeführt und batchweise in je einer Transaktion geschrieben.
+
         Args:
-            db: Datenbankverbindung
+            db: Datenbankverbindung (entfällt bei session_factory)
             model: SQLAlchemy Model
             batch_size: Maximale Batch-Größe
             flush_interval: Automatisches Flush-Interval in Sekunden
             retry_attempts: Anzahl Wiederholungsversuche bei Fehlern
+            max_pending: Obergrenze gepufferter Operationen; darüber warten add_* (Backpressure)
+            use_copy: Inserts auf PostgreSQL per COPY schreiben (nur append-only Tabellen)
+            session_factory: Erzeugt pro Flush eine eigene Session (für parallele Flushes)
         """
+        if db is None and session_factory is None:
+            raise ValueError("Entweder db oder session_factory muss angegeben werden")
+
         self.db = db
         self.model = model
+        self.table = model.__table__
         self.batch_size = batch_size
         self.flush_interval = flush_interval
         self.retry_attempts = retry_attempts
-        
-        # Batch-Speicher
-        self.inserts: List[Dict] = []
-        self.updates: List[Dict] = []
-        self.deletes: List[Any] = []
-        
-        # Metriken
-        self.operation_start = datetime.now()
-        
+        self.use_copy = use_copy
+        self.session_factory = session_factory
+
+        # Write-Behind-Puffer
+        self.buffer = WriteBehindBuffer(max_pending or batch_size * 10)
+        self._pk_names = [col.name for col in self.table.primary_key.columns]
+        self._flush_lock = asyncio.Lock()
+        self._pending_flush: Optional[asyncio.Task] = None
+        self.failed_operations = 0
+
         # Background Task
         self.flush_task: Optional[asyncio.Task] = None
-        
+
     async def start(self):
         """Startet den Bulk Processor"""
         if not self.flush_task:
             self.flush_task = asyncio.create_task(self._auto_flush())
             logger.info(f"Bulk Processor für {self.model.__name__} gestartet")
-            
+
     async def stop(self):
         """Stoppt den Bulk Processor"""
         if self.flush_task:
@@ -68,187 +88,129 @@ class BulkProcessor(Generic[Model]):
             except asyncio.CancelledError:
                 pass
             self.flush_task = None
-            
+
         # Verbleibende Operationen ausführen
         await self.flush()
         logger.info(f"Bulk Processor für {self.model.__name__} gestoppt")
-        
+
     async def _auto_flush(self):
         """Automatisches Flush in Intervallen"""
         while True:
             await asyncio.sleep(self.flush_interval)
             await self.flush()
-            
+
+    def _key(self, data: Dict[str, Any]) -> Optional[Hashable]:
+        """Primärschlüssel aus den Daten (None, falls nicht vollständig vorhanden)"""
+        if any(data.get(name) is None for name in self._pk_names):
+            return None
+        if len(self._pk_names) == 1:
+            return data[self._pk_names[0]]
+        return tuple(data[name] for name in self._pk_names)
+
+    async def _add(self, key: Hashable, op: str, data: Dict[str, Any]):
+        if self.buffer.is_full:
+            self._schedule_flush()
+        await self.buffer.put(key, op, data)
+        if len(self.buffer) >= self.batch_size:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Startet einen Flush im Hintergrund, falls keiner läuft"""
+        if self._pending_flush is None or self._pending_flush.done():
+            self._pending_flush = asyncio.create_task(self.flush())
+
     async def add_insert(self, data: Dict[str, Any]):
         """
         Fügt Insert-Operation hinzu
-        
+
         Args:
             data: Einzufügende Daten
         """
-        self.inserts.append(data)
-        
-        if len(self.inserts) >= self.batch_size:
-            await self.flush_inserts()
-            
+        key = self._key(data)
+        await self._add(key if key is not None else KeylessInsert(), OP_INSERT, data)
+
     async def add_update(self, data: Dict[str, Any]):
         """
         Fügt Update-Operation hinzu
-        
+
         Args:
-            data: Zu aktualisierende Daten
+            data: Zu aktualisierende Daten (inklusive Primärschlüssel)
         """
-        self.updates.append(data)
-        
-        if len(self.updates) >= self.batch_size:
-            await self.flush_updates()
-            
+        key = self._key(data)
+        if key is None:
+            raise ValueError(f"Update für {self.model.__name__} ohne Primärschlüssel")
+        await self._add(key, OP_UPDATE, data)
+
     async def add_delete(self, id: Any):
         """
         Fügt Delete-Operation hinzu
-        
+
         Args:
-            id: ID des zu löschenden Eintrags
+            id: ID des zu löschenden Eintrags (Tupel bei zusammengesetztem Schlüssel)
         """
-        self.deletes.append(id)
-        
-        if len(self.deletes) >= self.batch_size:
-            await self.flush_deletes()
-            
+        values = dict(zip(self._pk_names, id if isinstance(id, tuple) else (id,)))
+        await self._add(id, OP_DELETE, values)
+
     async def flush(self):
-        """Führt alle ausstehenden Operationen aus"""
-        await self.flush_inserts()
-        await self.flush_updates()
-        await self.flush_deletes()
-        
-    async def flush_inserts(self):
-        """Führt ausstehende Insert-Operationen aus"""
-        if not self.inserts:
-            return
-            
-        try:
-            # Bulk Insert mit ON CONFLICT DO NOTHING
-            stmt = insert(self.model.__table__).values(self.inserts)
-            stmt = stmt.on_conflict_do_nothing()
-            
-            await self._execute_with_retry(stmt)
-            
-            # Metriken aktualisieren
-            duration = (datetime.now() - self.operation_start).total_seconds()
-            metrics.track_transaction(
-                transaction_type="bulk_insert",
-                duration=duration,
-                status="success"
-            )
-            
-            logger.info(
-                f"Bulk Insert: {len(self.inserts)} Einträge für {self.model.__name__}"
-            )
-            
-        except Exception as e:
-            logger.error(f"Fehler bei Bulk Insert: {str(e)}")
-            metrics.track_transaction(
-                transaction_type="bulk_insert",
-                duration=0,
-                status="error"
-            )
-            
-        finally:
-            self.inserts = []
-            self.operation_start = datetime.now()
-            
-    async def flush_updates(self):
-        """Führt ausstehende Update-Operationen aus"""
-        if not self.updates:
-            return
-            
-        try:
-            # Updates in Batches ausführen
-            for batch in self._chunk_list(self.updates, self.batch_size):
-                stmt = update(self.model.__table__)
-                stmt = stmt.where(
-                    self.model.id.in_([item["id"] for item in batch])
-                )
-                stmt = stmt.values({
-                    k: v for k, v in batch[0].items() if k != "id"
-                })
-                
-                await self._execute_with_retry(stmt)
-                
-            # Metriken aktualisieren
-            duration = (datetime.now() - self.operation_start).total_seconds()
-            metrics.track_transaction(
-                transaction_type="bulk_update",
-                duration=duration,
-                status="success"
-            )
-            
-            logger.info(
-                f"Bulk Update: {len(self.updates)} Einträge für {self.model.__name__}"
-            )
-            
-        except Exception as e:
-            logger.error(f"Fehler bei Bulk Update: {str(e)}")
-            metrics.track_transaction(
-                transaction_type="bulk_update",
-                duration=0,
-                status="error"
-            )
-            
-        finally:
-            self.updates = []
-            self.operation_start = datetime.now()
-            
-    async def flush_deletes(self):
-        """Führt ausstehende Delete-Operationen aus"""
-        if not self.deletes:
-            return
-            
+        """Führt alle ausstehenden Operationen aus (ein Batch pro Transaktion)"""
+        async with self._flush_lock:
+            # Nur den Stand bei Aufruf schreiben, damit Dauerlast den Flush nicht endlos verlängert
+            remaining = len(self.buffer)
+            while remaining > 0 and len(self.buffer):
+                operations = self.buffer.drain(min(self.batch_size, remaining))
+                remaining -= len(operations)
+                try:
+                    await self._flush_batch(operations)
+                finally:
+                    await self.buffer.complete(len(operations))
+
+    # Inserts, Updates und Deletes werden gemeinsam geschrieben, damit die
+    # Reihenfolge pro Primärschlüssel erhalten bleibt
+    flush_inserts = flush
+    flush_updates = flush
+    flush_deletes = flush
+
+    async def _flush_batch(self, operations):
+        """Schreibt einen Batch in einer Transaktion"""
+        start = datetime.now()
         try:
-            # Deletes in Batches ausführen
-            for batch in self._chunk_list(self.deletes, self.batch_size):
-                stmt = delete(self.model.__table__).where(
-                    self.model.id.in_(batch)
-                )
-                
-                await self._execute_with_retry(stmt)
-                
+            counts = await self._execute_with_retry(operations)
+
             # Metriken aktualisieren
-            duration = (datetime.now() - self.operation_start).total_seconds()
             metrics.track_transaction(
-                transaction_type="bulk_delete",
-                duration=duration,
+                transaction_type="bulk_write",
+                duration=(datetime.now() - start).total_seconds(),
                 status="success"
             )
-            
+
             logger.info(
-                f"Bulk Delete: {len(self.deletes)} Einträge für {self.model.__name__}"
+                f"Bulk Write für {self.model.__name__}: {counts['inserts']} Inserts, "
+                f"{counts['updates']} Updates, {counts['deletes']} Deletes"
             )
-            
+
         except Exception as e:
-            logger.error(f"Fehler bei Bulk Delete: {str(e)}")
+            self.failed_operations += len(operations)
+            logger.error(f"Fehler bei Bulk Write für {self.model.__name__}: {str(e)}")
             metrics.track_transaction(
-                transaction_type="bulk_delete",
+                transaction_type="bulk_write",
                 duration=0,
                 status="error"
             )
-            
-        finally:
-            self.deletes = []
-            self.operation_start = datetime.now()
-            
-    async def _execute_with_retry(self, stmt, attempt: int = 1):
+
+    async def _execute_with_retry(self, operations, attempt: int = 1) -> Dict[str, int]:
         """
-        Führt Statement mit Retry-Logik aus
-        
+        Führt einen Batch mit Retry-Logik aus
+
         Args:
-            stmt: SQL Statement
+            operations: Zusammengeführte Operationen
             attempt: Aktueller Versuch
         """
         try:
-            await self.db.execute(stmt)
-            await self.db.commit()
-            
+            if self.session_factory is not None:
+                async with self.session_factory() as session:
+                    return await self._execute_in_session(session, operations)
+            return await self._execute_in_session(self.db, operations)
+
         except Exception as e:
             if attempt < self.retry_attempts:
                 # Exponentielles Backoff
@@ -257,14 +219,58 @@ class BulkProcessor(Generic[Model]):
                     f"Retry {attempt} nach {wait_time}s für {self.model.__name__}"
                 )
                 await asyncio.sleep(wait_time)
-                await self._execute_with_retry(stmt, attempt + 1)
+                return await self._execute_with_retry(operations, attempt + 1)
             else:
                 raise
-                
+
+    async def _execute_in_session(self, session: AsyncSession, operations) -> Dict[str, int]:
+        try:
+            counts = await execute_operations(session, self.table, operations, self.use_copy)
+            await session.commit()
+            return counts
+        except Exception:
+            await session.rollback()
+            raise
+
     @staticmethod
     def _chunk_list(lst: List[T], chunk_size: int) -> List[List[T]]:
         """Liste in Chunks aufteilen"""
         return [
             lst[i:i + chunk_size]
             for i in range(0, len(lst), chunk_size)
-        ] 
\ No newline at end of file
+        ]
+
+
+class BulkProcessorGroup:
+    """
+    Verwaltet Bulk Processoren für mehrere Models und flusht sie parallel.
+
+    Jeder Processor arbeitet mit eigenen Sessions aus ``session_factory``, da
+    eine AsyncSession nicht nebenläufig genutzt werden darf.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], **processor_options):
+        self.session_factory = session_factory
+        self.processor_options = processor_options
+        self.processors: Dict[Any, BulkProcessor] = {}
+
+    def processor(self, model: Model) -> BulkProcessor:
+        """Liefert den Processor für ein Model (wird bei Bedarf angelegt)"""
+        if model not in self.processors:
+            self.processors[model] = BulkProcessor(
+                db=None,
+                model=model,
+                session_factory=self.session_factory,
+                **self.processor_options
+            )
+        return self.processors[model]
+
+    async def start(self):
+        await asyncio.gather(*(p.start() for p in self.processors.values()))
+
+    async def stop(self):
+        await asyncio.gather(*(p.stop() for p in self.processors.values()))
+
+    async def flush(self):
+        """Flusht alle Models parallel"""
+        await asyncio.gather(*(p.flush() for p in self.processors.values()))
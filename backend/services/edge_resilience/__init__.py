@@ -7,6 +7,8 @@ Edge Network Resilience Framework für robuste Offline-Funktionalität.
 
 from .offline_manager import OfflineManager, NetworkStatus
 from .sync_queue import SyncQueue, SyncItem, SyncItemStatus, SyncItemPriority
+from .batch_sync import BatchSynchronizer, HttpBatchTransport, SimulatedTransport
+from .delta_sync import DeltaTracker, CentralSyncStore, HybridLogicalClock
 from .edge_network_resilience import EdgeNetworkResilience
 
 __all__ = [
@@ -16,5 +18,11 @@ __all__ = [
     'SyncItem',
     'SyncItemStatus',
     'SyncItemPriority',
+    'BatchSynchronizer',
+    'HttpBatchTransport',
+    'SimulatedTransport',
+    'DeltaTracker',
+    'CentralSyncStore',
+    'HybridLogicalClock',
     'EdgeNetworkResilience',
 ] 
\ No newline at end of file
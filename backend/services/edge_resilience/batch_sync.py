@@ -0,0 +1,400 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Gebündelte Synchronisation für das Edge Network Resilience Framework.
+
+Statt eines Requests pro SyncItem werden ausstehende Elemente zu
+komprimierten Umschlägen (Envelopes) mit mehreren Elementen zusammengefasst:
+
+- Ein Umschlag enthält höchstens ``max_items`` Elemente bzw. ``max_bytes``
+  Nutzdaten. Neu hinzugefügte Elemente werden höchstens ``max_delay``
+  Sekunden gesammelt, bevor sie versendet werden.
+- Bis zu ``max_in_flight`` Umschläge sind gleichzeitig unterwegs, sodass bei
+  hoher Latenz nicht jeder Umschlag eine volle Roundtrip-Zeit wartet.
+- Der Server quittiert jedes Element einzeln. Nur fehlgeschlagene Elemente
+  (oder die eines verlorenen Umschlags) werden erneut versucht; die
+  ``item_id`` dient dem Server als Idempotenzschlüssel.
+
+Protokoll (POST ``{api_endpoint}/sync/batch``, gzip-komprimiertes JSON):
+
+    Anfrage: {"envelope_id": "...", "items": [{"item_id": "...", ...}, ...]}
+    Antwort: {"envelope_id": "...", "results": {"<item_id>": {"status": "ok"}}}
+
+Status je Element: "ok", "conflict" oder "error" (fehlende Einträge gelten
+als "error").
+"""
+
+import asyncio
+import gzip
+import inspect
+import json
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from .sync_queue import SyncQueue, SyncItem, SyncItemStatus
+
+# Logging konfigurieren
+logger = logging.getLogger("edge_resilience.batch_sync")
+
+def encode_envelope(envelope_id: str, items: List[SyncItem], compress_level: int = 6) -> bytes:
+    """
+    Kodiert Elemente als komprimierten Umschlag.
+
+    Args:
+        envelope_id: ID des Umschlags
+        items: Zu versendende Elemente
+        compress_level: gzip-Kompressionsstufe (1-9)
+
+    Returns:
+        gzip-komprimiertes JSON
+    """
+    body = {
+        "envelope_id": envelope_id,
+        "items": [
+            {
+                "item_id": item.item_id,
+                "entity_type": item.entity_type,
+                "entity_id": item.entity_id,
+                "operation": item.operation,
+                "data": item.data if item.operation != "delete" else None,
+                "priority": item.priority.value,
+                "created_at": item.created_at.isoformat(),
+                "retry_count": item.retry_count
+            }
+            for item in items
+        ]
+    }
+    raw = json.dumps(body, separators=(",", ":"), default=str).encode("utf-8")
+    return gzip.compress(raw, compresslevel=compress_level)
+
+def decode_envelope(payload: bytes) -> Dict[str, Any]:
+    """
+    Dekodiert einen Umschlag (Gegenstück zu encode_envelope, z.B. für den Server).
+
+    Args:
+        payload: gzip-komprimiertes JSON
+
+    Returns:
+        Dictionary mit envelope_id und items
+    """
+    return json.loads(gzip.decompress(payload).decode("utf-8"))
+
+class HttpBatchTransport:
+    """
+    Versendet Umschläge per HTTP an den zentralen Server.
+
+    Die Session wird über alle Umschläge wiederverwendet (Keep-Alive), statt
+    pro Element eine neue Verbindung aufzubauen.
+    """
+
+    def __init__(self, api_endpoint: str, timeout: float = 30):
+        """
+        Initialisiert den Transport.
+
+        Args:
+            api_endpoint: URL des API-Endpunkts
+            timeout: Timeout pro Umschlag in Sekunden
+        """
+        self.url = f"{api_endpoint}/sync/batch"
+        self.changes_url = f"{api_endpoint}/sync/changes"
+        self.timeout = timeout
+        self._session = None
+
+    def _get_session(self):
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def send(self, payload: bytes) -> Dict[str, Any]:
+        """
+        Sendet einen Umschlag und gibt die Antwort des Servers zurück.
+
+        Args:
+            payload: Kodierter Umschlag
+
+        Returns:
+            Antwort mit den Ergebnissen je Element
+
+        Raises:
+            ConnectionError: Bei einem unerwarteten HTTP-Status
+        """
+        async with self._get_session().post(
+            self.url,
+            data=payload,
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"}
+        ) as response:
+            if response.status not in [200, 207]:
+                raise ConnectionError(f"Status {response.status}")
+            return await response.json()
+
+    async def fetch_changes(self, since: int, limit: int = 500, node_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Lädt eine Seite des Änderungs-Feeds (siehe delta_sync).
+
+        Args:
+            since: Wasserzeichen des Edge-Knotens
+            limit: Maximale Anzahl an Einträgen
+            node_id: ID des Edge-Knotens (eigene Änderungen werden übersprungen)
+
+        Returns:
+            Seite des Änderungs-Feeds
+
+        Raises:
+            ConnectionError: Bei einem unerwarteten HTTP-Status
+        """
+        async with self._get_session().get(
+            self.changes_url,
+            params={"since": since, "limit": limit, **({"node_id": node_id} if node_id else {})},
+            headers={"Accept-Encoding": "gzip"}
+        ) as response:
+            if response.status != 200:
+                raise ConnectionError(f"Status {response.status}")
+            return await response.json()
+
+    async def close(self):
+        """Schließt die HTTP-Session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+class SimulatedTransport:
+    """
+    Transport für Tests und Benchmarks.
+
+    Leitet Umschläge an einen Server-Handler weiter und simuliert Latenz und
+    Paketverlust über einen NetworkSimulator (linkup_mcp/tools/network_simulator.py)
+    sowie optional eine begrenzte, gemeinsam genutzte Bandbreite im Upload.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[bytes], Union[Dict[str, Any], Awaitable[Dict[str, Any]]]],
+        simulator: Any = None,
+        bandwidth_kbps: Optional[float] = None,
+        timeout: float = 5.0
+    ):
+        """
+        Initialisiert den simulierten Transport.
+
+        Args:
+            handler: Server-Handler, erhält den Umschlag und liefert die Antwort
+            simulator: Objekt mit simulate_latency() und should_drop_packet()
+            bandwidth_kbps: Upload-Bandbreite in kbit/s (None = unbegrenzt)
+            timeout: Wartezeit in Sekunden, bis ein verlorener Umschlag als
+                fehlgeschlagen gilt
+        """
+        self.handler = handler
+        self.simulator = simulator
+        self.bandwidth_kbps = bandwidth_kbps
+        self.timeout = timeout
+        self.requests = 0
+        self._uplink = asyncio.Lock()
+
+    async def _transfer(self) -> None:
+        if self.simulator is None:
+            return
+        if self.simulator.should_drop_packet():
+            await asyncio.sleep(self.timeout)
+            raise asyncio.TimeoutError("Paket verloren")
+        await self.simulator.simulate_latency()
+
+    async def send(self, payload: bytes) -> Dict[str, Any]:
+        """
+        Sendet einen Umschlag über die simulierte Verbindung.
+
+        Args:
+            payload: Kodierter Umschlag
+
+        Returns:
+            Antwort des Server-Handlers
+        """
+        self.requests += 1
+        if self.bandwidth_kbps:
+            # Die Uplink-Bandbreite teilen sich alle gleichzeitigen Umschläge
+            async with self._uplink:
+                await asyncio.sleep(len(payload) * 8 / (self.bandwidth_kbps * 1000))
+
+        # Hinweg
+        await self._transfer()
+        response = self.handler(payload)
+        if inspect.isawaitable(response):
+            response = await response
+        # Rückweg
+        await self._transfer()
+        return response
+
+    async def close(self):
+        """Keine Ressourcen freizugeben."""
+
+class BatchSynchronizer:
+    """
+    Synchronisiert die Queue gebündelt und mit mehreren Umschlägen gleichzeitig.
+    """
+
+    def __init__(
+        self,
+        sync_queue: SyncQueue,
+        transport: Any,
+        max_items: int = 200,
+        max_bytes: int = 256 * 1024,
+        max_delay: float = 0.05,
+        max_in_flight: int = 4,
+        compress_level: int = 6,
+        retry_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        is_online: Optional[Callable[[], bool]] = None
+    ):
+        """
+        Initialisiert den Synchronizer.
+
+        Args:
+            sync_queue: Synchronisations-Queue
+            transport: Transport mit ``async send(payload) -> dict``
+            max_items: Maximale Anzahl an Elementen pro Umschlag
+            max_bytes: Maximale Nutzdatengröße (unkomprimiert) pro Umschlag
+            max_delay: Maximale Sammelzeit für neu hinzugefügte Elemente in Sekunden
+            max_in_flight: Maximale Anzahl gleichzeitig gesendeter Umschläge
+            compress_level: gzip-Kompressionsstufe (1-9)
+            retry_backoff: Wartezeit nach einem fehlgeschlagenen Umschlag in
+                Sekunden (verdoppelt sich bei weiteren Fehlschlägen)
+            max_backoff: Maximale Wartezeit zwischen Versuchen in Sekunden
+            is_online: Optional, Funktion zur Prüfung der Verbindung
+        """
+        self.sync_queue = sync_queue
+        self.transport = transport
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.max_in_flight = max_in_flight
+        self.compress_level = compress_level
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.is_online = is_online or (lambda: True)
+
+        self.stats = {
+            "envelopes": 0,
+            "items_sent": 0,
+            "bytes_sent": 0,
+            "completed": 0,
+            "conflict": 0,
+            "retried": 0,
+            "failed": 0,
+            "transport_errors": 0
+        }
+
+        self._lock = asyncio.Lock()
+        self._scheduled: Optional[asyncio.TimerHandle] = None
+        self._pending_since_flush = 0
+        self._tasks = set()
+
+    def schedule(self) -> None:
+        """
+        Plant eine Synchronisation für neu hinzugefügte Elemente.
+
+        Elemente werden bis zu ``max_delay`` Sekunden gesammelt; sobald ein
+        Umschlag voll ist, wird sofort synchronisiert. Ohne laufenden
+        Event-Loop ohne Wirkung.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        self._pending_since_flush += 1
+        if self._pending_since_flush >= self.max_items:
+            if self._scheduled is not None:
+                self._scheduled.cancel()
+            self._start_flush()
+        elif self._scheduled is None:
+            self._scheduled = loop.call_later(self.max_delay, self._start_flush)
+
+    def _start_flush(self) -> None:
+        self._scheduled = None
+        self._pending_since_flush = 0
+        task = asyncio.ensure_future(self.sync_pending())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def sync_pending(self) -> Dict[str, int]:
+        """
+        Synchronisiert alle ausstehenden Elemente.
+
+        Returns:
+            Kumulierte Statistiken des Synchronizers
+        """
+        async with self._lock:
+            # Jeder Worker hält höchstens einen Umschlag gleichzeitig in der Leitung
+            await asyncio.gather(*(self._worker() for _ in range(self.max_in_flight)))
+        return dict(self.stats)
+
+    async def _worker(self):
+        failures = 0
+        while self.is_online():
+            items = self.sync_queue.claim_pending_items(self.max_items, self.max_bytes)
+            if not items:
+                return
+
+            if await self._send_envelope(items):
+                failures = 0
+            else:
+                failures += 1
+                await asyncio.sleep(min(self.retry_backoff * 2 ** (failures - 1), self.max_backoff))
+
+    async def _send_envelope(self, items: List[SyncItem]) -> bool:
+        """
+        Sendet einen Umschlag und übernimmt die Quittungen je Element.
+
+        Args:
+            items: Elemente des Umschlags (Status: in Bearbeitung)
+
+        Returns:
+            True, wenn der Umschlag beim Server angekommen ist, sonst False
+        """
+        envelope_id = str(uuid.uuid4())
+        payload = encode_envelope(envelope_id, items, self.compress_level)
+        self.stats["envelopes"] += 1
+        self.stats["items_sent"] += len(items)
+        self.stats["bytes_sent"] += len(payload)
+
+        try:
+            response = await self.transport.send(payload)
+            results = response.get("results", {})
+            delivered = True
+        except Exception as e:
+            logger.warning(f"Umschlag {envelope_id} mit {len(items)} Elementen fehlgeschlagen: {e!r}")
+            self.stats["transport_errors"] += 1
+            results = {}
+            delivered = False
+
+        for item in items:
+            status = (results.get(item.item_id) or {}).get("status")
+            if status == "ok":
+                item.update_status(SyncItemStatus.COMPLETED)
+                self.stats["completed"] += 1
+            elif status == "conflict":
+                item.update_status(SyncItemStatus.CONFLICT)
+                self.stats["conflict"] += 1
+            elif item.can_retry():
+                item.increment_retry_count()
+                item.update_status(SyncItemStatus.PENDING)
+                self.stats["retried"] += 1
+            else:
+                item.update_status(SyncItemStatus.FAILED)
+                self.stats["failed"] += 1
+
+        self.sync_queue.update_items(items)
+        return delivered
+
+    async def close(self):
+        """Bricht geplante Synchronisationen ab und schließt den Transport."""
+        if self._scheduled is not None:
+            self._scheduled.cancel()
+            self._scheduled = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.transport.close()
@@ -0,0 +1,727 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Delta-Synchronisation für das Edge Network Resilience Framework.
+
+Statt bei jeder Änderung die vollständige Entität in die Queue zu stellen,
+werden nur geänderte Felder übertragen:
+
+- Der DeltaTracker hält je Entität den zuletzt bekannten Stand (Schatten)
+  und einen Versionsvektor (Knoten -> Zähler). Eine Änderung erzeugt ein
+  Delta mit gesetzten, entfernten und - für kommutative Felder wie Bestände
+  oder Zähler - inkrementierten Feldern. Jedes Feld trägt einen Zeitstempel
+  einer Hybrid Logical Clock (HLC).
+- Solange ein Delta für eine Entität noch aussteht, werden weitere
+  Änderungen in dieses Delta eingearbeitet. Nach einem Tag offline wird je
+  geänderter Entität also nur ein Delta übertragen.
+- Der Server (CentralSyncStore) übernimmt ein Delta unverändert, wenn der
+  Basis-Versionsvektor des Deltas seinen Stand enthält. Bei nebenläufigen
+  Änderungen gewinnt je Feld der jüngere HLC-Zeitstempel; Inkremente
+  kommutativer Felder werden immer addiert, sodass keine Bestandsbuchung
+  verloren geht.
+- Jede Änderung auf dem Server erhält eine fortlaufende Sequenznummer. Der
+  Edge-Knoten lädt über den Änderungs-Feed nur Entitäten, die sich seit
+  seinem Wasserzeichen geändert haben. Entitäten, deren Serverstand genau
+  aus seinem eigenen Delta stammt, werden dabei übersprungen.
+
+Delta (SyncItem.data bei operation "delta"):
+
+    {"set": {...}, "unset": [...], "incr": {...}, "clock": {"<feld>": "<hlc>"},
+     "base": {"<knoten>": n}, "vv": {"<knoten>": n}, "hlc": "<hlc>", "node": "<knoten>"}
+
+Änderungs-Feed (GET ``{api_endpoint}/sync/changes?since=<wasserzeichen>&limit=<n>&node_id=<knoten>``):
+
+    {"changes": [{"entity_type": ..., "entity_id": ..., "data": {...}, "vv": {...},
+                  "hlc": ..., "deleted": false, "seq": 17}, ...],
+     "watermark": 17, "has_more": false}
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .batch_sync import decode_envelope
+from .sync_queue import SyncQueue, SyncItem, SyncItemPriority
+
+# Logging konfigurieren
+logger = logging.getLogger("edge_resilience.delta_sync")
+
+class HybridLogicalClock:
+    """
+    Hybrid Logical Clock (physische Zeit in ms, logischer Zähler, Knoten-ID).
+
+    Zeitstempel sind Zeichenketten fester Breite und damit lexikografisch
+    vergleichbar; bei gleicher Zeit und gleichem Zähler entscheidet die Knoten-ID.
+    """
+
+    def __init__(self, node_id: str, wall_clock: Callable[[], float] = time.time):
+        """
+        Initialisiert die Uhr.
+
+        Args:
+            node_id: ID des Knotens
+            wall_clock: Quelle der physischen Zeit in Sekunden
+        """
+        self.node_id = node_id
+        self.wall_clock = wall_clock
+        self._wall = 0
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def _format(self) -> str:
+        return f"{self._wall:013d}-{self._counter:06d}-{self.node_id}"
+
+    @staticmethod
+    def parse(timestamp: str) -> Tuple[int, int, str]:
+        """Zerlegt einen Zeitstempel in physische Zeit, Zähler und Knoten-ID."""
+        wall, counter, node_id = timestamp.split("-", 2)
+        return int(wall), int(counter), node_id
+
+    def now(self) -> str:
+        """Zeitstempel für ein lokales Ereignis."""
+        with self._lock:
+            wall = int(self.wall_clock() * 1000)
+            if wall > self._wall:
+                self._wall, self._counter = wall, 0
+            else:
+                self._counter += 1
+            return self._format()
+
+    def update(self, remote: str) -> str:
+        """Übernimmt einen empfangenen Zeitstempel, damit spätere lokale Zeitstempel größer sind."""
+        remote_wall, remote_counter, _ = self.parse(remote)
+        with self._lock:
+            wall = int(self.wall_clock() * 1000)
+            if wall > self._wall and wall > remote_wall:
+                self._wall, self._counter = wall, 0
+            elif remote_wall > self._wall:
+                self._wall, self._counter = remote_wall, remote_counter + 1
+            elif self._wall > remote_wall:
+                self._counter += 1
+            else:
+                self._counter = max(self._counter, remote_counter) + 1
+            return self._format()
+
+def vv_merge(a: Dict[str, int], b: Dict[str, int]) -> Dict[str, int]:
+    """Elementweises Maximum zweier Versionsvektoren."""
+    merged = dict(a)
+    for node, counter in b.items():
+        if counter > merged.get(node, 0):
+            merged[node] = counter
+    return merged
+
+def vv_descends(a: Dict[str, int], b: Dict[str, int]) -> bool:
+    """True, wenn ``a`` alle Änderungen aus ``b`` enthält (a >= b)."""
+    return all(a.get(node, 0) >= counter for node, counter in b.items())
+
+def vv_compare(a: Dict[str, int], b: Dict[str, int]) -> str:
+    """
+    Vergleicht zwei Versionsvektoren.
+
+    Returns:
+        "equal", "after" (a neuer), "before" (b neuer) oder "concurrent"
+    """
+    a_descends, b_descends = vv_descends(a, b), vv_descends(b, a)
+    if a_descends and b_descends:
+        return "equal"
+    if a_descends:
+        return "after"
+    if b_descends:
+        return "before"
+    return "concurrent"
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def diff_fields(
+    old: Dict[str, Any],
+    new: Dict[str, Any],
+    commutative: Iterable[str] = ()
+) -> Tuple[Dict[str, Any], List[str], Dict[str, Any]]:
+    """
+    Ermittelt die Feldänderungen zwischen zwei Ständen einer Entität.
+
+    Args:
+        old: Bisheriger Stand
+        new: Neuer Stand
+        commutative: Felder, deren numerische Änderung als Inkrement übertragen wird
+
+    Returns:
+        (gesetzte Felder, entfernte Felder, Inkremente)
+    """
+    commutative = set(commutative)
+    set_fields, incr = {}, {}
+    for field, value in new.items():
+        if field in old and old[field] == value:
+            continue
+        if field in commutative and _is_number(value) and _is_number(old.get(field)):
+            incr[field] = value - old[field]
+        else:
+            set_fields[field] = value
+    unset = [field for field in old if field not in new]
+    return set_fields, unset, incr
+
+def merge_deltas(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fasst zwei aufeinanderfolgende Deltas derselben Entität zusammen.
+
+    Args:
+        first: Älteres Delta
+        second: Jüngeres Delta
+
+    Returns:
+        Delta mit der Basis des älteren und dem Versionsvektor des jüngeren Deltas
+    """
+    set_fields = dict(first["set"])
+    unset = set(first["unset"])
+    incr = dict(first["incr"])
+    clock = dict(first["clock"])
+
+    for field, value in second["set"].items():
+        set_fields[field] = value
+        unset.discard(field)
+        incr.pop(field, None)
+    for field in second["unset"]:
+        set_fields.pop(field, None)
+        incr.pop(field, None)
+        unset.add(field)
+    for field, amount in second["incr"].items():
+        if field in set_fields:
+            # Feld wurde im selben Delta gesetzt: Inkrement in den Wert einrechnen
+            set_fields[field] += amount
+        else:
+            incr[field] = incr.get(field, 0) + amount
+    clock.update(second["clock"])
+
+    return {
+        "set": set_fields,
+        "unset": sorted(unset),
+        "incr": {field: amount for field, amount in incr.items() if amount},
+        "clock": clock,
+        "base": first["base"],
+        "vv": second["vv"],
+        "hlc": second["hlc"],
+        "node": second["node"]
+    }
+
+def apply_delta(data: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Wendet ein Delta ohne Konfliktauflösung auf einen Stand an.
+
+    Args:
+        data: Ausgangsstand
+        delta: Anzuwendendes Delta
+
+    Returns:
+        Neuer Stand
+    """
+    result = dict(data)
+    result.update(delta["set"])
+    for field in delta["unset"]:
+        result.pop(field, None)
+    for field, amount in delta["incr"].items():
+        result[field] = (result.get(field) or 0) + amount
+    return result
+
+class DeltaTracker:
+    """
+    Erfasst Änderungen auf dem Edge-Knoten als Feld-Deltas und wendet den
+    Änderungs-Feed des Servers an.
+
+    Schattenstände, Versionsvektoren und das Wasserzeichen liegen in der
+    SQLite-Datenbank der Synchronisations-Queue.
+    """
+
+    def __init__(
+        self,
+        sync_queue: SyncQueue,
+        node_id: str,
+        commutative_fields: Optional[Dict[str, Iterable[str]]] = None,
+        db_path: Optional[str] = None
+    ):
+        """
+        Initialisiert den Tracker.
+
+        Args:
+            sync_queue: Synchronisations-Queue, in die Deltas gestellt werden
+            node_id: Eindeutige ID des Edge-Knotens
+            commutative_fields: Kommutative Felder je Entitätstyp,
+                z.B. {"inventory": ["stock"]}
+            db_path: Pfad zur SQLite-Datenbank (Standard: Datenbank der Queue)
+        """
+        self.sync_queue = sync_queue
+        self.node_id = node_id
+        self.commutative_fields = {
+            entity_type: set(fields) for entity_type, fields in (commutative_fields or {}).items()
+        }
+        self.db_path = db_path or sync_queue.db_path
+        self.clock = HybridLogicalClock(node_id)
+
+        self._init_db()
+
+    def _init_db(self):
+        """Initialisiert die Tabellen für Schattenstände und Synchronisationsstatus."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS delta_shadow (
+            entity_type TEXT,
+            entity_id TEXT,
+            data TEXT,
+            version_vector TEXT,
+            PRIMARY KEY (entity_type, entity_id)
+        )
+        """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS delta_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    def _load_shadow(self, conn, entity_type: str, entity_id: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, int]]:
+        row = conn.execute(
+            "SELECT data, version_vector FROM delta_shadow WHERE entity_type = ? AND entity_id = ?",
+            (entity_type, entity_id)
+        ).fetchone()
+        if row is None:
+            return None, {}
+        return json.loads(row[0]), json.loads(row[1])
+
+    def _save_shadow(self, conn, entity_type: str, entity_id: str, data: Dict[str, Any], vv: Dict[str, int]):
+        conn.execute(
+            "INSERT OR REPLACE INTO delta_shadow (entity_type, entity_id, data, version_vector) VALUES (?, ?, ?, ?)",
+            (entity_type, entity_id, json.dumps(data), json.dumps(vv))
+        )
+
+    def record_change(
+        self,
+        entity_type: str,
+        entity_id: str,
+        data: Dict[str, Any],
+        priority: SyncItemPriority = SyncItemPriority.NORMAL
+    ) -> Optional[str]:
+        """
+        Erfasst den neuen Stand einer Entität und stellt das Delta in die Queue.
+
+        Args:
+            entity_type: Typ der Entität
+            entity_id: ID der Entität
+            data: Vollständiger neuer Stand
+            priority: Priorität des Elements
+
+        Returns:
+            ID des (ggf. zusammengefassten) Elements oder None, wenn sich nichts geändert hat
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            shadow, vv = self._load_shadow(conn, entity_type, entity_id)
+            set_fields, unset, incr = diff_fields(
+                shadow or {}, data, self.commutative_fields.get(entity_type, ())
+            )
+            if not (set_fields or unset or incr):
+                return None
+
+            timestamp = self.clock.now()
+            new_vv = dict(vv)
+            new_vv[self.node_id] = new_vv.get(self.node_id, 0) + 1
+            delta = {
+                "set": set_fields,
+                "unset": unset,
+                "incr": incr,
+                "clock": {field: timestamp for field in [*set_fields, *unset]},
+                "base": vv,
+                "vv": new_vv,
+                "hlc": timestamp,
+                "node": self.node_id
+            }
+
+            # Noch nicht versendetes Delta derselben Entität erweitern. Ein bereits
+            # übernommenes Element kann beim Server angekommen sein, ohne dass die
+            # Quittung zurückkam; der Server verwirft es beim erneuten Senden als
+            # Duplikat, daher wird die neue Änderung dann als eigenes Element gesendet.
+            pending = self.sync_queue.get_pending_item(entity_type, entity_id, "delta")
+            if pending is not None and (pending.retry_count or pending.metadata.get("claimed")):
+                pending = None
+            if pending is not None:
+                pending.data = merge_deltas(pending.data, delta)
+                if priority.value > pending.priority.value:
+                    pending.priority = priority
+                self.sync_queue.update_item(pending)
+                item_id = pending.item_id
+            else:
+                item_id = self.sync_queue.add_item(SyncItem(
+                    entity_type=entity_type,
+                    entity_id=entity_id,
+                    operation="delta",
+                    data=delta,
+                    priority=priority
+                ))
+
+            self._save_shadow(conn, entity_type, entity_id, data, new_vv)
+            conn.commit()
+            return item_id
+        finally:
+            conn.close()
+
+    def record_delete(
+        self,
+        entity_type: str,
+        entity_id: str,
+        priority: SyncItemPriority = SyncItemPriority.NORMAL
+    ) -> str:
+        """
+        Erfasst das Löschen einer Entität.
+
+        Ein noch ausstehendes Delta der Entität wird verworfen.
+
+        Args:
+            entity_type: Typ der Entität
+            entity_id: ID der Entität
+            priority: Priorität des Elements
+
+        Returns:
+            ID des Lösch-Elements
+        """
+        pending = self.sync_queue.get_pending_item(entity_type, entity_id, "delta")
+        if pending is not None:
+            self.sync_queue.delete_item(pending.item_id)
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM delta_shadow WHERE entity_type = ? AND entity_id = ?", (entity_type, entity_id))
+        conn.commit()
+        conn.close()
+
+        return self.sync_queue.add_item(SyncItem(
+            entity_type=entity_type,
+            entity_id=entity_id,
+            operation="delete",
+            priority=priority
+        ))
+
+    @property
+    def watermark(self) -> int:
+        """Sequenznummer der letzten übernommenen Server-Änderung."""
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute("SELECT value FROM delta_state WHERE key = 'watermark'").fetchone()
+        conn.close()
+        return int(row[0]) if row else 0
+
+    def apply_changes(
+        self,
+        changes: List[Dict[str, Any]],
+        watermark: Optional[int] = None
+    ) -> Dict[Tuple[str, str], Optional[Dict[str, Any]]]:
+        """
+        Wendet Änderungen aus dem Feed des Servers an.
+
+        Änderungen, die der Knoten laut Versionsvektor bereits kennt, werden
+        übersprungen. Noch nicht versendete lokale Deltas werden auf den
+        Server-Stand angewendet. Aufrufer sollten vorher die Queue übertragen,
+        damit kein bereits beim Server angekommenes Delta doppelt gezählt wird.
+
+        Args:
+            changes: Einträge des Änderungs-Feeds
+            watermark: Neues Wasserzeichen (wird mit den Änderungen gespeichert)
+
+        Returns:
+            Neuer lokaler Stand je geänderter Entität (None bei gelöschten Entitäten)
+        """
+        updated = {}
+        versions = {}
+        conn = sqlite3.connect(self.db_path)
+        try:
+            # Erst lesen, dann schreiben: die Queue nutzt eine eigene Verbindung zur selben Datenbank
+            for change in changes:
+                entity_type, entity_id = change["entity_type"], change["entity_id"]
+                if change.get("hlc"):
+                    self.clock.update(change["hlc"])
+
+                shadow, vv = self._load_shadow(conn, entity_type, entity_id)
+                if shadow is not None and vv_descends(vv, change["vv"]):
+                    continue
+
+                if change.get("deleted"):
+                    updated[(entity_type, entity_id)] = None
+                    continue
+
+                data = change["data"]
+                pending = self.sync_queue.get_pending_item(entity_type, entity_id, "delta")
+                if pending is not None:
+                    data = apply_delta(data, pending.data)
+
+                updated[(entity_type, entity_id)] = data
+                versions[(entity_type, entity_id)] = vv_merge(vv, change["vv"])
+
+            for (entity_type, entity_id), data in updated.items():
+                if data is None:
+                    conn.execute(
+                        "DELETE FROM delta_shadow WHERE entity_type = ? AND entity_id = ?",
+                        (entity_type, entity_id)
+                    )
+                else:
+                    self._save_shadow(conn, entity_type, entity_id, data, versions[(entity_type, entity_id)])
+
+            if watermark is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO delta_state (key, value) VALUES ('watermark', ?)",
+                    (str(watermark),)
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+        return updated
+
+    async def pull(
+        self,
+        fetch: Callable[[int, int, str], Awaitable[Dict[str, Any]]],
+        limit: int = 500
+    ) -> Dict[Tuple[str, str], Optional[Dict[str, Any]]]:
+        """
+        Lädt alle Änderungen seit dem Wasserzeichen seitenweise vom Server.
+
+        Args:
+            fetch: Funktion (since, limit, node_id) -> Seite des Änderungs-Feeds
+            limit: Einträge pro Seite
+
+        Returns:
+            Neuer lokaler Stand je geänderter Entität
+        """
+        updated = {}
+        watermark = self.watermark
+        while True:
+            page = await fetch(watermark, limit, self.node_id)
+            watermark = page["watermark"]
+            updated.update(self.apply_changes(page["changes"], watermark))
+            if not page.get("has_more"):
+                break
+
+        logger.info(f"Änderungs-Feed übernommen: {len(updated)} Entitäten, Wasserzeichen {watermark}")
+        return updated
+
+class CentralSyncStore:
+    """
+    Referenzimplementierung der Serverseite der Delta-Synchronisation.
+
+    Führt Deltas der Edge-Knoten zusammen, quittiert Umschläge im Format des
+    BatchSynchronizers und liefert den Änderungs-Feed. Die item_id bereits
+    übernommener Elemente wird gespeichert, damit erneut gesendete Umschläge
+    Inkremente nicht doppelt anwenden.
+    """
+
+    def __init__(self, db_path: str = "central_sync.db", node_id: str = "server"):
+        """
+        Initialisiert den Speicher.
+
+        Args:
+            db_path: Pfad zur SQLite-Datenbank
+            node_id: Knoten-ID für Änderungen ohne Delta (create/update)
+        """
+        self.db_path = db_path
+        self.node_id = node_id
+        self.clock = HybridLogicalClock(node_id)
+
+        self._init_db()
+
+    def _init_db(self):
+        """Initialisiert die SQLite-Datenbank."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS entities (
+            entity_type TEXT,
+            entity_id TEXT,
+            data TEXT,
+            field_clock TEXT,
+            version_vector TEXT,
+            hlc TEXT,
+            deleted INTEGER,
+            origin TEXT,
+            seq INTEGER,
+            PRIMARY KEY (entity_type, entity_id)
+        )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_entities_seq ON entities (seq)")
+        cursor.execute("CREATE TABLE IF NOT EXISTS applied_items (item_id TEXT PRIMARY KEY)")
+
+        conn.commit()
+        conn.close()
+
+    def _apply_item(self, cursor, item: Dict[str, Any], seq: int) -> Dict[str, Any]:
+        entity_type, entity_id, operation = item["entity_type"], item["entity_id"], item["operation"]
+        row = cursor.execute(
+            "SELECT data, field_clock, version_vector, deleted FROM entities WHERE entity_type = ? AND entity_id = ?",
+            (entity_type, entity_id)
+        ).fetchone()
+        if row is not None:
+            data, field_clock, vv, deleted = json.loads(row[0]), json.loads(row[1]), json.loads(row[2]), bool(row[3])
+        else:
+            data, field_clock, vv, deleted = {}, {}, {}, False
+
+        if operation == "delete":
+            vv = dict(vv)
+            vv[self.node_id] = vv.get(self.node_id, 0) + 1
+            data, deleted = {}, True
+            merged = True
+        elif operation in ["delta", "create", "update"]:
+            if deleted and operation != "create":
+                return {"status": "conflict", "message": "Entität wurde gelöscht"}
+
+            if operation == "delta":
+                delta = item["data"]
+                self.clock.update(delta["hlc"])
+            else:
+                # Vollständiger Stand ohne Versionsvektor: alle Felder mit Serverzeit setzen
+                timestamp = self.clock.now()
+                next_vv = dict(vv)
+                next_vv[self.node_id] = next_vv.get(self.node_id, 0) + 1
+                delta = {
+                    "set": item["data"] or {}, "unset": [], "incr": {},
+                    "clock": {field: timestamp for field in item["data"] or {}},
+                    "base": vv, "vv": next_vv, "hlc": timestamp, "node": None
+                }
+
+            # Kennt der Absender den Serverstand, ist die Änderung kausal jünger
+            merged = not vv_descends(delta["base"], vv)
+            for field, value in delta["set"].items():
+                if not merged or delta["clock"][field] >= field_clock.get(field, ""):
+                    data[field] = value
+                    field_clock[field] = delta["clock"][field]
+            for field in delta["unset"]:
+                if not merged or delta["clock"][field] >= field_clock.get(field, ""):
+                    data.pop(field, None)
+                    field_clock[field] = delta["clock"][field]
+            for field, amount in delta["incr"].items():
+                data[field] = (data.get(field) or 0) + amount
+
+            vv = vv_merge(vv, delta["vv"])
+            deleted = False
+        else:
+            return {"status": "error", "message": f"Unbekannte Operation: {operation}"}
+
+        # Stammt der Stand unverändert aus einem Delta, kennt dessen Absender ihn bereits
+        origin = delta["node"] if operation != "delete" and not merged else None
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO entities (
+                entity_type, entity_id, data, field_clock, version_vector, hlc, deleted, origin, seq
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                entity_type, entity_id, json.dumps(data), json.dumps(field_clock), json.dumps(vv),
+                max(field_clock.values(), default=self.clock.now()), int(deleted), origin, seq
+            )
+        )
+        return {"status": "ok", "merged": merged}
+
+    def apply_envelope(self, envelope: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Übernimmt alle Elemente eines Umschlags in einer Transaktion.
+
+        Args:
+            envelope: Dekodierter Umschlag
+
+        Returns:
+            Antwort mit dem Ergebnis je Element
+        """
+        results = {}
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            seq = cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM entities").fetchone()[0]
+            for item in envelope["items"]:
+                item_id = item["item_id"]
+                if cursor.execute("SELECT 1 FROM applied_items WHERE item_id = ?", (item_id,)).fetchone():
+                    results[item_id] = {"status": "ok", "duplicate": True}
+                    continue
+                seq += 1
+                results[item_id] = self._apply_item(cursor, item, seq)
+                if results[item_id]["status"] == "ok":
+                    cursor.execute("INSERT INTO applied_items (item_id) VALUES (?)", (item_id,))
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        return {"envelope_id": envelope["envelope_id"], "results": results}
+
+    def handle_batch(self, payload: bytes) -> Dict[str, Any]:
+        """Handler für ``POST /sync/batch`` (gzip-komprimierter Umschlag)."""
+        return self.apply_envelope(decode_envelope(payload))
+
+    def changes_since(self, since: int, limit: int = 500, node_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Liefert die Entitäten, die sich nach dem Wasserzeichen geändert haben.
+
+        Args:
+            since: Wasserzeichen des Edge-Knotens
+            limit: Maximale Anzahl an geprüften Einträgen
+            node_id: Knoten, dessen eigene, unverändert übernommene Deltas
+                übersprungen werden
+
+        Returns:
+            Seite des Änderungs-Feeds
+        """
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute(
+            """
+            SELECT entity_type, entity_id, data, version_vector, hlc, deleted, seq, origin
+            FROM entities WHERE seq > ? ORDER BY seq LIMIT ?
+            """,
+            (since, limit)
+        ).fetchall()
+        conn.close()
+
+        changes = [
+            {
+                "entity_type": row[0],
+                "entity_id": row[1],
+                "data": json.loads(row[2]),
+                "vv": json.loads(row[3]),
+                "hlc": row[4],
+                "deleted": bool(row[5]),
+                "seq": row[6]
+            }
+            for row in rows
+            if node_id is None or row[7] != node_id
+        ]
+        return {
+            "changes": changes,
+            "watermark": rows[-1][6] if rows else since,
+            "has_more": len(rows) == limit
+        }
+
+    def get_entity(self, entity_type: str, entity_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Holt den aktuellen Stand einer Entität.
+
+        Returns:
+            Daten der Entität oder None, wenn sie nicht existiert oder gelöscht wurde
+        """
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute(
+            "SELECT data, deleted FROM entities WHERE entity_type = ? AND entity_id = ?",
+            (entity_type, entity_id)
+        ).fetchone()
+        conn.close()
+        if row is None or row[1]:
+            return None
+        return json.loads(row[0])
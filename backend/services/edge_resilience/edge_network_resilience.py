@@ -12,10 +12,13 @@ import asyncio
 import json
 import logging
 import os
+import socket
 from typing import Dict, List, Optional, Any, Callable, Union
 
 from .offline_manager import OfflineManager, NetworkStatus
 from .sync_queue import SyncQueue, SyncItem, SyncItemStatus, SyncItemPriority
+from .batch_sync import BatchSynchronizer, HttpBatchTransport
+from .delta_sync import DeltaTracker
 
 # Logging konfigurieren
 logger = logging.getLogger("edge_resilience")
@@ -55,6 +58,28 @@ class EdgeNetworkResilience:
         # API-Endpunkt
         self.api_endpoint = api_endpoint
         
+        # Gebündelte Synchronisation (mehrere Elemente pro Request)
+        batch_config = self.config.get("batch_sync", {})
+        self.batch_sync = BatchSynchronizer(
+            self.sync_queue,
+            HttpBatchTransport(api_endpoint, timeout=batch_config.get("timeout", 30)),
+            max_items=batch_config.get("max_items", 200),
+            max_bytes=batch_config.get("max_bytes", 256 * 1024),
+            max_delay=batch_config.get("max_delay", 0.05),
+            max_in_flight=batch_config.get("max_in_flight", 4),
+            is_online=self.offline_manager.is_online
+        )
+        
+        # Delta-Synchronisation (Feld-Deltas, Änderungs-Feed)
+        delta_config = self.config.get("delta_sync", {})
+        self.delta_tracker = DeltaTracker(
+            self.sync_queue,
+            node_id=delta_config.get("node_id") or socket.gethostname(),
+            commutative_fields=delta_config.get("commutative_fields", {})
+        )
+        self.pull_limit = delta_config.get("pull_limit", 500)
+        self._change_listeners: List[Callable[[str, str, Optional[Dict[str, Any]]], None]] = []
+        
         # Event-Handler registrieren
         self._register_event_handlers()
         
@@ -126,9 +151,9 @@ class EdgeNetworkResilience:
         """
         logger.info(f"Synchronisationselement hinzugefügt: {item.item_id}")
         
-        # Wenn online, sofort verarbeiten
+        # Wenn online, mit weiteren neuen Elementen gebündelt übertragen
         if self.offline_manager.is_online():
-            asyncio.create_task(self._process_sync_item(item))
+            self.batch_sync.schedule()
     
     def _handle_sync_item_completed(self, item: SyncItem):
         """
@@ -216,13 +241,48 @@ class EdgeNetworkResilience:
             logger.warning("Kann ausstehende Elemente nicht verarbeiten: Offline")
             return
         
-        # Queue-Verarbeitung starten
-        await self.sync_queue.process_queue(self._process_sync_item)
+        # Ausstehende Elemente gebündelt übertragen
+        stats = await self.batch_sync.sync_pending()
+        logger.info(f"Synchronisation abgeschlossen: {stats}")
+        
+        # Danach Änderungen anderer Knoten seit dem Wasserzeichen laden
+        try:
+            await self.pull_changes()
+        except Exception as e:
+            logger.error(f"Fehler beim Laden des Änderungs-Feeds: {e}")
+    
+    async def pull_changes(self) -> int:
+        """
+        Lädt Änderungen seit dem letzten Wasserzeichen und benachrichtigt die Change-Listener.
+        
+        Returns:
+            Anzahl der geänderten Entitäten
+        """
+        updated = await self.delta_tracker.pull(self.batch_sync.transport.fetch_changes, self.pull_limit)
+        for (entity_type, entity_id), data in updated.items():
+            for listener in self._change_listeners:
+                try:
+                    listener(entity_type, entity_id, data)
+                except Exception as e:
+                    logger.error(f"Fehler beim Benachrichtigen des Change-Listeners: {e}")
+        return len(updated)
+    
+    def register_change_listener(self, listener: Callable[[str, str, Optional[Dict[str, Any]]], None]):
+        """
+        Registriert einen Listener für Änderungen aus dem Änderungs-Feed.
+        
+        Args:
+            listener: Funktion (entity_type, entity_id, data), data ist None bei gelöschten Entitäten
+        """
+        self._change_listeners.append(listener)
     
     async def start(self):
         """Startet das Edge Network Resilience Framework."""
         logger.info("Starte Edge Network Resilience Framework")
         
+        # Elemente, die beim letzten Lauf in Bearbeitung geblieben sind, erneut senden
+        self.sync_queue.reset_processing_items()
+        
         # Konnektivitätsmonitor starten
         health_endpoint = f"{self.api_endpoint}/health"
         monitor_interval = self.config.get("connectivity_check_interval", 30)
@@ -250,6 +310,8 @@ class EdgeNetworkResilience:
                 pass
         
         self._background_tasks = []
+        
+        await self.batch_sync.close()
     
     def add_sync_item(
         self,
@@ -282,6 +344,46 @@ class EdgeNetworkResilience:
         
         return self.sync_queue.add_item(item)
     
+    def record_change(
+        self,
+        entity_type: str,
+        entity_id: str,
+        data: Dict[str, Any],
+        priority: SyncItemPriority = SyncItemPriority.NORMAL
+    ) -> Optional[str]:
+        """
+        Erfasst den neuen Stand einer Entität; synchronisiert werden nur die geänderten Felder.
+        
+        Args:
+            entity_type: Typ der Entität (z.B. "customer", "inventory")
+            entity_id: ID der Entität
+            data: Vollständiger neuer Stand
+            priority: Priorität des Elements
+            
+        Returns:
+            ID des Elements oder None, wenn sich nichts geändert hat
+        """
+        return self.delta_tracker.record_change(entity_type, entity_id, data, priority)
+    
+    def record_delete(
+        self,
+        entity_type: str,
+        entity_id: str,
+        priority: SyncItemPriority = SyncItemPriority.NORMAL
+    ) -> str:
+        """
+        Erfasst das Löschen einer Entität.
+        
+        Args:
+            entity_type: Typ der Entität
+            entity_id: ID der Entität
+            priority: Priorität des Elements
+            
+        Returns:
+            ID des Lösch-Elements
+        """
+        return self.delta_tracker.record_delete(entity_type, entity_id, priority)
+    
     def get_sync_item(self, item_id: str) -> Optional[SyncItem]:
         """
         Holt ein Element aus der Synchronisationswarteschlange.
@@ -306,7 +408,9 @@ class EdgeNetworkResilience:
         
         return {
             "queue": queue_stats,
-            "network": network_status
+            "network": network_status,
+            "batch_sync": dict(self.batch_sync.stats),
+            "watermark": self.delta_tracker.watermark
         }
     
     def is_online(self) -> bool:
@@ -363,15 +363,67 @@ class SyncQueue:
         
         if updated:
             logger.info(f"Element aktualisiert: {item.item_id} (Status: {item.status.value})")
-            self._notify_listeners("updated", item)
+            self._notify_status(item)
+        
+        return updated
+    
+    def _notify_status(self, item: SyncItem):
+        """
+        Benachrichtigt die Listener über ein aktualisiertes Element.
+        
+        Args:
+            item: Aktualisiertes Element
+        """
+        self._notify_listeners("updated", item)
+        
+        # Zusätzliche Benachrichtigungen für bestimmte Status
+        if item.status == SyncItemStatus.COMPLETED:
+            self._notify_listeners("completed", item)
+        elif item.status == SyncItemStatus.FAILED:
+            self._notify_listeners("failed", item)
+        elif item.status == SyncItemStatus.CONFLICT:
+            self._notify_listeners("conflict", item)
+    
+    def update_items(self, items: List[SyncItem]) -> int:
+        """
+        Aktualisiert mehrere Elemente in einer Transaktion.
+        
+        Args:
+            items: Zu aktualisierende Elemente
             
-            # Zusätzliche Benachrichtigungen für bestimmte Status
-            if item.status == SyncItemStatus.COMPLETED:
-                self._notify_listeners("completed", item)
-            elif item.status == SyncItemStatus.FAILED:
-                self._notify_listeners("failed", item)
-            elif item.status == SyncItemStatus.CONFLICT:
-                self._notify_listeners("conflict", item)
+        Returns:
+            Anzahl der aktualisierten Elemente
+        """
+        if not items:
+            return 0
+        
+        rows = []
+        for item in items:
+            item_dict = item.to_dict()
+            rows.append((
+                item_dict["entity_type"], item_dict["entity_id"], item_dict["operation"],
+                json.dumps(item_dict["data"]), item_dict["status"], item_dict["priority"],
+                item_dict["updated_at"], item_dict["retry_count"], item_dict["max_retries"],
+                json.dumps(item_dict["metadata"]), item_dict["item_id"]
+            ))
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.executemany("""
+        UPDATE sync_items SET
+            entity_type = ?, entity_id = ?, operation = ?, data = ?,
+            status = ?, priority = ?, updated_at = ?, retry_count = ?,
+            max_retries = ?, metadata = ?
+        WHERE item_id = ?
+        """, rows)
+        
+        updated = cursor.rowcount
+        conn.commit()
+        conn.close()
+        
+        logger.info(f"{updated} Elemente aktualisiert")
+        for item in items:
+            self._notify_status(item)
         
         return updated
     
@@ -431,6 +483,92 @@ class SyncQueue:
         
         return None
     
+    def claim_pending_items(self, max_items: int = 100, max_bytes: Optional[int] = None) -> List[SyncItem]:
+        """
+        Holt die nächsten ausstehenden Elemente und markiert sie in derselben
+        Transaktion als in Bearbeitung.
+        
+        Args:
+            max_items: Maximale Anzahl an Elementen
+            max_bytes: Optional, maximale Größe der Nutzdaten (JSON) aller
+                Elemente; das erste Element wird immer zurückgegeben
+            
+        Returns:
+            Liste der übernommenen Elemente (nach Priorität und Erstellungszeitpunkt)
+        """
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        items = []
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("""
+            SELECT * FROM sync_items
+            WHERE status = ?
+            ORDER BY priority DESC, created_at ASC
+            LIMIT ?
+            """, (SyncItemStatus.PENDING.value, max_items))
+            
+            size = 0
+            for row in cursor.fetchall():
+                size += len(row["data"])
+                if items and max_bytes is not None and size > max_bytes:
+                    break
+                
+                # Konvertiere Zeile in Dictionary
+                item_dict = dict(row)
+                item_dict["data"] = json.loads(item_dict["data"])
+                item_dict["metadata"] = json.loads(item_dict["metadata"])
+                
+                item = SyncItem.from_dict(item_dict)
+                item.update_status(SyncItemStatus.PROCESSING)
+                # Ab hier kann das Element beim Server angekommen sein
+                item.metadata["claimed"] = True
+                items.append(item)
+            
+            cursor.executemany(
+                "UPDATE sync_items SET status = ?, updated_at = ?, metadata = ? WHERE item_id = ?",
+                [(item.status.value, item.updated_at.isoformat(), json.dumps(item.metadata), item.item_id)
+                 for item in items]
+            )
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        
+        for item in items:
+            self._notify_listeners("updated", item)
+        
+        return items
+    
+    def reset_processing_items(self) -> int:
+        """
+        Setzt Elemente, die beim letzten Lauf in Bearbeitung geblieben sind
+        (z.B. nach einem Absturz), auf ausstehend zurück.
+        
+        Returns:
+            Anzahl der zurückgesetzten Elemente
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+        UPDATE sync_items SET status = ?, updated_at = ?
+        WHERE status = ?
+        """, (SyncItemStatus.PENDING.value, datetime.now().isoformat(), SyncItemStatus.PROCESSING.value))
+        
+        reset_count = cursor.rowcount
+        conn.commit()
+        conn.close()
+        
+        if reset_count:
+            logger.info(f"{reset_count} Elemente in Bearbeitung auf ausstehend zurückgesetzt")
+        
+        return reset_count
+    
     def mark_as_processing(self, item_id: str) -> bool:
         """
         Markiert ein Element als in Bearbeitung.
@@ -616,9 +754,44 @@ class SyncQueue:
             items.append(SyncItem.from_dict(item_dict))
         
         conn.close()
-        
+
         return items
     
+    def get_pending_item(self, entity_type: str, entity_id: str, operation: str) -> Optional[SyncItem]:
+        """
+        Holt das jüngste ausstehende Element einer Entität mit der angegebenen Operation.
+        
+        Args:
+            entity_type: Typ der Entität
+            entity_id: ID der Entität
+            operation: Operation (z.B. "delta")
+        
+        Returns:
+            Das gefundene Element oder None, wenn keins aussteht
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+        SELECT * FROM sync_items
+        WHERE entity_type = ? AND entity_id = ? AND operation = ? AND status = ?
+        ORDER BY created_at DESC
+        LIMIT 1
+        """, (entity_type, entity_id, operation, SyncItemStatus.PENDING.value))
+        row = cursor.fetchone()
+        
+        conn.close()
+        
+        if row:
+            item_dict = dict(row)
+            item_dict["data"] = json.loads(item_dict["data"])
+            item_dict["metadata"] = json.loads(item_dict["metadata"])
+            
+            return SyncItem.from_dict(item_dict)
+        
+        return None
+    
     def clear_completed_items(self, older_than: Optional[datetime] = None) -> int:
         """
         Löscht abgeschlossene Elemente aus der Warteschlange.
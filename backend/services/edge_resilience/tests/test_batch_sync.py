@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Unit-Tests für die gebündelte Synchronisation.
+"""
+
+import asyncio
+import os
+import tempfile
+import unittest
+
+from ..batch_sync import BatchSynchronizer, SimulatedTransport, decode_envelope
+from ..sync_queue import SyncQueue, SyncItem, SyncItemStatus, SyncItemPriority
+
+class FlakySimulator:
+    """Verwirft die ersten ``drops`` Pakete, danach feste Latenz."""
+
+    def __init__(self, latency: float = 0.0, drops: int = 0):
+        self.latency = latency
+        self.drops = drops
+
+    def should_drop_packet(self) -> bool:
+        if self.drops:
+            self.drops -= 1
+            return True
+        return False
+
+    async def simulate_latency(self) -> int:
+        await asyncio.sleep(self.latency)
+        return int(self.latency * 1000)
+
+class TestBatchSynchronizer(unittest.IsolatedAsyncioTestCase):
+    """Test-Klasse für den BatchSynchronizer."""
+
+    def setUp(self):
+        """Setup für Tests."""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False).name
+        self.queue = SyncQueue(self.temp_db)
+        self.envelopes = []
+        self.applied = set()
+
+    def tearDown(self):
+        """Aufräumen nach Tests."""
+        if os.path.exists(self.temp_db):
+            os.unlink(self.temp_db)
+
+    def server(self, payload: bytes):
+        """Server, der Elemente idempotent übernimmt und 'bad'-Elemente ablehnt."""
+        envelope = decode_envelope(payload)
+        self.envelopes.append(envelope)
+        results = {}
+        for item in envelope["items"]:
+            if item["data"].get("bad"):
+                results[item["item_id"]] = {"status": "error", "message": "ungültig"}
+            elif item["data"].get("stale"):
+                results[item["item_id"]] = {"status": "conflict"}
+            else:
+                self.applied.add(item["item_id"])
+                results[item["item_id"]] = {"status": "ok"}
+        return {"envelope_id": envelope["envelope_id"], "results": results}
+
+    def add_items(self, count: int, **data):
+        return [
+            self.queue.add_item(SyncItem(
+                entity_type="product",
+                entity_id=f"P{i}",
+                operation="update",
+                data={"name": f"Produkt {i}", **data}
+            ))
+            for i in range(count)
+        ]
+
+    async def test_items_are_packed_and_acknowledged_per_item(self):
+        ok_ids = self.add_items(45)
+        bad_id = self.queue.add_item(SyncItem(entity_type="product", entity_id="X", operation="update",
+                                              data={"bad": True}))
+        stale_id = self.queue.add_item(SyncItem(entity_type="product", entity_id="Y", operation="update",
+                                                data={"stale": True}, priority=SyncItemPriority.HIGH))
+
+        sync = BatchSynchronizer(self.queue, SimulatedTransport(self.server), max_items=10,
+                                 max_in_flight=3, retry_backoff=0)
+        stats = await sync.sync_pending()
+
+        # 47 Elemente in Umschlägen zu höchstens 10 Elementen, Priorität zuerst
+        self.assertTrue(all(len(e["items"]) <= 10 for e in self.envelopes))
+        self.assertEqual(self.envelopes[0]["items"][0]["item_id"], stale_id)
+        self.assertEqual(self.applied, set(ok_ids))
+        self.assertEqual(self.queue.get_queue_stats()["completed"], 45)
+        self.assertEqual(self.queue.get_item(stale_id).status, SyncItemStatus.CONFLICT)
+
+        # Nur das abgelehnte Element wird wiederholt, bis max_retries erreicht ist
+        bad = self.queue.get_item(bad_id)
+        self.assertEqual(bad.status, SyncItemStatus.FAILED)
+        self.assertEqual(bad.retry_count, bad.max_retries)
+        self.assertEqual(stats["items_sent"], 47 + bad.max_retries)
+
+    async def test_byte_limit_splits_envelopes(self):
+        self.add_items(20, payload="x" * 1000)
+
+        sync = BatchSynchronizer(self.queue, SimulatedTransport(self.server), max_items=100,
+                                 max_bytes=5000, max_in_flight=1)
+        await sync.sync_pending()
+
+        self.assertEqual([len(e["items"]) for e in self.envelopes], [4, 4, 4, 4, 4])
+
+    async def test_lost_envelope_is_resent(self):
+        ids = self.add_items(30)
+        transport = SimulatedTransport(self.server, FlakySimulator(drops=1), timeout=0.01)
+
+        sync = BatchSynchronizer(self.queue, transport, max_items=10, max_in_flight=3, retry_backoff=0)
+        stats = await sync.sync_pending()
+
+        self.assertEqual(stats["transport_errors"], 1)
+        self.assertEqual(stats["items_sent"], 40)
+        self.assertEqual(self.applied, set(ids))
+        self.assertEqual(self.queue.get_queue_stats()["completed"], 30)
+
+    async def test_schedule_collects_items_until_max_delay(self):
+        sync = BatchSynchronizer(self.queue, SimulatedTransport(self.server), max_items=50, max_delay=0.05)
+        self.queue.register_listener("added", lambda item: sync.schedule())
+
+        self.add_items(5)
+        self.assertEqual(self.envelopes, [])
+        await asyncio.sleep(0.2)
+
+        self.assertEqual(len(self.envelopes), 1)
+        self.assertEqual(len(self.envelopes[0]["items"]), 5)
+        await sync.close()
+
+if __name__ == '__main__':
+    unittest.main()
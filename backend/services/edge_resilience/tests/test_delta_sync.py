@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Unit-Tests für die Delta-Synchronisation.
+"""
+
+import os
+import tempfile
+import unittest
+
+from ..batch_sync import BatchSynchronizer, SimulatedTransport, encode_envelope, decode_envelope
+from ..delta_sync import CentralSyncStore, DeltaTracker, HybridLogicalClock, vv_compare
+from ..sync_queue import SyncQueue, SyncItemStatus
+
+class TestVersionVector(unittest.TestCase):
+    """Test-Klasse für den Vergleich von Versionsvektoren."""
+
+    def test_compare(self):
+        self.assertEqual(vv_compare({"a": 1}, {"a": 1}), "equal")
+        self.assertEqual(vv_compare({"a": 2, "b": 1}, {"a": 1}), "after")
+        self.assertEqual(vv_compare({"a": 1}, {"a": 1, "b": 1}), "before")
+        self.assertEqual(vv_compare({"a": 2}, {"a": 1, "b": 1}), "concurrent")
+
+class TestDeltaSync(unittest.IsolatedAsyncioTestCase):
+    """Test-Klasse für DeltaTracker und CentralSyncStore."""
+
+    def setUp(self):
+        """Setup für Tests."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = CentralSyncStore(os.path.join(self.temp_dir.name, "central.db"))
+
+    def tearDown(self):
+        """Aufräumen nach Tests."""
+        self.temp_dir.cleanup()
+
+    def node(self, node_id: str) -> DeltaTracker:
+        queue = SyncQueue(os.path.join(self.temp_dir.name, f"{node_id}.db"))
+        return DeltaTracker(queue, node_id, commutative_fields={"inventory": ["stock"]})
+
+    async def push(self, tracker: DeltaTracker):
+        sync = BatchSynchronizer(tracker.sync_queue, SimulatedTransport(self.store.handle_batch), retry_backoff=0)
+        return await sync.sync_pending()
+
+    async def fetch(self, since: int, limit: int, node_id: str):
+        return self.store.changes_since(since, limit, node_id)
+
+    async def test_changes_are_coalesced_into_one_delta(self):
+        tracker = self.node("kasse-1")
+        item_id = tracker.record_change("inventory", "A1", {"name": "Weizen", "stock": 100, "unit": "t"})
+        self.assertEqual(tracker.record_change("inventory", "A1", {"name": "Weizen", "stock": 97, "unit": "t"}), item_id)
+        tracker.record_change("inventory", "A1", {"name": "Weizen", "stock": 95})
+        self.assertIsNone(tracker.record_change("inventory", "A1", {"name": "Weizen", "stock": 95}))
+
+        items = tracker.sync_queue.get_items_by_status(SyncItemStatus.PENDING)
+        self.assertEqual(len(items), 1)
+        delta = items[0].data
+        self.assertEqual(delta["set"], {"name": "Weizen", "stock": 95})
+        self.assertEqual(delta["unset"], ["unit"])
+        self.assertEqual(delta["vv"], {"kasse-1": 3})
+
+    async def test_concurrent_changes_are_merged(self):
+        edge_a, edge_b = self.node("kasse-1"), self.node("kasse-2")
+        edge_a.record_change("inventory", "A1", {"name": "Weizen", "stock": 100})
+        await self.push(edge_a)
+        await edge_b.pull(self.fetch)
+
+        # Beide Knoten buchen offline ab, Knoten B benennt zusätzlich um
+        edge_a.record_change("inventory", "A1", {"name": "Weizen A", "stock": 97})
+        edge_b.record_change("inventory", "A1", {"name": "Weizen B", "stock": 95})
+        await self.push(edge_a)
+        await self.push(edge_b)
+
+        entity = self.store.get_entity("inventory", "A1")
+        self.assertEqual(entity["stock"], 92)
+        self.assertEqual(entity["name"], "Weizen B")
+
+        # Knoten A lädt den zusammengeführten Stand und rechnet ein neues, lokales Delta ein
+        edge_a.record_change("inventory", "A1", {"name": "Weizen A", "stock": 96})
+        updated = await edge_a.pull(self.fetch)
+        self.assertEqual(updated[("inventory", "A1")], {"name": "Weizen B", "stock": 91})
+        self.assertEqual(await edge_a.pull(self.fetch), {})
+
+    async def test_causally_later_change_wins_despite_clock_skew(self):
+        edge_a, edge_b = self.node("kasse-1"), self.node("kasse-2")
+        edge_a.record_change("customer", "K1", {"name": "Meyer"})
+        await self.push(edge_a)
+        await edge_b.pull(self.fetch)
+
+        # Die Uhr von Knoten B geht falsch, er kennt aber den Stand von A
+        edge_b.clock = HybridLogicalClock("kasse-2", wall_clock=lambda: 0)
+        edge_b.record_change("customer", "K1", {"name": "Meier"})
+        await self.push(edge_b)
+
+        self.assertEqual(self.store.get_entity("customer", "K1"), {"name": "Meier"})
+
+    async def test_feed_returns_only_changes_since_watermark(self):
+        edge_a, edge_b = self.node("kasse-1"), self.node("kasse-2")
+        for i in range(5):
+            edge_a.record_change("customer", f"K{i}", {"name": f"Kunde {i}"})
+        await self.push(edge_a)
+
+        self.assertEqual(len(await edge_b.pull(self.fetch, limit=2)), 5)
+        self.assertEqual(edge_b.watermark, 5)
+        self.assertEqual(await edge_b.pull(self.fetch), {})
+
+        edge_a.record_change("customer", "K3", {"name": "Kunde 3", "city": "Celle"})
+        edge_a.record_delete("customer", "K4")
+        await self.push(edge_a)
+        updated = await edge_b.pull(self.fetch)
+        self.assertEqual(updated, {("customer", "K3"): {"name": "Kunde 3", "city": "Celle"}, ("customer", "K4"): None})
+
+    async def test_resent_envelope_does_not_apply_increments_twice(self):
+        edge_a = self.node("kasse-1")
+        edge_a.record_change("inventory", "A1", {"stock": 10})
+        await self.push(edge_a)
+        edge_a.record_change("inventory", "A1", {"stock": 7})
+
+        items = edge_a.sync_queue.get_items_by_status(SyncItemStatus.PENDING)
+        payload = encode_envelope("env-1", items)
+        self.store.handle_batch(payload)
+        response = self.store.handle_batch(payload)
+
+        self.assertTrue(response["results"][items[0].item_id]["duplicate"])
+        self.assertEqual(self.store.get_entity("inventory", "A1"), {"stock": 7})
+        self.assertEqual(decode_envelope(payload)["items"][0]["data"]["incr"], {"stock": -3})
+
+    async def test_change_after_lost_response_reaches_server(self):
+        edge_a = self.node("kasse-1")
+        edge_a.record_change("inventory", "A1", {"stock": 10})
+        await self.push(edge_a)
+
+        # Der Server übernimmt den Umschlag, die Antwort geht verloren, danach ist der Knoten offline
+        online = [True]
+
+        def lose_response(payload):
+            self.store.handle_batch(payload)
+            online[0] = False
+            raise ConnectionError("Antwort verloren")
+
+        edge_a.record_change("inventory", "A1", {"stock": 7})
+        sync = BatchSynchronizer(edge_a.sync_queue, SimulatedTransport(lose_response), retry_backoff=0,
+                                 is_online=lambda: online[0])
+        self.assertEqual((await sync.sync_pending())["retried"], 1)
+        self.assertEqual(self.store.get_entity("inventory", "A1"), {"stock": 7})
+
+        # Die neue Änderung darf nicht in das bereits angekommene Element einfließen
+        edge_a.record_change("inventory", "A1", {"stock": 4})
+        self.assertEqual(len(edge_a.sync_queue.get_items_by_status(SyncItemStatus.PENDING)), 2)
+        await self.push(edge_a)
+
+        self.assertEqual(self.store.get_entity("inventory", "A1"), {"stock": 4})
+        self.assertEqual(edge_a.sync_queue.get_items_by_status(SyncItemStatus.PENDING), [])
+
+if __name__ == '__main__':
+    unittest.main()
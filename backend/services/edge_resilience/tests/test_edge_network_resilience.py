@@ -229,17 +229,17 @@ class TestEdgeNetworkResilience(unittest.TestCase):
         item = self.framework.get_sync_item(item_id)
         
         # Manuell den Handler aufrufen
-        with patch.object(self.framework, '_process_sync_item') as mock_process:
-            # Im Online-Modus sollte das Element verarbeitet werden
+        with patch.object(self.framework.batch_sync, 'schedule') as mock_schedule:
+            # Im Online-Modus sollte eine gebündelte Synchronisation geplant werden
             self.framework._handle_sync_item_added(item)
-            mock_process.assert_called_once_with(item)
+            mock_schedule.assert_called_once_with()
             
-            mock_process.reset_mock()
+            mock_schedule.reset_mock()
             
-            # Im Offline-Modus sollte das Element nicht verarbeitet werden
+            # Im Offline-Modus sollte nichts geplant werden
             self.framework.offline_manager.set_network_status(NetworkStatus.OFFLINE)
             self.framework._handle_sync_item_added(item)
-            mock_process.assert_not_called()
+            mock_schedule.assert_not_called()
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -5,8 +5,11 @@ Dieser Service ermöglicht den Export von komplexen Tabellenstrukturen nach Exce
 mit Unterstützung für Formatierung, Hierarchien und Pivot-Tabellen.
 """
 
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+import asyncio
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Any, Sequence
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from pydantic import BaseModel, Field
 import openpyxl
@@ -15,6 +18,12 @@ from openpyxl.worksheet.table import Table, TableStyleInfo
 from celery import Task
 from redis import Redis
 
+from backend.services.report_engine import RowSource, query_source, records_source, write_rows, write_sheet_parts
+
+EXPORT_DIR = "exports"
+# Zeilen zwischen zwei Fortschrittsmeldungen
+PROGRESS_CHUNK_ROWS = 10000
+
 # Pydantic Models
 class ExportConfig(BaseModel):
     """Konfiguration für den Excel-Export"""
@@ -98,27 +107,27 @@ class ExcelExportTask(Task):
             self.redis_client.set(f"export_job:{job_id}", job.json())
 
 async def process_export(job: ExportJob):
-    """Verarbeitet einen Excel-Export"""
+    """
+    Verarbeitet einen Excel-Export.
+
+    Die Zeilen werden per Server-Side-Cursor gelesen und in ein write-only
+    Workbook geschrieben, damit der Speicherbedarf nicht mit der Tabellengröße
+    wächst. Der Fortschritt wird blockweise in Redis aktualisiert.
+    """
+    redis_client = Redis()
     try:
-        # Workbook erstellen
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        
-        if job.config.sheet_name:
-            ws.title = job.config.sheet_name
-            
-        # Daten laden und formatieren
-        data = await load_table_data(job.config.table_id)
-        await format_worksheet(ws, data, job.config)
-        
-        # Pivot-Tabellen
-        if job.config.include_pivot:
-            await create_pivot_tables(wb, data)
-            
-        # Speichern
-        file_path = f"exports/{job.id}.{job.config.format}"
-        wb.save(file_path)
-        
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        file_path = os.path.join(EXPORT_DIR, f"{job.id}.{job.config.format}")
+        job.status = "running"
+
+        def progress(rows_written: int, total: Optional[int]):
+            if total:
+                job.progress = round(min(rows_written / total, 1.0) * 95, 1)
+            redis_client.set(f"export_job:{job.id}", job.json())
+
+        # Schreiben blockiert, daher außerhalb der Event-Loop
+        await asyncio.to_thread(write_export, file_path, job.config, progress)
+
         # Job aktualisieren
         job.status = "completed"
         job.completed_at = datetime.now()
@@ -130,13 +139,132 @@ async def process_export(job: ExportJob):
         job.error = str(e)
         
     finally:
-        redis_client = Redis()
         redis_client.set(f"export_job:{job.id}", job.json())
 
+def write_export(file_path: str, config: ExportConfig, progress=None) -> int:
+    """
+    Schreibt den Export einer Tabelle in eine Datei.
+
+    Mehr Zeilen als ein Blatt fasst werden wie bei ``write_workbook`` auf
+    Folgeblättern ("Name (2)", ...) fortgesetzt.
+
+    Returns:
+        Anzahl der exportierten Zeilen
+    """
+    source = stream_table_data(config.table_id)
+    wb = openpyxl.Workbook(write_only=True)
+
+    pivot = _PivotAccumulator(source.columns) if config.include_pivot else None
+    rows = pivot.observe(source.rows) if pivot is not None else source.rows
+
+    def on_chunk(written: int, sheet: str):
+        if progress is not None:
+            progress(written, source.total)
+
+    counts = write_sheet_parts(
+        wb, config.sheet_name or config.table_id, [_header(column) for column in source.columns], rows,
+        on_chunk=on_chunk, chunk_size=PROGRESS_CHUNK_ROWS,
+        cell_factory=_cell_factory(config) if config.include_styles else None
+    )
+    if pivot is not None:
+        pivot.write(wb.create_sheet("Pivot"))
+
+    wb.save(file_path)
+    return sum(counts.values())
+
+def _get_engine():
+    from backend.db.database import engine
+    return engine
+
+def stream_table_data(table_id: str) -> RowSource:
+    """Liefert die Zeilen einer Tabelle als Strom (Server-Side-Cursor)"""
+    from sqlalchemy import Table, MetaData, func, inspect, select
+
+    engine = _get_engine()
+    # Nur existierende Tabellen zulassen; der Name wird nicht in SQL interpoliert
+    if table_id not in inspect(engine).get_table_names():
+        raise ValueError(f"Unbekannte Tabelle: {table_id}")
+
+    table = Table(table_id, MetaData(), autoload_with=engine)
+    with engine.connect() as connection:
+        total = connection.execute(select(func.count()).select_from(table)).scalar()
+    source = query_source(engine, select(table))
+    source.total = total
+    return source
+
 async def load_table_data(table_id: str) -> List[Dict[str, Any]]:
     """Lädt die Tabellendaten aus der Datenbank"""
-    # TODO: Implementierung der Datenbankabfrage
-    pass
+    def load() -> List[Dict[str, Any]]:
+        source = stream_table_data(table_id)
+        return [dict(zip(source.columns, row)) for row in source.rows]
+
+    return await asyncio.to_thread(load)
+
+def _header(column: str) -> str:
+    """Spaltenüberschrift: Kürzel wie "id" groß, sonst erster Buchstabe groß"""
+    return column.upper() if len(column) <= 2 else column.replace("_", " ").capitalize()
+
+def _cell_factory(config: ExportConfig):
+    """Zellen mit Zahlen- und Datumsformat der Konfiguration"""
+    from openpyxl.cell import WriteOnlyCell
+
+    def make_cell(ws, value):
+        if isinstance(value, bool) or not isinstance(value, (int, float, Decimal, date)):
+            return value
+        cell = WriteOnlyCell(ws, value=value)
+        cell.number_format = config.date_format if isinstance(value, date) else config.number_format
+        return cell
+
+    return make_cell
+
+class _PivotAccumulator:
+    """
+    Summiert numerische Spalten je Wert der ersten Textspalte, während die
+    Zeilen geschrieben werden (kein zweiter Durchlauf über die Daten).
+    """
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        self.group_index: Optional[int] = None
+        # Schlüsselspalten (id, *_id) werden nicht summiert
+        self.numeric = {
+            i for i, column in enumerate(self.columns)
+            if column.lower() != "id" and not column.lower().endswith("_id")
+        }
+        self.counts: Dict[Any, int] = {}
+        self.sums: Dict[Any, Dict[int, Any]] = {}
+
+    def observe(self, rows: Iterable[Sequence[Any]]):
+        for row in rows:
+            self.add(row)
+            yield row
+
+    def add(self, row: Sequence[Any]):
+        if self.group_index is None:
+            self.group_index = next((i for i, value in enumerate(row) if isinstance(value, str)), -1)
+            self.numeric.discard(self.group_index)
+
+        key = row[self.group_index] if self.group_index >= 0 else "Gesamt"
+        self.counts[key] = self.counts.get(key, 0) + 1
+        sums = self.sums.setdefault(key, {})
+        for i in list(self.numeric):
+            value = row[i]
+            if value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float, Decimal)):
+                self.numeric.discard(i)
+                continue
+            sums[i] = sums.get(i, 0) + value
+
+    def write(self, ws):
+        group = self.columns[self.group_index] if self.group_index not in (None, -1) else "Gruppe"
+        value_indices = sorted(self.numeric)
+        headers = [_header(group), "Anzahl"] + [f"Summe {_header(self.columns[i])}" for i in value_indices]
+        rows = (
+            [key, count] + [self.sums[key].get(i, 0) for i in value_indices]
+            for key, count in self.counts.items()
+        )
+        write_rows(ws, headers, rows)
 
 async def format_worksheet(
     ws: openpyxl.worksheet.worksheet.Worksheet,
@@ -144,13 +272,23 @@ async def format_worksheet(
     config: ExportConfig
 ):
     """Formatiert ein Worksheet mit den gegebenen Daten"""
-    # TODO: Implementierung der Excel-Formatierung
-    pass
+    source = records_source(data)
+    if source is None:
+        raise ValueError("Nicht unterstütztes Datenformat")
+    write_rows(
+        ws, [_header(column) for column in source.columns], source.rows,
+        cell_factory=_cell_factory(config) if config.include_styles else None
+    )
 
 async def create_pivot_tables(
     wb: openpyxl.workbook.workbook.Workbook,
     data: List[Dict[str, Any]]
 ):
     """Erstellt Pivot-Tabellen aus den Daten"""
-    # TODO: Implementierung der Pivot-Tabellen
-    pass 
\ No newline at end of file
+    source = records_source(data)
+    if source is None:
+        raise ValueError("Nicht unterstütztes Datenformat")
+    pivot = _PivotAccumulator(source.columns)
+    for row in source.rows:
+        pivot.add(row)
+    pivot.write(wb.create_sheet("Pivot"))
@@ -5,7 +5,7 @@ Kombiniert FAISS Vektorsuche mit MongoDB Metadaten-Verwaltung
 
 import faiss
 import numpy as np
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Sequence, Set, Iterable
 from datetime import datetime
 from pymongo import MongoClient
 import logging
@@ -13,21 +13,32 @@ from pathlib import Path
 import pickle
 import os
 
+# Metadatenfelder, für die ein In-Memory-Index für gefilterte Suchen gepflegt wird
+DEFAULT_FILTER_FIELDS = ("doc_type", "tenant_id")
+
 class FaissWithMetadataManager:
     """
     Kombiniert FAISS-Vektorsuche mit Metadaten aus MongoDB.
     - add_document(doc_id, embedding): Dokument/Embedding hinzufügen
-    - build_index(): Index nach dem Hinzufügen aufbauen
+    - remove_document(doc_id): Dokument aus Index und MongoDB entfernen
+    - build_index(): Neu hinzugefügte Embeddings inkrementell indexieren
     - search(query_vector, k): Ähnliche Dokumente inkl. Metadaten finden
+
+    Die Vektoren liegen in einem ``IndexIDMap2`` mit stabilen int64-IDs je
+    Dokument. Filter werden vor der Vektorsuche als ID-Selektor angewendet, so
+    dass gefilterte Suchen k Treffer aus der gefilterten Menge liefern. Für die
+    Felder in ``filter_fields`` wird dafür ein Metadaten-Index im Speicher
+    gehalten; andere Filter kosten eine MongoDB-Abfrage.
     """
     def __init__(
-        self, 
-        dim: int, 
+        self,
+        dim: int,
         mongo_uri: str = "mongodb://localhost:27017",
         db_name: str = "valeo_neuroerp",
         collection: str = "documents",
         index_path: str = "./data/faiss_db",
-        metadata_path: str = "./data/faiss_metadata"
+        metadata_path: str = "./data/faiss_metadata",
+        filter_fields: Sequence[str] = DEFAULT_FILTER_FIELDS
     ):
         """
         Initialisiert den FAISS Metadata Manager.
@@ -39,12 +50,20 @@ class FaissWithMetadataManager:
             collection: Name der Collection
             index_path: Pfad zum FAISS Index
             metadata_path: Pfad zu den Metadaten
+            filter_fields: Metadatenfelder mit In-Memory-Index für Filter
         """
         # FAISS Setup
         self.dim = dim
-        self.index = faiss.IndexFlatL2(dim)
-        self.embeddings: List[np.ndarray] = []
-        self.doc_ids: List[str] = []
+        self.index = self._new_index()
+        self.pending: Dict[str, np.ndarray] = {}
+        self.doc_ids: Dict[int, str] = {}
+        self.id_map: Dict[str, int] = {}
+        self.next_id = 0
+        
+        # Metadaten-Index: Feld -> Wert -> FAISS-IDs
+        self.filter_fields = tuple(filter_fields)
+        self.partitions: Dict[str, Dict[Any, Set[int]]] = {field: {} for field in self.filter_fields}
+        self.pending_metadata: Dict[str, Dict[str, Any]] = {}
         
         # Pfade Setup
         self.index_path = Path(index_path)
@@ -58,7 +77,8 @@ class FaissWithMetadataManager:
             self.collection = self.client[db_name][collection]
             # Erstelle Indizes für bessere Performance
             self.collection.create_index([("timestamp", -1)])
-            self.collection.create_index([("doc_type", 1)])
+            for field in self.filter_fields:
+                self.collection.create_index([(field, 1)])
             self.collection.create_index([("title", "text"), ("content", "text")])
         except Exception as e:
             logging.error(f"MongoDB Verbindungsfehler: {str(e)}")
@@ -70,20 +90,26 @@ class FaissWithMetadataManager:
         # Lade existierenden Index falls vorhanden
         self._load_if_exists()
 
+    def _new_index(self) -> faiss.IndexIDMap2:
+        return faiss.IndexIDMap2(faiss.IndexFlatL2(self.dim))
+
     def add_document(
-        self, 
-        doc_id: str, 
+        self,
+        doc_id: str,
         embedding: Union[List[float], np.ndarray],
         metadata: Dict[str, Any]
     ) -> bool:
         """
         Fügt ein Dokument mit Embedding und Metadaten hinzu.
         
+        Das Embedding wird mit dem nächsten ``build_index`` indexiert; ein
+        bereits indexiertes Dokument wird dabei ersetzt.
+        
         Args:
             doc_id: Eindeutige Dokument-ID
             embedding: Embedding Vektor
             metadata: Zusätzliche Metadaten
-            
+        
         Returns:
             bool: True wenn erfolgreich
         """
@@ -107,44 +133,135 @@ class FaissWithMetadataManager:
                 upsert=True
             )
             
-            # Zum FAISS Index hinzufügen
-            self.embeddings.append(embedding_array)
-            self.doc_ids.append(doc_id)
+            # Für den nächsten build_index vormerken
+            self.pending[doc_id] = embedding_array
+            self.pending_metadata[doc_id] = {
+                field: metadata[field] for field in self.filter_fields if field in metadata
+            }
             
             self.logger.info(f"Dokument {doc_id} erfolgreich hinzugefügt")
             return True
-            
+        
         except Exception as e:
             self.logger.error(f"Fehler beim Hinzufügen von Dokument {doc_id}: {str(e)}")
             return False
 
     def build_index(self) -> bool:
         """
-        Baut den FAISS Index neu auf.
+        Indexiert die seit dem letzten Aufruf hinzugefügten Embeddings
+        (``add_with_ids``) und speichert den Zustand.
         
         Returns:
             bool: True wenn erfolgreich
         """
         try:
-            if not self.embeddings:
+            if not self.pending:
                 self.logger.warning("Keine Embeddings zum Indexieren vorhanden")
                 return False
-                
-            vectors = np.vstack(self.embeddings)
-            self.index.add(vectors)
+            
+            # Ersetzte Dokumente zuerst entfernen
+            replaced = [self.id_map[doc_id] for doc_id in self.pending if doc_id in self.id_map]
+            if replaced:
+                self._remove_ids(replaced)
+            
+            ids = np.arange(self.next_id, self.next_id + len(self.pending), dtype='int64')
+            self.next_id += len(self.pending)
+            for faiss_id, doc_id in zip(ids.tolist(), self.pending):
+                self.doc_ids[faiss_id] = doc_id
+                self.id_map[doc_id] = faiss_id
+                self._index_metadata(faiss_id, self.pending_metadata.get(doc_id, {}))
+            
+            self.index.add_with_ids(np.vstack(list(self.pending.values())), ids)
+            added = len(self.pending)
+            self.pending = {}
+            self.pending_metadata = {}
             
             # Index und Metadaten speichern
             self._save_state()
             
-            self.logger.info(f"Index mit {len(self.embeddings)} Vektoren erfolgreich erstellt")
+            self.logger.info(f"{added} Vektoren indexiert, Index enthält {self.index.ntotal} Vektoren")
             return True
-            
+        
         except Exception as e:
             self.logger.error(f"Fehler beim Erstellen des Index: {str(e)}")
             return False
 
+    def remove_document(self, doc_id: str) -> bool:
+        """
+        Entfernt ein Dokument aus Index, Metadaten-Index und MongoDB.
+        
+        Args:
+            doc_id: Dokument-ID
+        
+        Returns:
+            bool: True wenn das Dokument vorhanden war
+        """
+        try:
+            self.pending.pop(doc_id, None)
+            self.pending_metadata.pop(doc_id, None)
+            deleted = self.collection.delete_one({"_id": doc_id}).deleted_count > 0
+            
+            if doc_id in self.id_map:
+                self._remove_ids([self.id_map[doc_id]])
+                self._save_state()
+                deleted = True
+            
+            return deleted
+        
+        except Exception as e:
+            self.logger.error(f"Fehler beim Entfernen von Dokument {doc_id}: {str(e)}")
+            return False
+
+    def _remove_ids(self, faiss_ids: List[int]):
+        """Entfernt Vektoren samt Zuordnungen (``remove_ids``)"""
+        self.index.remove_ids(np.array(faiss_ids, dtype='int64'))
+        for faiss_id in faiss_ids:
+            doc_id = self.doc_ids.pop(faiss_id)
+            del self.id_map[doc_id]
+            for values in self.partitions.values():
+                for ids in values.values():
+                    ids.discard(faiss_id)
+
+    def _index_metadata(self, faiss_id: int, metadata: Dict[str, Any]):
+        """Trägt die Filterfelder eines Dokuments in den Metadaten-Index ein"""
+        for field in self.filter_fields:
+            if field not in metadata:
+                continue
+            value = metadata[field]
+            # Arrays matchen in MongoDB auf jedes Element
+            for item in value if isinstance(value, (list, tuple, set)) else [value]:
+                self.partitions[field].setdefault(item, set()).add(faiss_id)
+
+    def _candidate_ids(self, filter_criteria: Dict[str, Any]) -> Set[int]:
+        """
+        Ermittelt die FAISS-IDs, die einem Filter entsprechen.
+        
+        Gleichheits- und ``$in``-Bedingungen auf ``filter_fields`` werden aus dem
+        Metadaten-Index beantwortet, alle anderen Filter mit einer MongoDB-Abfrage.
+        """
+        candidates: Optional[Set[int]] = None
+        for field, condition in filter_criteria.items():
+            if field not in self.partitions:
+                break
+            if isinstance(condition, dict):
+                if set(condition) != {"$in"}:
+                    break
+                values: Iterable[Any] = condition["$in"]
+            else:
+                values = [condition]
+            matched: Set[int] = set()
+            for value in values:
+                matched |= self.partitions[field].get(value, set())
+            candidates = matched if candidates is None else candidates & matched
+        else:
+            return candidates if candidates is not None else set(self.doc_ids)
+        
+        # Fallback: eine Abfrage für alle passenden Dokumente
+        cursor = self.collection.find(filter_criteria, {"_id": 1})
+        return {self.id_map[doc["_id"]] for doc in cursor if doc["_id"] in self.id_map}
+
     def search(
-        self, 
+        self,
         query_vector: Union[List[float], np.ndarray],
         k: int = 5,
         filter_criteria: Optional[Dict[str, Any]] = None
@@ -156,31 +273,51 @@ class FaissWithMetadataManager:
             query_vector: Suchanfrage als Embedding
             k: Anzahl der Ergebnisse
             filter_criteria: MongoDB Filter für Metadaten
-            
+        
         Returns:
             List[Dict]: Liste der gefundenen Dokumente mit Metadaten
         """
         try:
+            if self.index.ntotal == 0:
+                return []
+            
             query = np.array(query_vector).astype('float32').reshape(1, -1)
-            distances, indices = self.index.search(query, k)
+            
+            if filter_criteria:
+                # Filter vor der Vektorsuche anwenden
+                candidates = self._candidate_ids(filter_criteria)
+                if not candidates:
+                    return []
+                selector = faiss.IDSelectorBatch(np.fromiter(candidates, dtype='int64', count=len(candidates)))
+                distances, indices = self.index.search(
+                    query, min(k, len(candidates)), params=faiss.SearchParameters(sel=selector)
+                )
+            else:
+                distances, indices = self.index.search(query, min(k, self.index.ntotal))
+            
+            hits = [
+                (self.doc_ids[idx], float(distance))
+                for idx, distance in zip(indices[0].tolist(), distances[0].tolist())
+                if idx in self.doc_ids
+            ]
+            if not hits:
+                return []
+            
+            # Metadaten aller Treffer mit einer Abfrage laden
+            mongo_query: Dict[str, Any] = {"_id": {"$in": [doc_id for doc_id, _ in hits]}}
+            if filter_criteria:
+                mongo_query = {"$and": [mongo_query, filter_criteria]}
+            docs = {doc["_id"]: doc for doc in self.collection.find(mongo_query)}
             
             results = []
-            for idx, distance in zip(indices[0], distances[0]):
-                if idx < len(self.doc_ids):
-                    doc_id = self.doc_ids[idx]
-                    
-                    # MongoDB Abfrage mit optionalem Filter
-                    mongo_query = {"_id": doc_id}
-                    if filter_criteria:
-                        mongo_query.update(filter_criteria)
-                        
-                    doc = self.collection.find_one(mongo_query)
-                    if doc:
-                        doc["similarity_score"] = float(1 / (1 + distance))
-                        results.append(doc)
+            for doc_id, distance in hits:
+                doc = docs.get(doc_id)
+                if doc:
+                    doc["similarity_score"] = float(1 / (1 + distance))
+                    results.append(doc)
             
             return results
-            
+        
         except Exception as e:
             self.logger.error(f"Fehler bei der Suche: {str(e)}")
             return []
@@ -188,20 +325,30 @@ class FaissWithMetadataManager:
     def _save_state(self):
         """Speichert den aktuellen Zustand des Index und der Metadaten."""
         try:
+            # Erst in temporäre Dateien schreiben, damit Index und Metadaten konsistent bleiben
+            index_tmp = f"{self.index_path}.tmp"
+            metadata_tmp = f"{self.metadata_path}.tmp"
+            
             # FAISS Index speichern
-            faiss.write_index(self.index, str(self.index_path))
+            faiss.write_index(self.index, index_tmp)
             
             # Metadata speichern
             metadata = {
                 "doc_ids": self.doc_ids,
+                "next_id": self.next_id,
                 "dim": self.dim,
+                "filter_fields": self.filter_fields,
+                "partitions": self.partitions,
                 "timestamp": datetime.utcnow()
             }
-            with open(self.metadata_path, 'wb') as f:
+            with open(metadata_tmp, 'wb') as f:
                 pickle.dump(metadata, f)
-                
-            self.logger.info("Index und Metadaten erfolgreich gespeichert")
             
+            os.replace(index_tmp, self.index_path)
+            os.replace(metadata_tmp, self.metadata_path)
+            
+            self.logger.info("Index und Metadaten erfolgreich gespeichert")
+        
         except Exception as e:
             self.logger.error(f"Fehler beim Speichern des Zustands: {str(e)}")
 
@@ -209,57 +356,109 @@ class FaissWithMetadataManager:
         """Lädt existierenden Index und Metadaten falls vorhanden."""
         try:
             if self.index_path.exists() and self.metadata_path.exists():
-                # FAISS Index laden
-                self.index = faiss.read_index(str(self.index_path))
-                
                 # Metadata laden
                 with open(self.metadata_path, 'rb') as f:
                     metadata = pickle.load(f)
-                    
-                self.doc_ids = metadata["doc_ids"]
+                
                 if metadata["dim"] != self.dim:
                     raise ValueError("Dimensionalität stimmt nicht überein")
-                    
-                self.logger.info("Existierender Index und Metadaten geladen")
                 
+                # FAISS Index laden
+                index = faiss.read_index(str(self.index_path))
+                doc_ids = metadata["doc_ids"]
+                
+                if isinstance(doc_ids, list):
+                    # Altes Format: Positionen im IndexFlatL2 als IDs übernehmen
+                    vectors = index.reconstruct_n(0, index.ntotal) if index.ntotal else None
+                    index = self._new_index()
+                    if vectors is not None:
+                        index.add_with_ids(vectors, np.arange(len(vectors), dtype='int64'))
+                    doc_ids = dict(enumerate(doc_ids[:index.ntotal]))
+                
+                self.index = index
+                self.doc_ids = doc_ids
+                self.id_map = {doc_id: faiss_id for faiss_id, doc_id in doc_ids.items()}
+                self.next_id = metadata.get("next_id", max(doc_ids, default=-1) + 1)
+                
+                if tuple(metadata.get("filter_fields", ())) == self.filter_fields:
+                    self.partitions = metadata["partitions"]
+                else:
+                    self._rebuild_partitions()
+                
+                self.logger.info("Existierender Index und Metadaten geladen")
+        
         except Exception as e:
             self.logger.error(f"Fehler beim Laden des existierenden Zustands: {str(e)}")
             # Bei Fehler neuen Index erstellen
-            self.index = faiss.IndexFlatL2(self.dim)
-            self.doc_ids = []
+            self.index = self._new_index()
+            self.doc_ids = {}
+            self.id_map = {}
+            self.next_id = 0
+            self.partitions = {field: {} for field in self.filter_fields}
 
-    def rebuild_from_mongodb(self) -> bool:
+    def _rebuild_partitions(self):
+        """Baut den Metadaten-Index mit einer MongoDB-Abfrage neu auf."""
+        self.partitions = {field: {} for field in self.filter_fields}
+        projection = {field: 1 for field in self.filter_fields}
+        for doc in self.collection.find({"_id": {"$in": list(self.id_map)}}, projection):
+            self._index_metadata(self.id_map[doc["_id"]], doc)
+
+    def rebuild_from_mongodb(self, batch_size: int = 10000) -> bool:
         """
         Baut den Index neu aus allen MongoDB-Dokumenten auf.
         
+        Args:
+            batch_size: Anzahl der Vektoren pro ``add_with_ids``
+        
         Returns:
             bool: True wenn erfolgreich
         """
         try:
-            self.embeddings = []
-            self.doc_ids = []
+            self.index = self._new_index()
+            self.doc_ids = {}
+            self.id_map = {}
+            self.next_id = 0
+            self.pending = {}
+            self.pending_metadata = {}
+            self.partitions = {field: {} for field in self.filter_fields}
             
             # Alle Dokumente mit Embeddings aus MongoDB laden
-            cursor = self.collection.find({"embedding_dim": self.dim})
+            projection = {"embedding": 1, **{field: 1 for field in self.filter_fields}}
+            cursor = self.collection.find(
+                {"embedding_dim": self.dim, "embedding": {"$exists": True}}, projection
+            )
+            vectors: List[np.ndarray] = []
             for doc in cursor:
-                if "embedding" in doc:
-                    self.add_document(
-                        doc["_id"],
-                        doc["embedding"],
-                        {k: v for k, v in doc.items() if k not in ["_id", "embedding"]}
-                    )
-            
-            # Index neu aufbauen
-            return self.build_index()
+                faiss_id = self.next_id
+                self.next_id += 1
+                self.doc_ids[faiss_id] = doc["_id"]
+                self.id_map[doc["_id"]] = faiss_id
+                self._index_metadata(faiss_id, doc)
+                vectors.append(np.asarray(doc["embedding"], dtype='float32'))
+                if len(vectors) >= batch_size:
+                    self._add_batch(vectors)
+                    vectors = []
+            if vectors:
+                self._add_batch(vectors)
             
+            self._save_state()
+            self.logger.info(f"Index mit {self.index.ntotal} Vektoren aus MongoDB neu aufgebaut")
+            return self.index.ntotal > 0
+        
         except Exception as e:
             self.logger.error(f"Fehler beim Neuaufbau aus MongoDB: {str(e)}")
             return False
 
+    def _add_batch(self, vectors: List[np.ndarray]):
+        # IDs wurden beim Einlesen fortlaufend vergeben
+        start = self.next_id - len(vectors)
+        ids = np.arange(start, start + len(vectors), dtype='int64')
+        self.index.add_with_ids(np.vstack(vectors), ids)
+
     def cleanup(self):
         """Räumt Ressourcen auf."""
         try:
             self.client.close()
             self.logger.info("MongoDB Verbindung geschlossen")
         except Exception as e:
-            self.logger.error(f"Fehler beim Aufräumen: {str(e)}") 
\ No newline at end of file
+            self.logger.error(f"Fehler beim Aufräumen: {str(e)}")
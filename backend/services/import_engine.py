@@ -0,0 +1,521 @@
+"""
+Streaming-Import-Engine für das VALEO-NeuroERP-System.
+
+Liest CSV-, XLSX- und JSON-(Lines-)Dateien in Chunks, transformiert und
+validiert die Daten spaltenweise und lädt jeden Chunk per ``COPY`` bzw.
+``executemany`` in die Zieltabelle. Der Fortschritt wird aus dem Byte-Offset
+der Quelldatei berechnet (kein Vorab-Zählen der Zeilen), und nach jedem
+committeten Chunk wird ein Checkpoint geschrieben, sodass ein wiederholter
+Task beim letzten Chunk fortsetzt statt von vorn zu beginnen.
+"""
+
+import codecs
+import csv
+import io
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Standardgröße eines Chunks (Zeilen)
+DEFAULT_CHUNK_SIZE = 10000
+
+# Maximale Anzahl protokollierter Zeilenfehler pro Import
+MAX_LOGGED_ERRORS = 50
+
+
+@dataclass
+class ImportChunk:
+    """Ein spaltenorientierter Ausschnitt der Quelldatei."""
+
+    columns: Dict[str, List[Any]]
+    row_count: int
+    end_position: int  # Byte-Offset bzw. Zeilen-/Elementnummer nach dem Chunk
+    progress: float  # 0.0 - 1.0
+
+
+@dataclass
+class ImportCheckpoint:
+    """Stand des letzten committeten Chunks."""
+
+    position: int = 0
+    processed_rows: int = 0
+    error_rows: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "position": self.position,
+            "processed_rows": self.processed_rows,
+            "error_rows": self.error_rows,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "ImportCheckpoint":
+        data = data or {}
+        return cls(
+            position=int(data.get("position", 0)),
+            processed_rows=int(data.get("processed_rows", 0)),
+            error_rows=int(data.get("error_rows", 0)),
+        )
+
+
+@dataclass
+class ImportResult:
+    processed_rows: int = 0
+    error_rows: int = 0
+    chunks: int = 0
+    duration: float = 0.0
+    resumed_from: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.processed_rows / self.duration if self.duration else 0.0
+
+
+# ==================== Chunk-Reader ====================
+
+
+def _tracked_lines(f, encoding: str) -> Iterator[Tuple[str, int]]:
+    """Liefert dekodierte Zeilen zusammen mit dem Byte-Offset nach der Zeile."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    while True:
+        raw = f.readline()
+        if not raw:
+            return
+        yield decoder.decode(raw), f.tell()
+
+
+def _skip_bom(f, encoding: str) -> None:
+    if encoding.lower().replace("-", "") in ("utf8", "utf8sig") and f.read(3) != codecs.BOM_UTF8:
+        f.seek(0)
+
+
+def iter_csv_chunks(
+    file_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    delimiter: str = ",",
+    encoding: str = "utf-8",
+    start_position: int = 0,
+) -> Iterator[ImportChunk]:
+    """
+    Liest eine CSV-Datei chunkweise. ``start_position`` ist ein Byte-Offset hinter
+    einem vollständigen Datensatz (wie in ``ImportChunk.end_position`` geliefert).
+    """
+    total_bytes = os.path.getsize(file_path) or 1
+    with open(file_path, "rb") as f:
+        _skip_bom(f, encoding)
+        lines = _tracked_lines(f, encoding)
+        position = {"offset": f.tell()}
+
+        def line_source() -> Iterator[str]:
+            for line, offset in lines:
+                position["offset"] = offset
+                yield line
+
+        header = next(csv.reader(line_source(), delimiter=delimiter), None)
+        if header is None:
+            return
+        if start_position > position["offset"]:
+            f.seek(start_position)
+            position["offset"] = start_position
+            lines = _tracked_lines(f, encoding)
+
+        reader = csv.reader(line_source(), delimiter=delimiter)
+        while True:
+            columns: Dict[str, List[Any]] = {name: [] for name in header}
+            column_lists = [columns[name] for name in header]
+            count = 0
+            for record in reader:
+                if not record:
+                    continue
+                for i, values in enumerate(column_lists):
+                    values.append(record[i] if i < len(record) else None)
+                count += 1
+                if count >= chunk_size:
+                    break
+            if not count:
+                return
+            yield ImportChunk(columns, count, position["offset"], position["offset"] / total_bytes)
+
+
+def iter_jsonl_chunks(
+    file_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    encoding: str = "utf-8",
+    start_position: int = 0,
+) -> Iterator[ImportChunk]:
+    """Liest JSON-Lines (ein Objekt pro Zeile) chunkweise mit Byte-Offsets."""
+    total_bytes = os.path.getsize(file_path) or 1
+    with open(file_path, "rb") as f:
+        if start_position:
+            f.seek(start_position)
+        else:
+            _skip_bom(f, encoding)
+        items: List[Dict[str, Any]] = []
+        offset = f.tell()
+        for line, offset in _tracked_lines(f, encoding):
+            if not line.strip():
+                continue
+            items.append(json.loads(line))
+            if len(items) >= chunk_size:
+                yield _records_to_chunk(items, offset, offset / total_bytes)
+                items = []
+        if items:
+            yield _records_to_chunk(items, offset, 1.0)
+
+
+def iter_json_chunks(
+    file_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    root_element: Optional[str] = None,
+    start_position: int = 0,
+) -> Iterator[ImportChunk]:
+    """
+    Liest ein JSON-Array inkrementell per ``ijson``; das Dokument wird nie
+    vollständig in den Speicher geladen. ``start_position`` zählt Elemente.
+    Ist die Wurzel (bzw. ``root_element``) ein einzelnes Objekt, wird es als
+    Liste mit einem Element behandelt.
+    """
+    import ijson
+
+    root = root_element or ""
+    total_bytes = os.path.getsize(file_path) or 1
+    with open(file_path, "rb") as f:
+        single_object = _json_root_is_object(f, root)
+        f.seek(0)
+        if single_object:
+            prefix = root
+        else:
+            prefix = f"{root}.item" if root else "item"
+        items: List[Dict[str, Any]] = []
+        index = 0
+        for item in ijson.items(f, prefix, use_float=True):
+            index += 1
+            if index <= start_position:
+                continue
+            items.append(item)
+            if len(items) >= chunk_size:
+                yield _records_to_chunk(items, index, min(f.tell() / total_bytes, 1.0))
+                items = []
+        if items:
+            yield _records_to_chunk(items, index, 1.0)
+
+
+def _json_root_is_object(f, prefix: str) -> bool:
+    """Prüft streamend, ob unter ``prefix`` ein Objekt statt eines Arrays steht."""
+    import ijson
+
+    for current, event, _ in ijson.parse(f):
+        if current == prefix and event in ("start_map", "start_array"):
+            return event == "start_map"
+    return False
+
+
+def iter_excel_chunks(
+    file_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    sheet_name: Any = 0,
+    start_position: int = 0,
+) -> Iterator[ImportChunk]:
+    """
+    Liest ein Arbeitsblatt im Read-only-Modus von openpyxl (zeilenweises
+    Streaming). ``start_position`` zählt Datenzeilen ohne Kopfzeile.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        total_rows = max((sheet.max_row or 1) - 1, 1)
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(name) if name is not None else f"column_{i}" for i, name in enumerate(header)]
+        rows = sheet.iter_rows(min_row=start_position + 2, values_only=True)
+        position = start_position
+        while True:
+            columns: Dict[str, List[Any]] = {name: [] for name in header}
+            column_lists = [columns[name] for name in header]
+            count = 0
+            for record in rows:
+                for i, values in enumerate(column_lists):
+                    values.append(record[i] if i < len(record) else None)
+                count += 1
+                if count >= chunk_size:
+                    break
+            if not count:
+                return
+            position += count
+            yield ImportChunk(columns, count, position, min(position / total_rows, 1.0))
+    finally:
+        workbook.close()
+
+
+def _lookup(record: Dict[str, Any], dotted: str) -> Any:
+    value: Any = record
+    for key in dotted.split("."):
+        if isinstance(value, dict) and key in value:
+            value = value[key]
+        else:
+            return None
+    return value
+
+
+def _records_to_chunk(records: List[Dict[str, Any]], end_position: int, progress: float) -> ImportChunk:
+    """
+    Verpackt JSON-Objekte als Chunk. Die Spalten werden erst in
+    ``transform_chunk`` über die (ggf. verschachtelten) Mapping-Pfade gebildet.
+    """
+    return ImportChunk({"__records__": records}, len(records), end_position, progress)
+
+
+# ==================== Spaltenweise Transformation ====================
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("1", "true", "ja", "yes", "x", "wahr"):
+        return True
+    if text in ("0", "false", "nein", "no", "", "falsch"):
+        return False
+    raise ValueError(f"Kein Wahrheitswert: {value!r}")
+
+
+def _to_float(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    if "," in text:
+        # Deutsches Zahlenformat: 1.234,56
+        text = text.replace(".", "").replace(",", ".")
+    return float(text)
+
+
+def _to_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    for fmt in ("%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y"):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Kein Datum: {value!r}")
+
+
+def _to_int(value: Any) -> int:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    number = _to_float(value)
+    if not number.is_integer():
+        raise ValueError(f"Keine Ganzzahl: {value!r}")
+    return int(number)
+
+
+CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "str": lambda v: str(v).strip(),
+    "int": _to_int,
+    "float": _to_float,
+    "bool": _to_bool,
+    "date": _to_date,
+}
+
+
+def transform_chunk(
+    chunk: ImportChunk,
+    mapping: Dict[str, str],
+    types: Optional[Dict[str, str]] = None,
+    required: Sequence[str] = (),
+) -> Tuple[List[str], List[Tuple[Any, ...]], List[Tuple[int, str]]]:
+    """
+    Wendet Mapping, Typkonvertierung und Pflichtfeldprüfung spaltenweise an.
+
+    Returns:
+        (Zielspalten, gültige Zeilen als Tupel, [(Zeilenindex im Chunk, Fehler)])
+    """
+    types = types or {}
+    records = chunk.columns.get("__records__")
+    target_columns: List[str] = []
+    values: List[List[Any]] = []
+    for source, target in mapping.items():
+        if records is not None:
+            column = [_lookup(record, source) for record in records]
+        elif source in chunk.columns:
+            column = chunk.columns[source]
+        else:
+            continue
+        target_columns.append(target)
+        values.append(column)
+
+    invalid: Dict[int, str] = {}
+    for target, column in zip(target_columns, values):
+        converter = CONVERTERS.get(types.get(target, ""))
+        is_required = target in required
+        for i, value in enumerate(column):
+            if value is None or value == "":
+                column[i] = None
+                if is_required and i not in invalid:
+                    invalid[i] = f"Pflichtfeld '{target}' fehlt"
+                continue
+            if converter is not None:
+                try:
+                    column[i] = converter(value)
+                except (TypeError, ValueError) as e:
+                    invalid.setdefault(i, f"{target}: {e}")
+
+    rows = list(zip(*values)) if values else []
+    if invalid:
+        rows = [row for i, row in enumerate(rows) if i not in invalid]
+    return target_columns, rows, sorted(invalid.items())
+
+
+# ==================== Bulk-Loader und Checkpoints ====================
+
+
+class DBAPIBulkLoader:
+    """
+    Lädt Zeilen über eine DB-API-2.0-Verbindung. Bei PostgreSQL (psycopg2) wird
+    ``COPY ... FROM STDIN`` verwendet, sonst ``executemany``.
+    """
+
+    def __init__(self, connection, table: str, paramstyle: str = "qmark", use_copy: Optional[bool] = None):
+        self.connection = connection
+        self.table = table
+        self.paramstyle = paramstyle
+        if use_copy is None:
+            cursor = connection.cursor()
+            use_copy = hasattr(cursor, "copy_expert")
+            cursor.close()
+        self.use_copy = use_copy
+
+    @contextmanager
+    def transaction(self):
+        try:
+            yield
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+
+    def load(self, columns: List[str], rows: List[Tuple[Any, ...]]) -> None:
+        if not rows:
+            return
+        cursor = self.connection.cursor()
+        try:
+            if self.use_copy:
+                self._copy(cursor, columns, rows)
+            else:
+                placeholder = "?" if self.paramstyle == "qmark" else "%s"
+                sql = (
+                    f"INSERT INTO {self.table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join([placeholder] * len(columns))})"
+                )
+                cursor.executemany(sql, rows)
+        finally:
+            cursor.close()
+
+    def _copy(self, cursor, columns: List[str], rows: List[Tuple[Any, ...]]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(rows)
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {self.table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+
+
+class MemoryCheckpointStore:
+    """Checkpoint-Speicher im Prozess (Tests, Benchmarks)."""
+
+    def __init__(self, checkpoint: Optional[ImportCheckpoint] = None):
+        self.checkpoint = checkpoint or ImportCheckpoint()
+
+    def load(self) -> ImportCheckpoint:
+        return self.checkpoint
+
+    def save(self, checkpoint: ImportCheckpoint) -> None:
+        self.checkpoint = ImportCheckpoint(**checkpoint.to_dict())
+
+
+# ==================== Import-Engine ====================
+
+
+class StreamingImporter:
+    """
+    Verbindet Reader, Transformation, Loader und Checkpoint-Speicher.
+
+    Jeder Chunk wird zusammen mit seinem Checkpoint in einer Transaktion
+    geschrieben. Ein erneuter Lauf mit demselben Checkpoint-Speicher setzt
+    daher genau hinter dem letzten committeten Chunk fort.
+    """
+
+    def __init__(
+        self,
+        chunk_reader: Callable[[int], Iterator[ImportChunk]],
+        loader,
+        mapping: Dict[str, str],
+        types: Optional[Dict[str, str]] = None,
+        required: Sequence[str] = (),
+        checkpoint_store=None,
+        progress_callback: Optional[Callable[[int, str], None]] = None,
+    ):
+        self.chunk_reader = chunk_reader
+        self.loader = loader
+        self.mapping = mapping
+        self.types = types or {}
+        self.required = required
+        self.checkpoint_store = checkpoint_store or MemoryCheckpointStore()
+        self.progress_callback = progress_callback
+
+    def run(self) -> ImportResult:
+        start = time.perf_counter()
+        checkpoint = self.checkpoint_store.load()
+        result = ImportResult(
+            processed_rows=checkpoint.processed_rows,
+            error_rows=checkpoint.error_rows,
+            resumed_from=checkpoint.position,
+        )
+        if checkpoint.position:
+            logger.info(
+                f"Import wird ab Position {checkpoint.position} fortgesetzt "
+                f"({checkpoint.processed_rows} Zeilen bereits importiert)"
+            )
+
+        for chunk in self.chunk_reader(checkpoint.position):
+            columns, rows, errors = transform_chunk(chunk, self.mapping, self.types, self.required)
+            for index, message in errors:
+                if len(result.errors) < MAX_LOGGED_ERRORS:
+                    result.errors.append(f"Zeile {result.processed_rows + result.error_rows + index + 1}: {message}")
+
+            checkpoint = ImportCheckpoint(
+                position=chunk.end_position,
+                processed_rows=result.processed_rows + len(rows),
+                error_rows=result.error_rows + len(errors),
+            )
+            with self.loader.transaction():
+                self.loader.load(columns, rows)
+                self.checkpoint_store.save(checkpoint)
+
+            result.processed_rows = checkpoint.processed_rows
+            result.error_rows = checkpoint.error_rows
+            result.chunks += 1
+            if self.progress_callback:
+                self.progress_callback(
+                    int(chunk.progress * 100),
+                    f"{result.processed_rows} Zeilen verarbeitet, {result.error_rows} Fehler",
+                )
+
+        result.duration = time.perf_counter() - start
+        return result
@@ -0,0 +1,295 @@
+"""
+Zustellung von Benachrichtigungen an viele Empfänger für das VALEO-NeuroERP-System.
+
+Ein Ereignis (z.B. ein Notfall) wird in einem Durchgang an alle Empfänger
+verteilt statt Empfänger für Empfänger:
+
+- ``Coalescer``: unterdrückt gleiche Meldungen an dieselben Empfänger
+  innerhalb eines Zeitfensters (prozessweit geteilt)
+- ``NotificationDispatcher``: gruppiert die Zustellungen nach Kanal und
+  übergibt jedem Kanal seine komplette Liste; die Kanäle laufen parallel
+- ``SMTPBatchSender``: versendet E-Mails über wenige, wiederverwendete
+  SMTP-Verbindungen statt einer Verbindung je Nachricht
+"""
+
+import hashlib
+import logging
+import os
+import smtplib
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from email.mime.text import MIMEText
+from email.utils import formataddr
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Zeitfenster, in dem gleiche Meldungen an denselben Empfänger zusammengefasst werden
+DEFAULT_COALESCE_WINDOW = float(os.getenv("NOTIFICATION_COALESCE_SECONDS", "120"))
+
+# Gleichzeitige SMTP-Verbindungen eines Versands
+DEFAULT_SMTP_CONNECTIONS = 4
+
+
+@dataclass
+class NotificationEvent:
+    """Eine Meldung, die an mehrere Empfänger geht."""
+
+    subject: str
+    body: str
+    priority: str = "MEDIUM"
+    entity_type: str = ""
+    entity_id: Optional[int] = None
+
+    @property
+    def key(self) -> str:
+        """Inhaltsschlüssel für die Erkennung doppelter Meldungen."""
+        raw = f"{self.entity_type}|{self.entity_id}|{self.subject}|{self.body}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class Delivery:
+    """Zustellung einer Meldung an einen Empfänger über einen Kanal."""
+
+    user_id: int
+    channel: Hashable
+    address: Any = None  # E-Mail-Adresse, Telefonnummer, Geräte-Token ...
+    sent: bool = False
+    error: Optional[str] = None
+
+
+@dataclass
+class DispatchResult:
+    """Ergebnis einer Verteilung."""
+
+    deliveries: List[Delivery] = field(default_factory=list)
+    coalesced: int = 0
+    duration: float = 0.0
+
+    @property
+    def sent(self) -> int:
+        return sum(1 for delivery in self.deliveries if delivery.sent)
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for delivery in self.deliveries if not delivery.sent)
+
+
+class Coalescer:
+    """
+    Merkt sich kürzlich zugestellte Meldungen je (Empfänger, Kanal).
+
+    ``filter`` reserviert die durchgelassenen Empfänger, damit gleichzeitige
+    Verteilungen derselben Meldung nicht doppelt zustellen; fehlgeschlagene
+    Zustellungen werden mit ``release`` wieder freigegeben.
+    """
+
+    def __init__(self, window: float = DEFAULT_COALESCE_WINDOW, clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.clock = clock
+        self._seen: Dict[str, Dict[Tuple[int, Hashable], float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, key: str, deliveries: List[Delivery]) -> Tuple[List[Delivery], int]:
+        """
+        Zustellungen ohne die innerhalb des Zeitfensters bereits erfolgten
+        oder laufenden; die zurückgegebenen werden reserviert.
+
+        Returns:
+            (neue Zustellungen, Anzahl zusammengefasster)
+        """
+        if self.window <= 0:
+            return deliveries, 0
+        now = self.clock()
+        with self._lock:
+            self._prune(now)
+            seen = self._seen.setdefault(key, {})
+            fresh = []
+            for delivery in deliveries:
+                recipient = (delivery.user_id, delivery.channel)
+                if now - seen.get(recipient, float("-inf")) < self.window:
+                    continue
+                seen[recipient] = now
+                fresh.append(delivery)
+        return fresh, len(deliveries) - len(fresh)
+
+    def release(self, key: str, deliveries: List[Delivery]) -> None:
+        """Reservierung nicht zugestellter Meldungen aufheben, damit ein erneuter Versuch durchgeht."""
+        with self._lock:
+            seen = self._seen.get(key)
+            if not seen:
+                return
+            for delivery in deliveries:
+                seen.pop((delivery.user_id, delivery.channel), None)
+
+    def _prune(self, now: float) -> None:
+        for key in list(self._seen):
+            recipients = self._seen[key]
+            for recipient, stamp in list(recipients.items()):
+                if now - stamp >= self.window:
+                    del recipients[recipient]
+            if not recipients:
+                del self._seen[key]
+
+
+# Prozessweit geteilt: NotificationService wird je Anfrage neu erzeugt
+default_coalescer = Coalescer()
+
+ChannelSender = Callable[[List[Delivery], NotificationEvent], None]
+
+
+class NotificationDispatcher:
+    """
+    Verteilt eine Meldung an viele Empfänger über mehrere Kanäle.
+
+    Jeder Kanal erhält alle seine Zustellungen auf einmal und setzt
+    ``sent``/``error`` je Zustellung; so kann er Verbindungen wiederverwenden
+    oder Nachrichten bündeln. Eine Ausnahme eines Kanals markiert nur dessen
+    Zustellungen als fehlgeschlagen.
+    """
+
+    def __init__(self, senders: Dict[Hashable, ChannelSender], coalescer: Optional[Coalescer] = None):
+        self.senders = senders
+        self.coalescer = coalescer if coalescer is not None else default_coalescer
+
+    def dispatch(self, event: NotificationEvent, deliveries: List[Delivery]) -> DispatchResult:
+        """Doppelte Meldungen zusammenfassen und den Rest zustellen."""
+        fresh, coalesced = self.coalesce(event, deliveries)
+        result = self.deliver(event, fresh)
+        result.coalesced = coalesced
+        return result
+
+    def coalesce(self, event: NotificationEvent, deliveries: List[Delivery]) -> Tuple[List[Delivery], int]:
+        """Im Zeitfenster bereits zugestellte Meldungen herausfiltern."""
+        fresh, coalesced = self.coalescer.filter(event.key, deliveries)
+        if coalesced:
+            logger.info(f"{coalesced} doppelte Benachrichtigungen zu '{event.subject}' zusammengefasst")
+        return fresh, coalesced
+
+    def deliver(self, event: NotificationEvent, deliveries: List[Delivery]) -> DispatchResult:
+        """
+        Zustellungen nach Kanal gruppieren und die Kanäle parallel bedienen.
+
+        Fehlgeschlagene Zustellungen werden im Coalescer freigegeben.
+        """
+        started = time.perf_counter()
+        by_channel: Dict[Hashable, List[Delivery]] = defaultdict(list)
+        for delivery in deliveries:
+            if delivery.channel in self.senders:
+                by_channel[delivery.channel].append(delivery)
+            else:
+                delivery.error = f"Kein Versand für Kanal {delivery.channel} konfiguriert"
+
+        if by_channel:
+            with ThreadPoolExecutor(max_workers=len(by_channel)) as executor:
+                futures = {
+                    channel: executor.submit(self.senders[channel], channel_deliveries, event)
+                    for channel, channel_deliveries in by_channel.items()
+                }
+                for channel, future in futures.items():
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error(f"Versand über Kanal {channel} fehlgeschlagen: {str(e)}")
+                        for delivery in by_channel[channel]:
+                            if not delivery.sent and delivery.error is None:
+                                delivery.error = str(e)
+
+        self.coalescer.release(event.key, [delivery for delivery in deliveries if not delivery.sent])
+        return DispatchResult(deliveries=deliveries, duration=time.perf_counter() - started)
+
+
+def run_concurrently(deliveries: List[Delivery], send_one: Callable[[Delivery], Tuple[bool, str]],
+                     max_workers: int = 8) -> None:
+    """Einzelversand (z.B. SMS ohne Sammel-API) parallel über einen Thread-Pool."""
+    def run(delivery: Delivery) -> None:
+        try:
+            delivery.sent, error = send_one(delivery)
+            delivery.error = None if delivery.sent else (error or "Fehler beim Senden der Benachrichtigung")
+        except Exception as e:
+            delivery.sent, delivery.error = False, str(e)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(deliveries)))) as executor:
+        list(executor.map(run, deliveries))
+
+
+class SMTPBatchSender:
+    """
+    E-Mail-Versand über wiederverwendete SMTP-Verbindungen.
+
+    Die Empfänger werden auf ``connections`` Verbindungen verteilt; jede
+    Verbindung sendet ihre Nachrichten nacheinander und baut sich nach einem
+    Verbindungsabbruch einmal neu auf.
+    """
+
+    def __init__(self, server: str, port: int, from_email: str, username: Optional[str] = None,
+                 password: Optional[str] = None, use_tls: bool = True,
+                 connections: int = DEFAULT_SMTP_CONNECTIONS, timeout: float = 30,
+                 from_name: Optional[str] = None):
+        self.server = server
+        self.port = port
+        self.from_email = from_email
+        self.from_name = from_name
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.connections = connections
+        self.timeout = timeout
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        if self.use_tls:
+            smtp.starttls()
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+        return smtp
+
+    def _message(self, delivery: Delivery, event: NotificationEvent) -> str:
+        message = MIMEText(event.body, "plain", "utf-8")
+        message["From"] = formataddr((self.from_name, self.from_email)) if self.from_name else self.from_email
+        message["To"] = delivery.address
+        message["Subject"] = event.subject
+        return message.as_string()
+
+    def _send_chunk(self, deliveries: List[Delivery], event: NotificationEvent) -> None:
+        smtp = None
+        try:
+            for delivery in deliveries:
+                for attempt in range(2):
+                    try:
+                        if smtp is None:
+                            smtp = self._connect()
+                        smtp.sendmail(self.from_email, [delivery.address], self._message(delivery, event))
+                        delivery.sent, delivery.error = True, None
+                        break
+                    except smtplib.SMTPServerDisconnected as e:
+                        smtp = None
+                        delivery.error = str(e)
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError, smtplib.SMTPSenderRefused) as e:
+                        # Fehler dieses Empfängers; die Verbindung bleibt nutzbar
+                        delivery.error = str(e)
+                        break
+        finally:
+            if smtp is not None:
+                try:
+                    smtp.quit()
+                except smtplib.SMTPException:
+                    pass
+
+    def send(self, deliveries: List[Delivery], event: NotificationEvent) -> None:
+        addressed = []
+        for delivery in deliveries:
+            if delivery.address:
+                addressed.append(delivery)
+            else:
+                delivery.error = "Keine E-Mail-Adresse"
+        if not addressed:
+            return
+        count = max(1, min(self.connections, len(addressed)))
+        chunks = [addressed[i::count] for i in range(count)]
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            list(executor.map(self._send_chunk, chunks, [event] * count))
@@ -19,6 +19,13 @@ from ..models.emergency import EmergencyCase, EmergencyEscalation, EscalationLev
 from ..models.user import User
 from .email_service import EmailService
 from .sms_service import SMSService
+from .notification_dispatcher import (
+    Delivery,
+    NotificationDispatcher,
+    NotificationEvent,
+    SMTPBatchSender,
+    run_concurrently,
+)
 
 Base = declarative_base()
 
@@ -102,6 +109,26 @@ class NotificationService:
         # WebSocket-Client-Management
         self.websocket_clients: Set[WebSocket] = set()
         self.websocket_lock = threading.Lock()
+        
+        # Versand an viele Empfänger: SMTP-Verbindungen wiederverwenden, Push bündeln
+        smtp_config = self.email_service.config.get("smtp", {})
+        self.smtp_sender = None
+        if self.email_service.config.get("provider", "smtp").lower() == "smtp":
+            self.smtp_sender = SMTPBatchSender(
+                server=smtp_config.get("server"),
+                port=smtp_config.get("port"),
+                from_email=smtp_config.get("from_email"),
+                from_name=smtp_config.get("from_name"),
+                username=smtp_config.get("username"),
+                password=smtp_config.get("password"),
+                use_tls=smtp_config.get("use_tls", True)
+            )
+        self.dispatcher = NotificationDispatcher({
+            NotificationType.EMAIL: self._send_email_batch,
+            NotificationType.SMS: self._send_sms_batch,
+            NotificationType.PUSH: self._send_push_batch,
+            NotificationType.IN_APP: self._send_in_app_batch
+        })
     
     def send_emergency_notification(self, emergency: EmergencyCase, notification_type: str) -> bool:
         """Sendet Benachrichtigungen für Notfallereignisse"""
@@ -132,8 +159,7 @@ class NotificationService:
                 return False
             
             # Sende Benachrichtigungen an alle Benutzer
-            for user in users:
-                self._send_notification_to_user(user, subject, body, "emergency", emergency.id, priority)
+            self._send_notification_to_users(users, subject, body, "emergency", emergency.id, priority)
             
             return True
         except Exception as e:
@@ -166,8 +192,7 @@ class NotificationService:
             priority = self._map_escalation_level_to_priority(escalation.escalation_level.name)
             
             # Sende Benachrichtigungen an alle empfangenden Benutzer
-            for user in users:
-                self._send_notification_to_user(user, subject, body, "escalation", escalation.id, priority)
+            self._send_notification_to_users(users, subject, body, "escalation", escalation.id, priority)
             
             return True
         except Exception as e:
@@ -178,63 +203,159 @@ class NotificationService:
                                   entity_type: str, entity_id: int, 
                                   priority: NotificationPriority) -> bool:
         """Sendet eine Benachrichtigung an einen Benutzer über die konfigurierten Kanäle"""
-        # Hole die Benutzereinstellungen
+        return self._send_notification_to_users([user], subject, body, entity_type, entity_id, priority) > 0
+    
+    def _send_notification_to_users(self, users: List[User], subject: str, body: str,
+                                    entity_type: str, entity_id: int,
+                                    priority: NotificationPriority) -> int:
+        """
+        Sendet eine Benachrichtigung an mehrere Benutzer über deren konfigurierte Kanäle
+        
+        Die Einstellungen aller Empfänger werden mit einer Abfrage geladen, die
+        Protokolleinträge gesammelt geschrieben und die Kanäle parallel bedient.
+        Gleiche Meldungen an denselben Empfänger werden innerhalb des
+        Zeitfensters des Dispatchers zusammengefasst.
+        
+        Returns:
+            Anzahl erfolgreich zugestellter Benachrichtigungen
+        """
+        users_by_id = {user.id: user for user in users}
+        if not users_by_id:
+            return 0
+        
+        # Einstellungen aller Empfänger in einer Abfrage
         settings = self.db.query(NotificationSetting).filter(
-            NotificationSetting.user_id == user.id
+            NotificationSetting.user_id.in_(list(users_by_id)),
+            NotificationSetting.is_enabled == True
         ).all()
         
-        success = False
-        
-        # Protokolliere die Benachrichtigung
+        deliveries = []
         for setting in settings:
-            if not setting.is_enabled:
-                continue
-                
             # Prüfe, ob die Priorität der Benachrichtigung hoch genug ist
-            if (priority == NotificationPriority.LOW and setting.minimum_severity != "LOW") or \
-               (priority == NotificationPriority.MEDIUM and setting.minimum_severity in ["HIGH", "CRITICAL"]) or \
-               (priority == NotificationPriority.HIGH and setting.minimum_severity == "CRITICAL"):
+            if not self._priority_reaches(priority, setting.minimum_severity):
                 continue
-            
-            # Erstelle einen Protokolleintrag
-            log = NotificationLog(
-                user_id=user.id,
-                notification_type=setting.notification_type,
+            user = users_by_id[setting.user_id]
+            if setting.notification_type == NotificationType.EMAIL:
+                address = user.email
+            elif setting.notification_type == NotificationType.SMS:
+                address = setting.contact_information or user.phone
+            else:
+                address = user.id
+            deliveries.append(Delivery(user.id, setting.notification_type, address))
+        
+        event = NotificationEvent(subject, body, priority.value, entity_type, entity_id)
+        deliveries, _ = self.dispatcher.coalesce(event, deliveries)
+        if not deliveries:
+            return 0
+        
+        # Protokolleinträge vor dem Versand gesammelt anlegen
+        now = datetime.utcnow()
+        logs = [
+            NotificationLog(
+                user_id=delivery.user_id,
+                notification_type=delivery.channel,
                 content=body,
                 priority=priority,
                 related_entity_type=entity_type,
                 related_entity_id=entity_id,
                 is_sent=False,
-                created_at=datetime.utcnow()
+                created_at=now
             )
-            
-            self.db.add(log)
+            for delivery in deliveries
+        ]
+        try:
+            self.db.add_all(logs)
+            self.db.flush()
+            log_ids = [log.id for log in logs]
             self.db.commit()
+        except Exception:
+            # Nichts versendet: Reservierung aufheben
+            self.dispatcher.coalescer.release(event.key, deliveries)
+            raise
+        
+        result = self.dispatcher.deliver(event, deliveries)
+        
+        # Versandergebnisse gesammelt nachtragen
+        sent_at = datetime.utcnow()
+        self.db.bulk_update_mappings(NotificationLog, [
+            {
+                "id": log_id,
+                "is_sent": delivery.sent,
+                "sent_at": sent_at,
+                "error_message": None if delivery.sent else (delivery.error or "Fehler beim Senden der Benachrichtigung")
+            }
+            for log_id, delivery in zip(log_ids, result.deliveries)
+        ])
+        self.db.commit()
+        
+        self.logger.info(
+            f"Benachrichtigung '{subject}': {result.sent} zugestellt, {result.failed} fehlgeschlagen "
+            f"in {result.duration:.2f}s"
+        )
+        return result.sent
+    
+    def _priority_reaches(self, priority: NotificationPriority, minimum_severity: str) -> bool:
+        """Prüft, ob die Priorität die Mindestschwere einer Einstellung erreicht"""
+        if priority == NotificationPriority.LOW:
+            return minimum_severity == "LOW"
+        if priority == NotificationPriority.MEDIUM:
+            return minimum_severity not in ["HIGH", "CRITICAL"]
+        if priority == NotificationPriority.HIGH:
+            return minimum_severity != "CRITICAL"
+        return True
+    
+    def _send_email_batch(self, deliveries: List[Delivery], event: NotificationEvent) -> None:
+        """Sendet E-Mails über wiederverwendete SMTP-Verbindungen"""
+        if self.smtp_sender is not None:
+            self.smtp_sender.send(deliveries, event)
+        else:
+            # API-basierte Provider (SendGrid, Mailgun): Einzelaufrufe parallel
+            run_concurrently(deliveries, lambda d: self.email_service.send_email(
+                to_email=d.address, subject=event.subject, body=event.body
+            ))
+    
+    def _send_sms_batch(self, deliveries: List[Delivery], event: NotificationEvent) -> None:
+        """Sendet SMS parallel (der SMS-Service kennt keinen Sammelversand)"""
+        run_concurrently(deliveries, lambda d: self.sms_service.send_sms(to_number=d.address, message=event.body))
+    
+    def _send_push_batch(self, deliveries: List[Delivery], event: NotificationEvent) -> None:
+        """Sendet Push-Benachrichtigungen gebündelt (bis zu 500 Geräte je Anfrage)"""
+        for start in range(0, len(deliveries), 500):
+            chunk = deliveries[start:start + 500]
+            tokens = [self._get_user_fcm_token(d.user_id) for d in chunk]
             
-            # Sende die Benachrichtigung über den entsprechenden Kanal
-            try:
-                if setting.notification_type == NotificationType.EMAIL:
-                    success = self._send_email(user.email, subject, body)
-                elif setting.notification_type == NotificationType.SMS:
-                    success = self._send_sms(setting.contact_information or user.phone, body)
-                elif setting.notification_type == NotificationType.PUSH:
-                    success = self._send_push(user.id, subject, body, priority.value)
-                elif setting.notification_type == NotificationType.IN_APP:
-                    success = self._send_in_app(user.id, subject, body, priority.value)
-                
-                # Aktualisiere den Protokolleintrag
-                log.is_sent = success
-                log.sent_at = datetime.utcnow()
-                if not success:
-                    log.error_message = "Fehler beim Senden der Benachrichtigung"
-                self.db.commit()
-            except Exception as e:
-                log.is_sent = False
-                log.error_message = str(e)
-                self.db.commit()
-                self.logger.error(f"Fehler beim Senden der Benachrichtigung: {str(e)}")
-        
-        return success
+            # In einer realen Anwendung würde hier der tatsächliche Push-Versand erfolgen
+            self.logger.info(f"Push-Benachrichtigung würde gesendet werden an {len(chunk)} Geräte, Titel: {event.subject}")
+            
+            # Hier würde man z.B. Firebase Cloud Messaging (FCM) mit registration_ids nutzen
+            """
+            response = requests.post(
+                self.push_config["api_url"],
+                headers={
+                    "Authorization": f"key={self.push_config['api_key']}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "registration_ids": tokens,
+                    "notification": {"title": event.subject, "body": event.body},
+                    "data": {"priority": event.priority, "type": event.entity_type}
+                }
+            )
+            response.raise_for_status()
+            # response.json()["results"] enthält je Token ein Ergebnis in derselben Reihenfolge
+            """
+            
+            for delivery, token in zip(chunk, tokens):
+                delivery.sent = token is not None
+                delivery.error = None if token else "Kein FCM-Token gefunden"
+    
+    def _send_in_app_batch(self, deliveries: List[Delivery], event: NotificationEvent) -> None:
+        """Speichert In-App-Benachrichtigungen für alle Empfänger auf einmal"""
+        # In einer realen Anwendung würden die Benachrichtigungen hier gesammelt gespeichert
+        # (InAppNotification je Empfänger über add_all und einen Commit)
+        self.logger.info(f"In-App-Benachrichtigung würde gespeichert werden für {len(deliveries)} Benutzer, Titel: {event.subject}")
+        for delivery in deliveries:
+            delivery.sent = True
     
     def _send_email(self, to_email: str, subject: str, body: str) -> bool:
         """Sendet eine E-Mail-Benachrichtigung"""
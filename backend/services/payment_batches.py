@@ -0,0 +1,321 @@
+"""
+Partitionierte Verarbeitung von Zahlungsstapeln für das VALEO-NeuroERP-System.
+
+Ein Stapel (z.B. ein SEPA-Lauf) wird nach Schuldnerkonto in unabhängige
+Partitionen zerlegt. Jedes Schuldnerkonto liegt in genau einer Partition,
+dadurch kann jede Partition ihre Deckungsprüfung und Buchung ohne
+Abstimmung mit den anderen durchführen:
+
+- ``partition_payments``: stabile Zuordnung Konto -> Partition
+- ``PaymentLedger``: Buchungsjournal in SQLite (WAL); jede Zahlung ist über
+  (batch_id, position) eindeutig. Vor der Ausführung wird sie als ``pending``
+  festgeschrieben, danach als ``success`` oder ``error``; gebuchte und offene
+  (``pending``) Zahlungen werden bei einer Wiederholung nicht erneut ausgeführt
+- ``process_partition``: Deckungsprüfung und Buchung einer Partition; eine
+  fehlerhafte Zahlung wird vermerkt und hält die übrigen nicht auf
+- ``build_report``: Stapelbericht aus dem Journal, bei jeder Wiederholung gleich
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Lokales Journal je Host; für verteilte Verarbeitung (Chord) muss PAYMENT_LEDGER_DB
+# auf ein gemeinsames Journal zeigen
+LOCAL_LEDGER_PATH = os.path.join(tempfile.gettempdir(), "valeo_payment_ledger.db")
+DEFAULT_LEDGER_PATH = os.environ.get("PAYMENT_LEDGER_DB", LOCAL_LEDGER_PATH)
+
+# Obergrenze der Partitionen je Stapel
+DEFAULT_PARTITIONS = 16
+
+_CENT = Decimal("0.01")
+
+# (position, Zahlungsdaten)
+PartitionItem = Tuple[int, Dict[str, Any]]
+
+
+def debtor_account(payment_data: Dict[str, Any]) -> str:
+    """Schuldnerkonto einer Zahlung (IBAN, sonst Kunden-ID)."""
+    return str(
+        payment_data.get("debtor_account")
+        or payment_data.get("debtor_iban")
+        or payment_data.get("customer_id")
+        or ""
+    )
+
+
+def idempotency_key(batch_id: str, position: int) -> str:
+    """Idempotenzschlüssel einer Zahlung für den Zahlungsdienstleister."""
+    return f"{batch_id}:{position}"
+
+
+def partition_payments(
+    payment_batch: List[Dict[str, Any]], partitions: int = DEFAULT_PARTITIONS
+) -> List[List[PartitionItem]]:
+    """
+    Zahlungen nach Schuldnerkonto auf Partitionen verteilen.
+
+    Die Zuordnung hängt nur vom Konto ab (CRC32) und ist damit über Prozesse
+    und Wiederholungen hinweg stabil. Leere Partitionen entfallen.
+    """
+    accounts = {debtor_account(payment) for payment in payment_batch}
+    count = max(1, min(partitions, len(accounts)))
+    buckets: List[List[PartitionItem]] = [[] for _ in range(count)]
+    for position, payment in enumerate(payment_batch):
+        account = debtor_account(payment)
+        buckets[zlib.crc32(account.encode("utf-8")) % count].append((position, payment))
+    return [bucket for bucket in buckets if bucket]
+
+
+class PaymentLedger:
+    """Buchungsjournal für Zahlungsstapel in SQLite."""
+
+    def __init__(self, db_path: str = DEFAULT_LEDGER_PATH):
+        self.db_path = db_path
+        self._connection = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS payment_batch_items (
+                batch_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                partition INTEGER NOT NULL,
+                debtor_account TEXT NOT NULL,
+                status TEXT NOT NULL,
+                transaction_id TEXT,
+                amount TEXT,
+                currency TEXT,
+                error TEXT,
+                payment_data TEXT,
+                processed_at TEXT NOT NULL,
+                PRIMARY KEY (batch_id, position)
+            );
+            CREATE TABLE IF NOT EXISTS payment_batch_reports (
+                batch_id TEXT PRIMARY KEY,
+                report TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            """
+        )
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def claimed(self, batch_id: str, positions: List[int]) -> Dict[int, Tuple[str, Decimal, str]]:
+        """
+        Gebuchte oder noch offene Positionen: position -> (Konto, Betrag, Status).
+
+        ``pending`` bedeutet, dass die Ausführung begonnen hat, ihr Ergebnis aber
+        nicht festgeschrieben wurde (Abbruch, Sperrfehler); die Zahlung kann
+        ausgeführt worden sein.
+        """
+        claimed: Dict[int, Tuple[str, Decimal, str]] = {}
+        for start in range(0, len(positions), 900):
+            chunk = positions[start:start + 900]
+            rows = self._connection.execute(
+                f"SELECT position, debtor_account, amount, status FROM payment_batch_items "
+                f"WHERE batch_id = ? AND status IN ('success', 'pending') "
+                f"AND position IN ({','.join('?' * len(chunk))})",
+                [batch_id, *chunk],
+            )
+            claimed.update((row[0], (row[1], Decimal(row[2]), row[3])) for row in rows)
+        return claimed
+
+    def record(self, batch_id: str, partition: int, row: Dict[str, Any]) -> None:
+        """Status einer Zahlung festschreiben (eigene Transaktion)."""
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO payment_batch_items (batch_id, position, partition, debtor_account, "
+                "status, transaction_id, amount, currency, error, payment_data, processed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    batch_id, row["position"], partition, row["debtor_account"], row["status"],
+                    row.get("transaction_id"), row.get("amount"), row.get("currency"), row.get("error"),
+                    json.dumps(row["payment_data"], default=str) if row["status"] != "success" else None,
+                    datetime.now().isoformat(),
+                ),
+            )
+
+    def items(self, batch_id: str) -> List[sqlite3.Row]:
+        cursor = self._connection.execute(
+            "SELECT position, partition, debtor_account, status, transaction_id, amount, currency, error, "
+            "payment_data FROM payment_batch_items WHERE batch_id = ? ORDER BY position",
+            (batch_id,),
+        )
+        cursor.row_factory = sqlite3.Row
+        return cursor.fetchall()
+
+    def get_report(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection.execute(
+            "SELECT report FROM payment_batch_reports WHERE batch_id = ?", (batch_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_report(self, batch_id: str, report: Dict[str, Any]) -> None:
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO payment_batch_reports (batch_id, report, created_at) VALUES (?, ?, ?)",
+                (batch_id, json.dumps(report, default=str), datetime.now().isoformat()),
+            )
+
+
+def process_partition(
+    ledger: PaymentLedger,
+    batch_id: str,
+    partition: int,
+    items: List[PartitionItem],
+    execute_payment: Callable[[Dict[str, Any]], Dict[str, Any]],
+    balances: Optional[Dict[str, Any]] = None,
+    retry_pending: bool = False,
+) -> Dict[str, Any]:
+    """
+    Deckungsprüfung und Buchung einer Partition.
+
+    Jede Zahlung wird vor der Ausführung als ``pending`` festgeschrieben und
+    erhält ``idempotency_key`` = "<batch_id>:<position>". Bleibt sie ``pending``
+    (Abbruch zwischen Ausführung und Festschreiben), wird sie bei einer
+    Wiederholung nicht erneut ausgeführt, sondern im Bericht als offen
+    ausgewiesen und muss mit dem Zahlungsdienstleister abgeglichen werden.
+
+    Args:
+        ledger: Buchungsjournal
+        batch_id: Stapel-ID
+        partition: Nummer der Partition
+        items: (position, Zahlungsdaten) dieser Partition
+        execute_payment: Führt eine Zahlung aus und liefert transaction_id,
+            amount und currency; Ausnahmen gelten als fehlgeschlagene Zahlung
+        balances: Verfügbarer Betrag je Schuldnerkonto zu Beginn des Stapels;
+            Konten ohne Eintrag werden nicht geprüft
+        retry_pending: Offene Zahlungen erneut ausführen; nur zulässig, wenn der
+            Zahlungsdienstleister den Idempotenzschlüssel auswertet
+
+    Returns:
+        Kennzahlen der Partition
+    """
+    claimed = ledger.claimed(batch_id, [position for position, _ in items])
+    if retry_pending:
+        claimed = {position: claim for position, claim in claimed.items() if claim[2] != "pending"}
+
+    # Verfügbarer Rest je Konto abzüglich der bei früheren Läufen gebuchten oder offenen Zahlungen
+    available: Dict[str, Decimal] = {
+        account: Decimal(str(amount)) for account, amount in (balances or {}).items()
+    }
+    for account, amount, _ in claimed.values():
+        if account in available:
+            available[account] -= amount
+
+    summary = {"partition": partition, "payments": len(items), "successful": 0, "failed": 0,
+               "skipped": 0, "pending": 0, "accounts": len({debtor_account(p) for _, p in items})}
+    for position, payment_data in items:
+        if position in claimed:
+            summary["pending" if claimed[position][2] == "pending" else "skipped"] += 1
+            continue
+        account = debtor_account(payment_data)
+        row = {"position": position, "debtor_account": account, "payment_data": payment_data}
+        try:
+            amount = Decimal(str(payment_data.get("amount", "0"))).quantize(_CENT)
+            if account in available and amount > available[account]:
+                raise ValueError(
+                    f"Deckung auf Konto {account} nicht ausreichend: {amount} > {available[account]}"
+                )
+        except Exception as e:
+            logger.warning(f"Zahlung {position} im Stapel {batch_id} fehlgeschlagen: {e}")
+            ledger.record(batch_id, partition, {**row, "status": "error", "error": str(e)})
+            summary["failed"] += 1
+            continue
+
+        # Vor der Ausführung festschreiben: ein Abbruch danach führt nicht zur Doppelzahlung
+        ledger.record(batch_id, partition, {**row, "status": "pending", "amount": str(amount)})
+        try:
+            result = execute_payment({**payment_data, "idempotency_key": idempotency_key(batch_id, position)})
+        except Exception as e:
+            logger.warning(f"Zahlung {position} im Stapel {batch_id} fehlgeschlagen: {e}")
+            ledger.record(batch_id, partition, {**row, "status": "error", "error": str(e)})
+            summary["failed"] += 1
+            continue
+        if account in available:
+            available[account] -= amount
+        ledger.record(batch_id, partition, {
+            **row, "status": "success", "transaction_id": result["transaction_id"],
+            "amount": str(amount), "currency": result.get("currency"),
+        })
+        summary["successful"] += 1
+    return summary
+
+
+def build_report(ledger: PaymentLedger, batch_id: str, total_payments: int) -> Dict[str, Any]:
+    """
+    Stapelbericht aus dem Buchungsjournal zusammenstellen und speichern.
+
+    Der Bericht beruht nur auf dem Journal und ist damit unabhängig davon, wie
+    oft einzelne Partitionen ausgeführt wurden.
+    """
+    successful = failed = pending = 0
+    total_amount = Decimal("0.00")
+    per_partition: Dict[int, Dict[str, Any]] = defaultdict(
+        lambda: {"payments": 0, "successful": 0, "failed": 0, "pending": 0, "amount": Decimal("0.00")}
+    )
+    payment_results = []
+    for row in ledger.items(batch_id):
+        stats = per_partition[row["partition"]]
+        stats["payments"] += 1
+        if row["status"] == "success":
+            successful += 1
+            amount = Decimal(row["amount"])
+            total_amount += amount
+            stats["successful"] += 1
+            stats["amount"] += amount
+            payment_results.append({
+                "status": "success",
+                "position": row["position"],
+                "transaction_id": row["transaction_id"],
+                "amount": float(amount),
+                "currency": row["currency"],
+            })
+        elif row["status"] == "pending":
+            pending += 1
+            stats["pending"] += 1
+            payment_results.append({
+                "status": "pending",
+                "position": row["position"],
+                "idempotency_key": idempotency_key(batch_id, row["position"]),
+                "payment_data": json.loads(row["payment_data"]) if row["payment_data"] else None,
+                "error": "Ergebnis unbekannt, Abgleich mit dem Zahlungsdienstleister erforderlich",
+            })
+        else:
+            failed += 1
+            stats["failed"] += 1
+            payment_results.append({
+                "status": "error",
+                "position": row["position"],
+                "payment_data": json.loads(row["payment_data"]) if row["payment_data"] else None,
+                "error": row["error"],
+            })
+
+    report = {
+        "status": "success",
+        "batch_id": batch_id,
+        "total_payments": total_payments,
+        "successful_payments": successful,
+        "failed_payments": failed,
+        "pending_payments": pending,
+        "unprocessed_payments": total_payments - successful - failed - pending,
+        "success_rate": round(successful / total_payments * 100, 2) if total_payments else 0,
+        "total_amount": float(total_amount),
+        "partitions": [
+            {"partition": number, **stats, "amount": float(stats["amount"])}
+            for number, stats in sorted(per_partition.items())
+        ],
+        "payment_results": payment_results,
+    }
+    ledger.save_report(batch_id, report)
+    return report
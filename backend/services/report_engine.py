@@ -0,0 +1,308 @@
+"""
+Streaming-Ausgabe für Berichte und Exporte im VALEO-NeuroERP-System.
+
+Exporte werden nicht mehr aus vollständig materialisierten Datenstrukturen
+erzeugt, sondern zeilenweise aus einer ``RowSource`` geschrieben:
+
+- ``query_source``: liest Zeilen per Server-Side-Cursor (``stream_results``)
+  in Blöcken von ``chunk_size`` aus der Datenbank.
+- ``records_source``: adaptiert bereits vorhandene Listen von Dicts oder Listen.
+- ``write_workbook``: schreibt Arbeitsblätter mit einem write-only Workbook von
+  OpenPyXL; der Speicherbedarf hängt nicht von der Zeilenzahl ab.
+
+Fortschritt wird blockweise über einen Callback ``(bisher geschriebene Zeilen,
+Blattname)`` gemeldet.
+"""
+
+import itertools
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.chart import BarChart, LineChart, PieChart, Reference
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 10000
+# Zeilen am Blattanfang, aus denen die Spaltenbreiten geschätzt werden
+WIDTH_SAMPLE_ROWS = 1000
+# Excel-Grenze von 1.048.576 Zeilen abzüglich Kopfzeile
+MAX_SHEET_ROWS = 1048575
+
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_FILL = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center", wrap_text=True)
+
+CHART_TYPES = {"bar": BarChart, "line": LineChart, "pie": PieChart}
+
+ProgressCallback = Callable[[int, str], None]
+
+
+@dataclass
+class RowSource:
+    """Spaltennamen und ein (einmal iterierbarer) Zeilenstrom."""
+    columns: List[str]
+    rows: Iterable[Sequence[Any]]
+    total: Optional[int] = None
+
+
+@dataclass
+class SheetSpec:
+    """Arbeitsblatt eines Exports."""
+    name: str
+    source: RowSource
+    charts: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def records_source(data: Sequence[Any], columns: Optional[Sequence[str]] = None) -> Optional[RowSource]:
+    """
+    Adaptiert eine Liste von Dicts oder Listen. Gibt None zurück, wenn das
+    Format nicht unterstützt wird.
+    """
+    if all(isinstance(item, dict) for item in data):
+        if columns is None:
+            # Spalten in Reihenfolge des ersten Auftretens (wie pandas.DataFrame)
+            columns = list(dict.fromkeys(key for item in data for key in item))
+        names = list(columns)
+        return RowSource(names, ([item.get(name) for name in names] for item in data), len(data))
+    if all(isinstance(item, (list, tuple)) for item in data):
+        width = max((len(item) for item in data), default=0)
+        names = list(columns) if columns else [str(i) for i in range(width)]
+        return RowSource(names, iter(data), len(data))
+    return None
+
+
+def query_source(bind, query: Any, params: Optional[Dict[str, Any]] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> RowSource:
+    """
+    Führt eine Abfrage mit Server-Side-Cursor aus.
+
+    Die Verbindung bleibt geöffnet, bis der Zeilenstrom vollständig gelesen
+    oder geschlossen wurde.
+
+    Args:
+        bind: SQLAlchemy Engine oder Connection
+        query: SQL-Text oder SQLAlchemy-Statement
+        params: Parameter der Abfrage
+        chunk_size: Zeilen pro Fetch
+    """
+    from sqlalchemy import text
+    from sqlalchemy.engine import Engine
+
+    statement = text(query) if isinstance(query, str) else query
+    connection = bind.connect() if isinstance(bind, Engine) else bind
+    try:
+        result = connection.execution_options(stream_results=True, yield_per=chunk_size).execute(
+            statement, params or {}
+        )
+    except Exception:
+        if connection is not bind:
+            connection.close()
+        raise
+
+    def rows() -> Iterator[Sequence[Any]]:
+        try:
+            for partition in result.partitions():
+                yield from partition
+        finally:
+            result.close()
+            if connection is not bind:
+                connection.close()
+
+    return RowSource(list(result.keys()), rows())
+
+
+def cell_value(value: Any) -> Any:
+    """Wandelt Werte in von Excel unterstützte Typen."""
+    if value is None or isinstance(value, (str, int, float, Decimal, datetime, date, bool)):
+        return value
+    if isinstance(value, (dict, list, tuple)):
+        return str(value)
+    if hasattr(value, "item"):  # NumPy-Skalare
+        return value.item()
+    return str(value)
+
+
+def header_cells(worksheet, columns: Sequence[str]) -> List[Any]:
+    cells = []
+    for column in columns:
+        cell = WriteOnlyCell(worksheet, value=column)
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        cell.alignment = HEADER_ALIGNMENT
+        cells.append(cell)
+    return cells
+
+
+def column_widths(columns: Sequence[str], sample: Sequence[Sequence[Any]]) -> List[float]:
+    """Spaltenbreiten aus Kopfzeile und Stichprobe (max. 50 Zeichen)."""
+    widths = []
+    for i, column in enumerate(columns):
+        max_length = max([len(str(column))] + [len(str(row[i])) for row in sample if i < len(row)])
+        widths.append(min((max_length + 2) * 1.2, 50))
+    return widths
+
+
+def write_rows(worksheet, columns: Sequence[str], rows: Iterable[Sequence[Any]],
+               max_rows: int = MAX_SHEET_ROWS, on_chunk: Optional[Callable[[int], None]] = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE,
+               cell_factory: Optional[Callable[[Any, Any], Any]] = None) -> int:
+    """
+    Schreibt Kopfzeile und bis zu ``max_rows`` Zeilen in ein Arbeitsblatt.
+
+    Funktioniert mit normalen und write-only Arbeitsblättern. Spaltenbreiten
+    werden vor den Daten gesetzt, da write-only Blätter sie nicht nachträglich
+    ändern können.
+
+    Returns:
+        Anzahl der geschriebenen Datenzeilen
+    """
+    iterator = iter(rows)
+    sample = list(itertools.islice(iterator, min(WIDTH_SAMPLE_ROWS, max_rows)))
+    for i, width in enumerate(column_widths(columns, sample)):
+        worksheet.column_dimensions[get_column_letter(i + 1)].width = width
+
+    worksheet.append(header_cells(worksheet, columns))
+    convert = cell_value if cell_factory is None else (lambda value: cell_factory(worksheet, cell_value(value)))
+
+    written = 0
+    for row in itertools.chain(sample, itertools.islice(iterator, max_rows - len(sample))):
+        worksheet.append([convert(value) for value in row])
+        written += 1
+        if on_chunk is not None and written % chunk_size == 0:
+            on_chunk(written)
+    return written
+
+
+def add_charts(worksheet, columns: Sequence[str], row_count: int, charts: Sequence[Dict[str, Any]]) -> int:
+    """Fügt Diagramme über die geschriebenen Zeilen hinzu."""
+    added = 0
+    for chart_data in charts:
+        chart_class = CHART_TYPES.get(chart_data.get("type", "bar"))
+        data_cols = [col for col in chart_data.get("data_cols", []) if col in columns]
+        category_col = chart_data.get("category_col")
+        if chart_class is None or not data_cols or category_col not in columns or row_count == 0:
+            continue
+
+        chart = chart_class()
+        chart.title = chart_data.get("title", "Diagramm")
+        for data_col in data_cols:
+            col_idx = columns.index(data_col) + 1
+            chart.add_data(
+                Reference(worksheet, min_col=col_idx, min_row=1, max_row=row_count + 1),
+                titles_from_data=True
+            )
+        cat_idx = columns.index(category_col) + 1
+        chart.set_categories(Reference(worksheet, min_col=cat_idx, min_row=2, max_row=row_count + 1))
+        worksheet.add_chart(chart, "H2")
+        added += 1
+    return added
+
+
+def write_sheet_parts(
+    workbook,
+    name: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    on_chunk: Optional[ProgressCallback] = None,
+    on_part: Optional[Callable[[Any, str, int], None]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cell_factory: Optional[Callable[[Any, Any], Any]] = None,
+) -> Dict[str, int]:
+    """
+    Schreibt einen Zeilenstrom auf ein Blatt und setzt ihn bei mehr Zeilen als
+    Excel erlaubt auf Folgeblättern ("Name (2)", ...) fort.
+
+    ``on_chunk`` erhält die bisher geschriebenen Zeilen und den Blattnamen,
+    ``on_part`` jedes fertige Blatt mit Namen und Zeilenzahl.
+
+    Returns:
+        Anzahl geschriebener Datenzeilen je Blatt
+    """
+    counts: Dict[str, int] = {}
+    rows = iter(rows)
+    total_written = 0
+    part = 1
+    while True:
+        title = name[:31] if part == 1 else f"{name[:25]} ({part})"
+        worksheet = workbook.create_sheet(title)
+
+        def report(written: int, base: int = total_written, title: str = title):
+            if on_chunk is not None:
+                on_chunk(base + written, title)
+
+        written = write_rows(worksheet, columns, rows, max_rows=MAX_SHEET_ROWS, on_chunk=report,
+                             chunk_size=chunk_size, cell_factory=cell_factory)
+        counts[title] = written
+        total_written += written
+        if on_part is not None:
+            on_part(worksheet, title, written)
+
+        if written < MAX_SHEET_ROWS:
+            break
+        # Prüfen, ob weitere Zeilen folgen, bevor ein Folgeblatt angelegt wird
+        peek = next(rows, None)
+        if peek is None:
+            break
+        rows = itertools.chain([peek], rows)
+        part += 1
+    return counts
+
+
+def write_workbook(
+    output_file: str,
+    sheets: Iterable[SheetSpec],
+    include_charts: bool = True,
+    summary: Optional[Callable[[Dict[str, int]], List[List[Any]]]] = None,
+    progress: Optional[ProgressCallback] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, int]:
+    """
+    Schreibt einen Excel-Export mit einem write-only Workbook.
+
+    Blätter mit mehr Zeilen als Excel erlaubt werden auf Folgeblätter
+    ("Name (2)", ...) fortgesetzt. ``summary`` erhält die Zeilenzahlen je Blatt
+    und liefert die Zeilen eines abschließenden Zusammenfassungsblatts.
+
+    Returns:
+        Anzahl geschriebener Datenzeilen je Blatt (ohne Zusammenfassung)
+    """
+    workbook = Workbook(write_only=True)
+    counts: Dict[str, int] = {}
+    total_written = 0
+
+    for spec in sheets:
+        columns = list(spec.source.columns)
+        base = total_written
+
+        def report(written: int, title: str, base: int = base):
+            if progress is not None:
+                progress(base + written, title)
+
+        def finish(worksheet, title: str, written: int, spec: SheetSpec = spec, columns: List[str] = columns):
+            nonlocal total_written
+            if include_charts and title == spec.name[:31]:
+                add_charts(worksheet, columns, written, spec.charts)
+            total_written += written
+            if progress is not None:
+                progress(total_written, title)
+
+        counts.update(write_sheet_parts(workbook, spec.name, columns, spec.source.rows,
+                                        on_chunk=report, on_part=finish, chunk_size=chunk_size))
+        close = getattr(spec.source.rows, "close", None)
+        if close is not None:
+            close()
+
+    if summary is not None:
+        worksheet = workbook.create_sheet("Zusammenfassung")
+        write_rows(worksheet, ["Metrik", "Wert"], summary(counts))
+
+    workbook.save(output_file)
+    logger.info(f"Excel-Export {output_file} mit {total_written} Zeilen geschrieben")
+    return counts
@@ -0,0 +1,232 @@
+"""
+Caching und Downsampling für Diagramme im VALEO-NeuroERP-System.
+
+Die Visualisierungs-Tasks in ``backend/tasks/report_tasks/data_visualization.py``
+rendern Diagramme nur noch, wenn sich Daten oder Optionen geändert haben:
+
+- ``chart_fingerprint``: Schlüssel aus Diagrammtyp, Daten und Optionen.
+- ``ChartCache``: Ablage gerenderter Artefakte (PNG, HTML, Dashboard-Panels als
+  JSON) auf Dateibasis mit Bereinigung der am längsten ungenutzten Einträge.
+- ``lttb_indices`` / ``minmax_indices``: reduzieren lange Zeitreihen vor dem
+  Plotten auf eine feste Punktzahl, ohne Spitzen zu verlieren.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "VISUALIZATION_CACHE_DIR", os.path.join(tempfile.gettempdir(), "valeo_visualization_cache")
+)
+
+# Bei Änderungen am Render-Code erhöhen, damit alte Artefakte nicht mehr getroffen werden
+RENDER_VERSION = 1
+
+DEFAULT_MAX_ENTRIES = 2000
+
+# Zielpunktzahl für Zeitreihen (mehr Punkte sind in einem Diagramm nicht unterscheidbar)
+DEFAULT_MAX_POINTS = 2000
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def chart_fingerprint(chart_type: str, data: Any, options: Optional[Dict[str, Any]] = None) -> str:
+    """Fingerprint eines Diagramms (Typ + Daten + Optionen)."""
+    payload = {"version": RENDER_VERSION, "type": chart_type, "data": data, "options": options or {}}
+    try:
+        raw = json.dumps(payload, sort_keys=True, default=_json_default)
+    except TypeError:
+        # Dicts mit gemischten Schlüsseltypen lassen sich nicht sortieren
+        raw = json.dumps(payload, default=_json_default)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ChartCache:
+    """
+    Dateibasierter Cache für gerenderte Diagramme, adressiert über
+    ``chart_fingerprint``.
+
+    Artefakte werden atomar geschrieben; Treffer aktualisieren die
+    Änderungszeit, sodass beim Überschreiten von ``max_entries`` die am
+    längsten ungenutzten Einträge entfernt werden.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.cache_dir = os.path.join(cache_dir, "charts")
+        self.max_entries = max_entries
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def path(self, key: str, extension: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.{extension}")
+
+    def get(self, key: str, extension: str) -> Optional[str]:
+        path = self.path(key, extension)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def store(self, key: str, extension: str, render: Callable[[str], None]) -> str:
+        """Rendert über ``render(pfad)`` in eine temporäre Datei und legt sie ab."""
+        path = self.path(key, extension)
+        # Endung beibehalten, da z.B. Matplotlib das Format daraus ableitet
+        tmp_path = os.path.join(self.cache_dir, f"{key}.{os.getpid()}.{threading.get_ident()}.tmp.{extension}")
+        try:
+            render(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._prune()
+        return path
+
+    def get_or_render(self, key: str, extension: str, render: Callable[[str], None]) -> Tuple[str, bool]:
+        """Liefert (Pfad, aus dem Cache)."""
+        cached = self.get(key, extension)
+        if cached is not None:
+            return cached, True
+        return self.store(key, extension, render), False
+
+    def get_json(self, key: str) -> Optional[Any]:
+        path = self.get(key, "json")
+        if path is None:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set_json(self, key: str, value: Any) -> None:
+        def render(path: str):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(value, f, default=_json_default)
+
+        self.store(key, "json", render)
+
+    def _prune(self) -> None:
+        try:
+            entries = [entry for entry in os.scandir(self.cache_dir) if ".tmp." not in entry.name]
+        except OSError:
+            return
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        # Auf 90 % bereinigen, damit nicht bei jedem Schreiben erneut bereinigt wird
+        for entry in entries[:len(entries) - int(self.max_entries * 0.9)]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def numeric_axis(values: Sequence[Any]) -> np.ndarray:
+    """X-Werte als Zahlen (Datumswerte als Zeitstempel, sonst Positionen)."""
+    try:
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return np.asarray(values, dtype="datetime64[ns]").astype(np.int64).astype(float)
+    except (TypeError, ValueError):
+        return np.arange(len(values), dtype=float)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: wählt ``threshold`` Punkte, die den
+    Verlauf der Kurve optisch erhalten. Erster und letzter Punkt bleiben immer
+    erhalten.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    x = np.asarray(x, dtype=float)
+    # threshold - 2 Buckets zwischen erstem und letztem Punkt
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # Dreiecksfläche zwischen zuletzt gewähltem Punkt, Kandidat und Mittel des nächsten Buckets
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """Behält pro Bucket Minimum und Maximum (schneller als LTTB, erhält Ausreißer)."""
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+
+    buckets = max(max_points // 2, 1)
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = np.asarray(y, dtype=float)
+    rows = padded.reshape(buckets, size)
+    valid = ~np.all(np.isnan(rows), axis=1)
+    offsets = np.arange(buckets)[valid] * size
+    filled = np.where(np.isnan(rows[valid]), 0.0, rows[valid])
+    indices = np.concatenate([offsets + np.argmin(filled, axis=1), offsets + np.argmax(filled, axis=1), [0, n - 1]])
+    return np.unique(indices[indices < n])
+
+
+def downsample_indices(x: Sequence[Any], series: List[Sequence[Any]], max_points: int = DEFAULT_MAX_POINTS,
+                       method: str = "lttb") -> np.ndarray:
+    """
+    Gemeinsame Indizes für mehrere Reihen über derselben X-Achse (Vereinigung
+    der Auswahl je Reihe).
+    """
+    n = len(x)
+    if n <= max_points or not series:
+        return np.arange(n)
+
+    axis = numeric_axis(x) if method == "lttb" else None
+    selected = []
+    for values in series:
+        if method == "minmax":
+            selected.append(minmax_indices(np.asarray(values, dtype=float), max_points))
+        else:
+            selected.append(lttb_indices(axis, np.asarray(values, dtype=float), max_points))
+    return np.unique(np.concatenate(selected))
+
+
+def parse_dates(values: List[Any]) -> List[Any]:
+    """
+    ISO-Datumsstrings in ``datetime`` umwandeln, damit sie als Zeitachse statt
+    als Kategorien (ein Tick pro Wert) geplottet werden.
+    """
+    if not values or not isinstance(values[0], str):
+        return values
+    try:
+        return np.asarray(values, dtype="datetime64[us]").astype(datetime).tolist()
+    except (TypeError, ValueError):
+        return values
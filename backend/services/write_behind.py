@@ -0,0 +1,208 @@
+"""
+Write-Behind-Puffer für Bulk-Schreiboperationen im VALEO-NeuroERP-System.
+
+Operationen werden pro Primärschlüssel zusammengeführt, sodass pro Zeile
+höchstens eine Operation in die Datenbank geschrieben wird:
+
+- insert + update  → insert mit zusammengeführten Werten
+- update + update  → update mit zusammengeführten Werten
+- beliebig + delete → delete
+- delete + insert  → replace (delete und insert in derselben Transaktion)
+
+Der Puffer ist auf ``max_pending`` Operationen begrenzt (ausstehende und gerade
+geschriebene). Ist er voll, warten Produzenten in ``put`` bis ein Flush Platz
+geschaffen hat (Backpressure).
+"""
+
+import asyncio
+import itertools
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import Table, and_, bindparam, delete, insert, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+OP_INSERT = "insert"
+OP_UPDATE = "update"
+OP_DELETE = "delete"
+OP_REPLACE = "replace"
+
+
+@dataclass
+class PendingOperation:
+    """Zusammengeführte Operation für einen Primärschlüssel."""
+    op: str
+    values: Dict[str, Any]
+
+
+class KeylessInsert:
+    """Schlüssel für Inserts ohne Primärschlüssel (z.B. Autoincrement-IDs)."""
+    __slots__ = ("number",)
+    _counter = itertools.count()
+
+    def __init__(self):
+        self.number = next(self._counter)
+
+
+def merge_operation(current: Optional[PendingOperation], op: str, values: Dict[str, Any]) -> PendingOperation:
+    """Führt eine neue Operation mit der ausstehenden Operation desselben Schlüssels zusammen."""
+    if current is None:
+        return PendingOperation(op, dict(values))
+    if op == OP_DELETE:
+        return PendingOperation(OP_DELETE, dict(values))
+    if op == OP_INSERT:
+        # Zeile wurde zuvor gelöscht: ersetzen statt ON CONFLICT DO NOTHING
+        if current.op == OP_DELETE:
+            return PendingOperation(OP_REPLACE, dict(values))
+        return PendingOperation(current.op, {**current.values, **values})
+    # Update auf eine gelöschte Zeile bleibt wirkungslos
+    if current.op == OP_DELETE:
+        return current
+    return PendingOperation(current.op, {**current.values, **values})
+
+
+class WriteBehindBuffer:
+    """
+    Nach Primärschlüssel zusammengeführter Schreibpuffer mit begrenzter Größe.
+
+    ``drain`` entnimmt Operationen in Einfügereihenfolge; sie zählen bis zum
+    Aufruf von ``complete`` weiter gegen das Limit, damit auch laufende Flushes
+    den Speicher begrenzen.
+    """
+
+    def __init__(self, max_pending: int = 10000):
+        self.max_pending = max_pending
+        self._pending: Dict[Hashable, PendingOperation] = {}
+        self._inflight = 0
+        self._space = asyncio.Condition()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    @property
+    def is_full(self) -> bool:
+        return len(self._pending) + self._inflight >= self.max_pending
+
+    async def put(self, key: Hashable, op: str, values: Dict[str, Any]) -> None:
+        """Fügt eine Operation hinzu und wartet, solange der Puffer voll ist."""
+        if key not in self._pending and self.is_full:
+            async with self._space:
+                await self._space.wait_for(lambda: key in self._pending or not self.is_full)
+        self._pending[key] = merge_operation(self._pending.get(key), op, values)
+
+    def drain(self, limit: Optional[int] = None) -> List[Tuple[Hashable, PendingOperation]]:
+        """Entnimmt bis zu ``limit`` Operationen für einen Flush."""
+        count = len(self._pending) if limit is None else min(limit, len(self._pending))
+        keys = list(itertools.islice(self._pending, count))
+        operations = [(key, self._pending.pop(key)) for key in keys]
+        self._inflight += len(operations)
+        return operations
+
+    async def complete(self, count: int) -> None:
+        """Gibt nach einem Flush den Platz der geschriebenen Operationen frei."""
+        self._inflight -= count
+        async with self._space:
+            self._space.notify_all()
+
+
+def _insert_statement(dialect_name: str, table: Table):
+    """INSERT mit ON CONFLICT DO NOTHING, sofern der Dialekt es unterstützt."""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(table)
+    return dialect_insert(table).on_conflict_do_nothing()
+
+
+def _group_by_columns(rows: List[Dict[str, Any]]) -> Dict[Tuple[str, ...], List[Dict[str, Any]]]:
+    """Gruppiert Zeilen nach Spaltenmenge (executemany erwartet gleiche Schlüssel)."""
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    return groups
+
+
+async def _copy_rows(session: AsyncSession, table: Table, columns: Tuple[str, ...],
+                     rows: List[Dict[str, Any]]) -> None:
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        table.name,
+        records=[tuple(row[col] for col in columns) for row in rows],
+        columns=list(columns),
+        schema_name=table.schema,
+    )
+
+
+async def execute_operations(
+    session: AsyncSession,
+    table: Table,
+    operations: List[Tuple[Hashable, PendingOperation]],
+    use_copy: bool = False,
+) -> Dict[str, int]:
+    """
+    Schreibt zusammengeführte Operationen in der Reihenfolge delete → insert →
+    update. Da pro Schlüssel nur eine Operation existiert, bleibt die Semantik
+    der ursprünglichen Reihenfolge erhalten. Der Aufrufer steuert die Transaktion.
+
+    ``use_copy`` schreibt Inserts auf PostgreSQL/asyncpg per ``COPY``; das
+    umgeht ON CONFLICT und eignet sich daher nur für append-only Tabellen.
+
+    Returns:
+        Anzahl der Operationen je Art
+    """
+    pk_columns = list(table.primary_key.columns)
+    dialect_name = session.bind.dialect.name if session.bind is not None else ""
+
+    deletes, inserts, updates = [], [], []
+    for key, operation in operations:
+        if operation.op in (OP_DELETE, OP_REPLACE):
+            deletes.append(key)
+        if operation.op in (OP_INSERT, OP_REPLACE):
+            inserts.append(operation.values)
+        elif operation.op == OP_UPDATE:
+            updates.append(operation.values)
+
+    if deletes:
+        if len(pk_columns) == 1:
+            condition = pk_columns[0].in_(deletes)
+        else:
+            condition = tuple_(*pk_columns).in_(deletes)
+        await session.execute(delete(table).where(condition))
+
+    if inserts:
+        copy = use_copy and dialect_name == "postgresql"
+        for columns, rows in _group_by_columns(inserts).items():
+            if copy:
+                await _copy_rows(session, table, columns, rows)
+            else:
+                # executemany – SQLAlchemy bündelt dies zu mehrzeiligen VALUES
+                await session.execute(_insert_statement(dialect_name, table), rows)
+
+    if updates:
+        pk_names = {col.name for col in pk_columns}
+        for columns, rows in _group_by_columns(updates).items():
+            value_columns = [col for col in columns if col not in pk_names]
+            if not value_columns:
+                continue
+            stmt = (
+                update(table)
+                .where(and_(*[col == bindparam(f"_pk_{col.name}") for col in pk_columns]))
+                .values({col: bindparam(f"_v_{col}") for col in value_columns})
+            )
+            params = [
+                {
+                    **{f"_pk_{name}": row[name] for name in pk_names},
+                    **{f"_v_{col}": row[col] for col in value_columns},
+                }
+                for row in rows
+            ]
+            await session.execute(stmt, params)
+
+    return {"deletes": len(deletes), "inserts": len(inserts), "updates": len(updates)}
@@ -11,14 +11,15 @@ import logging
 import json
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, List, Optional, Union, Tuple
+from functools import partial
+from typing import Dict, Any, List, Optional, Union, Tuple, Callable
 from celery import shared_task
 
 # Für Zeitreihenanalyse
 from statsmodels.tsa.arima.model import ARIMA
 
 # Für Cluster-Analyse
-from sklearn.cluster import KMeans, DBSCAN
+from sklearn.cluster import KMeans, DBSCAN, MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
 
 # Für Anomalieerkennung
@@ -31,64 +32,137 @@ from sklearn.metrics import mean_squared_error, accuracy_score
 
 # Lokale Imports
 from backend.services.task_queue import update_task_progress
+from backend.services.analytics_engine import (
+    dataset_cache,
+    fingerprint,
+    map_groups,
+    model_store,
+    result_cache,
+)
 
 logger = logging.getLogger(__name__)
 
+
+def _cached_result(task_name: str, data_path: str, params: Dict[str, Any],
+                   compute: Callable[[], Dict[str, Any]], use_cache: bool) -> Dict[str, Any]:
+    """Liefert das Ergebnis aus dem Ergebnis-Cache oder berechnet es neu."""
+    if not use_cache:
+        return compute()
+    return result_cache.get_or_compute(fingerprint(task_name, data_path, params), compute)
+
+
+def _group_columns(columns: List[str], group_column: Optional[str]) -> List[str]:
+    return columns + [group_column] if group_column and group_column not in columns else list(columns)
+
+
+def _fit_arima_group(frame: pd.DataFrame, column: str, order: Tuple[int, int, int],
+                     forecast_steps: int) -> Dict[str, Any]:
+    """ARIMA-Modell für eine Gruppe (läuft im Prozesspool)."""
+    model_fit = ARIMA(frame[column].astype(float).to_numpy(), order=order).fit()
+    return {
+        "forecast": model_fit.forecast(steps=forecast_steps).tolist(),
+        "aic": float(model_fit.aic),
+        "bic": float(model_fit.bic),
+        "observations": len(frame),
+    }
+
+
+def _detect_group_anomalies(frame: pd.DataFrame, columns: List[str],
+                            contamination: float) -> Dict[str, Any]:
+    """Isolation Forest für eine Gruppe (läuft im Prozesspool)."""
+    data = frame[columns].dropna()
+    model = IsolationForest(contamination=contamination, random_state=42)
+    anomalies = model.fit_predict(data) == -1
+    return {
+        "anomaly_indices": data.index[anomalies].tolist(),
+        "num_anomalies": int(anomalies.sum()),
+        "total_samples": len(anomalies),
+    }
+
 @shared_task(bind=True)
 def analyze_time_series(self, data_path: str, column: str, 
-                       p: int = 1, d: int = 1, q: int = 1) -> Dict[str, Any]:
+                       p: int = 1, d: int = 1, q: int = 1,
+                       group_column: Optional[str] = None, forecast_steps: int = 10,
+                       max_workers: Optional[int] = None, use_cache: bool = True) -> Dict[str, Any]:
     """
     Führt eine ARIMA-Zeitreihenanalyse auf den angegebenen Daten durch.
     
+    Ohne ``group_column`` wird ein gespeichertes Modell inkrementell um neu
+    angehängte Beobachtungen fortgeschrieben, statt es komplett neu zu schätzen.
+    Mit ``group_column`` (z.B. Artikelnummer) wird pro Gruppe ein eigenes Modell
+    parallel im Prozesspool geschätzt.
+    
     Args:
         data_path: Pfad zur CSV-Datei mit Zeitreihendaten
         column: Name der zu analysierenden Spalte
         p: Autoregressive Ordnung (AR)
         d: Differenzierungsgrad (I)
         q: Moving-Average-Ordnung (MA)
+        group_column: Optionale Spalte für Modelle pro Gruppe
+        forecast_steps: Anzahl der vorherzusagenden Perioden
+        max_workers: Anzahl der Prozesse für Gruppenmodelle
+        use_cache: Ergebnis-Cache verwenden
         
     Returns:
         Dict mit Analyseergebnissen und Vorhersagen
     """
     logger.info(f"Starte Zeitreihenanalyse für {data_path}, Spalte {column}")
+    order = (p, d, q)
+    params = {"column": column, "order": order, "group_column": group_column,
+              "forecast_steps": forecast_steps}
     
-    try:
+    def compute() -> Dict[str, Any]:
         # Fortschritt aktualisieren
         update_task_progress(self.request.id, 10, "Daten werden geladen")
         
-        # Daten laden
-        df = pd.read_csv(data_path, parse_dates=True)
-        if column not in df.columns:
-            raise ValueError(f"Spalte {column} nicht in Datensatz gefunden")
+        # Daten laden (nur benötigte Spalten)
+        df = dataset_cache.load(data_path, _group_columns([column], group_column))
         
-        series = df[column].astype(float)
+        if group_column:
+            update_task_progress(self.request.id, 30, "ARIMA-Modelle pro Gruppe werden trainiert")
+            groups = map_groups(
+                df, group_column,
+                partial(_fit_arima_group, column=column, order=order, forecast_steps=forecast_steps),
+                max_workers=max_workers,
+            )
+            update_task_progress(self.request.id, 100, "Zeitreihenanalyse abgeschlossen")
+            return {"groups": {str(key): value for key, value in groups.items()}}
+        
+        series = df[column].astype(float).to_numpy()
         
         # Fortschritt aktualisieren
         update_task_progress(self.request.id, 30, "ARIMA-Modell wird trainiert")
         
-        # ARIMA-Modell anwenden
-        model = ARIMA(series, order=(p, d, q))
-        model_fit = model.fit()
+        # Gespeichertes Modell fortschreiben, wenn nur Zeilen angehängt wurden
+        model_fit, rows_seen = model_store.load("arima", data_path, params)
+        if model_fit is not None and 0 < rows_seen <= len(series):
+            if rows_seen < len(series):
+                model_fit = model_fit.append(series[rows_seen:], refit=False)
+        else:
+            model_fit, rows_seen = ARIMA(series, order=order).fit(), 0
+        model_store.save("arima", data_path, params, model_fit, len(series))
         
         # Fortschritt aktualisieren
         update_task_progress(self.request.id, 60, "Vorhersagen werden generiert")
         
-        # Vorhersagen für die nächsten 10 Perioden
-        forecast_steps = 10
         forecast = model_fit.forecast(steps=forecast_steps)
         
         # Ergebnisse zusammenstellen
         results = {
             "model_summary": model_fit.summary().tables[1].as_html(),
             "forecast": forecast.tolist(),
-            "aic": model_fit.aic,
-            "bic": model_fit.bic
+            "aic": float(model_fit.aic),
+            "bic": float(model_fit.bic),
+            "incremental_rows": len(series) - rows_seen if rows_seen else None
         }
         
         # Fortschritt aktualisieren
         update_task_progress(self.request.id, 100, "Zeitreihenanalyse abgeschlossen")
         
         return results
+    
+    try:
+        return _cached_result("analyze_time_series", data_path, params, compute, use_cache)
         
     except Exception as e:
         logger.error(f"Fehler bei der Zeitreihenanalyse: {str(e)}")
@@ -96,48 +170,47 @@ def analyze_time_series(self, data_path: str, column: str,
 
 @shared_task(bind=True)
 def perform_cluster_analysis(self, data_path: str, columns: List[str], 
-                            method: str = "kmeans", n_clusters: int = 3) -> Dict[str, Any]:
+                            method: str = "kmeans", n_clusters: int = 3,
+                            use_cache: bool = True) -> Dict[str, Any]:
     """
     Führt eine Cluster-Analyse auf den angegebenen Daten durch.
     
+    Mit ``method='minibatch_kmeans'`` werden Skalierung und Modell gespeichert
+    und bei angewachsenen Datensätzen nur mit den neuen Zeilen nachtrainiert
+    (``partial_fit``).
+    
     Args:
         data_path: Pfad zur CSV-Datei mit Daten
         columns: Liste der zu verwendenden Spalten
-        method: Clustering-Methode ('kmeans' oder 'dbscan')
+        method: Clustering-Methode ('kmeans', 'minibatch_kmeans' oder 'dbscan')
         n_clusters: Anzahl der Cluster (nur für KMeans)
+        use_cache: Ergebnis-Cache verwenden
         
     Returns:
         Dict mit Cluster-Zuordnungen und Statistiken
     """
     logger.info(f"Starte Cluster-Analyse für {data_path} mit Methode {method}")
+    params = {"columns": columns, "method": method.lower(), "n_clusters": n_clusters}
     
-    try:
+    def compute() -> Dict[str, Any]:
         # Fortschritt aktualisieren
         update_task_progress(self.request.id, 10, "Daten werden geladen")
         
-        # Daten laden
-        df = pd.read_csv(data_path)
-        
-        # Prüfen, ob alle angegebenen Spalten existieren
-        missing_columns = [col for col in columns if col not in df.columns]
-        if missing_columns:
-            raise ValueError(f"Spalten nicht gefunden: {', '.join(missing_columns)}")
-        
-        # Nur die angegebenen Spalten verwenden
-        data = df[columns].copy()
+        # Daten laden (nur die angegebenen Spalten)
+        df = dataset_cache.load(data_path, columns)
         
         # Fehlende Werte behandeln
-        data = data.dropna()
+        data = df[columns].dropna()
         
         # Daten standardisieren
         update_task_progress(self.request.id, 30, "Daten werden standardisiert")
-        scaler = StandardScaler()
-        scaled_data = scaler.fit_transform(data)
         
         # Clustering durchführen
         update_task_progress(self.request.id, 50, f"Clustering mit {method} wird durchgeführt")
         
         if method.lower() == "kmeans":
+            scaler = StandardScaler()
+            scaled_data = scaler.fit_transform(data)
             model = KMeans(n_clusters=n_clusters, random_state=42)
             clusters = model.fit_predict(scaled_data)
             
@@ -148,10 +221,35 @@ def perform_cluster_analysis(self, data_path: str, columns: List[str],
             results = {
                 "cluster_assignments": clusters.tolist(),
                 "cluster_centers": centers.tolist(),
-                "inertia": model.inertia_
+                "inertia": float(model.inertia_)
+            }
+            
+        elif method.lower() == "minibatch_kmeans":
+            state, rows_seen = model_store.load("minibatch_kmeans", data_path, params)
+            if state is None or rows_seen > len(data):
+                state, rows_seen = (
+                    StandardScaler(),
+                    MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3),
+                ), 0
+            scaler, model = state
+            
+            # Nur neue Zeilen nachtrainieren
+            new_rows = data.iloc[rows_seen:]
+            if len(new_rows):
+                scaler.partial_fit(new_rows)
+                model.partial_fit(scaler.transform(new_rows))
+            model_store.save("minibatch_kmeans", data_path, params, (scaler, model), len(data))
+            
+            clusters = model.predict(scaler.transform(data))
+            results = {
+                "cluster_assignments": clusters.tolist(),
+                "cluster_centers": scaler.inverse_transform(model.cluster_centers_).tolist(),
+                "inertia": float(model.inertia_) if model.inertia_ is not None else None,
+                "incremental_rows": len(new_rows)
             }
             
         elif method.lower() == "dbscan":
+            scaled_data = StandardScaler().fit_transform(data)
             model = DBSCAN(eps=0.5, min_samples=5)
             clusters = model.fit_predict(scaled_data)
             
@@ -162,24 +260,25 @@ def perform_cluster_analysis(self, data_path: str, columns: List[str],
             results = {
                 "cluster_assignments": clusters.tolist(),
                 "n_clusters": n_clusters_found,
-                "n_noise": list(clusters).count(-1)
+                "n_noise": int((clusters == -1).sum())
             }
             
         else:
             raise ValueError(f"Unbekannte Clustering-Methode: {method}")
         
-        # Cluster-Statistiken berechnen
+        # Cluster-Statistiken berechnen (vektorisiert über alle Cluster)
         update_task_progress(self.request.id, 80, "Cluster-Statistiken werden berechnet")
         
-        df['cluster'] = clusters
-        cluster_stats = df.groupby('cluster').agg(['mean', 'std', 'count'])
+        cluster_stats = data.assign(cluster=clusters).groupby('cluster').agg(['mean', 'std', 'count'])
         
         # In JSON-serialisierbares Format umwandeln
         stats_dict = {}
         for col in cluster_stats.columns.levels[0]:
             stats_dict[col] = {}
             for stat in cluster_stats.columns.levels[1]:
-                stats_dict[col][stat] = cluster_stats[col, stat].to_dict()
+                stats_dict[col][stat] = {
+                    str(key): value for key, value in cluster_stats[col, stat].to_dict().items()
+                }
         
         results["cluster_stats"] = stats_dict
         
@@ -187,6 +286,9 @@ def perform_cluster_analysis(self, data_path: str, columns: List[str],
         update_task_progress(self.request.id, 100, "Cluster-Analyse abgeschlossen")
         
         return results
+    
+    try:
+        return _cached_result("perform_cluster_analysis", data_path, params, compute, use_cache)
         
     except Exception as e:
         logger.error(f"Fehler bei der Cluster-Analyse: {str(e)}")
@@ -194,7 +296,8 @@ def perform_cluster_analysis(self, data_path: str, columns: List[str],
 
 @shared_task(bind=True)
 def detect_anomalies(self, data_path: str, columns: List[str], 
-                    contamination: float = 0.05) -> Dict[str, Any]:
+                    contamination: float = 0.05, group_column: Optional[str] = None,
+                    max_workers: Optional[int] = None, use_cache: bool = True) -> Dict[str, Any]:
     """
     Erkennt Anomalien in den angegebenen Daten mit Isolation Forest.
     
@@ -202,75 +305,86 @@ def detect_anomalies(self, data_path: str, columns: List[str],
         data_path: Pfad zur CSV-Datei mit Daten
         columns: Liste der zu verwendenden Spalten
         contamination: Erwarteter Anteil der Anomalien
+        group_column: Optionale Spalte für ein Modell pro Gruppe (z.B. Kunde)
+        max_workers: Anzahl der Prozesse für Gruppenmodelle
+        use_cache: Ergebnis-Cache verwenden
         
     Returns:
         Dict mit Anomalie-Flags und -Scores
     """
     logger.info(f"Starte Anomalieerkennung für {data_path}")
+    params = {"columns": columns, "contamination": contamination, "group_column": group_column}
     
-    try:
+    def compute() -> Dict[str, Any]:
         # Fortschritt aktualisieren
         update_task_progress(self.request.id, 10, "Daten werden geladen")
         
-        # Daten laden
-        df = pd.read_csv(data_path)
-        
-        # Prüfen, ob alle angegebenen Spalten existieren
-        missing_columns = [col for col in columns if col not in df.columns]
-        if missing_columns:
-            raise ValueError(f"Spalten nicht gefunden: {', '.join(missing_columns)}")
-        
-        # Nur die angegebenen Spalten verwenden
-        data = df[columns].copy()
+        # Daten laden (nur benötigte Spalten)
+        df = dataset_cache.load(data_path, _group_columns(columns, group_column))
+        
+        if group_column:
+            update_task_progress(self.request.id, 40, "Isolation Forest wird pro Gruppe angewendet")
+            groups = map_groups(
+                df, group_column,
+                partial(_detect_group_anomalies, columns=columns, contamination=contamination),
+                max_workers=max_workers,
+            )
+            update_task_progress(self.request.id, 100, "Anomalieerkennung abgeschlossen")
+            return {
+                "groups": {str(key): value for key, value in groups.items()},
+                "num_anomalies": sum(g.get("num_anomalies", 0) for g in groups.values()),
+                "total_samples": sum(g.get("total_samples", 0) for g in groups.values())
+            }
         
         # Fehlende Werte behandeln
-        data = data.dropna()
+        data = df[columns].dropna()
         
         # Anomalieerkennung durchführen
         update_task_progress(self.request.id, 40, "Isolation Forest wird angewendet")
         
-        model = IsolationForest(contamination=contamination, random_state=42)
+        model = IsolationForest(contamination=contamination, random_state=42, n_jobs=-1)
         anomaly_labels = model.fit_predict(data)
         anomaly_scores = model.score_samples(data)
         
         # -1 für Anomalien, 1 für normale Datenpunkte in Isolation Forest
         # Umwandeln in boolean (True für Anomalien)
         anomalies = (anomaly_labels == -1)
+        num_anomalies = int(anomalies.sum())
         
         # Ergebnisse zusammenstellen
         update_task_progress(self.request.id, 70, "Ergebnisse werden zusammengestellt")
         
-        # Original-Indizes speichern
-        original_indices = data.index.tolist()
-        
         results = {
             "anomaly_flags": anomalies.tolist(),
             "anomaly_scores": anomaly_scores.tolist(),
-            "original_indices": original_indices,
-            "num_anomalies": sum(anomalies),
+            "original_indices": data.index.tolist(),
+            "num_anomalies": num_anomalies,
             "total_samples": len(anomalies)
         }
         
         # Statistiken zu Anomalien
-        if sum(anomalies) > 0:
-            anomaly_data = data.iloc[anomalies]
-            normal_data = data.iloc[~anomalies]
+        if num_anomalies > 0:
+            anomaly_data = data[anomalies]
+            normal_data = data[~anomalies]
             
             # Mittelwerte und Standardabweichungen für normale und anomale Datenpunkte
             results["anomaly_stats"] = {
-                "mean": {col: float(anomaly_data[col].mean()) for col in columns},
-                "std": {col: float(anomaly_data[col].std()) for col in columns}
+                "mean": anomaly_data.mean().astype(float).to_dict(),
+                "std": anomaly_data.std().astype(float).to_dict()
             }
             
             results["normal_stats"] = {
-                "mean": {col: float(normal_data[col].mean()) for col in columns},
-                "std": {col: float(normal_data[col].std()) for col in columns}
+                "mean": normal_data.mean().astype(float).to_dict(),
+                "std": normal_data.std().astype(float).to_dict()
             }
         
         # Fortschritt aktualisieren
         update_task_progress(self.request.id, 100, "Anomalieerkennung abgeschlossen")
         
         return results
+    
+    try:
+        return _cached_result("detect_anomalies", data_path, params, compute, use_cache)
         
     except Exception as e:
         logger.error(f"Fehler bei der Anomalieerkennung: {str(e)}")
@@ -279,34 +393,34 @@ def detect_anomalies(self, data_path: str, columns: List[str],
 @shared_task(bind=True)
 def build_predictive_model(self, data_path: str, target_column: str, 
                           feature_columns: List[str], model_type: str = "regression",
-                          test_size: float = 0.2) -> Dict[str, Any]:
+                          test_size: float = 0.2, use_cache: bool = True) -> Dict[str, Any]:
     """
     Erstellt ein prädiktives Modell basierend auf Random Forest.
     
+    Die Bäume werden auf allen Kernen trainiert (``n_jobs=-1``); ein
+    inkrementelles Nachtrainieren ist für Random Forest nicht vorgesehen.
+    
     Args:
         data_path: Pfad zur CSV-Datei mit Daten
         target_column: Zielvariable
         feature_columns: Liste der Feature-Spalten
         model_type: 'regression' oder 'classification'
         test_size: Anteil der Testdaten
+        use_cache: Ergebnis-Cache verwenden
         
     Returns:
         Dict mit Modellbewertung und Feature-Wichtigkeiten
     """
     logger.info(f"Erstelle prädiktives Modell für {data_path}, Ziel: {target_column}")
+    params = {"target_column": target_column, "feature_columns": feature_columns,
+              "model_type": model_type.lower(), "test_size": test_size}
     
-    try:
+    def compute() -> Dict[str, Any]:
         # Fortschritt aktualisieren
         update_task_progress(self.request.id, 10, "Daten werden geladen")
         
-        # Daten laden
-        df = pd.read_csv(data_path)
-        
-        # Prüfen, ob alle angegebenen Spalten existieren
-        all_columns = feature_columns + [target_column]
-        missing_columns = [col for col in all_columns if col not in df.columns]
-        if missing_columns:
-            raise ValueError(f"Spalten nicht gefunden: {', '.join(missing_columns)}")
+        # Daten laden (nur Features und Zielvariable)
+        df = dataset_cache.load(data_path, feature_columns + [target_column])
         
         # Features und Target extrahieren
         X = df[feature_columns].copy()
@@ -325,7 +439,7 @@ def build_predictive_model(self, data_path: str, target_column: str,
         update_task_progress(self.request.id, 50, f"Random Forest {model_type} wird trainiert")
         
         if model_type.lower() == "regression":
-            model = RandomForestRegressor(n_estimators=100, random_state=42)
+            model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
             model.fit(X_train, y_train)
             
             # Vorhersagen und Bewertung
@@ -342,7 +456,7 @@ def build_predictive_model(self, data_path: str, target_column: str,
             }
             
         elif model_type.lower() == "classification":
-            model = RandomForestClassifier(n_estimators=100, random_state=42)
+            model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
             model.fit(X_train, y_train)
             
             # Vorhersagen und Bewertung
@@ -371,6 +485,9 @@ def build_predictive_model(self, data_path: str, target_column: str,
         update_task_progress(self.request.id, 100, "Prädiktives Modell erstellt")
         
         return results
+    
+    try:
+        return _cached_result("build_predictive_model", data_path, params, compute, use_cache)
         
     except Exception as e:
         logger.error(f"Fehler beim Erstellen des prädiktiven Modells: {str(e)}")
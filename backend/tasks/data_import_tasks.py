@@ -6,6 +6,7 @@ einschließlich CSV-, Excel- und JSON-Dateien.
 """
 
 import os
+import io
 import csv
 import json
 import logging
@@ -20,11 +21,139 @@ from django.conf import settings
 
 from backend.models.async_task import AsyncTask
 from backend.services.task_queue import update_task_progress, retry_task_with_exponential_backoff
+from backend.services.import_engine import (
+    ImportCheckpoint, StreamingImporter, iter_csv_chunks, iter_excel_chunks,
+    iter_json_chunks, iter_jsonl_chunks
+)
 
 logger = logging.getLogger(__name__)
 
 # Maximale Anzahl an Zeilen pro Batch für die Verarbeitung
-MAX_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10000
+
+
+class DjangoBulkLoader:
+    """
+    Lädt transformierte Chunks direkt in die Tabelle eines Django-Modells.
+
+    Unter PostgreSQL wird ``COPY`` verwendet, sonst ``executemany``. Die Zeilen
+    werden wie bei ``bulk_create`` über Modellinstanzen aufbereitet: Defaults
+    greifen für alle nicht gelieferten Felder (auch UUID-Primärschlüssel),
+    ``pre_save`` setzt ``auto_now``/``auto_now_add``, und ``None`` im Import
+    fällt auf den Default des Modells zurück statt NULL zu schreiben.
+    """
+
+    def __init__(self, model):
+        from django.db import connection
+
+        self.model = model
+        self.connection = connection
+        self.table = model._meta.db_table
+
+    def transaction(self):
+        return transaction.atomic()
+
+    def load(self, columns: List[str], rows: List[tuple]) -> None:
+        if not rows:
+            return
+
+        opts = self.model._meta
+        attnames = [opts.get_field(name).attname for name in columns]
+        objs = [
+            self.model(**{attname: value for attname, value in zip(attnames, row) if value is not None})
+            for row in rows
+        ]
+        # Automatisch vergebene IDs nur schreiben, wenn sie importiert werden
+        fields = [
+            field for field in opts.concrete_fields
+            if field is not opts.auto_field or field.attname in attnames
+        ]
+        db_rows = [
+            tuple(field.get_db_prep_save(field.pre_save(obj, True), self.connection) for field in fields)
+            for obj in objs
+        ]
+
+        db_columns = [self.connection.ops.quote_name(field.column) for field in fields]
+        table = self.connection.ops.quote_name(self.table)
+
+        with self.connection.cursor() as cursor:
+            if self.connection.vendor == 'postgresql':
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(db_rows)
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f"COPY {table} ({', '.join(db_columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+                )
+            else:
+                placeholders = ', '.join(['%s'] * len(db_columns))
+                cursor.executemany(
+                    f"INSERT INTO {table} ({', '.join(db_columns)}) VALUES ({placeholders})", db_rows
+                )
+
+
+class TaskCheckpointStore:
+    """Speichert den Import-Checkpoint im ``result`` des AsyncTask-Eintrags."""
+
+    KEY = 'import_checkpoint'
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+
+    def load(self) -> ImportCheckpoint:
+        task = AsyncTask.objects.filter(task_id=self.task_id).first()
+        result = task.result if task and isinstance(task.result, dict) else {}
+        return ImportCheckpoint.from_dict(result.get(self.KEY))
+
+    def save(self, checkpoint: ImportCheckpoint) -> None:
+        # Wird innerhalb der Chunk-Transaktion aufgerufen
+        task = AsyncTask.objects.select_for_update().filter(task_id=self.task_id).first()
+        if task is None:
+            return
+        result = task.result if isinstance(task.result, dict) else {}
+        result[self.KEY] = checkpoint.to_dict()
+        task.result = result
+        task.save(update_fields=['result'])
+
+
+def _run_import(task, chunk_reader, model_name: str, mapping: Dict[str, str],
+                options: Dict[str, Any], file_path: str, unit: str) -> Dict[str, Any]:
+    """Gemeinsamer Ablauf der Import-Tasks auf Basis der Streaming-Engine."""
+    from django.apps import apps
+    model = apps.get_model(model_name)
+
+    def report_progress(progress: int, message: str) -> None:
+        update_task_progress(task.request.id, progress, message)
+
+    importer = StreamingImporter(
+        chunk_reader=chunk_reader,
+        loader=DjangoBulkLoader(model),
+        mapping=mapping,
+        types=options.get('types'),
+        required=options.get('required', ()),
+        checkpoint_store=TaskCheckpointStore(task.request.id),
+        progress_callback=report_progress,
+    )
+
+    update_task_progress(task.request.id, 0, f"Import von {os.path.basename(file_path)} gestartet")
+    result = importer.run()
+    for message in result.errors:
+        logger.error(f"Fehler beim Import: {message}")
+
+    update_task_progress(task.request.id, 100,
+                         f"Import abgeschlossen: {result.processed_rows} {unit} erfolgreich, "
+                         f"{result.error_rows} Fehler")
+
+    return {
+        "status": "success",
+        "processed_rows": result.processed_rows,
+        "error_rows": result.error_rows,
+        "total_rows": result.processed_rows + result.error_rows,
+        "rows_per_second": round(result.rows_per_second, 1),
+        "resumed_from": result.resumed_from,
+        "file_path": file_path,
+        "model_name": model_name
+    }
+
 
 @shared_task(bind=True, max_retries=3)
 def import_csv_file(self, file_path: str, model_name: str, mapping: Dict[str, str], 
@@ -32,90 +161,31 @@ def import_csv_file(self, file_path: str, model_name: str, mapping: Dict[str, st
     """
     Importiert Daten aus einer CSV-Datei in ein Django-Modell.
     
+    Die Datei wird in einem Durchlauf chunkweise gelesen; der Fortschritt ergibt
+    sich aus dem Byte-Offset. Bei einer Wiederholung des Tasks wird hinter dem
+    letzten committeten Chunk fortgesetzt.
+    
     Args:
         file_path: Pfad zur CSV-Datei
         model_name: Name des Django-Modells
         mapping: Zuordnung von CSV-Spalten zu Modellfeldern
-        options: Zusätzliche Optionen für den Import
+        options: Zusätzliche Optionen für den Import (delimiter, encoding,
+            chunk_size, types, required)
         
     Returns:
         Dictionary mit Informationen zum Import-Ergebnis
     """
     try:
-        # Standardwerte für Optionen
         options = options or {}
         delimiter = options.get('delimiter', ',')
         encoding = options.get('encoding', 'utf-8')
-        skip_header = options.get('skip_header', True)
-        
-        # Modell dynamisch laden
-        from django.apps import apps
-        model = apps.get_model(model_name)
-        
-        # Datei öffnen und Zeilen zählen
-        with open(file_path, 'r', encoding=encoding) as f:
-            total_rows = sum(1 for _ in f)
+        chunk_size = options.get('chunk_size', MAX_BATCH_SIZE)
         
-        if skip_header:
-            total_rows -= 1
+        def chunk_reader(start_position: int):
+            return iter_csv_chunks(file_path, chunk_size, delimiter=delimiter,
+                                   encoding=encoding, start_position=start_position)
         
-        # Fortschritt initialisieren
-        update_task_progress(self.request.id, 0, f"Import von {total_rows} Zeilen gestartet")
-        
-        # Datei erneut öffnen und verarbeiten
-        with open(file_path, 'r', encoding=encoding) as f:
-            reader = csv.DictReader(f, delimiter=delimiter)
-            
-            batch = []
-            processed_rows = 0
-            error_rows = 0
-            
-            for row_num, row in enumerate(reader):
-                try:
-                    # Daten gemäß Mapping transformieren
-                    transformed_data = {}
-                    for csv_field, model_field in mapping.items():
-                        if csv_field in row:
-                            transformed_data[model_field] = row[csv_field]
-                    
-                    # Batch für Bulk-Create sammeln
-                    batch.append(model(**transformed_data))
-                    
-                    # Batch verarbeiten, wenn MAX_BATCH_SIZE erreicht ist
-                    if len(batch) >= MAX_BATCH_SIZE:
-                        with transaction.atomic():
-                            model.objects.bulk_create(batch)
-                        processed_rows += len(batch)
-                        batch = []
-                        
-                        # Fortschritt aktualisieren
-                        progress = int((processed_rows / total_rows) * 100)
-                        update_task_progress(self.request.id, progress, 
-                                            f"{processed_rows}/{total_rows} Zeilen verarbeitet")
-                
-                except Exception as e:
-                    error_rows += 1
-                    logger.error(f"Fehler beim Import von Zeile {row_num + 1}: {str(e)}")
-                    continue
-            
-            # Restliche Batch-Daten verarbeiten
-            if batch:
-                with transaction.atomic():
-                    model.objects.bulk_create(batch)
-                processed_rows += len(batch)
-            
-            # Abschließenden Fortschritt melden
-            update_task_progress(self.request.id, 100, 
-                               f"Import abgeschlossen: {processed_rows} Zeilen erfolgreich, {error_rows} Fehler")
-            
-            return {
-                "status": "success",
-                "processed_rows": processed_rows,
-                "error_rows": error_rows,
-                "total_rows": total_rows,
-                "file_path": file_path,
-                "model_name": model_name
-            }
+        return _run_import(self, chunk_reader, model_name, mapping, options, file_path, "Zeilen")
             
     except Exception as e:
         logger.error(f"Fehler beim CSV-Import: {str(e)}")
@@ -128,86 +198,28 @@ def import_excel_file(self, file_path: str, model_name: str, mapping: Dict[str,
     """
     Importiert Daten aus einer Excel-Datei in ein Django-Modell.
     
+    Das Arbeitsblatt wird im Read-only-Modus von openpyxl zeilenweise gestreamt.
+    
     Args:
         file_path: Pfad zur Excel-Datei
         model_name: Name des Django-Modells
         mapping: Zuordnung von Excel-Spalten zu Modellfeldern
-        options: Zusätzliche Optionen für den Import
+        options: Zusätzliche Optionen für den Import (sheet_name, chunk_size,
+            types, required)
         
     Returns:
         Dictionary mit Informationen zum Import-Ergebnis
     """
     try:
-        # Standardwerte für Optionen
         options = options or {}
         sheet_name = options.get('sheet_name', 0)
+        chunk_size = options.get('chunk_size', MAX_BATCH_SIZE)
         
-        # Modell dynamisch laden
-        from django.apps import apps
-        model = apps.get_model(model_name)
-        
-        # Excel-Datei lesen
-        df = pd.read_excel(file_path, sheet_name=sheet_name)
-        total_rows = len(df)
-        
-        # Fortschritt initialisieren
-        update_task_progress(self.request.id, 0, f"Import von {total_rows} Zeilen gestartet")
+        def chunk_reader(start_position: int):
+            return iter_excel_chunks(file_path, chunk_size, sheet_name=sheet_name,
+                                     start_position=start_position)
         
-        processed_rows = 0
-        error_rows = 0
-        batch = []
-        
-        # Daten verarbeiten
-        for index, row in df.iterrows():
-            try:
-                # Daten gemäß Mapping transformieren
-                transformed_data = {}
-                for excel_field, model_field in mapping.items():
-                    if excel_field in df.columns:
-                        value = row[excel_field]
-                        # NaN-Werte behandeln
-                        if pd.isna(value):
-                            value = None
-                        transformed_data[model_field] = value
-                
-                # Batch für Bulk-Create sammeln
-                batch.append(model(**transformed_data))
-                
-                # Batch verarbeiten, wenn MAX_BATCH_SIZE erreicht ist
-                if len(batch) >= MAX_BATCH_SIZE:
-                    with transaction.atomic():
-                        model.objects.bulk_create(batch)
-                    processed_rows += len(batch)
-                    batch = []
-                    
-                    # Fortschritt aktualisieren
-                    progress = int((processed_rows / total_rows) * 100)
-                    update_task_progress(self.request.id, progress, 
-                                        f"{processed_rows}/{total_rows} Zeilen verarbeitet")
-            
-            except Exception as e:
-                error_rows += 1
-                logger.error(f"Fehler beim Import von Zeile {index + 1}: {str(e)}")
-                continue
-        
-        # Restliche Batch-Daten verarbeiten
-        if batch:
-            with transaction.atomic():
-                model.objects.bulk_create(batch)
-            processed_rows += len(batch)
-        
-        # Abschließenden Fortschritt melden
-        update_task_progress(self.request.id, 100, 
-                           f"Import abgeschlossen: {processed_rows} Zeilen erfolgreich, {error_rows} Fehler")
-        
-        return {
-            "status": "success",
-            "processed_rows": processed_rows,
-            "error_rows": error_rows,
-            "total_rows": total_rows,
-            "file_path": file_path,
-            "model_name": model_name
-        }
+        return _run_import(self, chunk_reader, model_name, mapping, options, file_path, "Zeilen")
         
     except Exception as e:
         logger.error(f"Fehler beim Excel-Import: {str(e)}")
@@ -220,102 +232,34 @@ def import_json_file(self, file_path: str, model_name: str, mapping: Dict[str, s
     """
     Importiert Daten aus einer JSON-Datei in ein Django-Modell.
     
+    JSON-Lines-Dateien (``.jsonl``/``.ndjson`` oder ``format='jsonl'``) werden
+    zeilenweise gelesen, JSON-Arrays inkrementell per ijson - das Dokument wird
+    nie vollständig geladen.
+    
     Args:
         file_path: Pfad zur JSON-Datei
         model_name: Name des Django-Modells
-        mapping: Zuordnung von JSON-Feldern zu Modellfeldern
-        options: Zusätzliche Optionen für den Import
+        mapping: Zuordnung von JSON-Feldern zu Modellfeldern (Punktnotation
+            für verschachtelte Felder)
+        options: Zusätzliche Optionen für den Import (root_element, format,
+            chunk_size, types, required)
         
     Returns:
         Dictionary mit Informationen zum Import-Ergebnis
     """
     try:
-        # Standardwerte für Optionen
         options = options or {}
         root_element = options.get('root_element', None)
+        chunk_size = options.get('chunk_size', MAX_BATCH_SIZE)
+        json_lines = options.get('format') == 'jsonl' or file_path.lower().endswith(('.jsonl', '.ndjson'))
         
-        # Modell dynamisch laden
-        from django.apps import apps
-        model = apps.get_model(model_name)
-        
-        # JSON-Datei lesen
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Falls die Daten in einem bestimmten Element der JSON-Struktur liegen
-        if root_element:
-            for key in root_element.split('.'):
-                data = data[key]
-        
-        # Sicherstellen, dass data eine Liste ist
-        if not isinstance(data, list):
-            data = [data]
-        
-        total_rows = len(data)
-        
-        # Fortschritt initialisieren
-        update_task_progress(self.request.id, 0, f"Import von {total_rows} Elementen gestartet")
-        
-        processed_rows = 0
-        error_rows = 0
-        batch = []
+        def chunk_reader(start_position: int):
+            if json_lines:
+                return iter_jsonl_chunks(file_path, chunk_size, start_position=start_position)
+            return iter_json_chunks(file_path, chunk_size, root_element=root_element,
+                                    start_position=start_position)
         
-        # Daten verarbeiten
-        for index, item in enumerate(data):
-            try:
-                # Daten gemäß Mapping transformieren
-                transformed_data = {}
-                for json_field, model_field in mapping.items():
-                    # Unterstützung für verschachtelte Felder mit Punktnotation
-                    value = item
-                    for key in json_field.split('.'):
-                        if key in value:
-                            value = value[key]
-                        else:
-                            value = None
-                            break
-                    
-                    if value is not None:
-                        transformed_data[model_field] = value
-                
-                # Batch für Bulk-Create sammeln
-                batch.append(model(**transformed_data))
-                
-                # Batch verarbeiten, wenn MAX_BATCH_SIZE erreicht ist
-                if len(batch) >= MAX_BATCH_SIZE:
-                    with transaction.atomic():
-                        model.objects.bulk_create(batch)
-                    processed_rows += len(batch)
-                    batch = []
-                    
-                    # Fortschritt aktualisieren
-                    progress = int((processed_rows / total_rows) * 100)
-                    update_task_progress(self.request.id, progress, 
-                                        f"{processed_rows}/{total_rows} Elemente verarbeitet")
-            
-            except Exception as e:
-                error_rows += 1
-                logger.error(f"Fehler beim Import von Element {index + 1}: {str(e)}")
-                continue
-        
-        # Restliche Batch-Daten verarbeiten
-        if batch:
-            with transaction.atomic():
-                model.objects.bulk_create(batch)
-            processed_rows += len(batch)
-        
-        # Abschließenden Fortschritt melden
-        update_task_progress(self.request.id, 100, 
-                           f"Import abgeschlossen: {processed_rows} Elemente erfolgreich, {error_rows} Fehler")
-        
-        return {
-            "status": "success",
-            "processed_rows": processed_rows,
-            "error_rows": error_rows,
-            "total_rows": total_rows,
-            "file_path": file_path,
-            "model_name": model_name
-        }
+        return _run_import(self, chunk_reader, model_name, mapping, options, file_path, "Elemente")
         
     except Exception as e:
         logger.error(f"Fehler beim JSON-Import: {str(e)}")
@@ -7,6 +7,8 @@ Dieses Modul enthält Celery-Tasks für die asynchrone Generierung von Datenvisu
 import os
 import logging
 import json
+import shutil
+from functools import lru_cache
 from typing import Dict, List, Any, Optional, Union, Tuple
 from datetime import datetime
 from celery import shared_task
@@ -42,10 +44,32 @@ except ImportError:
 
 # Lokale Imports
 from backend.services.task_queue import update_task_progress
-from .report_utils import validate_report_parameters
+from backend.services.visualization_engine import (
+    DEFAULT_MAX_POINTS,
+    ChartCache,
+    chart_fingerprint,
+    downsample_indices,
+    parse_dates,
+)
+from .report_utils import render_parallel, validate_report_parameters
 
 logger = logging.getLogger(__name__)
 
+# Dashboard-Panels, ab denen im Prozesspool gerendert wird; ein Panel kostet
+# nur 10-20 ms, darunter überwiegt der Versand an die Worker-Prozesse
+PARALLEL_MIN_PANELS = 8
+
+@lru_cache(maxsize=None)
+def _chart_cache() -> ChartCache:
+    """Artefakt-Cache des Worker-Prozesses"""
+    return ChartCache()
+
+def _deliver(artifact: str, output_file: str) -> str:
+    """Kopiert ein Artefakt aus dem Cache an den angeforderten Ausgabepfad"""
+    if os.path.abspath(artifact) != os.path.abspath(output_file):
+        shutil.copyfile(artifact, output_file)
+    return output_file
+
 @shared_task(bind=True)
 def create_visualization(self, data: Dict[str, Any], 
                        chart_type: str,
@@ -106,21 +130,21 @@ def create_visualization(self, data: Dict[str, Any],
         
         update_task_progress(self.request.id, 30, "Visualisierung wird erstellt")
         
-        # Visualisierung erstellen
-        if interactive:
-            # Interaktive Visualisierung mit Plotly
-            fig = create_interactive_chart(chart_type, data)
-            
-            # Visualisierung speichern
-            fig.write_html(output_file)
-            
-        else:
-            # Statische Visualisierung mit Matplotlib
-            fig = create_static_chart(chart_type, data)
-            
-            # Visualisierung speichern
-            plt.savefig(output_file, dpi=300, bbox_inches='tight')
-            plt.close(fig)
+        def render(path: str):
+            if interactive:
+                # Interaktive Visualisierung mit Plotly
+                fig = create_interactive_chart(chart_type, data)
+                fig.write_html(path)
+            else:
+                # Statische Visualisierung mit Matplotlib
+                fig = create_static_chart(chart_type, data)
+                fig.savefig(path, dpi=300, bbox_inches='tight')
+                plt.close(fig)
+        
+        # Nur rendern, wenn Daten oder Optionen sich seit dem letzten Aufruf geändert haben
+        key = chart_fingerprint(chart_type, data, {'interactive': interactive})
+        artifact, cached = _chart_cache().get_or_render(key, 'html' if interactive else 'png', render)
+        _deliver(artifact, output_file)
         
         update_task_progress(self.request.id, 100, "Visualisierung erfolgreich erstellt")
         
@@ -131,6 +155,7 @@ def create_visualization(self, data: Dict[str, Any],
             "visualization_type": chart_type,
             "interactive": interactive,
             "title": title,
+            "cached": cached,
             "generated_at": datetime.now().isoformat()
         }
         
@@ -138,7 +163,7 @@ def create_visualization(self, data: Dict[str, Any],
         logger.error(f"Fehler bei der Erstellung der Visualisierung: {str(e)}")
         raise
 
-def create_static_chart(chart_type: str, data: Dict[str, Any]) -> Figure:
+def create_static_chart(chart_type: str, data: Dict[str, Any]) -> "Figure":
     """
     Erstellt ein statisches Diagramm mit Matplotlib.
     
@@ -179,10 +204,10 @@ def create_static_chart(chart_type: str, data: Dict[str, Any]) -> Figure:
     if chart_type == 'bar':
         if isinstance(y_data, list) and all(isinstance(item, (int, float)) for item in y_data):
             # Einfaches Balkendiagramm
-            ax.bar(x_data, y_data, color=plt.cm.get_cmap(color_map)(np.linspace(0, 1, len(y_data))))
+            ax.bar(x_data, y_data, color=plt.get_cmap(color_map)(np.linspace(0, 1, len(y_data))))
         elif isinstance(y_data, dict):
             # Balkendiagramm aus Dictionary
-            ax.bar(list(y_data.keys()), list(y_data.values()), color=plt.cm.get_cmap(color_map)(np.linspace(0, 1, len(y_data))))
+            ax.bar(list(y_data.keys()), list(y_data.values()), color=plt.get_cmap(color_map)(np.linspace(0, 1, len(y_data))))
         else:
             # Gruppiertes Balkendiagramm
             width = 0.8 / len(y_data)
@@ -209,10 +234,10 @@ def create_static_chart(chart_type: str, data: Dict[str, Any]) -> Figure:
     elif chart_type == 'pie':
         if isinstance(y_data, list) and all(isinstance(item, (int, float)) for item in y_data):
             # Einfaches Kreisdiagramm
-            ax.pie(y_data, labels=x_data, autopct='%1.1f%%', startangle=90, colors=plt.cm.get_cmap(color_map)(np.linspace(0, 1, len(y_data))))
+            ax.pie(y_data, labels=x_data, autopct='%1.1f%%', startangle=90, colors=plt.get_cmap(color_map)(np.linspace(0, 1, len(y_data))))
         elif isinstance(y_data, dict):
             # Kreisdiagramm aus Dictionary
-            ax.pie(list(y_data.values()), labels=list(y_data.keys()), autopct='%1.1f%%', startangle=90, colors=plt.cm.get_cmap(color_map)(np.linspace(0, 1, len(y_data))))
+            ax.pie(list(y_data.values()), labels=list(y_data.keys()), autopct='%1.1f%%', startangle=90, colors=plt.get_cmap(color_map)(np.linspace(0, 1, len(y_data))))
         ax.axis('equal')  # Gleiche Seitenverhältnisse für kreisförmiges Diagramm
     
     elif chart_type == 'scatter':
@@ -243,9 +268,9 @@ def create_static_chart(chart_type: str, data: Dict[str, Any]) -> Figure:
     elif chart_type == 'histogram':
         # Histogramm
         if isinstance(y_data, list) and all(isinstance(item, (int, float)) for item in y_data):
-            ax.hist(y_data, bins=data.get('bins', 10), color=plt.cm.get_cmap(color_map)(0.5))
+            ax.hist(y_data, bins=data.get('bins', 10), color=plt.get_cmap(color_map)(0.5))
         elif isinstance(y_data, dict):
-            ax.hist(list(y_data.values()), bins=data.get('bins', 10), color=plt.cm.get_cmap(color_map)(0.5))
+            ax.hist(list(y_data.values()), bins=data.get('bins', 10), color=plt.get_cmap(color_map)(0.5))
     
     # Titel und Achsenbeschriftungen setzen
     ax.set_title(title)
@@ -257,7 +282,7 @@ def create_static_chart(chart_type: str, data: Dict[str, Any]) -> Figure:
     
     return fig
 
-def create_interactive_chart(chart_type: str, data: Dict[str, Any]) -> Union[go.Figure, px.Figure]:
+def create_interactive_chart(chart_type: str, data: Dict[str, Any]) -> "go.Figure":
     """
     Erstellt ein interaktives Diagramm mit Plotly.
     
@@ -604,63 +629,26 @@ def create_dashboard(self, dashboard_data: Dict[str, Any],
         rows = layout.get('rows', 2)
         cols = layout.get('cols', 2)
         
-        # Subplot-Raster erstellen
-        fig = make_subplots(
-            rows=rows,
-            cols=cols,
-            subplot_titles=[chart.get('title', f'Diagramm {i+1}') for i, chart in enumerate(charts)],
-            specs=[[{'type': 'xy'} for _ in range(cols)] for _ in range(rows)]
-        )
+        placed = charts[:rows * cols]
+        if len(charts) > len(placed):
+            logger.warning(f"{len(charts) - len(placed)} Diagramme passen nicht ins Layout und werden übersprungen")
         
-        # Diagramme hinzufügen
-        for i, chart_data in enumerate(charts):
-            # Position im Raster bestimmen
-            row = (i // cols) + 1
-            col = (i % cols) + 1
-            
-            if row > rows or col > cols:
-                logger.warning(f"Diagramm {i+1} passt nicht ins Layout, wird übersprungen")
-                continue
-            
-            # Diagrammtyp und Daten extrahieren
-            chart_type = chart_data.get('type', 'bar')
-            x_data = chart_data.get('x_data', [])
-            y_data = chart_data.get('y_data', [])
-            
-            # Je nach Diagrammtyp unterschiedliche Visualisierung erstellen
-            if chart_type == 'bar':
-                fig.add_trace(go.Bar(x=x_data, y=y_data, name=chart_data.get('title', '')), row=row, col=col)
-            
-            elif chart_type == 'line':
-                fig.add_trace(go.Scatter(x=x_data, y=y_data, mode='lines+markers', name=chart_data.get('title', '')), row=row, col=col)
-            
-            elif chart_type == 'pie':
-                fig.add_trace(go.Pie(labels=x_data, values=y_data, name=chart_data.get('title', '')), row=row, col=col)
+        # Unverändertes Dashboard direkt aus dem Cache, sonst nur geänderte Panels neu rendern
+        cache = _chart_cache()
+        key = chart_fingerprint('dashboard', dashboard_data)
+        artifact = cache.get(key, 'html')
+        panels_cached = len(placed)
+        
+        if artifact is None:
+            panels, panels_cached = _render_panels(placed, cache)
             
-            elif chart_type == 'scatter':
-                fig.add_trace(go.Scatter(x=x_data, y=y_data, mode='markers', name=chart_data.get('title', '')), row=row, col=col)
+            update_task_progress(self.request.id, 70, "Dashboard wird zusammengesetzt")
             
-            # Achsenbeschriftungen hinzufügen
-            fig.update_xaxes(title_text=chart_data.get('x_label', ''), row=row, col=col)
-            fig.update_yaxes(title_text=chart_data.get('y_label', ''), row=row, col=col)
-        
-        # Layout optimieren
-        fig.update_layout(
-            title={
-                'text': title,
-                'y': 0.98,
-                'x': 0.5,
-                'xanchor': 'center',
-                'yanchor': 'top'
-            },
-            height=300 * rows,
-            width=400 * cols,
-            template=theme,
-            showlegend=True
-        )
+            fig = _assemble_dashboard(title, placed, panels, rows, cols, theme)
+            artifact = cache.store(key, 'html', lambda path: fig.write_html(path, include_plotlyjs='cdn'))
         
         # Dashboard speichern
-        fig.write_html(output_file, include_plotlyjs='cdn')
+        _deliver(artifact, output_file)
         
         update_task_progress(self.request.id, 100, "Dashboard erfolgreich erstellt")
         
@@ -670,6 +658,7 @@ def create_dashboard(self, dashboard_data: Dict[str, Any],
             "dashboard_file": output_file,
             "dashboard_title": title,
             "charts_count": len(charts),
+            "panels_cached": panels_cached,
             "layout": f"{rows}x{cols}",
             "generated_at": datetime.now().isoformat()
         }
@@ -678,6 +667,111 @@ def create_dashboard(self, dashboard_data: Dict[str, Any],
         logger.error(f"Fehler bei der Erstellung des Dashboards: {str(e)}")
         raise
 
+def _downsample_xy(x_data: List[Any], series: List[List[Any]], max_points: int,
+                  method: str = 'lttb') -> Tuple[List[Any], List[List[Any]]]:
+    """Reduziert X-Achse und Reihen auf gemeinsame Indizes"""
+    indices = downsample_indices(x_data, series, max_points, method)
+    if len(indices) == len(x_data):
+        return x_data, series
+    return [x_data[i] for i in indices], [[values[i] for i in indices] for values in series]
+
+def _render_panel(chart_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Erzeugt den Plotly-Trace eines Dashboard-Panels als Dict (JSON-fähig für
+    den Cache, picklebar für den Prozesspool).
+    """
+    chart_type = chart_data.get('type', 'bar')
+    x_data = chart_data.get('x_data', [])
+    y_data = chart_data.get('y_data', [])
+    name = chart_data.get('title', '')
+    
+    # Lange Reihen vor dem Plotten reduzieren
+    if chart_type in ('line', 'scatter'):
+        x_data, (y_data,) = _downsample_xy(x_data, [y_data], chart_data.get('max_points', DEFAULT_MAX_POINTS))
+    
+    # Je nach Diagrammtyp unterschiedliche Visualisierung erstellen
+    if chart_type == 'bar':
+        trace = go.Bar(x=x_data, y=y_data, name=name)
+    elif chart_type == 'line':
+        trace = go.Scatter(x=x_data, y=y_data, mode='lines+markers', name=name)
+    elif chart_type == 'pie':
+        trace = go.Pie(labels=x_data, values=y_data, name=name)
+    elif chart_type == 'scatter':
+        trace = go.Scatter(x=x_data, y=y_data, mode='markers', name=name)
+    else:
+        return None
+    return trace.to_plotly_json()
+
+def _render_panels(charts: List[Dict[str, Any]], cache: ChartCache,
+                   max_workers: Optional[int] = None) -> Tuple[List[Optional[Dict[str, Any]]], int]:
+    """
+    Rendert die Panels eines Dashboards; unveränderte Panels kommen aus dem
+    Cache, die übrigen werden ab PARALLEL_MIN_PANELS im Prozesspool erzeugt.
+    
+    Returns:
+        Panels in Eingabereihenfolge und Anzahl der Cache-Treffer
+    """
+    keys = [chart_fingerprint('panel', chart_data) for chart_data in charts]
+    panels = [cache.get_json(key) for key in keys]
+    missing = [i for i, panel in enumerate(panels) if panel is None]
+    
+    rendered = render_parallel(_render_panel, [charts[i] for i in missing],
+                               min_jobs=PARALLEL_MIN_PANELS, max_workers=max_workers)
+    
+    for i, panel in zip(missing, rendered):
+        panels[i] = panel
+        if panel is not None:
+            cache.set_json(keys[i], panel)
+    
+    return panels, len(charts) - len(missing)
+
+def _assemble_dashboard(title: str, charts: List[Dict[str, Any]], panels: List[Optional[Dict[str, Any]]],
+                        rows: int, cols: int, theme: str) -> "go.Figure":
+    """Setzt die gerenderten Panels in das Subplot-Raster ein"""
+    # Kreisdiagramme benötigen einen Subplot vom Typ 'domain'
+    specs = [[{'type': 'xy'} for _ in range(cols)] for _ in range(rows)]
+    for i, chart_data in enumerate(charts):
+        if chart_data.get('type', 'bar') == 'pie':
+            specs[i // cols][i % cols] = {'type': 'domain'}
+    
+    # Subplot-Raster erstellen
+    fig = make_subplots(
+        rows=rows,
+        cols=cols,
+        subplot_titles=[chart.get('title', f'Diagramm {i+1}') for i, chart in enumerate(charts)],
+        specs=specs
+    )
+    
+    # Diagramme hinzufügen
+    for i, (chart_data, panel) in enumerate(zip(charts, panels)):
+        # Position im Raster bestimmen
+        row = (i // cols) + 1
+        col = (i % cols) + 1
+        
+        if panel is not None:
+            fig.add_trace(panel, row=row, col=col)
+        
+        # Achsenbeschriftungen hinzufügen
+        if specs[row - 1][col - 1]['type'] == 'xy':
+            fig.update_xaxes(title_text=chart_data.get('x_label', ''), row=row, col=col)
+            fig.update_yaxes(title_text=chart_data.get('y_label', ''), row=row, col=col)
+    
+    # Layout optimieren
+    fig.update_layout(
+        title={
+            'text': title,
+            'y': 0.98,
+            'x': 0.5,
+            'xanchor': 'center',
+            'yanchor': 'top'
+        },
+        height=300 * rows,
+        width=400 * cols,
+        template=theme,
+        showlegend=True
+    )
+    return fig
+
 @shared_task(bind=True)
 def create_time_series_visualization(self, time_series_data: Dict[str, Any],
                                   chart_type: str = 'line',
@@ -700,6 +794,27 @@ def create_time_series_visualization(self, time_series_data: Dict[str, Any],
         dates = time_series_data.get('dates', [])
         values = time_series_data.get('values', [])
         series_name = time_series_data.get('series_name', 'Zeitreihe')
+        additional_series = time_series_data.get('additional_series', [])
+        
+        # Serverseitig auf max_points reduzieren (LTTB oder Min/Max je Bucket), damit z.B.
+        # ein Jahr Minutenwerte schnell gerendert wird und als kleine Datei ausgeliefert wird
+        max_points = time_series_data.get('max_points', DEFAULT_MAX_POINTS)
+        original_points = len(dates)
+        if max_points and len(dates) > max_points:
+            dates, series = _downsample_xy(
+                list(dates),
+                [values] + [extra.get('values', []) for extra in additional_series],
+                max_points,
+                time_series_data.get('downsampling', 'lttb')
+            )
+            values = series[0]
+            additional_series = [
+                {**extra, 'values': extra_values} for extra, extra_values in zip(additional_series, series[1:])
+            ]
+            logger.info(f"Zeitreihe von {original_points} auf {len(dates)} Punkte reduziert")
+        
+        # Datumsangaben als Zeitachse plotten
+        dates = parse_dates(list(dates))
         
         # Visualisierungsdaten vorbereiten
         visualization_data = {
@@ -711,7 +826,6 @@ def create_time_series_visualization(self, time_series_data: Dict[str, Any],
         }
         
         # Zusätzliche Zeitreihen hinzufügen, falls vorhanden
-        additional_series = time_series_data.get('additional_series', [])
         if additional_series:
             # Mehrere Zeitreihen in einem Diagramm
             visualization_data['y_data'] = [values]
@@ -721,14 +835,17 @@ def create_time_series_visualization(self, time_series_data: Dict[str, Any],
                 visualization_data['y_data'].append(series.get('values', []))
                 visualization_data['labels'].append(series.get('name', 'Unbenannt'))
         
-        # Standardvisualisierung erstellen
-        return create_visualization(
+        # Standardvisualisierung im aktuellen Task erstellen (self nicht doppelt übergeben)
+        result = create_visualization.run.__func__(
             self,
             visualization_data,
             chart_type=chart_type,
             output_file=output_file,
             interactive=time_series_data.get('interactive', False)
         )
+        result["original_points"] = original_points
+        result["plotted_points"] = len(dates)
+        return result
         
     except Exception as e:
         logger.error(f"Fehler bei der Erstellung der Zeitreihen-Visualisierung: {str(e)}")
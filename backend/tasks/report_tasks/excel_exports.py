@@ -24,6 +24,14 @@ try:
     from openpyxl.utils.dataframe import dataframe_to_rows
     from openpyxl.chart import BarChart, LineChart, PieChart, Reference
     from openpyxl.chart.series import DataPoint
+    from backend.services.report_engine import (
+        DEFAULT_CHUNK_SIZE,
+        RowSource,
+        SheetSpec,
+        query_source,
+        records_source,
+        write_workbook,
+    )
     EXCEL_AVAILABLE = True
 except ImportError:
     EXCEL_AVAILABLE = False
@@ -41,6 +49,11 @@ def generate_excel_export(self, export_data: Dict[str, Any],
     """
     Generiert einen Excel-Export basierend auf den übergebenen Daten.
     
+    Jedes Blatt enthält entweder ``data`` (Liste von Dicts oder Listen) oder
+    ``query`` (SQL, optional mit ``params``); Abfragen werden blockweise per
+    Server-Side-Cursor gelesen und zeilenweise in ein write-only Workbook
+    geschrieben, so dass der Speicherbedarf nicht mit der Zeilenzahl wächst.
+    
     Args:
         export_data: Dictionary mit den Daten für den Export
         output_file: Pfad zur Ausgabedatei (optional)
@@ -64,6 +77,7 @@ def generate_excel_export(self, export_data: Dict[str, Any],
         sheets = export_data.get('sheets', [])
         include_charts = export_data.get('include_charts', True)
         include_summary = export_data.get('include_summary', True)
+        chunk_size = export_data.get('chunk_size', DEFAULT_CHUNK_SIZE)
         
         # Ausgabepfad bestimmen
         if not output_file:
@@ -77,150 +91,46 @@ def generate_excel_export(self, export_data: Dict[str, Any],
         
         update_task_progress(self.request.id, 20, "Excel-Datei wird vorbereitet")
         
-        # Excel-Writer erstellen
-        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-            # Für jedes Blatt im Export
-            for i, sheet_data in enumerate(sheets):
-                progress = 20 + int(60 * (i + 1) / len(sheets))
-                update_task_progress(self.request.id, progress, f"Blatt {i+1}/{len(sheets)} wird erstellt")
-                
-                sheet_name = sheet_data.get('name', f'Sheet{i+1}')
-                data = sheet_data.get('data', [])
-                columns = sheet_data.get('columns', [])
-                
-                # Daten in DataFrame umwandeln
-                if isinstance(data, list) and all(isinstance(item, dict) for item in data):
-                    # Liste von Dictionaries
-                    df = pd.DataFrame(data)
-                elif isinstance(data, list) and all(isinstance(item, list) for item in data):
-                    # Liste von Listen
-                    df = pd.DataFrame(data, columns=columns if columns else None)
-                else:
-                    # Ungültiges Datenformat
-                    logger.warning(f"Ungültiges Datenformat für Blatt {sheet_name}, überspringe")
-                    continue
-                
-                # DataFrame in Excel schreiben
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-                
-                # Arbeitsblatt formatieren
-                worksheet = writer.sheets[sheet_name]
-                
-                # Überschriften formatieren
-                header_font = Font(bold=True, color="FFFFFF")
-                header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-                header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-                
-                for cell in worksheet[1]:
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-                
-                # Spaltenbreiten anpassen
-                for i, column in enumerate(worksheet.columns):
-                    max_length = 0
-                    column_letter = openpyxl.utils.get_column_letter(i + 1)
-                    
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    
-                    adjusted_width = (max_length + 2) * 1.2
-                    worksheet.column_dimensions[column_letter].width = min(adjusted_width, 50)
-                
-                # Diagramme hinzufügen, falls gewünscht
-                if include_charts and sheet_data.get('charts'):
-                    for chart_data in sheet_data.get('charts', []):
-                        chart_type = chart_data.get('type', 'bar')
-                        chart_title = chart_data.get('title', 'Diagramm')
-                        data_cols = chart_data.get('data_cols', [])
-                        category_col = chart_data.get('category_col')
-                        
-                        if not data_cols or not category_col:
-                            continue
-                        
-                        # Diagramm erstellen
-                        if chart_type == 'bar':
-                            chart = BarChart()
-                        elif chart_type == 'line':
-                            chart = LineChart()
-                        elif chart_type == 'pie':
-                            chart = PieChart()
-                        else:
-                            continue
-                        
-                        chart.title = chart_title
-                        
-                        # Datenbereich bestimmen
-                        last_row = len(df) + 1  # +1 für die Überschrift
-                        
-                        # Kategorienspalte finden
-                        cat_col_idx = df.columns.get_loc(category_col) + 1  # +1 für Excel-Indizierung
-                        cats = Reference(worksheet, min_col=cat_col_idx, min_row=1, max_row=last_row)
-                        
-                        # Datenspalten finden und hinzufügen
-                        for data_col in data_cols:
-                            if data_col in df.columns:
-                                data_col_idx = df.columns.get_loc(data_col) + 1  # +1 für Excel-Indizierung
-                                data = Reference(worksheet, min_col=data_col_idx, min_row=1, max_row=last_row)
-                                series = chart.series.append(data)
-                                series.title = data_col
-                        
-                        # Kategorien setzen
-                        chart.set_categories(cats)
-                        
-                        # Diagramm zum Arbeitsblatt hinzufügen
-                        worksheet.add_chart(chart, "H2")
-            
-            # Zusammenfassungsblatt hinzufügen, falls gewünscht
-            if include_summary:
-                update_task_progress(self.request.id, 80, "Zusammenfassungsblatt wird erstellt")
-                
-                summary_data = []
-                summary_data.append(["Exportzusammenfassung", ""])
-                summary_data.append(["Erstellt am", datetime.now().strftime('%d.%m.%Y %H:%M')])
-                summary_data.append(["Anzahl der Blätter", len(sheets)])
-                
-                total_records = 0
-                for sheet_data in sheets:
-                    sheet_name = sheet_data.get('name', '')
-                    data = sheet_data.get('data', [])
-                    record_count = len(data)
-                    total_records += record_count
-                    summary_data.append([f"Datensätze in {sheet_name}", record_count])
-                
-                summary_data.append(["Gesamtanzahl Datensätze", total_records])
-                
-                # Zusammenfassungs-DataFrame erstellen und in Excel schreiben
-                summary_df = pd.DataFrame(summary_data, columns=["Metrik", "Wert"])
-                summary_df.to_excel(writer, sheet_name="Zusammenfassung", index=False)
-                
-                # Zusammenfassungsblatt formatieren
-                summary_sheet = writer.sheets["Zusammenfassung"]
-                
-                # Überschriften formatieren
-                for cell in summary_sheet[1]:
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-                
-                # Spaltenbreiten anpassen
-                for i, column in enumerate(summary_sheet.columns):
-                    max_length = 0
-                    column_letter = openpyxl.utils.get_column_letter(i + 1)
-                    
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    
-                    adjusted_width = (max_length + 2) * 1.2
-                    summary_sheet.column_dimensions[column_letter].width = min(adjusted_width, 50)
+        # Blätter als Zeilenströme vorbereiten
+        specs = []
+        for i, sheet_data in enumerate(sheets):
+            sheet_name = sheet_data.get('name', f'Sheet{i+1}')
+            source = _sheet_source(sheet_data, chunk_size)
+            if source is None:
+                # Ungültiges Datenformat
+                logger.warning(f"Ungültiges Datenformat für Blatt {sheet_name}, überspringe")
+                continue
+            specs.append(SheetSpec(sheet_name, source, sheet_data.get('charts', [])))
+        
+        # Fortschritt blockweise melden (20-80%); ohne bekannte Zeilenzahl nur die Zeilenanzahl
+        total_rows = sum(spec.source.total for spec in specs if spec.source.total) or None
+        
+        def report_progress(rows_written: int, sheet_name: str):
+            progress = 20 + int(60 * rows_written / total_rows) if total_rows else 50
+            update_task_progress(
+                self.request.id, min(progress, 80),
+                f"Blatt {sheet_name}: {rows_written} Zeilen geschrieben"
+            )
+        
+        def summary_rows(counts: Dict[str, int]) -> List[List[Any]]:
+            update_task_progress(self.request.id, 80, "Zusammenfassungsblatt wird erstellt")
+            rows = [
+                ["Exportzusammenfassung", ""],
+                ["Erstellt am", datetime.now().strftime('%d.%m.%Y %H:%M')],
+                ["Anzahl der Blätter", len(counts)],
+            ]
+            rows.extend([f"Datensätze in {name}", count] for name, count in counts.items())
+            rows.append(["Gesamtanzahl Datensätze", sum(counts.values())])
+            return rows
+        
+        counts = write_workbook(
+            output_file,
+            specs,
+            include_charts=include_charts,
+            summary=summary_rows if include_summary else None,
+            progress=report_progress,
+            chunk_size=chunk_size
+        )
         
         update_task_progress(self.request.id, 100, "Excel-Export erfolgreich generiert")
         
@@ -229,7 +139,8 @@ def generate_excel_export(self, export_data: Dict[str, Any],
             "status": "success",
             "export_file": output_file,
             "export_size_bytes": os.path.getsize(output_file),
-            "sheets_count": len(sheets),
+            "sheets_count": len(counts),
+            "rows_written": sum(counts.values()),
             "generated_at": datetime.now().isoformat()
         }
         
@@ -237,6 +148,20 @@ def generate_excel_export(self, export_data: Dict[str, Any],
         logger.error(f"Fehler beim Excel-Export: {str(e)}")
         raise
 
+def _sheet_source(sheet_data: Dict[str, Any], chunk_size: int) -> Optional['RowSource']:
+    """Zeilenstrom eines Blatts aus ``source`` (nur bei direktem Aufruf), ``query`` oder ``data``"""
+    if isinstance(sheet_data.get('source'), RowSource):
+        return sheet_data['source']
+    
+    if sheet_data.get('query'):
+        from backend.db.database import engine
+        return query_source(engine, sheet_data['query'], sheet_data.get('params'), chunk_size)
+    
+    data = sheet_data.get('data', [])
+    if not isinstance(data, list):
+        return None
+    return records_source(data, sheet_data.get('columns') or None)
+
 @shared_task(bind=True)
 def generate_data_analysis_export(self, analysis_results: Dict[str, Any],
                                include_visualizations: bool = True,
@@ -312,13 +237,64 @@ def generate_data_analysis_export(self, analysis_results: Dict[str, Any],
                     "charts": []
                 })
         
-        # Excel-Export mit den vorbereiteten Daten generieren
-        return generate_excel_export(self, export_data, output_file=output_file)
+        # Excel-Export mit den vorbereiteten Daten generieren (im aktuellen Task, damit der Fortschritt hier ankommt)
+        return generate_excel_export.run.__func__(self, export_data, output_file=output_file)
         
     except Exception as e:
         logger.error(f"Fehler beim Export von Datenanalyse-Ergebnissen: {str(e)}")
         raise
 
+# Gruppierungsschlüssel und Bezeichnung je Zeitraum
+PERIOD_KEYS = {
+    'day': lambda d: (d.date(), d.date().isoformat()),
+    'week': lambda d: (d.isocalendar()[:2], d.strftime('KW %V %G')),
+    'month': lambda d: ((d.year, d.month), d.strftime('%B %Y')),
+    'quarter': lambda d: ((d.year, (d.month - 1) // 3 + 1), f"Q{(d.month - 1) // 3 + 1} {d.year}"),
+}
+
+class _TransactionAggregator:
+    """Aggregiert Beträge je Zeitraum und Kategorie, während die Transaktionen geschrieben werden"""
+    
+    def __init__(self, columns: List[str], group_by: str):
+        missing = [column for column in ('date', 'amount') if column not in columns]
+        if missing:
+            raise ValueError(f"Spalten nicht gefunden: {', '.join(missing)}")
+        self.date_index = columns.index('date')
+        self.amount_index = columns.index('amount')
+        self.category_index = columns.index('category') if 'category' in columns else None
+        self.period_key = PERIOD_KEYS[group_by]
+        self.periods: Dict[Any, List[Any]] = {}
+        self.categories: Dict[Any, List[float]] = {}
+    
+    def observe(self, rows):
+        for row in rows:
+            value = row[self.date_index]
+            if isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            elif not isinstance(value, datetime):
+                value = datetime.combine(value, datetime.min.time())
+            amount = float(row[self.amount_index] or 0)
+            
+            key, label = self.period_key(value)
+            period = self.periods.setdefault(key, [label, 0.0, 0])
+            period[1] += amount
+            period[2] += 1
+            
+            if self.category_index is not None:
+                category = self.categories.setdefault(row[self.category_index], [0.0, 0])
+                category[0] += amount
+                category[1] += 1
+            yield row
+    
+    def period_rows(self):
+        for key in sorted(self.periods):
+            label, total, count = self.periods[key]
+            yield [label, total, total / count, count]
+    
+    def category_rows(self):
+        for category, (total, count) in self.categories.items():
+            yield [category, total, total / count, count]
+
 @shared_task(bind=True)
 def generate_transaction_report(self, transaction_data: Dict[str, Any],
                              group_by: str = 'day',
@@ -326,6 +302,11 @@ def generate_transaction_report(self, transaction_data: Dict[str, Any],
     """
     Generiert einen Excel-Bericht für Transaktionsdaten.
     
+    Die Transaktionen stammen aus ``transactions`` (Liste von Dicts) oder aus
+    ``query`` (SQL mit den Spalten ``date``, ``amount`` und optional
+    ``category``). Die Zusammenfassungen werden beim Schreiben des
+    Transaktionsblatts fortlaufend aggregiert.
+    
     Args:
         transaction_data: Dictionary mit Transaktionsdaten
         group_by: Gruppierung der Daten ('day', 'week', 'month', 'quarter')
@@ -337,67 +318,36 @@ def generate_transaction_report(self, transaction_data: Dict[str, Any],
     logger.info(f"Starte Transaktionsbericht mit Gruppierung nach {group_by}")
     
     try:
-        # Transaktionsdaten extrahieren
-        transactions = transaction_data.get('transactions', [])
+        if group_by not in PERIOD_KEYS:
+            raise ValueError(f"Ungültige Gruppierung: {group_by}")
         
-        if not transactions:
+        if not transaction_data.get('transactions') and not transaction_data.get('query'):
             raise ValueError("Keine Transaktionsdaten vorhanden")
         
-        # Daten in DataFrame umwandeln
-        df = pd.DataFrame(transactions)
+        chunk_size = transaction_data.get('chunk_size', DEFAULT_CHUNK_SIZE)
+        source = _sheet_source({
+            'data': transaction_data.get('transactions', []),
+            'query': transaction_data.get('query'),
+            'params': transaction_data.get('params')
+        }, chunk_size)
+        if source is None:
+            raise ValueError("Ungültiges Format der Transaktionsdaten")
         
-        # Datum konvertieren
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'])
+        aggregator = _TransactionAggregator(source.columns, group_by)
+        summary_columns = ['total_amount', 'avg_amount', 'transaction_count']
         
-        # Gruppierung nach Zeitraum
-        if group_by == 'day':
-            df['group'] = df['date'].dt.date
-        elif group_by == 'week':
-            df['group'] = df['date'].dt.isocalendar().week
-            df['group_name'] = df['date'].dt.strftime('KW %V %Y')
-        elif group_by == 'month':
-            df['group'] = df['date'].dt.month
-            df['group_name'] = df['date'].dt.strftime('%B %Y')
-        elif group_by == 'quarter':
-            df['group'] = df['date'].dt.quarter
-            df['group_name'] = 'Q' + df['date'].dt.quarter.astype(str) + ' ' + df['date'].dt.year.astype(str)
-        
-        # Gruppierte Zusammenfassung erstellen
-        summary = df.groupby('group').agg({
-            'amount': ['sum', 'mean', 'count'],
-            'group_name': 'first' if 'group_name' in df.columns else None
-        }).reset_index()
-        
-        # Spalten umbenennen
-        summary.columns = ['group', 'total_amount', 'avg_amount', 'transaction_count', 
-                         'period' if 'group_name' in df.columns else None]
-        
-        # Wenn group_name nicht existiert, group als period verwenden
-        if 'group_name' not in df.columns:
-            summary = summary.drop(columns=['period'])
-            summary['period'] = summary['group'].astype(str)
-        
-        # Nach Kategorien gruppieren, falls vorhanden
-        category_summary = None
-        if 'category' in df.columns:
-            category_summary = df.groupby('category').agg({
-                'amount': ['sum', 'mean', 'count']
-            }).reset_index()
-            
-            category_summary.columns = ['category', 'total_amount', 'avg_amount', 'transaction_count']
-        
-        # Daten für den Excel-Export vorbereiten
+        # Daten für den Excel-Export vorbereiten; die Zusammenfassungen werden
+        # erst gelesen, wenn das Transaktionsblatt geschrieben ist
         export_data = {
             "sheets": [
                 {
                     "name": "Transaktionen",
-                    "data": transactions,
+                    "source": RowSource(source.columns, aggregator.observe(source.rows), source.total),
                     "charts": []
                 },
                 {
                     "name": f"Zusammenfassung_{group_by}",
-                    "data": summary.to_dict('records'),
+                    "source": RowSource(['period'] + summary_columns, _lazy(aggregator.period_rows)),
                     "charts": [
                         {
                             "type": "bar",
@@ -415,14 +365,15 @@ def generate_transaction_report(self, transaction_data: Dict[str, Any],
                 }
             ],
             "include_charts": True,
-            "include_summary": True
+            "include_summary": True,
+            "chunk_size": chunk_size
         }
         
         # Kategorie-Zusammenfassung hinzufügen, falls vorhanden
-        if category_summary is not None:
+        if aggregator.category_index is not None:
             export_data["sheets"].append({
                 "name": "Kategorien",
-                "data": category_summary.to_dict('records'),
+                "source": RowSource(['category'] + summary_columns, _lazy(aggregator.category_rows)),
                 "charts": [
                     {
                         "type": "pie",
@@ -433,9 +384,13 @@ def generate_transaction_report(self, transaction_data: Dict[str, Any],
                 ]
             })
         
-        # Excel-Export mit den vorbereiteten Daten generieren
-        return generate_excel_export(self, export_data, output_file=output_file)
+        # Excel-Export mit den vorbereiteten Daten generieren (im aktuellen Task, damit der Fortschritt hier ankommt)
+        return generate_excel_export.run.__func__(self, export_data, output_file=output_file)
         
     except Exception as e:
         logger.error(f"Fehler bei der Generierung des Transaktionsberichts: {str(e)}")
-        raise 
\ No newline at end of file
+        raise
+
+def _lazy(rows_factory):
+    """Erzeugt die Zeilen erst beim Lesen"""
+    yield from rows_factory()
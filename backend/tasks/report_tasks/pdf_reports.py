@@ -7,7 +7,10 @@ Dieses Modul enthält Celery-Tasks für die asynchrone Generierung von PDF-Beric
 import os
 import logging
 import json
-from typing import Dict, List, Any, Optional, Union
+import itertools
+import tempfile
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Union, Iterable, Iterator, Sequence, Tuple
 from datetime import datetime
 from celery import shared_task
 
@@ -38,10 +41,212 @@ except ImportError:
 
 # Lokale Imports
 from backend.services.task_queue import update_task_progress
-from .report_utils import format_report_data, validate_report_parameters
+from .report_utils import format_report_data, render_parallel, validate_report_parameters
 
 logger = logging.getLogger(__name__)
 
+# Vorlagen: Seitenformat, Ränder und Farben je template_name
+PDF_TEMPLATES = {
+    'default': {'pagesize': 'letter', 'margin': 72, 'header_color': 'grey', 'row_colors': ('beige', 'lightgrey')},
+    'financial': {'pagesize': 'A4', 'margin': 56, 'header_color': 'darkblue', 'row_colors': ('white', 'lightgrey')},
+    'project': {'pagesize': 'A4', 'margin': 56, 'header_color': 'darkgreen', 'row_colors': ('white', 'honeydew')},
+}
+
+# Schriftart für Berichte (TTF, optional), z.B. für Sonderzeichen außerhalb von Latin-1
+REPORT_FONT_PATH = os.environ.get('REPORT_FONT_PATH')
+
+# Zeilen pro Tabellen-Flowable; große Tabellen werden in Blöcken gesetzt
+TABLE_CHUNK_ROWS = 500
+
+# Flowables, die beim Aufbau des PDFs im Voraus erzeugt werden
+FLOWABLE_BUFFER = 16
+
+# Diagramme, ab denen im Prozesspool gerendert wird
+PARALLEL_MIN_CHARTS = 4
+
+@lru_cache(maxsize=None)
+def _register_fonts() -> Tuple[str, str]:
+    """Registriert die Berichtsschrift einmal pro Prozess und liefert (normal, fett)"""
+    if REPORT_FONT_PATH and os.path.exists(REPORT_FONT_PATH):
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+        pdfmetrics.registerFont(TTFont('ReportFont', REPORT_FONT_PATH))
+        return 'ReportFont', 'ReportFont'
+    return 'Helvetica', 'Helvetica-Bold'
+
+@lru_cache(maxsize=None)
+def _get_template(template_name: str) -> Dict[str, Any]:
+    """
+    Lädt eine Berichtsvorlage einmal pro Worker-Prozess: Stylesheet, Schriften
+    und Tabellenstil werden zwischen Jobs wiederverwendet.
+    """
+    config = PDF_TEMPLATES.get(template_name, PDF_TEMPLATES['default'])
+    font, bold_font = _register_fonts()
+    
+    styles = getSampleStyleSheet()
+    for style in styles.byName.values():
+        if hasattr(style, 'fontName'):
+            style.fontName = bold_font if 'Bold' in style.fontName else font
+    
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), getattr(colors, config['header_color'])),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), bold_font),
+        ('FONTNAME', (0, 1), (-1, -1), font),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        # Jede zweite Zeile einfärben
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [getattr(colors, name) for name in config['row_colors']]),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    
+    return {
+        'pagesize': A4 if config['pagesize'] == 'A4' else letter,
+        'margin': config['margin'],
+        'title': styles['Title'],
+        'subtitle': styles['Heading2'],
+        'heading': styles['Heading1'],
+        'normal': styles['Normal'],
+        'table_style': table_style,
+    }
+
+class _FlowableStream(list):
+    """
+    Liste für ``doc.build``, die sich bei Bedarf aus einem Generator nachfüllt.
+    ReportLab entnimmt Flowables vorne und legt geteilte wieder vorne ab, daher
+    muss nie das ganze Dokument im Speicher liegen.
+    """
+    
+    def __init__(self, flowables):
+        super().__init__()
+        self._source = iter(flowables)
+    
+    def __len__(self):
+        if super().__len__() < FLOWABLE_BUFFER and self._source is not None:
+            for flowable in self._source:
+                self.append(flowable)
+                if super().__len__() >= FLOWABLE_BUFFER:
+                    break
+            else:
+                self._source = None
+        return super().__len__()
+
+def _render_chart(chart_data: Dict[str, Any], chart_path: str) -> str:
+    """Rendert ein Diagramm als PNG (läuft im Prozesspool)"""
+    chart_type = chart_data.get('type', 'bar')
+    values = chart_data.get('data', {})
+    
+    plt.figure(figsize=(7, 4))
+    
+    if chart_type == 'bar':
+        plt.bar(list(values.keys()), list(values.values()))
+    elif chart_type == 'line':
+        plt.plot(list(values.keys()), list(values.values()))
+    elif chart_type == 'pie':
+        plt.pie(list(values.values()), labels=list(values.keys()), autopct='%1.1f%%')
+    
+    plt.title(chart_data.get('title', ''))
+    plt.tight_layout()
+    
+    # Diagramm speichern
+    plt.savefig(chart_path)
+    plt.close()
+    return chart_path
+
+def _render_chart_job(job: Tuple[Dict[str, Any], str]) -> str:
+    return _render_chart(*job)
+
+def _render_charts(charts: List[Dict[str, Any]], chart_dir: str, max_workers: Optional[int] = None) -> List[Tuple[str, str]]:
+    """Rendert alle Diagramme, ab PARALLEL_MIN_CHARTS im Prozesspool; liefert (Titel, Bildpfad) in Eingabereihenfolge"""
+    jobs = []
+    for i, chart_data in enumerate(charts):
+        if not chart_data.get('data'):
+            continue
+        chart_data = {**chart_data, 'title': chart_data.get('title', f'Diagramm {i+1}')}
+        jobs.append((chart_data, os.path.join(chart_dir, f"chart_{i}.png")))
+    
+    paths = render_parallel(_render_chart_job, jobs, min_jobs=PARALLEL_MIN_CHARTS, max_workers=max_workers)
+    
+    return [(chart_data['title'], path) for (chart_data, _), path in zip(jobs, paths)]
+
+def _table_rows(table_data: Dict[str, Any]) -> Tuple[List[str], Iterable[Sequence[Any]], Optional[int]]:
+    """Kopfzeile, Zeilenstrom und (falls bekannt) Zeilenzahl einer Tabelle"""
+    if table_data.get('query'):
+        from backend.db.database import engine
+        from backend.services.report_engine import query_source
+        source = query_source(engine, table_data['query'], table_data.get('params'))
+        return table_data.get('headers') or source.columns, source.rows, None
+    rows = table_data.get('rows', [])
+    return table_data.get('headers', []), rows, len(rows) if isinstance(rows, list) else None
+
+def _report_flowables(template: Dict[str, Any], title: str, subtitle: str, author: str,
+                      content_sections: List[Dict[str, Any]], charts: List[Tuple[str, str]],
+                      tables: List[Dict[str, Any]], on_rows=None) -> Iterator[Any]:
+    """Erzeugt die Flowables des Berichts der Reihe nach"""
+    heading_style = template['heading']
+    normal_style = template['normal']
+    
+    # Titel und Untertitel hinzufügen
+    yield Paragraph(title, template['title'])
+    if subtitle:
+        yield Spacer(1, 12)
+        yield Paragraph(subtitle, template['subtitle'])
+    
+    # Metadaten hinzufügen
+    yield Spacer(1, 24)
+    yield Paragraph(f"Erstellt am: {datetime.now().strftime('%d.%m.%Y %H:%M')}", normal_style)
+    yield Paragraph(f"Autor: {author}", normal_style)
+    
+    # Trennlinie
+    yield Spacer(1, 24)
+    
+    # Inhaltsabschnitte hinzufügen
+    for section in content_sections:
+        section_title = section.get('title', '')
+        section_content = section.get('content', '')
+        
+        if section_title:
+            yield Spacer(1, 16)
+            yield Paragraph(section_title, heading_style)
+        
+        if section_content:
+            yield Spacer(1, 8)
+            # Text in Absätze aufteilen
+            for para in section_content.split('\n\n'):
+                yield Paragraph(para, normal_style)
+                yield Spacer(1, 6)
+    
+    # Diagramme hinzufügen
+    for chart_title, chart_path in charts:
+        yield Spacer(1, 16)
+        yield Paragraph(chart_title, heading_style)
+        yield Spacer(1, 8)
+        yield Image(chart_path, width=450, height=300)
+    
+    # Tabellen blockweise hinzufügen; die Kopfzeile wird auf jeder Seite wiederholt
+    rows_written = 0
+    for i, table_data in enumerate(tables):
+        headers, rows, _ = _table_rows(table_data)
+        rows = iter(rows)
+        chunk = list(itertools.islice(rows, TABLE_CHUNK_ROWS))
+        
+        if not headers or not chunk:
+            continue
+        
+        yield Spacer(1, 16)
+        yield Paragraph(table_data.get('title', f'Tabelle {i+1}'), heading_style)
+        yield Spacer(1, 8)
+        
+        while chunk:
+            table = Table([list(headers)] + [list(row) for row in chunk], repeatRows=1)
+            table.setStyle(template['table_style'])
+            yield table
+            
+            rows_written += len(chunk)
+            if on_rows is not None:
+                on_rows(rows_written)
+            chunk = list(itertools.islice(rows, TABLE_CHUNK_ROWS))
+
 @shared_task(bind=True)
 def generate_pdf_report(self, report_data: Dict[str, Any], 
                       template_name: str = 'default',
@@ -89,151 +294,47 @@ def generate_pdf_report(self, report_data: Dict[str, Any],
         
         update_task_progress(self.request.id, 20, "PDF-Dokument wird vorbereitet")
         
+        # Vorlage mit Stilen und Schriften (pro Worker-Prozess zwischengespeichert)
+        template = _get_template(template_name)
+        margin = template['margin']
+        
         # PDF-Dokument erstellen
         doc = SimpleDocTemplate(
             output_file,
-            pagesize=letter,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=72
+            pagesize=template['pagesize'],
+            rightMargin=margin,
+            leftMargin=margin,
+            topMargin=margin,
+            bottomMargin=margin
         )
         
-        # Stile definieren
-        styles = getSampleStyleSheet()
-        title_style = styles['Title']
-        subtitle_style = styles['Heading2']
-        heading_style = styles['Heading1']
-        normal_style = styles['Normal']
-        
-        # Elemente für das PDF sammeln
-        elements = []
-        
-        # Titel und Untertitel hinzufügen
-        elements.append(Paragraph(title, title_style))
-        if subtitle:
-            elements.append(Spacer(1, 12))
-            elements.append(Paragraph(subtitle, subtitle_style))
-        
-        # Metadaten hinzufügen
-        elements.append(Spacer(1, 24))
-        elements.append(Paragraph(f"Erstellt am: {datetime.now().strftime('%d.%m.%Y %H:%M')}", normal_style))
-        elements.append(Paragraph(f"Autor: {author}", normal_style))
-        
-        # Trennlinie
-        elements.append(Spacer(1, 24))
-        
-        update_task_progress(self.request.id, 30, "Berichtsinhalte werden formatiert")
-        
-        # Inhaltsabschnitte hinzufügen
-        for section in content_sections:
-            section_title = section.get('title', '')
-            section_content = section.get('content', '')
+        # Temporäre Diagrammdateien werden mit dem Verzeichnis entfernt
+        with tempfile.TemporaryDirectory(prefix='report_charts_') as chart_dir:
+            update_task_progress(self.request.id, 30, "Diagramme werden generiert")
             
-            if section_title:
-                elements.append(Spacer(1, 16))
-                elements.append(Paragraph(section_title, heading_style))
-            
-            if section_content:
-                elements.append(Spacer(1, 8))
-                # Text in Absätze aufteilen
-                paragraphs = section_content.split('\n\n')
-                for para in paragraphs:
-                    elements.append(Paragraph(para, normal_style))
-                    elements.append(Spacer(1, 6))
-        
-        update_task_progress(self.request.id, 50, "Diagramme werden generiert")
-        
-        # Diagramme hinzufügen
-        if MATPLOTLIB_AVAILABLE and charts:
-            for i, chart_data in enumerate(charts):
-                chart_type = chart_data.get('type', 'bar')
-                chart_title = chart_data.get('title', f'Diagramm {i+1}')
-                chart_data_values = chart_data.get('data', {})
-                
-                if not chart_data_values:
-                    continue
-                
-                # Temporäre Datei für das Diagramm
-                chart_filename = f"temp_chart_{i}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                chart_path = os.path.join('temp', chart_filename)
-                os.makedirs('temp', exist_ok=True)
-                
-                # Diagramm erstellen
-                plt.figure(figsize=(7, 4))
-                
-                if chart_type == 'bar':
-                    plt.bar(list(chart_data_values.keys()), list(chart_data_values.values()))
-                elif chart_type == 'line':
-                    plt.plot(list(chart_data_values.keys()), list(chart_data_values.values()))
-                elif chart_type == 'pie':
-                    plt.pie(list(chart_data_values.values()), labels=list(chart_data_values.keys()), autopct='%1.1f%%')
-                
-                plt.title(chart_title)
-                plt.tight_layout()
-                
-                # Diagramm speichern
-                plt.savefig(chart_path)
-                plt.close()
-                
-                # Diagramm zum PDF hinzufügen
-                elements.append(Spacer(1, 16))
-                elements.append(Paragraph(chart_title, heading_style))
-                elements.append(Spacer(1, 8))
-                elements.append(Image(chart_path, width=450, height=300))
-        
-        update_task_progress(self.request.id, 70, "Tabellen werden formatiert")
-        
-        # Tabellen hinzufügen
-        for i, table_data in enumerate(tables):
-            table_title = table_data.get('title', f'Tabelle {i+1}')
-            headers = table_data.get('headers', [])
-            rows = table_data.get('rows', [])
+            rendered_charts = _render_charts(charts, chart_dir) if MATPLOTLIB_AVAILABLE and charts else []
             
-            if not headers or not rows:
-                continue
+            update_task_progress(self.request.id, 50, "PDF wird erstellt")
             
-            elements.append(Spacer(1, 16))
-            elements.append(Paragraph(table_title, heading_style))
-            elements.append(Spacer(1, 8))
-            
-            # Tabelle erstellen
-            table = Table([headers] + rows)
-            
-            # Tabellenstil definieren
-            table_style = TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ])
+            # Fortschritt blockweise über die bekannten Tabellenzeilen melden
+            known_rows = [
+                len(table.get('rows')) for table in tables
+                if isinstance(table.get('rows'), list) and not table.get('query')
+            ]
+            total_rows = sum(known_rows) if len(known_rows) == len(tables) else None
             
-            # Jede zweite Zeile einfärben
-            for i in range(1, len(rows) + 1):
-                if i % 2 == 0:
-                    table_style.add('BACKGROUND', (0, i), (-1, i), colors.lightgrey)
+            def report_rows(rows_written: int):
+                if total_rows:
+                    progress = 50 + int(40 * min(rows_written / total_rows, 1.0))
+                else:
+                    progress = 50
+                update_task_progress(self.request.id, progress, f"{rows_written} Tabellenzeilen gesetzt")
             
-            table.setStyle(table_style)
-            elements.append(table)
-        
-        update_task_progress(self.request.id, 90, "PDF wird erstellt")
-        
-        # PDF generieren
-        doc.build(elements)
-        
-        # Temporäre Diagrammdateien löschen
-        if MATPLOTLIB_AVAILABLE and charts:
-            for i in range(len(charts)):
-                chart_filename = f"temp_chart_{i}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                chart_path = os.path.join('temp', chart_filename)
-                if os.path.exists(chart_path):
-                    try:
-                        os.remove(chart_path)
-                    except Exception:
-                        pass
+            # PDF generieren; Flowables werden während des Aufbaus erzeugt
+            doc.build(_FlowableStream(_report_flowables(
+                template, title, subtitle, author, content_sections,
+                rendered_charts, tables, on_rows=report_rows
+            )))
         
         update_task_progress(self.request.id, 100, "PDF-Bericht erfolgreich generiert")
         
@@ -335,8 +436,8 @@ def generate_financial_report(self, financial_data: Dict[str, Any],
             ]
         }
         
-        # Standard-PDF-Bericht mit den formatierten Finanzdaten generieren
-        return generate_pdf_report(self, report_data, template_name='financial', output_file=output_file)
+        # Standard-PDF-Bericht mit den formatierten Finanzdaten generieren (im aktuellen Task, damit der Fortschritt hier ankommt)
+        return generate_pdf_report.run.__func__(self, report_data, template_name='financial', output_file=output_file)
         
     except Exception as e:
         logger.error(f"Fehler bei der Finanzberichtsgenerierung: {str(e)}")
@@ -470,8 +571,8 @@ def generate_project_status_report(self, project_data: Dict[str, Any],
                     "content": "Ein detaillierter Zeitplan ist im Anhang verfügbar."
                 })
         
-        # Standard-PDF-Bericht mit den formatierten Projektdaten generieren
-        return generate_pdf_report(self, report_data, template_name='project', output_file=output_file)
+        # Standard-PDF-Bericht mit den formatierten Projektdaten generieren (im aktuellen Task, damit der Fortschritt hier ankommt)
+        return generate_pdf_report.run.__func__(self, report_data, template_name='project', output_file=output_file)
         
     except Exception as e:
         logger.error(f"Fehler bei der Projektstatusberichtsgenerierung: {str(e)}")
@@ -5,11 +5,63 @@ Dieses Modul enthält Hilfsfunktionen für die Formatierung und Validierung von
 """
 
 import logging
-from typing import Dict, List, Any, Optional, Union, Tuple
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Any, Optional, Sequence, Union, Tuple
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Prozesse des gemeinsamen Render-Pools
+RENDER_POOL_WORKERS = int(os.environ.get("REPORT_RENDER_WORKERS", "0")) or (os.cpu_count() or 1)
+
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(max_workers=RENDER_POOL_WORKERS)
+        return _render_pool
+
+def _reset_render_pool() -> None:
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=False, cancel_futures=True)
+            _render_pool = None
+
+def render_parallel(func: Callable, items: Sequence[Any], min_jobs: int, max_workers: Optional[int] = None) -> List[Any]:
+    """
+    Wendet ``func`` auf alle Elemente an, ab ``min_jobs`` Elementen im
+    gemeinsamen Prozesspool des Moduls.
+    
+    Der Pool wird einmal je Prozess angelegt statt je Aufruf. In daemonischen
+    Prozessen (z.B. Prefork-Worker von Celery), die keine Kindprozesse starten
+    dürfen, sowie mit ``max_workers=1`` wird im aktuellen Prozess gerechnet.
+    
+    Args:
+        func: Picklebare Funktion
+        items: Eingaben
+        min_jobs: Mindestanzahl Elemente für den Prozesspool
+        max_workers: 1 erzwingt die Berechnung im aktuellen Prozess
+    
+    Returns:
+        Ergebnisse in Eingabereihenfolge
+    """
+    if len(items) < max(min_jobs, 2) or max_workers == 1 or multiprocessing.current_process().daemon:
+        return [func(item) for item in items]
+    try:
+        return list(_get_render_pool().map(func, items))
+    except BrokenProcessPool:
+        logger.warning("Render-Pool ausgefallen, Berechnung im aktuellen Prozess")
+        _reset_render_pool()
+        return [func(item) for item in items]
+
 def validate_report_parameters(data: Dict[str, Any], required_fields: List[str]) -> bool:
     """
     Validiert die Parameter für die Berichtsgenerierung.
@@ -310,38 +310,36 @@ def generate_inventory_report(
     }
 
 @shared_task(name="backend.tasks.reports.refresh_materialized_views")
-def refresh_materialized_views() -> Dict[str, Any]:
+def refresh_materialized_views(changed_tables: Optional[List[str]] = None,
+                               only_changed: bool = False) -> Dict[str, Any]:
     """
     Aktualisiert materialisierte Ansichten in der Datenbank.
     
+    Standardmäßig werden alle Ansichten vollständig neu aufgebaut. Mit
+    ``only_changed`` werden nur Ansichten aktualisiert, deren Basistabellen
+    sich laut Änderungszähler geändert haben; Lagerbewegungs-Aggregate werden
+    dann inkrementell fortgeschrieben.
+    
+    Args:
+        changed_tables: Geänderte Basistabellen (impliziert ``only_changed``)
+        only_changed: Nur geänderte Ansichten aktualisieren
+    
     Returns:
         Dict: Status der Aktualisierung
     """
+    from backend.db.database import engine
+    from backend.db.materialized_views import refresh_all_materialized_views, refresh_changed_views
+    
     logger.info("Aktualisiere materialisierte Ansichten")
     
-    # In einer realen Anwendung würden hier die materialisierten Ansichten aktualisiert
-    # Für dieses Beispiel simulieren wir nur die Verarbeitung
-    views = [
-        "financial_summary",
-        "inventory_summary",
-        "sales_by_product",
-        "purchases_by_supplier"
-    ]
-    
-    results = {}
-    
-    for view in views:
-        # Simuliere Verarbeitung
-        time.sleep(0.5)
-        results[view] = {
-            "status": "success",
-            "updated_at": datetime.now().isoformat(),
-            "rows_affected": 100 + hash(view) % 900  # Zufällige Anzahl von Zeilen
-        }
+    if only_changed or changed_tables is not None:
+        results = refresh_changed_views(engine, changed_tables)
+    else:
+        results = refresh_all_materialized_views(engine, full=True)
     
     return {
-        "status": "success",
-        "views_updated": len(views),
+        "status": "success" if all(r["success"] for r in results.values()) else "partial",
+        "views_updated": sum(1 for r in results.values() if r["success"]),
         "details": results,
         "completed_at": datetime.now().isoformat()
     } 
\ No newline at end of file
@@ -12,10 +12,29 @@ from typing import Dict, List, Any, Optional, Union
 from datetime import datetime, timedelta
 import decimal
 from decimal import Decimal
-from celery import shared_task
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from celery import chord, group, shared_task
 
 # Lokale Imports
 from backend.services.task_queue import update_task_progress
+from backend.services.bank_reconciliation import (
+    DEFAULT_DATE_WINDOW,
+    DEFAULT_FUZZY_WINDOW,
+    BankReconciler,
+    load_bookings,
+    load_statement,
+)
+from backend.services.payment_batches import (
+    DEFAULT_LEDGER_PATH,
+    DEFAULT_PARTITIONS,
+    LOCAL_LEDGER_PATH,
+    PaymentLedger,
+    build_report,
+    debtor_account,
+    partition_payments,
+    process_partition,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +45,59 @@ class DecimalEncoder(json.JSONEncoder):
             return float(obj)
         return super(DecimalEncoder, self).default(obj)
 
+def _execute_payment(payment_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validiert und führt eine Zahlung aus (ohne Fortschrittsmeldungen).
+    
+    Wird von process_payment und der partitionierten Stapelverarbeitung genutzt.
+    
+    Args:
+        payment_data: Dictionary mit Zahlungsinformationen, siehe process_payment
+    
+    Returns:
+        Dict mit Informationen zur verarbeiteten Zahlung
+    """
+    # Erforderliche Felder prüfen
+    required_fields = ['amount', 'currency', 'payment_method', 'customer_id']
+    missing_fields = [field for field in required_fields if field not in payment_data]
+    
+    if missing_fields:
+        raise ValueError(f"Fehlende Pflichtfelder in den Zahlungsdaten: {', '.join(missing_fields)}")
+    
+    # Zahlungsdaten extrahieren
+    amount = Decimal(str(payment_data['amount']))
+    currency = payment_data['currency']
+    payment_method = payment_data['payment_method']
+    customer_id = payment_data['customer_id']
+    reference = payment_data.get('reference', f"PAY-{datetime.now().strftime('%Y%m%d%H%M%S')}")
+    metadata = payment_data.get('metadata', {})
+    # Stapelzahlungen: der Zahlungsdienstleister muss Wiederholungen mit gleichem Schlüssel erkennen
+    idempotency_key = payment_data.get('idempotency_key')
+    
+    # Zahlungsmethode validieren
+    valid_payment_methods = ['credit_card', 'bank_transfer', 'paypal', 'sepa', 'crypto']
+    if payment_method not in valid_payment_methods:
+        raise ValueError(f"Ungültige Zahlungsmethode: {payment_method}")
+    
+    # In einer realen Anwendung würde hier die Integration mit einem Zahlungsdienstleister erfolgen
+    # Beispiel: Stripe, PayPal, etc.
+    
+    # Wir simulieren eine erfolgreiche Zahlung
+    transaction_id = f"TXN-{datetime.now().strftime('%Y%m%d%H%M%S')}-{hash(reference) % 10000:04d}"
+    
+    return {
+        "status": "success",
+        "transaction_id": transaction_id,
+        "reference": reference,
+        "amount": float(amount),
+        "currency": currency,
+        "payment_method": payment_method,
+        "customer_id": customer_id,
+        "processed_at": datetime.now().isoformat(),
+        "idempotency_key": idempotency_key,
+        "metadata": metadata
+    }
+
 @shared_task(bind=True)
 def process_payment(self, payment_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -49,34 +121,9 @@ def process_payment(self, payment_data: Dict[str, Any]) -> Dict[str, Any]:
         # Fortschritt aktualisieren
         update_task_progress(self.request.id, 10, "Zahlungsdaten werden validiert")
         
-        # Erforderliche Felder prüfen
-        required_fields = ['amount', 'currency', 'payment_method', 'customer_id']
-        missing_fields = [field for field in required_fields if field not in payment_data]
-        
-        if missing_fields:
-            raise ValueError(f"Fehlende Pflichtfelder in den Zahlungsdaten: {', '.join(missing_fields)}")
-        
-        # Zahlungsdaten extrahieren
-        amount = Decimal(str(payment_data['amount']))
-        currency = payment_data['currency']
-        payment_method = payment_data['payment_method']
-        customer_id = payment_data['customer_id']
-        reference = payment_data.get('reference', f"PAY-{datetime.now().strftime('%Y%m%d%H%M%S')}")
-        metadata = payment_data.get('metadata', {})
-        
-        # Zahlungsmethode validieren
-        valid_payment_methods = ['credit_card', 'bank_transfer', 'paypal', 'sepa', 'crypto']
-        if payment_method not in valid_payment_methods:
-            raise ValueError(f"Ungültige Zahlungsmethode: {payment_method}")
-        
-        # Zahlungsverarbeitung simulieren
+        # Zahlung validieren und verarbeiten
         update_task_progress(self.request.id, 30, "Zahlung wird verarbeitet")
-        
-        # In einer realen Anwendung würde hier die Integration mit einem Zahlungsdienstleister erfolgen
-        # Beispiel: Stripe, PayPal, etc.
-        
-        # Wir simulieren eine erfolgreiche Zahlung
-        transaction_id = f"TXN-{datetime.now().strftime('%Y%m%d%H%M%S')}-{hash(reference) % 10000:04d}"
+        result = _execute_payment(payment_data)
         
         # Transaktion in der Datenbank speichern (simuliert)
         update_task_progress(self.request.id, 70, "Transaktion wird gespeichert")
@@ -87,18 +134,7 @@ def process_payment(self, payment_data: Dict[str, Any]) -> Dict[str, Any]:
         update_task_progress(self.request.id, 100, "Zahlungsverarbeitung abgeschlossen")
         
         # Ergebnis zurückgeben
-        return {
-            "status": "success",
-            "transaction_id": transaction_id,
-            "reference": reference,
-            "amount": float(amount),
-            "currency": currency,
-            "payment_method": payment_method,
-            "customer_id": customer_id,
-            "processed_at": datetime.now().isoformat(),
-            "processing_time": processing_time,
-            "metadata": metadata
-        }
+        return {**result, "processing_time": processing_time}
         
     except Exception as e:
         logger.error(f"Fehler bei der Zahlungsverarbeitung: {str(e)}")
@@ -209,14 +245,25 @@ def generate_invoice(self, invoice_data: Dict[str, Any]) -> Dict[str, Any]:
 
 @shared_task(bind=True)
 def reconcile_transactions(self, start_date: str, end_date: str, 
-                         account_id: Optional[str] = None) -> Dict[str, Any]:
+                         account_id: Optional[str] = None,
+                         statement_files: Optional[List[str]] = None,
+                         bookings_file: Optional[str] = None,
+                         date_window: int = DEFAULT_DATE_WINDOW,
+                         max_details: int = 100) -> Dict[str, Any]:
     """
     Führt einen Abgleich von Transaktionen für einen bestimmten Zeitraum durch.
     
+    Die Umsätze der Kontoauszüge (MT940 oder CAMT.053) werden mit den gebuchten
+    Zahlungen abgeglichen, siehe backend.services.bank_reconciliation.
+    
     Args:
         start_date: Startdatum für den Abgleich (ISO-Format)
         end_date: Enddatum für den Abgleich (ISO-Format)
         account_id: Konto-ID (optional, falls nicht angegeben werden alle Konten abgeglichen)
+        statement_files: Pfade der Kontoauszugsdateien
+        bookings_file: CSV-Export der gebuchten Zahlungen
+        date_window: Zulässige Abweichung zwischen Buchungs- und Umsatzdatum in Tagen
+        max_details: Maximale Anzahl Einzelfälle je Kategorie im Ergebnis
     
     Returns:
         Dict mit Informationen zum Transaktionsabgleich
@@ -237,34 +284,44 @@ def reconcile_transactions(self, start_date: str, end_date: str,
         if start_date_obj > end_date_obj:
             raise ValueError("Startdatum muss vor dem Enddatum liegen")
         
-        # In einer realen Anwendung würden hier Transaktionen aus der Datenbank geladen
-        # und mit externen Datenquellen (z.B. Bankauszügen) abgeglichen werden
+        if not statement_files or not bookings_file:
+            raise ValueError("Kontoauszüge und gebuchte Zahlungen müssen angegeben werden")
+        
+        # Buchungen mit Vorlauf laden, damit Zahlungen am Rand des Zeitraums zugeordnet werden
+        first_day, last_day = start_date_obj.date(), end_date_obj.date()
+        margin = timedelta(days=DEFAULT_FUZZY_WINDOW)
+        
+        lines = [
+            line
+            for path in statement_files
+            for line in load_statement(path)
+            if first_day <= line.booking_date <= last_day
+            and (account_id is None or line.account == account_id)
+        ]
+        bookings = [
+            booking
+            for booking in load_bookings(bookings_file)
+            if first_day - margin <= booking.booking_date <= last_day + margin
+            and (account_id is None or booking.account in ("", account_id))
+        ]
         
-        # Simulierte Transaktionsdaten
         account_filter = f" für Konto {account_id}" if account_id else ""
-        update_task_progress(self.request.id, 30, f"Transaktionen{account_filter} werden abgeglichen")
-        
-        # Simulierte Ergebnisse des Abgleichs
-        reconciliation_results = {
-            "total_transactions": 120,
-            "matched_transactions": 115,
-            "unmatched_transactions": 5,
-            "duplicate_transactions": 2,
-            "missing_transactions": 3,
-            "accounts_processed": [account_id] if account_id else ["ACC-001", "ACC-002", "ACC-003"],
-            "unmatched_details": [
-                {
-                    "transaction_id": "TXN-20230405-1234",
-                    "date": "2023-04-05T14:30:00",
-                    "amount": 150.75,
-                    "description": "Unbekannte Zahlung",
-                    "status": "unmatched"
-                },
-                # Weitere nicht abgeglichene Transaktionen...
-            ]
-        }
-        
-        # Abgleichsbericht erstellen (simuliert)
+        update_task_progress(self.request.id, 30, f"{len(lines)} Transaktionen{account_filter} werden abgeglichen")
+        
+        reconciler = BankReconciler(
+            date_window=date_window,
+            progress_callback=lambda value, message: update_task_progress(
+                self.request.id, 30 + int(value * 40), message
+            ),
+        )
+        result = reconciler.reconcile(lines, bookings)
+        
+        reconciliation_results = result.summary(max_details)
+        reconciliation_results["accounts_processed"] = (
+            [account_id] if account_id else sorted({line.account for line in lines})
+        )
+        
+        # Abgleichsbericht erstellen
         update_task_progress(self.request.id, 70, "Abgleichsbericht wird erstellt")
         
         # In einer realen Anwendung würde hier ein Bericht generiert werden
@@ -492,13 +549,98 @@ def analyze_financial_data(self, data_params: Dict[str, Any]) -> Dict[str, Any]:
         logger.error(f"Fehler bei der Finanzdatenanalyse: {str(e)}")
         raise
 
+def _run_partition(batch_id: str, partition: int, items: List[Any],
+                   balances: Optional[Dict[str, Any]], ledger_path: str,
+                   retry_pending: bool = False) -> Dict[str, Any]:
+    """Partition mit eigener Datenbankverbindung verarbeiten (Worker-Pool oder Celery-Worker)."""
+    ledger = PaymentLedger(ledger_path)
+    try:
+        return process_partition(ledger, batch_id, partition, items, _execute_payment, balances, retry_pending)
+    finally:
+        ledger.close()
+
+@shared_task(bind=True, autoretry_for=(sqlite3.OperationalError,), retry_backoff=True, max_retries=5)
+def process_payment_partition(self, batch_id: str, partition: int, items: List[Any],
+                              balances: Optional[Dict[str, Any]] = None,
+                              ledger_path: str = DEFAULT_LEDGER_PATH,
+                              retry_pending: bool = False) -> Dict[str, Any]:
+    """
+    Verarbeitet eine Partition eines Zahlungsstapels (Kopf-Task des Chords).
+    
+    Eine Wiederholung nach Sperrfehler führt bereits begonnene Zahlungen nicht
+    erneut aus (Status ``pending`` im Journal).
+    
+    Args:
+        batch_id: Stapel-ID
+        partition: Nummer der Partition
+        items: Liste von (Position, Zahlungsdaten)
+        balances: Verfügbarer Betrag je Schuldnerkonto dieser Partition
+        ledger_path: Pfad des Buchungsjournals
+        retry_pending: Offene Zahlungen erneut ausführen (nur mit idempotentem Zahlungsdienstleister)
+    
+    Returns:
+        Kennzahlen der Partition
+    """
+    logger.info(f"Verarbeite Partition {partition} des Stapels {batch_id} mit {len(items)} Zahlungen")
+    return _run_partition(batch_id, partition, [tuple(item) for item in items], balances, ledger_path,
+                          retry_pending)
+
+@shared_task(bind=True)
+def aggregate_payment_batch(self, partition_results: List[Dict[str, Any]], batch_id: str,
+                            total_payments: int, ledger_path: str = DEFAULT_LEDGER_PATH) -> Dict[str, Any]:
+    """
+    Fasst die Partitionen eines Zahlungsstapels zum Stapelbericht zusammen (Callback des Chords).
+    
+    Args:
+        partition_results: Kennzahlen der Partitionen
+        batch_id: Stapel-ID
+        total_payments: Anzahl der Zahlungen im Stapel
+        ledger_path: Pfad des Buchungsjournals
+    
+    Returns:
+        Dict mit Informationen zur Stapelverarbeitung
+    """
+    ledger = PaymentLedger(ledger_path)
+    try:
+        report = build_report(ledger, batch_id, total_payments)
+    finally:
+        ledger.close()
+    logger.info(
+        f"Stapel {batch_id}: {report['successful_payments']} erfolgreich, "
+        f"{report['failed_payments']} fehlgeschlagen in {len(partition_results)} Partitionen"
+    )
+    return {**report, "completed_at": datetime.now().isoformat()}
+
 @shared_task(bind=True)
-def process_batch_payments(self, payment_batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+def process_batch_payments(self, payment_batch: List[Dict[str, Any]],
+                           batch_id: Optional[str] = None,
+                           balances: Optional[Dict[str, Any]] = None,
+                           partitions: int = DEFAULT_PARTITIONS,
+                           use_chord: bool = False,
+                           max_workers: Optional[int] = None,
+                           ledger_path: str = DEFAULT_LEDGER_PATH,
+                           retry_pending: bool = False) -> Dict[str, Any]:
     """
     Verarbeitet einen Stapel von Zahlungen.
     
+    Der Stapel wird nach Schuldnerkonto partitioniert; jede Partition prüft die
+    Deckung ihrer Konten und bucht unabhängig von den anderen. Gebuchte Zahlungen
+    werden im Buchungsjournal unter (batch_id, Position) festgehalten, ein erneut
+    eingereichter Stapel mit derselben batch_id bucht daher nur die noch nicht
+    begonnenen oder fehlgeschlagenen Zahlungen. Die batch_id ist Pflicht: ein
+    wiederkehrender Stapel mit gleichem Inhalt ist ein neuer Zahlungslauf.
+    
     Args:
         payment_batch: Liste von Zahlungsdaten
+        batch_id: Stapel-ID des Zahlungslaufs (Pflicht)
+        balances: Verfügbarer Betrag je Schuldnerkonto (optional)
+        partitions: Maximale Anzahl Partitionen
+        use_chord: Partitionen als Celery-Chord auf die Worker verteilen; den
+            Stapelbericht liefert dann aggregate_payment_batch. Erfordert ein
+            gemeinsames Buchungsjournal (PAYMENT_LEDGER_DB bzw. ledger_path)
+        max_workers: Threads für die lokale Verarbeitung ohne Chord
+        ledger_path: Pfad des Buchungsjournals
+        retry_pending: Offene Zahlungen erneut ausführen (nur mit idempotentem Zahlungsdienstleister)
     
     Returns:
         Dict mit Informationen zur Stapelverarbeitung
@@ -512,69 +654,76 @@ def process_batch_payments(self, payment_batch: List[Dict[str, Any]]) -> Dict[st
         if not payment_batch:
             raise ValueError("Keine Zahlungen zur Verarbeitung angegeben")
         
-        # Ergebnisse initialisieren
-        results = {
-            "total_payments": len(payment_batch),
-            "successful_payments": 0,
-            "failed_payments": 0,
-            "total_amount": Decimal('0.00'),
-            "payment_results": []
-        }
+        if not batch_id:
+            raise ValueError("batch_id ist erforderlich, um Wiederholungen eines Zahlungslaufs zu erkennen")
+        if use_chord and os.path.abspath(ledger_path) == os.path.abspath(LOCAL_LEDGER_PATH):
+            raise ValueError(
+                "use_chord erfordert ein gemeinsames Buchungsjournal für alle Worker "
+                "(PAYMENT_LEDGER_DB oder ledger_path setzen)"
+            )
+        total_payments = len(payment_batch)
+        
+        # Vollständig verarbeiteter Stapel: gespeicherten Bericht zurückgeben
+        ledger = PaymentLedger(ledger_path)
+        try:
+            report = ledger.get_report(batch_id)
+        finally:
+            ledger.close()
+        if (report and report["failed_payments"] == 0 and report["unprocessed_payments"] == 0
+                and report.get("pending_payments", 0) == 0):
+            logger.info(f"Stapel {batch_id} wurde bereits verarbeitet")
+            return {**report, "cached": True, "completed_at": datetime.now().isoformat()}
+        
+        buckets = partition_payments(payment_batch, partitions)
+        balances = balances or {}
+        
+        def partition_balances(items):
+            accounts = {debtor_account(payment) for _, payment in items}
+            return {account: balances[account] for account in accounts if account in balances}
+        
+        if use_chord:
+            header = group(
+                process_payment_partition.s(batch_id, number, items, partition_balances(items), ledger_path,
+                                            retry_pending)
+                for number, items in enumerate(buckets)
+            )
+            result = chord(header)(aggregate_payment_batch.s(batch_id, total_payments, ledger_path))
+            update_task_progress(self.request.id, 100, f"{len(buckets)} Partitionen an die Worker verteilt")
+            return {
+                "status": "submitted",
+                "batch_id": batch_id,
+                "total_payments": total_payments,
+                "partitions": len(buckets),
+                "report_task_id": result.id,
+                "submitted_at": datetime.now().isoformat()
+            }
         
-        # Zahlungen einzeln verarbeiten
-        for i, payment_data in enumerate(payment_batch):
-            progress = int(100 * i / len(payment_batch))
-            update_task_progress(self.request.id, progress, f"Verarbeite Zahlung {i+1}/{len(payment_batch)}")
-            
-            try:
-                # Zahlung verarbeiten
-                payment_result = process_payment.apply(
-                    args=[payment_data],
-                    throw=True
-                ).get()
-                
-                # Erfolgreiche Zahlung zählen
-                results["successful_payments"] += 1
-                results["total_amount"] += Decimal(str(payment_result["amount"]))
-                
-                # Ergebnis speichern
-                results["payment_results"].append({
-                    "status": "success",
-                    "transaction_id": payment_result["transaction_id"],
-                    "amount": payment_result["amount"],
-                    "currency": payment_result["currency"]
-                })
-                
-            except Exception as e:
-                logger.error(f"Fehler bei der Verarbeitung von Zahlung {i+1}: {str(e)}")
-                
-                # Fehlgeschlagene Zahlung zählen
-                results["failed_payments"] += 1
-                
-                # Fehlermeldung speichern
-                results["payment_results"].append({
-                    "status": "error",
-                    "payment_data": payment_data,
-                    "error": str(e)
-                })
+        # Partitionen lokal in einem Worker-Pool verarbeiten
+        update_task_progress(self.request.id, 5, f"Verarbeite {len(buckets)} Partitionen")
+        partition_results = []
+        with ThreadPoolExecutor(max_workers=max_workers or min(len(buckets), 8)) as executor:
+            futures = [
+                executor.submit(_run_partition, batch_id, number, items, partition_balances(items), ledger_path,
+                                retry_pending)
+                for number, items in enumerate(buckets)
+            ]
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    partition_results.append(future.result())
+                except Exception as e:
+                    # Zahlungen dieser Partition bleiben offen und werden bei Wiederholung gebucht
+                    logger.error(f"Partition im Stapel {batch_id} abgebrochen: {str(e)}")
+                update_task_progress(
+                    self.request.id, 5 + int(90 * done / len(buckets)),
+                    f"Partition {done}/{len(buckets)} verarbeitet"
+                )
+        
+        report = aggregate_payment_batch.run(partition_results, batch_id, total_payments, ledger_path)
         
         update_task_progress(self.request.id, 100, "Stapelverarbeitung abgeschlossen")
         
-        # Erfolgsrate berechnen
-        success_rate = (results["successful_payments"] / results["total_payments"]) * 100 if results["total_payments"] > 0 else 0
-        
-        # Ergebnis zurückgeben
-        return {
-            "status": "success",
-            "total_payments": results["total_payments"],
-            "successful_payments": results["successful_payments"],
-            "failed_payments": results["failed_payments"],
-            "success_rate": round(success_rate, 2),
-            "total_amount": float(results["total_amount"]),
-            "payment_results": results["payment_results"],
-            "completed_at": datetime.now().isoformat()
-        }
-        
+        return report
+    
     except Exception as e:
         logger.error(f"Fehler bei der Stapelverarbeitung von Zahlungen: {str(e)}")
         raise
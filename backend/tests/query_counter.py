@@ -0,0 +1,41 @@
+"""
+Hilfsmittel zum Zählen von SQL-Abfragen in Tests (Erkennung von N+1-Regressionen)
+"""
+
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryCounter:
+    """Zählt alle SQL-Statements, die während des Kontexts auf der Engine laufen."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+
+
+@contextmanager
+def assert_max_queries(engine: Engine, expected: int) -> Iterator[QueryCounter]:
+    """Schlägt fehl, wenn im Block mehr als ``expected`` Abfragen ausgeführt werden."""
+    with QueryCounter(engine) as counter:
+        yield counter
+    assert counter.count <= expected, (
+        f"{counter.count} Abfragen statt höchstens {expected}:\n" + "\n".join(counter.statements)
+    )
@@ -0,0 +1,101 @@
+"""
+Tests für die Ausführungsschicht der Analyse-Tasks
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from backend.services.analytics_engine import (
+    DatasetCache,
+    ModelStore,
+    ResultCache,
+    fingerprint,
+    map_groups,
+)
+
+
+@pytest.fixture
+def sales_csv(tmp_path):
+    path = tmp_path / "verkaeufe.csv"
+    pd.DataFrame({
+        "artikel": ["A", "A", "B", "B", "C"],
+        "menge": [1, 2, 3, 4, 5],
+        "umsatz": [10.0, 20.0, 30.0, 40.0, 50.0],
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+def _group_total(frame):
+    if frame["artikel"].iloc[0] == "C":
+        raise ValueError("zu wenige Daten")
+    return int(frame["menge"].sum())
+
+
+def test_dataset_cache_reads_selected_columns_and_detects_changes(sales_csv, tmp_path):
+    cache = DatasetCache(str(tmp_path / "cache"))
+    df = cache.load(sales_csv, ["menge"])
+    assert list(df.columns) == ["menge"]
+    # Der Aufrufer erhält eine Kopie: Änderungen erreichen den Cache nicht
+    df["menge"] = 0
+    assert cache.load(sales_csv, ["menge"])["menge"].tolist() == [1, 2, 3, 4, 5]
+
+    with pytest.raises(ValueError):
+        cache.load(sales_csv, ["fehlt"])
+
+    key_before = fingerprint("t", sales_csv, {})
+    with open(sales_csv, "a", encoding="utf-8") as f:
+        f.write("D,6,60.0\n")
+    os.utime(sales_csv, ns=(1, 1))
+    assert fingerprint("t", sales_csv, {}) != key_before
+    assert cache.load(sales_csv, ["menge"])["menge"].tolist() == [1, 2, 3, 4, 5, 6]
+
+
+def test_result_cache_returns_stored_result(sales_csv, tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"summe": 15}
+
+    key = fingerprint("summe", sales_csv, {"spalte": "menge"})
+    assert cache.get_or_compute(key, compute) == {"summe": 15}
+    assert cache.get_or_compute(key, compute) == {"summe": 15, "cached": True}
+    assert len(calls) == 1
+
+
+def test_result_cache_evicts_by_age_and_size(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_bytes=200, max_age=3600)
+    for n in range(10):
+        cache.set(f"k{n}", {"werte": "x" * 30})
+        os.utime(cache._path(f"k{n}"), (1000 + n, 1000 + n))
+    cache.set("neu", {"werte": "x" * 30})
+
+    # Alles älter als eine Stunde ist verdrängt, nur das neue Ergebnis bleibt
+    assert sorted(os.listdir(cache.cache_dir)) == ["neu.json"]
+    for n in range(10):
+        cache.set(f"k{n}", {"werte": "x" * 30})
+    assert sum(os.path.getsize(os.path.join(cache.cache_dir, f)) for f in os.listdir(cache.cache_dir)) <= 200
+    assert cache.get("k9") is not None and cache.get("neu") is None
+
+    os.utime(cache._path("k9"), (1000, 1000))
+    assert cache.get("k9") is None
+
+
+def test_model_store_keeps_rows_seen(sales_csv, tmp_path):
+    store = ModelStore(str(tmp_path / "cache"))
+    assert store.load("modell", sales_csv, {"k": 1}) == (None, 0)
+    store.save("modell", sales_csv, {"k": 1}, {"gewichte": [1, 2]}, 5)
+    assert store.load("modell", sales_csv, {"k": 1}) == ({"gewichte": [1, 2]}, 5)
+    assert store.load("modell", sales_csv, {"k": 2}) == (None, 0)
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_map_groups_isolates_group_errors(sales_csv, max_workers):
+    df = pd.read_csv(sales_csv)
+    results = map_groups(df, "artikel", _group_total, max_workers=max_workers, groups_per_task=1)
+    assert results["A"] == 3
+    assert results["B"] == 7
+    assert results["C"] == {"error": "zu wenige Daten"}
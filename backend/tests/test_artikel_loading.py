@@ -0,0 +1,112 @@
+"""
+Tests für Artikel-Ladeprofile und die N+1-Erkennung per Abfragezähler
+"""
+
+import pytest
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+
+from backend.db.artikel_loading import (
+    LOAD_PROFILES,
+    ArtikelListItem,
+    artikel_load_options,
+    build_load_options,
+)
+from backend.models.artikel import Artikel
+from query_counter import QueryCounter, assert_max_queries
+
+Base = declarative_base()
+
+
+class Gruppe(Base):
+    __tablename__ = "gruppe"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+
+class Produkt(Base):
+    __tablename__ = "produkt"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    gruppe_id = Column(Integer, ForeignKey("gruppe.id"))
+    gruppe = relationship("Gruppe")
+    preise = relationship("Preis", back_populates="produkt")
+    bilder = relationship("Bild")
+
+
+class Preis(Base):
+    __tablename__ = "preis"
+    id = Column(Integer, primary_key=True)
+    produkt_id = Column(Integer, ForeignKey("produkt.id"))
+    betrag = Column(Integer)
+    produkt = relationship("Produkt", back_populates="preise")
+    staffeln = relationship("Staffel")
+
+
+class Staffel(Base):
+    __tablename__ = "staffel"
+    id = Column(Integer, primary_key=True)
+    preis_id = Column(Integer, ForeignKey("preis.id"))
+
+
+class Bild(Base):
+    __tablename__ = "bild"
+    id = Column(Integer, primary_key=True)
+    produkt_id = Column(Integer, ForeignKey("produkt.id"))
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    gruppe = Gruppe(name="Futter")
+    session.add(gruppe)
+    for i in range(20):
+        produkt = Produkt(name=f"P{i}", gruppe=gruppe)
+        produkt.preise = [Preis(betrag=i, staffeln=[Staffel(), Staffel()]) for _ in range(2)]
+        session.add(produkt)
+    session.commit()
+    session.expunge_all()
+    yield session
+    session.close()
+
+
+def _serialize(produkte):
+    return [
+        (p.gruppe.name, [(x.betrag, len(x.staffeln)) for x in p.preise])
+        for p in produkte
+    ]
+
+
+def test_lazy_loading_is_detected_as_n_plus_1(db):
+    with QueryCounter(db.get_bind()) as counter:
+        _serialize(db.query(Produkt).all())
+    assert counter.count > 20
+
+
+def test_profile_loads_with_constant_query_count(db):
+    options = build_load_options(Produkt, ["gruppe", "preise.staffeln"])
+    with assert_max_queries(db.get_bind(), 3):
+        rows = _serialize(db.query(Produkt).options(*options).all())
+    assert len(rows) == 20
+    assert rows[0][1] == [(0, 2), (0, 2)]
+
+
+def test_unknown_relationship_is_rejected():
+    with pytest.raises(ValueError):
+        build_load_options(Produkt, ["lieferanten"])
+
+
+def test_artikel_profiles_reference_artikel_relationships():
+    for profile, paths in LOAD_PROFILES.items():
+        for path in paths:
+            assert hasattr(Artikel, path.split(".")[0]), (profile, path)
+    with pytest.raises(ValueError):
+        artikel_load_options("kasse")
+
+
+def test_list_item_uses_slots():
+    item = ArtikelListItem(1, "A-1", "Weizen", 12.5, "EUR", True, "Futter", "kg")
+    assert not hasattr(item, "__dict__")
+    assert item.to_dict()["einheit"] == "kg"
@@ -0,0 +1,120 @@
+"""
+Tests für die AsyncSession-Datenschicht der v1-Endpunkte
+"""
+
+from typing import List, Optional
+
+import pytest
+import pytest_asyncio
+from pydantic import BaseModel
+from sqlalchemy import Column, ForeignKey, Integer, String, select
+from sqlalchemy.orm import declarative_base, relationship
+
+from backend.app.db import async_session
+from backend.app.db.async_session import (
+    dispose_async_engine,
+    get_async_engine,
+    get_async_sessionmaker,
+    reload_for_response,
+    response_load_options,
+    to_async_url,
+)
+
+Base = declarative_base()
+
+
+class Kopf(Base):
+    __tablename__ = "kopf"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    positionen = relationship("Position", back_populates="kopf")
+
+
+class Position(Base):
+    __tablename__ = "position"
+    id = Column(Integer, primary_key=True)
+    kopf_id = Column(Integer, ForeignKey("kopf.id"))
+    text = Column(String(50))
+    kopf = relationship("Kopf", back_populates="positionen")
+
+
+class PositionResponse(BaseModel):
+    id: int
+    text: str
+
+    class Config:
+        from_attributes = True
+
+
+class KopfResponse(BaseModel):
+    id: int
+    name: str
+    positionen: List[PositionResponse] = []
+
+    class Config:
+        from_attributes = True
+
+
+class KopfOhnePositionen(BaseModel):
+    id: int
+    name: str
+    kopf: Optional[KopfResponse] = None
+
+
+@pytest_asyncio.fixture
+async def session(tmp_path):
+    engine = get_async_engine(f"sqlite:///{tmp_path / 'async_test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with get_async_sessionmaker(engine)() as db:
+        yield db
+    await engine.dispose()
+
+
+def test_to_async_url():
+    assert to_async_url("postgresql://u:p@host/erp") == "postgresql+asyncpg://u:p@host/erp"
+    assert to_async_url("sqlite:///app.db") == "sqlite+aiosqlite:///app.db"
+    assert to_async_url("sqlite+aiosqlite:///app.db") == "sqlite+aiosqlite:///app.db"
+
+
+def test_response_load_options_only_covers_schema_relationships():
+    assert len(response_load_options(Kopf, KopfResponse)) == 1
+    assert response_load_options(Kopf, KopfOhnePositionen) == []
+
+
+@pytest.mark.asyncio
+async def test_list_and_reload_without_lazy_loads(session):
+    kopf = Kopf(name="Angebot")
+    session.add(kopf)
+    await session.flush()
+    session.add_all([Position(kopf_id=kopf.id, text=f"Pos {i}") for i in range(3)])
+    await session.commit()
+
+    kopf = await reload_for_response(session, kopf, KopfResponse)
+    assert len(KopfResponse.model_validate(kopf).positionen) == 3
+
+    session.expunge_all()
+    result = await session.execute(
+        select(Kopf).options(*response_load_options(Kopf, KopfResponse))
+    )
+    items = [KopfResponse.model_validate(k) for k in result.scalars().all()]
+    assert [len(k.positionen) for k in items] == [3]
+
+
+@pytest.mark.asyncio
+async def test_dispose_closes_every_engine(tmp_path):
+    urls = [f"sqlite:///{tmp_path / name}" for name in ("a.db", "b.db")]
+    engines = [get_async_engine(url) for url in urls]
+    assert get_async_engine(urls[0]) is engines[0]
+    for engine in engines:
+        async with engine.connect():
+            pass
+    pools = [engine.sync_engine.pool for engine in engines]
+
+    await dispose_async_engine()
+
+    # dispose() schließt die Verbindungen und ersetzt den Pool
+    assert all(engine.sync_engine.pool is not pool for engine, pool in zip(engines, pools))
+    assert async_session._engines == {}
+    assert get_async_engine(urls[0]) is not engines[0]
+    await dispose_async_engine()
@@ -0,0 +1,165 @@
+"""
+Tests für den Bankabgleich (MT940/CAMT.053 einlesen, Abgleich in mehreren Durchgängen)
+"""
+
+from datetime import date
+
+from backend.services.bank_reconciliation import (
+    BankReconciler,
+    Booking,
+    StatementLine,
+    load_statement,
+    reference_tokens,
+)
+
+MT940 = """:20:STARTUMS
+:25:DE89370400440532013000
+:28C:12/1
+:60F:C240228EUR1000,00
+:61:2403010301CR1250,00NTRFNONREF//BANK-1
+:86:166?00SEPA-GUTSCHRIFT?20EREF+RE-2024-0815?21SVWZ+Rechnung RE-2024-0815?22Danke?32Landhandel Meyer GmbH
+:61:2403020302DR89,90NDDTNONREF//BANK-2
+:86:105?00SEPA-LASTSCHRIFT?20SVWZ+Stromabschlag Maerz?32Stadtwerke
+:61:2403010301CR1250,00NTRFNONREF//BANK-1
+:86:166?00SEPA-GUTSCHRIFT?20EREF+RE-2024-0815?21SVWZ+Rechnung RE-2024-0815?22Danke?32Landhandel Meyer GmbH
+:62F:C240302EUR2160,10
+-
+"""
+
+CAMT053 = """<?xml version="1.0" encoding="UTF-8"?>
+<Document xmlns="urn:iso:std:iso:20022:tech:xsd:camt.053.001.02">
+  <BkToCstmrStmt><Stmt>
+    <Acct><Id><IBAN>DE02120300000000202051</IBAN></Id></Acct>
+    <Ntry>
+      <Amt Ccy="EUR">500.00</Amt><CdtDbtInd>CRDT</CdtDbtInd>
+      <BookgDt><Dt>2024-03-04</Dt></BookgDt><ValDt><Dt>2024-03-04</Dt></ValDt>
+      <AcctSvcrRef>SAMMLER-7</AcctSvcrRef>
+      <NtryDtls>
+        <TxDtls>
+          <Refs><EndToEndId>RE-2024-0901</EndToEndId></Refs>
+          <AmtDtls><TxAmt><Amt Ccy="EUR">300.00</Amt></TxAmt></AmtDtls>
+          <RltdPties><Dbtr><Nm>Agrar Schulte KG</Nm></Dbtr></RltdPties>
+          <RmtInf><Ustrd>Rechnung 0901</Ustrd></RmtInf>
+        </TxDtls>
+        <TxDtls>
+          <Refs><EndToEndId>NOTPROVIDED</EndToEndId></Refs>
+          <AmtDtls><TxAmt><Amt Ccy="EUR">200.00</Amt></TxAmt></AmtDtls>
+          <RmtInf><Ustrd>Anzahlung Saatgut</Ustrd></RmtInf>
+        </TxDtls>
+      </NtryDtls>
+    </Ntry>
+  </Stmt></BkToCstmrStmt>
+</Document>
+"""
+
+
+def test_parse_mt940_and_camt053(tmp_path):
+    mt940 = tmp_path / "auszug.sta"
+    mt940.write_text(MT940, encoding="latin-1")
+    camt = tmp_path / "auszug.xml"
+    camt.write_text(CAMT053, encoding="utf-8")
+
+    gutschrift, lastschrift, _ = load_statement(str(mt940))
+    assert (gutschrift.account, gutschrift.booking_date, gutschrift.amount_cents) == (
+        "DE89370400440532013000", date(2024, 3, 1), 125000
+    )
+    assert gutschrift.reference == "RE-2024-0815"
+    assert gutschrift.remittance == "Rechnung RE-2024-0815Danke"
+    assert gutschrift.counterparty == "Landhandel Meyer GmbH"
+    assert (lastschrift.amount_cents, lastschrift.bank_reference) == (-8990, "BANK-2")
+
+    erste, zweite = load_statement(str(camt))
+    assert (erste.account, erste.amount_cents, erste.reference, erste.counterparty) == (
+        "DE02120300000000202051", 30000, "RE-2024-0901", "Agrar Schulte KG"
+    )
+    assert (zweite.amount_cents, zweite.reference, zweite.remittance) == (20000, "", "Anzahlung Saatgut")
+
+    # Derselbe Auszug ein zweites Mal importiert (andere Datei): alle Umsätze doppelt
+    kopie = tmp_path / "auszug_kopie.sta"
+    kopie.write_text(MT940, encoding="latin-1")
+    lines = list(load_statement(str(mt940))) + list(load_statement(str(kopie)))
+    assert len({line.line_id for line in lines}) == 6
+    result = BankReconciler().reconcile(lines, [])
+    # Die gleichen Umsätze 1 und 3 in einer Datei bleiben, die Kopie wird je Vorkommen zugeordnet
+    assert [(d["line_id"], d["duplicate_of"]) for d in result.duplicate_lines] == [
+        (lines[3].line_id, lines[0].line_id), (lines[4].line_id, lines[1].line_id),
+        (lines[5].line_id, lines[2].line_id),
+    ]
+
+
+def _line(line_id, day, cents, reference="", remittance=""):
+    return StatementLine(line_id, "DE01", date(2024, 3, day), cents, reference=reference,
+                         remittance=remittance, bank_reference=line_id)
+
+
+def _booking(booking_id, day, cents, reference="", text=""):
+    return Booking(booking_id, "DE01", date(2024, 3, day), cents, reference=reference, text=text)
+
+
+def test_reconcile_reports_matches_partials_duplicates_and_missing():
+    lines = [
+        _line("L1", 5, 125000, remittance="Rechnung RE-2024-0815"),
+        _line("L1-kopie", 5, 125000, remittance="Rechnung RE-2024-0815"),
+        _line("L1-dup", 5, 125000, remittance="Rechnung RE-2024-0815"),
+        _line("L2", 6, 4711),
+        _line("L3", 7, 9900, remittance="Lieferung Weizen Hof Brinkmann"),
+        _line("L4", 8, 40000, reference="RE-2024-0900"),
+        _line("L5", 20, 60000, remittance="Rest RE-2024-0900"),
+        _line("L6", 9, 1234, remittance="Unbekannt"),
+    ]
+    # Doppelt importierter Umsatz: gleiche Bankreferenz in einem zweiten Auszug
+    lines[2].bank_reference = lines[0].bank_reference = "X"
+    lines[2].source = "auszug-2.sta"
+    bookings = [
+        _booking("B1", 4, 125000, reference="RE-2024-0815"),
+        _booking("B2", 7, 4711, text="Zahlung"),
+        _booking("B3", 7, 9900, text="Lieferung Weizn Hof Brinkman"),
+        _booking("B4", 7, 9900, text="Lieferung Gerste Agrar Schulte"),
+        _booking("B5", 7, 100000, reference="RE-2024-0900"),
+        _booking("B6", 1, 5000, reference="RE-2024-0999"),
+        _booking("B6-dup", 1, 5000, reference="RE-2024-0999"),
+    ]
+
+    result = BankReconciler().reconcile(lines, bookings)
+
+    assert result.matches == [("L1", "B1", "reference"), ("L2", "B2", "amount_date"), ("L3", "B3", "fuzzy")]
+    assert result.duplicate_lines == [{"line_id": "L1-dup", "duplicate_of": "L1"}]
+    assert result.duplicate_bookings == [{"booking_id": "B6-dup", "duplicate_of": "B6"}]
+    assert result.partial_payments == [{
+        "booking_id": "B5", "reference": "RE-2024-0900", "booked_amount": 1000.0,
+        "paid_amount": 1000.0, "open_amount": 0.0, "line_ids": ["L4", "L5"], "status": "paid",
+    }]
+    assert [line.line_id for line in result.missing_in_books] == ["L1-kopie", "L6"]
+    assert [booking.booking_id for booking in result.missing_in_statement] == ["B4", "B6"]
+
+    summary = result.summary(max_details=1)
+    assert (summary["total_transactions"], summary["matched_transactions"], summary["unmatched_transactions"]) == (8, 3, 2)
+    assert len(summary["unmatched_details"]) == 1
+
+
+def test_reference_tokens_ignore_separators_and_plain_words():
+    assert reference_tokens("Rechnung RE-2024-0815, Kd 12", "re/2024/0815") == {"RE20240815"}
+
+
+def test_identical_lines_in_one_statement_are_separate_payments():
+    # Zwei Kartenzahlungen am selben Tag, ohne Bankreferenz
+    lines = [_line(f"K{n}", 5, -1999, reference="KARTE 4711") for n in (1, 2)]
+    for line in lines:
+        line.bank_reference = ""
+    bookings = [_booking("B1", 5, -1999, reference="KARTE 4711"), _booking("B2", 5, -1999, text="Karte")]
+
+    result = BankReconciler().reconcile(lines, bookings)
+
+    assert result.duplicate_lines == []
+    assert len(result.matches) == 2 and result.missing_in_statement == []
+
+
+def test_zero_amount_booking_with_shared_reference():
+    lines = [_line("L1", 5, 5000, remittance="Rechnung RE-2024-0815"),
+             _line("L2", 6, 2500, remittance="Teilzahlung RE-2024-0815")]
+    bookings = [_booking("B0", 5, 0, reference="RE-2024-0815"), _booking("B1", 5, 10000, reference="RE-2024-0815")]
+
+    result = BankReconciler().reconcile(lines, bookings)
+
+    assert [p["line_ids"] for p in result.partial_payments] == [["L1", "L2"]]
+    assert [b.booking_id for b in result.missing_in_statement] == ["B0"]
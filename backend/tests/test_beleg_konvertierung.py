@@ -0,0 +1,137 @@
+"""
+Tests für die Umwandlung von Belegen entlang der Belegkette (Angebot → Auftrag → Lieferschein → Rechnung)
+"""
+
+import importlib
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import Response
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from query_counter import assert_max_queries
+
+START = datetime(2024, 3, 1, 8, 0)
+
+
+@pytest.fixture
+def beleg(tmp_path, monkeypatch):
+    # db.py legt beim Import eine SQLite-Datei im Arbeitsverzeichnis an
+    monkeypatch.chdir(tmp_path)
+    db = importlib.import_module("backend.services.beleg_service.db")
+    api = importlib.import_module("backend.services.beleg_service.api")
+    konvertierung = importlib.import_module("backend.services.beleg_service.konvertierung")
+
+    engine = create_engine("sqlite://")
+    db.Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    for i in range(40):
+        angebot_id = f"AN-{i:03d}"
+        session.add(db.AngebotDB(
+            AngebotID=angebot_id, AngebotNummer=str(i), KundenID=f"K{i % 2}", Betreff="Dünger",
+            ErstellDatum=START + timedelta(hours=i), GueltigBis=START + timedelta(days=30),
+            Gesamtbetrag=300.0, MwStBetrag=57.0, Rabatt=0.0, Status="angenommen" if i < 30 else "offen",
+            Zahlungsbedingungen="30 Tage", Lieferbedingungen="frei Hof"
+        ))
+        for j in range(3):
+            session.add(db.AngebotsPositionDB(
+                angebot_id=angebot_id, PositionsID=f"{angebot_id}-{j}", ArtikelID=f"A{j}",
+                ArtikelBezeichnung="Kalkammonsalpeter", Menge=2.0, Einheit="t", Einzelpreis=50.0, MwStSatz=19.0,
+                Rabatt=0.0, Gesamtpreis=100.0
+            ))
+    session.commit()
+    session.expunge_all()
+    yield db, api, konvertierung, engine, session
+    session.close()
+
+
+def _list(api, session, func):
+    return getattr(api, func)(Response(), kunden_id=None, status=None, von=None, bis=None, cursor=None,
+                              limit=None, db=session)
+
+
+def test_chain_is_converted_in_constant_queries(beleg):
+    db, api, konvertierung, engine, session = beleg
+
+    with assert_max_queries(engine, 7):
+        auftraege = konvertierung.belege_umwandeln(session, "angebot", status="angenommen", jetzt=START)
+    assert len(auftraege.Erstellt) == 30 and auftraege.Uebersprungen == {}
+
+    # Eine Teilmenge ist bereits teilweise geliefert
+    session.query(db.AuftragsPositionDB).filter(db.AuftragsPositionDB.PositionsID == "AN-000-0").update(
+        {"BereitsGelieferteMenge": 0.5}
+    )
+    session.commit()
+    with assert_max_queries(engine, 8):
+        lieferscheine = konvertierung.belege_umwandeln(session, "auftrag", status="offen", jetzt=START)
+    with assert_max_queries(engine, 9):
+        rechnungen = konvertierung.belege_umwandeln(session, "lieferschein", status="erstellt", jetzt=START)
+    assert len(lieferscheine.Erstellt) == len(rechnungen.Erstellt) == 30
+
+    angebote = {a["AngebotID"]: a for a in _list(api, session, "list_angebote")}
+    assert angebote["AN-000"]["Status"] == "beauftragt" and angebote["AN-035"]["Status"] == "offen"
+
+    auftrag_id = auftraege.Erstellt["AN-000"]
+    auftrag = api.get_auftrag(auftrag_id, db=session)
+    assert auftrag["AngebotID"] == "AN-000" and auftrag["Status"] == "geliefert"
+    assert [p["BereitsGelieferteMenge"] for p in auftrag["Positionen"]] == [2.0, 2.0, 2.0]
+
+    lieferschein = api.get_lieferschein(lieferscheine.Erstellt[auftrag_id], db=session)
+    assert [p["Menge"] for p in lieferschein["Positionen"]] == [1.5, 2.0, 2.0]
+    api.Lieferschein(**lieferschein)
+
+    rechnung = api.Rechnung(**api.get_rechnung(rechnungen.Erstellt[lieferschein["LieferscheinID"]], db=session))
+    assert [p.Gesamtpreis for p in rechnung.Positionen] == [75.0, 100.0, 100.0]
+    assert rechnung.Gesamtbetrag == 275.0 and rechnung.MwStBetrag == pytest.approx(52.25)
+    assert rechnung.Faelligkeitsdatum == START + timedelta(days=14)
+    assert len(_list(api, session, "list_rechnungen")) == 30
+
+
+def test_repeated_conversion_is_idempotent(beleg):
+    db, api, konvertierung, engine, session = beleg
+
+    erster = konvertierung.belege_umwandeln(session, "angebot", ids=["AN-001", "AN-002"])
+    zweiter = konvertierung.belege_umwandeln(session, "angebot", ids=["AN-001", "AN-002", "AN-003"])
+
+    assert zweiter.Erstellt.keys() == {"AN-003"}
+    assert zweiter.Uebersprungen == erster.Erstellt
+    assert session.query(db.AuftragDB).count() == 3
+    assert session.query(db.AuftragsPositionDB).count() == 9
+    assert session.query(db.BelegVerknuepfungDB).count() == 3
+
+    # Ohne ID-Liste rückt das Fenster über die bereits umgewandelten Belege hinweg
+    dritter = konvertierung.belege_umwandeln(session, "angebot", max_belege=5)
+    assert sorted(dritter.Erstellt) == ["AN-000", "AN-004", "AN-005", "AN-006", "AN-007"]
+
+
+def test_invoice_numbers_are_gapless_per_year(beleg, monkeypatch):
+    db, api, konvertierung, engine, session = beleg
+    konvertierung.belege_umwandeln(session, "angebot", status="angenommen", jetzt=START)
+    konvertierung.belege_umwandeln(session, "auftrag", status="offen", jetzt=START)
+    lieferscheine = [l.LieferscheinID for l in session.query(db.LieferscheinDB).order_by(db.LieferscheinDB.ErstellDatum)]
+
+    konvertierung.belege_umwandeln(session, "lieferschein", ids=lieferscheine[:10], jetzt=START)
+
+    # Ein Fehler nach der Nummernvergabe rollt auch den Zähler zurück
+    def fehler(*args, **kwargs):
+        raise RuntimeError("Positionen nicht kopierbar")
+    monkeypatch.setitem(konvertierung._POSITIONEN, "lieferschein", fehler)
+    with pytest.raises(RuntimeError):
+        konvertierung.belege_umwandeln(session, "lieferschein", ids=lieferscheine[10:20], jetzt=START)
+    monkeypatch.undo()
+
+    konvertierung.belege_umwandeln(session, "lieferschein", ids=lieferscheine[10:25], jetzt=START)
+    konvertierung.belege_umwandeln(session, "lieferschein", ids=lieferscheine[25:], jetzt=datetime(2025, 1, 2))
+
+    nummern = sorted(r.RechnungNummer for r in session.query(db.RechnungDB))
+    assert nummern == [f"RE-2024-{n:06d}" for n in range(1, 26)] + [f"RE-2025-{n:06d}" for n in range(1, 6)]
+    assert session.query(db.AuftragDB.AuftragNummer).order_by(db.AuftragDB.AuftragNummer).first() == ("AU-2024-000001",)
+
+    # Doppelte Rechnungsnummern verhindert der eindeutige Index
+    rechnung = session.query(db.RechnungDB).first()
+    session.add(db.RechnungDB(RechnungID="doppelt", RechnungNummer=rechnung.RechnungNummer))
+    with pytest.raises(IntegrityError):
+        session.commit()
+    session.rollback()
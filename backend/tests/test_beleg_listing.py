@@ -0,0 +1,109 @@
+"""
+Tests für die Belegliste des Beleg-Service (Filter, Keyset-Paging, konstante Abfragezahl)
+"""
+
+import importlib
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from query_counter import assert_max_queries
+
+START = datetime(2024, 1, 1, 8, 0)
+
+
+@pytest.fixture
+def beleg(tmp_path, monkeypatch):
+    # db.py legt beim Import eine SQLite-Datei im Arbeitsverzeichnis an
+    monkeypatch.chdir(tmp_path)
+    db = importlib.import_module("backend.services.beleg_service.db")
+    api = importlib.import_module("backend.services.beleg_service.api")
+
+    engine = create_engine("sqlite://")
+    db.Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    for i in range(30):
+        angebot_id = f"AN-{i:03d}"
+        session.add(db.AngebotDB(
+            AngebotID=angebot_id, AngebotNummer=str(i), KundenID=f"K{i % 3}", Betreff="Saatgut",
+            # Je zwei Angebote mit gleichem Datum, damit der Cursor die ID berücksichtigen muss
+            ErstellDatum=START + timedelta(days=i // 2), GueltigBis=START + timedelta(days=30),
+            Gesamtbetrag=100.0, MwStBetrag=19.0, Rabatt=0.0, Status="offen" if i % 2 else "angenommen",
+            Zahlungsbedingungen="30 Tage", Lieferbedingungen="frei Hof"
+        ))
+        session.add(db.AuftragDB(
+            AuftragID=f"AU-{i:03d}", AuftragNummer=str(i), KundenID=f"K{i % 3}", ErstellDatum=START,
+            Status="offen", Prioritaet="normal", Gesamtbetrag=100.0, MwStBetrag=19.0, Rabatt=0.0,
+            Zahlungsbedingungen="30 Tage", Lieferbedingungen="frei Hof", Lieferadresse="Hof 1",
+            Rechnungsadresse="Hof 1"
+        ))
+        for j in range(3):
+            session.add(db.AngebotsPositionDB(
+                angebot_id=angebot_id, PositionsID=f"{angebot_id}-{j}", ArtikelID="A1",
+                ArtikelBezeichnung="Weizen", Menge=1.0, Einheit="t", Einzelpreis=100.0, MwStSatz=19.0,
+                Rabatt=0.0, Gesamtpreis=100.0
+            ))
+            session.add(db.AuftragsPositionDB(
+                auftrag_id=f"AU-{i:03d}", PositionsID=f"AU-{i:03d}-{j}", ArtikelID="A1",
+                ArtikelBezeichnung="Weizen", Menge=1.0, Einheit="t", Einzelpreis=100.0, MwStSatz=19.0,
+                Rabatt=0.0, Gesamtpreis=100.0, LieferStatus="offen", BereitsGelieferteMenge=0.0
+            ))
+    session.commit()
+    session.expunge_all()
+    yield api, engine, session
+    session.close()
+
+
+def _list(api, session, response=None, func="list_angebote", **kwargs):
+    params = dict(kunden_id=None, status=None, von=None, bis=None, cursor=None, limit=None)
+    params.update(kwargs)
+    return getattr(api, func)(response or Response(), db=session, **params)
+
+
+def test_list_loads_positions_in_constant_queries(beleg):
+    api, engine, session = beleg
+
+    with assert_max_queries(engine, 2):
+        angebote = _list(api, session)
+    with assert_max_queries(engine, 2):
+        auftraege = _list(api, session, func="list_auftraege")
+
+    assert len(angebote) == 30 and len(auftraege) == 30
+    assert all(len(a["Positionen"]) == 3 for a in angebote + auftraege)
+    assert api.Angebot(**angebote[0]).Positionen[0].PositionsID == "AN-000-0"
+
+
+def test_keyset_paging_returns_every_document_once(beleg):
+    api, engine, session = beleg
+
+    seen, cursor = [], None
+    while True:
+        response = Response()
+        with assert_max_queries(engine, 2):
+            page = _list(api, session, response, cursor=cursor, limit=7)
+        seen.extend(a["AngebotID"] for a in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert seen == [f"AN-{i:03d}" for i in range(30)]
+
+
+def test_filters_by_customer_status_and_date(beleg):
+    api, engine, session = beleg
+
+    angebote = _list(api, session, kunden_id="K1", status="offen",
+                     von=START + timedelta(days=2), bis=START + timedelta(days=10))
+
+    assert [a["AngebotID"] for a in angebote] == ["AN-007", "AN-013", "AN-019"]
+
+
+def test_invalid_cursor_is_rejected(beleg):
+    api, engine, session = beleg
+
+    with pytest.raises(HTTPException) as exc:
+        _list(api, session, cursor="kein-cursor", limit=5)
+    assert exc.value.status_code == 400
@@ -0,0 +1,102 @@
+"""
+Tests für das ereignisgesteuerte Compliance-Monitoring
+"""
+
+import asyncio
+import random
+import statistics
+
+import pytest
+
+from backend.components.compliance_engine.models import AlertSettings, MonitoringParameter
+from backend.components.compliance_engine.monitoring import ComplianceMonitoring
+from backend.components.compliance_engine.realtime import RunningStatistics, TimerWheel
+
+
+def test_running_statistics_matches_full_recomputation():
+    rng = random.Random(3)
+    stats = RunningStatistics(window=50)
+    values = []
+    for _ in range(500):
+        value = rng.uniform(-10, 10)
+        values.append(value)
+        stats.add(value)
+        window = values[-50:]
+        assert stats.min == min(window)
+        assert stats.max == max(window)
+        assert stats.mean == pytest.approx(statistics.fmean(window))
+    assert stats.variance == pytest.approx(statistics.variance(values[-50:]))
+    assert stats.snapshot()["count"] == 50
+
+    cumulative = RunningStatistics()
+    for value in values:
+        cumulative.add(value)
+    assert cumulative.snapshot()["min"] == min(values)
+    assert cumulative.mean == pytest.approx(statistics.fmean(values))
+
+
+@pytest.mark.asyncio
+async def test_timer_wheel_fires_due_timers_and_stops_when_idle():
+    wheel = TimerWheel(resolution=0.01, slots=4)
+    fired = []
+
+    async def record(name):
+        fired.append(name)
+
+    wheel.schedule(0.01, record, "kurz")
+    wheel.schedule(0.1, record, "lang")  # mehrere Umdrehungen
+    cancelled = wheel.schedule(0.05, record, "abgebrochen")
+    wheel.cancel(cancelled)
+    assert len(wheel) == 2
+
+    await asyncio.sleep(0.3)
+
+    assert fired == ["kurz", "lang"]
+    assert len(wheel) == 0
+    assert not wheel.running
+
+
+@pytest.mark.asyncio
+async def test_monitoring_evaluates_on_measurement_without_batch_tasks():
+    wheel = TimerWheel(resolution=0.25)
+    monitoring = ComplianceMonitoring(timer_wheel=wheel)
+    notified = []
+
+    async def notify(batch_id, alert):
+        notified.append(alert.id)
+
+    monitoring._notify_subscribers = notify
+    tasks_before = len(asyncio.all_tasks())
+
+    parameters = {"temperatur": MonitoringParameter(min=15, max=25, unit="°C", description="Lager")}
+    for i in range(100):
+        await monitoring.start_monitoring(f"CH-{i}", parameters)
+    assert len(asyncio.all_tasks()) == tasks_before
+
+    await monitoring.configure_alerts("CH-1", AlertSettings(
+        notification_threshold={}, notification_delay=1, auto_resolve=True, escalation_timeout=30
+    ))
+    measurement = await monitoring.add_measurement("CH-1", "temperatur", 30.0)
+    assert measurement.status == "alert"
+    assert len(await monitoring.get_active_alerts("CH-1")) == 1
+    # Verzögerte Benachrichtigung und Eskalation laufen über ein gemeinsames Rad
+    assert len(wheel) == 2 and wheel.running
+    assert notified == []
+
+    # Zurück im Grenzbereich: Alert wird aufgelöst, Timer werden verworfen
+    await monitoring.add_measurement("CH-1", "temperatur", 20.0)
+    assert await monitoring.get_active_alerts("CH-1") == []
+    assert len(wheel) == 0
+
+    await monitoring.add_measurement("CH-1", "temperatur", 10.0)
+    await asyncio.sleep(1.6)
+    assert len(notified) == 1
+
+    stats = await monitoring.get_parameter_statistics("CH-1", "temperatur")
+    assert stats["count"] == 3 and stats["min"] == 10.0 and stats["max"] == 30.0
+
+    await monitoring.stop_monitoring("CH-1")
+    assert len(wheel) == 0
+    with pytest.raises(ValueError):
+        await monitoring.add_measurement("CH-1", "temperatur", 20.0)
+    await wheel.stop()
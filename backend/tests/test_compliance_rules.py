@@ -0,0 +1,143 @@
+"""
+Tests für die Regeltabelle und die Bulk-Validierung der Compliance-Engine
+"""
+
+import copy
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.components.compliance_engine.engine import ComplianceEngine
+from backend.components.compliance_engine.models import ComplianceType, ValidationStatus
+from backend.components.compliance_engine.rules import ValidationCache, content_hash, rule_expiry
+
+
+def make_batch(now: datetime) -> dict:
+    return {
+        'supplier_data': {'supplier_id': 'SUPP-001', 'supplier_batch_refs': ['REF-001']},
+        'transport_conditions': {'temperature': 20.5, 'humidity': 50},
+        'quality_checks': {'moisture': 10.0, 'temperature': 20.0, 'contamination': 0.01},
+        'hygiene_protocol': {
+            'cleaning_date': (now - timedelta(days=2)).isoformat(),
+            'responsible': 'Max Mustermann',
+            'measures': ['Desinfektion']
+        },
+        'haccp_documentation': {
+            'version': '1.0',
+            'last_update': (now - timedelta(days=100)).isoformat(),
+            'critical_points': ['CP-001']
+        },
+        'hazard_analysis': {'biological': ['B-001'], 'chemical': ['C-001'], 'physical': ['P-001']},
+        'control_measures': [{'id': 'CM-001', 'type': 'temperature_control', 'description': 'Kühlung'}],
+        'process_monitoring': {'measurements': [{'parameter': 'temp', 'value': 20.5}]},
+        'eu_documentation': {'declaration': 'DOC-EU-001', 'certificates': ['CERT-001']},
+        'emergency_procedures': {'contact': 'notfall@example.com', 'procedures': ['PROC-001']},
+        'information_chain': {'supplier_info': 'S', 'transport_info': 'T', 'customer_info': 'C'}
+    }
+
+
+# Abweichungen, die jeweils eine andere Verzweigung der Validatoren treffen
+MUTATIONS = [
+    lambda b: b.pop('supplier_data'),
+    lambda b: b['supplier_data'].pop('supplier_id'),
+    lambda b: b['supplier_data'].update(supplier_id=None),
+    lambda b: b['transport_conditions'].update(temperature=None),
+    lambda b: b['transport_conditions'].update(humidity=65),
+    lambda b: b['quality_checks'].update(moisture=12.5),
+    lambda b: b['quality_checks'].update(contamination=0.5),
+    lambda b: b['quality_checks'].pop('temperature'),
+    lambda b: b['hygiene_protocol'].update(cleaning_date=(datetime.now() - timedelta(days=9)).isoformat()),
+    lambda b: b['haccp_documentation'].update(last_update=(datetime.now() - timedelta(days=400)).isoformat()),
+    lambda b: b['hazard_analysis'].update(chemical=[]),
+    lambda b: b['control_measures'][0].pop('description'),
+    lambda b: b.update(control_measures=[]),
+    lambda b: b['process_monitoring'].update(measurements=[]),
+    lambda b: b['process_monitoring']['measurements'].append({'parameter': 'ph'}),
+    lambda b: b['eu_documentation'].update(certificates=[]),
+    lambda b: b['emergency_procedures'].update(contact=''),
+    lambda b: b['information_chain'].pop('customer_info'),
+    lambda b: b['transport_conditions'].update(temperature=True),
+]
+
+
+def dump(records):
+    return [
+        (r.compliance_type, r.validation_result.status,
+         [(c.name, c.status, c.message, c.details) for c in r.validation_result.checks])
+        for r in records
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bulk_validation_matches_single_validation():
+    rng = random.Random(7)
+    now = datetime.now()
+    batches = {}
+    for i in range(300):
+        batch = make_batch(now)
+        for mutation in rng.sample(MUTATIONS, rng.choice([0, 0, 1, 2])):
+            mutation(batch)
+        batches[f"CH-{i:04d}"] = batch
+
+    bulk = await ComplianceEngine().validate_batches(
+        copy.deepcopy(batches), responsible_person="Test Person", digital_signature="SIG", chunk_size=64
+    )
+
+    single_engine = ComplianceEngine(cache=ValidationCache(max_entries=0))
+    statuses = set()
+    for batch_id, batch in batches.items():
+        expected = await single_engine.validate_batch(
+            batch_id, copy.deepcopy(batch), responsible_person="Test Person", digital_signature="SIG"
+        )
+        assert dump(bulk[batch_id]) == dump(expected), batch_id
+        statuses.update(r.validation_result.status for r in expected)
+    assert statuses == set(ValidationStatus)
+
+
+@pytest.mark.asyncio
+async def test_unchanged_batches_are_served_from_cache(monkeypatch):
+    engine = ComplianceEngine()
+    now = datetime.now()
+    batches = {f"CH-{i}": make_batch(now) for i in range(20)}
+    await engine.validate_batches(batches)
+    assert len(engine.cache) == 60
+
+    evaluated = []
+    original = engine._validate_chunk.__func__
+
+    def spy(self, items, *args):
+        evaluated.append(len(items))
+        return original(self, items, *args)
+
+    monkeypatch.setattr(ComplianceEngine, "_validate_chunk", spy)
+    batches["CH-3"]["quality_checks"]["moisture"] = 15.0
+    results = await engine.validate_batches(batches)
+
+    assert evaluated == [20]
+    assert len(engine.cache) == 63  # nur die geänderte Charge wurde neu validiert
+    assert results["CH-3"][0].validation_result.status == ValidationStatus.NON_COMPLIANT
+    assert results["CH-4"][0].validation_result.status == ValidationStatus.COMPLIANT
+
+    # Einzelvalidierung nutzt denselben Cache, Validatoren laufen nicht erneut
+    cached = results["CH-5"][1].validation_result
+    records = await engine.validate_batch("CH-5", make_batch(now), [ComplianceType.GMP])
+    assert records[0].validation_result is cached
+
+
+def test_time_dependent_rules_limit_cache_lifetime():
+    now = datetime(2025, 6, 10, 12, 0)
+    batch = make_batch(now)
+    batch['hygiene_protocol']['cleaning_date'] = datetime(2025, 6, 5, 8, 0).isoformat()
+
+    # Reinigung ist ab dem 8. Tag zu alt
+    assert rule_expiry(batch, ComplianceType.QS, now) == datetime(2025, 6, 13, 8, 0)
+    # HACCP-Stand 100 Tage alt, veraltet nach mehr als 12 * 30 Tagen
+    assert rule_expiry(batch, ComplianceType.GMP, now) == now + timedelta(days=261)
+    assert rule_expiry(batch, ComplianceType.EU_REG, now) is None
+
+    cache = ValidationCache()
+    key = content_hash(batch)
+    cache.store(key, ComplianceType.QS, "ergebnis", rule_expiry(batch, ComplianceType.QS, now))
+    assert cache.get(key, ComplianceType.QS, datetime(2025, 6, 13, 7, 59)) == "ergebnis"
+    assert cache.get(key, ComplianceType.QS, datetime(2025, 6, 13, 8, 0)) is None
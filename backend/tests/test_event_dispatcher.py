@@ -0,0 +1,115 @@
+"""
+Tests für den EventDispatcher mit synchronen und asynchronen Listenern
+"""
+
+import threading
+import time
+
+from backend.models.transaction_processing.events import ASYNC, EventDispatcher
+
+
+def test_slow_async_listener_stays_off_the_callers_path():
+    dispatcher = EventDispatcher()
+    seen = []
+    release = threading.Event()
+
+    def critical(event):
+        seen.append(("critical", event.get("n")))
+        if event.get("n") == 2:
+            event.stop_propagation()
+
+    def audit(event):
+        release.wait(1)
+        seen.append(("audit", event.get("n")))
+
+    dispatcher.add_listener("transaction.completed", critical, priority=10)
+    dispatcher.add_listener("transaction.completed", audit, mode=ASYNC)
+
+    started = time.perf_counter()
+    for n in range(3):
+        dispatcher.dispatch("transaction.completed", {"n": n})
+    assert time.perf_counter() - started < 0.5
+    assert seen == [("critical", 0), ("critical", 1), ("critical", 2)]
+
+    release.set()
+    assert dispatcher.flush(timeout=2)
+    # Event 2 hat die Propagation im kritischen Listener gestoppt
+    assert seen[3:] == [("audit", 0), ("audit", 1)]
+    metrics = dispatcher.metrics()
+    assert metrics["transaction.completed:test_slow_async_listener_stays_off_the_callers_path.<locals>.audit"]["events"] == 2
+    dispatcher.shutdown()
+
+
+def test_batches_timeouts_and_dead_letters():
+    dispatcher = EventDispatcher()
+    batches = []
+    hang = threading.Event()
+    fail = [True]
+    delivered = []
+
+    def analytics(events):
+        batches.append([event.get("n") for event in events])
+
+    def notify(event):
+        if event.get("n") == 1:
+            hang.wait(2)
+        if event.get("n") == 2 and fail[0]:
+            raise ConnectionError("SMS-Gateway nicht erreichbar")
+        delivered.append(event.get("n"))
+
+    dispatcher.add_listener("transaction.completed", analytics, mode=ASYNC, batch_size=50, batch_interval=0.2)
+    dispatcher.add_listener("transaction.completed", notify, mode=ASYNC, timeout=0.1)
+    for n in range(120):
+        dispatcher.dispatch("transaction.completed", {"n": n})
+    assert dispatcher.flush(timeout=3)
+
+    assert sorted(n for batch in batches for n in batch) == list(range(120))
+    assert all(len(batch) <= 50 for batch in batches) and len(batches) <= 4
+
+    letters = dispatcher.dead_letters.entries("transaction.completed")
+    assert [(entry.events[0].get("n"), entry.error) for entry in letters] == [
+        (1, "Zeitüberschreitung nach 0.1 s"), (2, "SMS-Gateway nicht erreichbar")
+    ]
+    stats = [m for name, m in dispatcher.metrics().items() if name.endswith("notify")][0]
+    assert (stats["calls"], stats["timeouts"], stats["failures"]) == (120, 1, 1)
+
+    # Der hängende Aufruf läuft noch und wird nicht ein zweites Mal zugestellt
+    assert letters[0].running
+    fail[0] = False
+    assert dispatcher.dead_letters.replay() == 1
+    hang.set()
+    time.sleep(0.1)
+    assert len(dispatcher.dead_letters) == 0
+    assert sorted(delivered) == list(range(120))
+
+    # Hängen alle Aufrufe, staut sich nichts im Pool: weitere Events werden sofort Dead Letters
+    stuck = threading.Event()
+    dispatcher.add_listener("transaction.batch_completed", lambda event: stuck.wait(2), mode=ASYNC, timeout=0.05)
+    for n in range(5):
+        dispatcher.dispatch("transaction.batch_completed", {"n": n})
+    assert dispatcher.flush(timeout=2)
+    assert [entry.error for entry in dispatcher.dead_letters.entries("transaction.batch_completed")] == (
+        ["Zeitüberschreitung nach 0.05 s"] * 2 + ["Vorherige Aufrufe hängen, nicht zugestellt"] * 3
+    )
+    stuck.set()
+    time.sleep(0.1)
+    assert [entry.events[0].get("n") for entry in dispatcher.dead_letters.entries("transaction.batch_completed")] == [
+        2, 3, 4
+    ]
+    dispatcher.dead_letters.clear()
+
+    # Volle Warteschlange: das Event wird nicht verworfen, sondern zum Dead Letter
+    running, blocked = threading.Event(), threading.Event()
+
+    def archive(event):
+        running.set()
+        blocked.wait(2)
+
+    dispatcher.add_listener("transaction.failed", archive, mode=ASYNC, queue_size=1)
+    dispatcher.dispatch("transaction.failed", {"n": 0})
+    assert running.wait(1)
+    for n in range(1, 3):
+        dispatcher.dispatch("transaction.failed", {"n": n})
+    assert [entry.error for entry in dispatcher.dead_letters.entries("transaction.failed")] == ["Warteschlange voll"]
+    blocked.set()
+    dispatcher.shutdown()
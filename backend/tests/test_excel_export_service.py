@@ -7,6 +7,10 @@ from datetime import datetime
 from fastapi.testclient import TestClient
 from unittest.mock import Mock, patch
 import openpyxl
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from backend.services import report_engine
+from backend.services.report_engine import records_source
 from backend.services.excel_export_service import (
     ExportConfig,
     ExportJob,
@@ -14,7 +18,8 @@ from backend.services.excel_export_service import (
     process_export,
     load_table_data,
     format_worksheet,
-    create_pivot_tables
+    create_pivot_tables,
+    write_export
 )
 
 # Test Data
@@ -99,10 +104,11 @@ class TestExcelExportService:
         assert response.status_code == 404
         
     @pytest.mark.asyncio
-    async def test_process_export(self, sample_job, mock_redis):
+    async def test_process_export(self, sample_job, mock_redis, tmp_path, monkeypatch):
         """Test: Export-Verarbeitung"""
-        with patch("backend.services.excel_export_service.load_table_data") as mock_load:
-            mock_load.return_value = SAMPLE_TABLE_DATA
+        monkeypatch.chdir(tmp_path)
+        with patch("backend.services.excel_export_service.stream_table_data") as mock_stream:
+            mock_stream.return_value = records_source(SAMPLE_TABLE_DATA)
             
             await process_export(sample_job)
             
@@ -110,10 +116,35 @@ class TestExcelExportService:
             assert sample_job.progress == 100.0
             assert sample_job.file_path.endswith(".xlsx")
             
+            wb = openpyxl.load_workbook(tmp_path / sample_job.file_path)
+            assert wb["Test"].cell(2, 2).value == "Test 1"
+            assert wb["Pivot"].max_row == 3
+            
+    def test_write_export_continues_on_next_sheet(self, sample_config, tmp_path, monkeypatch):
+        """Test: Überlauf wird wie bei write_workbook auf Folgeblätter verteilt"""
+        monkeypatch.setattr(report_engine, "MAX_SHEET_ROWS", 4)
+        rows = [{"id": i, "name": f"Test {i}", "value": i * 1.5, "date": "2025-01-01"} for i in range(9)]
+        monkeypatch.setattr("backend.services.excel_export_service.stream_table_data", lambda table_id: records_source(rows))
+        
+        assert write_export(str(tmp_path / "export.xlsx"), sample_config) == 9
+        
+        wb = openpyxl.load_workbook(tmp_path / "export.xlsx")
+        assert wb.sheetnames == ["Test", "Test (2)", "Test (3)", "Pivot"]
+        assert [wb[name].max_row for name in wb.sheetnames[:3]] == [5, 5, 2]
+        assert wb["Test (3)"].cell(2, 2).value == "Test 8"
+        
     @pytest.mark.asyncio
-    async def test_load_table_data(self):
+    async def test_load_table_data(self, monkeypatch):
         """Test: Tabellendaten laden"""
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE test_table (id INTEGER PRIMARY KEY, name TEXT)"))
+            connection.execute(text("INSERT INTO test_table VALUES (1, 'Test 1'), (2, 'Test 2')"))
+        monkeypatch.setattr("backend.services.excel_export_service._get_engine", lambda: engine)
+        
         data = await load_table_data("test_table")
+        with pytest.raises(ValueError):
+            await load_table_data("unbekannt; DROP TABLE test_table")
         
         assert isinstance(data, list)
         for item in data:
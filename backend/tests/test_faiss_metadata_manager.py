@@ -0,0 +1,86 @@
+"""
+Tests für die gefilterte Suche und inkrementelle Indexierung des FAISS Metadata Managers
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+mongomock = pytest.importorskip("mongomock")
+
+from backend.services import faiss_metadata_manager
+from backend.services.faiss_metadata_manager import FaissWithMetadataManager
+
+DIM = 4
+
+
+@pytest.fixture
+def mongo_client(monkeypatch):
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(faiss_metadata_manager, "MongoClient", lambda uri: client)
+    # mongomock kennt keine Text-Indizes
+    monkeypatch.setattr(mongomock.Collection, "create_index", lambda self, keys, **kwargs: None)
+    return client
+
+
+def _manager(tmp_path):
+    return FaissWithMetadataManager(
+        dim=DIM,
+        index_path=str(tmp_path / "faiss_db"),
+        metadata_path=str(tmp_path / "faiss_metadata"),
+    )
+
+
+def _vector(value):
+    return np.full(DIM, value, dtype="float32")
+
+
+@pytest.fixture
+def manager(mongo_client, tmp_path):
+    manager = _manager(tmp_path)
+    # Die nächsten Nachbarn sind Rechnungen, Lieferscheine liegen weiter entfernt
+    for i in range(10):
+        manager.add_document(f"rechnung-{i}", _vector(i), {"doc_type": "rechnung", "tenant_id": "A"})
+    for i in range(3):
+        manager.add_document(f"lieferschein-{i}", _vector(100 + i), {"doc_type": "lieferschein", "tenant_id": "B"})
+    manager.build_index()
+    return manager
+
+
+def test_filtered_search_returns_k_hits_with_batched_hydration(manager, mongo_client):
+    finds = []
+    original_find = mongomock.Collection.find
+
+    def counting_find(self, *args, **kwargs):
+        finds.append(args)
+        return original_find(self, *args, **kwargs)
+
+    mongomock.Collection.find = counting_find
+    try:
+        results = manager.search(_vector(0), k=3, filter_criteria={"doc_type": "lieferschein"})
+        other = manager.search(_vector(0), k=2, filter_criteria={"title": {"$exists": False}, "tenant_id": "B"})
+    finally:
+        mongomock.Collection.find = original_find
+
+    assert [doc["_id"] for doc in results] == ["lieferschein-0", "lieferschein-1", "lieferschein-2"]
+    assert results[0]["similarity_score"] > results[1]["similarity_score"]
+    assert [doc["_id"] for doc in other] == ["lieferschein-0", "lieferschein-1"]
+    # Filter über den Metadaten-Index: nur die Hydrierung; sonstige Filter: eine zusätzliche Abfrage
+    assert len(finds) == 3
+
+
+def test_incremental_updates_are_persisted(manager, mongo_client, tmp_path):
+    manager.add_document("rechnung-0", _vector(200), {"doc_type": "rechnung", "tenant_id": "A"})
+    manager.add_document("rechnung-neu", _vector(0.1), {"doc_type": "rechnung", "tenant_id": "C"})
+    manager.build_index()
+    manager.remove_document("rechnung-1")
+
+    assert manager.index.ntotal == 13
+
+    reloaded = _manager(tmp_path)
+    assert reloaded.index.ntotal == 13
+    assert [doc["_id"] for doc in reloaded.search(_vector(0), k=2)] == ["rechnung-neu", "rechnung-2"]
+    assert [doc["_id"] for doc in reloaded.search(_vector(0), k=5, filter_criteria={"tenant_id": "C"})] == [
+        "rechnung-neu"
+    ]
+    assert mongo_client["valeo_neuroerp"]["documents"].find_one({"_id": "rechnung-1"}) is None
@@ -0,0 +1,136 @@
+"""
+Tests für die Streaming-Import-Engine
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from backend.services.import_engine import (
+    DBAPIBulkLoader,
+    MemoryCheckpointStore,
+    StreamingImporter,
+    iter_csv_chunks,
+    iter_excel_chunks,
+    iter_json_chunks,
+    iter_jsonl_chunks,
+    transform_chunk,
+)
+
+MAPPING = {"Nummer": "nummer", "Name": "name", "Preis": "preis"}
+TYPES = {"nummer": "int", "preis": "float"}
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "artikel.csv"
+    lines = ["Nummer;Name;Preis"]
+    lines += [f'{i};"Artikel {i}";{i},50' for i in range(1, 26)]
+    lines.append('26;"Mehrzeilig\nName";1,00')
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def db():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE artikel (nummer INTEGER, name TEXT, preis REAL)")
+    yield connection
+    connection.close()
+
+
+def _importer(csv_file, db, store, chunk_size=10):
+    def reader(start_position):
+        return iter_csv_chunks(csv_file, chunk_size, delimiter=";", start_position=start_position)
+
+    return StreamingImporter(reader, DBAPIBulkLoader(db, "artikel"), MAPPING, TYPES, checkpoint_store=store)
+
+
+def test_csv_chunks_resume_from_byte_offset(csv_file):
+    chunks = list(iter_csv_chunks(csv_file, 10, delimiter=";"))
+    assert [c.row_count for c in chunks] == [10, 10, 6]
+    assert chunks[-1].progress == pytest.approx(1.0)
+    assert chunks[-1].columns["Name"][-1] == "Mehrzeilig\nName"
+
+    resumed = list(iter_csv_chunks(csv_file, 10, delimiter=";", start_position=chunks[0].end_position))
+    assert resumed[0].columns["Nummer"][0] == "11"
+    assert sum(c.row_count for c in resumed) == 16
+
+
+def test_transform_chunk_converts_columns_and_collects_errors(csv_file):
+    chunk = next(iter_csv_chunks(csv_file, 3, delimiter=";"))
+    chunk.columns["Preis"][1] = "kein Preis"
+    columns, rows, errors = transform_chunk(chunk, MAPPING, TYPES, required=["name"])
+    assert columns == ["nummer", "name", "preis"]
+    assert rows == [(1, "Artikel 1", 1.5), (3, "Artikel 3", 3.5)]
+    assert errors[0][0] == 1
+
+
+def test_import_loads_all_rows(csv_file, db):
+    result = _importer(csv_file, db, MemoryCheckpointStore()).run()
+    assert result.processed_rows == 26
+    assert result.chunks == 3
+    assert db.execute("SELECT COUNT(*), SUM(preis) FROM artikel").fetchone() == (26, 338.5)
+
+
+def test_retry_resumes_after_last_committed_chunk(csv_file, db):
+    store = MemoryCheckpointStore()
+    loader_calls = []
+
+    class FailingLoader(DBAPIBulkLoader):
+        def load(self, columns, rows):
+            loader_calls.append(len(rows))
+            if len(loader_calls) == 2:
+                raise RuntimeError("Verbindung verloren")
+            super().load(columns, rows)
+
+    importer = _importer(csv_file, db, store)
+    importer.loader = FailingLoader(db, "artikel")
+    with pytest.raises(RuntimeError):
+        importer.run()
+    assert store.checkpoint.processed_rows == 10
+
+    result = _importer(csv_file, db, store).run()
+    assert result.resumed_from > 0
+    assert result.processed_rows == 26
+    assert db.execute("SELECT COUNT(DISTINCT nummer), COUNT(*) FROM artikel").fetchone() == (26, 26)
+
+
+def test_json_and_jsonl_chunks(tmp_path):
+    items = [{"Nummer": i, "Details": {"Name": f"A{i}"}} for i in range(7)]
+    array_file = tmp_path / "artikel.json"
+    array_file.write_text(json.dumps({"daten": {"artikel": items}}), encoding="utf-8")
+    lines_file = tmp_path / "artikel.jsonl"
+    lines_file.write_text("\n".join(json.dumps(i) for i in items) + "\n", encoding="utf-8")
+    mapping = {"Nummer": "nummer", "Details.Name": "name"}
+
+    array_chunks = list(iter_json_chunks(str(array_file), 3, root_element="daten.artikel"))
+    assert [c.row_count for c in array_chunks] == [3, 3, 1]
+    resumed = list(iter_json_chunks(str(array_file), 3, "daten.artikel", start_position=array_chunks[0].end_position))
+    assert transform_chunk(resumed[0], mapping)[1][0] == (3, "A3")
+
+    object_file = tmp_path / "artikel_einzeln.json"
+    object_file.write_text(json.dumps({"daten": {"artikel": items[0]}}), encoding="utf-8")
+    single = list(iter_json_chunks(str(object_file), 3, root_element="daten.artikel"))
+    assert transform_chunk(single[0], mapping)[1] == [(0, "A0")]
+
+    line_chunks = list(iter_jsonl_chunks(str(lines_file), 3))
+    resumed = list(iter_jsonl_chunks(str(lines_file), 3, start_position=line_chunks[1].end_position))
+    assert transform_chunk(resumed[0], mapping)[1] == [(6, "A6")]
+
+
+def test_excel_chunks_stream_rows(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["Nummer", "Name", "Preis"])
+    for i in range(5):
+        sheet.append([i, f"Artikel {i}", i * 1.5])
+    path = tmp_path / "artikel.xlsx"
+    workbook.save(path)
+
+    chunks = list(iter_excel_chunks(str(path), 2))
+    assert [c.row_count for c in chunks] == [2, 2, 1]
+    resumed = list(iter_excel_chunks(str(path), 2, start_position=chunks[1].end_position))
+    assert resumed[0].columns["Name"] == ["Artikel 4"]
@@ -0,0 +1,126 @@
+"""
+Tests für die vektorisierte Bestellplanung der KI-Inventur-Vorschläge
+"""
+
+import math
+import sqlite3
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from backend.modules.ai_inventory_suggestions import (
+    AIInventorySuggestions,
+    PRODUCT_COLUMNS,
+    compute_reorder_plan,
+)
+
+AS_OF = datetime(2024, 7, 1, 12, 0)
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("""
+        CREATE TABLE products (
+            id TEXT PRIMARY KEY, product_name TEXT, category TEXT, current_stock REAL,
+            unit_price REAL, supplier_id TEXT, reorder_point REAL, safety_stock REAL
+        )
+    """)
+    connection.execute("""
+        CREATE TABLE transactions (
+            id INTEGER PRIMARY KEY, product_id TEXT, quantity REAL,
+            unit_price REAL, created_at TIMESTAMP
+        )
+    """)
+    products = [
+        ("A", "Apfelsaft", "Getränke", 5, 2.0, "S1", 0, 0),
+        ("B", "Brot", "Lebensmittel", 500, 3.0, "S1", 0, 0),
+        ("C", "Kabel", "Elektronik", 1, 10.0, "S2", 0, 0),
+    ]
+    connection.executemany("INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?)", products)
+    sales = []
+    for day in range(90):
+        created_at = (AS_OF - timedelta(days=day, hours=1)).strftime("%Y-%m-%d %H:%M:%S")
+        sales.append(("A", 2, 2.0, created_at))
+        sales.append(("B", 1, 3.0, created_at))
+    # Verkäufe außerhalb des Betrachtungszeitraums zählen nicht
+    sales.append(("C", 100, 10.0, (AS_OF - timedelta(days=200)).strftime("%Y-%m-%d %H:%M:%S")))
+    connection.executemany(
+        "INSERT INTO transactions (product_id, quantity, unit_price, created_at) VALUES (?, ?, ?, ?)", sales
+    )
+    connection.commit()
+    return connection
+
+
+def test_compute_reorder_plan_matches_scalar_formulas():
+    products = pd.DataFrame(
+        [("A", "Apfelsaft", "Getränke", 10.0, 4.0, "S1", 0.0, 0.0)], columns=PRODUCT_COLUMNS
+    )
+    # Tagesmengen 3 und 1 an zwei von vier Tagen
+    demand = pd.DataFrame(
+        [("A", 4.0, 10.0, 2)], columns=["product_id", "total_sold", "sum_sq_daily", "transactions"]
+    )
+
+    row = compute_reorder_plan(products, demand, lookback_days=4, as_of=AS_OF).iloc[0]
+
+    daily_demand = 1.0
+    demand_std = math.sqrt(10.0 / 4 - daily_demand ** 2)
+    safety_stock = demand_std * math.sqrt(7) * 1.645
+    assert row["daily_demand"] == pytest.approx(daily_demand)
+    assert row["demand_std"] == pytest.approx(demand_std)
+    assert row["safety_stock_optimal"] == pytest.approx(safety_stock)
+    assert row["reorder_point_optimal"] == pytest.approx(7 + safety_stock)
+    assert row["eoq"] == pytest.approx(math.sqrt(2 * 365 * 50 / (4.0 * 0.2)))
+    assert row["urgency_level"] == "mittel"
+    assert row["predicted_shortage_date"] == pd.Timestamp(AS_OF + timedelta(days=10))
+    assert row["seasonal_factor"] == pytest.approx(1.8)
+    assert bool(row["needs_reorder"])
+
+
+def test_run_reorder_planning_uses_grouped_queries_and_bulk_writes(connection, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    service = AIInventorySuggestions(connection)
+    statements = []
+    connection.set_trace_callback(statements.append)
+
+    result = service.run_reorder_planning(lookback_days=90, as_of=AS_OF, apply_parameters=True)
+
+    # Tagesnachfrage, Produkte und Nachfrage-Statistik – keine Queries pro Produkt
+    assert len([sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]) == 3
+    assert result["planned_products"] == 3
+    assert result["reorder_suggestions"] == 1
+
+    plan = connection.execute(
+        "SELECT product_id, urgency_level, daily_demand FROM inventory_reorder_plan"
+    ).fetchall()
+    assert plan == [("A", "hoch", pytest.approx(2.0))]
+
+    # Ohne Nachfrage im Zeitraum bleiben die Parameter unverändert
+    reorder_point_a, reorder_point_c = [
+        row[0] for row in connection.execute("SELECT reorder_point FROM products WHERE id IN ('A', 'C') ORDER BY id")
+    ]
+    # Konstante Tagesnachfrage: Standardabweichung fällt auf 30% der Nachfrage zurück
+    assert reorder_point_a == pytest.approx(2.0 * 7 + 0.6 * math.sqrt(7) * 1.645)
+    assert reorder_point_c == 0
+
+
+def test_refresh_daily_demand_only_aggregates_new_days(connection, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    service = AIInventorySuggestions(connection)
+    service.refresh_daily_demand(AS_OF)
+
+    next_day = AS_OF + timedelta(days=1)
+    connection.execute(
+        "INSERT INTO transactions (product_id, quantity, unit_price, created_at) VALUES ('C', 7, 10.0, ?)",
+        (next_day.strftime("%Y-%m-%d %H:%M:%S"),)
+    )
+    assert service.refresh_daily_demand(next_day) == 3
+
+    assert connection.execute(
+        "SELECT SUM(quantity) FROM product_daily_demand WHERE product_id = 'A'"
+    ).fetchone()[0] == 180
+    assert connection.execute(
+        "SELECT quantity FROM product_daily_demand WHERE product_id = 'C' AND day = ?",
+        (next_day.strftime("%Y-%m-%d"),)
+    ).fetchall() == [(7,)]
@@ -0,0 +1,143 @@
+"""
+Tests für die inkrementelle Pflege materialisierter Ansichten
+"""
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from backend.db.materialized_views import (
+    affected_views,
+    get_materialized_view_info,
+    get_view_staleness,
+    refresh_all_materialized_views,
+    refresh_changed_views,
+    refresh_materialized_view,
+    setup_materialized_views,
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'mv.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE artikel (id INTEGER PRIMARY KEY, kategorie TEXT, preis FLOAT)"))
+        conn.execute(text("CREATE TABLE charge (id INTEGER PRIMARY KEY, artikel_id INTEGER)"))
+        conn.execute(text(
+            "CREATE TABLE lagerbewegung (id INTEGER PRIMARY KEY, artikel_id INTEGER, menge FLOAT, datum DATE)"
+        ))
+        conn.execute(text("INSERT INTO artikel VALUES (1, 'Saatgut', 10.0), (2, 'Dünger', 20.0)"))
+        conn.execute(text("INSERT INTO charge VALUES (1, 1), (2, 2)"))
+        _book(conn, [(1, 10, "2026-01-05"), (2, 5, "2026-01-20"), (1, -3, "2026-02-01")])
+    setup_materialized_views(engine)
+    return engine
+
+
+def _book(conn, movements):
+    for artikel_id, menge, datum in movements:
+        conn.execute(
+            text("INSERT INTO lagerbewegung (artikel_id, menge, datum) VALUES (:a, :m, :d)"),
+            {"a": artikel_id, "m": menge, "d": datum},
+        )
+
+
+def _rows(engine, query):
+    with engine.connect() as conn:
+        return [tuple(row) for row in conn.execute(text(query))]
+
+
+def test_incremental_refresh_merges_only_new_movements(engine):
+    with engine.begin() as conn:
+        _book(conn, [(1, 4, "2026-02-10"), (3, 7, "2026-02-11")])
+
+    staleness = get_view_staleness(engine)
+    assert staleness["mv_lagerbestand_pro_artikel"]["pending_rows"] == 2
+    assert staleness["mv_lagerbestand_pro_artikel"]["stale"]
+    assert not staleness["mv_durchschnittlicher_artikelpreis"]["stale"]
+
+    assert refresh_materialized_view(engine, "mv_lagerbestand_pro_artikel")
+    assert refresh_materialized_view(engine, "mv_lagerbewegungen_pro_monat")
+    assert _rows(engine, "SELECT artikel_id, bestand FROM mv_lagerbestand_pro_artikel ORDER BY artikel_id") == [
+        (1, 11.0), (2, 5.0), (3, 7.0)
+    ]
+    assert _rows(engine, "SELECT * FROM mv_lagerbewegungen_pro_monat ORDER BY monat") == [
+        ("2026-01", 2, 15.0, 0.0), ("2026-02", 3, 11.0, 3.0)
+    ]
+    assert get_view_staleness(engine, "mv_lagerbestand_pro_artikel")["mv_lagerbestand_pro_artikel"]["pending_rows"] == 0
+
+    # Vollständiger Neuaufbau liefert dasselbe Ergebnis
+    assert refresh_materialized_view(engine, "mv_lagerbestand_pro_artikel", full=True)
+    assert _rows(engine, "SELECT SUM(bestand) FROM mv_lagerbestand_pro_artikel") == [(23.0,)]
+
+
+def test_refresh_changed_views_uses_dependency_graph(engine):
+    assert affected_views(["artikel"]) == {"mv_chargen_pro_kategorie", "mv_durchschnittlicher_artikelpreis"}
+
+    assert refresh_changed_views(engine) == {}
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO artikel VALUES (3, 'Saatgut', 30.0)"))
+
+    results = refresh_changed_views(engine)
+    assert set(results) == {"mv_chargen_pro_kategorie", "mv_durchschnittlicher_artikelpreis"}
+    assert _rows(engine, "SELECT * FROM mv_durchschnittlicher_artikelpreis WHERE kategorie = 'Saatgut'") == [
+        ("Saatgut", 20.0)
+    ]
+
+    info = get_materialized_view_info(engine, "mv_durchschnittlicher_artikelpreis")
+    assert info["refresh_count"] == 2
+    assert info["stale"] is False
+    assert all(r["success"] for r in refresh_all_materialized_views(engine).values())
+
+
+def test_updates_and_late_movements_are_detected(engine):
+    # Preisänderung ändert weder Zeilenzahl noch höchste ID
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE artikel SET preis = 40.0 WHERE id = 2"))
+        # Spät committete Bewegung mit niedrigerer ID als die bisher höchste
+        conn.execute(text("INSERT INTO lagerbewegung VALUES (0, 2, 1, '2026-01-02')"))
+
+    staleness = get_view_staleness(engine)
+    assert staleness["mv_durchschnittlicher_artikelpreis"]["changed_tables"] == ["artikel"]
+    assert staleness["mv_lagerbestand_pro_artikel"]["pending_rows"] == 1
+    refresh_changed_views(engine)
+    assert _rows(engine, "SELECT durchschnittspreis FROM mv_durchschnittlicher_artikelpreis "
+                         "WHERE kategorie = 'Dünger'") == [(40.0,)]
+    assert _rows(engine, "SELECT bestand FROM mv_lagerbestand_pro_artikel WHERE artikel_id = 2") == [(6.0,)]
+
+    # Korrektur einer Bewegung: inkrementell nicht abbildbar, daher Neuaufbau
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE lagerbewegung SET menge = 8 WHERE id = 1"))
+    assert refresh_materialized_view(engine, "mv_lagerbestand_pro_artikel")
+    assert _rows(engine, "SELECT artikel_id, bestand FROM mv_lagerbestand_pro_artikel ORDER BY artikel_id") == [
+        (1, 5.0), (2, 6.0)
+    ]
+    assert not get_view_staleness(engine)["mv_lagerbestand_pro_artikel"]["stale"]
+
+
+def test_refresh_keeps_triggers_and_compacts_change_log(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+
+    with engine.begin() as conn:
+        _book(conn, [(1, 2, "2026-02-12")])
+        conn.execute(text("UPDATE artikel SET preis = 12.0 WHERE id = 1"))
+    assert _rows(engine, "SELECT COUNT(*) FROM materialized_views_change_log") == [(2,)]
+
+    assert set(refresh_changed_views(engine)) == {
+        "mv_lagerbestand_pro_artikel", "mv_lagerbewegungen_pro_monat",
+        "mv_chargen_pro_kategorie", "mv_durchschnittlicher_artikelpreis",
+    }
+    staleness = get_view_staleness(engine)
+    assert not any(info["stale"] for info in staleness.values())
+
+    # Weder Aktualisierung noch Prüfung fassen die Trigger der Basistabellen an
+    assert not [statement for statement in statements if "TRIGGER" in statement.upper()]
+    assert _rows(engine, "SELECT COUNT(*) FROM materialized_views_change_log") == [(0,)]
+    assert _rows(engine, "SELECT table_name, change_count, mutation_count FROM materialized_views_changes "
+                         "WHERE table_name IN ('artikel', 'lagerbewegung') ORDER BY table_name") == [
+        ("artikel", 1, 1), ("lagerbewegung", 1, 0)
+    ]
+
+    # Nach dem Verdichten wird die nächste Änderung weiter erkannt
+    with engine.begin() as conn:
+        _book(conn, [(2, 1, "2026-02-13")])
+    assert get_view_staleness(engine)["mv_lagerbestand_pro_artikel"]["changed_tables"] == ["lagerbewegung"]
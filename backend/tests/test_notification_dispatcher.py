@@ -0,0 +1,135 @@
+"""
+Tests für die Zustellung von Benachrichtigungen an viele Empfänger
+"""
+
+import socketserver
+import threading
+
+import pytest
+
+from backend.services.notification_dispatcher import (
+    Coalescer,
+    Delivery,
+    NotificationDispatcher,
+    NotificationEvent,
+    SMTPBatchSender,
+)
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Minimaler SMTP-Server: nimmt Nachrichten an, lehnt Adressen mit 'refused' ab"""
+
+    def _reply(self, text):
+        self.wfile.write(text.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        with self.server.lock:
+            self.server.connections += 1
+        self._reply("220 localhost ESMTP")
+        in_data = False
+        for line in self.rfile:
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    with self.server.lock:
+                        self.server.messages += 1
+                    self._reply("250 OK")
+                elif line.startswith(b"From:"):
+                    self.server.senders.add(line.decode("ascii").strip())
+                continue
+            command = line[:4].upper()
+            if command in (b"EHLO", b"HELO"):
+                self._reply("250 localhost")
+            elif command == b"RCPT" and b"refused" in line:
+                self._reply("550 No such user")
+            elif command == b"DATA":
+                in_data = True
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+            elif command == b"QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("250 OK")
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = server.messages = 0
+    server.senders = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_emails_reuse_smtp_connections(smtp_server):
+    sender = SMTPBatchSender("127.0.0.1", smtp_server.server_address[1], "alarm@example.com",
+                             use_tls=False, connections=3, from_name="Leitstelle")
+    deliveries = [Delivery(n, "email", f"user{n}@example.com") for n in range(50)]
+    deliveries += [Delivery(50, "email", "refused@example.com"), Delivery(51, "email", None)]
+
+    sender.send(deliveries, NotificationEvent("Notfall", "Brand in Halle 3"))
+
+    assert sum(d.sent for d in deliveries) == 50
+    assert smtp_server.messages == 50
+    assert smtp_server.connections == 3
+    assert smtp_server.senders == {"From: Leitstelle <alarm@example.com>"}
+    assert "550" in deliveries[50].error
+    assert deliveries[51].error == "Keine E-Mail-Adresse"
+
+
+def test_smtp_sender_uses_tls_by_default():
+    sender = SMTPBatchSender("smtp.example.com", 587, "alarm@example.com")
+
+    assert sender.use_tls is True
+    assert sender.from_name is None
+
+
+def test_channels_fan_out_and_duplicates_coalesce():
+    now = [0.0]
+    received = {}
+
+    def sender(channel):
+        def send(deliveries, event):
+            received.setdefault(channel, []).append([d.user_id for d in deliveries])
+            if channel == "sms":
+                raise ConnectionError("SMS-Gateway nicht erreichbar")
+            for delivery in deliveries:
+                delivery.sent = True
+        return send
+
+    dispatcher = NotificationDispatcher(
+        {channel: sender(channel) for channel in ("email", "sms", "push")},
+        coalescer=Coalescer(window=60, clock=lambda: now[0]),
+    )
+    event = NotificationEvent("Notfall", "Brand in Halle 3", "CRITICAL", "emergency", 7)
+
+    def deliveries(users):
+        return [Delivery(u, c, u) for u in users for c in ("email", "sms", "push")] + [Delivery(1, "fax", "1")]
+
+    result = dispatcher.dispatch(event, deliveries(range(1, 4)))
+    assert received == {"email": [[1, 2, 3]], "sms": [[1, 2, 3]], "push": [[1, 2, 3]]}
+    assert (result.sent, result.failed, result.coalesced) == (6, 4, 0)
+    assert {d.error for d in result.deliveries if not d.sent} == {
+        "SMS-Gateway nicht erreichbar", "Kein Versand für Kanal fax konfiguriert"
+    }
+
+    # Gleiche Meldung innerhalb des Fensters: nur der neue Empfänger und die
+    # fehlgeschlagenen Zustellungen gehen erneut hinaus
+    now[0] = 30
+    result = dispatcher.dispatch(event, deliveries(range(1, 5)))
+    assert received["email"][-1] == [4]
+    assert received["sms"][-1] == [1, 2, 3, 4]
+    assert result.coalesced == 6
+
+    # Komplett gescheiterter Versand wird beim nächsten Versuch nicht zusammengefasst
+    failing = NotificationDispatcher({"sms": sender("sms")}, coalescer=Coalescer(window=60, clock=lambda: now[0]))
+    sms = [Delivery(9, "sms", "9")]
+    assert (failing.dispatch(event, sms).sent, failing.dispatch(event, sms).coalesced) == (0, 0)
+
+    now[0] = 100
+    assert dispatcher.dispatch(event, deliveries([1])).coalesced == 0
@@ -0,0 +1,89 @@
+"""
+Tests für die Nummernkreise mit Blockvergabe
+"""
+
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from backend.modules.number_range_service import (
+    NumberRangeConfig,
+    NumberRangeMode,
+    NumberRangeService,
+    WorkerIdInUseError,
+)
+
+RANGES = [
+    NumberRangeConfig("rechnung", "RE", NumberRangeMode.LUECKENLOS, block_groesse=10),
+    NumberRangeConfig("angebot", "AN", block_groesse=10),
+]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "nummernkreise.db")
+
+
+def test_parallel_workers_never_issue_duplicates(db_path):
+    workers = [NumberRangeService(db_path, f"kasse-{i}", RANGES) for i in range(4)]
+    nummern = []
+
+    def vergeben(service):
+        for _ in range(250):
+            nummern.append(service.next_value("rechnung", filiale="01"))
+
+    threads = [threading.Thread(target=vergeben, args=(w,)) for w in workers for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for w in workers:
+        w.close()
+
+    assert len(nummern) == len(set(nummern)) == 2000
+    # Zurückgegebene Reste werden zuerst wieder vergeben: keine Lücken
+    service = NumberRangeService(db_path, "kasse-9", RANGES)
+    assert sorted(nummern + [service.next_value("rechnung", filiale="01") for _ in range(30)]) == list(range(1, 2031))
+
+
+def _crash(service):
+    """Prozessabsturz: kein release(), kein Heartbeat mehr"""
+    service._stopped.set()
+    service._heartbeat.join()
+    time.sleep(service.lease_timeout * 1.5)
+
+
+def test_gapless_range_continues_after_crash(db_path):
+    service = NumberRangeService(db_path, "kasse-1", RANGES, lease_timeout=0.2)
+    assert [service.next_value("rechnung") for _ in range(3)] == [1, 2, 3]
+    assert service.next_value("angebot") == 1
+    andere = NumberRangeService(db_path, "kasse-2", RANGES)
+    assert andere.next_value("rechnung") == 11
+
+    # Solange die Instanz lebt, ist ihre Worker-ID belegt
+    with pytest.raises(WorkerIdInUseError):
+        NumberRangeService(db_path, "kasse-1", RANGES)
+
+    # Nach dem Absturz übernimmt der neue Prozess den offenen Block
+    _crash(service)
+    neu = NumberRangeService(db_path, "kasse-1", RANGES, lease_timeout=0.2)
+    assert neu.next_value("rechnung") == 4
+    # Die abgestürzte Instanz darf nicht weiter vergeben
+    with pytest.raises(WorkerIdInUseError):
+        service.next_value("rechnung")
+
+    # Gap-tolerante Kreise verlieren den Rest des Blocks, vergeben aber nie doppelt
+    assert neu.next_value("angebot") == 11
+
+
+def test_ranges_are_separated_by_year_and_branch(db_path):
+    service = NumberRangeService(db_path, "kasse-1", RANGES)
+
+    assert service.next_number("rechnung", "01", date(2024, 12, 31)) == "RE-2024-01-000001"
+    assert service.next_number("rechnung", "01", date(2025, 1, 1)) == "RE-2025-01-000001"
+    assert service.next_number("rechnung", "02", date(2025, 1, 1)) == "RE-2025-02-000001"
+    assert service.next_number("rechnung", "01", date(2025, 1, 2)) == "RE-2025-01-000002"
+    with pytest.raises(ValueError):
+        service.next_number("gutschrift")
@@ -0,0 +1,121 @@
+"""
+Tests für die partitionierte Verarbeitung von Zahlungsstapeln
+"""
+
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+import pytest
+
+from backend.services.payment_batches import (
+    PaymentLedger,
+    build_report,
+    debtor_account,
+    partition_payments,
+    process_partition,
+)
+
+
+def _payment(account, amount, reference):
+    return {"amount": amount, "currency": "EUR", "payment_method": "sepa", "customer_id": account,
+            "debtor_account": account, "reference": reference}
+
+
+@pytest.fixture
+def batch():
+    return [_payment(f"DE{n % 7:02d}", 100 + n, f"R{n}") for n in range(40)]
+
+
+def _executor(calls, failing=()):
+    numbers = count(1)
+
+    def execute(payment):
+        calls.append(payment["reference"])
+        assert payment["idempotency_key"].endswith(f":{int(payment['reference'][1:])}")
+        if payment["reference"] in failing:
+            raise ValueError("Gateway abgelehnt")
+        return {"transaction_id": f"TXN-{next(numbers)}", "amount": payment["amount"], "currency": "EUR"}
+    return execute
+
+
+def _run(ledger_path, batch_id, buckets, execute, balances=None):
+    def run(number, items):
+        ledger = PaymentLedger(ledger_path)
+        try:
+            return process_partition(ledger, batch_id, number, items, execute, balances)
+        finally:
+            ledger.close()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        return list(executor.map(run, range(len(buckets)), buckets))
+
+
+def test_partitions_keep_each_debtor_account_together(batch):
+    buckets = partition_payments(batch, partitions=4)
+
+    assert sum(len(bucket) for bucket in buckets) == len(batch)
+    accounts = [{debtor_account(p) for _, p in bucket} for bucket in buckets]
+    assert all(a.isdisjoint(b) for i, a in enumerate(accounts) for b in accounts[i + 1:])
+    assert buckets == partition_payments(batch, partitions=4)
+    assert len(partition_payments(batch[:1], partitions=4)) == 1
+
+
+def test_bad_payments_do_not_block_the_batch_and_rerun_is_idempotent(tmp_path, batch):
+    ledger_path = str(tmp_path / "ledger.db")
+    batch_id = "SEPA-2024-05"
+    buckets = partition_payments(batch, partitions=4)
+    calls = []
+    # DE00: R0, R7, R14, ... Guthaben reicht für die ersten beiden Zahlungen
+    balances = {"DE00": "210.00"}
+
+    _run(ledger_path, batch_id, buckets, _executor(calls, failing={"R5"}), balances)
+    ledger = PaymentLedger(ledger_path)
+    report = build_report(ledger, batch_id, len(batch))
+
+    failed = {r["payment_data"]["reference"]: r["error"] for r in report["payment_results"] if r["status"] == "error"}
+    assert set(failed) == {"R5", "R14", "R21", "R28", "R35"}
+    assert "Deckung" in failed["R14"] and failed["R5"] == "Gateway abgelehnt"
+    assert (report["successful_payments"], report["failed_payments"], report["pending_payments"],
+            report["unprocessed_payments"]) == (35, 5, 0, 0)
+    assert sum(p["payments"] for p in report["partitions"]) == 40
+    assert [r["position"] for r in report["payment_results"]] == list(range(40))
+
+    # Wiederholung: nur fehlgeschlagene Zahlungen laufen erneut, die Deckung rechnet Gebuchtes an
+    calls.clear()
+    _run(ledger_path, batch_id, buckets, _executor(calls), balances)
+    assert calls == ["R5"]
+    again = build_report(ledger, batch_id, len(batch))
+    assert (again["successful_payments"], again["failed_payments"]) == (36, 4)
+    assert again == build_report(ledger, batch_id, len(batch)) == ledger.get_report(batch_id)
+    ledger.close()
+
+
+class _FailingLedger(PaymentLedger):
+    """Journal, das nach der Ausführung einer Zahlung nicht mehr schreiben kann."""
+
+    def record(self, batch_id, partition, row):
+        if row["status"] == "success" and row["payment_data"]["reference"] == "R3":
+            raise sqlite3.OperationalError("database is locked")
+        super().record(batch_id, partition, row)
+
+
+def test_retry_after_lost_result_does_not_pay_twice(tmp_path, batch):
+    ledger_path = str(tmp_path / "ledger.db")
+    items = [(position, payment) for position, payment in enumerate(batch[:6])]
+    calls = []
+
+    ledger = _FailingLedger(ledger_path)
+    with pytest.raises(sqlite3.OperationalError):
+        process_partition(ledger, "RUN-1", 0, items, _executor(calls))
+    assert calls == ["R0", "R1", "R2", "R3"]
+
+    # Wiederholung der Partition (autoretry): R3 wurde ausgeführt, das Ergebnis ist unbekannt
+    calls.clear()
+    summary = process_partition(PaymentLedger(ledger_path), "RUN-1", 0, items, _executor(calls))
+    assert calls == ["R4", "R5"]
+    assert (summary["skipped"], summary["pending"], summary["successful"]) == (3, 1, 2)
+    report = build_report(ledger, "RUN-1", len(items))
+    assert (report["successful_payments"], report["pending_payments"]) == (5, 1)
+    assert report["payment_results"][3]["idempotency_key"] == "RUN-1:3"
+    ledger.close()
@@ -0,0 +1,55 @@
+"""
+Tests für die PDF-Berichte mit Diagrammen und Tabellen
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("reportlab")
+pytest.importorskip("matplotlib")
+
+from backend.tasks.report_tasks import pdf_reports, report_utils
+
+
+@pytest.fixture
+def progress(monkeypatch):
+    calls = []
+    monkeypatch.setattr(pdf_reports, "update_task_progress", lambda task_id, value, message=None: calls.append(value))
+    yield calls
+    report_utils._reset_render_pool()
+
+
+def _report(charts):
+    return {
+        "title": "Monatsbericht",
+        "content": [{"title": "Umsatz", "content": "Umsätze im Überblick"}],
+        "charts": [{"type": chart_type, "title": f"Diagramm {i}", "data": {"Jan": 10 + i, "Feb": 12, "Mär": 9}}
+                   for i, chart_type in enumerate(charts)],
+        "tables": [{"headers": ["Konto", "Betrag"], "rows": [[f"K{n}", n * 1.5] for n in range(1200)]}],
+    }
+
+
+@pytest.mark.parametrize("charts", [["bar", "line"], ["bar", "line", "pie", "bar", "line"]])
+def test_pdf_report_with_charts_and_tables(tmp_path, progress, charts):
+    output_file = tmp_path / "bericht.pdf"
+
+    result = pdf_reports.generate_pdf_report.run(_report(charts), output_file=str(output_file))
+
+    assert result["status"] == "success" and result["charts_count"] == len(charts)
+    with open(output_file, "rb") as f:
+        assert f.read(5) == b"%PDF-"
+    assert result["report_size_bytes"] == os.path.getsize(output_file)
+    assert progress[-1] == 100 and progress == sorted(progress)
+
+
+def test_charts_keep_input_order(tmp_path):
+    charts = [{"type": "bar", "title": f"D{i}", "data": {"a": i + 1}} for i in range(5)]
+    charts.insert(2, {"type": "bar", "title": "leer", "data": {}})
+    try:
+        rendered = pdf_reports._render_charts(charts, str(tmp_path))
+    finally:
+        report_utils._reset_render_pool()
+
+    assert [title for title, _ in rendered] == [f"D{i}" for i in range(5)]
+    assert all(os.path.exists(path) for _, path in rendered)
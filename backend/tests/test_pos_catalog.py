@@ -0,0 +1,92 @@
+"""
+Tests für den Artikelkatalog der Kasse (Indizes, Präfixsuche, Preisliste, Deltas)
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from backend.modules.pos_catalog import POSCatalog
+from backend.modules.pos_system import POSProduct, POSSystem
+
+
+def _product(artikel_nr, bezeichnung, ean=None, plu=None, brutto="1.19", kategorie="Obst", aktiv=True):
+    return POSProduct(
+        artikel_nr=artikel_nr, bezeichnung=bezeichnung, kurztext=f"{bezeichnung} lose",
+        verkaufspreis_netto=Decimal("1.00"), verkaufspreis_brutto=Decimal(brutto), mwst_satz=Decimal("19"),
+        einheit="kg", lagerbestand=Decimal("100"), ean_code=ean, kategorie=kategorie, aktiv=aktiv, plu=plu
+    )
+
+
+@pytest.fixture
+def catalog():
+    catalog = POSCatalog(preisliste={"ART002": Decimal("2.38")})
+    catalog.load([
+        _product("ART001", "Bio-Apfel Elstar", ean="4001234567890", plu="4101"),
+        _product("ART002", "Apfelsaft naturtrüb", ean="4001234567891", kategorie="Getränke"),
+        _product("ART003", "Birne Williams", plu="4409"),
+        _product("ART004", "Bio-Möhren", aktiv=False),
+    ], version=1)
+    return catalog
+
+
+def test_lookup_by_ean_plu_and_article_number(catalog):
+    assert catalog.lookup("4001234567890").artikel_nr == "ART001"
+    assert catalog.lookup("4409").artikel_nr == "ART003"
+    assert catalog.lookup("ART002").bezeichnung == "Apfelsaft naturtrüb"
+    assert catalog.lookup("ART004") is None
+    assert len(catalog) == 3
+
+    # Preise der Kassen-Preisliste sind beim Laden vorberechnet
+    saft = catalog.by_ean("4001234567891")
+    assert (saft.verkaufspreis_brutto, saft.verkaufspreis_netto) == (Decimal("2.38"), Decimal("2.00"))
+    catalog.set_price_list({})
+    assert catalog.by_ean("4001234567891").verkaufspreis_brutto == Decimal("1.19")
+
+
+def test_prefix_search(catalog):
+    assert [p.artikel_nr for p in catalog.search("apf")] == ["ART002", "ART001"]
+    assert [p.artikel_nr for p in catalog.search("bio ap")] == ["ART001"]
+    assert [p.artikel_nr for p in catalog.search("apf", kategorie="Obst")] == ["ART001"]
+    assert catalog.search("möhre") == []
+
+
+def test_deltas_update_all_indexes(catalog):
+    catalog.apply_delta(
+        geaendert=[_product("ART001", "Bio-Apfel Boskoop", ean="4001234567899", plu="4101")],
+        geloescht=["ART003"],
+        version=2
+    )
+    catalog.apply_changes({
+        ("article", "ART005"): {"bezeichnung": "Quitte", "kurztext": "", "verkaufspreis_netto": 2.0,
+                                "verkaufspreis_brutto": 2.14, "mwst_satz": 7, "einheit": "kg",
+                                "lagerbestand": 5, "ean_code": "4001234567892"},
+        ("customer", "K1"): {"name": "Meyer"},
+    })
+
+    assert catalog.version == 2
+    assert catalog.by_ean("4001234567890") is None
+    assert catalog.by_ean("4001234567899").bezeichnung == "Bio-Apfel Boskoop"
+    assert catalog.by_plu("4409") is None
+    assert [p.artikel_nr for p in catalog.search("elstar")] == []
+    assert [p.artikel_nr for p in catalog.search("bosk")] == ["ART001"]
+    assert catalog.lookup("4001234567892").verkaufspreis_brutto == Decimal("2.14")
+
+
+def test_pos_system_scans_from_catalog():
+    pos = POSSystem(None)
+    pos.load_catalog(preisliste={"ART001": Decimal("3.57")})
+
+    assert pos.add_to_cart("4001234567890", Decimal("2"))
+    assert pos.add_to_cart("ART001", Decimal("1"))
+    assert [(i.artikel_nr, i.menge, i.gesamtpreis_brutto) for i in pos.current_cart] == [
+        ("ART001", Decimal("3"), Decimal("10.71"))
+    ]
+    assert [p.artikel_nr for p in pos.get_products(search_term="vollkorn")] == ["ART002"]
+
+
+def test_empty_catalog_is_still_used():
+    # Ein leerer Katalog darf nicht auf die Datenbankabfrage zurückfallen
+    pos = POSSystem(None, catalog=POSCatalog())
+    assert pos.get_products() == []
+    assert not pos.add_to_cart("ART001", Decimal("1"))
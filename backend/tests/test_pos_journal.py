@@ -0,0 +1,102 @@
+"""
+Tests für das lokale Verkaufsjournal der Kasse und den Hintergrund-Worker
+"""
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from backend.modules.pos_journal import POSJournal
+from backend.modules.pos_system import POSSystem
+
+
+class FakeTSE:
+    """Lokale TSE: fortlaufender Signaturzähler wie TSESimulator"""
+
+    def __init__(self, ausfall_bei=None):
+        self.signature_counter = 1000
+        self.ausfall_bei = ausfall_bei
+        self.signiert = []
+
+    def sign_transaction(self, transaction_data):
+        if self.signature_counter - 1000 == self.ausfall_bei:
+            self.ausfall_bei = None
+            raise ConnectionError("TSE nicht erreichbar")
+        self.signature_counter += 1
+        self.signiert.append(transaction_data['receipt_number'])
+        return {'status': 'success', 'signature': f"SIG-{transaction_data['receipt_number']}",
+                'serial_number': 'TSE-TEST', 'signature_counter': self.signature_counter}
+
+
+@pytest.fixture
+def pos(tmp_path):
+    journal = POSJournal(str(tmp_path / "journal.db"))
+    yield POSSystem(None, journal=journal)
+    journal.close()
+
+
+def _sell(pos, menge="1"):
+    assert pos.add_to_cart("ART001", Decimal(menge))
+    assert pos.add_to_cart("ART002", Decimal("2"))
+    return pos.create_sale()
+
+
+def test_sales_are_signed_and_booked_in_batches(pos, monkeypatch):
+    abgaenge, buchungen = [], []
+    monkeypatch.setattr(pos, "_update_inventory_batch", abgaenge.append)
+    monkeypatch.setattr(pos, "_book_fibu_batch", lambda sales: buchungen.append([s.beleg_nr for s in sales]))
+
+    sales = [_sell(pos) for _ in range(5)]
+    assert all(s.tse_signatur is None for s in sales)
+    assert pos.save_sale_to_database(sales[0])
+    assert pos.journal.backlog() == {"tse": 5, "lager": 5, "fibu": 5}
+
+    worker = pos.create_journal_worker(tse=FakeTSE(), batch_size=3)
+    assert asyncio.run(worker.drain()) == {"tse": 5, "lager": 5, "fibu": 5}
+
+    assert pos.journal.backlog() == {"tse": 0, "lager": 0, "fibu": 0}
+    counters = [pos.journal.get_sale(s.beleg_nr)["tse_signatur_counter"] for s in sales]
+    assert counters == list(range(1001, 1006))
+    assert abgaenge == [{"ART001": Decimal("3"), "ART002": Decimal("6")},
+                        {"ART001": Decimal("2"), "ART002": Decimal("4")}]
+    assert buchungen == [[s.beleg_nr for s in sales[:3]], [s.beleg_nr for s in sales[3:]]]
+
+
+def test_till_keeps_selling_while_central_db_is_down(pos, monkeypatch):
+    erreichbar = False
+    gebucht = []
+
+    def update_inventory(artikel_nr, menge):
+        if not erreichbar:
+            raise ConnectionError("Zentrale Datenbank nicht erreichbar")
+        gebucht.append((artikel_nr, menge))
+
+    # Die echte Stapelbuchung muss den Fehler der Einzelbuchung durchreichen
+    monkeypatch.setattr(pos, "_update_inventory", update_inventory)
+    worker = pos.create_journal_worker(retry_backoff=0)
+
+    _sell(pos)
+    asyncio.run(worker.drain())
+    assert _sell(pos, "2") is not None
+    asyncio.run(worker.drain())
+    assert pos.journal.backlog() == {"tse": 0, "lager": 2, "fibu": 0}
+
+    erreichbar = True
+    assert asyncio.run(worker.drain())["lager"] == 2
+    assert gebucht == [("ART001", Decimal("3")), ("ART002", Decimal("4"))]
+
+
+def test_tse_failure_keeps_signatures_already_issued(pos):
+    sales = [_sell(pos) for _ in range(5)]
+    tse = FakeTSE(ausfall_bei=2)
+    worker = pos.create_journal_worker(tse=tse, retry_backoff=0)
+
+    assert asyncio.run(worker.drain_once())["tse"] == 2
+    assert pos.journal.backlog()["tse"] == 3
+    asyncio.run(worker.drain())
+
+    # Jeder Beleg genau einmal signiert, Zähler lückenlos
+    assert tse.signiert == [s.beleg_nr for s in sales]
+    counters = [pos.journal.get_sale(s.beleg_nr)["tse_signatur_counter"] for s in sales]
+    assert counters == list(range(1001, 1006))
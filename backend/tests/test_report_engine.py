@@ -0,0 +1,64 @@
+"""
+Tests für die Streaming-Ausgabe von Berichten
+"""
+
+import pytest
+import openpyxl
+from sqlalchemy import create_engine, text
+
+from backend.services import report_engine
+from backend.services.report_engine import SheetSpec, query_source, records_source, write_workbook
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'report.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE buchungen (id INTEGER PRIMARY KEY, konto TEXT, betrag REAL)"))
+        connection.execute(
+            text("INSERT INTO buchungen VALUES (:id, :konto, :betrag)"),
+            [{"id": i, "konto": f"K{i % 3}", "betrag": i * 1.5} for i in range(25)]
+        )
+    return engine
+
+
+def test_query_source_streams_into_workbook(engine, tmp_path):
+    """Zeilen werden blockweise aus der Datenbank gelesen und geschrieben"""
+    source = query_source(engine, "SELECT * FROM buchungen WHERE id < :limit ORDER BY id", {"limit": 20}, chunk_size=4)
+    progress = []
+    output_file = tmp_path / "export.xlsx"
+
+    counts = write_workbook(
+        str(output_file),
+        [SheetSpec("Buchungen", source)],
+        summary=lambda counts: [["Zeilen", sum(counts.values())]],
+        progress=lambda written, sheet: progress.append((written, sheet)),
+        chunk_size=5
+    )
+
+    assert counts == {"Buchungen": 20}
+    assert progress == [(5, "Buchungen"), (10, "Buchungen"), (15, "Buchungen"), (20, "Buchungen"), (20, "Buchungen")]
+
+    wb = openpyxl.load_workbook(output_file)
+    assert wb.sheetnames == ["Buchungen", "Zusammenfassung"]
+    ws = wb["Buchungen"]
+    assert [cell.value for cell in ws[1]] == ["id", "konto", "betrag"]
+    assert [cell.value for cell in ws[21]] == [19, "K1", 28.5]
+    assert ws.max_row == 21
+    assert wb["Zusammenfassung"].cell(2, 2).value == 20
+
+
+def test_sheet_overflow_continues_on_next_sheet(tmp_path, monkeypatch):
+    """Mehr Zeilen als ein Blatt fasst werden auf Folgeblätter verteilt"""
+    monkeypatch.setattr(report_engine, "MAX_SHEET_ROWS", 4)
+    source = records_source([{"nr": i} for i in range(9)])
+
+    counts = write_workbook(str(tmp_path / "overflow.xlsx"), [SheetSpec("Daten", source)])
+
+    assert counts == {"Daten": 4, "Daten (2)": 4, "Daten (3)": 1}
+    wb = openpyxl.load_workbook(tmp_path / "overflow.xlsx")
+    assert wb["Daten (3)"].cell(2, 1).value == 8
+
+
+def test_records_source_rejects_mixed_data():
+    assert records_source([{"a": 1}, [1]]) is None
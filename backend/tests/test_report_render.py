@@ -0,0 +1,37 @@
+"""
+Tests für das gemeinsame Rendern von Berichtsgrafiken im Prozesspool
+"""
+
+import multiprocessing
+import os
+
+from backend.tasks.report_tasks import report_utils
+from backend.tasks.report_tasks.report_utils import render_parallel
+
+
+def _pid(item):
+    return item, os.getpid()
+
+
+def test_small_jobs_render_in_process():
+    assert render_parallel(_pid, [1, 2, 3], min_jobs=8) == [(n, os.getpid()) for n in (1, 2, 3)]
+    assert render_parallel(_pid, list(range(10)), min_jobs=8, max_workers=1)[-1] == (9, os.getpid())
+
+
+def test_daemonic_worker_renders_in_process(monkeypatch):
+    # Prefork-Worker von Celery sind daemonisch und dürfen keine Kindprozesse starten
+    monkeypatch.setattr(multiprocessing.current_process(), "daemon", True)
+    assert render_parallel(_pid, list(range(10)), min_jobs=2) == [(n, os.getpid()) for n in range(10)]
+    assert report_utils._render_pool is None
+
+
+def test_pool_is_shared_between_calls():
+    try:
+        first = render_parallel(_pid, list(range(4)), min_jobs=2)
+        pool = report_utils._render_pool
+        second = render_parallel(_pid, list(range(4)), min_jobs=2)
+        assert [n for n, _ in first] == [n for n, _ in second] == list(range(4))
+        assert os.getpid() not in {pid for _, pid in first + second}
+        assert report_utils._render_pool is pool
+    finally:
+        report_utils._reset_render_pool()
@@ -0,0 +1,152 @@
+"""
+Tests für das gepufferte, hash-verkettete Audit-Log
+"""
+
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, inspect, text
+from sqlalchemy.exc import DBAPIError
+
+from backend.models.transaction_processing.audit import (
+    AuditBufferFullError,
+    TransactionAuditSink,
+    ensure_audit_schema,
+)
+from backend.models.transaction_processing.models import (
+    AuditLogSeverity,
+    TransactionAuditChain,
+    TransactionAuditLog,
+)
+
+
+def _create_tables(engine):
+    metadata = MetaData()
+    # Referenzierte Tabellen nur als Platzhalter
+    for name in ("user", "transaction", "transaction_item"):
+        Table(name, metadata, Column("id", Integer, primary_key=True))
+    table = TransactionAuditLog.__table__.to_metadata(metadata)
+    chain_table = TransactionAuditChain.__table__.to_metadata(metadata)
+    metadata.create_all(engine)
+    ensure_audit_schema(engine, table, chain_table)
+    return table, chain_table
+
+
+@pytest.fixture
+def sink(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'audit.db'}")
+    table, chain_table = _create_tables(engine)
+    sink = TransactionAuditSink(engine, batch_size=100, max_buffer=150, table=table, chain_table=chain_table)
+    yield sink
+    sink.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def pg_engine():
+    """Eigenes Schema auf der PostgreSQL-Datenbank aus TEST_POSTGRES_URL."""
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL nicht gesetzt")
+    pytest.importorskip("psycopg2")
+    schema = f"audit_test_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(url)
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+    engine = create_engine(url, connect_args={"options": f"-csearch_path={schema}"})
+    yield engine
+    engine.dispose()
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+    admin.dispose()
+
+
+def test_entries_are_buffered_chained_and_queryable(sink):
+    start = datetime(2024, 1, 31, 23, 0)
+    for n in range(250):
+        sink.append(n % 10, "booked", f"Buchung {n}", user_id=n % 3,
+                    timestamp=start + timedelta(minutes=n), details={"betrag": n / 4, "konto": "1200"})
+    # Zwei volle Blöcke geschrieben, der Rest liegt im Puffer
+    assert sink.pending() == 50
+
+    entries = sink.by_transaction(7)
+    assert sink.pending() == 0
+    assert [e["message"] for e in entries] == [f"Buchung {n}" for n in range(7, 250, 10)]
+    assert entries[0]["details"] == {"betrag": 1.75, "konto": "1200"}
+
+    february = sink.by_user(1, start=datetime(2024, 2, 1), end=datetime(2024, 3, 1))
+    assert {e["user_id"] for e in february} == {1} and len(february) == 63
+    sink.append(1, "reversed", "Storno", severity=AuditLogSeverity.WARNING, timestamp=start)
+    assert [e["message"] for e in sink.in_range(start, start + timedelta(hours=1),
+                                                 severity=AuditLogSeverity.WARNING)] == ["Storno"]
+    assert sink.verify() == {"valid": True, "checked": 251}
+
+
+def test_tampering_is_detected(sink):
+    for n in range(20):
+        sink.append(1, "booked", f"Buchung {n}", details={"betrag": n})
+    sink.flush()
+
+    with sink.engine.begin() as conn:
+        with pytest.raises(DBAPIError, match="nur fortschreibbar"):
+            conn.execute(text("UPDATE transaction_audit_log SET message = 'x' WHERE id = 5"))
+
+    # Manipulation am Schreibschutz vorbei
+    with sink.engine.begin() as conn:
+        conn.execute(text("DROP TRIGGER transaction_audit_log_no_update"))
+        conn.execute(text("DROP TRIGGER transaction_audit_log_no_delete"))
+        conn.execute(text("UPDATE transaction_audit_log SET details = '{\"betrag\": 99}' WHERE id = 5"))
+    result = sink.verify()
+    assert (result["valid"], result["first_invalid_id"], result["error"]) == (False, 5, "Eintrag wurde verändert")
+    assert sink.verify(from_id=6)["valid"]
+
+    with sink.engine.begin() as conn:
+        conn.execute(text("DELETE FROM transaction_audit_log WHERE id = 12"))
+    assert sink.verify(from_id=6)["error"] == "Eintrag 12 fehlt"
+
+    with sink.engine.begin() as conn:
+        conn.execute(text("DELETE FROM transaction_audit_log WHERE id = 20"))
+    assert sink.verify(from_id=13)["error"] == "Eintrag 20 fehlt"
+
+
+def test_full_buffer_rejects_entries(sink):
+    def fail(*args, **kwargs):
+        raise ConnectionError("Datenbank nicht erreichbar")
+
+    sink.engine.begin = fail
+    for n in range(150):
+        try:
+            sink.append(1, "booked", f"Buchung {n}")
+        except ConnectionError:
+            pass
+    assert sink.pending() == 150
+    with pytest.raises(AuditBufferFullError):
+        sink.append(1, "booked", "Buchung 150")
+    assert sink.pending() == 150
+    del sink.engine.begin
+    assert sink.flush() == 150
+
+
+def test_partitions_are_cached_only_after_commit(pg_engine):
+    table, chain_table = _create_tables(pg_engine)
+    sink = TransactionAuditSink(pg_engine, table=table, chain_table=chain_table)
+
+    # Transaktion 1 fehlt noch: der Block scheitert am Fremdschlüssel und wird zurückgerollt
+    sink.append(1, "booked", "Buchung", timestamp=datetime(2024, 1, 15))
+    with pytest.raises(Exception):
+        sink.flush()
+    assert sink.pending() == 1 and not sink._partitions
+    assert "transaction_audit_log_2024_01" not in inspect(pg_engine).get_table_names()
+
+    with pg_engine.begin() as conn:
+        conn.execute(text('INSERT INTO "transaction" (id) VALUES (1)'))
+    sink.append(1, "booked", "Folgebuchung", timestamp=datetime(2024, 2, 1))
+    assert sink.flush() == 2
+    assert {"transaction_audit_log_2024_01", "transaction_audit_log_2024_02"} <= set(
+        inspect(pg_engine).get_table_names()
+    )
+    assert len(sink._partitions) == 2
+    assert sink.verify() == {"valid": True, "checked": 2}
+    sink.close()
@@ -15,6 +15,12 @@ from backend.models.transaction_processing import (
     TransactionResult,
     TransactionStatus
 )
+from backend.models.transaction_processing.events import (
+    ASYNC,
+    EventDispatcher,
+    TRANSACTION_COMPLETED,
+    TRANSACTION_FAILED
+)
 
 class TestTransactionProcessor(unittest.TestCase):
     """Tests für den TransactionProcessor."""
@@ -166,5 +172,47 @@ class TestTransactionProcessor(unittest.TestCase):
                 # Überprüfen, ob der Rollback für den fehlgeschlagenen Chunk durchgeführt wurde
                 self.db_mock.execute.assert_any_call("ROLLBACK TO SAVEPOINT chunk_1")
 
+    def test_events_carry_snapshots_instead_of_orm_objects(self):
+        """Testet, dass ASYNC-Listener vom ORM gelöste Momentaufnahmen erhalten."""
+        dispatcher = EventDispatcher()
+        processor = TransactionProcessor(db_session=self.db_mock, chunk_size=2, event_dispatcher=dispatcher)
+        seen = []
+        dispatcher.add_listener(TRANSACTION_COMPLETED, lambda event: seen.append(event.get("transaction")), mode=ASYNC)
+        dispatcher.add_listener(TRANSACTION_FAILED, lambda event: seen.append(event.get("transaction")), mode=ASYNC)
+        
+        transactions = []
+        for i in range(4):
+            transaction = MagicMock(spec=Transaction)
+            transaction.id = f"tx-{i}"
+            transaction.reference_id = f"RE-{i}"
+            transaction.type = "inventory"
+            transaction.amount = 10.0 * (i + 1)
+            transaction.direction = "in"
+            transactions.append(transaction)
+        
+        def process_mock(transaction):
+            if transaction.id == "tx-3":
+                raise ValueError("Artikel gesperrt")
+        
+        with patch.object(processor, '_validate_transaction'):
+            with patch.object(processor, '_process_single_transaction', side_effect=process_mock):
+                processor.process_transactions(transactions)
+        
+        # Nach dem Commit verfallene Objekte dürfen die Events nicht mehr verändern
+        for transaction in transactions:
+            transaction.amount = None
+        self.assertTrue(dispatcher.flush(timeout=2))
+        dispatcher.shutdown()
+        
+        self.assertTrue(all(isinstance(snapshot, dict) for snapshot in seen))
+        by_id = {snapshot["id"]: snapshot for snapshot in seen}
+        self.assertEqual(by_id["tx-0"], {
+            "id": "tx-0", "number": "RE-0", "type": "inventory", "amount": 10.0,
+            "direction": "in", "status": "completed", "error": None
+        })
+        self.assertEqual(by_id["tx-2"]["status"], "failed")
+        self.assertEqual(by_id["tx-3"]["error"], "Verarbeitungsfehler: Artikel gesperrt")
+        self.assertEqual(by_id["tx-3"]["amount"], 40.0)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""
+Tests für Caching und Downsampling von Diagrammen
+"""
+
+import numpy as np
+
+from backend.services.visualization_engine import (
+    ChartCache,
+    chart_fingerprint,
+    downsample_indices,
+    lttb_indices,
+    minmax_indices,
+)
+
+
+def test_chart_cache_renders_only_on_changed_fingerprint(tmp_path):
+    cache = ChartCache(str(tmp_path), max_entries=3)
+    calls = []
+
+    def render(path):
+        calls.append(path)
+        with open(path, "w") as f:
+            f.write("<svg/>")
+
+    data = {"x_data": ["a", "b"], "y_data": [1, 2]}
+    key = chart_fingerprint("bar", data, {"interactive": False})
+    path, cached = cache.get_or_render(key, "svg", render)
+    assert not cached
+    assert cache.get_or_render(key, "svg", render) == (path, True)
+    assert len(calls) == 1
+
+    assert chart_fingerprint("bar", {"x_data": ["a", "b"], "y_data": [1, 3]}) != chart_fingerprint("bar", data)
+    assert chart_fingerprint("line", data) != chart_fingerprint("bar", data)
+    assert chart_fingerprint("bar", {1: "a", "b": 2}) == chart_fingerprint("bar", {1: "a", "b": 2})
+
+    # Älteste Einträge werden beim Überschreiten von max_entries entfernt
+    for i in range(4):
+        cache.set_json(chart_fingerprint("panel", i), {"i": i})
+    assert len(list((tmp_path / "charts").iterdir())) <= 3
+    assert cache.get_json(chart_fingerprint("panel", 3)) == {"i": 3}
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(100000, dtype=float)
+    y = np.sin(x / 1000)
+    y[54321] = 50.0
+
+    indices = lttb_indices(x, y, 500)
+
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == 99999
+    assert np.all(np.diff(indices) > 0)
+    assert 54321 in indices
+
+
+def test_minmax_keeps_extremes_and_downsample_unions_series():
+    y = np.zeros(10001)
+    y[777] = -3.0
+    y[9000] = 4.0
+
+    indices = minmax_indices(y, 100)
+    assert len(indices) <= 102
+    assert {0, 777, 9000, 10000} <= set(indices.tolist())
+
+    dates = [f"2025-01-01T00:{i // 60:02d}:{i % 60:02d}" for i in range(3600)]
+    first = np.sin(np.arange(3600) / 100)
+    second = np.cos(np.arange(3600) / 50)
+    combined = downsample_indices(dates, [first, second], max_points=200)
+    assert len(combined) >= 200
+    assert set(lttb_indices(np.arange(3600.0), first, 200).tolist()) <= set(combined.tolist())
+    assert len(downsample_indices(dates[:50], [first[:50]], max_points=200)) == 50
@@ -21,7 +21,7 @@ import prometheus_client as prom
 from core.config import settings
 from core.security import get_current_user
 from core.cache import get_redis
-from core.llm import LLMProvider, get_llm_provider, get_fallback_llm_provider
+from core.llm import LLMProvider, get_llm_provider, get_fallback_llm_provider, close_http_clients
 from models.schemas.llm import (
     TransactionAnalysisRequest,
     TransactionAnalysisResponse,
@@ -34,6 +34,8 @@ from models.schemas.llm import (
 )
 
 router = APIRouter(prefix="/llm")
+# Gepoolte Verbindungen zu den LLM-Providern beim Herunterfahren schließen
+router.add_event_handler("shutdown", close_http_clients)
 logger = structlog.get_logger(__name__)
 
 # Prometheus-Metriken für LLM-Zugriffe
@@ -74,14 +74,21 @@ class Settings(BaseSettings):
     LLM_CACHE_RESPONSES: bool = os.getenv("LLM_CACHE_RESPONSES", "True").lower() in ("true", "1", "t")
     LLM_MAX_TOKENS: int = int(os.getenv("LLM_MAX_TOKENS", "1024"))
     LLM_TEMPERATURE: float = float(os.getenv("LLM_TEMPERATURE", "0.1"))
+    LLM_CACHE_TTL: int = int(os.getenv("LLM_CACHE_TTL", "86400"))
+    LLM_CACHE_SIZE: int = int(os.getenv("LLM_CACHE_SIZE", "10000"))
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_TOKENS_PER_MINUTE: int = int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))  # 0 = unbegrenzt
+    LLM_HTTP_MAX_CONNECTIONS: int = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))
     
     # OpenAI-Einstellungen
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4")
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
     
     # Anthropic-Einstellungen
     ANTHROPIC_API_KEY: Optional[str] = os.getenv("ANTHROPIC_API_KEY")
     ANTHROPIC_MODEL: str = os.getenv("ANTHROPIC_MODEL", "claude-3-haiku-20240307")
+    ANTHROPIC_BASE_URL: str = os.getenv("ANTHROPIC_BASE_URL", "https://api.anthropic.com/v1")
     
     # Lokales LLM
     LOCAL_LLM_URL: Optional[str] = os.getenv("LOCAL_LLM_URL")
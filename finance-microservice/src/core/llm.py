@@ -9,18 +9,22 @@ import os
 import json
 import re
 import time
+import asyncio
+import hashlib
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional, Tuple, Union
 from functools import lru_cache
 
 import httpx
 import structlog
+import prometheus_client as prom
 from fastapi import Depends, HTTPException
 from tenacity import (
-    retry,
+    AsyncRetrying,
     stop_after_attempt,
     wait_exponential,
-    retry_if_exception_type,
+    retry_if_exception,
 )
 
 from src.core.config import settings
@@ -28,17 +32,293 @@ from src.core.cache import get_redis
 
 logger = structlog.get_logger(__name__)
 
+# Prometheus-Metriken des LLM-Gateways
+LLM_GATEWAY_REQUESTS = prom.Counter(
+    "finance_llm_gateway_requests_total",
+    "Anfragen an das LLM-Gateway nach Ergebnis",
+    ["provider", "result"]  # result: upstream, cache_hit, coalesced, error
+)
+LLM_UPSTREAM_LATENCY = prom.Histogram(
+    "finance_llm_upstream_latency_seconds",
+    "Latenz der Anfragen an den LLM-Provider in Sekunden",
+    ["provider"]
+)
+LLM_UPSTREAM_TOKENS = prom.Counter(
+    "finance_llm_upstream_tokens_total",
+    "Vom LLM-Provider abgerechnete Tokens",
+    ["provider", "type"]  # type: input oder output
+)
+
+# Langlebige HTTP-Clients pro Provider und Basis-URL (Connection-Pooling, kein TLS-Handshake pro Anfrage)
+_http_clients: Dict[Tuple[str, str], httpx.AsyncClient] = {}
+
+
+def get_http_client(provider_name: str, base_url: str, timeout: float) -> httpx.AsyncClient:
+    """
+    Liefert den gepoolten HTTP-Client für einen Provider.
+    
+    Args:
+        provider_name: Name des Providers
+        base_url: Basis-URL der Provider-API
+        timeout: Timeout in Sekunden
+        
+    Returns:
+        Ein wiederverwendbarer httpx.AsyncClient
+    """
+    key = (provider_name, base_url)
+    client = _http_clients.get(key)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=300.0,
+            ),
+        )
+        _http_clients[key] = client
+    return client
+
+
+async def close_http_clients() -> None:
+    """Schließt alle gepoolten HTTP-Clients (beim Herunterfahren des Services)."""
+    clients = list(_http_clients.values())
+    _http_clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """Netzwerkfehler, Rate-Limits und Serverfehler werden wiederholt, Client-Fehler nicht."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+class LLMResponseCache:
+    """
+    Exakter Antwort-Cache im Prozess mit TTL und LRU-Verdrängung.
+    
+    Der Schlüssel ist ein Hash aus Provider, Modell, Temperatur, max_tokens
+    und den Prompts – identische Anfragen (z.B. Buchungsvorschläge für denselben
+    Belegtext) werden nur einmal beim Provider abgerechnet.
+    """
+    
+    def __init__(self, ttl: int = settings.LLM_CACHE_TTL, max_entries: int = settings.LLM_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+    
+    @staticmethod
+    def make_key(
+        provider_name: str,
+        model_name: str,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> str:
+        prompt_hash = hashlib.sha256(
+            json.dumps([system_prompt, user_prompt, max_tokens]).encode("utf-8")
+        ).hexdigest()
+        return f"{provider_name}:{model_name}:{temperature}:{prompt_hash}"
+    
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: str, value: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class TokenBucketLimiter:
+    """
+    Begrenzt gleichzeitige Upstream-Anfragen und den Token-Verbrauch pro Minute.
+    
+    Vor einer Anfrage wird der geschätzte Verbrauch reserviert, danach mit dem
+    tatsächlichen Verbrauch verrechnet. ``tokens_per_minute=0`` schaltet die
+    Token-Begrenzung ab.
+    """
+    
+    def __init__(self, max_concurrency: int = settings.LLM_MAX_CONCURRENCY,
+                 tokens_per_minute: int = settings.LLM_TOKENS_PER_MINUTE):
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.tokens_per_minute),
+            self._tokens + (now - self._updated) * self.tokens_per_minute / 60.0,
+        )
+        self._updated = now
+    
+    async def acquire(self, estimated_tokens: int) -> None:
+        await self._semaphore.acquire()
+        if not self.tokens_per_minute:
+            return
+        needed = min(estimated_tokens, self.tokens_per_minute)
+        try:
+            async with self._lock:
+                while True:
+                    self._refill()
+                    if self._tokens >= needed:
+                        self._tokens -= needed
+                        return
+                    await asyncio.sleep((needed - self._tokens) * 60.0 / self.tokens_per_minute)
+        except BaseException:
+            self._semaphore.release()
+            raise
+    
+    def release(self, estimated_tokens: int, actual_tokens: Optional[int] = None) -> None:
+        if self.tokens_per_minute and actual_tokens is not None:
+            # Differenz zwischen Schätzung und tatsächlichem Verbrauch verrechnen
+            self._tokens += min(estimated_tokens, self.tokens_per_minute) - actual_tokens
+        self._semaphore.release()
+
+
+class LLMGateway:
+    """
+    Gemeinsamer Zugangspunkt aller Provider zu den LLM-APIs.
+    
+    Reihenfolge pro Anfrage: Antwort-Cache → Zusammenführen identischer laufender
+    Anfragen → Limiter → Upstream-Anfrage über den gepoolten Client.
+    """
+    
+    def __init__(self, cache: Optional[LLMResponseCache] = None,
+                 limiter: Optional[TokenBucketLimiter] = None,
+                 cache_enabled: bool = settings.LLM_CACHE_RESPONSES):
+        self.cache = cache or LLMResponseCache()
+        self.limiter = limiter or TokenBucketLimiter()
+        self.cache_enabled = cache_enabled
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    async def generate(
+        self,
+        provider: "LLMProvider",
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> str:
+        key = LLMResponseCache.make_key(
+            provider.provider_name, provider.model_name,
+            system_prompt, user_prompt, max_tokens, temperature,
+        )
+        
+        if self.cache_enabled:
+            cached = self.cache.get(key)
+            if cached is not None:
+                LLM_GATEWAY_REQUESTS.labels(provider=provider.provider_name, result="cache_hit").inc()
+                return cached
+        
+        # Identische Anfrage läuft bereits – auf deren Ergebnis warten
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            LLM_GATEWAY_REQUESTS.labels(provider=provider.provider_name, result="coalesced").inc()
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            text = await self._call_upstream(provider, system_prompt, user_prompt, max_tokens, temperature)
+            if self.cache_enabled:
+                self.cache.set(key, text)
+            future.set_result(text)
+            return text
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            LLM_GATEWAY_REQUESTS.labels(provider=provider.provider_name, result="error").inc()
+            future.set_exception(e)
+            # Ohne wartende Anfragen die Exception als abgerufen markieren
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+    
+    async def _call_upstream(
+        self,
+        provider: "LLMProvider",
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> str:
+        # Grobe Schätzung: ca. 4 Zeichen pro Token plus maximale Antwortlänge
+        estimated_tokens = (len(system_prompt) + len(user_prompt)) // 4 + max_tokens
+        actual_tokens = None
+        await self.limiter.acquire(estimated_tokens)
+        try:
+            start_time = time.perf_counter()
+            text, usage = await provider.complete(system_prompt, user_prompt, max_tokens, temperature)
+            latency = time.perf_counter() - start_time
+            
+            input_tokens = usage.get("input_tokens", 0)
+            output_tokens = usage.get("output_tokens", 0)
+            if usage:
+                actual_tokens = input_tokens + output_tokens
+            
+            LLM_GATEWAY_REQUESTS.labels(provider=provider.provider_name, result="upstream").inc()
+            LLM_UPSTREAM_LATENCY.labels(provider=provider.provider_name).observe(latency)
+            LLM_UPSTREAM_TOKENS.labels(provider=provider.provider_name, type="input").inc(input_tokens)
+            LLM_UPSTREAM_TOKENS.labels(provider=provider.provider_name, type="output").inc(output_tokens)
+            logger.info(
+                f"{provider.request_label} abgeschlossen",
+                prompt_tokens=input_tokens,
+                completion_tokens=output_tokens,
+                latency=latency,
+            )
+            return text
+        finally:
+            self.limiter.release(estimated_tokens, actual_tokens)
+
+
+# Gemeinsames Gateway für alle Provider-Instanzen
+llm_gateway = LLMGateway()
+
 
 class LLMProvider(ABC):
-    """Abstrakte Basisklasse für verschiedene LLM-Provider."""
+    """
+    Abstrakte Basisklasse für verschiedene LLM-Provider.
+    
+    Provider beschreiben nur Anfrage und Antwortformat ihrer API; Versand,
+    Wiederholungen, Caching und Limitierung übernimmt das ``LLMGateway``.
+    """
+    
+    # Wiederholungen bei Netzwerkfehlern, Rate-Limits und Serverfehlern
+    retry_attempts = 3
+    retry_wait_min = 2
+    retry_wait_max = 10
+    timeout = 60.0
+    request_label = "LLM-Anfrage"
     
     def __init__(self):
         self.provider_name = "base"
         self.model_name = "unknown"
         self.initialized = False
         self.api_key = None
+        self.base_url = ""
     
-    @abstractmethod
     async def generate_text(
         self,
         system_prompt: str,
@@ -58,8 +338,87 @@ class LLMProvider(ABC):
         Returns:
             Der generierte Text als String
         """
+        if not self.initialized:
+            raise HTTPException(
+                status_code=503,
+                detail=f"{self.display_name}-Provider nicht initialisiert"
+            )
+        
+        return await llm_gateway.generate(self, system_prompt, user_prompt, max_tokens, temperature)
+    
+    @property
+    def display_name(self) -> str:
+        return self.provider_name
+    
+    @abstractmethod
+    def build_request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Liefert Pfad (relativ zur Basis-URL), Header und Payload der Anfrage."""
+        pass
+    
+    @abstractmethod
+    def parse_response(self, result: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+        """Liefert den generierten Text und die Token-Nutzung (input_tokens, output_tokens)."""
         pass
     
+    async def complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> Tuple[str, Dict[str, int]]:
+        """
+        Führt eine Upstream-Anfrage über den gepoolten Client aus.
+        
+        Returns:
+            Tupel aus generiertem Text und Token-Nutzung
+        """
+        path, headers, payload = self.build_request(system_prompt, user_prompt, max_tokens, temperature)
+        client = get_http_client(self.provider_name, self.base_url, self.timeout)
+        
+        try:
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(self.retry_attempts),
+                wait=wait_exponential(multiplier=1, min=self.retry_wait_min, max=self.retry_wait_max),
+                retry=retry_if_exception(_is_retryable),
+                reraise=True,
+            ):
+                with attempt:
+                    response = await client.post(path, headers=headers, json=payload)
+                    response.raise_for_status()
+            return self.parse_response(response.json())
+            
+        except httpx.HTTPStatusError as e:
+            logger.error(
+                f"HTTP-Fehler bei {self.request_label}",
+                status_code=e.response.status_code,
+                response=e.response.text,
+            )
+            raise HTTPException(
+                status_code=e.response.status_code,
+                detail=f"Fehler bei {self.request_label}: {e.response.text}"
+            )
+            
+        except httpx.RequestError as e:
+            logger.error(f"Netzwerkfehler bei {self.request_label}", error=str(e))
+            raise HTTPException(
+                status_code=500,
+                detail=f"Netzwerkfehler bei {self.request_label}: {str(e)}"
+            )
+            
+        except Exception as e:
+            logger.error(f"Unerwarteter Fehler bei {self.request_label}", error=str(e))
+            raise HTTPException(
+                status_code=500,
+                detail=f"Unerwarteter Fehler bei {self.request_label}: {str(e)}"
+            )
+    
     @abstractmethod
     def get_provider_info(self) -> Dict[str, str]:
         """Liefert Informationen über den verwendeten LLM-Provider."""
@@ -250,12 +609,15 @@ class LLMProvider(ABC):
 class OpenAIProvider(LLMProvider):
     """LLM-Provider für OpenAI-Modelle."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    request_label = "OpenAI-Anfrage"
+    
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         super().__init__()
         
         self.provider_name = "openai"
         self.model_name = settings.OPENAI_MODEL
         self.api_key = api_key or settings.OPENAI_API_KEY
+        self.base_url = base_url or settings.OPENAI_BASE_URL
         
         if not self.api_key:
             logger.warning("OpenAI API-Schlüssel nicht konfiguriert")
@@ -263,37 +625,18 @@ class OpenAIProvider(LLMProvider):
         else:
             self.initialized = True
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((httpx.HTTPError, httpx.TimeoutException)),
-    )
-    async def generate_text(
+    @property
+    def display_name(self) -> str:
+        return "OpenAI"
+    
+    def build_request(
         self,
         system_prompt: str,
         user_prompt: str,
-        max_tokens: int = 1024,
-        temperature: float = 0.1,
-    ) -> str:
-        """
-        Generiert Text mit OpenAI-Modellen.
-        
-        Args:
-            system_prompt: Der Systemprompt, der das Verhalten des LLM definiert
-            user_prompt: Der Benutzerprompt mit der eigentlichen Anfrage
-            max_tokens: Maximale Anzahl von Tokens in der Antwort
-            temperature: Zufälligkeit der Antwort (0.0 bis 1.0)
-            
-        Returns:
-            Der generierte Text als String
-        """
-        if not self.initialized:
-            raise HTTPException(
-                status_code=503, 
-                detail="OpenAI-Provider nicht initialisiert"
-            )
-        
-        # OpenAI API-Anfrage
+        max_tokens: int,
+        temperature: float,
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Baut eine Chat-Completions-Anfrage für OpenAI."""
         headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}",
@@ -308,60 +651,17 @@ class OpenAIProvider(LLMProvider):
             "max_tokens": max_tokens,
             "temperature": temperature,
         }
-        
-        start_time = time.time()
-        
-        try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers=headers,
-                    json=payload,
-                )
-                response.raise_for_status()
-                result = response.json()
-                
-                # Logge Token-Nutzung
-                if "usage" in result:
-                    usage = result["usage"]
-                    logger.info(
-                        "OpenAI-Anfrage abgeschlossen",
-                        prompt_tokens=usage.get("prompt_tokens", 0),
-                        completion_tokens=usage.get("completion_tokens", 0),
-                        total_tokens=usage.get("total_tokens", 0),
-                        latency=time.time() - start_time,
-                    )
-                
-                # Extrahiere den generierten Text
-                if "choices" in result and len(result["choices"]) > 0:
-                    return result["choices"][0]["message"]["content"]
-                else:
-                    raise ValueError("Keine Antwort vom OpenAI-API erhalten")
-                
-        except httpx.HTTPStatusError as e:
-            logger.error(
-                "HTTP-Fehler bei OpenAI-Anfrage",
-                status_code=e.response.status_code,
-                response=e.response.text,
-            )
-            raise HTTPException(
-                status_code=e.response.status_code,
-                detail=f"Fehler bei OpenAI-Anfrage: {e.response.text}"
-            )
-            
-        except httpx.RequestError as e:
-            logger.error("Netzwerkfehler bei OpenAI-Anfrage", error=str(e))
-            raise HTTPException(
-                status_code=500,
-                detail=f"Netzwerkfehler bei OpenAI-Anfrage: {str(e)}"
-            )
-            
-        except Exception as e:
-            logger.error("Unerwarteter Fehler bei OpenAI-Anfrage", error=str(e))
-            raise HTTPException(
-                status_code=500,
-                detail=f"Unerwarteter Fehler bei OpenAI-Anfrage: {str(e)}"
-            )
+        return "/chat/completions", headers, payload
+    
+    def parse_response(self, result: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+        """Extrahiert Text und Token-Nutzung aus der OpenAI-Antwort."""
+        usage = result.get("usage", {})
+        if "choices" in result and len(result["choices"]) > 0:
+            return result["choices"][0]["message"]["content"], {
+                "input_tokens": usage.get("prompt_tokens", 0),
+                "output_tokens": usage.get("completion_tokens", 0),
+            }
+        raise ValueError("Keine Antwort vom OpenAI-API erhalten")
     
     def get_provider_info(self) -> Dict[str, str]:
         """Liefert Informationen über den verwendeten OpenAI-Provider."""
@@ -375,12 +675,15 @@ class OpenAIProvider(LLMProvider):
 class AnthropicProvider(LLMProvider):
     """LLM-Provider für Anthropic-Modelle."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    request_label = "Anthropic-Anfrage"
+    
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         super().__init__()
         
         self.provider_name = "anthropic"
         self.model_name = settings.ANTHROPIC_MODEL
         self.api_key = api_key or settings.ANTHROPIC_API_KEY
+        self.base_url = base_url or settings.ANTHROPIC_BASE_URL
         
         if not self.api_key:
             logger.warning("Anthropic API-Schlüssel nicht konfiguriert")
@@ -388,37 +691,18 @@ class AnthropicProvider(LLMProvider):
         else:
             self.initialized = True
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((httpx.HTTPError, httpx.TimeoutException)),
-    )
-    async def generate_text(
+    @property
+    def display_name(self) -> str:
+        return "Anthropic"
+    
+    def build_request(
         self,
         system_prompt: str,
         user_prompt: str,
-        max_tokens: int = 1024,
-        temperature: float = 0.1,
-    ) -> str:
-        """
-        Generiert Text mit Anthropic-Modellen.
-        
-        Args:
-            system_prompt: Der Systemprompt, der das Verhalten des LLM definiert
-            user_prompt: Der Benutzerprompt mit der eigentlichen Anfrage
-            max_tokens: Maximale Anzahl von Tokens in der Antwort
-            temperature: Zufälligkeit der Antwort (0.0 bis 1.0)
-            
-        Returns:
-            Der generierte Text als String
-        """
-        if not self.initialized:
-            raise HTTPException(
-                status_code=503, 
-                detail="Anthropic-Provider nicht initialisiert"
-            )
-        
-        # Anthropic API-Anfrage
+        max_tokens: int,
+        temperature: float,
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Baut eine Messages-Anfrage für Anthropic."""
         headers = {
             "Content-Type": "application/json",
             "X-API-Key": self.api_key,
@@ -434,60 +718,22 @@ class AnthropicProvider(LLMProvider):
             "max_tokens": max_tokens,
             "temperature": temperature,
         }
-        
-        start_time = time.time()
-        
-        try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    "https://api.anthropic.com/v1/messages",
-                    headers=headers,
-                    json=payload,
-                )
-                response.raise_for_status()
-                result = response.json()
-                
-                # Logge Token-Nutzung
-                logger.info(
-                    "Anthropic-Anfrage abgeschlossen",
-                    latency=time.time() - start_time,
-                )
-                
-                # Extrahiere den generierten Text
-                if "content" in result and len(result["content"]) > 0:
-                    content_blocks = [
-                        block["text"] 
-                        for block in result["content"] 
-                        if block["type"] == "text"
-                    ]
-                    return " ".join(content_blocks)
-                else:
-                    raise ValueError("Keine Antwort von Anthropic-API erhalten")
-                
-        except httpx.HTTPStatusError as e:
-            logger.error(
-                "HTTP-Fehler bei Anthropic-Anfrage",
-                status_code=e.response.status_code,
-                response=e.response.text,
-            )
-            raise HTTPException(
-                status_code=e.response.status_code,
-                detail=f"Fehler bei Anthropic-Anfrage: {e.response.text}"
-            )
-            
-        except httpx.RequestError as e:
-            logger.error("Netzwerkfehler bei Anthropic-Anfrage", error=str(e))
-            raise HTTPException(
-                status_code=500,
-                detail=f"Netzwerkfehler bei Anthropic-Anfrage: {str(e)}"
-            )
-            
-        except Exception as e:
-            logger.error("Unerwarteter Fehler bei Anthropic-Anfrage", error=str(e))
-            raise HTTPException(
-                status_code=500,
-                detail=f"Unerwarteter Fehler bei Anthropic-Anfrage: {str(e)}"
-            )
+        return "/messages", headers, payload
+    
+    def parse_response(self, result: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+        """Extrahiert Text und Token-Nutzung aus der Anthropic-Antwort."""
+        usage = result.get("usage", {})
+        if "content" in result and len(result["content"]) > 0:
+            content_blocks = [
+                block["text"]
+                for block in result["content"]
+                if block["type"] == "text"
+            ]
+            return " ".join(content_blocks), {
+                "input_tokens": usage.get("input_tokens", 0),
+                "output_tokens": usage.get("output_tokens", 0),
+            }
+        raise ValueError("Keine Antwort von Anthropic-API erhalten")
     
     def get_provider_info(self) -> Dict[str, str]:
         """Liefert Informationen über den verwendeten Anthropic-Provider."""
@@ -501,12 +747,19 @@ class AnthropicProvider(LLMProvider):
 class LocalLLMProvider(LLMProvider):
     """LLM-Provider für lokale LLM-Server."""
     
+    retry_attempts = 2
+    retry_wait_min = 1
+    retry_wait_max = 3
+    timeout = 120.0  # Längeres Timeout für lokale Modelle
+    request_label = "lokaler LLM-Anfrage"
+    
     def __init__(self, api_url: Optional[str] = None):
         super().__init__()
         
         self.provider_name = "local"
         self.model_name = settings.LOCAL_LLM_MODEL
         self.api_url = api_url or settings.LOCAL_LLM_URL
+        self.base_url = self.api_url or ""
         
         if not self.api_url:
             logger.warning("Lokale LLM-URL nicht konfiguriert")
@@ -514,37 +767,18 @@ class LocalLLMProvider(LLMProvider):
         else:
             self.initialized = True
     
-    @retry(
-        stop=stop_after_attempt(2),
-        wait=wait_exponential(multiplier=1, min=1, max=3),
-        retry=retry_if_exception_type((httpx.HTTPError, httpx.TimeoutException)),
-    )
-    async def generate_text(
+    @property
+    def display_name(self) -> str:
+        return "Lokaler LLM"
+    
+    def build_request(
         self,
         system_prompt: str,
         user_prompt: str,
-        max_tokens: int = 1024,
-        temperature: float = 0.1,
-    ) -> str:
-        """
-        Generiert Text mit einem lokalen LLM-Server.
-        
-        Args:
-            system_prompt: Der Systemprompt, der das Verhalten des LLM definiert
-            user_prompt: Der Benutzerprompt mit der eigentlichen Anfrage
-            max_tokens: Maximale Anzahl von Tokens in der Antwort
-            temperature: Zufälligkeit der Antwort (0.0 bis 1.0)
-            
-        Returns:
-            Der generierte Text als String
-        """
-        if not self.initialized:
-            raise HTTPException(
-                status_code=503, 
-                detail="Lokaler LLM-Provider nicht initialisiert"
-            )
-        
-        # Die Payload an den lokalen LLM-Server anpassen (z.B. llama.cpp-Server)
+        max_tokens: int,
+        temperature: float,
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """Baut eine Anfrage an den lokalen LLM-Server (z.B. llama.cpp-Server)."""
         headers = {"Content-Type": "application/json"}
         
         # llama.cpp Server verwendet ein OpenAI-kompatibles API-Format
@@ -558,55 +792,17 @@ class LocalLLMProvider(LLMProvider):
             "temperature": temperature,
             "stream": False,
         }
-        
-        start_time = time.time()
-        
-        try:
-            async with httpx.AsyncClient(timeout=120.0) as client:  # Längeres Timeout für lokale Modelle
-                response = await client.post(
-                    f"{self.api_url}/chat/completions",
-                    headers=headers,
-                    json=payload,
-                )
-                response.raise_for_status()
-                result = response.json()
-                
-                # Logge Latenz
-                logger.info(
-                    "Lokale LLM-Anfrage abgeschlossen",
-                    latency=time.time() - start_time,
-                )
-                
-                # Extrahiere den generierten Text (OpenAI-kompatibles Format)
-                if "choices" in result and len(result["choices"]) > 0:
-                    return result["choices"][0]["message"]["content"]
-                else:
-                    raise ValueError("Keine Antwort vom lokalen LLM-Server erhalten")
-                
-        except httpx.HTTPStatusError as e:
-            logger.error(
-                "HTTP-Fehler bei lokaler LLM-Anfrage",
-                status_code=e.response.status_code,
-                response=e.response.text,
-            )
-            raise HTTPException(
-                status_code=e.response.status_code,
-                detail=f"Fehler bei lokaler LLM-Anfrage: {e.response.text}"
-            )
-            
-        except httpx.RequestError as e:
-            logger.error("Netzwerkfehler bei lokaler LLM-Anfrage", error=str(e))
-            raise HTTPException(
-                status_code=500,
-                detail=f"Netzwerkfehler bei lokaler LLM-Anfrage: {str(e)}"
-            )
-            
-        except Exception as e:
-            logger.error("Unerwarteter Fehler bei lokaler LLM-Anfrage", error=str(e))
-            raise HTTPException(
-                status_code=500,
-                detail=f"Unerwarteter Fehler bei lokaler LLM-Anfrage: {str(e)}"
-            )
+        return "/chat/completions", headers, payload
+    
+    def parse_response(self, result: Dict[str, Any]) -> Tuple[str, Dict[str, int]]:
+        """Extrahiert Text und Token-Nutzung (OpenAI-kompatibles Format)."""
+        usage = result.get("usage", {})
+        if "choices" in result and len(result["choices"]) > 0:
+            return result["choices"][0]["message"]["content"], {
+                "input_tokens": usage.get("prompt_tokens", 0),
+                "output_tokens": usage.get("completion_tokens", 0),
+            }
+        raise ValueError("Keine Antwort vom lokalen LLM-Server erhalten")
     
     def get_provider_info(self) -> Dict[str, str]:
         """Liefert Informationen über den verwendeten lokalen LLM-Provider."""
@@ -0,0 +1,143 @@
+"""
+Tests für das LLM-Gateway gegen einen lokalen Stub-HTTP-Server.
+
+Ausführen im Verzeichnis finance-microservice:
+    python -m pytest tests/test_llm_gateway.py
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+import src.core.llm as llm
+from src.core.llm import LLMGateway, LLMResponseCache, OpenAIProvider, TokenBucketLimiter
+
+
+class StubState:
+    def __init__(self):
+        self.requests = 0
+        self.client_ports = set()
+        self.active = 0
+        self.max_active = 0
+        self.status = 200
+        self.lock = threading.Lock()
+
+
+def _make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with state.lock:
+                state.requests += 1
+                state.client_ports.add(self.client_address[1])
+                state.active += 1
+                state.max_active = max(state.max_active, state.active)
+            time.sleep(0.05)
+            with state.lock:
+                state.active -= 1
+
+            body = json.dumps({
+                "choices": [{"message": {"content": f"Konto 4930 für: {payload['messages'][1]['content']}"}}],
+                "usage": {"prompt_tokens": 12, "completion_tokens": 8},
+            } if state.status == 200 else {"error": "ungültig"}).encode("utf-8")
+            self.send_response(state.status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+@pytest.fixture
+def stub_server():
+    state = StubState()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(state))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield state, f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest_asyncio.fixture
+async def gateway(monkeypatch):
+    gateway = LLMGateway(LLMResponseCache(ttl=60, max_entries=100), TokenBucketLimiter(2, 0), cache_enabled=True)
+    monkeypatch.setattr(llm, "llm_gateway", gateway)
+    yield gateway
+    await llm.close_http_clients()
+
+
+def _provider(base_url):
+    return OpenAIProvider(api_key="test", base_url=base_url)
+
+
+@pytest.mark.asyncio
+async def test_repeated_prompt_is_served_from_cache(stub_server, gateway):
+    state, base_url = stub_server
+    first = await _provider(base_url).generate_text("System", "Beleg: Büromaterial 49,90 EUR")
+    second = await _provider(base_url).generate_text("System", "Beleg: Büromaterial 49,90 EUR")
+    assert first == second
+    assert state.requests == 1
+
+    # Andere Temperatur ist eine andere Anfrage
+    await _provider(base_url).generate_text("System", "Beleg: Büromaterial 49,90 EUR", temperature=0.7)
+    assert state.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_are_coalesced(stub_server, gateway):
+    state, base_url = stub_server
+    gateway.cache_enabled = False
+    results = await asyncio.gather(*(
+        _provider(base_url).generate_text("System", "Beleg: Tankquittung") for _ in range(10)
+    ))
+    assert len(set(results)) == 1
+    assert state.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_pooled_client_and_concurrency_limit(stub_server, gateway):
+    state, base_url = stub_server
+    for i in range(3):
+        await _provider(base_url).generate_text("System", f"Beleg {i}")
+    assert state.client_ports == {next(iter(state.client_ports))}
+
+    await asyncio.gather(*(
+        _provider(base_url).generate_text("System", f"Parallel {i}") for i in range(6)
+    ))
+    assert state.max_active <= 2
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(stub_server, gateway):
+    state, base_url = stub_server
+    state.status = 400
+    with pytest.raises(HTTPException) as error:
+        await _provider(base_url).generate_text("System", "Beleg ungültig")
+    assert error.value.status_code == 400
+    assert state.requests == 1
+
+
+def test_token_bucket_waits_for_refill():
+    async def run():
+        limiter = TokenBucketLimiter(max_concurrency=4, tokens_per_minute=6000)
+        await limiter.acquire(6000)
+        limiter.release(6000, 6000)
+        start = time.monotonic()
+        await limiter.acquire(100)  # 100 Tokens entsprechen 1 s Nachfüllzeit
+        limiter.release(100)
+        return time.monotonic() - start
+
+    assert 0.8 < asyncio.run(run()) < 2.0